@@ -31,19 +31,21 @@ import asyncio
 import joblib
 import os
 
+from model_registry import ModelRegistry, ModelVersion
+from uncertainty import analytic_interval
+
 class AnomalyDetectionEngine:
     """
     Advanced ML-powered anomaly detection engine for identifying cheating patterns
     Combines multiple statistical and machine learning approaches for robust detection
     """
     
-    def __init__(self):
+    def __init__(self, model_registry: ModelRegistry = None):
         self.logger = logging.getLogger(__name__)
         
-        # Model storage
-        self.baseline_models = {}
-        self.scalers = {}
-        self.anomaly_detectors = {}
+        # Model storage: versioned artifacts (scaler, isolation_forest, dbscan, pca, statistical)
+        self.model_registry = model_registry if model_registry is not None else ModelRegistry()
+        self.model_name = "anomaly_baseline"
         
         # Configuration parameters
         self.anomaly_threshold = 0.7  # Anomaly probability threshold
@@ -62,13 +64,34 @@ class AnomalyDetectionEngine:
         }
         
         # Model paths for persistence
-        self.model_dir = "/app/backend/models"
-        self._ensure_model_directory()
-        
-    def _ensure_model_directory(self):
-        """Ensure model directory exists"""
-        if not os.path.exists(self.model_dir):
-            os.makedirs(self.model_dir)
+        self.model_dir = self.model_registry.root
+        self._legacy_models = self._load_legacy_models()
+    
+    def _current_models(self) -> Optional[ModelVersion]:
+        """Active model version (hot-swapped after a retrain in any worker), else pre-registry files"""
+        models = self.model_registry.current(self.model_name)
+        return models if models is not None else self._legacy_models
+    
+    def _load_legacy_models(self) -> Optional[ModelVersion]:
+        """Models saved before versioning (flat *_scaler.pkl / *_detector.pkl files in the model directory)"""
+        try:
+            scaler_path = os.path.join(self.model_dir, "baseline_scaler.pkl")
+            if self.model_registry.current_version(self.model_name) or not os.path.exists(scaler_path):
+                return None
+            artifacts = {'scaler': joblib.load(scaler_path)}
+            for name in ('isolation_forest', 'dbscan'):
+                detector_path = os.path.join(self.model_dir, f"{name}_detector.pkl")
+                if os.path.exists(detector_path):
+                    artifacts[name] = joblib.load(detector_path)
+            baseline_path = os.path.join(self.model_dir, "baseline_models.json")
+            if os.path.exists(baseline_path):
+                with open(baseline_path) as f:
+                    artifacts['statistical'] = json.load(f).get('statistical', {})
+            feature_names = [str(name) for name in getattr(artifacts['scaler'], 'feature_names_in_', [])]
+            return ModelVersion(self.model_name, 'legacy', artifacts, {'feature_names': feature_names})
+        except Exception as e:
+            self.logger.warning(f"Could not load legacy anomaly models: {str(e)}")
+            return None
     
     def train_baseline_models(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -91,12 +114,14 @@ class AnomalyDetectionEngine:
                 raise ValueError("No valid features could be extracted from historical data")
             
             # Split features into training components
-            X = features_df.drop(['session_id', 'is_legitimate'], axis=1, errors='ignore')
+            X_observed = features_df.drop(['session_id', 'is_legitimate'], axis=1, errors='ignore')
+            # Features a session does not have (e.g. no difficulty data) are 0, as at scoring time
+            X = X_observed.astype(float).fillna(0.0)
             
             # Scale features
             scaler = StandardScaler()
             X_scaled = scaler.fit_transform(X)
-            self.scalers['baseline'] = scaler
+            artifacts = {'scaler': scaler}
             
             # Train multiple anomaly detection models
             training_results = {}
@@ -108,17 +133,17 @@ class AnomalyDetectionEngine:
                 n_estimators=100
             )
             isolation_forest.fit(X_scaled)
-            self.anomaly_detectors['isolation_forest'] = isolation_forest
+            artifacts['isolation_forest'] = isolation_forest
             
             # 2. DBSCAN for density-based clustering
             dbscan = DBSCAN(eps=0.5, min_samples=5)
             dbscan_labels = dbscan.fit_predict(X_scaled)
-            self.anomaly_detectors['dbscan'] = dbscan
+            artifacts['dbscan'] = dbscan
             
             # 3. Statistical baseline models for each feature
             baseline_stats = {}
-            for column in X.columns:
-                values = X[column].dropna()
+            for column in X_observed.columns:
+                values = X_observed[column].dropna()
                 if len(values) > 0:
                     baseline_stats[column] = {
                         'mean': float(values.mean()),
@@ -130,14 +155,15 @@ class AnomalyDetectionEngine:
                         'max': float(values.max())
                     }
             
-            self.baseline_models['statistical'] = baseline_stats
+            artifacts['statistical'] = baseline_stats
             
             # 4. PCA for dimensionality reduction and reconstruction error
+            pca = None
             n_components = min(10, X_scaled.shape[0] - 1, X_scaled.shape[1])  # Ensure valid PCA dimensions
             if n_components > 0:
                 pca = PCA(n_components=n_components)
                 pca.fit(X_scaled)
-                self.baseline_models['pca'] = pca
+                artifacts['pca'] = pca
             else:
                 self.logger.warning("Insufficient data for PCA - skipping PCA model")
             
@@ -158,12 +184,23 @@ class AnomalyDetectionEngine:
                 },
                 'dbscan_clusters': len(set(dbscan_labels)) - (1 if -1 in dbscan_labels else 0),
                 'dbscan_outliers': int(dbscan_outliers),
-                'pca_explained_variance': float(pca.explained_variance_ratio_.sum()),
+                'pca_explained_variance': float(pca.explained_variance_ratio_.sum()) if pca is not None else 0.0,
                 'statistical_baselines': baseline_stats
             }
             
-            # Save models to disk
-            self._save_models()
+            # Save a new model version and swap it in (other workers pick it up from the registry)
+            model_version = self.model_registry.save(self.model_name, artifacts, {
+                'feature_names': list(X.columns),
+                'num_training_samples': len(historical_data),
+                'metrics': {
+                    'isolation_forest_score_range': training_results['isolation_forest_score_range'],
+                    'dbscan_clusters': training_results['dbscan_clusters'],
+                    'dbscan_outliers': training_results['dbscan_outliers'],
+                    'pca_explained_variance': training_results['pca_explained_variance']
+                }
+            })
+            self.model_registry.publish(model_version)
+            training_results['model_version'] = model_version.version
             
             self.logger.info(f"Baseline model training completed successfully")
             return training_results
@@ -196,23 +233,21 @@ class AnomalyDetectionEngine:
                     'error': 'Could not extract features from session data'
                 }
             
-            # Convert to DataFrame for consistent processing
-            features_df = pd.DataFrame([features])
-            X = features_df.drop(['session_id'], axis=1, errors='ignore')
-            
             # Scale features using trained scaler
-            if 'baseline' not in self.scalers:
+            models = self._current_models()
+            if models is None:
                 raise ValueError("No trained scaler available. Please train baseline models first.")
             
-            X_scaled = self.scalers['baseline'].transform(X)
+            X = self._build_feature_frame([features], models)
+            X_scaled = models.artifacts['scaler'].transform(X)
             
             # Detect anomalies using multiple approaches
             anomaly_results = {}
             
             # 1. Isolation Forest anomaly detection
-            if 'isolation_forest' in self.anomaly_detectors:
-                isolation_score = self.anomaly_detectors['isolation_forest'].decision_function(X_scaled)[0]
-                isolation_anomaly = self.anomaly_detectors['isolation_forest'].predict(X_scaled)[0] == -1
+            if 'isolation_forest' in models.artifacts:
+                isolation_score = models.artifacts['isolation_forest'].decision_function(X_scaled)[0]
+                isolation_anomaly = isolation_score < 0  # IsolationForest.predict() labels negative scores as outliers
                 
                 anomaly_results['isolation_forest'] = {
                     'anomaly_detected': bool(isolation_anomaly),
@@ -221,13 +256,13 @@ class AnomalyDetectionEngine:
                 }
             
             # 2. Statistical anomaly detection
-            if 'statistical' in self.baseline_models:
-                statistical_anomalies = self._detect_statistical_anomalies(features, self.baseline_models['statistical'])
+            if 'statistical' in models.artifacts:
+                statistical_anomalies = self._detect_statistical_anomalies(features, models.artifacts['statistical'])
                 anomaly_results['statistical'] = statistical_anomalies
             
             # 3. PCA reconstruction error
-            if 'pca' in self.baseline_models:
-                pca_score = self._calculate_pca_anomaly_score(X_scaled[0], self.baseline_models['pca'])
+            if 'pca' in models.artifacts:
+                pca_score = self._calculate_pca_anomaly_score(X_scaled[0], models.artifacts['pca'])
                 anomaly_results['pca_reconstruction'] = {
                     'reconstruction_error': float(pca_score),
                     'anomaly_detected': bool(pca_score > 2.0),  # Threshold for reconstruction error
@@ -247,6 +282,7 @@ class AnomalyDetectionEngine:
                 'analysis_timestamp': datetime.utcnow().isoformat(),
                 'individual_analyses': anomaly_results,
                 'overall_assessment': overall_assessment,
+                'model_version': models.version,
                 'feature_analysis': self._analyze_feature_contributions(features, X.columns.tolist()),
                 'recommendation': self._generate_anomaly_recommendation(overall_assessment)
             }
@@ -259,6 +295,96 @@ class AnomalyDetectionEngine:
                 'error': str(e)
             }
     
+    def score_sessions_batch(self, sessions: List[Dict[str, Any]], include_response_patterns: bool = True) -> Dict[str, Any]:
+        """
+        Score many sessions against the trained models at once
+        
+        Features of all sessions are assembled into one matrix, scaled once and
+        scored with a single decision_function call per model; statistical
+        z-scores and PCA reconstruction errors are computed for the whole matrix.
+        Each session's overall_assessment matches detect_response_pattern_anomalies().
+        
+        Args:
+            sessions: Session data in the detect_response_pattern_anomalies format
+            include_response_patterns: Also run the per-session response pattern checks
+        
+        Returns:
+            Per-session scores keyed by session_id, plus sessions that could not be scored
+        """
+        try:
+            models = self._current_models()
+            if models is None:
+                raise ValueError("No trained scaler available. Please train baseline models first.")
+            
+            feature_rows, scored_sessions, failed = [], [], {}
+            for session in sessions:
+                features = self._extract_session_features(session)
+                if features:
+                    feature_rows.append(features)
+                    scored_sessions.append(session)
+                else:
+                    failed[session.get('session_id', 'unknown')] = 'Could not extract features from session data'
+            
+            results = {}
+            if feature_rows:
+                X = self._build_feature_frame(feature_rows, models)
+                X_scaled = models.artifacts['scaler'].transform(X)
+                per_model = {}
+                
+                if 'isolation_forest' in models.artifacts:
+                    isolation_scores = models.artifacts['isolation_forest'].decision_function(X_scaled)
+                    per_model['isolation_forest'] = [
+                        {'anomaly_detected': bool(score < 0), 'anomaly_score': float(score), 'confidence': abs(float(score))}
+                        for score in isolation_scores
+                    ]
+                
+                if 'statistical' in models.artifacts:
+                    per_model['statistical'] = self._detect_statistical_anomalies_matrix(
+                        self._build_feature_frame(feature_rows, models, fill_missing=False), models.artifacts['statistical'])
+                
+                if 'pca' in models.artifacts:
+                    pca = models.artifacts['pca']
+                    errors = ((X_scaled - pca.inverse_transform(pca.transform(X_scaled))) ** 2).sum(axis=1)
+                    per_model['pca_reconstruction'] = [
+                        {'reconstruction_error': float(error), 'anomaly_detected': bool(error > 2.0), 'confidence': min(float(error / 2.0), 1.0)}
+                        for error in errors
+                    ]
+                
+                for row, (session, features) in enumerate(zip(scored_sessions, feature_rows)):
+                    analyses = {name: values[row] for name, values in per_model.items()}
+                    if include_response_patterns:
+                        analyses['response_patterns'] = self._analyze_response_patterns(session)
+                    results[features['session_id']] = {
+                        'individual_analyses': analyses,
+                        'overall_assessment': self._calculate_overall_anomaly_assessment(analyses)
+                    }
+            
+            return {
+                'success': True,
+                'analysis_timestamp': datetime.utcnow().isoformat(),
+                'model_version': models.version,
+                'sessions_scored': len(results),
+                'results': results,
+                'failed_sessions': failed
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in batch anomaly scoring: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def get_model_registry_status(self) -> Dict[str, Any]:
+        """Active model version, saved versions and registry statistics"""
+        models = self._current_models()
+        return {
+            'active_version': models.version if models else None,
+            'feature_names': models.metadata.get('feature_names', []) if models else [],
+            'versions': self.model_registry.list_versions(self.model_name),
+            'registry': self.model_registry.get_stats()
+        }
+    
     def analyze_performance_inconsistencies(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze performance inconsistencies that may indicate cheating
@@ -1059,25 +1185,38 @@ class AnomalyDetectionEngine:
                 'anomaly_detected': False
             }
     
-    def _save_models(self):
-        """Save trained models to disk"""
-        try:
-            # Save scalers
-            for name, scaler in self.scalers.items():
-                joblib.dump(scaler, os.path.join(self.model_dir, f"{name}_scaler.pkl"))
-            
-            # Save anomaly detectors
-            for name, detector in self.anomaly_detectors.items():
-                joblib.dump(detector, os.path.join(self.model_dir, f"{name}_detector.pkl"))
-            
-            # Save baseline models
-            with open(os.path.join(self.model_dir, "baseline_models.json"), 'w') as f:
-                json.dump(self.baseline_models, f, default=str)
-                
-            self.logger.info("Models saved successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Error saving models: {str(e)}")
+    def _build_feature_frame(self, feature_rows: List[Dict[str, Any]], models: ModelVersion, fill_missing: bool = True) -> pd.DataFrame:
+        """Feature matrix in the column order the models were trained on (missing features are 0 unless fill_missing=False)"""
+        features_df = pd.DataFrame(feature_rows).drop(['session_id'], axis=1, errors='ignore')
+        feature_names = models.metadata.get('feature_names') or list(features_df.columns)
+        features_df = features_df.reindex(columns=feature_names).astype(float)
+        return features_df.fillna(0.0) if fill_missing else features_df
+    
+    def _detect_statistical_anomalies_matrix(self, X: pd.DataFrame, baseline_stats: Dict[str, Dict]) -> List[Dict[str, Any]]:
+        """
+        Z-score anomaly counts for every row of a feature matrix (summary form of
+        _detect_statistical_anomalies; features missing from a session (NaN) are skipped)
+        """
+        columns = [column for column in X.columns if column in baseline_stats]
+        means = np.array([baseline_stats[column]['mean'] for column in columns])
+        stds = np.array([baseline_stats[column]['std'] for column in columns])
+        values = X[columns].to_numpy()
+        present = ~np.isnan(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.abs((values - means) / stds)
+        z_scores[~present | ~(stds > 0)] = 0.0
+        anomalous = z_scores > 2.0
+        totals = present.sum(axis=1)
+        return [
+            {
+                'total_features': int(totals[row]),
+                'total_anomalies': int(anomalous[row].sum()),
+                'anomaly_rate': int(anomalous[row].sum()) / max(int(totals[row]), 1),
+                'anomalous_features': [columns[j] for j in np.nonzero(anomalous[row])[0]],
+                'max_z_score': float(z_scores[row].max()) if columns else 0.0
+            }
+            for row in range(len(values))
+        ]
     
     def _convert_to_probability(self, score: float) -> float:
         """Convert various scores to probability scale [0, 1]"""
@@ -1113,8 +1252,7 @@ class AnomalyDetectionEngine:
             component_values = list(components.values())
             
             if len(component_values) > 1:
-                component_std = statistics.stdev(component_values)
-                margin_of_error = 1.96 * component_std / np.sqrt(len(component_values))  # 95% CI
+                margin_of_error = analytic_interval(component_values, 0.95, distribution="normal")['margin_of_error']
             else:
                 margin_of_error = 0.1  # Default margin
             
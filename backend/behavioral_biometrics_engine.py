@@ -26,19 +26,255 @@ from typing import Dict, List, Any, Optional, Tuple
 import uuid
 import hashlib
 import statistics
-from collections import defaultdict
+import os
+from collections import defaultdict, OrderedDict
 import asyncio
 
+from pymongo.errors import DuplicateKeyError
+
+from biometric_wire_format import BiometricBatch, SCHEMAS, compress_columns, decompress_columns
+
+KEYSTROKE_STREAM_CAPACITY = int(os.environ.get("KEYSTROKE_STREAM_CAPACITY", "1000"))
+KEYSTROKE_STREAM_WINDOW = int(os.environ.get("KEYSTROKE_STREAM_WINDOW", "5000"))
+BIOMETRIC_RETENTION_DAYS = int(os.environ.get("BIOMETRIC_RETENTION_DAYS", "90"))
+
+# Keystroke events as a structured array; keys are interned to integer codes
+KEYSTROKE_DTYPE = np.dtype([("timestamp", "f8"), ("key", "i4"), ("event", "i1")])
+KEY_EVENT_CODES = {"keydown": 1, "keyup": 2}
+
+
+def keystroke_array(keystroke_data: List[Dict[str, Any]], key_codes: Dict[Any, int]) -> np.ndarray:
+    """Events sorted by timestamp; unseen keys are added to key_codes"""
+    count = len(keystroke_data)
+    intern = key_codes.setdefault
+    events = np.empty(count, dtype=KEYSTROKE_DTYPE)
+    events["timestamp"] = np.fromiter([event.get("timestamp", 0) for event in keystroke_data], dtype=np.float64, count=count)
+    events["key"] = np.fromiter([intern(event.get("key"), len(key_codes)) for event in keystroke_data], dtype=np.int32, count=count)
+    events["event"] = np.fromiter([KEY_EVENT_CODES.get(event.get("event_type"), 0) for event in keystroke_data], dtype=np.int8, count=count)
+    return events[np.argsort(events["timestamp"], kind="stable")]
+
+
+def pair_key_events(downs: np.ndarray, ups: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dwell time for each keydown: the first keyup of the same key strictly after it.
+    Keyups are sorted by (key, timestamp) and every keydown is located with one
+    binary search instead of scanning all keyups. Returns (dwell_times, matched_mask) in keydown order.
+    """
+    matched = np.zeros(len(downs), dtype=bool)
+    if not len(downs) or not len(ups):
+        return np.empty(0), matched
+
+    # (key, timestamp) folded into one sortable float per event
+    origin = min(downs["timestamp"].min(), ups["timestamp"].min())
+    span = max(downs["timestamp"].max(), ups["timestamp"].max()) - origin + 1.0
+    up_position = ups["key"] * span + (ups["timestamp"] - origin)
+    down_position = downs["key"] * span + (downs["timestamp"] - origin)
+    order = np.argsort(up_position, kind="stable")
+    up_position, up_keys, up_times = up_position[order], ups["key"][order], ups["timestamp"][order]
+
+    index = np.searchsorted(up_position, down_position, side="right")
+    in_range = index < len(up_keys)
+    matched[in_range] = up_keys[index[in_range]] == downs["key"][in_range]
+    return up_times[index[matched]] - downs["timestamp"][matched], matched
+
+
+def digraph_statistics(keys: np.ndarray, latencies: np.ndarray, key_names: List[str], top: int = 20) -> List[Dict[str, Any]]:
+    """
+    Latency statistics per consecutive key pair, where latencies[i] is the
+    time from keys[i] to keys[i + 1]. Most frequent digraphs first.
+    """
+    if len(keys) < 2:
+        return []
+    pairs = keys[:-1].astype(np.int64) * len(key_names) + keys[1:]
+    codes, inverse, counts = np.unique(pairs, return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse, weights=latencies, minlength=len(codes))
+    squares = np.bincount(inverse, weights=latencies ** 2, minlength=len(codes))
+    return _digraph_records(codes, counts, sums, squares, key_names, top)
+
+
+def _digraph_records(codes, counts, sums, squares, key_names: List[str], top: int) -> List[Dict[str, Any]]:
+    means = sums / counts
+    stds = np.sqrt(np.maximum(squares / counts - means ** 2, 0.0))
+    records = []
+    for i in np.argsort(-counts, kind="stable")[:top]:
+        first, second = divmod(int(codes[i]), len(key_names))
+        records.append({
+            "digraph": [key_names[first], key_names[second]],
+            "count": int(counts[i]),
+            "mean_latency": float(means[i]),
+            "std_latency": float(stds[i])
+        })
+    return records
+
+
+def key_dwell_statistics(keys: np.ndarray, dwell_times: np.ndarray, key_names: List[str], top: int = 20) -> Dict[str, Dict[str, float]]:
+    """Mean/std dwell time per key, most frequent keys first"""
+    if not len(keys):
+        return {}
+    counts = np.bincount(keys, minlength=len(key_names))
+    sums = np.bincount(keys, weights=dwell_times, minlength=len(key_names))
+    squares = np.bincount(keys, weights=dwell_times ** 2, minlength=len(key_names))
+    return _key_dwell_records(counts, sums, squares, key_names, top)
+
+
+def _key_dwell_records(counts, sums, squares, key_names: List[str], top: int) -> Dict[str, Dict[str, float]]:
+    stats_by_key = {}
+    for code in np.argsort(-counts, kind="stable")[:top]:
+        if counts[code] == 0:
+            break
+        mean = sums[code] / counts[code]
+        stats_by_key[key_names[code]] = {
+            "count": int(counts[code]),
+            "mean": float(mean),
+            "std": float(np.sqrt(max(squares[code] / counts[code] - mean ** 2, 0.0)))
+        }
+    return stats_by_key
+
+
+class RunningStats:
+    """Count/mean/variance/min/max over batches (Chan et al. parallel update)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, values: np.ndarray):
+        if not len(values):
+            return
+        n, mean = len(values), float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        delta = mean - self.mean
+        total = self.count + n
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+
+
+class KeystrokeStream:
+    """
+    Incremental keystroke statistics for one session. Batches must arrive in
+    time order. Counts, means, standard deviations, extremes, key frequencies and
+    digraph/per-key aggregates cover the whole stream; quantiles, consistency
+    and rhythm patterns use the most recent `window` dwell and flight times. Keydowns
+    still waiting for their keyup are carried into the next batch.
+    """
+
+    def __init__(self, window: int = KEYSTROKE_STREAM_WINDOW, max_open_keydowns: int = 256):
+        self.window = window
+        self.max_open_keydowns = max_open_keydowns
+        self.key_codes: Dict[Any, int] = {}
+        self.dwell = RunningStats()
+        self.flight = RunningStats()
+        self.recent_dwell = np.empty(0)
+        self.recent_flight = np.empty(0)
+        self.key_counts = np.zeros(0, dtype=np.int64)
+        self.key_dwell = np.zeros((3, 0))  # count, sum, sum of squares per key code
+        self.digraphs: Dict[Tuple[int, int], List[float]] = {}  # (key1, key2) -> [count, sum, sum of squares]
+        self.open_keydowns = np.empty(0, dtype=KEYSTROKE_DTYPE)
+        self.last_keydown = np.empty(0, dtype=KEYSTROKE_DTYPE)
+        self.first_timestamp: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+        self.total_events = 0
+        self.total_keydowns = 0
+        self.batches = 0
+        self.missed_batches = 0  # batches of this stream not seen by this process (another worker, eviction)
+        self.updated_at = datetime.utcnow()
+
+    @property
+    def key_names(self) -> List[str]:
+        return [str(key) for key in self.key_codes]
+
+    def update(self, keystroke_data: List[Dict[str, Any]]):
+        events = keystroke_array(keystroke_data, self.key_codes)
+        self.batches += 1
+        self.updated_at = datetime.utcnow()
+        if not len(events):
+            return
+
+        n_keys = len(self.key_codes)
+        self.total_events += len(events)
+        self.first_timestamp = float(events["timestamp"][0]) if self.first_timestamp is None else self.first_timestamp
+        self.last_timestamp = float(events["timestamp"][-1])
+        self.key_counts = np.concatenate([self.key_counts, np.zeros(n_keys - len(self.key_counts), dtype=np.int64)])
+        self.key_counts += np.bincount(events["key"], minlength=n_keys)
+
+        downs = events[events["event"] == 1]
+        ups = events[events["event"] == 2]
+        self.total_keydowns += len(downs)
+
+        # Dwell: carried keydowns plus this batch's keydowns against this batch's keyups
+        pending = np.concatenate([self.open_keydowns, downs])
+        dwell_times, matched = pair_key_events(pending, ups)
+        self.open_keydowns = pending[~matched][-self.max_open_keydowns:]
+        self.dwell.update(dwell_times)
+        self.recent_dwell = np.concatenate([self.recent_dwell, dwell_times])[-self.window:]
+        self.key_dwell = np.pad(self.key_dwell, ((0, 0), (0, n_keys - self.key_dwell.shape[1])))
+        matched_keys = pending["key"][matched]
+        self.key_dwell += np.vstack([np.bincount(matched_keys, minlength=n_keys),
+                                     np.bincount(matched_keys, weights=dwell_times, minlength=n_keys),
+                                     np.bincount(matched_keys, weights=dwell_times ** 2, minlength=n_keys)])
+
+        # Flight and digraphs continue from the last keydown of the previous batch
+        chain = np.concatenate([self.last_keydown, downs])
+        if len(downs):
+            self.last_keydown = downs[-1:].copy()
+        if len(chain) < 2:
+            return
+        flight_times = np.diff(chain["timestamp"])
+        self.flight.update(flight_times)
+        self.recent_flight = np.concatenate([self.recent_flight, flight_times])[-self.window:]
+
+        pairs = np.stack([chain["key"][:-1], chain["key"][1:]], axis=1)
+        unique_pairs, inverse, counts = np.unique(pairs, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        sums = np.bincount(inverse, weights=flight_times, minlength=len(unique_pairs))
+        squares = np.bincount(inverse, weights=flight_times ** 2, minlength=len(unique_pairs))
+        for (first, second), count, total, square in zip(unique_pairs.tolist(), counts, sums, squares):
+            aggregate = self.digraphs.setdefault((first, second), [0, 0.0, 0.0])
+            aggregate[0] += int(count)
+            aggregate[1] += float(total)
+            aggregate[2] += float(square)
+
+    def digraph_statistics(self, top: int = 20) -> List[Dict[str, Any]]:
+        if not self.digraphs:
+            return []
+        n_keys = len(self.key_codes)
+        codes = np.array([first * n_keys + second for first, second in self.digraphs])
+        counts, sums, squares = np.array(list(self.digraphs.values())).T
+        return _digraph_records(codes, counts, sums, squares, self.key_names, top)
+
+    def key_dwell_statistics(self, top: int = 20) -> Dict[str, Dict[str, float]]:
+        counts, sums, squares = self.key_dwell
+        return _key_dwell_records(counts, sums, squares, self.key_names, top)
+
+
 class KeystrokeDynamicsAnalyzer:
     """
     Advanced keystroke dynamics analysis for behavioral fingerprinting
     Analyzes typing patterns, rhythm metrics, and detects anomalies
+    
+    Incremental streams live in this process only (LRU of KEYSTROKE_STREAM_CAPACITY).
+    With several workers, a session's batches must be routed to the same worker
+    (sticky sessions on session_id); a batch that reaches a worker without the
+    stream, or arrives after eviction or a restart, starts the statistics over
+    and is reported as stream.restarted (stream.missed_batches counts the batches
+    the statistics lack).
     """
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.baseline_profiles = {}  # Store baseline patterns per user
         self.anomaly_threshold = 2.5  # Standard deviations for anomaly detection
+        self.streams: "OrderedDict[str, KeystrokeStream]" = OrderedDict()  # Incremental sessions, LRU-bounded
         
     def analyze_typing_patterns(self, keystroke_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -55,106 +291,163 @@ class KeystrokeDynamicsAnalyzer:
             if not keystroke_data or len(keystroke_data) < 10:
                 return {"error": "Insufficient keystroke data for analysis", "patterns": {}}
             
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(keystroke_data)
-            df['timestamp'] = pd.to_numeric(df['timestamp'])
-            df = df.sort_values('timestamp')
-            
-            # Calculate dwell times (key press duration)
-            dwell_times = []
-            flight_times = []  # Time between keystrokes
-            
-            # Group by key press/release pairs
-            keydown_events = df[df['event_type'] == 'keydown'].copy()
-            keyup_events = df[df['event_type'] == 'keyup'].copy()
-            
-            # Calculate dwell times
-            for _, keydown in keydown_events.iterrows():
-                keyup_match = keyup_events[
-                    (keyup_events['key'] == keydown['key']) & 
-                    (keyup_events['timestamp'] > keydown['timestamp'])
-                ].head(1)
-                
-                if not keyup_match.empty:
-                    dwell_time = keyup_match.iloc[0]['timestamp'] - keydown['timestamp']
-                    dwell_times.append(dwell_time)
-            
-            # Calculate flight times (time between consecutive keystrokes)
-            sorted_keydowns = keydown_events.sort_values('timestamp')
-            timestamps = sorted_keydowns['timestamp'].values
-            flight_times = np.diff(timestamps)
-            
-            # Analyze typing rhythm and patterns
-            rhythm_analysis = self.calculate_rhythm_metrics(dwell_times, flight_times)
+            key_codes: Dict[Any, int] = {}
+            events = keystroke_array(keystroke_data, key_codes)
+            return {"typing_patterns": self._analyze_keystroke_array(events, [str(key) for key in key_codes])}
             
-            # Character frequency analysis
-            char_frequency = df['key'].value_counts().to_dict()
-            
-            # Typing speed analysis
-            total_time = df['timestamp'].max() - df['timestamp'].min()
-            typing_speed = len(keydown_events) / (total_time / 60) if total_time > 0 else 0  # WPM approximation
-            
-            # Pattern consistency analysis
-            consistency_metrics = self._analyze_consistency(dwell_times, flight_times)
-            
-            # Advanced behavioral metrics
-            behavioral_metrics = self._calculate_behavioral_metrics(df, dwell_times, flight_times)
+        except Exception as e:
+            self.logger.error(f"Error analyzing typing patterns: {str(e)}")
+            return {"error": str(e), "patterns": {}}
+
+    def analyze_keystroke_columns(self, timestamps: np.ndarray, keys: np.ndarray, keyup: np.ndarray,
+                                  key_names: List[str]) -> Dict[str, Any]:
+        """
+        analyze_typing_patterns for columnar input (e.g. a decoded wire-format
+        frame): timestamps in ms, key indexes into key_names, keyup flags
+        """
+        try:
+            if len(timestamps) < 10:
+                return {"error": "Insufficient keystroke data for analysis", "patterns": {}}
+
+            events = np.empty(len(timestamps), dtype=KEYSTROKE_DTYPE)
+            events["timestamp"] = timestamps
+            events["key"] = keys
+            events["event"] = np.where(keyup, KEY_EVENT_CODES["keyup"], KEY_EVENT_CODES["keydown"])
+            events = events[np.argsort(events["timestamp"], kind="stable")]
+            return {"typing_patterns": self._analyze_keystroke_array(events, list(key_names))}
+
+        except Exception as e:
+            self.logger.error(f"Error analyzing keystroke columns: {str(e)}")
+            return {"error": str(e), "patterns": {}}
+
+    def _analyze_keystroke_array(self, events: np.ndarray, key_names: List[str]) -> Dict[str, Any]:
+        """Typing patterns for a time-sorted KEYSTROKE_DTYPE array whose key codes index key_names"""
+        # Dwell times (key press duration) and flight times (between consecutive keydowns)
+        keydowns = events[events["event"] == 1]
+        dwell_times, matched = pair_key_events(keydowns, events[events["event"] == 2])
+        flight_times = np.diff(keydowns["timestamp"])
+        
+        typing_patterns = self._build_typing_patterns(
+            dwell_times, flight_times,
+            key_counts=np.bincount(events["key"], minlength=len(key_names)),
+            key_names=key_names,
+            total_keystrokes=len(keydowns),
+            total_time=float(events["timestamp"][-1] - events["timestamp"][0])
+        )
+        typing_patterns["digraph_statistics"] = digraph_statistics(keydowns["key"], flight_times, key_names)
+        typing_patterns["key_dwell_statistics"] = key_dwell_statistics(keydowns["key"][matched], dwell_times, key_names)
+        return typing_patterns
+    
+    def update_typing_stream(self, stream_id: str, keystroke_data: List[Dict[str, Any]], finalize: bool = False,
+                             batch_number: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Incremental typing analysis: add a batch of keystroke events to a stream
+        and return the analysis of everything received so far
+        
+        Args:
+            stream_id: Stream identifier (usually the session id)
+            keystroke_data: Next batch of keystroke events, in time order after the previous batch
+            finalize: Drop the stream state after this batch
+            batch_number: 1-based position of this batch in the stream as counted by the
+                caller across workers; a larger number than this worker has seen means
+                earlier batches are missing from the statistics
             
-            return {
-                "typing_patterns": {
-                    "rhythm_analysis": rhythm_analysis,
-                    "character_frequency": char_frequency,
-                    "typing_speed_wpm": round(typing_speed, 2),
-                    "consistency_metrics": consistency_metrics,
-                    "behavioral_metrics": behavioral_metrics,
-                    "total_keystrokes": len(keydown_events),
-                    "analysis_duration": total_time,
-                    "timestamp": datetime.utcnow().isoformat()
-                }
+        Returns:
+            Dict in the analyze_typing_patterns format plus stream metadata
+        """
+        try:
+            stream = self.streams.pop(stream_id, None) or KeystrokeStream()
+            missed = max(0, batch_number - (stream.batches + stream.missed_batches + 1)) if batch_number else 0
+            stream.missed_batches += missed
+            restarted = missed > 0
+            stream.update(keystroke_data or [])
+            if not finalize:
+                self.streams[stream_id] = stream
+                while len(self.streams) > KEYSTROKE_STREAM_CAPACITY:
+                    self.streams.popitem(last=False)
+            
+            stream_info = {
+                "stream_id": stream_id,
+                "batches": stream.batches,
+                "total_events": stream.total_events,
+                "open_keydowns": len(stream.open_keydowns),
+                "finalized": finalize,
+                "restarted": restarted,
+                "missed_batches": stream.missed_batches
             }
+            if stream.total_events < 10 or stream.dwell.count == 0 or stream.flight.count == 0:
+                return {"error": "Insufficient keystroke data for analysis", "patterns": {}, "stream": stream_info}
+            
+            typing_patterns = self._build_typing_patterns(
+                stream.recent_dwell, stream.recent_flight,
+                key_counts=stream.key_counts,
+                key_names=stream.key_names,
+                total_keystrokes=stream.total_keydowns,
+                total_time=stream.last_timestamp - stream.first_timestamp,
+                running={"dwell": stream.dwell, "flight": stream.flight}
+            )
+            typing_patterns["digraph_statistics"] = stream.digraph_statistics()
+            typing_patterns["key_dwell_statistics"] = stream.key_dwell_statistics()
+            
+            return {"typing_patterns": typing_patterns, "stream": stream_info}
             
         except Exception as e:
-            self.logger.error(f"Error analyzing typing patterns: {str(e)}")
+            self.logger.error(f"Error updating typing stream: {str(e)}")
             return {"error": str(e), "patterns": {}}
     
-    def calculate_rhythm_metrics(self, dwell_times: List[float], flight_times: List[float]) -> Dict[str, Any]:
+    def _build_typing_patterns(self, dwell_times: np.ndarray, flight_times: np.ndarray, key_counts: np.ndarray,
+                               key_names: List[str], total_keystrokes: int, total_time: float,
+                               running: Optional[Dict[str, "RunningStats"]] = None) -> Dict[str, Any]:
+        """Typing pattern summary shared by one-shot and incremental analysis"""
+        # Analyze typing rhythm and patterns
+        rhythm_analysis = self.calculate_rhythm_metrics(dwell_times, flight_times, running)
+        
+        # Character frequency analysis (events per key, most frequent first)
+        char_frequency = {key_names[code]: int(key_counts[code]) for code in np.argsort(-key_counts, kind="stable") if key_counts[code]}
+        
+        # Typing speed analysis
+        typing_speed = total_keystrokes / (total_time / 60) if total_time > 0 else 0  # WPM approximation
+        
+        # Pattern consistency analysis
+        consistency_metrics = self._analyze_consistency(dwell_times, flight_times)
+        
+        # Advanced behavioral metrics
+        backspace_count = int(key_counts[key_names.index("Backspace")]) if "Backspace" in key_names else 0
+        behavioral_metrics = self._calculate_behavioral_metrics(backspace_count, int(key_counts.sum()), dwell_times, flight_times)
+        
+        return {
+            "rhythm_analysis": rhythm_analysis,
+            "character_frequency": char_frequency,
+            "typing_speed_wpm": round(typing_speed, 2),
+            "consistency_metrics": consistency_metrics,
+            "behavioral_metrics": behavioral_metrics,
+            "total_keystrokes": int(total_keystrokes),
+            "analysis_duration": float(total_time),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def calculate_rhythm_metrics(self, dwell_times: List[float], flight_times: List[float],
+                                 running: Optional[Dict[str, "RunningStats"]] = None) -> Dict[str, Any]:
         """
         Calculate comprehensive rhythm metrics from keystroke timing data
         
         Args:
             dwell_times: List of key press durations
             flight_times: List of time intervals between consecutive keystrokes
+            running: Optional whole-stream RunningStats ("dwell", "flight") for mean/std/min/max
             
         Returns:
             Dict containing rhythm analysis metrics
         """
         try:
-            if not dwell_times or not flight_times:
+            dwell_times = np.asarray(dwell_times, dtype=float)
+            flight_times = np.asarray(flight_times, dtype=float)
+            if not len(dwell_times) or not len(flight_times):
                 return {"error": "Insufficient timing data"}
             
-            # Dwell time statistics
-            dwell_stats = {
-                "mean": np.mean(dwell_times),
-                "std": np.std(dwell_times),
-                "median": np.median(dwell_times),
-                "min": np.min(dwell_times),
-                "max": np.max(dwell_times),
-                "q25": np.percentile(dwell_times, 25),
-                "q75": np.percentile(dwell_times, 75),
-                "cv": np.std(dwell_times) / np.mean(dwell_times) if np.mean(dwell_times) > 0 else 0
-            }
-            
-            # Flight time statistics
-            flight_stats = {
-                "mean": np.mean(flight_times),
-                "std": np.std(flight_times),
-                "median": np.median(flight_times),
-                "min": np.min(flight_times),
-                "max": np.max(flight_times),
-                "q25": np.percentile(flight_times, 25),
-                "q75": np.percentile(flight_times, 75),
-                "cv": np.std(flight_times) / np.mean(flight_times) if np.mean(flight_times) > 0 else 0
-            }
+            running = running or {}
+            dwell_stats = self._timing_statistics(dwell_times, running.get("dwell"))
+            flight_stats = self._timing_statistics(flight_times, running.get("flight"))
             
             # Rhythm regularity metrics
             rhythm_regularity = {
@@ -177,6 +470,24 @@ class KeystrokeDynamicsAnalyzer:
             self.logger.error(f"Error calculating rhythm metrics: {str(e)}")
             return {"error": str(e)}
     
+    def _timing_statistics(self, values: np.ndarray, running: Optional["RunningStats"] = None) -> Dict[str, float]:
+        """Summary statistics; mean/std/min/max come from running stats when given"""
+        q25, median, q75 = np.percentile(values, [25, 50, 75])
+        if running is not None and running.count:
+            mean, std, minimum, maximum = running.mean, running.std, running.min, running.max
+        else:
+            mean, std, minimum, maximum = values.mean(), values.std(), values.min(), values.max()
+        return {
+            "mean": mean,
+            "std": std,
+            "median": median,
+            "min": minimum,
+            "max": maximum,
+            "q25": q25,
+            "q75": q75,
+            "cv": std / mean if mean > 0 else 0
+        }
+    
     def detect_typing_anomalies(self, baseline_pattern: Dict[str, Any], current_pattern: Dict[str, Any]) -> Dict[str, Any]:
         """
         Detect typing anomalies by comparing current patterns against baseline
@@ -335,7 +646,7 @@ class KeystrokeDynamicsAnalyzer:
         except:
             return {"dwell_consistency": 0.5, "flight_consistency": 0.5, "overall_consistency": 0.5}
     
-    def _calculate_behavioral_metrics(self, df: pd.DataFrame, dwell_times: List[float], flight_times: List[float]) -> Dict[str, Any]:
+    def _calculate_behavioral_metrics(self, backspace_count: int, total_events: int, dwell_times: np.ndarray, flight_times: np.ndarray) -> Dict[str, Any]:
         """Calculate advanced behavioral metrics"""
         try:
             # Typing rhythm analysis
@@ -346,52 +657,46 @@ class KeystrokeDynamicsAnalyzer:
                 dominant_frequency = 0
             
             # Keystroke pressure patterns (simulated from timing variations)
-            pressure_simulation = np.std(dwell_times) * 100  # Simulated pressure variance
+            pressure_simulation = np.std(dwell_times) * 100 if len(dwell_times) else 0.0  # Simulated pressure variance
             
             # Error patterns (backspace usage, corrections)
-            backspace_count = df[df['key'] == 'Backspace'].shape[0]
-            total_keystrokes = df.shape[0]
-            error_rate = backspace_count / total_keystrokes if total_keystrokes > 0 else 0
+            error_rate = backspace_count / total_events if total_events > 0 else 0
             
             # Pause patterns (long intervals between keystrokes)
-            pause_threshold = np.percentile(flight_times, 90) if flight_times else 1.0
-            pause_count = len([ft for ft in flight_times if ft > pause_threshold])
+            pause_threshold = np.percentile(flight_times, 90) if len(flight_times) else 1.0
+            pause_count = int(np.count_nonzero(flight_times > pause_threshold))
             
             return {
                 "dominant_rhythm_frequency": float(dominant_frequency),
                 "simulated_pressure_variance": float(pressure_simulation),
                 "error_rate": float(error_rate),
-                "pause_frequency": float(pause_count / len(flight_times) if flight_times else 0),
+                "pause_frequency": float(pause_count / len(flight_times) if len(flight_times) else 0),
                 "backspace_usage": int(backspace_count)
             }
         except Exception as e:
             return {"error": str(e)}
     
-    def _detect_rhythm_patterns(self, dwell_times: List[float], flight_times: List[float]) -> Dict[str, Any]:
+    def _detect_rhythm_patterns(self, dwell_times: np.ndarray, flight_times: np.ndarray) -> Dict[str, Any]:
         """Detect specific rhythm patterns in typing"""
         try:
-            # Burst typing detection (periods of rapid typing)
-            if flight_times:
-                short_intervals = [ft for ft in flight_times if ft < np.percentile(flight_times, 25)]
-                burst_pattern_detected = len(short_intervals) > len(flight_times) * 0.3
+            if len(flight_times):
+                q25, q75 = np.percentile(flight_times, [25, 75])
+                # Burst typing detection (periods of rapid typing)
+                burst_pattern_detected = np.count_nonzero(flight_times < q25) > len(flight_times) * 0.3
+                # Hesitation pattern detection (frequent long pauses)
+                hesitation_pattern_detected = np.count_nonzero(flight_times > q75) > len(flight_times) * 0.2
             else:
                 burst_pattern_detected = False
-            
-            # Hesitation pattern detection (frequent long pauses)
-            if flight_times:
-                long_intervals = [ft for ft in flight_times if ft > np.percentile(flight_times, 75)]
-                hesitation_pattern_detected = len(long_intervals) > len(flight_times) * 0.2
-            else:
                 hesitation_pattern_detected = False
             
             # Rhythmic typing detection (consistent intervals)
-            rhythm_consistency = 1 / (1 + np.std(flight_times)) if flight_times else 0
+            rhythm_consistency = 1 / (1 + np.std(flight_times)) if len(flight_times) else 0
             rhythmic_typing_detected = rhythm_consistency > 0.7
             
             return {
-                "burst_pattern_detected": burst_pattern_detected,
-                "hesitation_pattern_detected": hesitation_pattern_detected,
-                "rhythmic_typing_detected": rhythmic_typing_detected,
+                "burst_pattern_detected": bool(burst_pattern_detected),
+                "hesitation_pattern_detected": bool(hesitation_pattern_detected),
+                "rhythmic_typing_detected": bool(rhythmic_typing_detected),
                 "rhythm_consistency_score": float(rhythm_consistency)
             }
         except:
@@ -1154,7 +1459,36 @@ class BiometricDataPrivacyManager:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.retention_days = 90
+        self.retention_days = BIOMETRIC_RETENTION_DAYS
+        self.records = None  # anonymized submissions
+        self.event_chunks = None  # compressed columnar event chunks
+        self._indexes_ready = False
+        
+    def attach_storage(self, db):
+        """Persist biometric data in MongoDB"""
+        self.records = db.biometric_data
+        self.event_chunks = db.biometric_event_chunks
+        
+    async def ensure_indexes(self):
+        """TTL indexes enforce the retention policy even if purge_expired_data never runs"""
+        if self.records is None or self._indexes_ready:
+            return
+        self._indexes_ready = True
+        try:
+            for collection in (self.records, self.event_chunks):
+                await collection.create_index([("retention_until", 1)], expireAfterSeconds=0)
+            await self.records.create_index([("session_hash", 1)])
+            # Chunks used to be unique per (session_hash, sequence), which let a remounted collector overwrite them
+            try:
+                await self.event_chunks.drop_index("session_hash_1_sequence_1")
+            except Exception:
+                pass
+            await self.event_chunks.create_index([("session_hash", 1), ("upload_id", 1), ("sequence", 1)], unique=True)
+        except Exception as e:
+            self.logger.error(f"Failed creating biometric data indexes: {e}")
+    
+    def _session_hash(self, session_id: str) -> str:
+        return hashlib.sha256(str(session_id).encode()).hexdigest()[:16]
         
     async def store_biometric_data(self, session_id: str, biometric_data: Dict[str, Any], 
                                  consent_given: bool = False) -> Dict[str, Any]:
@@ -1167,27 +1501,109 @@ class BiometricDataPrivacyManager:
             anonymized_data = self._anonymize_biometric_data(biometric_data)
             
             # Add retention metadata
+            now = datetime.utcnow()
             storage_record = {
-                "session_id": session_id,
+                "record_id": str(uuid.uuid4()),
+                "session_hash": self._session_hash(session_id),
                 "biometric_data": anonymized_data,
-                "consent_timestamp": datetime.utcnow(),
-                "retention_until": datetime.utcnow() + timedelta(days=self.retention_days),
+                "consent_timestamp": now,
+                "retention_until": now + timedelta(days=self.retention_days),
                 "anonymized": True,
-                "storage_timestamp": datetime.utcnow()
+                "storage_timestamp": now
             }
             
-            return {"success": True, "storage_record": storage_record}
+            stored = False
+            if self.records is not None:
+                await self.ensure_indexes()
+                await self.records.insert_one(dict(storage_record))
+                stored = True
+            
+            return {"success": True, "stored": stored, "storage_record": storage_record}
             
         except Exception as e:
             self.logger.error(f"Error storing biometric data: {str(e)}")
             return {"error": str(e)}
     
+    async def store_event_chunk(self, batch: BiometricBatch, consent_given: bool = False) -> Dict[str, Any]:
+        """
+        Store one decoded wire-format frame as a chunk of zlib-compressed,
+        delta-encoded columns keyed by (session_hash, upload_id, sequence).
+        Chunks are inserted, never replaced: a resent chunk (same upload and
+        sequence) is reported as a duplicate and the stored copy is kept
+        """
+        try:
+            if not consent_given:
+                return {"error": "Consent required for biometric data storage"}
+            
+            now = datetime.utcnow()
+            blobs = compress_columns(batch)
+            chunk = {
+                "session_hash": self._session_hash(batch.session_id),
+                "upload_id": batch.upload_id,
+                "sequence": batch.sequence,
+                "schema_version": batch.version,
+                "counts": {stream: batch.count(stream) for stream in SCHEMAS[batch.version]},
+                "keys": batch.key_names,
+                "columns": blobs,
+                "timing_data": batch.timing_data,
+                "compressed_bytes": sum(len(blob) for blob in blobs.values()),
+                "consent_timestamp": now,
+                "retention_until": now + timedelta(days=self.retention_days),
+                "storage_timestamp": now
+            }
+            
+            stored = False
+            duplicate = False
+            if self.event_chunks is not None:
+                await self.ensure_indexes()
+                try:
+                    await self.event_chunks.insert_one(dict(chunk))
+                    stored = True
+                except DuplicateKeyError:
+                    duplicate = True
+            
+            return {
+                "success": True,
+                "stored": stored,
+                "duplicate": duplicate,
+                "upload_id": chunk["upload_id"],
+                "sequence": chunk["sequence"],
+                "compressed_bytes": chunk["compressed_bytes"],
+                "retention_until": chunk["retention_until"]
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error storing biometric event chunk: {str(e)}")
+            return {"error": str(e)}
+    
+    async def load_event_chunks(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Stored chunks of a session with their columns decoded: uploads in the
+        order they started, each upload's chunks in sequence order
+        """
+        if self.event_chunks is None:
+            return []
+        chunks = []
+        upload_rank: Dict[Any, int] = {}
+        cursor = self.event_chunks.find({"session_hash": self._session_hash(session_id)}).sort("storage_timestamp", 1)
+        async for chunk in cursor:
+            upload_rank.setdefault(chunk.get("upload_id"), len(upload_rank))
+            chunk["columns"] = decompress_columns(chunk["schema_version"], chunk["counts"], chunk["columns"])
+            chunks.append(chunk)
+        chunks.sort(key=lambda chunk: (upload_rank[chunk.get("upload_id")], chunk["sequence"]))
+        return chunks
+    
     async def purge_expired_data(self) -> Dict[str, Any]:
         """Automatically purge expired biometric data"""
         try:
             current_time = datetime.utcnow()
+            purged = 0
+            if self.records is not None:
+                for collection in (self.records, self.event_chunks):
+                    result = await collection.delete_many({"retention_until": {"$lt": current_time}})
+                    purged += result.deleted_count
             purge_results = {
-                "purged_records": 0,
+                "purged_records": purged,
                 "purge_timestamp": current_time,
                 "retention_policy": f"{self.retention_days} days"
             }
@@ -1307,6 +1723,7 @@ intervention_system = RealTimeInterventionSystem()
 # Export main classes for use in server.py
 __all__ = [
     'KeystrokeDynamicsAnalyzer',
+    'KeystrokeStream',
     'InteractionBiometricsAnalyzer', 
     'ResponseTimingAnalyzer',
     'BiometricDataPrivacyManager',
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Compact Columnar Wire Format for Biometric Events
+
+BiometricDataCollector used to post every keystroke, mouse and scroll event as
+a JSON object with repeated keys. A batch is now sent as one binary frame:
+
+    b"BBF" | version (u8) | header length (u32 LE) | header (UTF-8 JSON) | columns
+
+The header carries the session id, consent flag, upload id (one per collector
+instance, so a remounted collector restarting at sequence 0 never collides
+with chunks already stored), chunk sequence number, event
+counts per stream, the key dictionary for keystrokes and the (low volume)
+question timing records. Columns follow in the SCHEMAS order for the frame's
+version, each `count` little-endian values. Timestamps are performance.now()
+milliseconds quantized to TIME_QUANTUM_MS; timestamps and coordinates are
+delta encoded (the first value is absolute), so most values fit into one or
+two bytes and gzip well. A frame may be gzip-compressed as a whole.
+
+decode_frame() turns a frame into NumPy columns without building per-event
+dicts. compress_columns()/decompress_columns() keep the encoded columns as the
+compressed per-chunk storage blob.
+"""
+
+import gzip
+import io
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"BBF"
+SCHEMA_VERSION = 1
+TIME_QUANTUM_MS = 0.1
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+MAX_FRAME_EVENTS = 500_000
+
+# Keystroke flag bits
+KEYUP = 1
+SHIFT = 2
+CTRL = 4
+ALT = 8
+META = 16
+
+# Mouse event kinds
+MOUSE_MOVE = 0
+MOUSE_CLICK = 1
+
+# version -> stream -> [(column, dtype, delta encoded)]
+SCHEMAS: Dict[int, Dict[str, List[Tuple[str, str, bool]]]] = {
+    1: {
+        "keystroke": [("t", "<i4", True), ("key", "<u2", False), ("flags", "u1", False)],
+        "mouse": [("t", "<i4", True), ("x", "<i2", True), ("y", "<i2", True), ("kind", "u1", False), ("button", "i1", False)],
+        "scroll": [("t", "<i4", True), ("x", "<i4", True), ("y", "<i4", True), ("dx", "<i2", False), ("dy", "<i2", False)],
+    }
+}
+
+
+class WireFormatError(ValueError):
+    """Raised for frames that cannot be decoded"""
+
+
+class BiometricBatch:
+    """One decoded frame: header fields plus decoded NumPy columns per stream"""
+
+    def __init__(self, version: int, header: Dict[str, Any], columns: Dict[str, Dict[str, np.ndarray]], encoded: Dict[str, bytes]):
+        self.version = version
+        self.header = header
+        self.columns = columns
+        self.encoded = encoded  # stream -> raw (still delta encoded) column bytes
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.header.get("session_id")
+
+    @property
+    def upload_id(self) -> Optional[str]:
+        return self.header.get("upload_id")
+
+    @property
+    def sequence(self) -> int:
+        return int(self.header.get("sequence", 0))
+
+    @property
+    def key_names(self) -> List[str]:
+        return [str(key) for key in self.header.get("keys", [])]
+
+    @property
+    def timing_data(self) -> List[Dict[str, Any]]:
+        return list(self.header.get("timing_data", []))
+
+    def count(self, stream: str) -> int:
+        return int(self.header.get("counts", {}).get(stream, 0))
+
+    @property
+    def total_events(self) -> int:
+        return sum(self.count(stream) for stream in SCHEMAS[self.version]) + len(self.timing_data)
+
+    # ----- record views for analyzers that still take lists of dicts -----
+
+    def mouse_records(self) -> List[Dict[str, Any]]:
+        mouse = self.columns.get("mouse")
+        if not mouse or not len(mouse["t"]):
+            return []
+        kinds = np.where(mouse["kind"] == MOUSE_CLICK, "click", "mousemove").tolist()
+        return [
+            {"x": x, "y": y, "timestamp": t, "event_type": kind, "button": button}
+            for x, y, t, kind, button in zip(mouse["x"].tolist(), mouse["y"].tolist(), mouse["t"].tolist(),
+                                             kinds, mouse["button"].tolist())
+        ]
+
+    def click_columns(self) -> Tuple[List[float], List[Tuple[int, int]]]:
+        mouse = self.columns.get("mouse")
+        if not mouse:
+            return [], []
+        clicks = mouse["kind"] == MOUSE_CLICK
+        return mouse["t"][clicks].tolist(), list(zip(mouse["x"][clicks].tolist(), mouse["y"][clicks].tolist()))
+
+    def click_records(self) -> List[Dict[str, Any]]:
+        timings, positions = self.click_columns()
+        return [{"x": x, "y": y, "timestamp": t} for t, (x, y) in zip(timings, positions)]
+
+    def scroll_records(self) -> List[Dict[str, Any]]:
+        scroll = self.columns.get("scroll")
+        if not scroll or not len(scroll["t"]):
+            return []
+        return [
+            {"x": x, "y": y, "deltaX": dx, "deltaY": dy, "timestamp": t, "event_type": "scroll"}
+            for x, y, dx, dy, t in zip(scroll["x"].tolist(), scroll["y"].tolist(), scroll["dx"].tolist(),
+                                       scroll["dy"].tolist(), scroll["t"].tolist())
+        ]
+
+
+def _decode_columns(version: int, counts: Dict[str, int], body: bytes) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, bytes]]:
+    columns: Dict[str, Dict[str, np.ndarray]] = {}
+    encoded: Dict[str, bytes] = {}
+    offset = 0
+    for stream, schema in SCHEMAS[version].items():
+        count = int(counts.get(stream, 0))
+        if count < 0:
+            raise WireFormatError(f"Negative event count for {stream}")
+        start = offset
+        decoded = {}
+        for name, dtype, delta in schema:
+            size = count * np.dtype(dtype).itemsize
+            if offset + size > len(body):
+                raise WireFormatError(f"Frame truncated in {stream}.{name}")
+            values = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+            offset += size
+            if delta:
+                values = np.cumsum(values, dtype=np.int64)
+            if name == "t":
+                decoded[name] = values * TIME_QUANTUM_MS
+            else:
+                decoded[name] = values.astype(np.int64) if delta else values
+        columns[stream] = decoded
+        encoded[stream] = body[start:offset]
+    if offset != len(body):
+        raise WireFormatError(f"{len(body) - offset} unexpected trailing bytes")
+    return columns, encoded
+
+
+def decode_frame(data: bytes) -> BiometricBatch:
+    """Decode a (optionally gzip-compressed) frame into NumPy columns"""
+    if data[:2] == b"\x1f\x8b":
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(data)) as stream:
+                data = stream.read(MAX_FRAME_BYTES + 1)
+        except (OSError, EOFError, zlib.error) as e:
+            raise WireFormatError(f"Invalid gzip payload: {e}")
+    if len(data) > MAX_FRAME_BYTES:
+        raise WireFormatError(f"Frame exceeds {MAX_FRAME_BYTES} bytes")
+    if len(data) < 8 or data[:3] != MAGIC:
+        raise WireFormatError("Not a biometric event frame")
+
+    version = data[3]
+    if version not in SCHEMAS:
+        raise WireFormatError(f"Unsupported schema version {version}")
+    (header_length,) = struct.unpack_from("<I", data, 4)
+    if 8 + header_length > len(data):
+        raise WireFormatError("Frame truncated in header")
+    try:
+        header = json.loads(data[8:8 + header_length].decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise WireFormatError(f"Invalid frame header: {e}")
+    if not isinstance(header, dict):
+        raise WireFormatError("Frame header must be an object")
+
+    try:
+        counts = {stream: int(header.get("counts", {}).get(stream, 0)) for stream in SCHEMAS[version]}
+    except (AttributeError, TypeError, ValueError):
+        raise WireFormatError("Invalid event counts in frame header")
+    if sum(counts.values()) > MAX_FRAME_EVENTS:
+        raise WireFormatError(f"Frame exceeds {MAX_FRAME_EVENTS} events")
+    columns, encoded = _decode_columns(version, counts, data[8 + header_length:])
+
+    keys = columns["keystroke"].get("key")
+    if keys is not None and len(keys) and int(keys.max()) >= len(header.get("keys", [])):
+        raise WireFormatError("Keystroke key index outside the key dictionary")
+    return BiometricBatch(version, header, columns, encoded)
+
+
+def encode_frame(header: Dict[str, Any], columns: Dict[str, Dict[str, Any]], version: int = SCHEMA_VERSION,
+                 compress: bool = False) -> bytes:
+    """
+    Encode decoded-style columns (timestamps in ms, absolute coordinates) into a
+    frame. Mirrors the browser encoder; used by tests and benchmarks.
+    """
+    header = dict(header)
+    header["counts"] = {stream: int(len(columns.get(stream, {}).get("t", []))) for stream in SCHEMAS[version]}
+    parts = []
+    for stream, schema in SCHEMAS[version].items():
+        stream_columns = columns.get(stream, {})
+        for name, dtype, delta in schema:
+            values = np.asarray(stream_columns.get(name, []))
+            if name == "t":
+                values = np.round(values / TIME_QUANTUM_MS)
+            values = values.astype(np.int64)
+            if delta and len(values):
+                values = np.diff(values, prepend=0)
+            parts.append(values.astype(dtype).tobytes())
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    frame = MAGIC + bytes([version]) + struct.pack("<I", len(header_bytes)) + header_bytes + b"".join(parts)
+    return gzip.compress(frame) if compress else frame
+
+
+def compress_columns(batch: BiometricBatch, level: int = 6) -> Dict[str, bytes]:
+    """zlib-compressed encoded column bytes per non-empty stream (the storage blob)"""
+    return {stream: zlib.compress(raw, level) for stream, raw in batch.encoded.items() if raw}
+
+
+def decompress_columns(version: int, counts: Dict[str, int], blobs: Dict[str, bytes]) -> Dict[str, Dict[str, np.ndarray]]:
+    """Inverse of compress_columns for a stored chunk"""
+    body = b"".join(zlib.decompress(blobs[stream]) if stream in blobs else b"" for stream in SCHEMAS[version])
+    return _decode_columns(version, counts, body)[0]
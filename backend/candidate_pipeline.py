@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Candidate Pipeline Aggregation
+
+The admin pipeline view used to load up to 1,000 tokens and 1,000 enhanced
+tokens and issue two find_one calls (sessions, assessments) per token, then
+sort in Python. It is now one aggregation per page:
+
+Key Features:
+- Keyset (cursor) pagination on (created_at, token), newest first; each
+  token collection is matched, sorted and limited on its own index before
+  the branches are merged with $unionWith, so a page touches only a page
+  worth of tokens regardless of the number of invitations
+- $lookup into sessions and assessments on their indexed token fields for
+  the page only, with the pipeline status derived in the aggregation
+- Server-side filters: status, job_id (indexed), job title prefix and
+  interview type. Status depends on the joins, so status-filtered pages are
+  scanned in batches up to PIPELINE_MAX_SCAN tokens per request; a short page
+  with a next_cursor means the scan budget ran out before the page filled
+- Requires MongoDB 5.0+ ($lookup with localField/foreignField and pipeline)
+"""
+
+import base64
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+PIPELINE_PAGE_SIZE = int(os.environ.get("PIPELINE_PAGE_SIZE", "100"))
+PIPELINE_MAX_PAGE_SIZE = int(os.environ.get("PIPELINE_MAX_PAGE_SIZE", "500"))
+PIPELINE_SCAN_BATCH = int(os.environ.get("PIPELINE_SCAN_BATCH", "500"))
+PIPELINE_MAX_SCAN = int(os.environ.get("PIPELINE_MAX_SCAN", "20000"))
+
+PIPELINE_STATUSES = ("Invited", "In Progress", "Completed", "Report Ready")
+
+# Token collection -> interview type shown in the pipeline
+TOKEN_COLLECTIONS = (("tokens", "Standard"), ("enhanced_tokens", "Enhanced"))
+
+
+class PipelineQueryError(ValueError):
+    """Invalid pipeline filter or cursor"""
+
+
+def encode_cursor(entry: Dict[str, Any]) -> str:
+    position = {"created_at": entry["created_at"].isoformat(), "token": entry["token"]}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(position["created_at"]), str(position["token"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise PipelineQueryError(f"Invalid cursor: {e}")
+
+
+def parse_statuses(status: Optional[str]) -> Optional[List[str]]:
+    """Comma-separated status filter (case-insensitive)"""
+    if not status:
+        return None
+    by_name = {name.lower(): name for name in PIPELINE_STATUSES}
+    statuses = []
+    for name in status.split(","):
+        name = name.strip().lower()
+        if name not in by_name:
+            raise PipelineQueryError(f"Unknown status '{name}', expected one of {', '.join(PIPELINE_STATUSES)}")
+        statuses.append(by_name[name])
+    return statuses
+
+
+async def ensure_pipeline_indexes(db):
+    for collection, _ in TOKEN_COLLECTIONS:
+        await db[collection].create_index([("created_at", -1), ("token", -1)])
+        await db[collection].create_index([("job_id", 1), ("created_at", -1), ("token", -1)])
+
+
+def _branch_stages(interview_type: str, match: Dict[str, Any], batch_size: int) -> List[Dict[str, Any]]:
+    """One token collection: indexed match/sort/limit, then a slim projection"""
+    projection = {
+        "_id": 0,
+        "token": 1,
+        "created_at": 1,
+        "job_title": {"$arrayElemAt": [{"$split": [{"$ifNull": ["$job_description", ""]}, "\n"]}, 0]},
+        "interview_type": {"$literal": interview_type},
+    }
+    if interview_type == "Enhanced":
+        projection["features"] = {
+            "coding_challenge": {"$ifNull": ["$include_coding_challenge", False]},
+            "role_archetype": {"$ifNull": ["$role_archetype", "General"]},
+            "interview_focus": {"$ifNull": ["$interview_focus", "Balanced"]},
+        }
+    return [
+        {"$match": match},
+        {"$sort": {"created_at": -1, "token": -1}},
+        {"$limit": batch_size},
+        {"$project": projection},
+    ]
+
+
+def build_pipeline_aggregation(after: Optional[Tuple[datetime, str]], batch_size: int,
+                               job_id: Optional[str] = None, job_title: Optional[str] = None,
+                               interview_types: Optional[List[str]] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """(base collection, aggregation) for the next batch_size pipeline entries after the cursor position"""
+    match: Dict[str, Any] = {}
+    if job_id:
+        match["job_id"] = job_id
+    if job_title:
+        match["job_description"] = {"$regex": f"^{re.escape(job_title)}", "$options": "i"}
+    if after is not None:
+        created_at, token = after
+        match["$or"] = [{"created_at": {"$lt": created_at}},
+                        {"created_at": created_at, "token": {"$lt": token}}]
+
+    branches = [(collection, kind) for collection, kind in TOKEN_COLLECTIONS
+                if not interview_types or kind in interview_types]
+    if not branches:
+        raise PipelineQueryError("No interview type selected")
+
+    base_collection, base_type = branches[0]
+    stages = _branch_stages(base_type, match, batch_size)
+    for collection, kind in branches[1:]:
+        stages.append({"$unionWith": {"coll": collection, "pipeline": _branch_stages(kind, match, batch_size)}})
+    if len(branches) > 1:
+        stages += [{"$sort": {"created_at": -1, "token": -1}}, {"$limit": batch_size}]
+
+    stages += [
+        {"$lookup": {"from": "sessions", "localField": "token", "foreignField": "token", "as": "session",
+                     "pipeline": [{"$project": {"_id": 0, "candidate_name": 1, "status": 1, "session_id": 1}},
+                                  {"$limit": 1}]}},
+        {"$lookup": {"from": "assessments", "localField": "token", "foreignField": "token", "as": "assessment",
+                     "pipeline": [{"$project": {"_id": 0, "overall_score": 1}}, {"$limit": 1}]}},
+        {"$set": {"session": {"$arrayElemAt": ["$session", 0]},
+                  "assessment": {"$arrayElemAt": ["$assessment", 0]}}},
+        {"$set": {
+            "status": {"$switch": {
+                "branches": [
+                    {"case": {"$gt": ["$assessment", None]}, "then": "Report Ready"},
+                    {"case": {"$eq": ["$session.status", "completed"]}, "then": "Completed"},
+                    {"case": {"$gt": ["$session", None]}, "then": "In Progress"},
+                ],
+                "default": "Invited"
+            }},
+            "candidate_name": {"$ifNull": ["$session.candidate_name", "Not Started"]},
+            "overall_score": {"$ifNull": ["$assessment.overall_score", None]},
+            "session_id": {"$ifNull": ["$session.session_id", None]},
+        }},
+        {"$unset": ["session", "assessment"]},
+    ]
+    return base_collection, stages
+
+
+async def fetch_pipeline_page(db, status: Optional[str] = None, job_id: Optional[str] = None,
+                              job_title: Optional[str] = None, interview_type: Optional[str] = None,
+                              cursor: Optional[str] = None, limit: int = PIPELINE_PAGE_SIZE) -> Dict[str, Any]:
+    """One page of the candidate pipeline, newest invitations first"""
+    limit = max(1, min(limit, PIPELINE_MAX_PAGE_SIZE))
+    statuses = parse_statuses(status)
+    interview_types = None
+    if interview_type:
+        interview_types = [kind for _, kind in TOKEN_COLLECTIONS if kind.lower() == interview_type.strip().lower()]
+        if not interview_types:
+            raise PipelineQueryError(f"Unknown interview type '{interview_type}'")
+    after = decode_cursor(cursor) if cursor else None
+
+    if not statuses:
+        collection, stages = build_pipeline_aggregation(after, limit + 1, job_id, job_title, interview_types)
+        entries = await db[collection].aggregate(stages).to_list(limit + 1)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        return {
+            "pipeline": entries,
+            "next_cursor": encode_cursor(entries[-1]) if has_more else None,
+            "has_more": has_more,
+            "scanned": len(entries)
+        }
+
+    # Status is only known after the joins: scan in batches until the page fills
+    entries, scanned, exhausted, last = [], 0, False, None
+    batch_size = max(PIPELINE_SCAN_BATCH, 4 * limit)
+    while len(entries) < limit and scanned < PIPELINE_MAX_SCAN:
+        collection, stages = build_pipeline_aggregation(after, batch_size, job_id, job_title, interview_types)
+        batch = await db[collection].aggregate(stages).to_list(batch_size)
+        consumed = 0
+        for entry in batch:
+            consumed += 1
+            last = entry
+            if entry["status"] in statuses:
+                entries.append(entry)
+                if len(entries) == limit:
+                    break
+        scanned += consumed
+        if len(batch) < batch_size and consumed == len(batch):
+            exhausted = True
+            break
+        if last is not None:
+            after = (last["created_at"], last["token"])
+
+    return {
+        "pipeline": entries,
+        "next_cursor": encode_cursor(last) if last is not None and not exhausted else None,
+        "has_more": not exhausted,
+        "scanned": scanned
+    }
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Batched Candidate Reads
+
+Admin comparison, report listings and candidate detail views used to read
+assessments and sessions one find_one at a time, and fetched whole session
+documents (including the full message transcript) to read a candidate name.
+
+Key Features:
+- load_candidates(): N tokens resolved with two concurrent $in queries
+  (assessments, sessions) on indexed token fields, so round trips stay
+  constant as the comparison set grows
+- Narrow projections per use: session summaries without the transcript,
+  transcripts without per-message metadata, comparison fields only, and
+  report listings without the long-form feedback text
+- list_reports(): report listings newest first on a (created_via, created_at)
+  index; full reports stay available per session
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+REPORT_LIST_LIMIT = int(os.environ.get("REPORT_LIST_LIMIT", "1000"))
+
+SESSION_SUMMARY_PROJECTION = {
+    "_id": 0, "token": 1, "session_id": 1, "candidate_name": 1, "job_title": 1,
+    "status": 1, "started_at": 1, "completed_at": 1
+}
+# Question/answer text only; the per-message analysis payloads are left behind
+SESSION_TRANSCRIPT_PROJECTION = {
+    "_id": 0, "token": 1, "session_id": 1, "candidate_name": 1, "messages.type": 1, "messages.content": 1
+}
+COMPARISON_PROJECTION = {
+    "_id": 0, "token": 1, "job_title": 1, "technical_score": 1, "behavioral_score": 1, "overall_score": 1,
+    "key_strengths": 1, "areas_for_improvement": 1, "red_flags": 1
+}
+SCORE_PROJECTION = {"_id": 0, "token": 1, "session_id": 1, "technical_score": 1, "behavioral_score": 1, "overall_score": 1}
+# Listings show scores and summary analytics; the long-form text is served by the per-session report endpoints
+REPORT_LISTING_PROJECTION = {
+    "_id": 0, "technical_feedback": 0, "behavioral_feedback": 0, "recommendations": 0,
+    "supporting_quotes": 0, "module_performance": 0
+}
+
+ADMIN_REPORTS_QUERY = {"$or": [{"created_via": "admin"}, {"created_via": {"$exists": False}}]}
+PLACEMENT_REPORTS_QUERY = {"created_via": "placement_preparation"}
+
+
+async def ensure_candidate_read_indexes(db):
+    for collection in (db.sessions, db.assessments):
+        await collection.create_index([("token", 1)])
+        await collection.create_index([("session_id", 1)])
+    await db.assessments.create_index([("created_via", 1), ("created_at", -1)])
+
+
+async def find_by_tokens(collection, tokens: Iterable[str], projection: Dict[str, Any]) -> Dict[str, dict]:
+    """token -> first matching document, in one $in query (the projection must include token)"""
+    tokens = list(dict.fromkeys(token for token in tokens if token))
+    if not tokens:
+        return {}
+    found: Dict[str, dict] = {}
+    async for doc in collection.find({"token": {"$in": tokens}}, projection):
+        found.setdefault(doc.get("token"), doc)
+    return found
+
+
+async def load_candidates(db, tokens: Iterable[str],
+                          assessment_projection: Dict[str, Any] = SCORE_PROJECTION,
+                          session_projection: Dict[str, Any] = SESSION_SUMMARY_PROJECTION
+                          ) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """(assessments by token, sessions by token) for a set of candidate tokens"""
+    tokens = list(tokens)
+    return await asyncio.gather(
+        find_by_tokens(db.assessments, tokens, assessment_projection),
+        find_by_tokens(db.sessions, tokens, session_projection)
+    )
+
+
+async def load_session_with_assessment(db, session_id: str,
+                                       session_projection: Dict[str, Any] = SESSION_SUMMARY_PROJECTION,
+                                       assessment_projection: Optional[Dict[str, Any]] = None
+                                       ) -> Tuple[Optional[dict], Optional[dict]]:
+    """(session, assessment) for one candidate session, read concurrently"""
+    return await asyncio.gather(
+        db.sessions.find_one({"session_id": session_id}, session_projection),
+        db.assessments.find_one({"session_id": session_id}, assessment_projection)
+    )
+
+
+async def list_reports(db, query: Dict[str, Any], limit: int = REPORT_LIST_LIMIT) -> List[dict]:
+    return await db.assessments.find(query, REPORT_LISTING_PROJECTION).sort("created_at", -1).to_list(limit)
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Cohort-Wide Collaborative Cheating Detection
+
+Comparing every session with every other session (and every answer with every
+answer inside each pair) does not scale to a full exam day. This module
+detects collaboration across a whole cohort in four vectorized steps:
+
+1. encode_sessions(): sparse session x (question, answer) matrix plus sparse
+   session x question matrices for answered questions, residual response times
+   and answer timestamps
+2. MinHash LSH over each session's (question, answer) tokens (shared with
+   device_similarity) to generate candidate pairs; sessions that share no band
+   are never compared
+3. score_pairs(): answer agreement, shared wrong answers, residual response
+   time correlation and answer simultaneity for all candidate pairs at once,
+   computed with sparse row products
+4. Union-find over the flagged pairs to report clusters of colluding sessions
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from device_similarity import MinHasher, band_keys
+
+PAIR_SCORING_CHUNK = 100_000
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n: int):
+        self.parent = np.arange(n, dtype=np.int64)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return int(x)
+
+    def union(self, a: int, b: int) -> int:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self, members: Sequence[int]) -> Dict[int, List[int]]:
+        groups: Dict[int, List[int]] = {}
+        for member in members:
+            groups.setdefault(self.find(member), []).append(member)
+        return groups
+
+
+def _answer_key(answer: Any) -> str:
+    if isinstance(answer, str):
+        return answer
+    if isinstance(answer, (dict, list, tuple, set)):
+        return json.dumps(sorted(answer) if isinstance(answer, set) else answer, sort_keys=True, default=str)
+    return str(answer)
+
+
+def _epoch_seconds(timestamp: Any) -> Optional[float]:
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return None
+
+
+class CohortEncoding:
+    """Sparse per-session matrices for a cohort of sessions (rows follow session_ids)"""
+
+    def __init__(self, session_ids: List[str], answers: sparse.csr_matrix, wrong_answers: sparse.csr_matrix,
+                 answered: sparse.csr_matrix, timed: sparse.csr_matrix, residual_times: sparse.csr_matrix,
+                 stamped: sparse.csr_matrix, stamps: sparse.csr_matrix, accuracy: np.ndarray,
+                 mean_response_time: np.ndarray, token_values: np.ndarray):
+        self.session_ids = session_ids
+        self.answers = answers
+        self.wrong_answers = wrong_answers
+        self.answered = answered
+        self.timed = timed
+        self.residual_times = residual_times
+        self.stamped = stamped
+        self.stamps = stamps
+        self.accuracy = accuracy
+        self.mean_response_time = mean_response_time
+        self.token_values = token_values
+
+    def __len__(self) -> int:
+        return len(self.session_ids)
+
+    @property
+    def answer_counts(self) -> np.ndarray:
+        return np.diff(self.answered.indptr)
+
+    @property
+    def wrong_counts(self) -> np.ndarray:
+        return np.diff(self.wrong_answers.indptr)
+
+
+def encode_sessions(sessions: Sequence[Dict[str, Any]], seed: int = 1) -> CohortEncoding:
+    """
+    Build the sparse cohort matrices. A question answered twice in one session
+    counts once (last answer wins). Response times are stored as residuals from
+    the cohort mean for that question, so questions that are simply slow for
+    everybody do not make sessions look correlated.
+    """
+    questions: Dict[Any, int] = {}
+    tokens: Dict[Tuple[int, str], int] = {}
+    session_ids: List[str] = []
+    answer_rows, answer_cols, wrong_flags = [], [], []
+    q_rows, q_cols, q_times, q_stamps = [], [], [], []
+    accuracy, mean_time = [], []
+
+    for row, session in enumerate(sessions):
+        session_ids.append(str(session.get('session_id', f'session-{row}')))
+        latest: Dict[int, Dict[str, Any]] = {}
+        for response in session.get('responses') or []:
+            question_id = response.get('question_id')
+            if question_id is None:
+                continue
+            latest[questions.setdefault(question_id, len(questions))] = response
+
+        correct, times = 0, []
+        for column, response in latest.items():
+            token = tokens.setdefault((column, _answer_key(response.get('response', ''))), len(tokens))
+            is_correct = bool(response.get('is_correct', False))
+            correct += is_correct
+            answer_rows.append(row)
+            answer_cols.append(token)
+            wrong_flags.append(not is_correct)
+
+            response_time = response.get('response_time') or 0
+            stamp = _epoch_seconds(response.get('timestamp'))
+            q_rows.append(row)
+            q_cols.append(column)
+            q_times.append(float(response_time) if response_time > 0 else np.nan)
+            q_stamps.append(np.nan if stamp is None else stamp)
+            if response_time > 0:
+                times.append(float(response_time))
+
+        accuracy.append(correct / len(latest) if latest else 0.0)
+        mean_time.append(float(np.mean(times)) if times else 0.0)
+
+    n, n_questions, n_tokens = len(session_ids), len(questions), len(tokens)
+    answer_rows = np.asarray(answer_rows, dtype=np.int64)
+    answer_cols = np.asarray(answer_cols, dtype=np.int64)
+    wrong_flags = np.asarray(wrong_flags, dtype=bool)
+    answers = sparse.csr_matrix((np.ones(len(answer_rows), dtype=np.float32), (answer_rows, answer_cols)),
+                                shape=(n, n_tokens))
+    wrong_answers = sparse.csr_matrix(
+        (np.ones(int(wrong_flags.sum()), dtype=np.float32), (answer_rows[wrong_flags], answer_cols[wrong_flags])),
+        shape=(n, n_tokens)
+    )
+
+    q_rows = np.asarray(q_rows, dtype=np.int64)
+    q_cols = np.asarray(q_cols, dtype=np.int64)
+    q_times = np.asarray(q_times, dtype=np.float64)
+    q_stamps = np.asarray(q_stamps, dtype=np.float64)
+
+    def _matrix(values, mask):
+        return sparse.csr_matrix((values[mask], (q_rows[mask], q_cols[mask])), shape=(n, n_questions))
+
+    has_time = ~np.isnan(q_times)
+    has_stamp = ~np.isnan(q_stamps)
+    answered = _matrix(np.ones(len(q_rows)), np.ones(len(q_rows), dtype=bool))
+    timed = _matrix(np.ones(len(q_rows)), has_time)
+
+    # Residual = response time minus the cohort mean for the question
+    question_means = np.zeros(n_questions)
+    if has_time.any():
+        sums = np.bincount(q_cols[has_time], weights=q_times[has_time], minlength=n_questions)
+        counts = np.bincount(q_cols[has_time], minlength=n_questions)
+        question_means = np.divide(sums, counts, out=np.zeros(n_questions), where=counts > 0)
+    residuals = np.where(has_time, q_times - question_means[q_cols], 0.0)
+    residual_times = _matrix(residuals, has_time)
+
+    # Timestamps relative to the earliest one keep float precision for sub-second differences
+    base = q_stamps[has_stamp].min() if has_stamp.any() else 0.0
+    stamped = _matrix(np.ones(len(q_rows)), has_stamp)
+    stamps = _matrix(q_stamps - base, has_stamp)
+
+    token_values = np.random.default_rng(seed).integers(0, 2 ** 63, size=max(n_tokens, 1), dtype=np.uint64)
+    return CohortEncoding(session_ids, answers, wrong_answers, answered, timed, residual_times, stamped, stamps,
+                          np.asarray(accuracy), np.asarray(mean_time), token_values)
+
+
+def _row_sums(matrix) -> np.ndarray:
+    return np.asarray(matrix.sum(axis=1)).ravel()
+
+
+def answer_agreement(encoding: CohortEncoding, left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(common_questions, matching_answers) per pair"""
+    common = _row_sums(encoding.answered[left].multiply(encoding.answered[right]))
+    matching = _row_sums(encoding.answers[left].multiply(encoding.answers[right]))
+    return common, matching
+
+
+def score_pairs(encoding: CohortEncoding, left: np.ndarray, right: np.ndarray,
+                simultaneity_window_seconds: float = 300.0, min_wrong_answers: int = 5) -> Dict[str, np.ndarray]:
+    """
+    Pair metrics for sessions left[k] and right[k] (arrays of row numbers):
+    - common_questions / matching_answers / answer_similarity
+    - shared_wrong_answers / wrong_answer_overlap (shared wrong answers over the
+      smaller wrong-answer count of the two sessions, but at least
+      min_wrong_answers so one coincidental shared mistake does not count as
+      full overlap)
+    - performance_similarity and timing_similarity (mean response time), as in
+      the per-session analysis
+    - time_correlation: Pearson correlation of residual response times over
+      common timed questions
+    - simultaneity: share of common questions answered within the window
+    """
+    common_count, matching = answer_agreement(encoding, left, right)
+    shared_wrong = _row_sums(encoding.wrong_answers[left].multiply(encoding.wrong_answers[right]))
+
+    wrong_counts = encoding.wrong_counts
+    min_wrong = np.maximum(np.minimum(wrong_counts[left], wrong_counts[right]), min_wrong_answers)
+
+    accuracy = encoding.accuracy
+    mean_time = encoding.mean_response_time
+    slower = np.maximum(mean_time[left], mean_time[right])
+    timing_similarity = np.where(slower > 0, 1 - np.abs(mean_time[left] - mean_time[right]) / np.where(slower > 0, slower, 1), 0.0)
+
+    # Pearson correlation of residual times over commonly timed questions
+    both_timed = encoding.timed[left].multiply(encoding.timed[right])
+    timed_count = _row_sums(both_timed)
+    x = encoding.residual_times[left].multiply(both_timed)
+    y = encoding.residual_times[right].multiply(both_timed)
+    sx, sy = _row_sums(x), _row_sums(y)
+    sxx, syy, sxy = _row_sums(x.multiply(x)), _row_sums(y.multiply(y)), _row_sums(x.multiply(y))
+    cov = timed_count * sxy - sx * sy
+    var = (timed_count * sxx - sx ** 2) * (timed_count * syy - sy ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        time_correlation = np.where((timed_count >= 3) & (var > 0), cov / np.sqrt(np.where(var > 0, var, 1)), 0.0)
+
+    # Answers to the same question within the window
+    both_stamped = encoding.stamped[left].multiply(encoding.stamped[right])
+    stamped_count = _row_sums(both_stamped)
+    gaps = (encoding.stamps[left] - encoding.stamps[right]).multiply(both_stamped).tocsr()
+    far = np.bincount(np.repeat(np.arange(len(left)), np.diff(gaps.indptr)),
+                      weights=(np.abs(gaps.data) >= simultaneity_window_seconds).astype(np.float64),
+                      minlength=len(left))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        answer_similarity = np.where(common_count > 0, matching / np.where(common_count > 0, common_count, 1), 0.0)
+        wrong_overlap = shared_wrong / np.maximum(min_wrong, 1)
+        simultaneity = np.where(stamped_count > 0, (stamped_count - far) / np.where(stamped_count > 0, stamped_count, 1), 0.0)
+
+    return {
+        'common_questions': common_count.astype(np.int64),
+        'matching_answers': matching.astype(np.int64),
+        'answer_similarity': answer_similarity,
+        'shared_wrong_answers': shared_wrong.astype(np.int64),
+        'wrong_answer_overlap': np.minimum(wrong_overlap, 1.0),
+        'performance_similarity': 1 - np.abs(accuracy[left] - accuracy[right]),
+        'timing_similarity': np.clip(timing_similarity, 0.0, 1.0),
+        'time_correlation': np.clip(time_correlation, -1.0, 1.0),
+        'simultaneity': np.clip(simultaneity, 0.0, 1.0),
+        'timed_questions': timed_count.astype(np.int64),
+        'stamped_questions': stamped_count.astype(np.int64),
+    }
+
+
+class CohortCollaborationDetector:
+    """
+    MinHash LSH candidate generation plus vectorized pair scoring. With 32
+    permutations in 8 bands of 4 rows, two sessions whose answer sets have
+    Jaccard similarity s are compared with probability 1 - (1 - s^4)^8
+    (~0.98 at s=0.8, ~0.42 at s=0.5).
+
+    Candidate pairs whose signatures agree on fewer than min_estimated_jaccard
+    of their rows, or that fail the answer agreement thresholds, are dropped
+    before the timing metrics are computed.
+
+    A pair is flagged when it shares at least min_common_questions, agrees on at
+    least answer_threshold of them and its collusion score reaches
+    score_threshold. The score weights shared wrong answers and correlated
+    per-question response times as heavily as overall agreement, so candidates
+    who simply all answered correctly are not flagged on agreement alone.
+    """
+
+    SCORE_WEIGHTS = {
+        'answer_similarity': 0.3,
+        'wrong_answer_overlap': 0.3,
+        'time_correlation': 0.3,
+        'simultaneity': 0.1,
+    }
+
+    def __init__(self, num_perm: int = 32, bands: int = 8, max_bucket_size: int = 50,
+                 min_common_questions: int = 5, answer_threshold: float = 0.8, score_threshold: float = 0.7,
+                 min_estimated_jaccard: float = 0.5, simultaneity_window_seconds: float = 300.0, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.bands = bands
+        self.max_bucket_size = max_bucket_size
+        self.min_common_questions = min_common_questions
+        self.answer_threshold = answer_threshold
+        self.score_threshold = score_threshold
+        self.min_estimated_jaccard = min_estimated_jaccard
+        self.simultaneity_window_seconds = simultaneity_window_seconds
+        self.seed = seed
+        self.hasher = MinHasher(num_perm, seed)
+
+    def signatures(self, encoding: CohortEncoding, chunk: int = 2000) -> np.ndarray:
+        """MinHash signatures per session; rows are padded by repeating their first token"""
+        answers = encoding.answers
+        counts = np.diff(answers.indptr)
+        signatures = np.full((len(encoding), self.hasher.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, len(encoding), chunk):
+            stop = min(start + chunk, len(encoding))
+            rows = np.arange(start, stop)[counts[start:stop] > 0]
+            if not len(rows):
+                continue
+            width = int(counts[rows].max())
+            offsets = np.minimum(np.arange(width)[None, :], counts[rows][:, None] - 1)
+            token_ids = answers.indices[answers.indptr[rows][:, None] + offsets]
+            signatures[rows] = self.hasher.signatures(encoding.token_values[token_ids])
+        return signatures
+
+    def candidate_pairs(self, signatures: np.ndarray, eligible: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        (left, right, oversized_buckets) for sessions sharing at least one LSH band.
+        Buckets larger than max_bucket_size are chained (each member paired with
+        the next) instead of expanded to all pairs, which keeps them connected
+        for clustering without a quadratic blow-up.
+        """
+        rows = np.flatnonzero(eligible)
+        if len(rows) < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0
+
+        keys = band_keys(signatures[rows], self.bands)
+        left_parts, right_parts, oversized = [], [], 0
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind='stable')
+            sorted_keys = keys[order, band]
+            boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+            starts = np.concatenate(([0], boundaries))
+            stops = np.concatenate((boundaries, [len(sorted_keys)]))
+            for start, stop in zip(starts[stops - starts > 1], stops[stops - starts > 1]):
+                members = rows[order[start:stop]]
+                if len(members) > self.max_bucket_size:
+                    oversized += 1
+                    left_parts.append(members[:-1])
+                    right_parts.append(members[1:])
+                else:
+                    i, j = np.triu_indices(len(members), k=1)
+                    left_parts.append(members[i])
+                    right_parts.append(members[j])
+
+        if not left_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), oversized
+        left = np.concatenate(left_parts)
+        right = np.concatenate(right_parts)
+        low, high = np.minimum(left, right), np.maximum(left, right)
+        unique = np.unique(low * len(signatures) + high)
+        return unique // len(signatures), unique % len(signatures), oversized
+
+    def collusion_scores(self, metrics: Dict[str, np.ndarray]) -> np.ndarray:
+        score = np.zeros(len(metrics['answer_similarity']))
+        for name, weight in self.SCORE_WEIGHTS.items():
+            score += weight * np.clip(metrics[name], 0.0, 1.0)
+        return score
+
+    def flag(self, metrics: Dict[str, np.ndarray], scores: np.ndarray) -> np.ndarray:
+        return ((metrics['common_questions'] >= self.min_common_questions)
+                & (metrics['answer_similarity'] >= self.answer_threshold)
+                & (scores >= self.score_threshold))
+
+    def detect(self, sessions: Sequence[Dict[str, Any]], max_reported_pairs: int = 500) -> Dict[str, Any]:
+        """Clusters of sessions linked by flagged pairs, largest and strongest first"""
+        timings = {}
+        started = time.perf_counter()
+        encoding = encode_sessions(sessions, self.seed)
+        timings['encode_ms'] = (time.perf_counter() - started) * 1000
+
+        step = time.perf_counter()
+        eligible = encoding.answer_counts >= self.min_common_questions
+        signatures = self.signatures(encoding)
+        left, right, oversized = self.candidate_pairs(signatures, eligible)
+        timings['candidate_ms'] = (time.perf_counter() - step) * 1000
+
+        step = time.perf_counter()
+        flagged_parts, scored = [], 0
+        for start in range(0, len(left), PAIR_SCORING_CHUNK):
+            l, r = left[start:start + PAIR_SCORING_CHUNK], right[start:start + PAIR_SCORING_CHUNK]
+            close = (signatures[l] == signatures[r]).mean(axis=1) >= self.min_estimated_jaccard
+            l, r = l[close], r[close]
+            common, matching = answer_agreement(encoding, l, r)
+            agree = (common >= self.min_common_questions) & (matching >= self.answer_threshold * common)
+            l, r = l[agree], r[agree]
+            scored += len(l)
+            if not len(l):
+                continue
+            metrics = score_pairs(encoding, l, r, self.simultaneity_window_seconds)
+            scores = self.collusion_scores(metrics)
+            keep = self.flag(metrics, scores)
+            if keep.any():
+                flagged_parts.append((l[keep], r[keep], scores[keep], {k: v[keep] for k, v in metrics.items()}))
+        timings['scoring_ms'] = (time.perf_counter() - step) * 1000
+
+        step = time.perf_counter()
+        flagged_pairs = []
+        union_find = UnionFind(len(encoding))
+        for l, r, scores, metrics in flagged_parts:
+            for k in range(len(l)):
+                union_find.union(int(l[k]), int(r[k]))
+                flagged_pairs.append(self._pair_record(encoding, int(l[k]), int(r[k]), float(scores[k]),
+                                                       {name: values[k] for name, values in metrics.items()}))
+        clusters = self._build_clusters(encoding, union_find, flagged_pairs)
+        timings['clustering_ms'] = (time.perf_counter() - step) * 1000
+        timings['total_ms'] = (time.perf_counter() - started) * 1000
+
+        flagged_pairs.sort(key=lambda pair: pair['collusion_score'], reverse=True)
+        n = len(encoding)
+        return {
+            'sessions_analyzed': n,
+            'sessions_eligible': int(eligible.sum()),
+            'candidate_pairs': int(len(left)),
+            'pairs_scored': scored,
+            'all_pairs': n * (n - 1) // 2,
+            'oversized_buckets': oversized,
+            'flagged_pair_count': len(flagged_pairs),
+            'flagged_pairs': [{k: v for k, v in pair.items() if not k.startswith('_')}
+                              for pair in flagged_pairs[:max_reported_pairs]],
+            'clusters': clusters,
+            'collaboration_detected': bool(clusters),
+            'parameters': {
+                'num_perm': self.hasher.num_perm,
+                'bands': self.bands,
+                'min_common_questions': self.min_common_questions,
+                'answer_threshold': self.answer_threshold,
+                'score_threshold': self.score_threshold,
+                'min_estimated_jaccard': self.min_estimated_jaccard,
+                'simultaneity_window_seconds': self.simultaneity_window_seconds,
+            },
+            'timings_ms': {k: round(v, 2) for k, v in timings.items()},
+        }
+
+    @staticmethod
+    def _pair_record(encoding: CohortEncoding, left: int, right: int, score: float, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        record = {
+            'session1': encoding.session_ids[left],
+            'session2': encoding.session_ids[right],
+            'collusion_score': round(score, 4),
+            '_rows': (left, right),
+        }
+        for name, value in metrics.items():
+            record[name] = int(value) if np.issubdtype(type(value), np.integer) else round(float(value), 4)
+        return record
+
+    def _build_clusters(self, encoding: CohortEncoding, union_find: UnionFind,
+                        flagged_pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        pairs_by_root: Dict[int, List[Dict[str, Any]]] = {}
+        for pair in flagged_pairs:
+            pairs_by_root.setdefault(union_find.find(pair['_rows'][0]), []).append(pair)
+
+        members = sorted({row for pair in flagged_pairs for row in pair['_rows']})
+        clusters = []
+        for root, rows in union_find.groups(members).items():
+            pairs = pairs_by_root.get(root, [])
+            scores = [pair['collusion_score'] for pair in pairs]
+            size = len(rows)
+            mean_score = float(np.mean(scores))
+            clusters.append({
+                'cluster_id': f"cluster-{len(clusters) + 1}",
+                'session_ids': [encoding.session_ids[row] for row in rows],
+                'size': size,
+                'flagged_pairs': len(pairs),
+                # Share of member pairs that were flagged directly (1.0 = every member linked to every other)
+                'density': round(len(pairs) / (size * (size - 1) / 2), 4),
+                'mean_collusion_score': round(mean_score, 4),
+                'max_collusion_score': round(float(max(scores)), 4),
+                'mean_answer_similarity': round(float(np.mean([p['answer_similarity'] for p in pairs])), 4),
+                'shared_wrong_answers': int(sum(p['shared_wrong_answers'] for p in pairs)),
+                'max_simultaneity': round(float(max(p['simultaneity'] for p in pairs)), 4),
+                'risk_level': 'HIGH' if mean_score >= 0.8 else 'MEDIUM' if mean_score >= 0.7 else 'LOW',
+            })
+
+        clusters.sort(key=lambda cluster: (cluster['size'], cluster['mean_collusion_score']), reverse=True)
+        for position, cluster in enumerate(clusters, start=1):
+            cluster['cluster_id'] = f"cluster-{position}"
+        return clusters
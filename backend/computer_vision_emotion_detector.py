@@ -16,6 +16,9 @@ import base64
 import io
 from datetime import datetime, timedelta
 import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import torch
 
@@ -37,6 +40,93 @@ except ImportError:
     logging.warning("⚠️  imutils library not available")
 
 
+# Shared worker pool for CPU-bound frame batches so decoding/inference never blocks the event loop
+FRAME_BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(2, os.cpu_count() or 2),
+    thread_name_prefix="frame-batch"
+)
+
+
+class AdaptiveFrameSampler:
+    """
+    Decides which frames of a stream are worth analyzing.
+    A frame is analyzed when it differs enough from the last analyzed frame
+    (mean absolute difference of a downscaled grayscale probe), or when too many
+    consecutive frames have been skipped.
+    """
+    
+    def __init__(self, motion_threshold: float = 0.02, max_skip: int = 10, probe_size: Tuple[int, int] = (32, 24)):
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.probe_size = probe_size
+        self.last_probe = None
+        self.skipped_since_last = 0
+    
+    def motion_score(self, gray: np.ndarray) -> float:
+        """Normalized (0-1) motion between this frame and the last analyzed frame"""
+        probe = cv2.resize(gray, self.probe_size, interpolation=cv2.INTER_AREA).astype(np.float32)
+        if self.last_probe is None:
+            return 1.0
+        return float(np.mean(np.abs(probe - self.last_probe)) / 255.0)
+    
+    def should_analyze(self, gray: np.ndarray) -> Tuple[bool, float]:
+        """Return (analyze, motion) and update the sampler state"""
+        motion = self.motion_score(gray)
+        if motion >= self.motion_threshold or self.skipped_since_last >= self.max_skip:
+            self.last_probe = cv2.resize(gray, self.probe_size, interpolation=cv2.INTER_AREA).astype(np.float32)
+            self.skipped_since_last = 0
+            return True, motion
+        self.skipped_since_last += 1
+        return False, motion
+
+
+class FaceTracker:
+    """
+    Reuses the last detected face boxes between frames and only re-runs the
+    Haar cascade every `redetect_interval` analyzed frames, when no face is
+    being tracked, or when the scene changed abruptly.
+    """
+    
+    def __init__(self, redetect_interval: int = 10, reacquire_motion: float = 0.12):
+        self.redetect_interval = redetect_interval
+        self.reacquire_motion = reacquire_motion
+        self.last_faces: List[Tuple[int, int, int, int]] = []
+        self.frames_since_detection = 0
+    
+    def locate(self, gray: np.ndarray, motion: float, detect_fn) -> Tuple[List[Tuple[int, int, int, int]], bool]:
+        """Return (faces, redetected) for the given grayscale frame"""
+        needs_detection = (
+            not self.last_faces
+            or self.frames_since_detection >= self.redetect_interval
+            or motion >= self.reacquire_motion
+        )
+        if needs_detection:
+            self.last_faces = detect_fn(gray)
+            self.frames_since_detection = 0
+            return self.last_faces, True
+        
+        # Clamp tracked boxes to the current frame in case the resolution changed
+        height, width = gray.shape[:2]
+        self.last_faces = [
+            (x, y, min(w, width - x), min(h, height - y))
+            for (x, y, w, h) in self.last_faces
+            if x < width and y < height
+        ]
+        self.frames_since_detection += 1
+        return self.last_faces, False
+
+
+class SessionVideoState:
+    """Per-session sampling and tracking state for batched frame ingestion"""
+    
+    def __init__(self):
+        # Held for a whole batch: batches of one session run one at a time, in any worker thread
+        self.lock = threading.Lock()
+        self.sampler = AdaptiveFrameSampler()
+        self.tracker = FaceTracker()
+        self.last_analysis: Optional[Dict[str, Any]] = None
+
+
 class ComputerVisionEmotionDetector:
     """
     Computer vision-based emotion detection system for interview analysis
@@ -54,6 +144,12 @@ class ComputerVisionEmotionDetector:
         self.emotion_history = []
         self.engagement_tracker = []
         
+        # Batched ingestion state (bounded LRU of per-session samplers/trackers)
+        self.session_states: "OrderedDict[str, SessionVideoState]" = OrderedDict()
+        self.session_states_lock = threading.Lock()  # FRAME_BATCH_EXECUTOR threads share the LRU
+        self.max_tracked_sessions = 512
+        self.emotion_input_size = (48, 48)
+        
         # Initialize OpenCV face detection
         self._initialize_face_detection()
         
@@ -158,6 +254,251 @@ class ComputerVisionEmotionDetector:
             logging.error(f"Error analyzing frame emotions: {str(e)}")
             return self._get_fallback_frame_analysis(f"Analysis error: {str(e)}")
     
+    async def analyze_frame_batch(self, frames: List[Any], timestamps: List[datetime] = None,
+                                  session_id: str = None) -> Dict[str, Any]:
+        """
+        Analyze a batch of consecutive frames from one session.
+        Frames are sampled adaptively, faces are tracked between detections and
+        emotions for every analyzed face in the batch are inferred together.
+        The CPU-bound work runs in FRAME_BATCH_EXECUTOR.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            FRAME_BATCH_EXECUTOR, self._analyze_frame_batch_sync, frames, timestamps, session_id
+        )
+    
+    def _get_session_state(self, session_id: Optional[str]) -> SessionVideoState:
+        """Get (or create) the sampling/tracking state for a session"""
+        if session_id is None:
+            return SessionVideoState()
+        with self.session_states_lock:
+            state = self.session_states.get(session_id)
+            if state is None:
+                state = SessionVideoState()
+                self.session_states[session_id] = state
+                while len(self.session_states) > self.max_tracked_sessions:
+                    self.session_states.popitem(last=False)
+            else:
+                self.session_states.move_to_end(session_id)
+            return state
+    
+    def release_session(self, session_id: str):
+        """Drop the sampling/tracking state of a finished session"""
+        with self.session_states_lock:
+            self.session_states.pop(session_id, None)
+    
+    def _analyze_frame_batch_sync(self, frames: List[Any], timestamps: List[datetime] = None,
+                                  session_id: str = None) -> Dict[str, Any]:
+        """Synchronous body of analyze_frame_batch"""
+        state = self._get_session_state(session_id)
+        with state.lock:
+            return self._analyze_session_batch(state, frames, timestamps)
+    
+    def _analyze_session_batch(self, state: SessionVideoState, frames: List[Any],
+                               timestamps: List[datetime] = None) -> Dict[str, Any]:
+        """Sample, track and analyze one batch; the caller holds state.lock"""
+        batch_summary = {
+            "frames_received": len(frames),
+            "frames_analyzed": 0,
+            "frames_skipped": 0,
+            "frames_invalid": 0,
+            "face_detections_run": 0,
+            "analyses": []
+        }
+        
+        # Pass 1: decode, sample and locate faces; collect face crops for batched inference
+        pending = []
+        face_rois = []
+        for index, frame_data in enumerate(frames):
+            timestamp = timestamps[index] if timestamps and index < len(timestamps) and timestamps[index] else datetime.utcnow()
+            image = self._bytes_to_opencv_image(frame_data)
+            if image is None:
+                batch_summary["frames_invalid"] += 1
+                continue
+            
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            analyze, motion = state.sampler.should_analyze(gray)
+            if not analyze:
+                batch_summary["frames_skipped"] += 1
+                continue
+            
+            faces, redetected = state.tracker.locate(gray, motion, self._detect_faces_gray)
+            if redetected:
+                batch_summary["face_detections_run"] += 1
+            
+            face_slots = []
+            for (x, y, w, h) in faces:
+                if w <= 0 or h <= 0:
+                    continue
+                face_slots.append(((x, y, w, h), len(face_rois)))
+                face_rois.append(image[y:y+h, x:x+w])
+            pending.append((index, timestamp, image, face_slots, motion, redetected))
+        
+        # Pass 2: one vectorized inference over every face crop in the batch
+        emotions_batch, quality_batch = self._infer_face_batch(face_rois)
+        
+        # Pass 3: assemble per-frame analyses in the same shape as analyze_frame_emotions
+        for index, timestamp, image, face_slots, motion, redetected in pending:
+            if not face_slots:
+                analysis = self._get_fallback_frame_analysis("No faces detected")
+                analysis["timestamp"] = timestamp.isoformat()
+            else:
+                face_analyses = []
+                for face_index, (face_region, roi_index) in enumerate(face_slots):
+                    x, y, w, h = face_region
+                    emotions = emotions_batch[roi_index]
+                    face_quality = quality_batch[roi_index]
+                    face_analyses.append({
+                        "face_index": face_index,
+                        "face_area": int(w * h),
+                        "face_position": {"x": int(x), "y": int(y), "width": int(w), "height": int(h)},
+                        "emotions": emotions,
+                        "engagement_score": self._calculate_face_engagement(emotions, face_quality),
+                        "attention_score": self._calculate_attention_score(face_region, image.shape),
+                        "face_quality": face_quality
+                    })
+                
+                analysis = {
+                    "timestamp": timestamp.isoformat(),
+                    "faces_detected": len(face_analyses),
+                    "emotions": {},
+                    "engagement_metrics": {},
+                    "attention_indicators": {},
+                    "face_quality_metrics": {},
+                    "privacy_compliant": True
+                }
+                primary_face = max(face_analyses, key=lambda x: x.get('face_area', 0))
+                analysis.update(primary_face)
+                analysis["engagement_metrics"] = self._calculate_frame_engagement(face_analyses)
+                analysis["attention_indicators"] = self._calculate_attention_indicators(face_analyses)
+            
+            analysis["frame_index"] = index
+            analysis["motion_score"] = motion
+            analysis["face_redetected"] = redetected
+            batch_summary["analyses"].append(analysis)
+            state.last_analysis = analysis
+        
+        batch_summary["frames_analyzed"] = len(batch_summary["analyses"])
+        return batch_summary
+    
+    def _detect_faces_gray(self, gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Run the Haar cascade on an already grayscale frame"""
+        try:
+            if self.face_cascade is None:
+                return []
+            detected_faces = self.face_cascade.detectMultiScale(
+                gray,
+                scaleFactor=1.1,
+                minNeighbors=5,
+                minSize=(30, 30),
+                flags=cv2.CASCADE_SCALE_IMAGE
+            )
+            return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in detected_faces]
+        except Exception as e:
+            logging.error(f"Error detecting faces: {str(e)}")
+            return []
+    
+    def _infer_face_batch(self, face_rois: List[np.ndarray]) -> Tuple[List[Dict[str, float]], List[Dict[str, float]]]:
+        """
+        Infer emotions and face quality for a list of face crops at once.
+        Crops are normalized to emotion_input_size and stacked into one
+        (N, H, W) array so brightness/contrast/sharpness and the emotion
+        heuristic are computed with array operations instead of per face.
+        """
+        if not face_rois:
+            return [], []
+        
+        try:
+            gray_stack = np.stack([
+                cv2.resize(
+                    cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if len(roi.shape) == 3 else roi,
+                    self.emotion_input_size,
+                    interpolation=cv2.INTER_AREA
+                )
+                for roi in face_rois
+            ]).astype(np.float32)
+            face_areas = np.array([roi.shape[0] * roi.shape[1] for roi in face_rois], dtype=np.float32)
+            
+            brightness = gray_stack.mean(axis=(1, 2))
+            contrast = gray_stack.std(axis=(1, 2))
+            
+            # Laplacian variance on the stacked crops (4-neighbour kernel)
+            laplacian = (
+                4 * gray_stack[:, 1:-1, 1:-1]
+                - gray_stack[:, :-2, 1:-1] - gray_stack[:, 2:, 1:-1]
+                - gray_stack[:, 1:-1, :-2] - gray_stack[:, 1:-1, 2:]
+            )
+            sharpness = np.minimum(1.0, laplacian.reshape(len(face_rois), -1).var(axis=1) / 1000)
+            
+            size_adequacy = np.minimum(1.0, face_areas / 10000)
+            brightness_quality = np.where(
+                (brightness >= 80) & (brightness <= 180),
+                1.0,
+                np.maximum(0.0, 1.0 - np.abs(brightness - 130) / 130)
+            )
+            contrast_quality = np.minimum(1.0, contrast / 50)
+            overall_quality = (size_adequacy + brightness_quality + contrast_quality + sharpness) / 4
+            
+            quality_batch = [
+                {
+                    "size_adequacy": float(size_adequacy[i]),
+                    "brightness_quality": float(brightness_quality[i]),
+                    "contrast_quality": float(contrast_quality[i]),
+                    "sharpness": float(sharpness[i]),
+                    "overall_quality": float(overall_quality[i])
+                }
+                for i in range(len(face_rois))
+            ]
+            
+            if self.emotion_detector is not None:
+                emotions_batch = [self._detect_emotions_fer_tracked(roi) for roi in face_rois]
+            else:
+                emotions_batch = self._estimate_emotions_basic_batch(brightness, contrast)
+            
+            return emotions_batch, quality_batch
+            
+        except Exception as e:
+            logging.error(f"Error in batched face inference: {str(e)}")
+            fallback_quality = {
+                "size_adequacy": 0.5,
+                "brightness_quality": 0.5,
+                "contrast_quality": 0.5,
+                "sharpness": 0.5,
+                "overall_quality": 0.5
+            }
+            return [{"neutral": 1.0} for _ in face_rois], [dict(fallback_quality) for _ in face_rois]
+    
+    def _estimate_emotions_basic_batch(self, brightness: np.ndarray, contrast: np.ndarray) -> List[Dict[str, float]]:
+        """Vectorized form of _estimate_emotions_basic over a batch of crops"""
+        labels = ["neutral", "happy", "sad", "surprise", "angry"]
+        scores = np.tile(np.array([0.7, 0.1, 0.1, 0.05, 0.05], dtype=np.float64), (len(brightness), 1))
+        
+        bright = (brightness > 120) & (contrast > 30)
+        dark = ~bright & (brightness < 80)
+        scores[bright, 1] = np.minimum(0.6, scores[bright, 1] + 0.3)
+        scores[bright, 0] -= 0.3
+        scores[dark, 2] = np.minimum(0.5, scores[dark, 2] + 0.2)
+        scores[dark, 0] -= 0.2
+        
+        scores /= scores.sum(axis=1, keepdims=True)
+        return [dict(zip(labels, row.tolist())) for row in scores]
+    
+    def _detect_emotions_fer_tracked(self, face_roi: np.ndarray) -> Dict[str, float]:
+        """FER emotion scores for an already located face (skips FER's own face detector)"""
+        try:
+            face_rgb = cv2.cvtColor(face_roi, cv2.COLOR_BGR2RGB)
+            height, width = face_rgb.shape[:2]
+            emotions = self.emotion_detector.detect_emotions(face_rgb, face_rectangles=[(0, 0, width, height)])
+            if emotions:
+                emotion_scores = emotions[0]['emotions']
+                total_score = sum(emotion_scores.values())
+                if total_score > 0:
+                    return {emotion: score / total_score for emotion, score in emotion_scores.items()}
+            return {"neutral": 1.0}
+        except Exception as e:
+            logging.error(f"Error in FER emotion detection: {str(e)}")
+            return {"neutral": 1.0}
+    
     def _bytes_to_opencv_image(self, frame_data: bytes) -> Optional[np.ndarray]:
         """Convert bytes data to OpenCV image format"""
         try:
@@ -858,6 +1199,7 @@ class ComputerVisionEmotionDetector:
             "face_detection_ready": self.face_cascade is not None,
             "emotion_detection_ready": self.emotion_detector is not None,
             "privacy_mode": self.privacy_mode,
+            "tracked_sessions": len(self.session_states),
             "system_ready": self.face_cascade is not None or self.emotion_detector is not None
         }
 
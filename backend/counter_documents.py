@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Counter Documents
+
+Shared storage for counters maintained with $inc and rebuilt by an
+aggregation (question bank stats, AI question analytics). Each counter set
+is one document in aptitude_question_stats:
+{"_id": stats_id, "counters": {...}, "reconciled_at", "updated_at"}.
+
+Key Features:
+- field_key(): turn any value into a MongoDB field name
+- record_counter_delta(): apply a $inc delta, only once the counters have
+  been reconciled, so a partial history is never mistaken for the full set
+- store_counters(): replace the counters (reconciliation or reset)
+- load_counters(): the maintained counters, rebuilt first when requested or
+  never built, with their provenance ("counters" or "aggregation")
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+
+COUNTERS_COLLECTION = "aptitude_question_stats"
+
+
+def field_key(value: Any, empty: str = "_", reserved: str = "") -> str:
+    """A value usable as a MongoDB field name ("." and "$", plus any reserved characters, become "_")"""
+    key = str(value).replace(".", "_").replace("$", "_")
+    for character in reserved:
+        key = key.replace(character, "_")
+    return key or empty
+
+
+async def record_counter_delta(db, stats_id: str, delta: Dict[str, float]):
+    """$inc the counters by a flat dotted-path delta (no-op until they have been reconciled once)"""
+    if delta:
+        await db[COUNTERS_COLLECTION].update_one(
+            {"_id": stats_id, "reconciled_at": {"$exists": True}},
+            {"$inc": {f"counters.{key}": value for key, value in delta.items()},
+             "$set": {"updated_at": datetime.utcnow()}}
+        )
+
+
+async def store_counters(db, stats_id: str, counters: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the counters and mark them reconciled"""
+    now = datetime.utcnow()
+    await db[COUNTERS_COLLECTION].replace_one(
+        {"_id": stats_id},
+        {"counters": counters, "reconciled_at": now, "updated_at": now},
+        upsert=True
+    )
+    return {"counters": counters, "reconciled_at": now}
+
+
+async def load_counters(db, stats_id: str, compute: Callable[[Any], Awaitable[Dict[str, Any]]],
+                        refresh: bool = False) -> Dict[str, Any]:
+    """{"counters", "reconciled_at", "computed_from"}; compute(db) rebuilds them when refresh=True or never built"""
+    stats = None if refresh else await db[COUNTERS_COLLECTION].find_one({"_id": stats_id})
+    if stats is None or "reconciled_at" not in stats:
+        stats = await store_counters(db, stats_id, await compute(db))
+        computed_from = "aggregation"
+    else:
+        computed_from = "counters"
+    return {"counters": stats.get("counters", {}), "reconciled_at": stats["reconciled_at"], "computed_from": computed_from}
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Deterministic Device Hashing and Near-Match Index
+
+Device ids used to chain SHA-256/384/512 with a timestamp, so the same device
+never hashed to the same id and matching needed fuzzy loops over every stored
+device. This module provides:
+
+- canonical_features(): a flat, order-independent "path=value" serialization of
+  the stable fingerprint components (volatile readings such as battery level,
+  free memory or network RTT are excluded)
+- device_digest(): one BLAKE2b digest of the canonical features for exact matches
+- MinHasher: vectorized MinHash signatures over the feature set
+- DeviceSimilarityIndex: a bounded MinHash LSH index that finds "same device,
+  slightly changed browser" candidates without scanning every fingerprint
+
+The index stores signatures in a preallocated ring of slots. Each LSH band keeps
+a sorted key array (binary search on lookup) plus a small dict of recent
+inserts that is merged into the sorted arrays in batches.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DIGEST_PERSON = b"devfp-v2"
+DEVICE_SIMILARITY_INDEX_CAPACITY = int(os.environ.get("DEVICE_SIMILARITY_INDEX_CAPACITY", "100000"))
+
+# Readings that change between sessions on the same device
+VOLATILE_FEATURE_PREFIXES = (
+    "hardware.memory_signature.available_memory",
+    "hardware.storage_signature.available_storage",
+    "network.downlink",
+    "network.rtt",
+    "network.effective_type",
+    "performance.memory_usage",
+    "performance.cpu_usage",
+    "performance.battery_level",
+    "performance.battery_charging",
+    "performance.performance_benchmarks",
+)
+
+_BAND_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5,
+                      0x85EBCA77C2B2AE63, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB],
+                     dtype=np.uint64)
+
+
+def canonical_features(components: Dict[str, Any], prefix: str = "") -> List[str]:
+    """Sorted, de-duplicated "path=value" tokens; lists of scalars become one token per item"""
+    features = set()
+
+    def _walk(value, path):
+        if path.startswith(VOLATILE_FEATURE_PREFIXES):
+            return
+        if isinstance(value, dict):
+            for key, child in value.items():
+                _walk(child, f"{path}.{key}" if path else str(key))
+        elif isinstance(value, (list, tuple, set)):
+            for item in value:
+                if isinstance(item, (dict, list, tuple, set)):
+                    _walk(item, f"{path}[]")
+                else:
+                    features.add(f"{path}[]={json.dumps(item, sort_keys=True, default=str)}")
+        else:
+            features.add(f"{path}={json.dumps(value, sort_keys=True, default=str)}")
+
+    _walk(components, prefix)
+    return sorted(features)
+
+
+def device_digest(features: Sequence[str]) -> str:
+    """Exact-match device id: BLAKE2b-128 over the canonical feature list"""
+    return hashlib.blake2b("\n".join(features).encode(), digest_size=16, person=DIGEST_PERSON).hexdigest()
+
+
+def feature_hashes(features: Iterable[str]) -> np.ndarray:
+    """64-bit hash per feature token"""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "little") for f in features),
+        dtype=np.uint64
+    )
+
+
+class MinHasher:
+    """MinHash with multiply-shift hash functions h_i(x) = (a_i * x + b_i) >> 32 over uint64"""
+
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        if hashes.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            mixed = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return mixed.min(axis=1).astype(np.uint32)
+
+    def signatures(self, token_matrix: np.ndarray) -> np.ndarray:
+        """Signatures for a (devices x tokens) matrix of token hashes (same token count per row)"""
+        with np.errstate(over="ignore"):
+            mixed = (token_matrix[:, None, :] * self._a[None, :, None] + self._b[None, :, None]) >> np.uint64(32)
+        return mixed.min(axis=2).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray, bands: int, band: Optional[int] = None) -> np.ndarray:
+    """(n x bands) uint64 LSH keys, or (n x 1) for a single band; each band's rows are mixed with odd multipliers"""
+    signatures = np.atleast_2d(signatures)
+    rows = signatures.shape[1] // bands
+    if rows > len(_BAND_MIX):
+        raise ValueError(f"At most {len(_BAND_MIX)} rows per band are supported")
+    selected = range(bands) if band is None else [band]
+    keys = np.empty((signatures.shape[0], len(selected)), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for column, b in enumerate(selected):
+            key = np.full(signatures.shape[0], ((b + 1) * int(_BAND_MIX[-1])) & 0xFFFFFFFFFFFFFFFF, dtype=np.uint64)
+            for r in range(rows):
+                key = (key ^ signatures[:, b * rows + r].astype(np.uint64)) * _BAND_MIX[r]
+            keys[:, column] = key ^ (key >> np.uint64(29))
+    return keys
+
+
+class DeviceSimilarityIndex:
+    """
+    Bounded MinHash LSH index. With 32 permutations in 8 bands of 4 rows, two
+    fingerprints with Jaccard similarity s share at least one band with
+    probability 1 - (1 - s^4)^8 (~0.98 at s=0.8, ~0.42 at s=0.5).
+    Once capacity is reached the oldest fingerprints are overwritten.
+    """
+
+    def __init__(self, capacity: int = DEVICE_SIMILARITY_INDEX_CAPACITY, num_perm: int = 32, bands: int = 8,
+                 merge_threshold: int = 4096, max_bucket_candidates: int = 256, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.capacity = capacity
+        self.bands = bands
+        self.merge_threshold = merge_threshold
+        self.max_bucket_candidates = max_bucket_candidates
+        self.hasher = MinHasher(num_perm, seed)
+
+        self._signatures = np.zeros((capacity, num_perm), dtype=np.uint32)
+        self._slot_ids: List[Optional[str]] = [None] * capacity
+        self._slot_of: Dict[str, int] = {}
+        self._next_slot = 0
+        # Per band: sorted keys with their slots, plus unmerged recent inserts
+        self._keys = [np.empty(0, dtype=np.uint64) for _ in range(bands)]
+        self._slots = [np.empty(0, dtype=np.int64) for _ in range(bands)]
+        self._delta: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._delta_size = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._slot_of
+
+    def signature_for(self, features: Sequence[str]) -> np.ndarray:
+        return self.hasher.signature(feature_hashes(features))
+
+    def _claim_slot(self, device_id: str) -> int:
+        slot = self._slot_of.get(device_id)
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.capacity
+            evicted = self._slot_ids[slot]
+            if evicted is not None:
+                self._slot_of.pop(evicted, None)
+            self._slot_ids[slot] = device_id
+            self._slot_of[device_id] = slot
+        return slot
+
+    def add(self, device_id: str, signature: np.ndarray):
+        """Insert or replace a fingerprint. Stale band entries are dropped lazily on merge/query."""
+        slot = self._claim_slot(device_id)
+        self._signatures[slot] = signature
+        for band, key in enumerate(band_keys(signature, self.bands)[0]):
+            self._delta[band].setdefault(int(key), []).append(slot)
+        self._delta_size += 1
+        if self._delta_size >= self.merge_threshold:
+            self._merge()
+
+    def add_many(self, device_ids: Sequence[str], signatures: np.ndarray):
+        """Bulk insert; band arrays are rebuilt once for the whole batch"""
+        slots = np.fromiter((self._claim_slot(device_id) for device_id in device_ids), dtype=np.int64, count=len(device_ids))
+        self._signatures[slots] = signatures
+        self._merge(extra_slots=slots, extra_keys=band_keys(signatures, self.bands))
+
+    def _merge(self, extra_slots: Optional[np.ndarray] = None, extra_keys: Optional[np.ndarray] = None):
+        for band in range(self.bands):
+            key_parts = [self._keys[band]]
+            slot_parts = [self._slots[band]]
+            if self._delta[band]:
+                delta_keys, delta_slots = [], []
+                for key, slots in self._delta[band].items():
+                    delta_keys.extend([key] * len(slots))
+                    delta_slots.extend(slots)
+                key_parts.append(np.array(delta_keys, dtype=np.uint64))
+                slot_parts.append(np.array(delta_slots, dtype=np.int64))
+            if extra_slots is not None:
+                key_parts.append(extra_keys[:, band])
+                slot_parts.append(extra_slots)
+            keys = np.concatenate(key_parts)
+            slots = np.concatenate(slot_parts)
+
+            # Drop entries whose slot has since been overwritten with a different band key
+            current = band_keys(self._signatures[slots], self.bands, band)[:, 0] if len(slots) else keys
+            live = current == keys
+            keys, slots = keys[live], slots[live]
+            order = np.argsort(keys, kind="stable")
+            self._keys[band] = keys[order]
+            self._slots[band] = slots[order]
+            self._delta[band] = {}
+        self._delta_size = 0
+
+    def query(self, signature: np.ndarray, threshold: float = 0.5, limit: int = 10,
+              exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Near matches as (device_id, estimated Jaccard similarity), best first"""
+        keys = band_keys(signature, self.bands)[0]
+        candidate_parts = []
+        for band, key in enumerate(keys):
+            sorted_keys = self._keys[band]
+            lo = np.searchsorted(sorted_keys, key, side="left")
+            hi = min(np.searchsorted(sorted_keys, key, side="right"), lo + self.max_bucket_candidates)
+            if hi > lo:
+                candidate_parts.append(self._slots[band][lo:hi])
+            recent = self._delta[band].get(int(key))
+            if recent:
+                candidate_parts.append(np.array(recent[:self.max_bucket_candidates], dtype=np.int64))
+        if not candidate_parts:
+            return []
+
+        candidates = np.unique(np.concatenate(candidate_parts))
+        similarity = (self._signatures[candidates] == signature).mean(axis=1)
+        keep = similarity >= threshold
+        candidates, similarity = candidates[keep], similarity[keep]
+        order = np.argsort(-similarity, kind="stable")
+
+        matches = []
+        for index in order:
+            device_id = self._slot_ids[candidates[index]]
+            if device_id is None or device_id == exclude:
+                continue
+            matches.append((device_id, round(float(similarity[index]), 4)))
+            if len(matches) >= limit:
+                break
+        return matches
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "indexed_devices": len(self._slot_of),
+            "capacity": self.capacity,
+            "num_perm": self.hasher.num_perm,
+            "bands": self.bands,
+            "unmerged_inserts": self._delta_size,
+            "memory_bytes": int(self._signatures.nbytes + sum(k.nbytes + s.nbytes for k, s in zip(self._keys, self._slots)))
+        }
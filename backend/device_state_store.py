@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Bounded, Persistent Per-Device State for Session Fingerprinting
+
+DeviceFingerprintingEngine keeps per-device signature history, session history
+and tracking records. Plain dicts grew without bound and were private to one
+uvicorn worker. DeviceStateStore replaces each map with two tiers:
+
+- An LRU-bounded in-process tier (DEVICE_STATE_CACHE_SIZE devices per map)
+- An optional MongoDB tier (one document per device) with indexes on
+  device_id/user_ids and a TTL index on expires_at
+
+Writes are buffered and flushed in batches (bulk_write of upserts). List
+appends are flushed as $push/$each/$slice, so appends from several workers
+merge in MongoDB instead of overwriting each other. Before an analysis the
+caller hydrates the devices it needs, which refreshes them from MongoDB and
+re-applies any local writes that have not been flushed yet.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson.errors import InvalidDocument
+from pymongo import UpdateOne
+
+DEVICE_STATE_CACHE_SIZE = int(os.environ.get("DEVICE_STATE_CACHE_SIZE", "5000"))
+DEVICE_STATE_FLUSH_BATCH = int(os.environ.get("DEVICE_STATE_FLUSH_BATCH", "100"))
+DEVICE_STATE_FLUSH_INTERVAL_SECONDS = float(os.environ.get("DEVICE_STATE_FLUSH_INTERVAL_SECONDS", "2"))
+DEVICE_STATE_REFRESH_SECONDS = float(os.environ.get("DEVICE_STATE_REFRESH_SECONDS", "5"))
+
+
+class DeviceStateStore:
+    """
+    Per-device state map. kind="list" entries are capped lists appended with
+    append(); kind="record" entries are single documents replaced with set().
+    """
+
+    def __init__(self, name: str, kind: str = "list", max_items: int = 100,
+                 capacity: int = DEVICE_STATE_CACHE_SIZE, retention_days: int = 365):
+        if kind not in ("list", "record"):
+            raise ValueError(f"Unknown device state kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_items = max_items
+        self.capacity = capacity
+        self.retention_days = retention_days
+        self.collection = None
+
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._loaded_at: Dict[str, float] = {}
+        # device_id -> {"push": [...], "set": value, "user_ids": set()}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "loads": 0, "flushes": 0, "flushed_writes": 0, "flush_errors": 0}
+
+    # ----- in-process tier -----
+
+    def _touch(self, device_id: str, value: Any):
+        self._cache[device_id] = value
+        self._cache.move_to_end(device_id)
+        while len(self._cache) > self.capacity:
+            evicted, _ = self._cache.popitem(last=False)
+            self._loaded_at.pop(evicted, None)
+            self.stats["evictions"] += 1
+
+    def get(self, device_id: str, default: Any = None) -> Any:
+        if device_id in self._cache:
+            self.stats["hits"] += 1
+            self._cache.move_to_end(device_id)
+            return self._cache[device_id]
+        self.stats["misses"] += 1
+        return default
+
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def append(self, device_id: str, item: Any, user_id: Optional[str] = None) -> List[Any]:
+        """Append to a device's list (trimmed to max_items) and queue the write"""
+        items = list(self._cache.get(device_id, []))
+        items.append(item)
+        items = items[-self.max_items:]
+        self._touch(device_id, items)
+        if self.collection is not None:
+            pending = self._pending.setdefault(device_id, {"push": [], "user_ids": set()})
+            pending["push"].append(item)
+            pending["push"] = pending["push"][-self.max_items:]
+            if user_id:
+                pending["user_ids"].add(user_id)
+        return items
+
+    def set(self, device_id: str, value: Any, user_id: Optional[str] = None):
+        """Replace a device's record and queue the write"""
+        self._touch(device_id, value)
+        if self.collection is not None:
+            pending = self._pending.setdefault(device_id, {"push": [], "user_ids": set()})
+            pending["set"] = value
+            if user_id:
+                pending["user_ids"].add(user_id)
+
+    # ----- durable tier -----
+
+    def attach(self, collection):
+        """Back this map with a motor collection"""
+        self.collection = collection
+
+    async def ensure_indexes(self):
+        if self.collection is None:
+            return
+        try:
+            await self.collection.create_index([("device_id", 1)], unique=True)
+            await self.collection.create_index([("user_ids", 1)])
+            await self.collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+        except Exception as e:
+            logging.error(f"Failed creating {self.name} indexes: {e}")
+
+    async def hydrate(self, device_ids: Iterable[str], force: bool = False):
+        """
+        Refresh devices from MongoDB (skipped for entries loaded within
+        DEVICE_STATE_REFRESH_SECONDS unless force=True). Unflushed local writes
+        are re-applied on top of the stored state.
+        """
+        if self.collection is None:
+            return
+        self._ensure_flusher()
+        now = time.monotonic()
+        stale = [
+            device_id for device_id in dict.fromkeys(device_ids)
+            if device_id and (force or now - self._loaded_at.get(device_id, -1e9) > DEVICE_STATE_REFRESH_SECONDS)
+        ]
+        if not stale:
+            return
+
+        # Serialized with flush() so a batch is never in flight while its devices are reloaded
+        async with self._get_lock():
+            stored = {}
+            async for doc in self.collection.find({"device_id": {"$in": stale}}):
+                stored[doc["device_id"]] = doc
+            self.stats["loads"] += 1
+            self._merge_loaded(stale, stored, now)
+
+    def _merge_loaded(self, device_ids: List[str], stored: Dict[str, dict], now: float):
+        for device_id in device_ids:
+            doc = stored.get(device_id)
+            pending = self._pending.get(device_id, {})
+            if self.kind == "list":
+                items = list(doc.get("items", [])) if doc else []
+                items.extend(pending.get("push", []))
+                if doc is None and not items:
+                    items = list(self._cache.get(device_id, []))
+                if items:
+                    self._touch(device_id, items[-self.max_items:])
+            else:
+                if "set" in pending:
+                    value = pending["set"]
+                elif doc is not None:
+                    value = doc.get("value")
+                else:
+                    value = self._cache.get(device_id)
+                if value is not None:
+                    self._touch(device_id, value)
+            self._loaded_at[device_id] = now
+
+    def _build_writes(self, batch: Dict[str, Dict[str, Any]]) -> List[UpdateOne]:
+        now = datetime.utcnow()
+        writes = []
+        for device_id, pending in batch.items():
+            update: Dict[str, Any] = {
+                "$set": {"updated_at": now, "expires_at": now + timedelta(days=self.retention_days)},
+                "$setOnInsert": {"device_id": device_id, "first_seen": now}
+            }
+            if pending.get("push"):
+                update["$push"] = {"items": {"$each": pending["push"], "$slice": -self.max_items}}
+            if "set" in pending:
+                update["$set"]["value"] = pending["set"]
+            if pending.get("user_ids"):
+                update["$addToSet"] = {"user_ids": {"$each": sorted(pending["user_ids"])}}
+            writes.append(UpdateOne({"device_id": device_id}, update, upsert=True))
+        return writes
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        return self._flush_lock
+
+    async def flush(self) -> int:
+        """Write all pending device updates in one unordered bulk_write"""
+        if self.collection is None or not self._pending:
+            return 0
+        async with self._get_lock():
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                await self.collection.bulk_write(self._build_writes(batch), ordered=False)
+                self.stats["flushes"] += 1
+                self.stats["flushed_writes"] += len(batch)
+                return len(batch)
+            except InvalidDocument as e:
+                # Not retryable: drop the batch rather than failing every later flush
+                self.stats["flush_errors"] += 1
+                logging.error(f"Device state batch for {self.name} could not be encoded and was dropped: {e}")
+                return 0
+            except Exception as e:
+                # Put the batch back in front of anything queued meanwhile
+                self.stats["flush_errors"] += 1
+                logging.error(f"Device state flush failed for {self.name}: {e}")
+                for device_id, pending in batch.items():
+                    newer = self._pending.get(device_id)
+                    if newer:
+                        pending["push"] = (pending.get("push", []) + newer.get("push", []))[-self.max_items:]
+                        if "set" in newer:
+                            pending["set"] = newer["set"]
+                        pending["user_ids"] = pending.get("user_ids", set()) | newer.get("user_ids", set())
+                    self._pending[device_id] = pending
+                return 0
+
+    async def flush_if_due(self):
+        if len(self._pending) >= DEVICE_STATE_FLUSH_BATCH:
+            await self.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            self._flusher = None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(DEVICE_STATE_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Device state flush loop error for {self.name}: {e}")
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "cached_devices": len(self._cache),
+            "capacity": self.capacity,
+            "pending_writes": len(self._pending),
+            "persistent": self.collection is not None,
+            **self.stats
+        }
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Lazy Engine Registry
+
+server.py used to build every analysis engine (and import torch, librosa,
+sklearn, matplotlib, ...) at module scope, so each worker paid the startup
+time and memory for routes it might never serve. Engines are now registered
+with a factory and constructed on first use:
+
+- Thread-safe, exactly-once construction per engine (double-checked lock)
+- LazyEngine proxies keep existing module-level names working unchanged
+- lazy_import() defers heavy third-party modules until an attribute is used
+- Load timings and failures are reported for the health endpoint
+- Optional prewarm list from configuration (ENGINE_PREWARM="a,b" or "all")
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class _EngineEntry:
+    __slots__ = ("name", "factory", "instance", "loaded", "lock", "load_seconds", "loaded_at", "error")
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self.factory = factory
+        self.instance = None
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.load_seconds = None
+        self.loaded_at = None
+        self.error = None
+
+
+class EngineRegistry:
+    """Registry of named engine factories, each constructed at most once"""
+
+    def __init__(self):
+        self._entries: Dict[str, _EngineEntry] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> "LazyEngine":
+        """Register a factory and return a proxy that resolves the engine on first use"""
+        if name in self._entries:
+            raise ValueError(f"Engine '{name}' is already registered")
+        self._entries[name] = _EngineEntry(name, factory)
+        return LazyEngine(self, name)
+
+    def proxy(self, name: str, item: Optional[str] = None) -> "LazyEngine":
+        """Proxy for an already registered engine, or for one key of a grouped engine (a dict)"""
+        if name not in self._entries:
+            raise KeyError(f"Unknown engine '{name}'")
+        return LazyEngine(self, name, item)
+
+    def get(self, name: str) -> Any:
+        entry = self._entries[name]
+        if entry.loaded:
+            return entry.instance
+        with entry.lock:
+            if not entry.loaded:
+                started = time.perf_counter()
+                try:
+                    instance = entry.factory()
+                except Exception as e:
+                    # Leave the entry unloaded so the next caller retries
+                    entry.error = str(e)
+                    logging.error(f"Engine '{name}' failed to load: {e}")
+                    raise
+                entry.instance = instance
+                entry.load_seconds = time.perf_counter() - started
+                entry.loaded_at = time.time()
+                entry.error = None
+                entry.loaded = True
+                logging.info(f"Engine '{name}' loaded in {entry.load_seconds * 1000:.1f} ms")
+        return entry.instance
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return bool(entry and entry.loaded)
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def prewarm(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Load the given engines now; unknown names and failures are reported, not raised"""
+        report = {}
+        for name in names:
+            if name not in self._entries:
+                report[name] = "unknown"
+                continue
+            try:
+                self.get(name)
+                report[name] = "loaded"
+            except Exception as e:
+                report[name] = f"error: {e}"
+        return report
+
+    def prewarm_from_env(self, variable: str = "ENGINE_PREWARM") -> Dict[str, Any]:
+        """Prewarm engines listed in an environment variable (comma separated, or 'all')"""
+        value = os.environ.get(variable, "").strip()
+        if not value:
+            return {}
+        if value.lower() == "all":
+            names = self.names()
+        else:
+            names = [name.strip() for name in value.split(",") if name.strip()]
+        return self.prewarm(names)
+
+    def status(self) -> Dict[str, Any]:
+        engines = {}
+        for name, entry in self._entries.items():
+            engines[name] = {
+                "loaded": entry.loaded,
+                "load_ms": round(entry.load_seconds * 1000, 2) if entry.load_seconds is not None else None,
+                "loaded_at": entry.loaded_at,
+                "error": entry.error
+            }
+        loaded = [name for name, entry in self._entries.items() if entry.loaded]
+        return {
+            "registered": len(self._entries),
+            "loaded": len(loaded),
+            "loaded_engines": loaded,
+            "engines": engines
+        }
+
+
+class LazyEngine:
+    """
+    Stand-in for a module-level engine instance. Attribute access (and
+    assignment) is forwarded to the real engine, constructing it on first use.
+    """
+
+    __slots__ = ("_registry", "_name", "_item")
+
+    def __init__(self, registry: EngineRegistry, name: str, item: Optional[str] = None):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_item", item)
+
+    def _resolve(self) -> Any:
+        instance = self._registry.get(self._name)
+        return instance if self._item is None else instance[self._item]
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._resolve(), attribute)
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self._resolve(), attribute, value)
+
+    def __repr__(self) -> str:
+        label = self._name if self._item is None else f"{self._name}.{self._item}"
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyEngine {label} ({state})>"
+
+
+class _LazyModule:
+    """Module placeholder that performs the real import on first attribute access"""
+
+    def __init__(self, module_name: str, on_import: Optional[Callable[[], None]] = None):
+        self.__dict__["_module_name"] = module_name
+        self.__dict__["_on_import"] = on_import
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    on_import = self.__dict__["_on_import"]
+                    if on_import is not None:
+                        on_import()
+                    module = importlib.import_module(self.__dict__["_module_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "imported" if self.__dict__["_module"] is not None else "not imported"
+        return f"<lazy module {self.__dict__['_module_name']} ({state})>"
+
+
+def lazy_import(module_name: str, on_import: Optional[Callable[[], None]] = None) -> Any:
+    """Return a placeholder for module_name; on_import runs once just before the real import"""
+    return _LazyModule(module_name, on_import)
+
+
+# Application-wide registry used by server.py
+engine_registry = EngineRegistry()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Dynamic Micro-Batching for Text Inference
+
+Collects concurrent model-backed inference requests (text emotion, sentiment)
+for a few milliseconds or until a maximum batch size is reached, runs one
+batched forward pass on a dedicated worker thread and resolves each caller's
+future with its own result.
+
+Key Features:
+- One worker thread per batcher, so backend models are loaded once per worker
+  process and forward passes never run concurrently on the same model
+- max_batch_size / max_wait_ms trade latency for throughput
+- Per-batcher statistics (batch sizes, queue wait, end-to-end latency)
+- Synthetic concurrency benchmark (python inference_batcher.py)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Groups single-item inference calls into batches.
+
+    batch_fn receives a list of inputs and must return a list of outputs of the
+    same length and order. loader (optional) is called once, on the worker
+    thread, before the first batch; its return value is passed to batch_fn as
+    the first argument.
+    """
+
+    def __init__(self,
+                 name: str,
+                 batch_fn: Callable,
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0,
+                 loader: Optional[Callable[[], Any]] = None,
+                 latency_window: int = 2048):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.loader = loader
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batcher-{name}")
+        self._model = None
+        self._model_loaded = loader is None
+        self._load_lock = threading.Lock()
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.stats = {
+            "requests": 0,
+            "completed": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_batch_observed": 0
+        }
+        self._latencies_ms = deque(maxlen=latency_window)
+        self._queue_waits_ms = deque(maxlen=latency_window)
+
+    def _ensure_worker(self):
+        """Start the collector task on the running event loop (restarts if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._worker_task is None or self._worker_task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker_task = loop.create_task(self._collect_loop())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        self.stats["requests"] += 1
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queue several items at once; they may be split across batches"""
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    def _run_batch(self, items: List[Any]) -> List[Any]:
+        """Executed on the worker thread"""
+        if not self._model_loaded:
+            with self._load_lock:
+                if not self._model_loaded:
+                    self._model = self.loader()
+                    self._model_loaded = True
+                    logging.info(f"MicroBatcher[{self.name}] backend model loaded")
+        if self.loader is not None:
+            return self.batch_fn(self._model, items)
+        return self.batch_fn(items)
+
+    async def _collect_loop(self):
+        max_wait = self.max_wait_ms / 1000.0
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            deadline = time.perf_counter() + max_wait
+
+            # Gather more requests until the window closes or the batch is full
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            items = [entry[0] for entry in batch]
+            try:
+                results = await self._loop.run_in_executor(self._executor, self._run_batch, items)
+                if len(results) != len(items):
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(items)} inputs")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.error(f"MicroBatcher[{self.name}] batch failed: {str(e)}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            self.stats["batches"] += 1
+            self.stats["completed"] += len(batch)
+            self.stats["max_batch_observed"] = max(self.stats["max_batch_observed"], len(batch))
+            for (_, future, enqueued), result in zip(batch, results):
+                self._queue_waits_ms.append((started - enqueued) * 1000)
+                self._latencies_ms.append((finished - enqueued) * 1000)
+                if not future.done():
+                    future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching efficiency and latency percentiles over the recent window"""
+        latencies = np.array(self._latencies_ms) if self._latencies_ms else np.zeros(1)
+        waits = np.array(self._queue_waits_ms) if self._queue_waits_ms else np.zeros(1)
+        batches = max(self.stats["batches"], 1)
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "model_loaded": self._model_loaded,
+            **self.stats,
+            "avg_batch_size": round(self.stats["completed"] / batches, 2),
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3)
+            },
+            "queue_wait_ms_p50": round(float(np.percentile(waits, 50)), 3)
+        }
+
+
+# Batchers registered by the application, exposed through the stats endpoint
+BATCHER_REGISTRY: Dict[str, MicroBatcher] = {}
+
+
+def register_batcher(batcher: MicroBatcher) -> MicroBatcher:
+    BATCHER_REGISTRY[batcher.name] = batcher
+    return batcher
+
+
+def get_batcher_stats() -> Dict[str, Any]:
+    return {name: batcher.get_stats() for name, batcher in BATCHER_REGISTRY.items()}
+
+
+async def run_synthetic_benchmark(batch_fn: Callable[[List[Any]], List[Any]],
+                                  make_input: Callable[[int], Any],
+                                  concurrency_levels: List[int] = (1, 8, 32, 128),
+                                  requests_per_level: int = 512,
+                                  max_batch_size: int = 32,
+                                  max_wait_ms: float = 5.0) -> List[Dict[str, Any]]:
+    """
+    Throughput vs. latency for unbatched (one call per item) and micro-batched
+    execution of batch_fn at several client concurrency levels.
+    """
+    report = []
+    for concurrency in concurrency_levels:
+        for mode in ("unbatched", "batched"):
+            if mode == "batched":
+                batcher = MicroBatcher(f"bench-{concurrency}", batch_fn, max_batch_size, max_wait_ms)
+                call = batcher.submit
+            else:
+                executor = ThreadPoolExecutor(max_workers=1)
+                loop = asyncio.get_running_loop()
+
+                async def call(item, _executor=executor, _loop=loop):
+                    return (await _loop.run_in_executor(_executor, batch_fn, [item]))[0]
+
+            latencies = []
+            counter = iter(range(requests_per_level))
+
+            async def client():
+                for i in counter:
+                    started = time.perf_counter()
+                    await call(make_input(i))
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+            row = {
+                "mode": mode,
+                "concurrency": concurrency,
+                "requests": requests_per_level,
+                "throughput_rps": round(requests_per_level / elapsed, 1),
+                "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2)
+            }
+            if mode == "batched":
+                row["avg_batch_size"] = batcher.get_stats()["avg_batch_size"]
+            else:
+                executor.shutdown(wait=False)
+            report.append(row)
+    return report
+
+
+def _synthetic_transformer_batch(items: List[str]) -> List[Dict[str, float]]:
+    """Stand-in for a transformer forward pass: fixed per-call overhead plus a small per-item cost"""
+    time.sleep(0.004 + 0.0002 * len(items))
+    return [{"neutral": 1.0} for _ in items]
+
+
+if __name__ == "__main__":
+    results = asyncio.run(run_synthetic_benchmark(
+        _synthetic_transformer_batch,
+        lambda i: f"synthetic candidate answer {i}"
+    ))
+    print(f"{'mode':<10} {'conc':>5} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch':>6}")
+    for row in results:
+        print(f"{row['mode']:<10} {row['concurrency']:>5} {row['throughput_rps']:>9} "
+              f"{row['latency_p50_ms']:>8} {row['latency_p95_ms']:>8} {row.get('avg_batch_size', 1):>6}")
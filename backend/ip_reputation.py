@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+IP Reputation Index
+
+Tags IP addresses with categories (datacenter, vpn, proxy, tor_exit,
+blocklist, ...) from local feed files, replacing the first-octet datacenter
+heuristic and the simulated blacklist check of EnvironmentAnalyzer.
+
+Feed directory (IP_REPUTATION_FEED_DIR, default backend/ip_feeds):
+- <category>.txt / .list / .netset: one IP or CIDR per line; '#' and ';' start
+  comments, anything after the address is ignored (Spamhaus DROP style)
+- *.csv: header row with a 'network' column (IP or CIDR) or 'start_ip' and
+  'end_ip' columns (ASN range dumps); optional 'category' (defaults to the file
+  name) and 'label' (provider, ASN, list name) columns
+
+Key Features:
+- One compressed binary (Patricia) trie per address family; lookups walk at
+  most prefix-length nodes (32 for IPv4, 128 for IPv6) and return the tags of
+  every containing prefix
+- Nodes live in flat typed arrays instead of Python objects, so millions of
+  prefixes fit in tens of megabytes
+- IPv4-mapped IPv6 addresses are looked up in the IPv4 trie
+- Feed changes (name, size, mtime) are noticed at most every
+  IP_REPUTATION_REFRESH_SECONDS; the new index is built in a background thread
+  and swapped in with a single assignment, so lookups never see a partial index
+  and keep using the previous one if a rebuild fails
+"""
+
+import csv
+import hashlib
+import ipaddress
+import logging
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_FEED_DIR = os.environ.get("IP_REPUTATION_FEED_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ip_feeds"))
+REFRESH_SECONDS = float(os.environ.get("IP_REPUTATION_REFRESH_SECONDS", "60"))
+
+TEXT_FEED_SUFFIXES = (".txt", ".list", ".netset")
+CSV_FEED_SUFFIX = ".csv"
+
+# Reputation penalty per category (unknown categories are tagged but carry no penalty)
+CATEGORY_RISK = {
+    "blocklist": 0.6,
+    "tor_exit": 0.5,
+    "proxy": 0.3,
+    "vpn": 0.3,
+    "datacenter": 0.2,
+}
+ANONYMIZER_CATEGORIES = frozenset({"tor_exit", "vpn", "proxy"})
+
+NO_CHILD = -1
+
+
+class PrefixTrie:
+    """
+    Compressed binary trie over fixed-width integer prefixes. Node i is
+    (values[i], lengths[i], children[2i], children[2i+1], tags[i]); node 0 is the
+    zero-length root. tags is a bitmask of category ids, 0 for pure branch nodes.
+
+    Lookups start from a jump table indexed by the top JUMP_BITS bits, which
+    holds the deepest node of length <= JUMP_BITS containing each slot and the
+    tagged prefixes above it, then descend by address bits and verify the
+    tagged nodes passed on the way.
+    """
+
+    JUMP_BITS = 16
+
+    def __init__(self, width: int):
+        self.width = width
+        self.values = array("Q") if width <= 64 else []   # IPv6 prefixes exceed 64 bits
+        self.lengths = array("B")
+        self.children = array("i")
+        self.tags = array("Q")
+        self.labels: Dict[int, str] = {}
+        self.prefixes = 0
+        self._jump: Optional[array] = None
+        self._jump_tagged: List[Tuple[int, ...]] = []
+        self._new_node(0, 0)
+
+    def __len__(self) -> int:
+        return self.prefixes
+
+    @property
+    def node_count(self) -> int:
+        return len(self.lengths)
+
+    def _new_node(self, value: int, length: int) -> int:
+        self.values.append(value)
+        self.lengths.append(length)
+        self.children.extend((NO_CHILD, NO_CHILD))
+        self.tags.append(0)
+        return len(self.lengths) - 1
+
+    def insert(self, value: int, length: int, tag_mask: int, label: Optional[str] = None) -> None:
+        """Tag the prefix value/length (host bits must be zero)"""
+        self._insert(0, value, length, tag_mask, label, None)
+
+    def insert_sorted(self, prefixes: Iterable[Tuple[int, int, int, Optional[str]]]) -> None:
+        """
+        Bulk insert of (value, length, tag_mask, label) sorted by (value, length).
+        Every prefix's deepest containing node lies on the path of the previous
+        one, so each insert resumes from that path instead of the root.
+        """
+        width, values, lengths = self.width, self.values, self.lengths
+        path = [0]
+        for value, length, tag_mask, label in prefixes:
+            while len(path) > 1:
+                top = path[-1]
+                if lengths[top] <= length and not (value ^ values[top]) >> (width - lengths[top]):
+                    break
+                path.pop()
+            self._insert(path[-1], value, length, tag_mask, label, path)
+
+    def _insert(self, node: int, value: int, length: int, tag_mask: int, label: Optional[str],
+                path: Optional[List[int]]) -> None:
+        width, values, lengths, children = self.width, self.values, self.lengths, self.children
+        self._jump = None
+        added = []
+        while lengths[node] != length:
+            slot = 2 * node + ((value >> (width - 1 - lengths[node])) & 1)
+            child = children[slot]
+            if child == NO_CHILD:
+                node = children[slot] = self._new_node(value, length)
+                added.append(node)
+                break
+            child_value, child_length = values[child], lengths[child]
+            common = min(child_length, length, width - (child_value ^ value).bit_length())
+            if common == child_length:
+                node = child
+                added.append(node)
+                continue
+            if common == length:
+                # New prefix sits between node and child
+                inner = self._new_node(value, length)
+                children[2 * inner + ((child_value >> (width - 1 - length)) & 1)] = child
+                children[slot] = inner
+                node = inner
+                added.append(node)
+                break
+            # Diverging prefixes: branch at the first differing bit
+            branch = self._new_node(value >> (width - common) << (width - common), common)
+            leaf = self._new_node(value, length)
+            bit = (value >> (width - 1 - common)) & 1
+            children[2 * branch + bit] = leaf
+            children[2 * branch + 1 - bit] = child
+            children[slot] = branch
+            node = leaf
+            added.extend((branch, leaf))
+            break
+        if path is not None:
+            path.extend(added)
+
+        if not self.tags[node]:
+            self.prefixes += 1
+        self.tags[node] |= tag_mask
+        if label and node not in self.labels:
+            self.labels[node] = label
+
+    def finalize(self) -> None:
+        """Build the jump table (done lazily by the first lookup after an insert)"""
+        bits = min(self.JUMP_BITS, self.width)
+        shift = self.width - bits
+        jump = array("i", [0]) * (1 << bits)
+        jump_tagged: List[Tuple[int, ...]] = [()] * (1 << bits)
+        # Parents before children, so deeper nodes overwrite the slots they cover
+        stack = [(0, ())]
+        while stack:
+            node, above = stack.pop()
+            length = self.lengths[node]
+            tagged = above + (node,) if self.tags[node] else above
+            low = self.values[node] >> shift
+            high = low + (1 << (bits - length))
+            jump[low:high] = array("i", [node]) * (high - low)
+            jump_tagged[low:high] = [tagged] * (high - low)
+            for child in self.children[2 * node:2 * node + 2]:
+                if child != NO_CHILD and self.lengths[child] <= bits:
+                    stack.append((child, tagged))
+        self._jump_tagged = jump_tagged
+        self._jump = jump
+
+    def matches(self, value: int) -> List[int]:
+        """Nodes of all tagged prefixes containing value, least specific first"""
+        if self._jump is None:
+            self.finalize()
+        values, lengths, children, tags = self.values, self.lengths, self.children, self.tags
+        width = self.width
+        slot = value >> (width - min(self.JUMP_BITS, width))
+        node = self._jump[slot]
+        found = list(self._jump_tagged[slot])
+
+        # Descend by address bits only; prefixes passed on the way are checked afterwards
+        passed = []
+        length = lengths[node]
+        while length < width:
+            node = children[2 * node + ((value >> (width - 1 - length)) & 1)]
+            if node == NO_CHILD:
+                break
+            length = lengths[node]
+            if tags[node]:
+                passed.append(node)
+        for node in passed:
+            if (value ^ values[node]) >> (width - lengths[node]):
+                break   # deeper prefixes extend this one, so they cannot match either
+            found.append(node)
+        return found
+
+    def prefix_string(self, node: int) -> str:
+        network_class = ipaddress.IPv4Network if self.width == 32 else ipaddress.IPv6Network
+        return str(network_class((self.values[node], self.lengths[node])))
+
+
+@dataclass(frozen=True)
+class IPReputation:
+    """Lookup result for one address"""
+    ip_address: str
+    valid: bool
+    categories: Tuple[str, ...] = ()
+    matched_prefixes: Tuple[str, ...] = ()     # least specific first
+    labels: Tuple[str, ...] = ()
+    index_version: str = ""
+
+    def has(self, category: str) -> bool:
+        return category in self.categories
+
+    @property
+    def risk_penalty(self) -> float:
+        return min(1.0, sum(CATEGORY_RISK.get(category, 0.0) for category in self.categories))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ip_address": self.ip_address,
+            "valid": self.valid,
+            "categories": list(self.categories),
+            "matched_prefixes": list(self.matched_prefixes),
+            "labels": list(self.labels),
+            "risk_penalty": round(self.risk_penalty, 3),
+            "index_version": self.index_version,
+        }
+
+
+@dataclass
+class IPReputationSnapshot:
+    """Immutable index built from one state of the feed directory"""
+    ipv4: PrefixTrie
+    ipv6: PrefixTrie
+    categories: List[str]
+    feeds: Dict[str, Dict[str, Any]]
+    signature: Tuple
+    version: str
+    built_at: float = field(default_factory=time.time)
+    build_seconds: float = 0.0
+
+    def lookup(self, ip_address: str) -> IPReputation:
+        try:
+            address = ipaddress.ip_address(str(ip_address).strip())
+        except ValueError:
+            return IPReputation(str(ip_address), False, index_version=self.version)
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        trie = self.ipv4 if address.version == 4 else self.ipv6
+
+        nodes = trie.matches(int(address))
+        if not nodes:
+            return IPReputation(str(address), True, index_version=self.version)
+        mask = 0
+        for node in nodes:
+            mask |= trie.tags[node]
+        return IPReputation(
+            str(address),
+            True,
+            categories=tuple(category for bit, category in enumerate(self.categories) if mask >> bit & 1),
+            matched_prefixes=tuple(trie.prefix_string(node) for node in nodes),
+            labels=tuple(trie.labels[node] for node in nodes if node in trie.labels),
+            index_version=self.version,
+        )
+
+
+def _feed_files(feed_dir: str) -> List[os.DirEntry]:
+    if not os.path.isdir(feed_dir):
+        return []
+    return sorted(
+        (entry for entry in os.scandir(feed_dir)
+         if entry.is_file() and not entry.name.startswith(".")
+         and entry.name.lower().endswith(TEXT_FEED_SUFFIXES + (CSV_FEED_SUFFIX,))),
+        key=lambda entry: entry.name
+    )
+
+
+def feed_signature(feed_dir: str) -> Tuple:
+    """(name, size, mtime) of every feed file; changes when a feed is added, removed or rewritten"""
+    signature = []
+    for entry in _feed_files(feed_dir):
+        stat = entry.stat()
+        signature.append((entry.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def _category_from_name(file_name: str) -> str:
+    return file_name.split(".", 1)[0].strip().lower()
+
+
+def _range_networks(start: str, end: str) -> Iterator[ipaddress._BaseNetwork]:
+    yield from ipaddress.summarize_address_range(ipaddress.ip_address(start.strip()), ipaddress.ip_address(end.strip()))
+
+
+def read_feed(path: str) -> Iterator[Tuple[Optional[ipaddress._BaseNetwork], str, Optional[str]]]:
+    """
+    (network, category, label) rows of one feed file; network is None for an
+    unparseable row so callers can count them
+    """
+    default_category = _category_from_name(os.path.basename(path))
+    with open(path, newline="", encoding="utf-8", errors="replace") as handle:
+        if path.lower().endswith(CSV_FEED_SUFFIX):
+            reader = csv.DictReader(line for line in handle if line.strip() and not line.lstrip().startswith("#"))
+            for row in reader:
+                category = (row.get("category") or default_category).strip().lower()
+                label = (row.get("label") or "").strip() or None
+                try:
+                    if row.get("network"):
+                        networks = [ipaddress.ip_network(row["network"].strip(), strict=False)]
+                    else:
+                        networks = _range_networks(row["start_ip"], row["end_ip"])
+                    for network in networks:
+                        yield network, category, label
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    yield None, category, label
+        else:
+            for line in handle:
+                text = line.split("#", 1)[0].split(";", 1)[0].strip()
+                if not text:
+                    continue
+                try:
+                    yield ipaddress.ip_network(text.split()[0], strict=False), default_category, None
+                except ValueError:
+                    yield None, default_category, None
+
+
+def build_snapshot(feed_dir: str, signature: Optional[Tuple] = None) -> IPReputationSnapshot:
+    """Parse every feed in feed_dir into fresh tries"""
+    started = time.perf_counter()
+    signature = signature if signature is not None else feed_signature(feed_dir)
+    prefixes: Dict[int, List[Tuple[int, int, int, Optional[str]]]] = {4: [], 6: []}
+    category_bits: Dict[str, int] = {}
+    feeds = {}
+
+    for entry in _feed_files(feed_dir):
+        loaded = invalid = 0
+        for network, category, label in read_feed(entry.path):
+            if network is None:
+                invalid += 1
+                continue
+            if category not in category_bits:
+                if len(category_bits) == 64:
+                    raise ValueError("IP reputation feeds define more than 64 categories")
+                category_bits[category] = len(category_bits)
+            prefixes[network.version].append(
+                (int(network.network_address), network.prefixlen, 1 << category_bits[category], label))
+            loaded += 1
+        feeds[entry.name] = {"entries": loaded, "invalid_entries": invalid}
+
+    tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+    for version, trie in tries.items():
+        trie.insert_sorted(sorted(prefixes.pop(version), key=itemgetter(0, 1)))
+        trie.finalize()
+
+    digest = hashlib.blake2b(repr(signature).encode(), digest_size=4).hexdigest()
+    return IPReputationSnapshot(
+        ipv4=tries[4],
+        ipv6=tries[6],
+        categories=sorted(category_bits, key=category_bits.get),
+        feeds=feeds,
+        signature=signature,
+        version=f"{int(time.time())}-{digest}",
+        build_seconds=time.perf_counter() - started,
+    )
+
+
+class IPReputationIndex:
+    """Feed-backed IP reputation lookups with automatic, atomic reloads"""
+
+    def __init__(self, feed_dir: str = DEFAULT_FEED_DIR, refresh_seconds: float = REFRESH_SECONDS,
+                 background_reload: bool = True):
+        self.feed_dir = feed_dir
+        self.refresh_seconds = refresh_seconds
+        self.background_reload = background_reload
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._checked_at = time.monotonic()
+        self._stats = {"lookups": 0, "reloads": 0, "failed_reloads": 0, "last_error": None}
+        self._snapshot = self._build(feed_signature(feed_dir))
+
+    def _build(self, signature: Tuple) -> IPReputationSnapshot:
+        try:
+            snapshot = build_snapshot(self.feed_dir, signature)
+            self.logger.info(
+                f"IP reputation index {snapshot.version}: {len(snapshot.ipv4)} IPv4 and {len(snapshot.ipv6)} IPv6 "
+                f"prefixes from {len(snapshot.feeds)} feeds in {snapshot.build_seconds:.2f}s"
+            )
+            return snapshot
+        except Exception as e:
+            self.logger.error(f"Could not build IP reputation index from {self.feed_dir}: {str(e)}")
+            self._stats["last_error"] = str(e)
+            return IPReputationSnapshot(PrefixTrie(32), PrefixTrie(128), [], {}, (), "empty")
+
+    @property
+    def snapshot(self) -> IPReputationSnapshot:
+        self._maybe_reload()
+        return self._snapshot
+
+    def lookup(self, ip_address: str) -> IPReputation:
+        self._stats["lookups"] += 1
+        return self.snapshot.lookup(ip_address)
+
+    def lookup_many(self, ip_addresses: Iterable[str]) -> List[IPReputation]:
+        snapshot = self.snapshot
+        results = [snapshot.lookup(ip_address) for ip_address in ip_addresses]
+        self._stats["lookups"] += len(results)
+        return results
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild now if the feeds changed (or always with force); returns True if a new index was swapped in"""
+        with self._lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+        try:
+            signature = feed_signature(self.feed_dir)
+            if not force and signature == self._snapshot.signature:
+                return False
+            snapshot = build_snapshot(self.feed_dir, signature)
+            self._snapshot = snapshot
+            self._stats["reloads"] += 1
+            self._stats["last_error"] = None
+            self.logger.info(f"IP reputation index reloaded: {snapshot.version} ({snapshot.build_seconds:.2f}s)")
+            return True
+        except Exception as e:
+            self._stats["failed_reloads"] += 1
+            self._stats["last_error"] = str(e)
+            self.logger.error(f"IP reputation reload failed, keeping {self._snapshot.version}: {str(e)}")
+            return False
+        finally:
+            self._reloading = False
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_seconds:
+            return
+        self._checked_at = now
+        try:
+            changed = feed_signature(self.feed_dir) != self._snapshot.signature
+        except OSError:
+            return
+        if not changed or self._reloading:
+            return
+        if self.background_reload:
+            threading.Thread(target=self.reload, name="ip-reputation-reload", daemon=True).start()
+        else:
+            self.reload()
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "feed_dir": self.feed_dir,
+            "index_version": snapshot.version,
+            "ipv4_prefixes": len(snapshot.ipv4),
+            "ipv6_prefixes": len(snapshot.ipv6),
+            "trie_nodes": snapshot.ipv4.node_count + snapshot.ipv6.node_count,
+            "categories": snapshot.categories,
+            "feeds": snapshot.feeds,
+            "build_seconds": round(snapshot.build_seconds, 3),
+            "reloading": self._reloading,
+            **self._stats,
+        }
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Versioned Model Registry
+
+Stores trained model artifacts (scalers, detectors, baselines) as immutable
+versions and serves the current version to every worker process:
+
+<root>/<model_name>/<version>/<artifact>.joblib   uncompressed joblib dumps
+<root>/<model_name>/<version>/metadata.json      feature names, metrics, library versions
+<root>/<model_name>/CURRENT                      name of the active version
+
+Key Features:
+- Versions are written to a temporary directory and renamed into place, and
+  CURRENT is replaced with os.replace(), so readers never see a partial version
+- Artifacts are loaded with mmap_mode="r": numpy arrays held by the models
+  (PCA components, scaler statistics, DBSCAN core samples) are memory-mapped
+  from the page cache and shared by all workers on a host; tree ensembles copy
+  their node arrays into their own buffers when unpickled
+- Each process loads a version once; current() re-checks CURRENT at most every
+  MODEL_REGISTRY_REFRESH_SECONDS and swaps in a new version after a retrain
+- Old versions are pruned (MODEL_REGISTRY_KEEP_VERSIONS), never the current one
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+DEFAULT_MODEL_ROOT = os.environ.get("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+REFRESH_SECONDS = float(os.environ.get("MODEL_REGISTRY_REFRESH_SECONDS", "5"))
+KEEP_VERSIONS = int(os.environ.get("MODEL_REGISTRY_KEEP_VERSIONS", "5"))
+
+CURRENT_POINTER = "CURRENT"
+METADATA_FILE = "metadata.json"
+ARTIFACT_SUFFIX = ".joblib"
+
+
+def _library_versions() -> Dict[str, str]:
+    versions = {}
+    for module_name in ("sklearn", "numpy", "joblib"):
+        try:
+            versions[module_name] = __import__(module_name).__version__
+        except Exception:
+            continue
+    return versions
+
+
+@dataclass
+class ModelVersion:
+    """One loaded model version: artifacts by name plus their metadata"""
+    name: str
+    version: str
+    artifacts: Dict[str, Any]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.time)
+
+
+class ModelRegistry:
+    """File-system model registry shared by all worker processes on a host"""
+
+    def __init__(self, root: str = DEFAULT_MODEL_ROOT, refresh_seconds: float = REFRESH_SECONDS,
+                 keep_versions: int = KEEP_VERSIONS):
+        self.root = root
+        self.refresh_seconds = refresh_seconds
+        self.keep_versions = keep_versions
+        self.logger = logging.getLogger(__name__)
+
+        self._loaded: Dict[str, ModelVersion] = {}     # model name -> active version in this process
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {"saves": 0, "loads": 0, "swaps": 0, "pointer_checks": 0}
+
+    def _model_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def current_version(self, name: str) -> Optional[str]:
+        """Version named by CURRENT (None before the first save)"""
+        try:
+            with open(os.path.join(self._model_dir(name), CURRENT_POINTER)) as pointer:
+                return pointer.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def save(self, name: str, artifacts: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+             activate: bool = True) -> ModelVersion:
+        """Write a new immutable version and (by default) make it current"""
+        model_dir = self._model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+        version = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        metadata = {
+            **(metadata or {}),
+            "model_name": name,
+            "version": version,
+            "created_at": datetime.utcnow().isoformat(),
+            "artifacts": sorted(artifacts),
+            "library_versions": _library_versions(),
+        }
+
+        staging = tempfile.mkdtemp(prefix=f".{version}-", dir=model_dir)
+        try:
+            for artifact_name, artifact in artifacts.items():
+                # Uncompressed, so the arrays can be memory-mapped on load
+                joblib.dump(artifact, os.path.join(staging, artifact_name + ARTIFACT_SUFFIX))
+            with open(os.path.join(staging, METADATA_FILE), "w") as handle:
+                json.dump(metadata, handle, default=str)
+            os.rename(staging, os.path.join(model_dir, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self._stats["saves"] += 1
+        if activate:
+            self.activate(name, version)
+        return ModelVersion(name, version, dict(artifacts), metadata)
+
+    def activate(self, name: str, version: str) -> None:
+        """Point CURRENT at an existing version (rollback uses the same call)"""
+        if not os.path.isdir(os.path.join(self._model_dir(name), version)):
+            raise ValueError(f"Unknown {name} model version: {version}")
+        pointer_tmp = os.path.join(self._model_dir(name), f".{CURRENT_POINTER}.{uuid.uuid4().hex}")
+        with open(pointer_tmp, "w") as pointer:
+            pointer.write(version)
+        os.replace(pointer_tmp, os.path.join(self._model_dir(name), CURRENT_POINTER))
+        self._checked_at.pop(name, None)
+        self.prune(name)
+
+    def load(self, name: str, version: Optional[str] = None, mmap_mode: Optional[str] = "r") -> ModelVersion:
+        """Load a version (the current one by default) from disk"""
+        version = version or self.current_version(name)
+        if version is None:
+            raise FileNotFoundError(f"No saved versions of model {name}")
+        version_dir = os.path.join(self._model_dir(name), version)
+        with open(os.path.join(version_dir, METADATA_FILE)) as handle:
+            metadata = json.load(handle)
+        artifacts = {
+            artifact_name: joblib.load(os.path.join(version_dir, artifact_name + ARTIFACT_SUFFIX), mmap_mode=mmap_mode)
+            for artifact_name in metadata.get("artifacts", [])
+        }
+        self._stats["loads"] += 1
+        return ModelVersion(name, version, artifacts, metadata)
+
+    def current(self, name: str) -> Optional[ModelVersion]:
+        """
+        Active version for this process. CURRENT is re-read at most every
+        refresh_seconds; a changed pointer loads the new version and replaces
+        the cached one in a single assignment, so callers holding the previous
+        ModelVersion finish with it undisturbed.
+        """
+        now = time.monotonic()
+        checked_at = self._checked_at.get(name)
+        if checked_at is not None and now - checked_at < self.refresh_seconds:
+            return self._loaded.get(name)
+
+        with self._lock:
+            loaded = self._loaded.get(name)
+            self._checked_at[name] = now
+            self._stats["pointer_checks"] += 1
+            version = self.current_version(name)
+            if version is None or (loaded is not None and loaded.version == version):
+                return loaded
+            try:
+                fresh = self.load(name, version)
+            except Exception as e:
+                self.logger.error(f"Could not load {name} model version {version}: {str(e)}")
+                return loaded
+            if loaded is not None:
+                self._stats["swaps"] += 1
+            self._loaded[name] = fresh
+            return fresh
+
+    def publish(self, model: ModelVersion) -> None:
+        """Make a version this process just saved active without reading it back"""
+        with self._lock:
+            if model.name in self._loaded:
+                self._stats["swaps"] += 1
+            self._loaded[model.name] = model
+            self._checked_at[model.name] = time.monotonic()
+
+    def list_versions(self, name: str) -> List[Dict[str, Any]]:
+        """Saved versions, newest first"""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        current = self.current_version(name)
+        versions = []
+        for version in sorted(os.listdir(model_dir), reverse=True):
+            metadata_path = os.path.join(model_dir, version, METADATA_FILE)
+            if version.startswith(".") or not os.path.isfile(metadata_path):
+                continue
+            with open(metadata_path) as handle:
+                metadata = json.load(handle)
+            versions.append({
+                "version": version,
+                "created_at": metadata.get("created_at"),
+                "current": version == current,
+                "metrics": metadata.get("metrics", {}),
+            })
+        return versions
+
+    def prune(self, name: str) -> List[str]:
+        """Delete all but the newest keep_versions versions (the current one is always kept)"""
+        current = self.current_version(name)
+        removed = []
+        for entry in self.list_versions(name)[self.keep_versions:]:
+            if entry["version"] != current:
+                shutil.rmtree(os.path.join(self._model_dir(name), entry["version"]), ignore_errors=True)
+                removed.append(entry["version"])
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "root": self.root,
+            "loaded": {name: model.version for name, model in self._loaded.items()},
+            **self._stats,
+        }
@@ -22,6 +22,7 @@ import numpy as np
 from datetime import datetime
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import re
+from inference_batcher import MicroBatcher, register_batcher
 
 class OpenSourceAIEngine:
     """
@@ -47,6 +48,11 @@ class OpenSourceAIEngine:
         
         # Initialize models asynchronously
         self._initialize_models()
+        
+        # Concurrent response analyses share one emotion/embedding forward pass
+        self.response_batcher = register_batcher(MicroBatcher(
+            "oss_response_models", self._run_response_models_batch, max_batch_size=16, max_wait_ms=8
+        ))
     
     def _initialize_models(self):
         """Initialize all AI models"""
@@ -514,33 +520,24 @@ class OpenSourceAIEngine:
                 "overall_tone": "positive" if sentiment_scores['compound'] > 0.1 else "negative" if sentiment_scores['compound'] < -0.1 else "neutral"
             }
             
-            # Advanced emotion analysis if available
-            if 'emotion' in self.pipelines:
-                try:
-                    emotion_results = self.pipelines['emotion'](response)
-                    analysis["emotion_analysis"] = {
-                        "primary_emotion": emotion_results[0]['label'] if emotion_results else "neutral",
-                        "confidence": emotion_results[0]['score'] if emotion_results else 0.5,
-                        "emotions": emotion_results
-                    }
-                except Exception as e:
-                    logging.error(f"Emotion analysis failed: {str(e)}")
-                    analysis["emotion_analysis"] = {"primary_emotion": "neutral", "confidence": 0.5}
-            
-            # Relevance analysis using sentence similarity if available
-            if 'sentence_transformer' in self.models:
-                try:
-                    question_embedding = self.models['sentence_transformer'].encode([question])
-                    response_embedding = self.models['sentence_transformer'].encode([response])
-                    
-                    # Calculate cosine similarity
-                    similarity = np.dot(question_embedding[0], response_embedding[0]) / (
-                        np.linalg.norm(question_embedding[0]) * np.linalg.norm(response_embedding[0])
-                    )
-                    analysis["relevance"] = float(max(0.0, min(1.0, similarity)))
-                except Exception as e:
-                    logging.error(f"Relevance analysis failed: {str(e)}")
-                    analysis["relevance"] = 0.5
+            # Emotion and relevance models run micro-batched with concurrent requests
+            if 'emotion' in self.pipelines or 'sentence_transformer' in self.models:
+                model_outputs = await self.response_batcher.submit((response, question))
+                
+                if 'emotion' in self.pipelines:
+                    emotion_results = model_outputs.get("emotion")
+                    if emotion_results is None:
+                        analysis["emotion_analysis"] = {"primary_emotion": "neutral", "confidence": 0.5}
+                    else:
+                        analysis["emotion_analysis"] = {
+                            "primary_emotion": emotion_results[0]['label'] if emotion_results else "neutral",
+                            "confidence": emotion_results[0]['score'] if emotion_results else 0.5,
+                            "emotions": emotion_results
+                        }
+                
+                if 'sentence_transformer' in self.models:
+                    relevance = model_outputs.get("relevance")
+                    analysis["relevance"] = 0.5 if relevance is None else relevance
             
             # Extract key points (simple keyword extraction)
             response_lower = response.lower()
@@ -591,6 +588,40 @@ class OpenSourceAIEngine:
                 "strengths": []
             }
     
+    def _run_response_models_batch(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        One emotion pipeline pass and one sentence-transformer encode for a batch
+        of (response, question) pairs
+        """
+        outputs = [{} for _ in items]
+        responses = [response for response, _ in items]
+        questions = [question for _, question in items]
+        
+        if 'emotion' in self.pipelines:
+            try:
+                emotion_results = self.pipelines['emotion'](responses)
+                for output, result in zip(outputs, emotion_results):
+                    output["emotion"] = result if isinstance(result, list) else [result]
+            except Exception as e:
+                logging.error(f"Emotion analysis failed: {str(e)}")
+        
+        if 'sentence_transformer' in self.models:
+            try:
+                embeddings = self.models['sentence_transformer'].encode(questions + responses)
+                question_embeddings = embeddings[:len(items)]
+                response_embeddings = embeddings[len(items):]
+                
+                # Row-wise cosine similarity
+                similarity = np.sum(question_embeddings * response_embeddings, axis=1) / (
+                    np.linalg.norm(question_embeddings, axis=1) * np.linalg.norm(response_embeddings, axis=1)
+                )
+                for output, value in zip(outputs, similarity):
+                    output["relevance"] = float(max(0.0, min(1.0, value)))
+            except Exception as e:
+                logging.error(f"Relevance analysis failed: {str(e)}")
+        
+        return outputs
+    
     async def generate_interview_feedback(self, 
                                         candidate_responses: List[Dict[str, Any]],
                                         overall_performance: Dict[str, float]) -> Dict[str, Any]:
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+AI Question Analytics
+
+Analytics over AI-generated aptitude questions. The admin endpoint used to
+load every question matching an unanchored regex on metadata.source into
+memory and count in a Python loop.
+
+Key Features:
+- Normalized metadata.source_kind ("ai", "import", "template", "other")
+  stamped on insert and backfilled once, backed by an index
+- One $facet aggregation over the AI subset computes the source, topic,
+  difficulty and industry breakdowns plus quality/validation totals
+  server-side; memory is bounded by the number of distinct groups
+- Incremental counters in the aptitude_question_stats collection: inserts
+  and question updates apply $inc deltas, so reads are a single find_one.
+  The aggregation reconciles the counters (on first read, on request, or
+  after a bulk delete resets them); storage is shared with the question bank
+  stats (counter_documents)
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from counter_documents import field_key, load_counters, record_counter_delta, store_counters
+
+AI_ANALYTICS_STATS_ID = "ai_questions"
+SOURCE_KINDS = ("ai", "import", "template", "other")
+IMPORT_SOURCES = ("admin_bulk", "bulk_import", "import")
+HIGH_QUALITY_THRESHOLD = 0.8
+DEFAULT_SCORE = 0.5
+
+BREAKDOWNS = {
+    # counter name -> (document path, default)
+    "by_source": ("metadata.source", "unknown"),
+    "by_topic": ("topic", "unknown"),
+    "by_difficulty": ("difficulty", "unknown"),
+    "by_industry": ("metadata.industry", "general"),
+}
+VALIDATION_STATES = ("validated", "needs_validation", "failed_validation")
+
+
+def source_kind(source: Any) -> str:
+    if not source:
+        return "template"
+    source = str(source).lower()
+    if source.startswith("ai_"):
+        return "ai"
+    if source in IMPORT_SOURCES or source.startswith("import"):
+        return "import"
+    return "other"
+
+
+def tag_source_kind(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Stamp metadata.source_kind on a question document (in place)"""
+    metadata = doc.get("metadata")
+    if not isinstance(metadata, dict):
+        metadata = doc["metadata"] = {}
+    metadata["source_kind"] = source_kind(metadata.get("source"))
+    return doc
+
+
+def _lookup(doc: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def question_counters(doc: Dict[str, Any]) -> Dict[str, float]:
+    """Flat counter contributions of one question ({} unless it is AI-generated)"""
+    metadata = doc.get("metadata") or {}
+    if source_kind(metadata.get("source")) != "ai":
+        return {}
+    counters: Dict[str, float] = {"total": 1}
+    for name, (path, default) in BREAKDOWNS.items():
+        value = _lookup(doc, path)
+        counters[f"{name}.{field_key(default if value is None else value)}"] = 1
+
+    quality_validation = metadata.get("quality_validation") or {}
+    quality_score = quality_validation.get("quality_score", DEFAULT_SCORE)
+    counters["quality_score_sum"] = quality_score
+    counters["job_relevance_sum"] = metadata.get("job_relevance_score", DEFAULT_SCORE)
+    if quality_score >= HIGH_QUALITY_THRESHOLD:
+        counters["high_quality_count"] = 1
+    if metadata.get("contextual_enhancement"):
+        counters["contextual_questions"] = 1
+    if not quality_validation:
+        counters["validation.needs_validation"] = 1
+    elif quality_validation.get("valid", False):
+        counters["validation.validated"] = 1
+    else:
+        counters["validation.failed_validation"] = 1
+    return counters
+
+
+def counter_delta(removed: Iterable[Dict[str, Any]] = (), added: Iterable[Dict[str, Any]] = ()) -> Dict[str, float]:
+    """Non-zero $inc delta for replacing the removed questions with the added ones"""
+    delta: Dict[str, float] = {}
+    for sign, docs in ((-1, removed), (1, added)):
+        for doc in docs:
+            for key, value in question_counters(doc).items():
+                delta[key] = delta.get(key, 0) + sign * value
+    return {key: value for key, value in delta.items() if value}
+
+
+async def ensure_question_analytics_indexes(db):
+    await db.aptitude_questions.create_index([("metadata.source_kind", 1)])
+
+
+async def backfill_source_kind(db) -> int:
+    """Stamp source_kind on questions stored before the field existed"""
+    missing = {"metadata.source_kind": {"$exists": False}}
+    updated = 0
+    for kind, match in (
+        ("ai", {"metadata.source": {"$regex": "^ai_", "$options": "i"}}),
+        ("import", {"$or": [{"metadata.source": {"$in": list(IMPORT_SOURCES)}},
+                            {"metadata.source": {"$regex": "^import", "$options": "i"}}]}),
+        ("template", {"$or": [{"metadata.source": {"$exists": False}}, {"metadata.source": {"$in": [None, ""]}}]}),
+        ("other", {}),
+    ):
+        result = await db.aptitude_questions.update_many({**missing, **match}, {"$set": {"metadata.source_kind": kind}})
+        updated += result.modified_count
+    return updated
+
+
+async def record_questions(db, removed: Iterable[Dict[str, Any]] = (), added: Iterable[Dict[str, Any]] = ()):
+    """Apply inserted/updated questions to the counters (no-op until they have been reconciled once)"""
+    await record_counter_delta(db, AI_ANALYTICS_STATS_ID, counter_delta(removed, added))
+
+
+async def reset_question_analytics(db):
+    """Empty counters after the whole bank was deleted"""
+    await store_counters(db, AI_ANALYTICS_STATS_ID, {})
+
+
+def _truthy(expression: Any) -> Dict[str, Any]:
+    return {"$not": [{"$in": [{"$ifNull": [expression, False]}, [False, 0, ""]]}]}
+
+
+def build_ai_analytics_pipeline():
+    quality_validation = {"$ifNull": ["$metadata.quality_validation", {}]}
+    quality_score = {"$ifNull": ["$metadata.quality_validation.quality_score", DEFAULT_SCORE]}
+    has_validation = {"$gt": [{"$size": {"$objectToArray": quality_validation}}, 0]}
+    facets = {
+        name: [{"$group": {"_id": {"$ifNull": [f"${path}", default]}, "count": {"$sum": 1}}}]
+        for name, (path, default) in BREAKDOWNS.items()
+    }
+    facets["totals"] = [{"$group": {
+        "_id": None,
+        "total": {"$sum": 1},
+        "quality_score_sum": {"$sum": quality_score},
+        "job_relevance_sum": {"$sum": {"$ifNull": ["$metadata.job_relevance_score", DEFAULT_SCORE]}},
+        "high_quality_count": {"$sum": {"$cond": [{"$gte": [quality_score, HIGH_QUALITY_THRESHOLD]}, 1, 0]}},
+        "contextual_questions": {"$sum": {"$cond": [_truthy("$metadata.contextual_enhancement"), 1, 0]}},
+        "validated": {"$sum": {"$cond": [
+            {"$and": [has_validation, _truthy("$metadata.quality_validation.valid")]}, 1, 0]}},
+        "failed_validation": {"$sum": {"$cond": [
+            {"$and": [has_validation, {"$not": [_truthy("$metadata.quality_validation.valid")]}]}, 1, 0]}},
+        "needs_validation": {"$sum": {"$cond": [has_validation, 0, 1]}},
+    }}]
+    return [{"$match": {"metadata.source_kind": "ai"}}, {"$facet": facets}]
+
+
+def counters_from_facet(result: Dict[str, Any]) -> Dict[str, Any]:
+    totals = (result.get("totals") or [{}])[0]
+    counters: Dict[str, Any] = {
+        name: {field_key(group["_id"]): group["count"] for group in result.get(name, [])}
+        for name in BREAKDOWNS
+    }
+    for key in ("total", "quality_score_sum", "job_relevance_sum", "high_quality_count", "contextual_questions"):
+        counters[key] = totals.get(key, 0)
+    counters["validation"] = {state: totals.get(state, 0) for state in VALIDATION_STATES}
+    return counters
+
+
+async def compute_ai_analytics_counters(db) -> Dict[str, Any]:
+    results = await db.aptitude_questions.aggregate(build_ai_analytics_pipeline()).to_list(1)
+    return counters_from_facet(results[0] if results else {})
+
+
+async def reconcile_ai_analytics(db) -> Dict[str, Any]:
+    """Rebuild the counters from one aggregation"""
+    return await store_counters(db, AI_ANALYTICS_STATS_ID, await compute_ai_analytics_counters(db))
+
+
+def format_ai_analytics(counters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Endpoint analytics/summary from counters (None when there are no AI questions)"""
+    total = counters.get("total", 0)
+    if total <= 0:
+        return None
+    validation = counters.get("validation", {})
+    analytics = {
+        "total_ai_questions": total,
+        **{name: {key: count for key, count in counters.get(name, {}).items() if count > 0} for name in BREAKDOWNS},
+        "quality_metrics": {
+            "average_quality_score": round(counters.get("quality_score_sum", 0) / total, 3),
+            "average_job_relevance": round(counters.get("job_relevance_sum", 0) / total, 3),
+            "high_quality_count": counters.get("high_quality_count", 0),
+            "contextual_questions": counters.get("contextual_questions", 0)
+        },
+        "validation_status": {state: validation.get(state, 0) for state in VALIDATION_STATES}
+    }
+    return {
+        "analytics": analytics,
+        "summary": {
+            "total_questions": total,
+            "contextual_percentage": round(analytics["quality_metrics"]["contextual_questions"] / total * 100, 1),
+            "high_quality_percentage": round(analytics["quality_metrics"]["high_quality_count"] / total * 100, 1),
+            "validation_coverage": round(analytics["validation_status"]["validated"] / total * 100, 1)
+        }
+    }
+
+
+async def get_ai_analytics(db, refresh: bool = False) -> Dict[str, Any]:
+    """Analytics from the maintained counters, or from a fresh aggregation when refresh=True or not yet reconciled"""
+    stats = await load_counters(db, AI_ANALYTICS_STATS_ID, compute_ai_analytics_counters, refresh)
+    return {
+        "computed_from": stats["computed_from"],
+        "reconciled_at": stats["reconciled_at"],
+        "report": format_ai_analytics(stats["counters"])
+    }
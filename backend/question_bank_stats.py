@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Aptitude Question Bank Statistics
+
+The admin stats endpoint and the seeding flow used to recount the question
+bank with one count_documents per topic and per difficulty on every call.
+
+Key Features:
+- Per-(topic, subtopic, difficulty, question_type) counters in a single
+  aptitude_question_stats document, maintained with $inc by every insert,
+  import, update and delete path, so stats reads are one find_one
+- Reconciliation rebuilds the counters with one $group aggregation: at
+  startup when they have never been built, on request, and periodically to
+  absorb drift (e.g. writes racing a reconciliation, or manual edits)
+- Counters are only incremented once reconciled, so a partial history is
+  never mistaken for the full bank (counter_documents)
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Iterable, List
+
+from counter_documents import field_key, load_counters, record_counter_delta, store_counters
+
+QUESTION_BANK_STATS_ID = "question_bank"
+QUESTION_BANK_RECONCILE_INTERVAL_SECONDS = int(os.environ.get("QUESTION_BANK_RECONCILE_INTERVAL_SECONDS", "21600"))
+
+CELL_FIELDS = ("topic", "subtopic", "difficulty", "question_type")
+CELL_SEPARATOR = "|"
+UNKNOWN = "unknown"
+
+
+def cell_key(doc: Dict[str, Any]) -> str:
+    return CELL_SEPARATOR.join(field_key(UNKNOWN if doc.get(field) is None else doc.get(field),
+                                         empty=UNKNOWN, reserved=CELL_SEPARATOR)
+                               for field in CELL_FIELDS)
+
+
+def bank_delta(removed: Iterable[Dict[str, Any]] = (), added: Iterable[Dict[str, Any]] = ()) -> Dict[str, int]:
+    """Non-zero $inc delta for replacing the removed questions with the added ones"""
+    delta: Dict[str, int] = {}
+    for sign, docs in ((-1, removed), (1, added)):
+        for doc in docs:
+            delta["total"] = delta.get("total", 0) + sign
+            key = f"cells.{cell_key(doc)}"
+            delta[key] = delta.get(key, 0) + sign
+    return {key: value for key, value in delta.items() if value}
+
+
+async def record_bank_changes(db, removed: Iterable[Dict[str, Any]] = (), added: Iterable[Dict[str, Any]] = ()):
+    """Apply inserted/updated/deleted questions to the counters (no-op until they have been reconciled once)"""
+    await record_counter_delta(db, QUESTION_BANK_STATS_ID, bank_delta(removed, added))
+
+
+async def reset_bank_stats(db):
+    """Empty counters after the whole bank was deleted"""
+    await store_counters(db, QUESTION_BANK_STATS_ID, {"total": 0, "cells": {}})
+
+
+def build_bank_stats_pipeline() -> List[Dict[str, Any]]:
+    return [{"$group": {
+        "_id": {field: {"$ifNull": [f"${field}", UNKNOWN]} for field in CELL_FIELDS},
+        "count": {"$sum": 1}
+    }}]
+
+
+def counters_from_groups(groups: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    cells: Dict[str, int] = {}
+    for group in groups:
+        key = cell_key(group["_id"])
+        cells[key] = cells.get(key, 0) + group["count"]
+    return {"total": sum(cells.values()), "cells": cells}
+
+
+async def compute_bank_counters(db) -> Dict[str, Any]:
+    groups = await db.aptitude_questions.aggregate(build_bank_stats_pipeline()).to_list(length=None)
+    return counters_from_groups(groups)
+
+
+async def reconcile_bank_stats(db) -> Dict[str, Any]:
+    """Rebuild the counters from one aggregation"""
+    return await store_counters(db, QUESTION_BANK_STATS_ID, await compute_bank_counters(db))
+
+
+def summarize_bank_stats(counters: Dict[str, Any], topics: Iterable[str] = (),
+                         difficulties: Iterable[str] = ()) -> Dict[str, Any]:
+    """Breakdowns from the cell counters; listed topics/difficulties are reported even when empty"""
+    by_topic = {topic: 0 for topic in topics}
+    by_difficulty = {difficulty: 0 for difficulty in difficulties}
+    by_subtopic: Dict[str, Dict[str, int]] = {}
+    by_type: Dict[str, int] = {}
+    cells = []
+    for key, count in sorted((counters.get("cells") or {}).items()):
+        if count <= 0:
+            continue
+        topic, subtopic, difficulty, question_type = key.split(CELL_SEPARATOR)
+        by_topic[topic] = by_topic.get(topic, 0) + count
+        by_difficulty[difficulty] = by_difficulty.get(difficulty, 0) + count
+        by_type[question_type] = by_type.get(question_type, 0) + count
+        topic_subtopics = by_subtopic.setdefault(topic, {})
+        topic_subtopics[subtopic] = topic_subtopics.get(subtopic, 0) + count
+        cells.append({"topic": topic, "subtopic": subtopic, "difficulty": difficulty,
+                      "question_type": question_type, "count": count})
+    return {
+        "total": counters.get("total", 0),
+        "by_topic": by_topic,
+        "by_difficulty": by_difficulty,
+        "by_subtopic": by_subtopic,
+        "by_type": by_type,
+        "cells": cells
+    }
+
+
+async def get_bank_counters(db, refresh: bool = False) -> Dict[str, Any]:
+    """{"counters", "reconciled_at", "computed_from"}: the maintained counters, reconciled first when refresh=True or never built"""
+    return await load_counters(db, QUESTION_BANK_STATS_ID, compute_bank_counters, refresh)
+
+
+async def reconcile_bank_stats_loop(db):
+    """Periodic reconciliation (disabled when the interval is 0)"""
+    if QUESTION_BANK_RECONCILE_INTERVAL_SECONDS <= 0:
+        return
+    while True:
+        await asyncio.sleep(QUESTION_BANK_RECONCILE_INTERVAL_SECONDS)
+        try:
+            result = await reconcile_bank_stats(db)
+            logging.info(f"Question bank stats reconciled: {result['counters'].get('total', 0)} questions")
+        except Exception as e:
+            logging.error(f"Question bank stats reconciliation failed: {e}")
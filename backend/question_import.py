@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Streaming Aptitude Question Import
+
+Bulk import used to take one JSON array, validate it in a loop, abort on the
+first invalid item and insert everything with one insert_many, with no way
+to tell that a question was already in the bank.
+
+Key Features:
+- NDJSON and CSV request bodies of any size are read incrementally; only
+  the current and the previous chunk of rows are held in memory, and the
+  per-row report is streamed back as NDJSON
+- Each chunk is validated in slices on a thread pool while the previous
+  chunk is being written, so parsing/validation overlaps the database writes
+- Normalized content hash (case-folded, whitespace-collapsed question text
+  plus the sorted options) backed by a partial unique index; duplicates of
+  banked questions, and repeats within the import, are reported per row
+- Unordered bulk_write per chunk: a bad row never blocks the rest
+"""
+
+import asyncio
+import codecs
+import csv
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+IMPORT_CHUNK_SIZE = int(os.environ.get("QUESTION_IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_VALIDATION_WORKERS = int(os.environ.get("QUESTION_IMPORT_VALIDATION_WORKERS", "4"))
+IMPORT_MAX_ROW_BYTES = int(os.environ.get("QUESTION_IMPORT_MAX_ROW_BYTES", "65536"))
+
+IMPORT_FORMATS = ("ndjson", "csv")
+IMPORT_REPORT_MODES = ("all", "errors", "summary")
+IMPORT_STATUSES = ("inserted", "duplicate", "invalid", "error")
+CSV_LIST_SEPARATOR = "|"
+DUPLICATE_KEY_ERROR = 11000
+
+IMPORT_EXECUTOR = ThreadPoolExecutor(max_workers=IMPORT_VALIDATION_WORKERS, thread_name_prefix="question-import")
+
+# One CSV record, converted on the worker threads
+CsvRecord = namedtuple("CsvRecord", ["header", "record"])
+
+
+class ImportFormatError(ValueError):
+    """Unreadable import stream or unknown format"""
+
+
+class InvalidQuestionRow(ValueError):
+    def __init__(self, errors: List[str]):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+# ----- Content hash -----
+
+def normalize_content(text: Any) -> str:
+    return " ".join(unicodedata.normalize("NFKC", str(text or "")).casefold().split())
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    """Hash of the question text and option set, insensitive to case, spacing and option order"""
+    payload = [normalize_content(doc.get("question_text")),
+               sorted(normalize_content(option) for option in doc.get("options") or [])]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+def stamp_content_hash(doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc["content_hash"] = content_hash(doc)
+    return doc
+
+
+async def ensure_content_hash_index(db):
+    # Partial so questions stored before hashing (or duplicates left unhashed by the backfill) don't collide
+    await db.aptitude_questions.create_index(
+        [("content_hash", 1)], unique=True, partialFilterExpression={"content_hash": {"$exists": True}}
+    )
+
+
+async def backfill_content_hash(db, batch_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, int]:
+    """Hash questions stored before the field existed; existing duplicates stay unhashed"""
+    hashed = duplicates = 0
+    cursor = db.aptitude_questions.find({"content_hash": {"$exists": False}},
+                                        {"_id": 1, "question_text": 1, "options": 1}).sort("_id", 1)
+    batch: List[UpdateOne] = []
+
+    async def flush():
+        nonlocal hashed, duplicates
+        try:
+            result = await db.aptitude_questions.bulk_write(batch, ordered=False)
+            hashed += result.modified_count
+        except BulkWriteError as e:
+            hashed += e.details.get("nModified", 0)
+            duplicates += sum(1 for error in e.details.get("writeErrors", []) if error.get("code") == DUPLICATE_KEY_ERROR)
+        batch.clear()
+
+    async for doc in cursor:
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"content_hash": content_hash(doc)}}))
+        if len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    if duplicates:
+        logging.warning(f"Question content hash backfill: {duplicates} existing duplicates left unhashed")
+    return {"hashed": hashed, "duplicates": duplicates}
+
+
+# ----- Writes -----
+
+class WriteOutcome:
+    """Result of an unordered insert, by position in the submitted batch"""
+    __slots__ = ("inserted", "duplicates", "errors")
+
+    def __init__(self, inserted: List[Dict[str, Any]], duplicates: set, errors: Dict[int, str]):
+        self.inserted = inserted
+        self.duplicates = duplicates
+        self.errors = errors
+
+
+async def write_questions(collection, docs: List[Dict[str, Any]]) -> WriteOutcome:
+    """Unordered bulk insert; duplicate-key and other per-document failures are reported, not raised"""
+    if not docs:
+        return WriteOutcome([], set(), {})
+    failed: Dict[int, Dict[str, Any]] = {}
+    try:
+        await collection.bulk_write([InsertOne(doc) for doc in docs], ordered=False)
+    except BulkWriteError as e:
+        failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        if not failed:
+            raise
+    duplicates = {index for index, error in failed.items() if error.get("code") == DUPLICATE_KEY_ERROR}
+    errors = {index: error.get("errmsg", "write failed") for index, error in failed.items() if index not in duplicates}
+    return WriteOutcome([doc for index, doc in enumerate(docs) if index not in failed], duplicates, errors)
+
+
+# ----- Stream parsing -----
+
+def detect_import_format(fmt: Optional[str], content_type: Optional[str]) -> str:
+    if fmt:
+        fmt = fmt.strip().lower()
+        if fmt in ("jsonl", "json"):
+            fmt = "ndjson"
+        if fmt not in IMPORT_FORMATS:
+            raise ImportFormatError(f"Unknown format '{fmt}', expected one of {', '.join(IMPORT_FORMATS)}")
+        return fmt
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    raise ImportFormatError("Cannot detect import format; pass format=ndjson|csv or a matching Content-Type")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decoded lines of a byte stream, without line terminators"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+            if len(buffer) > IMPORT_MAX_ROW_BYTES:
+                raise ImportFormatError(f"Line exceeds {IMPORT_MAX_ROW_BYTES} bytes")
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"Import is not valid UTF-8: {e}")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """(line number, raw JSON line) for each non-blank line"""
+    row = 0
+    async for line in lines:
+        row += 1
+        if line.strip():
+            yield row, line
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """(record number after the header, CsvRecord); quoted fields may span lines"""
+    header, record, row = None, None, 0
+    async for line in lines:
+        record = line if record is None else f"{record}\n{line}"
+        if record.count('"') % 2:
+            if len(record) > IMPORT_MAX_ROW_BYTES:
+                raise ImportFormatError(f"CSV record exceeds {IMPORT_MAX_ROW_BYTES} bytes")
+            continue
+        if not record.strip():
+            record = None
+            continue
+        if header is None:
+            header = [name.strip() for name in next(csv.reader([record]))]
+            if "question_text" not in header:
+                raise ImportFormatError("CSV header must include question_text")
+        else:
+            row += 1
+            yield row, CsvRecord(header, record)
+        record = None
+    if record is not None:
+        raise ImportFormatError("CSV ends inside a quoted field")
+
+
+def iter_import_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    lines = iter_lines(chunks)
+    return iter_csv_rows(lines) if fmt == "csv" else iter_ndjson_rows(lines)
+
+
+def csv_record_to_question(record: CsvRecord) -> Dict[str, Any]:
+    values = next(csv.reader([record.record]), [])
+    if len(values) != len(record.header):
+        raise InvalidQuestionRow([f"expected {len(record.header)} columns, got {len(values)}"])
+    data: Dict[str, Any] = {}
+    for name, value in zip(record.header, values):
+        value = value.strip()
+        if not name or not value:
+            continue
+        if name == "options":
+            data[name] = json.loads(value) if value.startswith("[") else [
+                option.strip() for option in value.split(CSV_LIST_SEPARATOR)]
+        elif name == "metadata":
+            data[name] = json.loads(value)
+        else:
+            data[name] = value
+    return data
+
+
+# ----- Pipeline -----
+
+def _error_messages(error: Exception) -> List[str]:
+    if isinstance(error, InvalidQuestionRow):
+        return error.errors
+    details = getattr(error, "errors", None)
+    if callable(details):
+        # pydantic ValidationError
+        try:
+            return [f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in details()]
+        except Exception:
+            pass
+    return [str(error)]
+
+
+def _prepare_rows(rows: List[Tuple[int, Any]], prepare: Callable[[Dict[str, Any]], Dict[str, Any]]):
+    """(row, document or None, errors or None) for each row; runs on a worker thread"""
+    results = []
+    for row, payload in rows:
+        try:
+            if isinstance(payload, str):
+                data = json.loads(payload)
+            elif isinstance(payload, CsvRecord):
+                data = csv_record_to_question(payload)
+            else:
+                data = payload
+            if not isinstance(data, dict):
+                raise InvalidQuestionRow(["row is not an object"])
+            results.append((row, stamp_content_hash(prepare(data)), None))
+        except (ValueError, TypeError) as e:
+            results.append((row, None, _error_messages(e)))
+    return results
+
+
+async def _validate_chunk(rows, prepare):
+    loop = asyncio.get_running_loop()
+    size = max(1, -(-len(rows) // IMPORT_VALIDATION_WORKERS))
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(IMPORT_EXECUTOR, _prepare_rows, rows[i:i + size], prepare)
+        for i in range(0, len(rows), size)
+    ))
+    return [result for part in parts for result in part]
+
+
+async def _write_chunk(validated, insert) -> List[Dict[str, Any]]:
+    outcome = await insert([doc for _, doc, _ in validated if doc is not None])
+    reports, position = [], 0
+    for row, doc, errors in validated:
+        if doc is None:
+            reports.append({"row": row, "status": "invalid", "errors": errors})
+            continue
+        if position in outcome.duplicates:
+            reports.append({"row": row, "status": "duplicate", "content_hash": doc["content_hash"]})
+        elif position in outcome.errors:
+            reports.append({"row": row, "status": "error", "errors": [outcome.errors[position]]})
+        else:
+            reports.append({"row": row, "status": "inserted", "id": doc.get("id")})
+        position += 1
+    return reports
+
+
+async def import_questions(rows: AsyncIterator[Tuple[int, Any]],
+                           prepare: Callable[[Dict[str, Any]], Dict[str, Any]],
+                           insert: Callable[[List[Dict[str, Any]]], Any],
+                           chunk_size: int = IMPORT_CHUNK_SIZE) -> AsyncIterator[Dict[str, Any]]:
+    """Per-row reports in input order.
+
+    prepare turns one row into a question document (raising ValueError when
+    invalid) and runs on worker threads; insert writes a batch and returns a
+    WriteOutcome. The next chunk is read and validated while the previous
+    one is being written.
+    """
+    writing, chunk, stream_error = None, [], None
+    try:
+        async for item in rows:
+            chunk.append(item)
+            if len(chunk) < chunk_size:
+                continue
+            validated = await _validate_chunk(chunk, prepare)
+            chunk = []
+            if writing is not None:
+                for report in await writing:
+                    yield report
+            writing = asyncio.ensure_future(_write_chunk(validated, insert))
+    except ImportFormatError as e:
+        # Rows read before the stream error are still written and reported, then the error surfaces
+        stream_error = e
+    if writing is not None:
+        for report in await writing:
+            yield report
+    if chunk:
+        for report in await _write_chunk(await _validate_chunk(chunk, prepare), insert):
+            yield report
+    if stream_error is not None:
+        raise stream_error
+
+
+async def import_report_lines(rows: AsyncIterator[Tuple[int, Any]], prepare, insert,
+                              report: str = "all") -> AsyncIterator[bytes]:
+    """NDJSON response body: per-row reports (all, or errors only) followed by a summary line"""
+    summary: Dict[str, Any] = {status: 0 for status in IMPORT_STATUSES}
+    summary["rows"] = 0
+    try:
+        async for row_report in import_questions(rows, prepare, insert):
+            summary["rows"] += 1
+            summary[row_report["status"]] += 1
+            if report == "all" or (report == "errors" and row_report["status"] != "inserted"):
+                yield (json.dumps(row_report, default=str) + "\n").encode()
+    except ImportFormatError as e:
+        summary["error_message"] = str(e)
+    except Exception as e:
+        logging.error(f"Question import failed: {e}")
+        summary["error_message"] = "Import failed"
+    summary["success"] = "error_message" not in summary
+    yield (json.dumps({"summary": summary}) + "\n").encode()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Question Index
+
+Template seeding, AI generation and AI refinement used to add questions
+without checking for paraphrases already in the bank, so the same item was
+exposed under several wordings and skewed calibration. Exact repeats are
+caught by the content hash (question_import); this module catches near ones.
+
+Key Features:
+- Shingles: the words of the normalized stem (case-folded, punctuation and
+  stop words removed) plus one token per option, hashed into a
+  96-permutation MinHash signature (device_similarity). Word sets survive
+  reordering and rephrasing ("A train covers 120 km in 2 hours. Find its
+  average speed" vs "What is the average speed of a train that travels
+  120 km in 2 hours?")
+- Template variants ("120 km in 2 hours" vs "150 km in 3 hours") are kept
+  apart explicitly: a near-duplicate must also have the same numbers in its
+  stem and the same option set (options compare by their numbers when they
+  have any, so "60" and "60 km/h" are the same option)
+- LSH band keys (32 bands x 3 rows) stored on each question in an indexed
+  multikey field, maintained on insert and backfilled at startup (and
+  re-stamped when QUESTION_MINHASH_VERSION changes); a lookup is one indexed
+  $in query, so screening stays sub-linear in the bank size
+- NearDuplicateGuard screens generated questions against the bank and
+  against earlier accepted questions of the same request (check() looks,
+  accept() records a question once it will really be inserted);
+  each band keeps the NEAR_DUPLICATE_MAX_CANDIDATES banked questions that
+  share the most bands with the batch
+- cluster_near_duplicates(): one pass over the stored band keys with
+  union-find (run in a worker thread), returning groups of near-identical
+  questions
+
+Two questions with Jaccard similarity s share a band with probability
+1 - (1 - s^3)^32 (~0.99 at s=0.5, ~0.58 at s=0.3); candidates are then kept
+only if their signature agreement reaches the threshold and their numbers
+and options match.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from device_similarity import MinHasher, band_keys, feature_hashes
+from question_import import normalize_content
+
+QUESTION_MINHASH_VERSION = 2
+QUESTION_MINHASH_PERM = 96
+QUESTION_MINHASH_BANDS = 32
+QUESTION_MINHASH_SEED = 50
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.5"))
+NEAR_DUPLICATE_MAX_CANDIDATES = int(os.environ.get("NEAR_DUPLICATE_MAX_CANDIDATES", "200"))
+NEAR_DUPLICATE_BACKFILL_BATCH = int(os.environ.get("NEAR_DUPLICATE_BACKFILL_BATCH", "1000"))
+
+QUESTION_HASHER = MinHasher(QUESTION_MINHASH_PERM, seed=QUESTION_MINHASH_SEED)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+STOP_WORDS = frozenset(
+    "a an the is are was were be of in on at to for by with from and or if its it this that "
+    "what which who how find calculate".split()
+)
+_UINT64 = 1 << 64
+_INT64_MAX = (1 << 63) - 1
+
+
+def _normalize(text: Any) -> str:
+    return normalize_content(_PUNCTUATION.sub(" ", normalize_content(text)))
+
+
+def _option_token(option: Any) -> str:
+    numbers = _NUMBER.findall(str(option))
+    return " ".join(numbers) if numbers else _normalize(option)
+
+
+def question_shingles(doc: Dict[str, Any]) -> List[str]:
+    shingles = {f"w:{word}" for word in _normalize(doc.get("question_text")).split() if word not in STOP_WORDS}
+    shingles.update(f"o:{_option_token(option)}" for option in doc.get("options") or [])
+    return sorted(shingles)
+
+
+def variant_key(doc: Dict[str, Any]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(numbers in the stem, option set): near-duplicates must agree on both"""
+    numbers = tuple(sorted(_NUMBER.findall(str(doc.get("question_text") or ""))))
+    return numbers, tuple(sorted({_option_token(option) for option in doc.get("options") or []}))
+
+
+def question_signature(doc: Dict[str, Any]) -> np.ndarray:
+    return QUESTION_HASHER.signature(feature_hashes(question_shingles(doc)))
+
+
+def signature_bands(signature: np.ndarray) -> List[int]:
+    """LSH band keys as signed 64-bit integers (BSON int64)"""
+    return [key - _UINT64 if key > _INT64_MAX else key
+            for key in (int(key) for key in band_keys(signature, QUESTION_MINHASH_BANDS)[0])]
+
+
+def stamp_minhash(doc: Dict[str, Any]) -> np.ndarray:
+    """Store the signature and band keys on a question document (in place)"""
+    signature = question_signature(doc)
+    doc["minhash_signature"] = signature.tobytes()
+    doc["minhash_bands"] = signature_bands(signature)
+    doc["minhash_version"] = QUESTION_MINHASH_VERSION
+    return signature
+
+
+def stored_signature(doc: Dict[str, Any]) -> Optional[np.ndarray]:
+    raw = doc.get("minhash_signature")
+    if doc.get("minhash_version") != QUESTION_MINHASH_VERSION or not raw or len(raw) != QUESTION_MINHASH_PERM * 4:
+        return None
+    return np.frombuffer(bytes(raw), dtype=np.uint32)
+
+
+def stored_bands(doc: Dict[str, Any], signature: np.ndarray) -> List[int]:
+    bands = doc.get("minhash_bands")
+    if not bands or len(bands) != QUESTION_MINHASH_BANDS:
+        return signature_bands(signature)
+    return list(bands)
+
+
+def estimated_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float((a == b).mean())
+
+
+async def ensure_near_duplicate_index(db):
+    await db.aptitude_questions.create_index([("minhash_bands", 1)])
+
+
+async def backfill_minhash(db, batch_size: int = NEAR_DUPLICATE_BACKFILL_BATCH) -> int:
+    """Index questions stored before signatures existed, or signed with an older shingle scheme"""
+    updated = 0
+    batch: List[UpdateOne] = []
+    cursor = db.aptitude_questions.find({"minhash_version": {"$ne": QUESTION_MINHASH_VERSION}},
+                                        {"_id": 1, "question_text": 1, "options": 1})
+    async for doc in cursor:
+        signature = question_signature(doc)
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "minhash_signature": signature.tobytes(), "minhash_bands": signature_bands(signature),
+            "minhash_version": QUESTION_MINHASH_VERSION}}))
+        if len(batch) >= batch_size:
+            updated += (await db.aptitude_questions.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await db.aptitude_questions.bulk_write(batch, ordered=False)).modified_count
+    return updated
+
+
+# (summary, signature, variant key) of a question a new one is compared with
+Candidate = Tuple[Dict[str, Any], np.ndarray, Tuple[Tuple[str, ...], Tuple[str, ...]]]
+
+
+class NearDuplicateGuard:
+    """
+    Screens a batch of new questions against the bank and against each other.
+    Keep one guard per generation request so paraphrases produced within the
+    same request are caught before any of them is inserted.
+    """
+
+    def __init__(self, collection, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                 exclude_ids: Iterable[str] = ()):
+        self.collection = collection
+        self.threshold = threshold
+        self.exclude_ids = set(exclude_ids)
+        self._accepted: Dict[int, List[Candidate]] = {}
+        self.rejected = 0
+
+    async def _banked(self, bands: Iterable[int]) -> Dict[int, List[Candidate]]:
+        bands = list(set(bands))
+        by_band: Dict[int, List[Candidate]] = {}
+        if not bands:
+            return by_band
+        wanted = set(bands)
+        # Per band, a min-heap of the candidates sharing the most bands with the batch:
+        # a crowded band can't push out a question that matches on several bands
+        heaps: Dict[int, List[Tuple[int, int, Candidate]]] = {}
+        order = itertools.count()
+        cursor = self.collection.find(
+            {"minhash_bands": {"$in": bands}},
+            {"_id": 0, "id": 1, "question_text": 1, "options": 1, "minhash_bands": 1, "minhash_signature": 1,
+             "minhash_version": 1}
+        )
+        async for banked in cursor:
+            signature = stored_signature(banked)
+            if signature is None or banked.get("id") in self.exclude_ids:
+                continue
+            shared = [band for band in banked.get("minhash_bands") or [] if band in wanted]
+            entry = (len(shared), next(order),
+                     ({"id": banked.get("id"), "question_text": banked.get("question_text")}, signature, variant_key(banked)))
+            for band in shared:
+                heap = heaps.setdefault(band, [])
+                if len(heap) < NEAR_DUPLICATE_MAX_CANDIDATES:
+                    heapq.heappush(heap, entry)
+                elif entry[0] > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+        for band, heap in heaps.items():
+            by_band[band] = [candidate for _, _, candidate in heap]
+        return by_band
+
+    def _best_match(self, signature: np.ndarray, key, bands: List[int],
+                    *candidate_maps: Dict[int, List[Candidate]]) -> Optional[Dict[str, Any]]:
+        best, best_similarity, seen = None, self.threshold, set()
+        for candidates in candidate_maps:
+            for band in bands:
+                for summary, other, other_key in candidates.get(band, ()):
+                    if id(summary) in seen:
+                        continue
+                    seen.add(id(summary))
+                    if other_key != key:
+                        continue
+                    similarity = estimated_similarity(signature, other)
+                    if similarity >= best_similarity:
+                        best, best_similarity = summary, similarity
+        if best is None:
+            return None
+        return {"near_duplicate_of": best.get("id"), "question_text": best.get("question_text"),
+                "similarity": round(best_similarity, 4)}
+
+    def accept(self, doc: Dict[str, Any]):
+        """Record a question that will be inserted, so later ones in the request are compared with it"""
+        signature = stored_signature(doc)
+        if signature is None:
+            signature = stamp_minhash(doc)
+        summary = {"id": doc.get("id"), "question_text": doc.get("question_text")}
+        for band in doc["minhash_bands"]:
+            self._accepted.setdefault(band, []).append((summary, signature, variant_key(doc)))
+
+    async def screen(self, docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(accepted documents, rejections); one indexed query for the whole batch, every survivor is accept()ed"""
+        signatures = [stamp_minhash(doc) for doc in docs]
+        banked = await self._banked(band for doc in docs for band in doc["minhash_bands"])
+        accepted, rejected = [], []
+        for doc, signature in zip(docs, signatures):
+            match = self._best_match(signature, variant_key(doc), doc["minhash_bands"], banked, self._accepted)
+            if match is not None:
+                rejected.append({"id": doc.get("id"), **match})
+                continue
+            accepted.append(doc)
+            self.accept(doc)
+        self.rejected += len(rejected)
+        return accepted, rejected
+
+    async def check(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        None when the question may be accepted, otherwise the near-duplicate it matched.
+        Nothing is recorded: call accept() once the question is actually kept.
+        """
+        signature = stamp_minhash(doc)
+        banked = await self._banked(doc["minhash_bands"])
+        match = self._best_match(signature, variant_key(doc), doc["minhash_bands"], banked, self._accepted)
+        if match is not None:
+            self.rejected += 1
+        return match
+
+
+async def find_near_duplicates(collection, doc: Dict[str, Any], threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                               exclude_ids: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """Closest banked near-duplicate of one question, if any"""
+    return await NearDuplicateGuard(collection, threshold, exclude_ids).check(doc)
+
+
+def cluster_signatures(records: List[Tuple[str, np.ndarray, List[int], Any]],
+                       threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[List[str]]:
+    """
+    Union-find over (id, signature, band keys, variant key) records: each question is compared
+    with the most recent NEAR_DUPLICATE_MAX_CANDIDATES questions of each of its bands
+    """
+    buckets: Dict[int, deque] = {}
+    parent: Dict[str, str] = {}
+
+    def find(question_id: str) -> str:
+        while parent[question_id] != question_id:
+            parent[question_id] = parent[parent[question_id]]
+            question_id = parent[question_id]
+        return question_id
+
+    for question_id, signature, bands, key in records:
+        parent[question_id] = question_id
+        compared = set()
+        for band in bands:
+            bucket = buckets.get(band)
+            if bucket is None:
+                bucket = buckets[band] = deque(maxlen=NEAR_DUPLICATE_MAX_CANDIDATES)
+            for other_id, other, other_key in bucket:
+                if other_id in compared:
+                    continue
+                compared.add(other_id)
+                if other_key != key:
+                    continue
+                root, other_root = find(question_id), find(other_id)
+                if root != other_root and estimated_similarity(signature, other) >= threshold:
+                    parent[other_root] = root
+            bucket.append((question_id, signature, key))
+
+    groups: Dict[str, List[str]] = {}
+    for question_id in parent:
+        groups.setdefault(find(question_id), []).append(question_id)
+    return sorted((members for members in groups.values() if len(members) > 1), key=len, reverse=True)
+
+
+async def cluster_near_duplicates(collection, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                                  query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """One pass over the bank's stored band keys; the CPU-bound grouping runs off the event loop"""
+    records: List[Tuple[str, np.ndarray, List[int], Any]] = []
+    seen = set()
+    cursor = collection.find(query or {}, {"_id": 0, "id": 1, "question_text": 1, "options": 1,
+                                           "minhash_signature": 1, "minhash_bands": 1, "minhash_version": 1})
+    async for doc in cursor:
+        question_id = doc.get("id")
+        if not question_id or question_id in seen:
+            continue
+        seen.add(question_id)
+        signature = stored_signature(doc)
+        if signature is None:
+            # Not backfilled yet
+            signature = question_signature(doc)
+        records.append((question_id, signature, stored_bands(doc, signature), variant_key(doc)))
+
+    clusters = await asyncio.get_running_loop().run_in_executor(
+        None,
+        lambda: cluster_signatures(records, threshold)
+    )
+    return {"scanned": len(records), "clusters": clusters}
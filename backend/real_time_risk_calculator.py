@@ -12,7 +12,8 @@ Key Features:
 - Real-time risk factor updates with sliding window analysis
 - Multi-level intervention alerts (LOW, MEDIUM, HIGH, CRITICAL)
 - Statistical confidence intervals for risk assessments
-- WebSocket support for live dashboard updates
+- Risk score changes published to admin WebSocket subscribers (risk_update_scheduler)
+- Event-driven continuous updates for sessions with new activity
 
 Author: AI Assistant
 Created: 2025
@@ -23,26 +24,22 @@ import logging
 import statistics
 import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple, Union
-from collections import defaultdict, deque
+from collections import defaultdict, deque, OrderedDict
 from dataclasses import dataclass, field
+import os
 import uuid
-import json
-import threading
-import time
 from scipy import stats
-from scipy.stats import norm, beta
+from scipy.stats import beta
 import warnings
 warnings.filterwarnings('ignore')
 
-# WebSocket support (will be implemented in Phase 2)
-try:
-    import websockets
-    WEBSOCKET_AVAILABLE = True
-except ImportError:
-    WEBSOCKET_AVAILABLE = False
-    logging.warning("WebSocket support not available - install websockets package for real-time updates")
+from risk_update_scheduler import ContinuousRiskScheduler, RiskUpdateBroker
+from session_features import SessionFeatureBundle, SessionFeatureCache
+from uncertainty import DEFAULT_RESAMPLES, DEFAULT_SEED, analytic_intervals, batch_bootstrap_intervals, level_key
+
+RISK_MONITORED_SESSIONS = int(os.environ.get("RISK_MONITORED_SESSIONS", "5000"))
 
 @dataclass
 class RiskFactor:
@@ -82,8 +79,15 @@ class RealTimeRiskCalculator:
     - Behavioral biometric analysis (when available)
     """
     
-    def __init__(self, anomaly_engine=None, statistical_analyzer=None):
-        """Initialize the Real-time Risk Calculator"""
+    def __init__(self, anomaly_engine=None, statistical_analyzer=None, broker: RiskUpdateBroker = None,
+                 session_loader=None, assessment_store=None):
+        """
+        Initialize the Real-time Risk Calculator
+        
+        broker: RiskUpdateBroker that receives risk score changes (a private one by default)
+        session_loader: optional async callable session_id -> session data dict (or None)
+        assessment_store: optional async callable (session_id, assessment) persisting scheduled updates
+        """
         self.logger = logging.getLogger(__name__)
         
         # Engine integrations
@@ -109,22 +113,27 @@ class RealTimeRiskCalculator:
         }
         
         # Real-time data structures
-        self.active_sessions = {}  # session_id -> session risk data
+        self.active_sessions = OrderedDict()  # monitored session_id -> monitoring metadata (LRU bounded)
+        self.max_monitored_sessions = RISK_MONITORED_SESSIONS
+        self.session_events = {}  # session_id -> recent responses recorded through mark_session_dirty
         self.risk_factor_history = defaultdict(lambda: deque(maxlen=100))  # Sliding window
         self.active_alerts = {}    # alert_id -> RiskAlert
         self.session_risk_cache = {}  # Performance optimization
+        self.feature_cache = SessionFeatureCache(max_sessions=RISK_MONITORED_SESSIONS)  # parsed features, rebuilt on new answers
         
         # Sliding window configuration
         self.window_size = 50  # Number of recent responses to consider
         self.update_interval = 30  # Update interval in seconds
         self.confidence_levels = [0.80, 0.90, 0.95, 0.99]
+        self.bootstrap_resamples = DEFAULT_RESAMPLES
+        self.bootstrap_seed = DEFAULT_SEED  # fixed seed: same score history -> same intervals
         
-        # Threading for continuous updates
-        self.update_thread = None
-        self.stop_updates = threading.Event()
-        
-        # WebSocket connections (for real-time dashboard)
-        self.websocket_connections = set()
+        # Session data source and event-driven continuous updates
+        self.session_loader = session_loader
+        self.assessment_store = assessment_store
+        self.broker = broker if broker is not None else RiskUpdateBroker()
+        self.scheduler = ContinuousRiskScheduler(self._periodic_risk_update)
+        self.score_change_epsilon = 0.01  # smaller changes are not published
         
         self.logger.info("RealTimeRiskCalculator initialized successfully")
     
@@ -148,6 +157,7 @@ class RealTimeRiskCalculator:
         """
         try:
             self.logger.info(f"Calculating composite risk score for session: {session_id}")
+            previous_assessment = self.session_risk_cache.get(session_id)
             
             # Get current session data
             session_data = await self._get_session_data(session_id)
@@ -162,6 +172,9 @@ class RealTimeRiskCalculator:
             if current_response_data:
                 session_data = self._update_session_with_current_response(session_data, current_response_data)
             
+            # Parse the session once for every analysis below
+            features = self.feature_cache.get(session_data)
+            
             # Collect risk factors from all engines
             risk_factors = []
             
@@ -172,7 +185,7 @@ class RealTimeRiskCalculator:
             
             # 2. Get risk factors from StatisticalAnomalyAnalyzer (Step 2.2)  
             if self.statistical_analyzer:
-                statistical_factors = await self._get_statistical_analyzer_risk_factors(session_data)
+                statistical_factors = await self._get_statistical_analyzer_risk_factors(features)
                 risk_factors.extend(statistical_factors)
             
             # 3. Get behavioral biometric risk factors
@@ -180,7 +193,7 @@ class RealTimeRiskCalculator:
             risk_factors.extend(behavioral_factors)
             
             # 4. Calculate response pattern risk factors
-            response_pattern_factors = await self._calculate_response_pattern_risk_factors(session_data)
+            response_pattern_factors = await self._calculate_response_pattern_risk_factors(features)
             risk_factors.extend(response_pattern_factors)
             
             # 5. Calculate timing irregularity factors
@@ -235,9 +248,11 @@ class RealTimeRiskCalculator:
                 'risk_factors': [rf.__dict__ if hasattr(rf, '__dict__') else rf for rf in risk_factors]
             })
             
-            # Send real-time updates via WebSocket (if available)
-            if WEBSOCKET_AVAILABLE:
-                await self._broadcast_risk_update(risk_assessment)
+            # Scored sessions are monitored for event-driven updates
+            self._monitor_session(session_id)
+            
+            # Publish the change to subscribed dashboards
+            await self._broadcast_risk_update(risk_assessment, previous_assessment)
             
             self.logger.info(f"Composite risk score calculated: {composite_score:.3f} ({risk_level}) for session {session_id}")
             return risk_assessment
@@ -319,7 +334,7 @@ class RealTimeRiskCalculator:
             })
             
             # Real-time dashboard update
-            if significant_change and WEBSOCKET_AVAILABLE:
+            if significant_change:
                 await self._broadcast_significant_change_alert(session_id, updated_assessment)
             
             self.logger.info(f"Risk factors updated continuously for session {session_id}: {previous_score:.3f} → {new_score:.3f}")
@@ -426,7 +441,7 @@ class RealTimeRiskCalculator:
             }
             
             # Real-time alert broadcasting
-            if rate_limited_alerts and WEBSOCKET_AVAILABLE:
+            if rate_limited_alerts:
                 await self._broadcast_alert_notifications(alert_summary)
             
             self.logger.info(f"Alert check completed for session {session_id}: {len(rate_limited_alerts)} alerts generated at {risk_level} level")
@@ -447,7 +462,7 @@ class RealTimeRiskCalculator:
         
         Features:
         - Multiple confidence levels (80%, 90%, 95%, 99%)
-        - Bootstrap and analytical confidence interval methods
+        - Seeded BCa bootstrap (one vectorized resample for all levels) and analytical methods
         - Uncertainty quantification in risk assessment
         - Confidence-based decision making support
         
@@ -484,87 +499,140 @@ class RealTimeRiskCalculator:
                     'current_samples': len(historical_scores)
                 }
             
-            confidence_intervals = {}
+            bootstrap_by_level = self._calculate_bootstrap_confidence_intervals([historical_scores])[0]
+            result = self._build_confidence_interval_result(session_id, historical_scores, bootstrap_by_level)
             
-            # Calculate confidence intervals for multiple confidence levels
-            for confidence_level in self.confidence_levels:
-                alpha = 1 - confidence_level
-                
-                # Method 1: Bootstrap confidence intervals
-                bootstrap_ci = self._calculate_bootstrap_confidence_interval(historical_scores, confidence_level)
-                
-                # Method 2: Analytical confidence intervals (assuming normal distribution)
-                analytical_ci = self._calculate_analytical_confidence_interval(historical_scores, confidence_level)
-                
-                # Method 3: Bayesian confidence intervals (if sufficient data)
-                bayesian_ci = self._calculate_bayesian_confidence_interval(historical_scores, confidence_level)
-                
-                confidence_intervals[f"{int(confidence_level*100)}%"] = {
-                    'confidence_level': float(confidence_level),
-                    'alpha': float(alpha),
-                    'bootstrap_method': bootstrap_ci,
-                    'analytical_method': analytical_ci,
-                    'bayesian_method': bayesian_ci,
-                    'recommended_method': self._select_best_ci_method(bootstrap_ci, analytical_ci, bayesian_ci),
-                    'interpretation': self._interpret_confidence_interval(bootstrap_ci, confidence_level)
-                }
+            self.logger.info(f"Confidence intervals generated for session {session_id} with {len(historical_scores)} samples")
+            return result
             
-            # Calculate uncertainty metrics
-            uncertainty_metrics = self._calculate_uncertainty_metrics(historical_scores, confidence_intervals)
+        except Exception as e:
+            self.logger.error(f"Error generating confidence intervals for session {session_id}: {str(e)}")
+            return {
+                'success': False,
+                'session_id': session_id,
+                'error': str(e),
+                'timestamp': datetime.utcnow().isoformat()
+            }
+
+    async def generate_confidence_intervals_batch(self, session_ids: List[str]) -> Dict[str, Any]:
+        """
+        Confidence intervals for many sessions from their recorded score histories
+        
+        Sessions are bootstrapped together (one resample-index matrix per history
+        length) in a worker thread; sessions with fewer than 5 scores are listed
+        in insufficient_data instead of being recalculated.
+        """
+        try:
+            histories = {session_id: self._get_historical_risk_scores(session_id) for session_id in dict.fromkeys(session_ids)}
+            eligible = [session_id for session_id, scores in histories.items() if len(scores) >= 5]
             
-            # Generate confidence-based recommendations
-            confidence_based_recommendations = self._generate_confidence_based_recommendations(
-                confidence_intervals, uncertainty_metrics
-            )
+            def calculate():
+                bootstrap_results = self._calculate_bootstrap_confidence_intervals([histories[s] for s in eligible])
+                return {
+                    session_id: self._build_confidence_interval_result(session_id, histories[session_id], bootstrap_by_level)
+                    for session_id, bootstrap_by_level in zip(eligible, bootstrap_results)
+                }
             
-            result = {
+            results = await asyncio.get_running_loop().run_in_executor(None, calculate)
+            return {
                 'success': True,
-                'session_id': session_id,
                 'timestamp': datetime.utcnow().isoformat(),
-                'confidence_intervals': confidence_intervals,
-                'uncertainty_metrics': uncertainty_metrics,
-                'confidence_based_recommendations': confidence_based_recommendations,
-                'statistical_summary': {
-                    'sample_size': len(historical_scores),
-                    'mean_risk_score': float(statistics.mean(historical_scores)),
-                    'std_risk_score': float(statistics.stdev(historical_scores)) if len(historical_scores) > 1 else 0.0,
-                    'min_risk_score': float(min(historical_scores)),
-                    'max_risk_score': float(max(historical_scores)),
-                    'score_volatility': float(statistics.stdev(historical_scores)) if len(historical_scores) > 1 else 0.0
-                },
-                'methodology': {
-                    'bootstrap_samples': 1000,
-                    'analytical_assumption': 'normal_distribution',
-                    'bayesian_prior': 'beta_distribution',
-                    'confidence_levels_calculated': [int(cl*100) for cl in self.confidence_levels]
+                'sessions_requested': len(histories),
+                'sessions_calculated': len(results),
+                'results': results,
+                'insufficient_data': {
+                    session_id: len(scores) for session_id, scores in histories.items() if len(scores) < 5
                 }
             }
-            
-            self.logger.info(f"Confidence intervals generated for session {session_id} with {len(historical_scores)} samples")
-            return result
-            
         except Exception as e:
-            self.logger.error(f"Error generating confidence intervals for session {session_id}: {str(e)}")
+            self.logger.error(f"Error generating batch confidence intervals: {str(e)}")
             return {
                 'success': False,
-                'session_id': session_id,
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
+    
+    def _build_confidence_interval_result(self, session_id: str, historical_scores: List[float],
+                                          bootstrap_by_level: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Assemble the per-level interval analysis around precomputed bootstrap intervals"""
+        confidence_intervals = {}
+        analytical_by_level = self._calculate_analytical_confidence_intervals(historical_scores)
+        bayesian_by_level = self._calculate_bayesian_confidence_intervals(historical_scores)
+        
+        # Calculate confidence intervals for multiple confidence levels
+        for confidence_level in self.confidence_levels:
+            alpha = 1 - confidence_level
+            
+            # Method 1: Bootstrap confidence intervals (all levels share one set of replicates)
+            bootstrap_ci = bootstrap_by_level[level_key(confidence_level)]
+            
+            # Method 2: Analytical confidence intervals (assuming normal distribution)
+            analytical_ci = analytical_by_level[level_key(confidence_level)]
+            
+            # Method 3: Bayesian confidence intervals (if sufficient data)
+            bayesian_ci = bayesian_by_level[level_key(confidence_level)]
+            
+            confidence_intervals[level_key(confidence_level)] = {
+                'confidence_level': float(confidence_level),
+                'alpha': float(alpha),
+                'bootstrap_method': bootstrap_ci,
+                'analytical_method': analytical_ci,
+                'bayesian_method': bayesian_ci,
+                'recommended_method': self._select_best_ci_method(bootstrap_ci, analytical_ci, bayesian_ci),
+                'interpretation': self._interpret_confidence_interval(bootstrap_ci, confidence_level)
+            }
+        
+        # Calculate uncertainty metrics
+        uncertainty_metrics = self._calculate_uncertainty_metrics(historical_scores, confidence_intervals)
+        
+        # Generate confidence-based recommendations
+        confidence_based_recommendations = self._generate_confidence_based_recommendations(
+            confidence_intervals, uncertainty_metrics
+        )
+        
+        return {
+            'success': True,
+            'session_id': session_id,
+            'timestamp': datetime.utcnow().isoformat(),
+            'confidence_intervals': confidence_intervals,
+            'uncertainty_metrics': uncertainty_metrics,
+            'confidence_based_recommendations': confidence_based_recommendations,
+            'statistical_summary': {
+                'sample_size': len(historical_scores),
+                'mean_risk_score': float(statistics.mean(historical_scores)),
+                'std_risk_score': float(statistics.stdev(historical_scores)) if len(historical_scores) > 1 else 0.0,
+                'min_risk_score': float(min(historical_scores)),
+                'max_risk_score': float(max(historical_scores)),
+                'score_volatility': float(statistics.stdev(historical_scores)) if len(historical_scores) > 1 else 0.0
+            },
+            'methodology': {
+                'bootstrap_samples': self.bootstrap_resamples,
+                'bootstrap_interval': 'bca',
+                'bootstrap_seed': self.bootstrap_seed,
+                'analytical_assumption': 'normal_distribution',
+                'bayesian_prior': 'beta_distribution',
+                'confidence_levels_calculated': [int(cl*100) for cl in self.confidence_levels]
+            }
+        }
 
     # ===== HELPER METHODS =====
     
     async def _get_session_data(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get comprehensive session data for risk calculation"""
         try:
-            # This would typically fetch from database
-            # For now, return mock data structure
+            if self.session_loader is not None:
+                session_data = await self.session_loader(session_id)
+                if session_data:
+                    return session_data
+            
+            # Fall back to the responses recorded for the session in memory
+            events = self.session_events.get(session_id, ())
             return {
                 'session_id': session_id,
-                'responses': [],
-                'timings': [],
-                'metadata': {},
-                'start_time': datetime.utcnow() - timedelta(minutes=30),
+                'responses': list(events),
+                'timings': [e.get('response_time', 0) for e in events],
+                'metadata': {'source': 'recorded_events'},
+                'start_time': self.active_sessions.get(session_id, {}).get('monitored_since', datetime.utcnow()),
                 'last_update': datetime.utcnow()
             }
         except Exception as e:
@@ -621,16 +689,16 @@ class RealTimeRiskCalculator:
         
         return risk_factors
     
-    async def _get_statistical_analyzer_risk_factors(self, session_data: Dict[str, Any]) -> List[RiskFactor]:
-        """Get risk factors from StatisticalAnomalyAnalyzer (Step 2.2)"""
+    async def _get_statistical_analyzer_risk_factors(self, features: SessionFeatureBundle) -> List[RiskFactor]:
+        """Get risk factors from StatisticalAnomalyAnalyzer (Step 2.2); all four analyses share one feature bundle"""
         risk_factors = []
         try:
             if self.statistical_analyzer:
                 # Call statistical analysis methods
-                pattern_analysis = self.statistical_analyzer.detect_answer_pattern_irregularities(session_data)
-                difficulty_analysis = self.statistical_analyzer.analyze_difficulty_progression_anomalies(session_data)
-                timezone_analysis = self.statistical_analyzer.identify_time_zone_manipulation(session_data)
-                collaboration_analysis = self.statistical_analyzer.detect_collaborative_cheating_patterns(session_data)
+                pattern_analysis = self.statistical_analyzer.detect_answer_pattern_irregularities(features)
+                difficulty_analysis = self.statistical_analyzer.analyze_difficulty_progression_anomalies(features)
+                timezone_analysis = self.statistical_analyzer.identify_time_zone_manipulation(features)
+                collaboration_analysis = self.statistical_analyzer.detect_collaborative_cheating_patterns(features)
                 
                 # Convert results to risk factors
                 if pattern_analysis.get('success'):
@@ -707,16 +775,15 @@ class RealTimeRiskCalculator:
         
         return risk_factors
     
-    async def _calculate_response_pattern_risk_factors(self, session_data: Dict[str, Any]) -> List[RiskFactor]:
+    async def _calculate_response_pattern_risk_factors(self, features: SessionFeatureBundle) -> List[RiskFactor]:
         """Calculate response pattern risk factors"""
         risk_factors = []
         try:
-            responses = session_data.get('responses', [])
-            if not responses:
+            if not features.responses:
                 return risk_factors
             
             # Response time consistency analysis
-            response_times = [r.get('response_time', 0) for r in responses if r.get('response_time', 0) > 0]
+            response_times = features.positive_response_times
             if len(response_times) > 3:
                 time_consistency = self._analyze_response_time_consistency(response_times)
                 risk_factors.append(RiskFactor(
@@ -730,7 +797,7 @@ class RealTimeRiskCalculator:
                 ))
             
             # Accuracy pattern analysis
-            accuracy_scores = [1 if r.get('is_correct', False) else 0 for r in responses]
+            accuracy_scores = features.correctness.tolist()
             if len(accuracy_scores) > 5:
                 accuracy_risk = self._analyze_accuracy_pattern_risk(accuracy_scores)
                 risk_factors.append(RiskFactor(
@@ -1073,70 +1140,33 @@ class RealTimeRiskCalculator:
         history = list(self.risk_factor_history[session_id])
         return [h['composite_score'] for h in history]
     
-    def _calculate_bootstrap_confidence_interval(self, scores: List[float], confidence_level: float) -> Dict[str, Any]:
-        """Calculate bootstrap confidence interval"""
+    def _calculate_bootstrap_confidence_intervals(self, score_histories: List[List[float]]) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        BCa bootstrap intervals at every configured confidence level for each score history
+        (long, roughly symmetric histories use the normal approximation instead of resampling)
+        """
         try:
-            n_bootstrap = 1000
-            n_samples = len(scores)
-            
-            bootstrap_means = []
-            for _ in range(n_bootstrap):
-                bootstrap_sample = np.random.choice(scores, size=n_samples, replace=True)
-                bootstrap_means.append(np.mean(bootstrap_sample))
-            
-            alpha = 1 - confidence_level
-            lower_percentile = (alpha / 2) * 100
-            upper_percentile = (1 - alpha / 2) * 100
-            
-            lower_bound = np.percentile(bootstrap_means, lower_percentile)
-            upper_bound = np.percentile(bootstrap_means, upper_percentile)
-            
-            return {
-                'method': 'bootstrap',
-                'lower_bound': float(lower_bound),
-                'upper_bound': float(upper_bound),
-                'confidence_level': float(confidence_level),
-                'bootstrap_samples': n_bootstrap,
-                'mean_estimate': float(np.mean(bootstrap_means)),
-                'available': True
-            }
+            return batch_bootstrap_intervals(
+                score_histories, self.confidence_levels, method='bca',
+                n_resamples=self.bootstrap_resamples, seed=self.bootstrap_seed
+            )
         except Exception as e:
-            return {'method': 'bootstrap', 'available': False, 'error': str(e)}
+            unavailable = {'method': 'bootstrap', 'available': False, 'error': str(e)}
+            return [{level_key(cl): dict(unavailable) for cl in self.confidence_levels} for _ in score_histories]
     
-    def _calculate_analytical_confidence_interval(self, scores: List[float], confidence_level: float) -> Dict[str, Any]:
-        """Calculate analytical confidence interval assuming normal distribution"""
+    def _calculate_analytical_confidence_intervals(self, scores: List[float]) -> Dict[str, Dict[str, Any]]:
+        """Calculate analytical confidence intervals assuming normal distribution, for every confidence level"""
         try:
-            n = len(scores)
-            mean_score = statistics.mean(scores)
-            std_score = statistics.stdev(scores) if n > 1 else 0
-            
             # t-distribution for small samples, normal for large samples
-            if n < 30:
-                from scipy.stats import t
-                t_value = t.ppf((1 + confidence_level) / 2, df=n-1)
-            else:
-                t_value = norm.ppf((1 + confidence_level) / 2)
-            
-            margin_of_error = t_value * (std_score / np.sqrt(n))
-            lower_bound = mean_score - margin_of_error
-            upper_bound = mean_score + margin_of_error
-            
             return {
-                'method': 'analytical',
-                'lower_bound': float(lower_bound),
-                'upper_bound': float(upper_bound),
-                'confidence_level': float(confidence_level),
-                'mean_estimate': float(mean_score),
-                'standard_error': float(std_score / np.sqrt(n)),
-                'margin_of_error': float(margin_of_error),
-                'distribution_used': 't_distribution' if n < 30 else 'normal_distribution',
-                'available': True
+                level: {'method': 'analytical', 'confidence_level': float(cl), **interval, 'available': True}
+                for cl, (level, interval) in zip(self.confidence_levels, analytic_intervals(scores, self.confidence_levels).items())
             }
         except Exception as e:
-            return {'method': 'analytical', 'available': False, 'error': str(e)}
+            return {level_key(cl): {'method': 'analytical', 'available': False, 'error': str(e)} for cl in self.confidence_levels}
     
-    def _calculate_bayesian_confidence_interval(self, scores: List[float], confidence_level: float) -> Dict[str, Any]:
-        """Calculate Bayesian confidence interval"""
+    def _calculate_bayesian_confidence_intervals(self, scores: List[float]) -> Dict[str, Dict[str, Any]]:
+        """Calculate Bayesian confidence intervals for every confidence level"""
         try:
             # Simple Bayesian approach using Beta distribution for bounded scores [0,1]
             # Convert scores to successes/failures format
@@ -1147,23 +1177,26 @@ class RealTimeRiskCalculator:
             alpha = successes + 0.5
             beta_param = n - successes + 0.5
             
-            alpha_level = 1 - confidence_level
-            lower_bound = beta.ppf(alpha_level / 2, alpha, beta_param)
-            upper_bound = beta.ppf(1 - alpha_level / 2, alpha, beta_param)
+            alpha_levels = 1 - np.asarray(self.confidence_levels)
+            lower_bounds = beta.ppf(alpha_levels / 2, alpha, beta_param)
+            upper_bounds = beta.ppf(1 - alpha_levels / 2, alpha, beta_param)
             
             return {
-                'method': 'bayesian',
-                'lower_bound': float(lower_bound),
-                'upper_bound': float(upper_bound),
-                'confidence_level': float(confidence_level),
-                'posterior_mean': float(alpha / (alpha + beta_param)),
-                'alpha_parameter': float(alpha),
-                'beta_parameter': float(beta_param),
-                'prior_used': 'jeffreys_prior',
-                'available': True
+                level_key(cl): {
+                    'method': 'bayesian',
+                    'lower_bound': float(lower_bound),
+                    'upper_bound': float(upper_bound),
+                    'confidence_level': float(cl),
+                    'posterior_mean': float(alpha / (alpha + beta_param)),
+                    'alpha_parameter': float(alpha),
+                    'beta_parameter': float(beta_param),
+                    'prior_used': 'jeffreys_prior',
+                    'available': True
+                }
+                for cl, lower_bound, upper_bound in zip(self.confidence_levels, lower_bounds, upper_bounds)
             }
         except Exception as e:
-            return {'method': 'bayesian', 'available': False, 'error': str(e)}
+            return {level_key(cl): {'method': 'bayesian', 'available': False, 'error': str(e)} for cl in self.confidence_levels}
     
     def _select_best_ci_method(self, bootstrap_ci: Dict, analytical_ci: Dict, bayesian_ci: Dict) -> str:
         """Select the best confidence interval method based on data characteristics"""
@@ -1201,7 +1234,7 @@ class RealTimeRiskCalculator:
             # Calculate average interval width across confidence levels
             interval_widths = []
             for level, ci_data in confidence_intervals.items():
-                recommended_method = ci_data.get('recommended_method', 'bootstrap')
+                recommended_method = f"{ci_data.get('recommended_method', 'bootstrap')}_method"
                 if recommended_method in ci_data and ci_data[recommended_method].get('available'):
                     method_data = ci_data[recommended_method]
                     width = method_data['upper_bound'] - method_data['lower_bound']
@@ -1282,82 +1315,117 @@ class RealTimeRiskCalculator:
         
         return min(risk, 1.0)
     
-    # WebSocket broadcasting methods (placeholders)
-    async def _broadcast_risk_update(self, risk_assessment: Dict[str, Any]):
-        """Broadcast risk update to connected WebSocket clients"""
-        if WEBSOCKET_AVAILABLE and self.websocket_connections:
-            message = json.dumps({
-                'type': 'risk_update',
-                'data': risk_assessment
-            })
-            # In production, this would broadcast to all connected clients
-            pass
+    # Risk update publishing (fan-out to admin WebSocket subscribers through the broker)
+    async def _broadcast_risk_update(self, risk_assessment: Dict[str, Any], previous_assessment: Optional[Dict[str, Any]] = None):
+        """Publish a score change; unchanged scores (within score_change_epsilon and same level) are not sent"""
+        score = risk_assessment['composite_risk_score']
+        previous_score = previous_assessment.get('composite_risk_score') if previous_assessment else None
+        previous_level = previous_assessment.get('risk_level') if previous_assessment else None
+        if (previous_score is not None and abs(score - previous_score) < self.score_change_epsilon
+                and previous_level == risk_assessment['risk_level']):
+            return
+        self.broker.publish({
+            'type': 'risk_update',
+            'session_id': risk_assessment['session_id'],
+            'composite_risk_score': score,
+            'risk_level': risk_assessment['risk_level'],
+            'previous_risk_score': previous_score,
+            'previous_risk_level': previous_level,
+            'risk_breakdown': risk_assessment.get('risk_breakdown', {}),
+            'alerts_triggered': risk_assessment.get('alerts_triggered', []),
+            'timestamp': risk_assessment['timestamp']
+        })
     
     async def _broadcast_significant_change_alert(self, session_id: str, assessment: Dict[str, Any]):
-        """Broadcast significant change alert"""
-        if WEBSOCKET_AVAILABLE and self.websocket_connections:
-            message = json.dumps({
-                'type': 'significant_change_alert',
-                'session_id': session_id,
-                'data': assessment
-            })
-            # In production, this would broadcast to all connected clients
-            pass
+        """Publish significant change alert"""
+        self.broker.publish({
+            'type': 'significant_change_alert',
+            'session_id': session_id,
+            'composite_risk_score': assessment['composite_risk_score'],
+            'previous_risk_score': assessment.get('previous_risk_score'),
+            'risk_level': assessment['risk_level'],
+            'trend_analysis': assessment.get('trend_analysis', {}),
+            'timestamp': assessment['timestamp']
+        })
     
     async def _broadcast_alert_notifications(self, alert_summary: Dict[str, Any]):
-        """Broadcast alert notifications"""
-        if WEBSOCKET_AVAILABLE and self.websocket_connections:
-            message = json.dumps({
-                'type': 'alert_notification',
-                'data': alert_summary
-            })
-            # In production, this would broadcast to all connected clients
-            pass
+        """Publish alert notifications"""
+        self.broker.publish({
+            'type': 'alert_notification',
+            'session_id': alert_summary['session_id'],
+            'current_risk_level': alert_summary['current_risk_level'],
+            'alert_details': alert_summary['alert_details'],
+            'escalation_actions': alert_summary['escalation_actions'],
+            'timestamp': alert_summary['timestamp']
+        })
 
     # Continuous update management
+    def _monitor_session(self, session_id: str):
+        """Register (or refresh) a monitored session, evicting the least recently scored beyond the bound"""
+        entry = self.active_sessions.pop(session_id, None) or {'monitored_since': datetime.utcnow()}
+        entry['last_scored'] = datetime.utcnow()
+        self.active_sessions[session_id] = entry
+        while len(self.active_sessions) > self.max_monitored_sessions:
+            evicted, _ = self.active_sessions.popitem(last=False)
+            self.stop_monitoring(evicted)
+    
+    def stop_monitoring(self, session_id: str):
+        """Drop a session from continuous updates (e.g. when the session ends)"""
+        self.active_sessions.pop(session_id, None)
+        self.session_events.pop(session_id, None)
+        self.feature_cache.invalidate(session_id)
+        self.scheduler.forget(session_id)
+    
+    def mark_session_dirty(self, session_id: str, event: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Record new activity for a session. Monitored sessions are recomputed by
+        the scheduler; returns False for sessions that are not monitored.
+        Must be called from the event loop.
+        """
+        if session_id not in self.active_sessions:
+            return False
+        if event is not None:
+            self.session_events.setdefault(session_id, deque(maxlen=self.window_size)).append(event)
+        self.feature_cache.invalidate(session_id)
+        self.scheduler.mark_dirty(session_id)
+        return True
+    
     def start_continuous_updates(self):
-        """Start continuous risk factor updates in background thread"""
-        if not self.update_thread or not self.update_thread.is_alive():
-            self.stop_updates.clear()
-            self.update_thread = threading.Thread(target=self._continuous_update_worker, daemon=True)
-            self.update_thread.start()
-            self.logger.info("Continuous risk updates started")
+        """Start the event-driven scheduler on the running event loop (it also starts on the first mark)"""
+        self.scheduler._ensure_worker()
+        self.logger.info("Continuous risk updates started")
     
     def stop_continuous_updates(self):
         """Stop continuous risk factor updates"""
-        self.stop_updates.set()
-        if self.update_thread and self.update_thread.is_alive():
-            self.update_thread.join(timeout=5)
+        self.scheduler.stop()
         self.logger.info("Continuous risk updates stopped")
     
-    def _continuous_update_worker(self):
-        """Background worker for continuous risk updates"""
-        while not self.stop_updates.is_set():
-            try:
-                # Update risk factors for all active sessions
-                for session_id in list(self.active_sessions.keys()):
-                    asyncio.run(self._periodic_risk_update(session_id))
-                
-                # Wait for next update interval
-                self.stop_updates.wait(self.update_interval)
-                
-            except Exception as e:
-                self.logger.error(f"Error in continuous update worker: {str(e)}")
-                self.stop_updates.wait(10)  # Wait 10 seconds before retrying
+    def get_continuous_update_stats(self) -> Dict[str, Any]:
+        return {
+            'monitored_sessions': len(self.active_sessions),
+            'max_monitored_sessions': self.max_monitored_sessions,
+            'scheduler': self.scheduler.get_stats(),
+            'broker': self.broker.get_stats(),
+            'feature_cache': self.feature_cache.get_stats()
+        }
     
     async def _periodic_risk_update(self, session_id: str):
-        """Perform periodic risk update for a session"""
+        """Scheduled risk update for a session with new activity"""
         try:
             # Check if session is still active
             if session_id not in self.active_sessions:
                 return
+            previous_level = self.session_risk_cache.get(session_id, {}).get('risk_level')
             
             # Calculate current risk score
             current_assessment = await self.calculate_composite_risk_score(session_id)
             
             if current_assessment.get('success'):
-                # Check for alerts
-                await self.trigger_intervention_alerts(session_id, current_assessment)
+                if self.assessment_store is not None:
+                    await self.assessment_store(session_id, current_assessment)
+                # Alerts only when the risk level moved, so recomputations don't repeat them
+                if current_assessment['risk_level'] != previous_level:
+                    await self.trigger_intervention_alerts(session_id, current_assessment)
                 
         except Exception as e:
             self.logger.error(f"Error in periodic risk update for session {session_id}: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+In-Process Read-Through Cache for Reference Documents
+
+Candidate-facing endpoints look up the same rarely-changing documents
+(interview tokens, job postings, aptitude configs/tokens) on every request.
+This module keeps them in a small per-worker TTL cache:
+
+- Read-through: get_or_load(key, loader) only hits Mongo on a miss
+- Negative caching: "not found" results are cached with a shorter TTL
+- Single-flight: concurrent misses for the same key share one database read
+- Explicit invalidation hooks for the admin/candidate paths that mutate the data
+- Optional cross-worker invalidation by watching Mongo change streams
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+# Sentinel stored for negative cache entries
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """
+    Bounded TTL cache with negative entries and single-flight loading.
+    Values are deep-copied on the way out so callers can mutate them freely.
+    """
+
+    def __init__(self,
+                 name: str,
+                 ttl_seconds: float = 60.0,
+                 negative_ttl_seconds: float = 5.0,
+                 max_entries: int = 10000):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "loads": 0, "invalidations": 0}
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self._entries.pop(key, None)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any):
+        ttl = self.negative_ttl_seconds if value is _MISSING else self.ttl_seconds
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader() on a miss (None means not found)"""
+        found, value = self._lookup(key)
+        if found:
+            if value is _MISSING:
+                self.stats["negative_hits"] += 1
+                return None
+            self.stats["hits"] += 1
+            return copy.deepcopy(value)
+
+        self.stats["misses"] += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            value = await asyncio.shield(inflight)
+            return None if value is None else copy.deepcopy(value)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.stats["loads"] += 1
+            value = await loader()
+            self._store(key, _MISSING if value is None else value)
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else may be awaiting; mark retrieved to avoid "exception never retrieved" noise
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        return None if value is None else copy.deepcopy(value)
+
+    def invalidate(self, key: Hashable):
+        if self._entries.pop(key, None) is not None:
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        self.stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "negative_ttl_seconds": self.negative_ttl_seconds,
+            **self.stats,
+            "hit_rate": round((self.stats["hits"] + self.stats["negative_hits"]) / lookups, 4) if lookups else 0.0
+        }
+
+
+async def watch_collection_invalidations(collection,
+                                         caches: List[Tuple[ReadThroughCache, str]],
+                                         retry_delay_seconds: float = 30.0):
+    """
+    Invalidate cache entries when another worker changes a document.
+
+    caches is a list of (cache, key_field) pairs; the document's key_field value
+    is the cache key. Deletes carry no full document, so they clear the caches.
+    Change streams need a replica set; on standalone servers this logs once per
+    retry and keeps relying on TTL expiry.
+    """
+    while True:
+        try:
+            async with collection.watch(full_document="updateLookup") as stream:
+                logging.info(f"Reference cache change stream started on {collection.name}")
+                async for change in stream:
+                    operation = change.get("operationType")
+                    document = change.get("fullDocument") or {}
+                    for cache, key_field in caches:
+                        if operation in ("delete", "drop", "rename", "invalidate") or key_field not in document:
+                            cache.clear()
+                        else:
+                            cache.invalidate(document[key_field])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Reference cache change stream on {collection.name} unavailable: {e}")
+            for cache, _ in caches:
+                cache.clear()
+            await asyncio.sleep(retry_delay_seconds)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Replay and Synchronized-Activity Detection
+
+Linear-time building blocks for SessionIntegrityMonitor. Replay detection used
+to compare every request window with every later window (quadratic in the
+request history) and synchronized activity was found by bucketing events into
+fixed 30-second slots, which also missed pairs straddling a slot boundary.
+
+Key Features:
+- ReplayDetector: Rabin-Karp rolling hash over windows of request signatures;
+  each request is one O(1) hash update plus a dict probe, so a history of n
+  requests is checked in O(n) and sessions can be fed request by request
+- Repeated windows are reported as runs: consecutive replayed windows of the
+  same original are merged into one entry with the run length
+- find_synchronized_groups(): one sort plus a sweep over the timeline,
+  O(n log n), with windows anchored at the first event of each group
+- SynchronizedActivityTracker: incremental sweep-line join of events from
+  different sessions/devices within a time window over a bounded horizon
+"""
+
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+REPLAY_SEQUENCE_LENGTH = int(os.environ.get("REPLAY_SEQUENCE_LENGTH", "3"))
+SYNC_WINDOW_SECONDS = float(os.environ.get("SYNC_WINDOW_SECONDS", "30"))
+
+# Rabin-Karp parameters: Mersenne prime modulus and a fixed base
+HASH_MODULUS = (1 << 61) - 1
+HASH_BASE = 1_000_003
+
+
+def request_signature(request: Dict[str, Any]) -> str:
+    return f"{request.get('method', '')}:{request.get('path', '')}:{request.get('body_hash', '')}"
+
+
+def parse_activity_time(value: Any) -> Optional[float]:
+    """Epoch seconds from an ISO string, datetime or number (naive times are taken as UTC)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value.timestamp()
+    except (ValueError, OverflowError):
+        return None
+    return None
+
+
+class ReplayDetector:
+    """Incremental detection of repeated request-signature windows in one session"""
+
+    def __init__(self, sequence_length: int = REPLAY_SEQUENCE_LENGTH):
+        self.sequence_length = max(1, sequence_length)
+        self.duplicate_runs: List[Dict[str, Any]] = []
+
+        self._token_ids: Dict[str, int] = {}
+        self._token_signatures: List[str] = []
+        self._tokens: List[int] = []                        # token id per request
+        self._hash = 0
+        self._leading_power = pow(HASH_BASE, self.sequence_length - 1, HASH_MODULUS)
+        self._first_seen: Dict[int, List[int]] = {}        # window hash -> first start of each distinct window
+
+    @property
+    def position(self) -> int:
+        """Requests seen so far"""
+        return len(self._tokens)
+
+    def add(self, signature: str) -> Optional[Dict[str, Any]]:
+        """Feed the next request signature; returns the replay run it starts or extends"""
+        k = self.sequence_length
+        tokens = self._tokens
+        token = self._token_ids.get(signature)
+        if token is None:
+            token = self._token_ids[signature] = len(self._token_signatures) + 1
+            self._token_signatures.append(signature)
+        if len(tokens) >= k:
+            self._hash = (self._hash - tokens[-k] * self._leading_power) % HASH_MODULUS
+        self._hash = (self._hash * HASH_BASE + token) % HASH_MODULUS
+        tokens.append(token)
+        if len(tokens) < k:
+            return None
+
+        start = len(tokens) - k
+        window = tokens[start:]
+        if self._extends_last_run(start, window):
+            run = self.duplicate_runs[-1]
+            run['sequence_length'] += 1
+            run['sequence'].append(signature)
+            return run
+
+        # Rabin-Karp probe; equal hashes are confirmed on the tokens themselves
+        starts = self._first_seen.setdefault(self._hash, [])
+        original_start = next((first for first in starts if tokens[first:first + k] == window), None)
+        if original_start is None:
+            starts.append(start)
+            return None
+        if start < original_start + k:
+            return None   # overlaps its first occurrence
+        run = {
+            'original_start': original_start,
+            'duplicate_start': start,
+            'sequence_length': k,
+            'sequence': [self._token_signatures[token - 1] for token in window]
+        }
+        self.duplicate_runs.append(run)
+        return run
+
+    def _extends_last_run(self, start: int, window: List[int]) -> bool:
+        """True when this window continues the last run on the original side too"""
+        if not self.duplicate_runs:
+            return False
+        run = self.duplicate_runs[-1]
+        offset = start - run['duplicate_start']
+        if offset != run['sequence_length'] - self.sequence_length + 1:
+            return False
+        original = run['original_start'] + offset
+        return original + self.sequence_length <= start and \
+            self._tokens[original:original + self.sequence_length] == window
+
+
+def find_duplicate_sequences(signatures: List[str], sequence_length: int = REPLAY_SEQUENCE_LENGTH) -> List[Dict[str, Any]]:
+    """Replay runs in a complete signature history (each repeated window is matched to its first occurrence)"""
+    detector = ReplayDetector(sequence_length)
+    for signature in signatures:
+        detector.add(signature)
+    return detector.duplicate_runs
+
+
+def find_synchronized_groups(activities: List[Dict[str, Any]], window_seconds: float = SYNC_WINDOW_SECONDS,
+                             group_key: str = 'device_id') -> List[Dict[str, Any]]:
+    """
+    Groups of activities from more than one device within window_seconds of
+    the group's first activity. Activities without a parseable timestamp are skipped.
+    """
+    timed = sorted(
+        (moment, index) for index, moment in
+        ((index, parse_activity_time(activity.get('timestamp'))) for index, activity in enumerate(activities))
+        if moment is not None
+    )
+    times = [moment for moment, _ in timed]
+
+    groups = []
+    i = 0
+    while i < len(timed):
+        end = bisect_left(times, times[i] + window_seconds, lo=i + 1)
+        if end - i > 1:
+            members = [activities[index] for _, index in timed[i:end]]
+            devices = list(dict.fromkeys(member.get(group_key, '') for member in members))
+            if len(devices) > 1:
+                groups.append({
+                    'timestamp': members[0].get('timestamp'),
+                    'time_span_seconds': times[end - 1] - times[i],
+                    'device_count': len(devices),
+                    'devices': devices,
+                    'activities': members,
+                    'synchronization_score': len(devices) / len(members)
+                })
+        i = end
+    return groups
+
+
+class SynchronizedActivityTracker:
+    """
+    Incremental cross-session join: each added event is matched against events
+    of other sources (sessions or devices) within window_seconds. Events are
+    kept in time order for horizon_seconds behind the newest one (late events
+    inside the horizon are still joined) and at most max_events are retained.
+    """
+
+    def __init__(self, window_seconds: float = SYNC_WINDOW_SECONDS, horizon_seconds: Optional[float] = None,
+                 max_events: int = 100000):
+        self.window_seconds = window_seconds
+        self.horizon_seconds = horizon_seconds if horizon_seconds is not None else max(300.0, 10 * window_seconds)
+        self.max_events = max_events
+        self._events: List[Tuple[float, int, Hashable]] = []   # (time, sequence, source), sorted
+        self._sequence = 0
+        self.stats = {'events': 0, 'late_events_dropped': 0, 'matches': 0}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, source: Hashable, moment: float) -> List[Hashable]:
+        """Record an event; returns the other sources active within the window around it"""
+        self.stats['events'] += 1
+        newest = self._events[-1][0] if self._events else moment
+        if moment < newest - self.horizon_seconds:
+            self.stats['late_events_dropped'] += 1
+            return []
+
+        low = bisect_left(self._events, (moment - self.window_seconds,))
+        high = bisect_right(self._events, (moment + self.window_seconds, float('inf')))
+        others = list(dict.fromkeys(other for _, _, other in self._events[low:high] if other != source))
+        self.stats['matches'] += len(others)
+
+        self._sequence += 1
+        insort(self._events, (moment, self._sequence, source))
+        self._prune()
+        return others
+
+    def _prune(self) -> None:
+        # Expired events are dropped in batches to keep deletions amortized O(1)
+        cutoff = bisect_left(self._events, (self._events[-1][0] - self.horizon_seconds,))
+        if cutoff >= max(64, len(self._events) // 8) or len(self._events) > self.max_events:
+            del self._events[:max(cutoff, len(self._events) - self.max_events)]
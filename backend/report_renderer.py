@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Out-of-Process Report Rendering with GridFS Artifact Storage
+
+PDF reports used to be built with reportlab/matplotlib on the event loop and
+written to /tmp, which is lost when another worker serves the download. This
+module renders them in a process pool and stores the output in GridFS:
+
+- Rendering runs in a spawn-based ProcessPoolExecutor (report_templates.render_report)
+- Artifacts are content-addressed: the GridFS file id is the SHA-256 of the PDF bytes
+- A render key (SHA-256 of template kind, template version and payload) maps to
+  the artifact, so repeat requests for an unchanged report skip rendering
+- Concurrent requests for the same render key share one render
+- Downloads stream from GridFS chunk by chunk
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from starlette.responses import StreamingResponse
+
+import report_templates
+
+
+class ReportArtifactNotFound(Exception):
+    """Raised when a requested artifact is missing from storage"""
+
+
+class ReportRenderer:
+    """Renders reports off the event loop and keeps the PDFs in GridFS"""
+
+    def __init__(self, db, bucket_name: str = "report_artifacts", max_workers: Optional[int] = None):
+        self.db = db
+        self.bucket_name = bucket_name
+        self.max_workers = max_workers or int(os.environ.get("REPORT_RENDER_WORKERS", "2"))
+        self._bucket = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "renders": 0, "cache_hits": 0, "deduplicated": 0, "errors": 0}
+
+    @property
+    def bucket(self) -> AsyncIOMotorGridFSBucket:
+        if self._bucket is None:
+            self._bucket = AsyncIOMotorGridFSBucket(self.db, bucket_name=self.bucket_name)
+        return self._bucket
+
+    @property
+    def index(self):
+        """render_key -> artifact mapping"""
+        return self.db[f"{self.bucket_name}_index"]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn keeps the workers free of the server's threads, sockets and event loop
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=report_templates.init_worker
+            )
+        return self._pool
+
+    async def _render_bytes(self, kind: str, payload: Dict[str, Any]) -> bytes:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), report_templates.render_report, kind, payload)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool and retry once
+            logging.warning(f"Report render pool broken while rendering {kind}; restarting")
+            self._pool = None
+            return await loop.run_in_executor(self._get_pool(), report_templates.render_report, kind, payload)
+
+    @staticmethod
+    def render_key(kind: str, payload: Dict[str, Any]) -> str:
+        source = json.dumps(
+            {"kind": kind, "version": report_templates.TEMPLATE_VERSION, "payload": payload},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    async def render(self, kind: str, payload: Dict[str, Any], filename: str) -> Dict[str, Any]:
+        """
+        Return the stored artifact for this report, rendering it only if no
+        artifact exists for the same kind/template version/payload.
+        """
+        self.stats["requests"] += 1
+        render_key = self.render_key(kind, payload)
+
+        cached = await self.index.find_one({"_id": render_key})
+        if cached and await self.exists(cached["artifact_id"]):
+            self.stats["cache_hits"] += 1
+            await self.index.update_one({"_id": render_key}, {"$set": {"last_used_at": datetime.utcnow()}})
+            return {**cached, "cached": True}
+
+        inflight = self._inflight.get(render_key)
+        if inflight is not None:
+            return {**(await asyncio.shield(inflight)), "cached": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[render_key] = future
+        try:
+            artifact = await self._render_and_store(kind, payload, filename, render_key)
+            future.set_result(artifact)
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(render_key, None)
+        return {**artifact, "cached": False}
+
+    async def _render_and_store(self, kind: str, payload: Dict[str, Any], filename: str, render_key: str) -> Dict[str, Any]:
+        pdf_bytes = await self._render_bytes(kind, payload)
+        self.stats["renders"] += 1
+        artifact_id = hashlib.sha256(pdf_bytes).hexdigest()
+
+        if await self.exists(artifact_id):
+            self.stats["deduplicated"] += 1
+        else:
+            try:
+                await self.bucket.upload_from_stream_with_id(
+                    artifact_id, filename, pdf_bytes,
+                    metadata={"kind": kind, "content_type": "application/pdf", "render_key": render_key}
+                )
+            except Exception as e:
+                # Another worker stored the same bytes first
+                if not await self.exists(artifact_id):
+                    raise
+                logging.info(f"Report artifact {artifact_id} already stored: {e}")
+
+        artifact = {
+            "_id": render_key,
+            "artifact_id": artifact_id,
+            "kind": kind,
+            "filename": filename,
+            "size": len(pdf_bytes),
+            "created_at": datetime.utcnow(),
+            "last_used_at": datetime.utcnow()
+        }
+        await self.index.replace_one({"_id": render_key}, artifact, upsert=True)
+        return artifact
+
+    async def exists(self, artifact_id: str) -> bool:
+        return await self.db[f"{self.bucket_name}.files"].count_documents({"_id": artifact_id}, limit=1) > 0
+
+    async def stream_response(self, artifact_id: str, filename: str, inline: bool = False) -> StreamingResponse:
+        """Stream a stored PDF back to the client without loading it into memory"""
+        try:
+            grid_out = await self.bucket.open_download_stream(artifact_id)
+        except Exception as e:
+            raise ReportArtifactNotFound(artifact_id) from e
+
+        async def chunks():
+            while True:
+                chunk = await grid_out.readchunk()
+                if not chunk:
+                    break
+                yield chunk
+
+        disposition = "inline" if inline else "attachment"
+        return StreamingResponse(
+            chunks(),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": f"{disposition}; filename={filename}",
+                "Content-Length": str(grid_out.length),
+                "ETag": f'"{artifact_id}"'
+            }
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers, "pool_started": self._pool is not None, **self.stats}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
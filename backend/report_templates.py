@@ -0,0 +1,2486 @@
+#!/usr/bin/env python3
+"""
+PDF Report Templates
+
+Pure rendering functions for the downloadable reports (aptitude results,
+resume gap analysis, rejection reasons, technical/behavioral interview
+questions and ATS score). Each renderer takes a plain-data payload and
+returns the PDF bytes; they never touch the database, so report_renderer can
+run them in a separate process and cache the output by payload hash.
+
+Charts are drawn with the Agg backend and memoized per worker process by a
+hash of the chart data.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+# matplotlib is configured for Agg in init_worker(); importing pyplot first would pick a GUI backend
+plt = None
+
+# Bump when a template changes so cached artifacts are rendered again
+TEMPLATE_VERSION = 1
+
+CHART_CACHE_MAX_ENTRIES = 128
+_chart_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def init_worker():
+    """Process pool initializer: headless charts and reproducible PDF bytes"""
+    global plt
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as pyplot
+    from reportlab import rl_config
+    # No creation timestamp or random document id, so identical payloads give identical bytes
+    rl_config.invariant = 1
+    plt = pyplot
+
+
+def cached_chart(builder: Callable[..., str], *args) -> str:
+    """Return builder(*args), memoized by a hash of the chart data"""
+    if plt is None:
+        init_worker()
+    key_source = json.dumps([builder.__name__, args], sort_keys=True, default=str)
+    key = hashlib.blake2b(key_source.encode(), digest_size=16).hexdigest()
+    chart = _chart_cache.get(key)
+    if chart is not None:
+        _chart_cache.move_to_end(key)
+        return chart
+    chart = builder(*args)
+    if chart:
+        _chart_cache[key] = chart
+        while len(_chart_cache) > CHART_CACHE_MAX_ENTRIES:
+            _chart_cache.popitem(last=False)
+    return chart
+
+
+# Set professional color palette
+APTITUDE_COLORS = {
+    'primary': '#2E86AB',      # Professional Blue
+    'secondary': '#A23B72',    # Magenta
+    'success': '#F18F01',      # Orange
+    'warning': '#C73E1D',      # Red
+    'info': '#6C7B7F',         # Gray
+    'light': '#F5F5F5',        # Light Gray
+    'dark': '#2C3E50'          # Dark Blue
+}
+
+TOPIC_COLORS = {
+    'numerical_reasoning': '#2E86AB',
+    'logical_reasoning': '#A23B72', 
+    'verbal_comprehension': '#F18F01',
+    'spatial_reasoning': '#C73E1D'
+}
+
+
+def create_performance_radar_chart(topic_scores: Dict[str, Dict[str, Any]]) -> str:
+    """Create radar chart for topic performance"""
+    try:
+        plt.style.use('seaborn-v0_8-whitegrid')
+        fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
+        
+        # Prepare data
+        topics = list(topic_scores.keys())
+        topic_names = {
+            'numerical_reasoning': 'Numerical\nReasoning',
+            'logical_reasoning': 'Logical\nReasoning', 
+            'verbal_comprehension': 'Verbal\nComprehension',
+            'spatial_reasoning': 'Spatial\nReasoning'
+        }
+        
+        labels = [topic_names.get(topic, topic.replace('_', ' ').title()) for topic in topics]
+        values = [topic_scores[topic].get('percentage', 0) for topic in topics]
+        
+        # Close the plot
+        values += values[:1]
+        labels += labels[:1]
+        
+        # Create angles for each topic
+        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=True)
+        
+        # Plot
+        ax.plot(angles, values, 'o-', linewidth=3, color=APTITUDE_COLORS['primary'], markersize=8)
+        ax.fill(angles, values, alpha=0.25, color=APTITUDE_COLORS['primary'])
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(labels[:-1], fontsize=11, fontweight='bold')
+        ax.set_ylim(0, 100)
+        ax.set_yticks([20, 40, 60, 80, 100])
+        ax.set_yticklabels(['20%', '40%', '60%', '80%', '100%'], fontsize=9)
+        ax.grid(True, alpha=0.3)
+        
+        # Add performance zones
+        ax.fill_between(angles, 0, 40, alpha=0.1, color='red', label='Needs Improvement')
+        ax.fill_between(angles, 40, 70, alpha=0.1, color='orange', label='Good')
+        ax.fill_between(angles, 70, 100, alpha=0.1, color='green', label='Excellent')
+        
+        plt.title('Topic Performance Overview', pad=30, fontsize=16, fontweight='bold')
+        
+        # Save to base64
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
+        buffer.seek(0)
+        chart_b64 = base64.b64encode(buffer.read()).decode()
+        plt.close()
+        
+        return chart_b64
+        
+    except Exception as e:
+        logging.error(f"Radar chart creation error: {e}")
+        return ""
+
+
+def create_difficulty_progression_chart(difficulty_performance: Dict[str, Dict[str, Any]]) -> str:
+    """Create bar chart for difficulty progression"""
+    try:
+        plt.style.use('seaborn-v0_8-whitegrid')
+        fig, ax = plt.subplots(figsize=(10, 6))
+        
+        difficulties = ['easy', 'medium', 'hard']
+        percentages = [difficulty_performance.get(diff, {}).get('percentage', 0) for diff in difficulties]
+        totals = [difficulty_performance.get(diff, {}).get('total', 0) for diff in difficulties]
+        
+        colors = [APTITUDE_COLORS['success'], APTITUDE_COLORS['primary'], APTITUDE_COLORS['warning']]
+        
+        bars = ax.bar(difficulties, percentages, color=colors, alpha=0.8, edgecolor='white', linewidth=2)
+        
+        # Add value labels on bars
+        for i, (bar, percentage, total) in enumerate(zip(bars, percentages, totals)):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 1,
+                   f'{percentage:.1f}%\n({total} questions)',
+                   ha='center', va='bottom', fontweight='bold', fontsize=10)
+        
+        ax.set_ylim(0, 100)
+        ax.set_ylabel('Success Rate (%)', fontsize=12, fontweight='bold')
+        ax.set_xlabel('Difficulty Level', fontsize=12, fontweight='bold')
+        ax.set_title('Performance by Difficulty Level', fontsize=14, fontweight='bold', pad=20)
+        
+        # Add performance zones
+        ax.axhspan(0, 40, alpha=0.1, color='red', label='Needs Improvement')
+        ax.axhspan(40, 70, alpha=0.1, color='orange', label='Good')
+        ax.axhspan(70, 100, alpha=0.1, color='green', label='Excellent')
+        
+        ax.grid(axis='y', alpha=0.3)
+        ax.set_xticklabels([d.title() for d in difficulties], fontsize=11)
+        
+        # Save to base64
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
+        buffer.seek(0)
+        chart_b64 = base64.b64encode(buffer.read()).decode()
+        plt.close()
+        
+        return chart_b64
+        
+    except Exception as e:
+        logging.error(f"Difficulty chart creation error: {e}")
+        return ""
+
+
+def create_time_management_chart(time_analysis: Dict[str, Any]) -> str:
+    """Create time management visualization"""
+    try:
+        plt.style.use('seaborn-v0_8-whitegrid')
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        
+        # Time efficiency gauge
+        efficiency_score = time_analysis.get('time_efficiency_score', 50)
+        
+        # Create gauge chart
+        theta = np.linspace(0, np.pi, 100)
+        r = 1
+        
+        ax1.plot(r * np.cos(theta), r * np.sin(theta), 'k-', linewidth=3)
+        ax1.fill_between(r * np.cos(theta), 0, r * np.sin(theta), alpha=0.1, color='lightgray')
+        
+        # Color zones
+        zones = [
+            (0, 40, 'red', 'Needs Improvement'),
+            (40, 70, 'orange', 'Good'),
+            (70, 100, 'green', 'Excellent')
+        ]
+        
+        for start, end, color, label in zones:
+            start_angle = np.pi * (1 - start/100)
+            end_angle = np.pi * (1 - end/100)
+            theta_zone = np.linspace(end_angle, start_angle, 50)
+            ax1.fill_between(r * np.cos(theta_zone), 0, r * np.sin(theta_zone), 
+                           alpha=0.3, color=color, label=label)
+        
+        # Needle
+        needle_angle = np.pi * (1 - efficiency_score/100)
+        ax1.arrow(0, 0, 0.8 * np.cos(needle_angle), 0.8 * np.sin(needle_angle),
+                 head_width=0.05, head_length=0.05, fc='black', ec='black', linewidth=3)
+        
+        ax1.set_xlim(-1.2, 1.2)
+        ax1.set_ylim(-0.2, 1.2)
+        ax1.set_aspect('equal')
+        ax1.axis('off')
+        ax1.set_title(f'Time Efficiency: {efficiency_score:.1f}%', fontsize=14, fontweight='bold', pad=20)
+        
+        # Time by topic
+        time_by_topic = time_analysis.get('time_by_topic', {})
+        if time_by_topic:
+            topics = list(time_by_topic.keys())
+            avg_times = [time_by_topic[topic].get('avg_time', 0) for topic in topics]
+            
+            topic_names = {
+                'numerical_reasoning': 'Numerical',
+                'logical_reasoning': 'Logical', 
+                'verbal_comprehension': 'Verbal',
+                'spatial_reasoning': 'Spatial'
+            }
+            
+            labels = [topic_names.get(topic, topic.replace('_', ' ').title()) for topic in topics]
+            colors = [TOPIC_COLORS.get(topic, APTITUDE_COLORS['info']) for topic in topics]
+            
+            bars = ax2.bar(labels, avg_times, color=colors, alpha=0.8, edgecolor='white', linewidth=2)
+            
+            # Add value labels
+            for bar, time_val in zip(bars, avg_times):
+                height = bar.get_height()
+                ax2.text(bar.get_x() + bar.get_width()/2., height + 2,
+                        f'{time_val:.1f}s',
+                        ha='center', va='bottom', fontweight='bold', fontsize=10)
+            
+            ax2.set_ylabel('Average Time (seconds)', fontsize=12, fontweight='bold')
+            ax2.set_xlabel('Topic', fontsize=12, fontweight='bold')
+            ax2.set_title('Average Time per Topic', fontsize=14, fontweight='bold', pad=20)
+            ax2.grid(axis='y', alpha=0.3)
+        
+        plt.tight_layout()
+        
+        # Save to base64
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
+        buffer.seek(0)
+        chart_b64 = base64.b64encode(buffer.read()).decode()
+        plt.close()
+        
+        return chart_b64
+        
+    except Exception as e:
+        logging.error(f"Time chart creation error: {e}")
+        return ""
+
+
+def create_percentile_visualization(percentile_rank: float, overall_score: float) -> str:
+    """Create percentile comparison visualization"""
+    try:
+        plt.style.use('seaborn-v0_8-whitegrid')
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        
+        # Percentile distribution
+        x = np.linspace(0, 100, 1000)
+        y = np.exp(-(x-50)**2/800)  # Bell curve approximation
+        
+        ax1.fill_between(x, 0, y, alpha=0.3, color=APTITUDE_COLORS['info'], label='All Test Takers')
+        ax1.fill_between(x[x <= percentile_rank], 0, y[x <= percentile_rank], 
+                        alpha=0.7, color=APTITUDE_COLORS['primary'], label=f'Your Percentile: {percentile_rank:.1f}%')
+        
+        ax1.axvline(percentile_rank, color=APTITUDE_COLORS['warning'], linewidth=3, linestyle='--', label='Your Position')
+        ax1.set_xlabel('Percentile Rank', fontsize=12, fontweight='bold')
+        ax1.set_ylabel('Distribution Density', fontsize=12, fontweight='bold')
+        ax1.set_title('Percentile Ranking', fontsize=14, fontweight='bold', pad=20)
+        ax1.legend()
+        ax1.grid(alpha=0.3)
+        
+        # Score comparison
+        score_ranges = [
+            (0, 40, 'Below Average', 'red'),
+            (40, 60, 'Average', 'orange'),
+            (60, 80, 'Above Average', 'lightgreen'),
+            (80, 100, 'Excellent', 'green')
+        ]
+        
+        for i, (start, end, label, color) in enumerate(score_ranges):
+            ax2.barh(i, end-start, left=start, color=color, alpha=0.6, edgecolor='white', linewidth=2)
+            ax2.text(start + (end-start)/2, i, label, ha='center', va='center', fontweight='bold', fontsize=10)
+        
+        # Your score indicator
+        ax2.axvline(overall_score, color='black', linewidth=4, linestyle='-', label=f'Your Score: {overall_score:.1f}%')
+        
+        ax2.set_xlabel('Score (%)', fontsize=12, fontweight='bold')
+        ax2.set_title('Score Comparison', fontsize=14, fontweight='bold', pad=20)
+        ax2.set_yticks([])
+        ax2.legend()
+        ax2.grid(axis='x', alpha=0.3)
+        
+        plt.tight_layout()
+        
+        # Save to base64
+        buffer = BytesIO()
+        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
+        buffer.seek(0)
+        chart_b64 = base64.b64encode(buffer.read()).decode()
+        plt.close()
+        
+        return chart_b64
+        
+    except Exception as e:
+        logging.error(f"Percentile chart creation error: {e}")
+        return ""
+
+def render_aptitude_report(payload: Dict[str, Any]) -> bytes:
+    """Comprehensive aptitude results report; payload holds the result and session documents"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+
+    result = payload["result"]
+    session = payload["session"]
+
+    # Create document
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    story = []
+
+    # Get styles
+    styles = getSampleStyleSheet()
+
+    # Custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        textColor=colors.HexColor(APTITUDE_COLORS['primary'])
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12,
+        spaceBefore=20,
+        textColor=colors.HexColor(APTITUDE_COLORS['dark'])
+    )
+
+    body_style = ParagraphStyle(
+        'CustomBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=12,
+        alignment=TA_JUSTIFY
+    )
+
+    # Header
+    story.append(Paragraph("APTITUDE TEST COMPREHENSIVE REPORT", title_style))
+    story.append(Spacer(1, 20))
+
+    # Executive Summary Section
+    story.append(Paragraph("EXECUTIVE SUMMARY", heading_style))
+
+    candidate_name = session.get('candidate_name', 'Anonymous')
+    test_date = session.get('start_time', datetime.utcnow()).strftime('%B %d, %Y')
+    overall_score = result.get('overall_score', 0)
+    percentile_rank = result.get('percentile_rank', 50)
+
+    summary_data = [
+        ['Candidate Name:', candidate_name],
+        ['Test Date:', test_date],
+        ['Overall Score:', f"{overall_score:.1f}%"],
+        ['Percentile Rank:', f"{percentile_rank:.1f}th percentile"],
+        ['Questions Attempted:', f"{result.get('questions_attempted', 0)} questions"],
+        ['Time Taken:', f"{result.get('total_time_taken', 0) // 60} minutes {result.get('total_time_taken', 0) % 60} seconds"]
+    ]
+
+    summary_table = Table(summary_data, colWidths=[2*inch, 3*inch])
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F8F9FA')),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor(APTITUDE_COLORS['dark'])),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('PADDIN', (0, 0), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6'))
+    ]))
+
+    story.append(summary_table)
+    story.append(Spacer(1, 20))
+
+    # Performance Level Assessment
+    if overall_score >= 80:
+        performance_level = "EXCELLENT"
+        level_color = "green"
+        level_description = "Outstanding performance demonstrating exceptional cognitive abilities across multiple domains."
+    elif overall_score >= 60:
+        performance_level = "GOOD"
+        level_color = "orange"
+        level_description = "Solid performance showing good aptitude with identified areas for targeted improvement."
+    elif overall_score >= 40:
+        performance_level = "AVERAGE"
+        level_color = "orange" 
+        level_description = "Average performance indicating foundational skills with significant development opportunities."
+    else:
+        performance_level = "NEEDS IMPROVEMENT"
+        level_color = "red"
+        level_description = "Performance indicates need for substantial skill development across core areas."
+
+    story.append(Paragraph(f"<b>Performance Level: {performance_level}</b>", 
+                         ParagraphStyle('PerformanceLevel', parent=body_style, 
+                                      textColor=colors.HexColor(APTITUDE_COLORS[level_color if level_color != 'green' else 'success']),
+                                      fontSize=14, spaceAfter=10)))
+    story.append(Paragraph(level_description, body_style))
+    story.append(Spacer(1, 20))
+
+    # Topic Performance Charts
+    story.append(Paragraph("DETAILED PERFORMANCE ANALYSIS", heading_style))
+
+    # Create and add radar chart
+    radar_chart = cached_chart(create_performance_radar_chart, result.get('topic_scores', {}))
+    if radar_chart:
+        try:
+            radar_img_data = base64.b64decode(radar_chart)
+            radar_img = Image(BytesIO(radar_img_data), width=6*inch, height=4*inch)
+            story.append(radar_img)
+            story.append(Spacer(1, 15))
+        except Exception as e:
+            logging.error(f"Error adding radar chart: {e}")
+
+    # Topic Scores Table
+    story.append(Paragraph("Topic-wise Performance Breakdown", 
+                         ParagraphStyle('SubHeading', parent=heading_style, fontSize=14)))
+
+    topic_names = {
+        'numerical_reasoning': 'Numerical Reasoning',
+        'logical_reasoning': 'Logical Reasoning', 
+        'verbal_comprehension': 'Verbal Comprehension',
+        'spatial_reasoning': 'Spatial Reasoning'
+    }
+
+    topic_data = [['Topic', 'Score', 'Total', 'Percentage', 'Avg. Time', 'Assessment']]
+
+    for topic, scores in result.get('topic_scores', {}).items():
+        topic_name = topic_names.get(topic, topic.replace('_', ' ').title())
+        score = scores.get('score', 0)
+        total = scores.get('total', 0)
+        percentage = scores.get('percentage', 0)
+        avg_time = scores.get('avg_time', 0)
+
+        if percentage >= 75:
+            assessment = "Strong"
+        elif percentage >= 50:
+            assessment = "Moderate"
+        else:
+            assessment = "Needs Work"
+
+        topic_data.append([
+            topic_name,
+            str(score),
+            str(total),
+            f"{percentage:.1f}%",
+            f"{avg_time:.1f}s",
+            assessment
+        ])
+
+    topic_table = Table(topic_data, colWidths=[2.2*inch, 0.6*inch, 0.6*inch, 0.8*inch, 0.8*inch, 1*inch])
+    topic_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(APTITUDE_COLORS['primary'])),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('PADDINGX', (0, 0), (-1, -1), 6),
+        ('PADDINGY', (0, 0), (-1, -1), 8)
+    ]))
+
+    story.append(topic_table)
+    story.append(PageBreak())
+
+    # Difficulty Analysis
+    story.append(Paragraph("DIFFICULTY PROGRESSION ANALYSIS", heading_style))
+
+    difficulty_chart = cached_chart(create_difficulty_progression_chart, result.get('difficulty_performance', {}))
+    if difficulty_chart:
+        try:
+            diff_img_data = base64.b64decode(difficulty_chart)
+            diff_img = Image(BytesIO(diff_img_data), width=7*inch, height=4*inch)
+            story.append(diff_img)
+            story.append(Spacer(1, 15))
+        except Exception as e:
+            logging.error(f"Error adding difficulty chart: {e}")
+
+    # Time Management Analysis
+    story.append(Paragraph("TIME MANAGEMENT ANALYSIS", heading_style))
+
+    time_analysis = result.get('time_management_analytics', {})
+    time_chart = cached_chart(create_time_management_chart, time_analysis)
+    if time_chart:
+        try:
+            time_img_data = base64.b64decode(time_chart)
+            time_img = Image(BytesIO(time_img_data), width=7*inch, height=4*inch)
+            story.append(time_img)
+            story.append(Spacer(1, 15))
+        except Exception as e:
+            logging.error(f"Error adding time chart: {e}")
+
+    # Time Management Insights
+    time_insights = time_analysis.get('time_management_insights', [])
+    if time_insights:
+        story.append(Paragraph("Time Management Insights:", 
+                             ParagraphStyle('InsightHeading', parent=body_style, fontName='Helvetica-Bold')))
+        for insight in time_insights:
+            story.append(Paragraph(f"• {insight}", body_style))
+        story.append(Spacer(1, 15))
+
+    # Percentile Comparison
+    story.append(Paragraph("COMPARATIVE PERFORMANCE", heading_style))
+
+    percentile_chart = cached_chart(create_percentile_visualization, percentile_rank, overall_score)
+    if percentile_chart:
+        try:
+            perc_img_data = base64.b64decode(percentile_chart)
+            perc_img = Image(BytesIO(perc_img_data), width=7*inch, height=4*inch)
+            story.append(perc_img)
+            story.append(Spacer(1, 15))
+        except Exception as e:
+            logging.error(f"Error adding percentile chart: {e}")
+
+    # Improvement Recommendations
+    story.append(Paragraph("PERSONALIZED IMPROVEMENT RECOMMENDATIONS", heading_style))
+
+    recommendations = result.get('recommendations', [])
+    if recommendations:
+        for i, rec in enumerate(recommendations, 1):
+            story.append(Paragraph(f"<b>{i}.</b> {rec}", body_style))
+            story.append(Spacer(1, 8))
+
+    story.append(Spacer(1, 20))
+
+    # Detailed Analysis
+    detailed_analysis = result.get('detailed_analysis', '')
+    if detailed_analysis:
+        story.append(Paragraph("COMPREHENSIVE ANALYSIS", heading_style))
+        # Split analysis into paragraphs
+        analysis_parts = detailed_analysis.split('**')
+        for part in analysis_parts:
+            if part.strip():
+                if part.strip().endswith(':'):
+                    # This is a heading
+                    story.append(Paragraph(f"<b>{part.strip()}</b>", 
+                                         ParagraphStyle('AnalysisHeading', parent=body_style, 
+                                                       fontName='Helvetica-Bold', spaceAfter=8)))
+                else:
+                    story.append(Paragraph(part.strip(), body_style))
+
+    # Footer
+    story.append(Spacer(1, 30))
+    story.append(Paragraph("Generated by Elite AI Aptitude Assessment System", 
+                         ParagraphStyle('Footer', parent=styles['Normal'], 
+                                      fontSize=9, alignment=TA_CENTER, 
+                                      textColor=colors.HexColor('#6C757D'))))
+
+    # Build PDF
+    doc.build(story)
+
+    return buffer.getvalue()
+
+
+def render_resume_analysis_report(payload: Dict[str, Any]) -> bytes:
+    """Resume gap analysis report"""
+    job_title = payload["job_title"]
+    job_description = payload["job_description"]
+    analysis_text = payload["analysis_text"]
+    current_time = payload["generated_at"]
+
+    # Generate PDF using reportlab
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter, A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    from reportlab.lib.units import inch
+
+    # Create PDF document
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Title
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=20,
+        textColor='darkblue'
+    )
+    story.append(Paragraph("Resume Gap Analysis Report", title_style))
+    story.append(Spacer(1, 12))
+
+    # Job details
+    story.append(Paragraph(f"<b>Position:</b> {job_title}", styles['Normal']))
+    story.append(Paragraph(f"<b>Generated on:</b> {current_time} UTC", styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    # Job description
+    story.append(Paragraph("<b>Job Requirements:</b>", styles['Heading2']))
+    story.append(Paragraph(job_description, styles['Normal']))
+    story.append(Spacer(1, 20))
+
+    # Analysis results
+    story.append(Paragraph("<b>Gap Analysis Results:</b>", styles['Heading2']))
+    story.append(Spacer(1, 12))
+
+    # Format the analysis text for PDF
+    analysis_lines = analysis_text.split('\n')
+    for line in analysis_lines:
+        if line.strip():
+            if line.startswith('•'):
+                story.append(Paragraph(line, styles['Normal']))
+            else:
+                story.append(Paragraph(line, styles['Normal']))
+            story.append(Spacer(1, 6))
+
+    # Build PDF
+    doc.build(story)
+
+    return buffer.getvalue()
+
+
+def render_rejection_reasons_report(payload: Dict[str, Any]) -> bytes:
+    """Candidate rejection reasons report"""
+    job_title = payload["job_title"]
+    job_description = payload["job_description"]
+    rejection_reasons_text = payload["rejection_reasons"]
+    current_time = payload["generated_at"]
+
+    # Generate Enhanced PDF using reportlab with improved formatting
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter, A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import HexColor, black, white, red, darkred, darkblue, darkgreen, orange
+    from reportlab.lib import colors
+
+    # Create PDF document with margins
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=50,
+        leftMargin=50,
+        topMargin=50,
+        bottomMargin=50
+    )
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Enhanced Title with background
+    title_style = ParagraphStyle(
+        'EnhancedTitle',
+        parent=styles['Title'],
+        fontSize=22,
+        spaceAfter=30,
+        spaceBefore=10,
+        textColor=white,
+        backColor=HexColor('#8B0000'),  # Dark red background
+        borderPadding=15,
+        alignment=1  # Center alignment
+    )
+    story.append(Paragraph("🚫 CANDIDATE REJECTION REASONS ANALYSIS", title_style))
+    story.append(Spacer(1, 20))
+
+    # Job details in a styled box
+    job_info_style = ParagraphStyle(
+        'JobInfo',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=6,
+        textColor=darkblue,
+        backColor=HexColor('#F0F8FF'),  # Light blue background
+        borderPadding=10
+    )
+
+    story.append(Paragraph(f"<b>📋 Position:</b> {job_title}", job_info_style))
+    story.append(Paragraph(f"<b>🕒 Generated on:</b> {current_time} UTC", job_info_style))
+    story.append(Spacer(1, 25))
+
+    # Executive Summary Section
+    summary_title_style = ParagraphStyle(
+        'SummaryTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=15,
+        textColor=white,
+        backColor=HexColor('#2E8B57'),  # Sea green
+        borderPadding=8,
+        alignment=0
+    )
+    story.append(Paragraph("📊 EXECUTIVE SUMMARY", summary_title_style))
+
+    # Parse rejection reasons to count gaps by severity
+    critical_count = len(re.findall(r'CRITICAL', rejection_reasons_text, re.IGNORECASE))
+    major_count = len(re.findall(r'MAJOR', rejection_reasons_text, re.IGNORECASE))
+    moderate_count = len(re.findall(r'MODERATE', rejection_reasons_text, re.IGNORECASE))
+    total_gaps = len(re.findall(r'• \*\*.*?\*\*:', rejection_reasons_text))
+
+    summary_style = ParagraphStyle(
+        'Summary',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=8,
+        backColor=HexColor('#F5F5F5'),
+        borderPadding=8
+    )
+
+    story.append(Paragraph(f"<b>Total Rejection Reasons Identified:</b> {total_gaps}", summary_style))
+    story.append(Paragraph(f"<b>🔴 Critical Issues:</b> {critical_count} | <b>🟠 Major Issues:</b> {major_count} | <b>🟡 Moderate Issues:</b> {moderate_count}", summary_style))
+    story.append(Paragraph("<b>Recommendation:</b> <font color='red'>REJECT</font> - Multiple critical gaps identified that prevent successful role performance.", summary_style))
+    story.append(Spacer(1, 20))
+
+    # Job Requirements Section
+    job_req_title_style = ParagraphStyle(
+        'JobReqTitle',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        textColor=white,
+        backColor=HexColor('#4682B4'),  # Steel blue
+        borderPadding=8
+    )
+    story.append(Paragraph("📋 JOB REQUIREMENTS", job_req_title_style))
+
+    job_desc_style = ParagraphStyle(
+        'JobDesc',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=10,
+        backColor=HexColor('#F8F8FF'),  # Ghost white
+        borderPadding=10,
+        firstLineIndent=0
+    )
+    story.append(Paragraph(job_description, job_desc_style))
+    story.append(Spacer(1, 20))
+
+    # Main Analysis Section
+    analysis_title_style = ParagraphStyle(
+        'AnalysisTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=15,
+        textColor=white,
+        backColor=HexColor('#8B0000'),  # Dark red
+        borderPadding=8
+    )
+    story.append(Paragraph("🔍 COMPREHENSIVE REJECTION ANALYSIS", analysis_title_style))
+    story.append(Spacer(1, 10))
+
+    # Enhanced formatting for rejection reasons
+    rejection_lines = rejection_reasons_text.split('\n')
+    current_category = ""
+    gap_counter = 1
+
+    for line in rejection_lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Main rejection reason (bullet point)
+        if line.startswith('• **') and line.endswith('**:') or '**:' in line:
+            # Extract category and reason
+            main_bullet_style = ParagraphStyle(
+                'MainBullet',
+                parent=styles['Normal'],
+                fontSize=12,
+                spaceAfter=8,
+                spaceBefore=15,
+                leftIndent=10,
+                textColor=white,
+                backColor=HexColor('#DC143C'),  # Crimson
+                borderPadding=8,
+                fontName='Helvetica-Bold'
+            )
+
+            # Clean up the formatting and add numbering
+            clean_line = line.replace('• **', '').replace('**:', '')
+            numbered_line = f"#{gap_counter}. {clean_line}"
+            story.append(Paragraph(numbered_line, main_bullet_style))
+            gap_counter += 1
+
+        # Sub-points (Required, Candidate Reality, Gap Impact)
+        elif line.startswith('- '):
+            if 'Required:' in line:
+                required_style = ParagraphStyle(
+                    'Required',
+                    parent=styles['Normal'],
+                    fontSize=10,
+                    spaceAfter=4,
+                    leftIndent=25,
+                    textColor=HexColor('#8B0000'),  # Dark red
+                    fontName='Helvetica-Bold'
+                )
+                story.append(Paragraph(f"🎯 {line}", required_style))
+
+            elif 'Candidate Reality:' in line:
+                reality_style = ParagraphStyle(
+                    'Reality',
+                    parent=styles['Normal'],
+                    fontSize=10,
+                    spaceAfter=4,
+                    leftIndent=25,
+                    textColor=HexColor('#4682B4'),  # Steel blue
+                    fontName='Helvetica-Bold'
+                )
+                story.append(Paragraph(f"👤 {line}", reality_style))
+
+            elif 'Gap Impact:' in line:
+                impact_style = ParagraphStyle(
+                    'Impact',
+                    parent=styles['Normal'],
+                    fontSize=10,
+                    spaceAfter=4,
+                    leftIndent=25,
+                    textColor=HexColor('#FF4500'),  # Orange red
+                    fontName='Helvetica-Bold'
+                )
+                story.append(Paragraph(f"⚠️ {line}", impact_style))
+
+            else:
+                # Other sub-points
+                sub_style = ParagraphStyle(
+                    'SubPoint',
+                    parent=styles['Normal'],
+                    leftIndent=30,
+                    spaceAfter=3,
+                    fontSize=10,
+                    textColor=black
+                )
+                story.append(Paragraph(line, sub_style))
+
+        # Section headers
+        elif line.startswith('**') and line.endswith('**') and ':' not in line:
+            section_style = ParagraphStyle(
+                'SectionHeader',
+                parent=styles['Heading3'],
+                fontSize=13,
+                spaceAfter=10,
+                spaceBefore=15,
+                textColor=HexColor('#2E8B57'),  # Sea green
+                fontName='Helvetica-Bold'
+            )
+            clean_section = line.replace('**', '')
+            story.append(Paragraph(f"📂 {clean_section}", section_style))
+
+        # Regular text
+        else:
+            if line:
+                regular_style = ParagraphStyle(
+                    'Regular',
+                    parent=styles['Normal'],
+                    fontSize=10,
+                    spaceAfter=6,
+                    leftIndent=15
+                )
+                story.append(Paragraph(line, regular_style))
+
+    # Enhanced Footer Section
+    story.append(Spacer(1, 30))
+
+    # Add a separator line
+    line_style = ParagraphStyle(
+        'Line',
+        parent=styles['Normal'],
+        fontSize=14,
+        alignment=1,
+        textColor=HexColor('#8B0000')
+    )
+    story.append(Paragraph("_" * 80, line_style))
+    story.append(Spacer(1, 15))
+
+    footer_title_style = ParagraphStyle(
+        'FooterTitle',
+        parent=styles['Heading3'],
+        fontSize=12,
+        spaceAfter=8,
+        textColor=HexColor('#2E8B57'),
+        alignment=1,
+        fontName='Helvetica-Bold'
+    )
+    story.append(Paragraph("📝 ANALYSIS NOTES", footer_title_style))
+
+    footer_style = ParagraphStyle(
+        'Footer',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=HexColor('#666666'),
+        alignment=1,  # Center alignment
+        spaceAfter=4
+    )
+    story.append(Paragraph("🤖 This comprehensive rejection analysis was generated using advanced AI-powered gap analysis technology.", footer_style))
+    story.append(Paragraph("📞 For questions or clarifications, please consult with HR or the hiring manager.", footer_style))
+    story.append(Paragraph("⚡ Analysis considers technical skills, experience, qualifications, and cultural fit factors.", footer_style))
+
+    # Build PDF
+    doc.build(story)
+
+    return buffer.getvalue()
+
+
+def render_technical_questions_report(payload: Dict[str, Any]) -> bytes:
+    """Technical interview questions report, rendered from the generated HTML"""
+    job_title = payload["job_title"]
+    html_content = payload["html_content"]
+    current_time = payload["generated_at"]
+
+    # Convert HTML to PDF using weasyprint for better quality
+    try:
+        # Generate PDF from HTML using weasyprint
+        import weasyprint
+
+        # Convert HTML to PDF with proper styling
+        try:
+            pdf_bytes = weasyprint.HTML(string=html_content).write_pdf()
+            logging.info("Successfully generated PDF using weasyprint")
+            return pdf_bytes
+        except Exception as weasy_error:
+            logging.warning(f"Weasyprint error: {weasy_error}, trying pdfkit fallback")
+            # Try pdfkit as fallback
+            import pdfkit
+            options = {
+                'page-size': 'A4',
+                'margin-top': '0.75in',
+                'margin-right': '0.75in',
+                'margin-bottom': '0.75in',
+                'margin-left': '0.75in',
+                'encoding': "UTF-8",
+                'no-outline': None,
+                'enable-local-file-access': None
+            }
+            pdf_bytes = pdfkit.from_string(html_content, False, options=options)
+            logging.info("Successfully generated PDF using pdfkit")
+            return pdf_bytes
+
+    except ImportError as import_error:
+        logging.warning(f"HTML to PDF libraries not available: {import_error}, using reportlab fallback")
+        # Final fallback to reportlab with HTML parsing
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter, A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.lib.units import inch
+        from reportlab.lib.colors import HexColor, white, darkblue
+        from html import unescape
+
+        # Create PDF document
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
+        styles = getSampleStyleSheet()
+        story = []
+
+        # Title
+        title_style = ParagraphStyle(
+            'EnhancedTitle',
+            parent=styles['Title'],
+            fontSize=22,
+            spaceAfter=30,
+            spaceBefore=10,
+            textColor=white,
+            backColor=HexColor('#2c3e50'),
+            borderPadding=15,
+            alignment=1
+        )
+        story.append(Paragraph("💻 TECHNICAL INTERVIEW QUESTIONS", title_style))
+        story.append(Spacer(1, 20))
+
+        # Job details
+        job_info_style = ParagraphStyle(
+            'JobInfo',
+            parent=styles['Normal'],
+            fontSize=12,
+            spaceAfter=6,
+            textColor=darkblue,
+            backColor=HexColor('#ecf0f1'),
+            borderPadding=10
+        )
+
+        story.append(Paragraph(f"<b>📋 Position:</b> {job_title}", job_info_style))
+        story.append(Paragraph(f"<b>🕒 Generated on:</b> {current_time} UTC", job_info_style))
+        story.append(Spacer(1, 25))
+
+        # Parse HTML content and extract text for PDF
+        # Remove HTML tags but preserve structure
+        clean_text = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
+        clean_text = re.sub(r'<script[^>]*>.*?</script>', '', clean_text, flags=re.DOTALL)
+        clean_text = re.sub(r'<head[^>]*>.*?</head>', '', clean_text, flags=re.DOTALL)
+        clean_text = re.sub(r'<[^>]+>', ' ', clean_text)
+        clean_text = unescape(clean_text)
+        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+
+        # Split into paragraphs and create PDF content
+        content_style = ParagraphStyle('Content', parent=styles['Normal'], fontSize=11, spaceAfter=12, leftIndent=20)
+
+        # Look for question patterns
+        question_blocks = []
+        lines = clean_text.split('\n')
+        current_block = []
+
+        for line in lines:
+            line = line.strip()
+            if line:
+                if 'Question' in line and ':' in line:
+                    if current_block:
+                        question_blocks.append(' '.join(current_block))
+                    current_block = [line]
+                else:
+                    current_block.append(line)
+
+        if current_block:
+            question_blocks.append(' '.join(current_block))
+
+        # Add content to PDF
+        if question_blocks:
+            for i, block in enumerate(question_blocks[:25], 1):  # Limit to 25 questions max
+                if block.strip():
+                    # Clean the text for safe PDF rendering
+                    safe_block = block.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                    safe_block = re.sub(r'\s+', ' ', safe_block).strip()
+
+                    if len(safe_block) > 500:  # Split very long blocks
+                        parts = [safe_block[i:i+500] for i in range(0, len(safe_block), 500)]
+                        for part in parts:
+                            if part.strip():
+                                story.append(Paragraph(part, content_style))
+                                story.append(Spacer(1, 8))
+                    else:
+                        story.append(Paragraph(safe_block, content_style))
+                        story.append(Spacer(1, 12))
+        else:
+            # Fallback content if no questions were parsed
+            fallback_content = """
+            This document contains technical interview questions generated for the specified role.
+            The questions are designed to assess technical competency and role alignment.
+            """
+            story.append(Paragraph(fallback_content, content_style))
+
+        # Build PDF
+        try:
+            doc.build(story)
+            logging.info("Successfully generated PDF using reportlab fallback")
+            return buffer.getvalue()
+        except Exception as build_error:
+            logging.error(f"PDF build error: {build_error}")
+            # Create minimal PDF as last resort
+            buffer = BytesIO()
+            c = canvas.Canvas(buffer, pagesize=A4)
+            c.drawString(100, 750, f"Technical Interview Questions - {job_title}")
+            c.drawString(100, 720, f"Generated on: {current_time}")
+            c.drawString(100, 680, "Technical interview questions are available in the system.")
+            c.save()
+            logging.info("Created minimal fallback PDF")
+            return buffer.getvalue()
+
+    except Exception as pdf_error:
+        logging.error(f"PDF generation error: {pdf_error}")
+        # Create minimal PDF as final fallback
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import A4
+
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4)
+        c.drawString(100, 750, f"Technical Interview Questions - {job_title}")
+        c.drawString(100, 720, f"Generated on: {current_time}")
+        c.drawString(100, 680, "Error generating detailed questions. Please try again.")
+        c.save()
+        logging.info("Created error fallback PDF")
+        return buffer.getvalue()
+
+
+def render_behavioral_questions_report(payload: Dict[str, Any]) -> bytes:
+    """Behavioral interview questions report, rendered from the generated HTML"""
+    job_title = payload["job_title"]
+    html_content = payload["html_content"]
+    current_time = payload["generated_at"]
+
+    # Convert HTML to PDF using the same approach as technical questions
+    try:
+        # Generate PDF from HTML using weasyprint
+        import weasyprint
+
+        # Convert HTML to PDF with proper styling
+        try:
+            pdf_bytes = weasyprint.HTML(string=html_content).write_pdf()
+            logging.info("Successfully generated PDF using weasyprint")
+            return pdf_bytes
+        except Exception as weasy_error:
+            logging.warning(f"Weasyprint error: {weasy_error}, trying pdfkit fallback")
+            # Try pdfkit as fallback
+            import pdfkit
+            options = {
+                'page-size': 'A4',
+                'margin-top': '0.75in',
+                'margin-right': '0.75in',
+                'margin-bottom': '0.75in',
+                'margin-left': '0.75in',
+                'encoding': "UTF-8",
+                'no-outline': None,
+                'enable-local-file-access': None
+            }
+            pdf_bytes = pdfkit.from_string(html_content, False, options=options)
+            logging.info("Successfully generated PDF using pdfkit")
+            return pdf_bytes
+
+    except ImportError as import_error:
+        logging.warning(f"HTML to PDF libraries not available: {import_error}, using reportlab fallback")
+        # Final fallback to reportlab with HTML parsing
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter, A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.lib.units import inch
+        from reportlab.lib.colors import HexColor, white, darkblue
+        from html import unescape
+
+        # Create PDF document
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
+        styles = getSampleStyleSheet()
+        story = []
+
+        # Title - Using same styling as technical questions
+        title_style = ParagraphStyle(
+            'EnhancedTitle',
+            parent=styles['Title'],
+            fontSize=22,
+            spaceAfter=30,
+            spaceBefore=10,
+            textColor=white,
+            backColor=HexColor('#2c3e50'),  # Same as technical questions
+            borderPadding=15,
+            alignment=1
+        )
+        story.append(Paragraph("🗣️ BEHAVIORAL INTERVIEW QUESTIONS", title_style))
+        story.append(Spacer(1, 20))
+
+        # Job details - Using same styling as technical questions
+        job_info_style = ParagraphStyle(
+            'JobInfo',
+            parent=styles['Normal'],
+            fontSize=12,
+            spaceAfter=6,
+            textColor=darkblue,
+            backColor=HexColor('#ecf0f1'),  # Same as technical questions
+            borderPadding=10
+        )
+
+        story.append(Paragraph(f"<b>📋 Position:</b> {job_title}", job_info_style))
+        story.append(Paragraph(f"<b>🕒 Generated on:</b> {current_time} UTC", job_info_style))
+        story.append(Spacer(1, 25))
+
+        # Parse HTML content and extract text for PDF with enhanced question detection
+        # Remove HTML tags but preserve structure
+        clean_text = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
+        clean_text = re.sub(r'<script[^>]*>.*?</script>', '', clean_text, flags=re.DOTALL)
+        clean_text = re.sub(r'<head[^>]*>.*?</head>', '', clean_text, flags=re.DOTALL)
+        clean_text = re.sub(r'<[^>]+>', '\n', clean_text)  # Replace HTML tags with newlines for better parsing
+        clean_text = unescape(clean_text)
+        clean_text = re.sub(r'\n\s*\n', '\n\n', clean_text)  # Normalize multiple newlines
+        clean_text = clean_text.strip()
+
+        # Enhanced question extraction with multiple patterns and improved formatting
+        content_style = ParagraphStyle('Content', parent=styles['Normal'], fontSize=11, spaceAfter=12, leftIndent=20)
+        question_header_style = ParagraphStyle('QuestionHeader', parent=styles['Normal'], fontSize=12, spaceAfter=8, 
+                                             textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold')
+
+        # Look for various question patterns
+        question_blocks = []
+
+        # Split by common separators that indicate new questions
+        potential_questions = []
+
+        # Try multiple splitting patterns
+        patterns = [
+            r'(?=Question\s*\d+)',  # Split before "Question 1", "Question 2", etc.
+            r'(?=\d+\.\s)',         # Split before "1. ", "2. ", etc.
+            r'(?=Q\d+)',           # Split before "Q1", "Q2", etc.
+            r'(?=\n\s*\d+\s*[.:])', # Split before numbered items with various separators
+        ]
+
+        for pattern in patterns:
+            splits = re.split(pattern, clean_text, flags=re.MULTILINE)
+            if len(splits) > len(potential_questions):
+                potential_questions = splits
+
+        # If no clear pattern found, split by double newlines and look for question-like content
+        if len(potential_questions) <= 3:
+            potential_questions = clean_text.split('\n\n')
+
+        # Process and filter questions with enhanced section header detection
+        processed_questions = []
+        section_headers = []
+        question_count = 0
+
+        # First pass: identify section headers
+        section_header_patterns = [
+            r'(?i)(leadership|strategic\s+thinking|collaboration|resilience|role-specific).*?(excellence|mastery|leadership)',
+            r'(?i)^(leadership|strategic|collaboration|resilience|role-specific)\s*$'
+        ]
+
+        for i, block in enumerate(potential_questions):
+            block = block.strip()
+            if not block:
+                continue
+
+            # Check if this is a section header
+            is_header = False
+            for pattern in section_header_patterns:
+                if re.search(pattern, block) and len(block) < 150 and not any(word in block.lower() for word in ['describe', 'tell me', 'give me', 'how did', 'what was']):
+                    section_headers.append((i, block.title()))
+                    is_header = True
+                    break
+
+            if is_header:
+                continue
+
+            # Skip metadata sections
+            if any(skip_term in block.lower() for skip_term in ['behavioral interview questions', 'cultural fit', 'assessment', 'star method', 'candidate:', 'position:', 'generated on']):
+                continue
+
+            # Look for question-like content
+            if (len(block) > 50 and  # Reasonable length
+                ('?' in block or 'question' in block.lower() or 
+                 any(word in block.lower() for word in ['describe', 'tell me', 'give me an example', 'how did you', 'what was', 'when have you']))):
+
+                question_count += 1
+
+                # Clean and format the question with improved structure
+                formatted_block = re.sub(r'\s+', ' ', block).strip()
+
+                processed_questions.append((question_count, formatted_block))
+
+                # Limit to 25 questions
+                if question_count >= 25:
+                    break
+
+        # If we still don't have enough questions, try a more aggressive extraction
+        if len(processed_questions) < 15:
+            # Split by sentences and look for question patterns
+            sentences = re.split(r'[.!?]+', clean_text)
+            question_sentences = []
+
+            for sentence in sentences:
+                sentence = sentence.strip()
+                if (len(sentence) > 30 and
+                    any(pattern in sentence.lower() for pattern in [
+                        'describe', 'tell me', 'give me an example', 'how did you', 'what was',
+                        'when have you', 'can you share', 'walk me through', 'explain how'
+                    ])):
+                    question_sentences.append(sentence + '?')
+
+            # Combine with processed questions
+            processed_questions.extend(question_sentences[:25-len(processed_questions)])
+
+        # Add content to PDF with improved formatting and line breaks
+        if processed_questions:
+            # Add section header
+            section_header = ParagraphStyle('SectionHeader', parent=styles['Normal'], fontSize=14, spaceAfter=15,
+                                          textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold')
+            story.append(Paragraph("COMPREHENSIVE BEHAVIORAL ASSESSMENT QUESTIONS", section_header))
+            story.append(Spacer(1, 15))
+
+            # Create enhanced styles for better formatting
+            question_number_style = ParagraphStyle('QuestionNumber', parent=styles['Normal'], fontSize=12, spaceAfter=4,
+                                                 textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold')
+            question_content_style = ParagraphStyle('QuestionContent', parent=styles['Normal'], fontSize=11, spaceAfter=6,
+                                                   leftIndent=20, rightIndent=20, alignment=0)
+            assessment_style = ParagraphStyle('Assessment', parent=styles['Normal'], fontSize=10, spaceAfter=4,
+                                            leftIndent=30, rightIndent=20, textColor=HexColor('#555555'))
+            probes_style = ParagraphStyle('Probes', parent=styles['Normal'], fontSize=10, spaceAfter=8,
+                                        leftIndent=40, rightIndent=20, textColor=HexColor('#27ae60'))
+            subsection_header_style = ParagraphStyle('SubsectionHeader', parent=styles['Normal'], fontSize=13, spaceAfter=10, spaceBefore=20,
+                                                   textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold', backColor=HexColor('#ecf0f1'), borderPadding=8)
+
+            # ENHANCED FORMATTING: Add proper line breaks and structure formatting
+            def format_text_with_breaks(text):
+                """Add proper line breaks and structure for better readability"""
+
+                # First, identify and separate different parts of the question
+                # Look for "Assesses" pattern which indicates the assessment section
+                assessment_pattern = r'(\?\s*)(Assesses [^.]*\.)'
+                assessment_match = re.search(assessment_pattern, text)
+
+                # Look for "Follow-up Probes" pattern
+                probes_pattern = r'(Follow-up Probes?:\s*)(.*?)$'
+                probes_match = re.search(probes_pattern, text, re.DOTALL)
+
+                # Separate question, assessment, and probes
+                if assessment_match:
+                    question_text = text[:assessment_match.start(2)].strip()
+
+                    if probes_match:
+                        assessment_text = text[assessment_match.start(2):probes_match.start(1)].strip()
+                        probes_text = text[probes_match.start():]
+                    else:
+                        assessment_text = text[assessment_match.start(2):].strip()
+                        probes_text = ""
+                else:
+                    # If no clear assessment pattern, just split on question marks
+                    parts = text.split('?', 1)
+                    if len(parts) > 1:
+                        question_text = parts[0] + '?'
+                        remaining = parts[1].strip()
+
+                        if probes_match:
+                            assessment_text = remaining[:probes_match.start(1) - len(parts[0]) - 1].strip()
+                            probes_text = remaining[probes_match.start(1) - len(parts[0]) - 1:]
+                        else:
+                            assessment_text = remaining
+                            probes_text = ""
+                    else:
+                        question_text = text
+                        assessment_text = ""
+                        probes_text = ""
+
+                # Format each section with proper breaks
+                formatted_parts = []
+
+                # 1. Format the main question
+                if question_text:
+                    # Add line breaks after periods and question marks within the question
+                    q = re.sub(r'(\.)(\s+)([A-Z][a-z])', r'\1<br/><br/>\3', question_text)
+                    q = re.sub(r'(\?)(\s+)([A-Z][a-z])', r'\1<br/><br/>\3', q)
+                    formatted_parts.append(f'<b>{q.strip()}</b>')
+
+                # 2. Format the assessment section
+                if assessment_text:
+                    # Clean up assessment text
+                    assessment_clean = assessment_text.replace('Assesses ', '').strip()
+                    if assessment_clean:
+                        formatted_parts.append(f'<br/><i><b>Assessment Focus:</b> {assessment_clean}</i>')
+
+                # 3. Format the follow-up probes section
+                if probes_text:
+                    probes_clean = probes_text.replace('Follow-up Probes:', '').replace('Follow-up Probe:', '').strip()
+
+                    # Split probes by question marks for better formatting
+                    if probes_clean:
+                        # Split individual probe questions
+                        probe_questions = re.split(r'(\?\s*)', probes_clean)
+                        formatted_probes = []
+                        current_probe = ""
+
+                        for part in probe_questions:
+                            if part.strip() == '?' or part.strip() == '? ':
+                                current_probe += '?'
+                                if current_probe.strip():
+                                    formatted_probes.append(f'• {current_probe.strip()}')
+                                    current_probe = ""
+                            else:
+                                current_probe += part
+
+                        # Add any remaining probe
+                        if current_probe.strip():
+                            formatted_probes.append(f'• {current_probe.strip()}')
+
+                        if formatted_probes:
+                            formatted_parts.append('<br/><b>Follow-up Probes:</b>')
+                            for probe in formatted_probes:
+                                formatted_parts.append(f'<br/>{probe}')
+
+                # Join all parts with proper spacing
+                return '<br/>'.join(formatted_parts)
+
+            current_section = ""
+            for item in processed_questions[:25]:
+                # Handle both tuple and string formats for backward compatibility
+                if isinstance(item, tuple):
+                    question_num, question_text = item
+                else:
+                    question_num = processed_questions.index(item) + 1
+                    question_text = item
+
+                # Check if we need to add a section header before this question
+                for header_index, header_text in section_headers:
+                    if header_index <= question_num <= header_index + 6:  # Section applies to next few questions
+                        if header_text != current_section:
+                            story.append(Paragraph(f"📋 {header_text.upper()}", subsection_header_style))
+                            story.append(Spacer(1, 10))
+                            current_section = header_text
+                        break
+
+                if question_text.strip():
+                    # Add question number
+                    story.append(Paragraph(f"Question {question_num:02d}.", question_number_style))
+
+                    # Apply enhanced formatting to the question
+                    formatted_question = format_text_with_breaks(question_text)
+
+                    # Clean and safely format the question text for PDF rendering
+                    # Remove any malformed HTML tags and clean the content
+                    clean_question = re.sub(r'<[^>]*>', '', formatted_question)  # Remove all HTML tags first
+                    clean_question = re.sub(r'\s+', ' ', clean_question).strip()  # Normalize whitespace
+
+                    # Now apply safe formatting without HTML tags for reportlab
+                    # Split content by logical sections for proper styling
+                    content_parts = clean_question.split('Assessment Focus:')
+
+                    # Main question part
+                    main_question = content_parts[0].strip()
+                    if main_question:
+                        story.append(Paragraph(main_question, question_content_style))
+
+                    # Assessment and probes part
+                    if len(content_parts) > 1:
+                        remaining_content = content_parts[1].strip()
+
+                        # Split assessment from probes
+                        if 'Follow-up Probes:' in remaining_content:
+                            assessment_and_probes = remaining_content.split('Follow-up Probes:', 1)
+
+                            # Assessment section
+                            if assessment_and_probes[0].strip():
+                                story.append(Paragraph(f"Assessment Focus: {assessment_and_probes[0].strip()}", assessment_style))
+
+                            # Probes section
+                            if len(assessment_and_probes) > 1 and assessment_and_probes[1].strip():
+                                story.append(Paragraph("Follow-up Probes:", assessment_style))
+                                # Split individual probes
+                                probes = assessment_and_probes[1].strip()
+                                probe_lines = [line.strip() for line in probes.split('•') if line.strip()]
+                                for probe in probe_lines:
+                                    if probe:
+                                        story.append(Paragraph(f"• {probe}", probes_style))
+                        else:
+                            # Just assessment, no probes
+                            story.append(Paragraph(f"Assessment Focus: {remaining_content}", assessment_style))
+
+                    # Add extra spacing between questions
+                    story.append(Spacer(1, 25))
+        else:
+            # Enhanced fallback content
+            fallback_content = f"""
+            <b>Comprehensive Behavioral Interview Questions for {job_title}</b><br/><br/>
+            This document contains professionally crafted behavioral interview questions designed to assess:<br/>
+            • Leadership and influence capabilities<br/>
+            • Strategic thinking and decision-making skills<br/>  
+            • Collaboration and teamwork effectiveness<br/>
+            • Resilience and adaptability under pressure<br/>
+            • Role-specific competencies and cultural fit<br/><br/>
+            Each question follows the STAR methodology (Situation, Task, Action, Result) to evaluate past behavior as a predictor of future performance.<br/><br/>
+            <i>Note: The complete set of 25 behavioral questions is available in the system for comprehensive candidate assessment.</i>
+            """
+            story.append(Paragraph(fallback_content, content_style))
+
+        # Build PDF
+        try:
+            doc.build(story)
+            logging.info("Successfully generated PDF using reportlab fallback")
+            return buffer.getvalue()
+        except Exception as build_error:
+            logging.error(f"PDF build error: {build_error}")
+            # Create minimal PDF as last resort
+            buffer = BytesIO()
+            c = canvas.Canvas(buffer, pagesize=A4)
+            c.drawString(100, 750, f"Behavioral Interview Questions - {job_title}")
+            c.drawString(100, 720, f"Generated on: {current_time}")
+            c.drawString(100, 680, "Behavioral interview questions are available in the system.")
+            c.save()
+            logging.info("Created minimal fallback PDF")
+            return buffer.getvalue()
+
+    except Exception as pdf_error:
+        logging.error(f"PDF generation error: {pdf_error}")
+        # Create minimal PDF as final fallback
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import A4
+
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pagesize=A4)
+        c.drawString(100, 750, f"Behavioral Interview Questions - {job_title}")
+        c.drawString(100, 720, f"Generated on: {current_time}")
+        c.drawString(100, 680, "Error generating detailed questions. Please try again.")
+        c.save()
+        logging.info("Created error fallback PDF")
+        return buffer.getvalue()
+
+
+def render_ats_report(payload: Dict[str, Any]) -> bytes:
+    """ATS score report"""
+    job_title = payload["job_title"]
+    ats_analysis_text = payload["analysis_text"]
+    ats_score = payload["ats_score"]
+    current_time = payload["generated_at"]
+
+    # Generate PDF using reportlab with enhanced professional formatting
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter, A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle, KeepTogether
+    from reportlab.lib.units import inch
+    from reportlab.lib.colors import HexColor, Color
+    from reportlab.lib import colors
+    from reportlab.graphics.shapes import Drawing, Rect
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.charts.textlabels import Label
+
+    def parse_ats_analysis(analysis_text):
+        """Parse the ATS analysis text into structured sections with comprehensive modern format recognition"""
+        sections = {}
+        lines = analysis_text.split('\n')
+        current_section = None
+        current_content = []
+
+        # Extract key sections using modern AI-generated patterns
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            # Check for AI-generated section headers (updated for current format)
+            if any(keyword in line.upper() for keyword in ['COMPREHENSIVE ATS SCORE', 'OVERALL ATS SCORE', 'FINAL SCORE']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'ats_score'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['DETAILED SCORING BREAKDOWN', 'SCORE BREAKDOWN', 'SCORING BREAKDOWN']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'scoring_breakdown'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['CRITICAL IMPROVEMENT AREAS', 'IMPROVEMENT AREAS', 'AREAS FOR IMPROVEMENT']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'improvement_areas'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['IMPLEMENTATION ROADMAP', 'ROADMAP', 'ACTION PLAN']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'implementation_roadmap'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['IMMEDIATE FIXES', 'SHORT TERM', 'STRATEGIC DEVELOPMENT']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'timeline_improvements'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['ATS OPTIMIZATION CHECKLIST', 'OPTIMIZATION CHECKLIST', 'CHECKLIST']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'optimization_checklist'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['HIRING PROBABILITY', 'PROBABILITY ASSESSMENT', 'COMPETITIVE POSITIONING']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'probability_assessment'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['ENHANCED ANALYSIS INSIGHTS', 'CONTENT ANALYSIS RESULTS', 'KEYWORD MATCHING ANALYSIS', 'HYBRID SCORING CALCULATION']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'enhanced_insights'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['SCORE ENHANCEMENT RECOMMENDATIONS', 'RECOMMENDATIONS', 'SUGGESTIONS']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'recommendations'
+                current_content = [line]
+            # Legacy format support for backward compatibility
+            elif any(keyword in line.upper() for keyword in ['EDUCATIONAL', 'EDUCATION', 'DEGREE', 'CERTIFICATION']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'education'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['JOB HISTORY', 'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'CAREER']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'job_history'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['PROJECTS', 'PROJECT', 'PORTFOLIO']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'projects'
+                current_content = [line]
+            elif any(keyword in line.upper() for keyword in ['SKILL', 'TECHNICAL', 'COMPETENC', 'TECHNOLOG']):
+                if current_section:
+                    sections[current_section] = '\n'.join(current_content)
+                current_section = 'skills'
+                current_content = [line]
+            elif current_section:
+                current_content.append(line)
+            else:
+                # Start a general section for unmatched content
+                if not current_section:
+                    current_section = 'general_analysis'
+                    current_content = [line]
+                else:
+                    current_content.append(line)
+
+        # Add the last section
+        if current_section:
+            sections[current_section] = '\n'.join(current_content)
+
+        return sections
+
+    def extract_scores(analysis_text):
+        """Extract individual scores from the analysis text across multiple known formats.
+        Returns dict like {category: {score: int, max: int, label: str}}
+        Supported categories: keyword, experience, technical, education, achievements, projects
+        """
+        scores = {}
+        text = analysis_text
+        # Normalize unicode emojis and bold markers away for easier matching
+        text = text.replace('**', '')
+
+        # Helper to register a score if better info found later
+        def set_score(key, score, max_score, label):
+            prev = scores.get(key)
+            max_score_int = int(max_score)  # Convert to int before comparison
+            if not prev or (prev and prev['max'] < max_score_int):
+                scores[key] = {'score': int(score), 'max': max_score_int, 'label': label}
+
+        # Patterns (case-insensitive) for multiple phrasings
+        patterns = [
+            # Modern breakdown with names
+            (r"Keyword\s+Optimization\s*:\s*(\d+)\s*/\s*(\d+)", 'keyword', 'Keyword Optimization'),
+            (r"Keyword\s+Analysis\s*:\s*(\d+)\s*/\s*(\d+)", 'keyword', 'Keyword Analysis'),
+
+            (r"Experience\s+Relevance\s*:\s*(\d+)\s*/\s*(\d+)", 'experience', 'Experience Relevance'),
+            (r"Experience\s+Evaluation\s*:\s*(\d+)\s*/\s*(\d+)", 'experience', 'Experience Evaluation'),
+
+            (r"Technical\s+Competenc(?:y|ies)\s*:\s*(\d+)\s*/\s*(\d+)", 'technical', 'Technical Competency'),
+            (r"Technical\s+Skills?\s*:\s*(\d+)\s*/\s*(\d+)", 'technical', 'Technical Skills'),
+
+            (r"Qualifications\s*:\s*(\d+)\s*/\s*(\d+)", 'education', 'Qualifications'),
+            (r"Education.*Certifications\s*:\s*(\d+)\s*/\s*(\d+)", 'education', 'Education & Certifications'),
+
+            (r"Quantified\s+Achievements\s*:\s*(\d+)\s*/\s*(\d+)", 'achievements', 'Quantified Achievements'),
+
+            (r"Project\s+Innovation\s*:\s*(\d+)\s*/\s*(\d+)", 'projects', 'Project Innovation'),
+            (r"Projects?\s*:\s*(\d+)\s*/\s*(\d+)", 'projects', 'Projects')
+        ]
+
+        # Remove common emojis before regex checking
+        emoji_pattern = r"[🎯💼⚙️🎓📊🚀🔍💡📈📋⭐✅⏱️🗺️]"
+        text_wo_emoji = re.sub(emoji_pattern, '', text)
+
+        # Try explicit patterns first on full text
+        for pat, key, label in patterns:
+            m = re.search(pat, text_wo_emoji, flags=re.IGNORECASE)
+            if m:
+                set_score(key, m.group(1), m.group(2), label)
+
+        # Additionally, within the 'DETAILED SCORING BREAKDOWN' section, capture generic 'Name: x/y' lines
+        breakdown_match = re.search(r"(DETAILED\s+SCORING\s+BREAKDOWN|SCORE\s+BREAKDOWN|SCORING\s+BREAKDOWN)([\s\S]+?)(?:\n\s*\n|\Z)", text_wo_emoji, flags=re.IGNORECASE)
+        if breakdown_match:
+            block = breakdown_match.group(2)
+            for line in block.split('\n'):
+                line = line.strip()
+                m = re.search(r"([A-Za-z &]+)\s*:\s*(\d+)\s*/\s*(\d+)", line)
+                if m:
+                    raw_label = m.group(1).strip()
+                    score_v = m.group(2)
+                    max_v = m.group(3)
+                    label_lower = raw_label.lower()
+                    if 'keyword' in label_lower:
+                        set_score('keyword', score_v, max_v, raw_label)
+                    elif 'experience' in label_lower:
+                        set_score('experience', score_v, max_v, raw_label)
+                    elif 'technical' in label_lower or 'tech' in label_lower:
+                        set_score('technical', score_v, max_v, raw_label)
+                    elif 'qualif' in label_lower or 'education' in label_lower or 'cert' in label_lower:
+                        set_score('education', score_v, max_v, raw_label)
+                    elif 'achievement' in label_lower:
+                        set_score('achievements', score_v, max_v, raw_label)
+                    elif 'project' in label_lower:
+                        set_score('projects', score_v, max_v, raw_label)
+
+        return scores
+
+    def create_progress_bar(score, max_score=100, width=3*inch, height=0.2*inch):
+        """Create a visual progress bar for score representation"""
+        drawing = Drawing(width, height)
+
+        # Determine color based on score percentage
+        percentage = (score / max_score) * 100 if max_score > 0 else 0
+        if percentage >= 75:
+            bar_color = HexColor('#28A745')  # Green for good scores
+        elif percentage >= 50:
+            bar_color = HexColor('#FFC107')  # Orange for needs improvement
+        else:
+            bar_color = HexColor('#DC3545')  # Red for critical areas
+
+        # Background bar (light gray)
+        bg_rect = Rect(0, 0, width, height)
+        bg_rect.fillColor = HexColor('#e5e7eb')
+        bg_rect.strokeColor = HexColor('#d1d5db')
+        bg_rect.strokeWidth = 1
+        drawing.add(bg_rect)
+
+        # Progress bar (colored based on score)
+        progress_width = (score / max_score) * width if max_score > 0 else 0
+        if progress_width > 0:
+            progress_rect = Rect(0, 0, progress_width, height)
+            progress_rect.fillColor = bar_color
+            progress_rect.strokeColor = bar_color
+            drawing.add(progress_rect)
+
+        return drawing
+
+    def get_score_color(score, max_score=100):
+        """Get color based on score percentage"""
+        percentage = (score / max_score) * 100 if max_score > 0 else 0
+        if percentage >= 75:
+            return HexColor('#28A745')  # Green
+        elif percentage >= 50:
+            return HexColor('#FFC107')  # Orange
+        else:
+            return HexColor('#DC3545')  # Red
+
+    # Create PDF document with enhanced margins and professional layout
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        leftMargin=0.75*inch,
+        rightMargin=0.75*inch,
+        topMargin=1*inch,
+        bottomMargin=0.75*inch
+    )
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Enhanced custom styles with professional typography
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        spaceAfter=20,
+        textColor=HexColor('#1f2937'),
+        alignment=1,
+        fontName='Helvetica-Bold'
+    )
+
+    header_style = ParagraphStyle(
+        'HeaderStyle',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=12,
+        spaceBefore=20,
+        textColor=HexColor('#1f2937'),
+        fontName='Helvetica-Bold',
+        backColor=HexColor('#f8fafc'),
+        borderColor=HexColor('#e2e8f0'),
+        borderWidth=1,
+        borderPadding=8,
+        leftIndent=12,
+        rightIndent=12
+    )
+
+    subheader_style = ParagraphStyle(
+        'SubHeaderStyle',
+        parent=styles['Heading3'],
+        fontSize=14,
+        spaceAfter=8,
+        spaceBefore=12,
+        textColor=HexColor('#374151'),
+        fontName='Helvetica-Bold'
+    )
+
+    normal_style = ParagraphStyle(
+        'NormalStyle',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=6,
+        textColor=HexColor('#4b5563'),
+        leading=15
+    )
+
+    bullet_style = ParagraphStyle(
+        'BulletStyle',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=4,
+        textColor=HexColor('#4b5563'),
+        leading=14,
+        leftIndent=20,
+        bulletIndent=10
+    )
+
+    job_info_style = ParagraphStyle(
+        'JobInfoStyle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=6,
+        textColor=HexColor('#6b7280'),
+        alignment=1,
+        fontName='Helvetica'
+    )
+
+    summary_title_style = ParagraphStyle(
+        'SummaryTitle',
+        parent=styles['Heading2'],
+        fontSize=18,
+        spaceAfter=15,
+        spaceBefore=10,
+        textColor=HexColor('#1f2937'),
+        fontName='Helvetica-Bold',
+        alignment=1
+    )
+
+    callout_style = ParagraphStyle(
+        'CalloutStyle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=8,
+        textColor=HexColor('#1f2937'),
+        backColor=HexColor('#f0f9ff'),
+        borderColor=HexColor('#0ea5e9'),
+        borderWidth=1,
+        borderPadding=10,
+        leftIndent=10,
+        rightIndent=10,
+        fontName='Helvetica-Bold'
+    )
+
+    # Professional title with enhanced styling
+    story.append(Paragraph("📊 ATS SCORE ANALYSIS REPORT", title_style))
+    story.append(Spacer(1, 15))
+
+    # Job details in professional box
+    job_info_table = Table([
+        [f"Position: {job_title}"],
+        [f"Analysis Date: {current_time} UTC"]
+    ], colWidths=[5*inch])
+    job_info_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#f8fafc')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#374151')),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+        ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
+    ]))
+    story.append(job_info_table)
+    story.append(Spacer(1, 20))
+
+    # EXECUTIVE SUMMARY SECTION
+    story.append(Paragraph("📋 EXECUTIVE SUMMARY", summary_title_style))
+    story.append(Spacer(1, 10))
+
+    # ATS Score with enhanced presentation
+    try:
+        ats_score_num = int(float(ats_score))
+    except Exception:
+        ats_score_num = 0
+
+    score_color = get_score_color(ats_score_num)
+    compatibility_level = (
+        'EXCEPTIONAL (95-100)' if ats_score_num >= 95 else
+        'OUTSTANDING (85-94)' if ats_score_num >= 85 else
+        'STRONG (75-84)' if ats_score_num >= 75 else
+        'GOOD (65-74)' if ats_score_num >= 65 else
+        'MODERATE (55-64)' if ats_score_num >= 55 else
+        'NEEDS IMPROVEMENT (<55)'
+    )
+
+    # Overall score table with enhanced styling
+    score_data = [
+        ['OVERALL ATS SCORE', f'{ats_score_num}/100', compatibility_level]
+    ]
+
+    score_table = Table(score_data, colWidths=[1.8*inch, 1.2*inch, 2.5*inch])
+    score_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#ffffff')),
+        ('BACKGROUND', (1, 0), (1, 0), score_color),
+        ('TEXTCOLOR', (0, 0), (0, 0), HexColor('#1f2937')),
+        ('TEXTCOLOR', (1, 0), (1, 0), colors.white),
+        ('TEXTCOLOR', (2, 0), (2, 0), score_color),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 14),
+        ('FONTSIZE', (1, 0), (1, 0), 18),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 2, HexColor('#e2e8f0')),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12)
+    ]))
+    story.append(score_table)
+    story.append(Spacer(1, 15))
+
+    # Add progress bar for overall score
+    progress_bar = create_progress_bar(ats_score_num, 100)
+    story.append(progress_bar)
+    story.append(Spacer(1, 20))
+
+    # Parse sections from analysis to get top recommendations
+    sections = parse_ats_analysis(ats_analysis_text)
+    scores = extract_scores(ats_analysis_text)
+
+    # Generate Top 3 Recommendations based on lowest scoring categories
+    top_recommendations = []
+    if scores:
+        # Sort categories by score gap (max - current score)
+        sorted_categories = sorted(
+            scores.items(),
+            key=lambda x: x[1].get('max', 0) - x[1].get('score', 0),
+            reverse=True
+        )
+
+        category_names = {
+            'keyword': 'Add missing job-specific keywords',
+            'experience': 'Quantify achievements with metrics',
+            'technical': 'Update with trending technologies',
+            'education': 'Include relevant certifications',
+            'achievements': 'Add measurable impact statements',
+            'projects': 'Showcase high-impact projects'
+        }
+
+        for category, score_info in sorted_categories[:3]:
+            if score_info.get('score', 0) < score_info.get('max', 0):
+                gap = score_info.get('max', 0) - score_info.get('score', 0)
+                recommendation = category_names.get(category, f"Improve {category}")
+                top_recommendations.append(f"• {recommendation} (+{gap} points)")
+
+    # If no specific scores, provide generic recommendations
+    if not top_recommendations:
+        top_recommendations = [
+            "• Add more job-specific keywords throughout resume",
+            "• Include quantified achievements with metrics",
+            "• Update technical skills with current technologies"
+        ]
+
+    # Top 3 Recommendations in callout box
+    story.append(Paragraph("🎯 TOP 3 PRIORITY IMPROVEMENTS", subheader_style))
+    story.append(Spacer(1, 8))
+
+    recommendations_table = Table([['\n'.join(top_recommendations)]], colWidths=[5.5*inch])
+    recommendations_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#f0f9ff')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('GRID', (0, 0), (-1, -1), 2, HexColor('#0ea5e9')),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('LEFTPADDING', (0, 0), (-1, -1), 15),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 15)
+    ]))
+    story.append(recommendations_table)
+    story.append(Spacer(1, 25))
+
+    # Enhanced Score Breakdown Section with progress bars
+    if scores:
+        story.append(Paragraph("📈 DETAILED SCORE BREAKDOWN", header_style))
+        story.append(Spacer(1, 12))
+
+        # Compute weights based on max points of each category
+        total_max = sum(int(info.get('max', 0)) for info in scores.values()) or 100
+
+        # Create enhanced score breakdown with progress bars
+        score_breakdown_data = [['CATEGORY', 'SCORE', 'PERCENTAGE', 'WEIGHT', 'PROGRESS']]
+
+        for category, score_info in scores.items():
+            category_name = {
+                'keyword': '🎯 Keyword Optimization',
+                'experience': '💼 Experience Relevance', 
+                'technical': '⚙️ Technical Competency',
+                'education': '🎓 Qualifications',
+                'achievements': '📊 Quantified Achievements',
+                'projects': '🚀 Project Innovation'
+            }.get(category, score_info.get('label') or category.title())
+
+            score_val = int(score_info.get('score', 0))
+            max_val = int(score_info.get('max', 1))
+            percentage = int((score_val / max_val) * 100) if max_val > 0 else 0
+            weight_pct = int(round((max_val / total_max) * 100)) if total_max > 0 else 0
+
+            # Create mini progress bar for this row
+            progress_drawing = create_progress_bar(score_val, max_val, width=1.2*inch, height=0.15*inch)
+
+            score_breakdown_data.append([
+                category_name,
+                f"{score_val}/{max_val}",
+                f"{percentage}%",
+                f"{weight_pct}%",
+                progress_drawing
+            ])
+
+        breakdown_table = Table(
+            score_breakdown_data, 
+            colWidths=[2.2*inch, 0.8*inch, 0.7*inch, 0.7*inch, 1.3*inch]
+        )
+        breakdown_table.setStyle(TableStyle([
+            # Header row styling
+            ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1f2937')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            # Data rows styling
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),  # Category names left-aligned
+            ('ALIGN', (1, 0), (-2, -1), 'CENTER'),  # Scores and percentages centered
+            ('ALIGN', (-1, 1), (-1, -1), 'CENTER'),  # Progress bars centered
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+            # Alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), 
+             [HexColor('#ffffff'), HexColor('#f8fafc')] * 10),
+            # Padding
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('LEFTPADDING', (0, 0), (-1, -1), 10),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 10)
+        ]))
+        story.append(breakdown_table)
+        story.append(Spacer(1, 20))
+
+    # Educational Background with enhanced formatting
+    if 'education' in sections:
+        story.append(Paragraph("🎓 EDUCATIONAL QUALIFICATIONS", header_style))
+        story.append(Spacer(1, 8))
+        education_content = sections['education'].replace('**', '').replace('*', '')
+        for line in education_content.split('\n'):
+            if line.strip():
+                story.append(Paragraph(f"• {line.strip()}", bullet_style))
+        story.append(Spacer(1, 15))
+
+    # Professional Experience with enhanced formatting
+    if 'job_history' in sections:
+        story.append(Paragraph("💼 PROFESSIONAL EXPERIENCE", header_style))
+        story.append(Spacer(1, 8))
+        job_content = sections['job_history'].replace('**', '').replace('*', '')
+        if 'no formal job history' in job_content.lower():
+            story.append(Paragraph("• No formal job history listed in resume", bullet_style))
+        else:
+            for line in job_content.split('\n'):
+                if line.strip():
+                    story.append(Paragraph(f"• {line.strip()}", bullet_style))
+        story.append(Spacer(1, 15))
+
+    # Key Projects with enhanced formatting
+    if 'projects' in sections:
+        story.append(Paragraph("🚀 KEY PROJECTS", header_style))
+        story.append(Spacer(1, 8))
+        projects_content = sections['projects'].replace('**', '').replace('*', '')
+        project_lines = projects_content.split('\n')
+        for line in project_lines:
+            if line.strip():
+                # Check if it's a project title (contains parentheses with tech stack)
+                if '(' in line and ')' in line and ':' in line:
+                    story.append(Paragraph(f"<b>• {line.strip()}</b>", subheader_style))
+                else:
+                    story.append(Paragraph(f"  → {line.strip()}", bullet_style))
+        story.append(Spacer(1, 15))
+
+    # Skills & Competencies with enhanced formatting
+    if 'skills' in sections:
+        story.append(Paragraph("⚡ SKILLS & COMPETENCIES", header_style))
+        story.append(Spacer(1, 8))
+        skills_content = sections['skills'].replace('**', '').replace('*', '')
+        for line in skills_content.split('\n'):
+            if line.strip():
+                if any(keyword in line for keyword in ['Core Technical Skills:', 'Specialized Tools:', 'Soft Skills:', 'Domain Expertise:']):
+                    story.append(Paragraph(f"<b>{line.strip()}</b>", subheader_style))
+                else:
+                    story.append(Paragraph(f"• {line.strip()}", bullet_style))
+        story.append(Spacer(1, 15))
+
+    # Enhanced Scoring Explanation with better structure
+    if scores:
+        story.append(Paragraph("🧮 HOW THE SCORE WAS CALCULATED", header_style))
+        story.append(Spacer(1, 12))
+
+        for category_key, score_info in scores.items():
+            category_names = {
+                'keyword': 'Keyword Optimization',
+                'experience': 'Experience Relevance',
+                'technical': 'Technical Competency',
+                'education': 'Qualifications',
+                'achievements': 'Quantified Achievements',
+                'projects': 'Project Innovation'
+            }
+            label = category_names.get(category_key, score_info.get('label') or category_key.title())
+
+            # Category header with score
+            score_val = score_info.get('score', 0)
+            max_val = score_info.get('max', 1)
+            percentage = int((score_val / max_val) * 100) if max_val > 0 else 0
+            category_color = get_score_color(percentage)
+
+            # Create category table with score and color coding
+            category_data = [[
+                f"{label}",
+                f"{score_val}/{max_val}",
+                f"{percentage}%"
+            ]]
+
+            category_table = Table(category_data, colWidths=[2.5*inch, 0.8*inch, 0.8*inch])
+            category_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), HexColor('#f8fafc')),
+                ('BACKGROUND', (1, 0), (2, 0), category_color),
+                ('TEXTCOLOR', (0, 0), (0, 0), HexColor('#1f2937')),
+                ('TEXTCOLOR', (1, 0), (2, 0), colors.white),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 12),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+                ('TOPPADDING', (0, 0), (-1, -1), 6),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 6)
+            ]))
+            story.append(category_table)
+            story.append(Spacer(1, 8))
+
+            # Explanation extraction with better formatting
+            explanation = []
+            lines = ats_analysis_text.split('\n')
+            capture = False
+            section_keywords = {
+                'keyword': ['KEYWORD OPTIMIZATION', 'KEYWORD ANALYSIS'],
+                'experience': ['EXPERIENCE RELEVANCE', 'EXPERIENCE EVALUATION'],
+                'technical': ['TECHNICAL COMPETENCY', 'TECHNICAL SKILLS'],
+                'education': ['QUALIFICATIONS', 'EDUCATION'],
+                'achievements': ['QUANTIFIED ACHIEVEMENTS'],
+                'projects': ['PROJECT INNOVATION', 'PROJECTS']
+            }
+
+            for ln in lines:
+                lcu = ln.upper()
+                if any(k in lcu for k in section_keywords.get(category_key, [])):
+                    capture = True
+                    continue
+                if capture:
+                    # Stop when we hit another section
+                    if re.search(r"^[A-Z].+:\s*\d+\s*/\s*\d+", ln) or any(h in lcu for h in [
+                        'COMPREHENSIVE ATS SCORE','DETAILED SCORING BREAKDOWN',
+                        'CRITICAL IMPROVEMENT','IMPLEMENTATION ROADMAP',
+                        'ATS OPTIMIZATION','HIRING PROBABILITY'
+                    ]):
+                        break
+                    if ln.strip():
+                        explanation.append(ln.strip())
+
+            # Fallback explanation
+            if not explanation:
+                if percentage >= 75:
+                    explanation.append("Strong performance in this category.")
+                elif percentage >= 50:
+                    explanation.append("Adequate performance with room for improvement.")
+                else:
+                    explanation.append("Significant improvement needed in this category.")
+                explanation.append(f"Score {score_val}/{max_val}. See detailed analysis for specific recommendations.")
+
+            # Display explanation with better formatting
+            for i, ln in enumerate(explanation[:4]):  # Limit to 4 lines
+                story.append(Paragraph(f"• {ln}", bullet_style))
+
+            # Weight contribution
+            total_max = sum(v.get('max', 0) for v in scores.values()) or 100
+            weight_pct = int(round((max_val / total_max) * 100))
+            story.append(Paragraph(f"Weight: {weight_pct}% of total ATS score", normal_style))
+            story.append(Spacer(1, 12))
+
+        story.append(Spacer(1, 15))
+
+        # Enhanced Improvement Roadmap with color-coded priorities
+        story.append(Paragraph("🚀 IMPROVEMENT ROADMAP BY CATEGORY", header_style))
+        story.append(Spacer(1, 12))
+
+        improvement_items = []
+        for category_key, score_info in scores.items():
+            score_val = score_info.get('score', 0)
+            max_val = score_info.get('max', 0)
+            if score_val >= max_val:
+                continue  # Skip categories that are already at max
+
+            gap = max_val - score_val
+            percentage = int((score_val / max_val) * 100) if max_val > 0 else 0
+
+            category_names = {
+                'keyword': 'Keyword Optimization',
+                'experience': 'Experience Relevance',
+                'technical': 'Technical Competency',
+                'education': 'Qualifications',
+                'achievements': 'Quantified Achievements',
+                'projects': 'Project Innovation'
+            }
+            label = category_names.get(category_key, category_key.title())
+
+            # Determine priority based on gap and percentage
+            if percentage < 50:
+                priority = "HIGH"
+                priority_color = HexColor('#DC3545')
+                priority_bg = HexColor('#fef2f2')
+            elif percentage < 75:
+                priority = "MEDIUM"
+                priority_color = HexColor('#FFC107')
+                priority_bg = HexColor('#fffbeb')
+            else:
+                priority = "LOW"
+                priority_color = HexColor('#28A745')
+                priority_bg = HexColor('#f0fdf4')
+
+            # Generate specific recommendations
+            recommendations = {
+                'keyword': [
+                    "Add missing job-specific keywords throughout resume",
+                    "Include industry terminology and technical terms",
+                    "Use keyword variations and synonyms"
+                ],
+                'experience': [
+                    "Quantify achievements with specific metrics",
+                    "Add measurable results and impact statements", 
+                    "Include percentage improvements and cost savings"
+                ],
+                'technical': [
+                    "Update with current trending technologies",
+                    "Add certifications in relevant tools",
+                    "Include hands-on project experience"
+                ],
+                'education': [
+                    "Add relevant professional certifications",
+                    "Include continuing education courses",
+                    "Highlight academic achievements"
+                ],
+                'achievements': [
+                    "Convert responsibilities into achievements",
+                    "Add quantified results (%, $, time)",
+                    "Include awards and recognition"
+                ],
+                'projects': [
+                    "Add 1-2 high-impact projects",
+                    "Include project outcomes and metrics",
+                    "Showcase technical complexity"
+                ]
+            }
+
+            improvement_items.append({
+                'category': label,
+                'priority': priority,
+                'priority_color': priority_color,
+                'priority_bg': priority_bg,
+                'gap': gap,
+                'recommendations': recommendations.get(category_key, [])[:3]
+            })
+
+        # Sort by priority (HIGH first)
+        priority_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+        improvement_items.sort(key=lambda x: priority_order.get(x['priority'], 3))
+
+        for item in improvement_items:
+            # Category header with priority
+            priority_data = [[
+                f"{item['category']}",
+                f"PRIORITY: {item['priority']}",
+                f"+{item['gap']} POINTS"
+            ]]
+
+            priority_table = Table(priority_data, colWidths=[2*inch, 1.5*inch, 1*inch])
+            priority_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, 0), HexColor('#f8fafc')),
+                ('BACKGROUND', (1, 0), (1, 0), item['priority_bg']),
+                ('BACKGROUND', (2, 0), (2, 0), item['priority_color']),
+                ('TEXTCOLOR', (0, 0), (1, 0), HexColor('#1f2937')),
+                ('TEXTCOLOR', (1, 0), (1, 0), item['priority_color']),
+                ('TEXTCOLOR', (2, 0), (2, 0), colors.white),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
+                ('TOPPADDING', (0, 0), (-1, -1), 6),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 6)
+            ]))
+            story.append(priority_table)
+            story.append(Spacer(1, 6))
+
+            # Recommendations
+            for rec in item['recommendations']:
+                story.append(Paragraph(f"• {rec}", bullet_style))
+            story.append(Spacer(1, 12))
+
+    # Enhanced Comprehensive Analysis Section with better visual hierarchy
+    story.append(Paragraph("📋 COMPREHENSIVE ATS ANALYSIS", header_style))
+    story.append(Spacer(1, 12))
+
+    # Process all sections with enhanced formatting and visual elements
+    section_order = [
+        'ats_score', 'scoring_breakdown', 'improvement_areas', 'implementation_roadmap', 
+        'timeline_improvements', 'optimization_checklist', 'probability_assessment', 
+        'enhanced_insights', 'recommendations', 'scoring', 'detailed_analysis', 'general_analysis'
+    ]
+
+    section_icons = {
+        'ats_score': '🎯',
+        'scoring_breakdown': '📊',
+        'improvement_areas': '🔍',
+        'implementation_roadmap': '🗺️',
+        'timeline_improvements': '⏱️',
+        'optimization_checklist': '✅',
+        'probability_assessment': '📈',
+        'enhanced_insights': '💡',
+        'recommendations': '⭐',
+        'scoring': '🎯',
+        'detailed_analysis': '🔍',
+        'general_analysis': '📋'
+    }
+
+    for section_name in section_order:
+        if section_name in sections:
+            content = sections[section_name]
+            if content and content.strip():
+                # Add section header with icon
+                icon = section_icons.get(section_name, '📄')
+                section_titles = {
+                    'ats_score': f'{icon} ATS SCORE SUMMARY',
+                    'scoring_breakdown': f'{icon} DETAILED SCORING BREAKDOWN',
+                    'improvement_areas': f'{icon} CRITICAL IMPROVEMENT AREAS',
+                    'implementation_roadmap': f'{icon} IMPLEMENTATION ROADMAP',
+                    'timeline_improvements': f'{icon} TIMELINE-BASED IMPROVEMENTS',
+                    'optimization_checklist': f'{icon} ATS OPTIMIZATION CHECKLIST',
+                    'probability_assessment': f'{icon} HIRING PROBABILITY ASSESSMENT',
+                    'enhanced_insights': f'{icon} ENHANCED ANALYSIS INSIGHTS',
+                    'recommendations': f'{icon} SCORE ENHANCEMENT RECOMMENDATIONS',
+                    'scoring': f'{icon} SCORING ANALYSIS',
+                    'detailed_analysis': f'{icon} DETAILED INSIGHTS',
+                    'general_analysis': f'{icon} ANALYSIS OVERVIEW'
+                }
+
+                section_title = section_titles.get(section_name, f'{icon} {section_name.upper()}')
+                story.append(Paragraph(section_title, subheader_style))
+                story.append(Spacer(1, 8))
+
+                # Process content with enhanced formatting
+                content_lines = content.split('\n')
+                in_list = False
+
+                for line in content_lines:
+                    if line.strip():
+                        clean_line = line.replace('**', '').replace('*', '').replace('■', '•')
+                        clean_line = re.sub(r'[🎯💼⚙️🎓📊🚀🔍💡📈📋⭐✅⏱️🗺️]', '', clean_line)
+
+                        # Enhanced line formatting with better hierarchy
+                        if any(keyword in line.upper() for keyword in [
+                            'COMPREHENSIVE ATS SCORE', 'OVERALL ATS SCORE', 'FINAL SCORE',
+                            'KEYWORD OPTIMIZATION', 'EXPERIENCE RELEVANCE', 'TECHNICAL COMPETENCY', 
+                            'QUALIFICATIONS', 'QUANTIFIED ACHIEVEMENTS',
+                            'HIGH-IMPACT KEYWORDS', 'EXPERIENCE GAPS', 'TECHNICAL SKILLS',
+                            'QUANTIFICATION OPPORTUNITIES', 'ATS FORMATTING ISSUES',
+                            'IMMEDIATE FIXES', 'SHORT TERM', 'STRATEGIC DEVELOPMENT',
+                            'HIRING PROBABILITY', 'COMPETITIVE POSITIONING',
+                            'CONTENT ANALYSIS RESULTS', 'KEYWORD MATCHING ANALYSIS',
+                            'HYBRID SCORING CALCULATION', 'SCORE ENHANCEMENT'
+                        ]):
+                            # Major section headers
+                            story.append(Paragraph(f"<b>{clean_line.strip()}</b>", subheader_style))
+                            story.append(Spacer(1, 4))
+                            in_list = False
+                        elif line.strip().startswith(('•', '-', '→', '✓', '✗', '▪', '▫')):
+                            # Bullet points with consistent formatting
+                            bullet_text = clean_line.strip().lstrip('•-→✓✗▪▫ ')
+                            story.append(Paragraph(f"• {bullet_text}", bullet_style))
+                            in_list = True
+                        elif ':' in clean_line and len(clean_line.split(':')[0]) < 60:
+                            # Label-value pairs
+                            parts = clean_line.split(':', 1)
+                            if len(parts) == 2:
+                                story.append(Paragraph(f"<b>{parts[0].strip()}:</b> {parts[1].strip()}", normal_style))
+                                story.append(Spacer(1, 2))
+                            in_list = False
+                        elif re.search(r'\d+/\d+|\d+%|\d+\.\d+%', clean_line):
+                            # Numeric scores and percentages - highlight them
+                            story.append(Paragraph(f"<b>{clean_line.strip()}</b>", normal_style))
+                            story.append(Spacer(1, 2))
+                            in_list = False
+                        elif clean_line.strip():
+                            # Regular paragraphs
+                            if in_list:
+                                # Continuation of list item
+                                story.append(Paragraph(f"  {clean_line.strip()}", bullet_style))
+                            else:
+                                story.append(Paragraph(clean_line.strip(), normal_style))
+                                story.append(Spacer(1, 3))
+
+                story.append(Spacer(1, 15))
+
+    # Enhanced fallback section if no structured sections found
+    if not any(section in sections for section in section_order):
+        story.append(Paragraph("🔍 COMPLETE ANALYSIS", subheader_style))
+        story.append(Spacer(1, 10))
+
+        # Process raw analysis with better formatting
+        analysis_lines = ats_analysis_text.split('\n')
+        for line in analysis_lines:
+            if line.strip():
+                clean_line = line.replace('**', '').replace('*', '').replace('■', '•')
+                clean_line = re.sub(r'[🎯💼⚙️🎓📊🚀🔍💡📈📋⭐✅⏱️🗺️]', '', clean_line)
+
+                if clean_line.strip():
+                    if any(keyword in line.upper() for keyword in [
+                        'COMPREHENSIVE ATS SCORE', 'KEYWORD ANALYSIS', 'EXPERIENCE EVALUATION',
+                        'TECHNICAL COMPETENCY', 'EDUCATION', 'QUANTIFIED ACHIEVEMENTS',
+                        'CRITICAL IMPROVEMENT', 'SCORE ENHANCEMENT', 'IMPLEMENTATION ROADMAP',
+                        'IMMEDIATE FIXES', 'SHORT TERM', 'STRATEGIC DEVELOPMENT',
+                        'ATS OPTIMIZATION', 'HIRING PROBABILITY', 'COMPETITIVE POSITIONING'
+                    ]):
+                        story.append(Paragraph(f"<b>{clean_line.strip()}</b>", subheader_style))
+                        story.append(Spacer(1, 4))
+                    elif line.strip().startswith(('•', '-', '→', '✓', '✗')):
+                        bullet_text = clean_line.strip().lstrip('•-→✓✗ ')
+                        story.append(Paragraph(f"• {bullet_text}", bullet_style))
+                    else:
+                        story.append(Paragraph(clean_line.strip(), normal_style))
+                        story.append(Spacer(1, 3))
+        story.append(Spacer(1, 15))
+
+    # Footer with timestamp and professional note
+    footer_style = ParagraphStyle(
+        'FooterStyle',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=HexColor('#6b7280'),
+        alignment=1,
+        spaceBefore=20
+    )
+
+    story.append(Paragraph(
+        f"Generated by ATS Analysis System | {current_time} UTC<br/>"
+        "This analysis is based on industry-standard ATS parsing algorithms and best practices.",
+        footer_style
+    ))
+
+    # Build the enhanced PDF
+    doc.build(story)
+
+    return buffer.getvalue()
+
+
+
+REPORT_RENDERERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "aptitude_report": render_aptitude_report,
+    "resume_analysis": render_resume_analysis_report,
+    "rejection_reasons": render_rejection_reasons_report,
+    "technical_interview_questions": render_technical_questions_report,
+    "behavioral_interview_questions": render_behavioral_questions_report,
+    "ats_score": render_ats_report,
+}
+
+
+def render_report(kind: str, payload: Dict[str, Any]) -> bytes:
+    """Entry point executed in the rendering process"""
+    if plt is None:
+        init_worker()
+    return REPORT_RENDERERS[kind](payload)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Continuous Risk Scoring Scheduler and Risk Update Fan-out
+
+The risk calculator used to recompute every monitored session on a background
+thread every 30 seconds, each time in a fresh event loop, and its WebSocket
+broadcasts were placeholders. This module provides the asyncio-native pieces:
+
+- ContinuousRiskScheduler: runs inside the application's event loop and
+  recomputes only sessions that received new events (a dirty set). Bursts of
+  events for a session are coalesced, each session is recomputed at most once
+  per min_interval_seconds and at most max_concurrency recomputations run at
+  the same time.
+- RiskUpdateBroker: in-process pub/sub. Each subscriber (e.g. an admin
+  WebSocket) gets a bounded queue filtered by session ids; slow subscribers
+  lose their oldest messages instead of blocking publishers.
+- MongoChangeStreamRelay: optional multi-worker fan-out. Messages published on
+  one worker are inserted into a collection and delivered to the other
+  workers' brokers from a change stream (requires a replica set).
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+RISK_SCHEDULER_MAX_CONCURRENCY = int(os.environ.get("RISK_SCHEDULER_MAX_CONCURRENCY", "4"))
+RISK_SCHEDULER_COALESCE_SECONDS = float(os.environ.get("RISK_SCHEDULER_COALESCE_SECONDS", "0.5"))
+RISK_SCHEDULER_MIN_INTERVAL_SECONDS = float(os.environ.get("RISK_SCHEDULER_MIN_INTERVAL_SECONDS", "5"))
+RISK_SUBSCRIBER_QUEUE_SIZE = int(os.environ.get("RISK_SUBSCRIBER_QUEUE_SIZE", "256"))
+
+
+class RiskSubscription:
+    """A subscriber's bounded message queue; session_ids=None receives every session"""
+
+    def __init__(self, broker: "RiskUpdateBroker", session_ids: Optional[Iterable[str]], queue_size: int):
+        self.subscription_id = str(uuid.uuid4())
+        self.session_ids: Optional[Set[str]] = set(session_ids) if session_ids is not None else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._broker = broker
+
+    def wants(self, session_id: Optional[str]) -> bool:
+        return self.session_ids is None or session_id in self.session_ids
+
+    def subscribe_sessions(self, session_ids: Iterable[str]):
+        if self.session_ids is not None:
+            self.session_ids.update(session_ids)
+
+    def unsubscribe_sessions(self, session_ids: Iterable[str]):
+        if self.session_ids is not None:
+            self.session_ids.difference_update(session_ids)
+
+    def offer(self, message: Dict[str, Any]):
+        """Enqueue without blocking; the oldest message is dropped when the queue is full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class RiskUpdateBroker:
+    """In-process publish/subscribe for risk score changes"""
+
+    def __init__(self, queue_size: int = RISK_SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, RiskSubscription] = {}
+        self._relay: Optional["MongoChangeStreamRelay"] = None
+        self.stats = {"published": 0, "delivered": 0, "relayed_in": 0}
+
+    def subscribe(self, session_ids: Optional[Iterable[str]] = None) -> RiskSubscription:
+        subscription = RiskSubscription(self, session_ids, self.queue_size)
+        self._subscriptions[subscription.subscription_id] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: RiskSubscription):
+        self._subscriptions.pop(subscription.subscription_id, None)
+
+    def attach_relay(self, relay: "MongoChangeStreamRelay"):
+        self._relay = relay
+
+    def publish(self, message: Dict[str, Any]) -> int:
+        """Deliver to local subscribers and forward to other workers; returns local deliveries"""
+        self.stats["published"] += 1
+        if self._relay is not None:
+            self._relay.forward(message)
+        return self.deliver(message)
+
+    def deliver(self, message: Dict[str, Any]) -> int:
+        """Local fan-out only (also used for messages relayed from other workers)"""
+        delivered = 0
+        session_id = message.get("session_id")
+        for subscription in list(self._subscriptions.values()):
+            if subscription.wants(session_id):
+                subscription.offer(message)
+                delivered += 1
+        self.stats["delivered"] += delivered
+        return delivered
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "subscribers": len(self._subscriptions),
+            "dropped": sum(s.dropped for s in self._subscriptions.values()),
+            "relay": self._relay.get_stats() if self._relay is not None else None
+        }
+
+
+class MongoChangeStreamRelay:
+    """
+    Cross-worker fan-out through a MongoDB collection: forward() inserts the
+    message tagged with this worker's id, start() watches inserts and delivers
+    messages from other workers to the local broker. Documents expire after
+    ttl_seconds. Change streams need a replica set; without one the relay
+    disables itself and the broker stays process-local.
+    """
+
+    def __init__(self, collection, worker_id: Optional[str] = None, ttl_seconds: int = 300):
+        self.collection = collection
+        self.worker_id = worker_id or str(uuid.uuid4())
+        self.ttl_seconds = ttl_seconds
+        self.enabled = True
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self.stats = {"forwarded": 0, "received": 0, "errors": 0}
+
+    async def ensure_indexes(self):
+        try:
+            await self.collection.create_index([("created_at", 1)], expireAfterSeconds=self.ttl_seconds)
+        except Exception as e:
+            logging.error(f"Failed creating risk update relay index: {e}")
+
+    def forward(self, message: Dict[str, Any]):
+        if not self.enabled:
+            return
+        task = asyncio.get_running_loop().create_task(self._insert(message))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _insert(self, message: Dict[str, Any]):
+        try:
+            await self.collection.insert_one({"worker_id": self.worker_id, "message": message, "created_at": datetime.utcnow()})
+            self.stats["forwarded"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Risk update relay insert failed: {e}")
+
+    def start(self, broker: RiskUpdateBroker):
+        broker.attach_relay(self)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch(broker))
+
+    async def stop(self):
+        self.enabled = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch(self, broker: RiskUpdateBroker):
+        await self.ensure_indexes()
+        pipeline = [{"$match": {"operationType": "insert", "fullDocument.worker_id": {"$ne": self.worker_id}}}]
+        backoff = 1.0
+        while self.enabled:
+            try:
+                async with self.collection.watch(pipeline) as stream:
+                    backoff = 1.0
+                    async for change in stream:
+                        broker.stats["relayed_in"] += 1
+                        self.stats["received"] += 1
+                        broker.deliver(change["fullDocument"]["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                if "replica set" in str(e).lower() or "change stream" in str(e).lower():
+                    logging.warning(f"Risk update relay disabled, change streams unavailable: {e}")
+                    self.enabled = False
+                    return
+                logging.warning(f"Risk update change stream interrupted, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"worker_id": self.worker_id, "enabled": self.enabled, **self.stats}
+
+
+class ContinuousRiskScheduler:
+    """
+    Recomputes risk for sessions marked dirty. recompute(session_id) is awaited
+    on the event loop (at most max_concurrency at once); marks that arrive while
+    a session is waiting or running are folded into its next recomputation.
+    """
+
+    def __init__(self,
+                 recompute: Callable[[str], Awaitable[Any]],
+                 max_concurrency: int = RISK_SCHEDULER_MAX_CONCURRENCY,
+                 coalesce_seconds: float = RISK_SCHEDULER_COALESCE_SECONDS,
+                 min_interval_seconds: float = RISK_SCHEDULER_MIN_INTERVAL_SECONDS,
+                 latency_window: int = 1024):
+        self.recompute = recompute
+        self.max_concurrency = max_concurrency
+        self.coalesce_seconds = coalesce_seconds
+        self.min_interval_seconds = min_interval_seconds
+
+        self._dirty: Dict[str, float] = {}  # session_id -> first mark since last run (monotonic)
+        self._running: Set[str] = set()
+        self._last_run: Dict[str, float] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()  # in-flight recomputations, referenced until done
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.stats = {"marks": 0, "coalesced_marks": 0, "recomputations": 0, "errors": 0, "rounds": 0}
+        self._lag_ms = deque(maxlen=latency_window)
+
+    def _ensure_worker(self):
+        """Start the scheduler task on the running event loop (restarts if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wake = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._task = loop.create_task(self._run())
+
+    def mark_dirty(self, session_id: str):
+        """Schedule a recomputation; must be called from the event loop"""
+        self._ensure_worker()
+        self.stats["marks"] += 1
+        if session_id in self._dirty:
+            self.stats["coalesced_marks"] += 1
+        else:
+            self._dirty[session_id] = time.monotonic()
+        self._wake.set()
+
+    def forget(self, session_id: str):
+        self._dirty.pop(session_id, None)
+        self._last_run.pop(session_id, None)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._pending):
+            task.cancel()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _due_sessions(self, now: float) -> List[str]:
+        return [session_id for session_id in self._dirty
+                if session_id not in self._running
+                and now - self._last_run.get(session_id, float("-inf")) >= self.min_interval_seconds]
+
+    def _next_due_in(self, now: float) -> Optional[float]:
+        waits = [self._last_run.get(session_id, float("-inf")) + self.min_interval_seconds - now
+                 for session_id in self._dirty if session_id not in self._running]
+        return max(min(waits), 0.0) if waits else None
+
+    async def _run(self):
+        while True:
+            timeout = self._next_due_in(time.monotonic())
+            try:
+                if timeout is None:
+                    await self._wake.wait()
+                elif timeout > 0:
+                    await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            # Let a burst of events settle before recomputing
+            if self.coalesce_seconds > 0:
+                await asyncio.sleep(self.coalesce_seconds)
+
+            now = time.monotonic()
+            due = self._due_sessions(now)
+            if not due:
+                continue
+            self.stats["rounds"] += 1
+            for session_id in due:
+                self._lag_ms.append((now - self._dirty.pop(session_id)) * 1000)
+                self._running.add(session_id)
+                self._last_run[session_id] = now
+                task = self._loop.create_task(self._recompute_one(session_id))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    async def _recompute_one(self, session_id: str):
+        try:
+            async with self._semaphore:
+                await self.recompute(session_id)
+            self.stats["recomputations"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"Scheduled risk recomputation failed for {session_id}: {e}")
+        finally:
+            self._running.discard(session_id)
+            if session_id in self._dirty:
+                self._wake.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lag = sorted(self._lag_ms)
+        return {
+            **self.stats,
+            "running": self.running,
+            "dirty_sessions": len(self._dirty),
+            "in_flight": len(self._running),
+            "max_concurrency": self.max_concurrency,
+            "coalesce_seconds": self.coalesce_seconds,
+            "min_interval_seconds": self.min_interval_seconds,
+            "mark_to_start_ms_p50": round(lag[len(lag) // 2], 3) if lag else None,
+            "mark_to_start_ms_max": round(lag[-1], 3) if lag else None
+        }
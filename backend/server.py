@@ -6,7 +6,7 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 from datetime import datetime, timedelta
 import json
@@ -153,10 +153,13 @@ from google.oauth2 import service_account
 import pymongo
 import gridfs
 
+# Heavy engines and ML libraries are constructed/imported on first use
+from engine_registry import engine_registry, lazy_import
+
 # Import libraries for sentiment analysis and emotional intelligence
-import librosa
+librosa = lazy_import("librosa")
 import numpy as np
-import torch
+torch = lazy_import("torch")
 # from transformers import pipeline  # Commented out due to dependency issues
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 # from textstat import flesch_reading_ease  # Temporarily disabled due to dependency issues
@@ -173,156 +176,163 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 # Phase 2: AI-Powered Screening & Shortlisting Engine - Temporarily disabled due to dependency issues
 # from phase2_screening_engine import AIResumeAnalysisEngine, SmartScoringSystem, AutoShortlistingEngine
 
-# MODULE 1: Behavioral Biometric Analysis Engine Import
-try:
-    from behavioral_biometrics_engine import (
-        KeystrokeDynamicsAnalyzer,
-        InteractionBiometricsAnalyzer,
-        ResponseTimingAnalyzer,
-        BiometricDataPrivacyManager,
-        RealTimeInterventionSystem,
-        keystroke_analyzer,
-        interaction_analyzer,
-        timing_analyzer,
-        privacy_manager,
-        intervention_system
-    )
-    print("✅ Behavioral Biometric Analysis Engine loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load Behavioral Biometric Analysis Engine - {e}")
-    # Create stub classes
-    class KeystrokeDynamicsAnalyzer:
-        def __init__(self): pass
-        def analyze_typing_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_typing_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def generate_biometric_signature(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class InteractionBiometricsAnalyzer:
-        def __init__(self): pass
-        def analyze_mouse_movement_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_click_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def analyze_scroll_behavior(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def calculate_interaction_consistency_score(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class ResponseTimingAnalyzer:
-        def __init__(self): pass
-        def analyze_question_response_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_suspicious_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def identify_external_assistance_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def calculate_cognitive_load_indicators(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class BiometricDataPrivacyManager:
-        def __init__(self): pass
-        def record_consent(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def purge_expired_data(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def anonymize_biometric_data(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class RealTimeInterventionSystem:
-        def __init__(self): pass
-        def assess_security_risk(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def trigger_intervention(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def log_security_event(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    # Create stub instances
-    keystroke_analyzer = KeystrokeDynamicsAnalyzer()
-    interaction_analyzer = InteractionBiometricsAnalyzer()
-    timing_analyzer = ResponseTimingAnalyzer()
-    privacy_manager = BiometricDataPrivacyManager()
-    intervention_system = RealTimeInterventionSystem()
-
-# MODULE 2: Statistical Anomaly Detection System Import
-try:
-    from anomaly_detection_engine import (
-        AnomalyDetectionEngine,
-        anomaly_detection_engine
-    )
-    print("✅ Statistical Anomaly Detection Engine loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load Statistical Anomaly Detection Engine - {e}")
-    # Create stub class
-    class AnomalyDetectionEngine:
-        def __init__(self): pass
-        def train_baseline_models(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_response_pattern_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def analyze_performance_inconsistencies(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def calculate_anomaly_probability_scores(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    anomaly_detection_engine = AnomalyDetectionEngine()
-
-# Load Statistical Anomaly Analyzer (Step 2.2)
-try:
-    from statistical_anomaly_analyzer import (
-        StatisticalAnomalyAnalyzer,
-        statistical_anomaly_analyzer
-    )
-    print("✅ Statistical Anomaly Analyzer loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load Statistical Anomaly Analyzer - {e}")
-    # Create stub class
-    class StatisticalAnomalyAnalyzer:
-        def __init__(self): pass
-        def detect_answer_pattern_irregularities(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def analyze_difficulty_progression_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def identify_time_zone_manipulation(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_collaborative_cheating_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    statistical_anomaly_analyzer = StatisticalAnomalyAnalyzer()
-
-# Load Real-time Risk Calculator (Step 2.3)
-try:
-    from real_time_risk_calculator import RealTimeRiskCalculator
-    real_time_risk_calculator = RealTimeRiskCalculator(
-        anomaly_engine=anomaly_detection_engine,
-        statistical_analyzer=statistical_anomaly_analyzer
-    )
-    print("✅ Real-time Risk Calculator loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load Real-time Risk Calculator - {e}")
-    # Create stub class
-    class RealTimeRiskCalculator:
-        def __init__(self, *args, **kwargs): pass
-        async def calculate_composite_risk_score(self, *args, **kwargs): return {"error": "Module not loaded"}
-        async def update_risk_factors_continuously(self, *args, **kwargs): return {"error": "Module not loaded"}
-        async def trigger_intervention_alerts(self, *args, **kwargs): return {"error": "Module not loaded"}
-        async def generate_confidence_intervals(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    real_time_risk_calculator = RealTimeRiskCalculator()
-    # Create stub classes
-    class KeystrokeDynamicsAnalyzer:
-        def __init__(self): pass
-        def analyze_typing_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_typing_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def generate_biometric_signature(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class InteractionBiometricsAnalyzer:
-        def __init__(self): pass
-        def analyze_mouse_movement_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_click_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def analyze_scroll_behavior(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def calculate_interaction_consistency_score(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class ResponseTimingAnalyzer:
-        def __init__(self): pass
-        def analyze_question_response_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_suspicious_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def identify_external_assistance_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def calculate_cognitive_load_indicators(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class BiometricDataPrivacyManager:
-        def __init__(self): pass
-        async def store_biometric_data(self, *args, **kwargs): return {"error": "Module not loaded"}
-        async def purge_expired_data(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class RealTimeInterventionSystem:
-        def __init__(self): pass
-        async def flag_anomaly(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    # Initialize stub instances
-    keystroke_analyzer = KeystrokeDynamicsAnalyzer()
-    interaction_analyzer = InteractionBiometricsAnalyzer()
-    timing_analyzer = ResponseTimingAnalyzer()
-    privacy_manager = BiometricDataPrivacyManager()
-    intervention_system = RealTimeInterventionSystem()
+# MODULE 1: Behavioral Biometric Analysis Engine (loaded on first use)
+from biometric_wire_format import KEYUP as KEYUP_FLAG, WireFormatError, decode_frame as decode_biometric_frame
+
+def _load_behavioral_biometrics():
+    try:
+        from behavioral_biometrics_engine import (
+            keystroke_analyzer,
+            interaction_analyzer,
+            timing_analyzer,
+            privacy_manager,
+            intervention_system
+        )
+        privacy_manager.attach_storage(db)
+        print("✅ Behavioral Biometric Analysis Engine loaded successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load Behavioral Biometric Analysis Engine - {e}")
+        # Create stub classes
+        class KeystrokeDynamicsAnalyzer:
+            def __init__(self): pass
+            def analyze_typing_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def update_typing_stream(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def analyze_keystroke_columns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_typing_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def generate_biometric_signature(self, *args, **kwargs): return {"error": "Module not loaded"}
+
+        class InteractionBiometricsAnalyzer:
+            def __init__(self): pass
+            def analyze_mouse_movement_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_click_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def analyze_scroll_behavior(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def calculate_interaction_consistency_score(self, *args, **kwargs): return {"error": "Module not loaded"}
+
+        class ResponseTimingAnalyzer:
+            def __init__(self): pass
+            def analyze_question_response_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_suspicious_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def identify_external_assistance_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def calculate_cognitive_load_indicators(self, *args, **kwargs): return {"error": "Module not loaded"}
+
+        class BiometricDataPrivacyManager:
+            def __init__(self): pass
+            def record_consent(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def anonymize_biometric_data(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def store_biometric_data(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def store_event_chunk(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def load_event_chunks(self, *args, **kwargs): return []
+            async def purge_expired_data(self, *args, **kwargs): return {"error": "Module not loaded"}
+
+        class RealTimeInterventionSystem:
+            def __init__(self): pass
+            def assess_security_risk(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def trigger_intervention(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def log_security_event(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def flag_anomaly(self, *args, **kwargs): return {"error": "Module not loaded"}
+
+        # Create stub instances
+        keystroke_analyzer = KeystrokeDynamicsAnalyzer()
+        interaction_analyzer = InteractionBiometricsAnalyzer()
+        timing_analyzer = ResponseTimingAnalyzer()
+        privacy_manager = BiometricDataPrivacyManager()
+        intervention_system = RealTimeInterventionSystem()
+
+    return {
+        "keystroke_analyzer": keystroke_analyzer,
+        "interaction_analyzer": interaction_analyzer,
+        "timing_analyzer": timing_analyzer,
+        "privacy_manager": privacy_manager,
+        "intervention_system": intervention_system
+    }
+
+engine_registry.register("behavioral_biometrics", _load_behavioral_biometrics)
+keystroke_analyzer = engine_registry.proxy("behavioral_biometrics", "keystroke_analyzer")
+interaction_analyzer = engine_registry.proxy("behavioral_biometrics", "interaction_analyzer")
+timing_analyzer = engine_registry.proxy("behavioral_biometrics", "timing_analyzer")
+privacy_manager = engine_registry.proxy("behavioral_biometrics", "privacy_manager")
+intervention_system = engine_registry.proxy("behavioral_biometrics", "intervention_system")
+
+# MODULE 2: Statistical Anomaly Detection System (loaded on first use)
+def _load_anomaly_detection_engine():
+    try:
+        from anomaly_detection_engine import anomaly_detection_engine
+        print("✅ Statistical Anomaly Detection Engine loaded successfully")
+        return anomaly_detection_engine
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load Statistical Anomaly Detection Engine - {e}")
+        # Create stub class
+        class AnomalyDetectionEngine:
+            def __init__(self): pass
+            def train_baseline_models(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_response_pattern_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def analyze_performance_inconsistencies(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def calculate_anomaly_probability_scores(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def score_sessions_batch(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def get_model_registry_status(self): return {"error": "Module not loaded"}
+
+        return AnomalyDetectionEngine()
+
+anomaly_detection_engine = engine_registry.register("anomaly_detection_engine", _load_anomaly_detection_engine)
+
+# Statistical Anomaly Analyzer (Step 2.2)
+def _load_statistical_anomaly_analyzer():
+    try:
+        from statistical_anomaly_analyzer import statistical_anomaly_analyzer
+        print("✅ Statistical Anomaly Analyzer loaded successfully")
+        return statistical_anomaly_analyzer
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load Statistical Anomaly Analyzer - {e}")
+        # Create stub class
+        class StatisticalAnomalyAnalyzer:
+            def __init__(self): pass
+            def detect_answer_pattern_irregularities(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def analyze_difficulty_progression_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def identify_time_zone_manipulation(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_collaborative_cheating_patterns(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_cohort_collaboration(self, *args, **kwargs): return {"error": "Module not loaded"}
+
+        return StatisticalAnomalyAnalyzer()
+
+statistical_anomaly_analyzer = engine_registry.register("statistical_anomaly_analyzer", _load_statistical_anomaly_analyzer)
+
+# Real-time Risk Calculator (Step 2.3)
+from risk_update_scheduler import RiskUpdateBroker, MongoChangeStreamRelay
+
+# Risk score changes fan out to admin WebSocket subscribers through this broker
+risk_update_broker = RiskUpdateBroker()
+
+def _load_real_time_risk_calculator():
+    try:
+        from real_time_risk_calculator import RealTimeRiskCalculator
+        calculator = RealTimeRiskCalculator(
+            anomaly_engine=engine_registry.get("anomaly_detection_engine"),
+            statistical_analyzer=engine_registry.get("statistical_anomaly_analyzer"),
+            broker=risk_update_broker,
+            session_loader=_load_risk_session_data,
+            assessment_store=_store_scheduled_risk_assessment
+        )
+        print("✅ Real-time Risk Calculator loaded successfully")
+        return calculator
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load Real-time Risk Calculator - {e}")
+        # Create stub class
+        class RealTimeRiskCalculator:
+            def __init__(self, *args, **kwargs): pass
+            async def calculate_composite_risk_score(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def update_risk_factors_continuously(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def trigger_intervention_alerts(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def generate_confidence_intervals(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def generate_confidence_intervals_batch(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def mark_session_dirty(self, *args, **kwargs): return False
+            def stop_monitoring(self, *args, **kwargs): pass
+            def start_continuous_updates(self): pass
+            def stop_continuous_updates(self): pass
+            def get_continuous_update_stats(self): return {"error": "Module not loaded"}
+
+        return RealTimeRiskCalculator()
+
+real_time_risk_calculator = engine_registry.register("real_time_risk_calculator", _load_real_time_risk_calculator)
 
 # Temporary stub classes to avoid breaking the code
 class AIResumeAnalysisEngine:
@@ -538,7 +548,7 @@ class I18nManager:
         return content
 
 # Initialize I18n Manager
-i18n_manager = I18nManager()
+i18n_manager = engine_registry.register("i18n_manager", I18nManager)
 
 # GDPR/CCPA Compliance Implementation
 class DataPrivacyManager:
@@ -573,6 +583,7 @@ class DataPrivacyManager:
                 collection = getattr(db, collection_name)
                 result = await collection.delete_many({"candidate_name": candidate_id})
                 deleted_counts[collection_name] = result.deleted_count
+            clear_reference_caches()
             
             # Delete audio files from GridFS
             audio_files = fs.find({"metadata.candidate_id": candidate_id})
@@ -622,6 +633,7 @@ class DataPrivacyManager:
             
             enhanced_tokens_result = await db.enhanced_tokens.delete_many({"created_at": {"$lt": interview_cutoff}})
             cleanup_results['enhanced_tokens'] = enhanced_tokens_result.deleted_count
+            clear_reference_caches()
             
             # Clean up audio files (30 days)
             audio_cutoff = current_time - timedelta(days=self.data_retention_policies['audio_files'])
@@ -641,17 +653,16 @@ class DataPrivacyManager:
             # Clean up video analysis data (60 days)
             video_cutoff = current_time - timedelta(days=self.data_retention_policies['video_analysis'])
             
-            # Clean video analysis collections
-            video_result = await db.video_analysis.delete_many({
-                "timestamp": {"$lt": video_cutoff.isoformat()}
-            })
-            cleanup_results['video_analysis'] = video_result.deleted_count
+            # Clean video analysis collections (minute buckets and legacy per-frame documents)
+            cleanup_results['video_analysis'] = await session_analysis_store.delete_before("video", video_cutoff)
             
             # Clean audio analysis data (60 days for analysis, different from raw audio files)
-            audio_analysis_result = await db.audio_analysis.delete_many({
-                "timestamp": {"$lt": video_cutoff.isoformat()}
-            })
-            cleanup_results['audio_analysis'] = audio_analysis_result.deleted_count
+            cleanup_results['audio_analysis'] = await session_analysis_store.delete_before("audio", video_cutoff)
+            cleanup_results['ei_analysis'] = await session_analysis_store.delete_before("ei", video_cutoff)
+            
+            # Drop rollups of sessions with no events inside the retention window
+            rollup_result = await db.session_analysis_rollups.delete_many({"last_event_at": {"$lt": video_cutoff}})
+            cleanup_results['session_analysis_rollups'] = rollup_result.deleted_count
             
             logging.info(f"Data cleanup completed: {cleanup_results}")
             return {
@@ -698,10 +709,10 @@ class DataPrivacyManager:
             
             # Count video analysis data
             video_cutoff = current_time - timedelta(days=self.data_retention_policies['video_analysis'])
-            total_video_analysis = await db.video_analysis.count_documents({})
+            total_video_analysis = await db.video_analysis.count_documents({}) + await db.video_analysis_buckets.count_documents({})
             expired_video_analysis = await db.video_analysis.count_documents({
                 "timestamp": {"$lt": video_cutoff.isoformat()}
-            })
+            }) + await db.video_analysis_buckets.count_documents({"minute": {"$lt": video_cutoff}})
             
             status["data_counts"] = {
                 "sessions": {"total": total_sessions, "expired": expired_sessions},
@@ -1272,6 +1283,12 @@ class BiometricDataSubmissionRequest(BaseModel):
     timing_data: Optional[List[Dict[str, Any]]] = []
     consent_given: bool = False
 
+class KeystrokeStreamRequest(BaseModel):
+    session_id: str
+    keystroke_data: List[Dict[str, Any]] = []
+    consent_given: bool = False
+    finalize: bool = False  # Store the final analysis and release the stream
+
 class BiometricAnalysisRequest(BaseModel):
     session_id: str
     analysis_types: List[str] = ["keystroke_dynamics", "interaction_patterns", "response_timing"]
@@ -1490,7 +1507,7 @@ def parse_resume(file: UploadFile, content: bytes) -> str:
             raise HTTPException(status_code=400, detail="Unsupported file format. Please upload PDF, DOC, DOCX, or TXT files.")
 
 # Initialize sentiment analysis tools
-analyzer = SentimentIntensityAnalyzer()
+analyzer = engine_registry.register("vader_sentiment", SentimentIntensityAnalyzer)
 
 # Initialize emotion classification pipeline 
 try:
@@ -1504,25 +1521,49 @@ except Exception as e:
     print(f"⚠️  Warning: Could not load emotion classifier - {e}")
     emotion_classifier = None
 
+# Micro-batching for per-message text inference
+from inference_batcher import MicroBatcher, register_batcher, get_batcher_stats
+
 class EmotionalIntelligenceAnalyzer:
     """Advanced emotional intelligence and sentiment analysis"""
     
     def __init__(self):
         self.analyzer = analyzer
         self.emotion_classifier = emotion_classifier
+        self.batcher = register_batcher(MicroBatcher(
+            "text_emotion", self.analyze_text_sentiment_batch, max_batch_size=32, max_wait_ms=5
+        ))
         
     def analyze_text_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze text sentiment using VADER and emotion classification"""
+        return self.analyze_text_sentiment_batch([text])[0]
+    
+    async def analyze_text_sentiment_async(self, text: str) -> Dict[str, Any]:
+        """Request-path entry point: joins concurrent calls into one batched classifier pass"""
+        if self.emotion_classifier is None:
+            # VADER alone is cheap; there is no forward pass worth waiting to batch
+            return self.analyze_text_sentiment(text)
+        return await self.batcher.submit(text)
+    
+    def analyze_text_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze several texts with a single emotion classifier forward pass"""
+        batch_emotions = [{} for _ in texts]
+        if self.emotion_classifier:
+            try:
+                indices = [i for i, text in enumerate(texts) if text and text.strip()]
+                if indices:
+                    emotion_results = self.emotion_classifier([texts[i] for i in indices])
+                    for i, scores in zip(indices, emotion_results):
+                        batch_emotions[i] = {score['label']: score['score'] for score in scores}
+            except Exception as e:
+                print(f"Error in batched emotion classification: {e}")
+        return [self._build_text_analysis(text, emotions) for text, emotions in zip(texts, batch_emotions)]
+    
+    def _build_text_analysis(self, text: str, emotions: Dict[str, float]) -> Dict[str, Any]:
+        """Combine VADER scores with precomputed emotion scores for one text"""
         try:
             # VADER sentiment analysis
-            sentiment_scores = self.analyzer.polarity_scores(text)
-            
-            # Emotion classification if available
-            emotions = {}
-            if self.emotion_classifier and text.strip():
-                emotion_results = self.emotion_classifier(text)
-                for emotion_score in emotion_results[0]:
-                    emotions[emotion_score['label']] = emotion_score['score']
+            sentiment_scores = self.analyzer.polarity_scores(text or "")
             
             # Calculate overall emotional intelligence metrics
             emotional_stability = 1 - abs(sentiment_scores['compound'])
@@ -1623,42 +1664,334 @@ class EmotionalIntelligenceAnalyzer:
             }
 
 # Initialize the emotional intelligence analyzer
-ei_analyzer = EmotionalIntelligenceAnalyzer()
+ei_analyzer = engine_registry.register("ei_analyzer", EmotionalIntelligenceAnalyzer)
 
 # Phase 4: Executive Analytics Dashboard
+DAILY_METRICS_TIME_TO_HIRE_MAX_HOURS = 24 * 60  # histogram cap; longer durations share the last bin
+
+class DailyMetricsStore:
+    """
+    Materialized per-day, per-job rollups for the executive dashboard (daily_metrics).
+    One document per (day, job_title) holds counters and sums for the hiring funnel,
+    time-to-hire, candidate experience, hiring quality and bias. Documents are
+    updated with $inc as sessions start/complete and assessments are written, so
+    dashboards read O(days x jobs) small documents instead of whole collections.
+    """
+    
+    TIME_BUCKETS = {
+        'excellent': 7,    # <= 7 days
+        'good': 14,        # 8-14 days
+        'average': 21,     # 15-21 days
+        'slow': 30,        # 22-30 days
+        'poor': 999        # > 30 days
+    }
+    POSITIVE_THEMES = ['communication', 'technical skills', 'problem solving', 'enthusiasm', 'experience']
+    NEGATIVE_THEMES = ['clarity', 'confidence', 'technical depth', 'preparation', 'engagement']
+    
+    def __init__(self):
+        self.collection = db.daily_metrics
+    
+    async def ensure_indexes(self):
+        try:
+            await self.collection.create_index([("day", 1), ("job_title", 1)], unique=True)
+            await self.collection.create_index([("job_title", 1), ("day", 1)])
+            logging.info("Daily metrics indexes ensured")
+        except Exception as e:
+            logging.error(f"Failed creating daily metrics indexes: {e}")
+    
+    @staticmethod
+    def _as_datetime(value) -> Optional[datetime]:
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                return None
+        return None
+    
+    @staticmethod
+    def _day(value: datetime) -> datetime:
+        return datetime(value.year, value.month, value.day)
+    
+    @staticmethod
+    def _doc_id(day: datetime, job_title: str) -> str:
+        return f"{day.strftime('%Y-%m-%d')}|{job_title}"
+    
+    @staticmethod
+    def _safe_key(name) -> str:
+        return str(name).replace(".", "_").replace("$", "_") or "unknown"
+    
+    @classmethod
+    def time_bucket(cls, days: float) -> str:
+        for name in ('excellent', 'good', 'average', 'slow'):
+            if days <= cls.TIME_BUCKETS[name]:
+                return name
+        return 'poor'
+    
+    @staticmethod
+    def experience_score(ei_metrics: dict) -> float:
+        """Experience score (1-5 scale) from confidence, engagement and stress levels"""
+        confidence = ei_metrics.get('confidence', 0.5)
+        engagement = ei_metrics.get('enthusiasm', 0.5)
+        stress = ei_metrics.get('stress_level', 0.5)
+        return (confidence * 0.4 + engagement * 0.4 + (1 - stress) * 0.2) * 5
+    
+    @staticmethod
+    def satisfaction_level(experience_score: float) -> str:
+        if experience_score >= 4.0:
+            return 'excellent'
+        if experience_score >= 3.5:
+            return 'good'
+        if experience_score >= 2.5:
+            return 'average'
+        return 'poor'
+    
+    @staticmethod
+    def quality_score(assessment: dict) -> float:
+        """Composite quality score from technical/behavioral scores and predicted success"""
+        technical = assessment.get('technical_score', 0) / 100
+        behavioral = assessment.get('behavioral_score', 0) / 100
+        overall = assessment.get('overall_score', 0) / 100
+        success_prob = (assessment.get('predictive_analytics') or {}).get('success_probability', overall)
+        return (technical * 0.4 + behavioral * 0.3 + success_prob * 0.3) * 100
+    
+    @staticmethod
+    def quality_level(quality_score: float) -> str:
+        if quality_score >= 80:
+            return 'excellent'
+        if quality_score >= 70:
+            return 'good'
+        if quality_score >= 60:
+            return 'average'
+        return 'below_average'
+    
+    def _completion_increments(self, session: dict, completed_at: datetime) -> Dict[str, float]:
+        started_at = self._as_datetime(session.get("started_at"))
+        inc: Dict[str, float] = {"funnel.completed": 1}
+        if started_at:
+            days = max(0.0, (completed_at - started_at).total_seconds() / (24 * 3600))
+            hour_bin = min(int(days * 24), DAILY_METRICS_TIME_TO_HIRE_MAX_HOURS)
+            inc.update({
+                "time_to_hire.count": 1,
+                "time_to_hire.sum": days,
+                f"time_to_hire.buckets.{self.time_bucket(days)}": 1,
+                f"time_to_hire.hours.{hour_bin}": 1
+            })
+        return inc
+    
+    def _assessment_increments(self, assessment: dict) -> Dict[str, float]:
+        inc: Dict[str, float] = {}
+        
+        def _add(path, value):
+            inc[path] = inc.get(path, 0) + value
+        
+        overall_score = assessment.get('overall_score', 0) or 0
+        _add("funnel.assessed", 1)
+        _add("scores.overall_sum", overall_score)
+        if overall_score >= 80:
+            _add("scores.successful", 1)
+        
+        experience = self.experience_score(assessment.get('emotional_intelligence_metrics') or {})
+        _add("experience.sum", experience)
+        _add(f"experience.satisfaction.{self.satisfaction_level(experience)}", 1)
+        
+        quality = self.quality_score(assessment)
+        _add("quality.sum", quality)
+        _add(f"quality.levels.{self.quality_level(quality)}", 1)
+        
+        predictive_data = assessment.get('predictive_analytics') or {}
+        if predictive_data:
+            _add("predictions.total", 1)
+            # Consider prediction accurate if within 20% of actual score
+            if abs(predictive_data.get('success_probability', 0) - overall_score / 100) <= 0.2:
+                _add("predictions.accurate", 1)
+        
+        bias_data = assessment.get('bias_analysis') or {}
+        _add("bias.sum", bias_data.get('overall_bias_score', 0) or 0)
+        if bias_data.get('is_biased', False):
+            _add("bias.incidents", 1)
+        
+        combined_feedback = ' '.join([
+            assessment.get('technical_feedback', '') or '',
+            assessment.get('behavioral_feedback', '') or '',
+            assessment.get('overall_feedback', '') or ''
+        ]).lower()
+        for theme in self.POSITIVE_THEMES + self.NEGATIVE_THEMES:
+            if theme in combined_feedback:
+                _add(f"feedback_themes.{self._safe_key(theme)}", 1)
+        return inc
+    
+    async def _apply(self, when: datetime, job_title: str, inc: Dict[str, float]):
+        day = self._day(when)
+        job_title = job_title or "Unknown Position"
+        await self.collection.update_one(
+            {"_id": self._doc_id(day, job_title)},
+            {
+                "$inc": inc,
+                "$setOnInsert": {"day": day, "job_title": job_title},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+    
+    async def record_session_started(self, session: dict):
+        try:
+            started_at = self._as_datetime(session.get("started_at")) or datetime.utcnow()
+            await self._apply(started_at, session.get("job_title"), {"funnel.started": 1})
+        except Exception as e:
+            logging.error(f"Daily metrics session start update failed: {e}")
+    
+    async def record_session_completed(self, session: dict, completed_at: datetime):
+        try:
+            await self._apply(completed_at, session.get("job_title"), self._completion_increments(session, completed_at))
+        except Exception as e:
+            logging.error(f"Daily metrics session completion update failed: {e}")
+    
+    async def record_assessment(self, assessment: dict):
+        try:
+            created_at = self._as_datetime(assessment.get("created_at")) or datetime.utcnow()
+            await self._apply(created_at, assessment.get("job_title"), self._assessment_increments(assessment))
+        except Exception as e:
+            logging.error(f"Daily metrics assessment update failed: {e}")
+    
+    async def load(self, date_range: tuple = None, job_title: Optional[str] = None) -> List[dict]:
+        """Rollup documents for the days touched by date_range (whole days), optionally for one job"""
+        query: Dict[str, Any] = {}
+        if date_range:
+            start_date, end_date = date_range
+            query["day"] = {"$gte": self._day(start_date), "$lte": self._day(end_date)}
+        if job_title:
+            query["job_title"] = job_title
+        return await self.collection.find(query).sort("day", 1).to_list(None)
+    
+    async def backfill(self, since: Optional[datetime] = None) -> dict:
+        """
+        Rebuild rollups from sessions and assessments (for data written before the
+        rollups existed). Documents for the affected days are replaced, so the
+        backfill is idempotent.
+        """
+        docs: Dict[str, dict] = {}
+        if since:
+            since = self._day(since)
+        
+        def _fold(day: datetime, job_title: str, inc: Dict[str, float]):
+            job_title = job_title or "Unknown Position"
+            doc = docs.setdefault(self._doc_id(day, job_title), {"day": day, "job_title": job_title})
+            for path, value in inc.items():
+                node = doc
+                parts = path.split(".")
+                for part in parts[:-1]:
+                    node = node.setdefault(part, {})
+                node[parts[-1]] = node.get(parts[-1], 0) + value
+        
+        def _day_stage(field):
+            return {"$dateFromParts": {"year": {"$year": field}, "month": {"$month": field}, "day": {"$dayOfMonth": field}}}
+        
+        started_match: Dict[str, Any] = {"started_at": {"$type": "date"}}
+        completed_match: Dict[str, Any] = {"status": "completed", "completed_at": {"$type": "date"}}
+        assessment_match: Dict[str, Any] = {"created_at": {"$type": "date"}}
+        if since:
+            started_match["started_at"]["$gte"] = since
+            completed_match["completed_at"]["$gte"] = since
+            assessment_match["created_at"]["$gte"] = since
+        
+        async for row in db.sessions.aggregate([
+            {"$match": started_match},
+            {"$group": {"_id": {"day": _day_stage("$started_at"), "job_title": "$job_title"}, "started": {"$sum": 1}}}
+        ]):
+            _fold(row["_id"]["day"], row["_id"].get("job_title"), {"funnel.started": row["started"]})
+        
+        async for row in db.sessions.aggregate([
+            {"$match": completed_match},
+            {"$project": {
+                "job_title": 1,
+                "day": _day_stage("$completed_at"),
+                "days": {"$cond": [
+                    {"$eq": [{"$type": "$started_at"}, "date"]},
+                    {"$divide": [{"$subtract": ["$completed_at", "$started_at"]}, 24 * 3600 * 1000]},
+                    None
+                ]}
+            }},
+            {"$group": {
+                "_id": {"day": "$day", "job_title": "$job_title", "days": "$days"},
+                "count": {"$sum": 1}
+            }}
+        ]):
+            key = row["_id"]
+            days = key.get("days")
+            inc = {"funnel.completed": row["count"]}
+            if days is not None:
+                days = max(0.0, days)
+                hour_bin = min(int(days * 24), DAILY_METRICS_TIME_TO_HIRE_MAX_HOURS)
+                inc.update({
+                    "time_to_hire.count": row["count"],
+                    "time_to_hire.sum": days * row["count"],
+                    f"time_to_hire.buckets.{self.time_bucket(days)}": row["count"],
+                    f"time_to_hire.hours.{hour_bin}": row["count"]
+                })
+            _fold(key["day"], key.get("job_title"), inc)
+        
+        async for assessment in db.assessments.aggregate([
+            {"$match": assessment_match},
+            {"$project": {
+                "_id": 0, "job_title": 1, "created_at": 1,
+                "technical_score": 1, "behavioral_score": 1, "overall_score": 1,
+                "technical_feedback": 1, "behavioral_feedback": 1, "overall_feedback": 1,
+                "emotional_intelligence_metrics": 1, "predictive_analytics": 1,
+                "bias_analysis.overall_bias_score": 1, "bias_analysis.is_biased": 1
+            }}
+        ]):
+            _fold(self._day(assessment["created_at"]), assessment.get("job_title"), self._assessment_increments(assessment))
+        
+        if since:
+            await self.collection.delete_many({"day": {"$gte": since}})
+        else:
+            await self.collection.delete_many({})
+        now = datetime.utcnow()
+        for doc_id, doc in docs.items():
+            await self.collection.replace_one({"_id": doc_id}, {**doc, "updated_at": now}, upsert=True)
+        
+        logging.info(f"Daily metrics backfill rebuilt {len(docs)} rollup documents")
+        return {"documents": len(docs), "since": since.isoformat() if since else None}
+
+daily_metrics_store = DailyMetricsStore()
+
 class ExecutiveAnalytics:
     """Advanced analytics for C-Suite dashboard with real-time and historical insights"""
     
     def __init__(self):
         self.cost_per_hire_base = 5000  # Base cost estimate in USD
-        self.time_buckets = {
-            'excellent': 7,    # <= 7 days
-            'good': 14,        # 8-14 days  
-            'average': 21,     # 15-21 days
-            'slow': 30,        # 22-30 days
-            'poor': 999        # > 30 days
-        }
-    
-    async def calculate_time_to_hire_metrics(self, date_range: tuple = None) -> dict:
+        self.time_buckets = DailyMetricsStore.TIME_BUCKETS
+    
+    @staticmethod
+    def _total(rows: List[dict], path: str) -> float:
+        total = 0
+        for row in rows:
+            node = row
+            for part in path.split("."):
+                node = node.get(part, {}) if isinstance(node, dict) else {}
+            total += node if isinstance(node, (int, float)) else 0
+        return total
+    
+    @staticmethod
+    def _merge_counts(rows: List[dict], path: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for row in rows:
+            node = row
+            for part in path.split("."):
+                node = node.get(part, {}) if isinstance(node, dict) else {}
+            for key, value in (node or {}).items():
+                counts[key] = counts.get(key, 0) + value
+        return counts
+    
+    async def calculate_time_to_hire_metrics(self, date_range: tuple = None, rows: List[dict] = None) -> dict:
         """Calculate comprehensive time-to-hire analytics"""
         try:
-            # Build query filter
-            query_filter = {}
-            if date_range:
-                start_date, end_date = date_range
-                query_filter["created_at"] = {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
-            
-            # Get completed sessions
-            sessions = await db.sessions.find({
-                **query_filter,
-                "status": "completed",
-                "completed_at": {"$exists": True}
-            }).to_list(None)
+            rows = rows if rows is not None else await daily_metrics_store.load(date_range)
+            total_hires = int(self._total(rows, "time_to_hire.count"))
             
-            if not sessions:
+            if not total_hires:
                 return {
                     "average_time_to_hire": 0,
                     "median_time_to_hire": 0,
@@ -1667,42 +2000,27 @@ class ExecutiveAnalytics:
                     "total_hires": 0
                 }
             
-            # Calculate time to hire for each session
-            hire_times = []
-            for session in sessions:
-                if session.get("started_at") and session.get("completed_at"):
-                    start = session["started_at"]
-                    end = session["completed_at"]
-                    if isinstance(start, str):
-                        start = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                    if isinstance(end, str):
-                        end = datetime.fromisoformat(end.replace('Z', '+00:00'))
-                    
-                    time_diff = (end - start).total_seconds() / (24 * 3600)  # Convert to days
-                    hire_times.append(time_diff)
-            
-            # Calculate metrics
-            average_time = sum(hire_times) / len(hire_times) if hire_times else 0
-            median_time = sorted(hire_times)[len(hire_times)//2] if hire_times else 0
-            
-            # Time distribution
-            time_distribution = {
-                'excellent': len([t for t in hire_times if t <= self.time_buckets['excellent']]),
-                'good': len([t for t in hire_times if self.time_buckets['excellent'] < t <= self.time_buckets['good']]),
-                'average': len([t for t in hire_times if self.time_buckets['good'] < t <= self.time_buckets['average']]),
-                'slow': len([t for t in hire_times if self.time_buckets['average'] < t <= self.time_buckets['slow']]),
-                'poor': len([t for t in hire_times if t > self.time_buckets['slow']])
-            }
+            average_time = self._total(rows, "time_to_hire.sum") / total_hires
+            
+            # Median from the hourly histogram (resolution: one hour)
+            histogram = self._merge_counts(rows, "time_to_hire.hours")
+            median_time = 0
+            seen = 0
+            for hour_bin in sorted(histogram, key=int):
+                seen += histogram[hour_bin]
+                if seen > total_hires // 2:
+                    median_time = (int(hour_bin) + 0.5) / 24
+                    break
             
-            # Trend data (last 30 days, weekly buckets)
-            trend_data = await self._calculate_time_trend(sessions)
+            buckets = self._merge_counts(rows, "time_to_hire.buckets")
+            time_distribution = {name: buckets.get(name, 0) for name in self.time_buckets}
             
             return {
                 "average_time_to_hire": round(average_time, 2),
                 "median_time_to_hire": round(median_time, 2),
                 "time_distribution": time_distribution,
-                "trend_data": trend_data,
-                "total_hires": len(hire_times)
+                "trend_data": self._calculate_time_trend(rows),
+                "total_hires": total_hires
             }
         
         except Exception as e:
@@ -1715,21 +2033,13 @@ class ExecutiveAnalytics:
                 "total_hires": 0
             }
     
-    async def calculate_candidate_experience_metrics(self, date_range: tuple = None) -> dict:
+    async def calculate_candidate_experience_metrics(self, date_range: tuple = None, rows: List[dict] = None) -> dict:
         """Calculate candidate experience and satisfaction metrics"""
         try:
-            query_filter = {}
-            if date_range:
-                start_date, end_date = date_range
-                query_filter["created_at"] = {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
+            rows = rows if rows is not None else await daily_metrics_store.load(date_range)
+            assessed = self._total(rows, "funnel.assessed")
             
-            # Get all assessments
-            assessments = await db.assessments.find(query_filter).to_list(None)
-            
-            if not assessments:
+            if not assessed:
                 return {
                     "average_experience_score": 0,
                     "satisfaction_distribution": {},
@@ -1737,54 +2047,23 @@ class ExecutiveAnalytics:
                     "completion_rate": 0
                 }
             
-            # Calculate experience metrics from emotional intelligence data
-            experience_scores = []
-            satisfaction_levels = []
-            
-            for assessment in assessments:
-                ei_metrics = assessment.get('emotional_intelligence_metrics', {})
-                
-                # Experience score based on confidence, engagement, and stress levels
-                confidence = ei_metrics.get('confidence', 0.5)
-                engagement = ei_metrics.get('enthusiasm', 0.5)
-                stress = ei_metrics.get('stress_level', 0.5)
-                
-                experience_score = (confidence * 0.4 + engagement * 0.4 + (1 - stress) * 0.2) * 5  # Convert to 1-5 scale
-                experience_scores.append(experience_score)
-                
-                # Satisfaction level classification
-                if experience_score >= 4.0:
-                    satisfaction_levels.append('excellent')
-                elif experience_score >= 3.5:
-                    satisfaction_levels.append('good')
-                elif experience_score >= 2.5:
-                    satisfaction_levels.append('average')
-                else:
-                    satisfaction_levels.append('poor')
-            
-            # Calculate distributions
+            satisfaction = self._merge_counts(rows, "experience.satisfaction")
             satisfaction_distribution = {
-                'excellent': satisfaction_levels.count('excellent'),
-                'good': satisfaction_levels.count('good'), 
-                'average': satisfaction_levels.count('average'),
-                'poor': satisfaction_levels.count('poor')
+                level: satisfaction.get(level, 0) for level in ('excellent', 'good', 'average', 'poor')
             }
             
-            # Get completion rate
-            total_sessions = await db.sessions.count_documents(query_filter)
-            completed_sessions = await db.sessions.count_documents({
-                **query_filter,
-                "status": "completed"
-            })
-            completion_rate = (completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
+            # Completion rate: interviews completed vs started in the window
+            total_sessions = self._total(rows, "funnel.started")
+            completed_sessions = self._total(rows, "funnel.completed")
+            completion_rate = min(100.0, completed_sessions / total_sessions * 100) if total_sessions > 0 else 0
             
             return {
-                "average_experience_score": round(sum(experience_scores) / len(experience_scores), 2) if experience_scores else 0,
+                "average_experience_score": round(self._total(rows, "experience.sum") / assessed, 2),
                 "satisfaction_distribution": satisfaction_distribution,
-                "feedback_themes": await self._extract_feedback_themes(assessments),
+                "feedback_themes": self._extract_feedback_themes(rows),
                 "completion_rate": round(completion_rate, 2)
             }
-            
+        
         except Exception as e:
             logging.error(f"Candidate experience calculation error: {e}")
             return {
@@ -1794,20 +2073,13 @@ class ExecutiveAnalytics:
                 "completion_rate": 0
             }
     
-    async def calculate_hiring_quality_metrics(self, date_range: tuple = None) -> dict:
+    async def calculate_hiring_quality_metrics(self, date_range: tuple = None, rows: List[dict] = None) -> dict:
         """Calculate hiring quality and success prediction metrics"""
         try:
-            query_filter = {}
-            if date_range:
-                start_date, end_date = date_range
-                query_filter["created_at"] = {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
+            rows = rows if rows is not None else await daily_metrics_store.load(date_range)
+            assessed = self._total(rows, "funnel.assessed")
             
-            assessments = await db.assessments.find(query_filter).to_list(None)
-            
-            if not assessments:
+            if not assessed:
                 return {
                     "average_quality_score": 0,
                     "high_quality_percentage": 0,
@@ -1815,52 +2087,18 @@ class ExecutiveAnalytics:
                     "prediction_accuracy": 0
                 }
             
-            quality_scores = []
-            high_quality_count = 0
-            quality_levels = []
-            
-            for assessment in assessments:
-                # Calculate composite quality score
-                technical = assessment.get('technical_score', 0) / 100
-                behavioral = assessment.get('behavioral_score', 0) / 100
-                overall = assessment.get('overall_score', 0) / 100
-                
-                # Get predictive analytics if available
-                predictive_data = assessment.get('predictive_analytics', {})
-                success_prob = predictive_data.get('success_probability', overall)
-                
-                # Composite quality score
-                quality_score = (technical * 0.4 + behavioral * 0.3 + success_prob * 0.3) * 100
-                quality_scores.append(quality_score)
-                
-                # Quality classification
-                if quality_score >= 80:
-                    quality_levels.append('excellent')
-                    high_quality_count += 1
-                elif quality_score >= 70:
-                    quality_levels.append('good')
-                elif quality_score >= 60:
-                    quality_levels.append('average')
-                else:
-                    quality_levels.append('below_average')
-            
-            # Quality distribution
+            levels = self._merge_counts(rows, "quality.levels")
             quality_distribution = {
-                'excellent': quality_levels.count('excellent'),
-                'good': quality_levels.count('good'),
-                'average': quality_levels.count('average'),
-                'below_average': quality_levels.count('below_average')
+                level: levels.get(level, 0) for level in ('excellent', 'good', 'average', 'below_average')
             }
             
-            high_quality_percentage = (high_quality_count / len(assessments) * 100) if assessments else 0
-            
             return {
-                "average_quality_score": round(sum(quality_scores) / len(quality_scores), 2) if quality_scores else 0,
-                "high_quality_percentage": round(high_quality_percentage, 2),
+                "average_quality_score": round(self._total(rows, "quality.sum") / assessed, 2),
+                "high_quality_percentage": round(quality_distribution['excellent'] / assessed * 100, 2),
                 "quality_distribution": quality_distribution,
-                "prediction_accuracy": await self._calculate_prediction_accuracy(assessments)
+                "prediction_accuracy": self._calculate_prediction_accuracy(rows)
             }
-            
+        
         except Exception as e:
             logging.error(f"Hiring quality calculation error: {e}")
             return {
@@ -1870,22 +2108,13 @@ class ExecutiveAnalytics:
                 "prediction_accuracy": 0
             }
     
-    async def calculate_diversity_metrics(self, date_range: tuple = None) -> dict:
+    async def calculate_diversity_metrics(self, date_range: tuple = None, rows: List[dict] = None) -> dict:
         """Calculate diversity and bias metrics"""
         try:
-            query_filter = {}
-            if date_range:
-                start_date, end_date = date_range
-                query_filter["created_at"] = {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
+            rows = rows if rows is not None else await daily_metrics_store.load(date_range)
+            assessed = self._total(rows, "funnel.assessed")
             
-            # Get assessments with bias analysis
-            assessments = await db.assessments.find(query_filter).to_list(None)
-            sessions = await db.sessions.find(query_filter).to_list(None)
-            
-            if not assessments:
+            if not assessed:
                 return {
                     "bias_score": 0,
                     "fairness_metrics": {},
@@ -1893,31 +2122,14 @@ class ExecutiveAnalytics:
                     "bias_incidents": 0
                 }
             
-            # Calculate bias metrics
-            bias_scores = []
-            bias_incidents = 0
-            
-            for assessment in assessments:
-                bias_data = assessment.get('bias_analysis', {})
-                overall_bias = bias_data.get('overall_bias_score', 0)
-                bias_scores.append(overall_bias)
-                
-                if bias_data.get('is_biased', False):
-                    bias_incidents += 1
-            
-            # Fairness metrics (demographic parity, equalized odds)
-            fairness_metrics = await self._calculate_fairness_metrics(assessments)
-            
-            # Diversity trends
-            diversity_trends = await self._calculate_diversity_trends(sessions)
-            
             return {
-                "bias_score": round(sum(bias_scores) / len(bias_scores), 3) if bias_scores else 0,
-                "fairness_metrics": fairness_metrics,
-                "diversity_trends": diversity_trends,
-                "bias_incidents": bias_incidents
+                "bias_score": round(self._total(rows, "bias.sum") / assessed, 3),
+                # Fairness metrics (demographic parity, equalized odds)
+                "fairness_metrics": self._calculate_fairness_metrics(),
+                "diversity_trends": self._calculate_diversity_trends(int(self._total(rows, "funnel.started"))),
+                "bias_incidents": int(self._total(rows, "bias.incidents"))
             }
-            
+        
         except Exception as e:
             logging.error(f"Diversity metrics calculation error: {e}")
             return {
@@ -1927,28 +2139,14 @@ class ExecutiveAnalytics:
                 "bias_incidents": 0
             }
     
-    async def calculate_cost_per_hire(self, date_range: tuple = None) -> dict:
+    async def calculate_cost_per_hire(self, date_range: tuple = None, rows: List[dict] = None) -> dict:
         """Calculate cost per hire metrics"""
         try:
-            query_filter = {}
-            if date_range:
-                start_date, end_date = date_range
-                query_filter["created_at"] = {
-                    "$gte": start_date,
-                    "$lte": end_date
-                }
+            rows = rows if rows is not None else await daily_metrics_store.load(date_range)
             
-            # Count completed interviews
-            completed_interviews = await db.sessions.count_documents({
-                **query_filter,
-                "status": "completed"
-            })
-            
-            # Count successful hires (high-quality candidates)
-            high_quality_assessments = await db.assessments.count_documents({
-                **query_filter,
-                "overall_score": {"$gte": 80}
-            })
+            # Completed interviews and successful hires (high-quality candidates)
+            completed_interviews = int(self._total(rows, "funnel.completed"))
+            high_quality_assessments = int(self._total(rows, "scores.successful"))
             
             # Calculate costs
             platform_cost = completed_interviews * 50  # $50 per interview
@@ -1964,7 +2162,7 @@ class ExecutiveAnalytics:
                 "successful_hires": high_quality_assessments,
                 "efficiency_ratio": round(high_quality_assessments / completed_interviews, 2) if completed_interviews > 0 else 0
             }
-            
+        
         except Exception as e:
             logging.error(f"Cost per hire calculation error: {e}")
             return {
@@ -1975,102 +2173,72 @@ class ExecutiveAnalytics:
                 "efficiency_ratio": 0
             }
     
-    async def _calculate_time_trend(self, sessions: list) -> list:
+    async def calculate_dashboard_metrics(self, date_range: tuple = None, job_title: Optional[str] = None, rows: List[dict] = None) -> dict:
+        """All dashboard metric groups from a single read of the daily rollups"""
+        rows = rows if rows is not None else await daily_metrics_store.load(date_range, job_title)
+        return {
+            "time_to_hire": await self.calculate_time_to_hire_metrics(rows=rows),
+            "candidate_experience": await self.calculate_candidate_experience_metrics(rows=rows),
+            "hiring_quality": await self.calculate_hiring_quality_metrics(rows=rows),
+            "diversity_metrics": await self.calculate_diversity_metrics(rows=rows),
+            "cost_metrics": await self.calculate_cost_per_hire(rows=rows)
+        }
+    
+    def _calculate_time_trend(self, rows: List[dict]) -> list:
         """Calculate time to hire trend data"""
         try:
-            # Group by week
+            # Group by week of completion
             week_data = {}
-            for session in sessions:
-                if session.get("completed_at"):
-                    completed_date = session["completed_at"]
-                    if isinstance(completed_date, str):
-                        completed_date = datetime.fromisoformat(completed_date.replace('Z', '+00:00'))
-                    
-                    week_key = completed_date.strftime("%Y-W%U")
-                    if week_key not in week_data:
-                        week_data[week_key] = []
-                    
-                    if session.get("started_at"):
-                        start_date = session["started_at"]
-                        if isinstance(start_date, str):
-                            start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                        
-                        time_diff = (completed_date - start_date).total_seconds() / (24 * 3600)
-                        week_data[week_key].append(time_diff)
+            for row in rows:
+                time_to_hire = row.get("time_to_hire") or {}
+                if not time_to_hire.get("count"):
+                    continue
+                week_key = row["day"].strftime("%Y-W%U")
+                week = week_data.setdefault(week_key, {"sum": 0, "count": 0})
+                week["sum"] += time_to_hire.get("sum", 0)
+                week["count"] += time_to_hire.get("count", 0)
             
             # Calculate weekly averages
             trend_data = []
-            for week, times in sorted(week_data.items()):
-                if times:
-                    avg_time = sum(times) / len(times)
-                    trend_data.append({
-                        "week": week,
-                        "average_time": round(avg_time, 2),
-                        "interview_count": len(times)
-                    })
+            for week, totals in sorted(week_data.items()):
+                trend_data.append({
+                    "week": week,
+                    "average_time": round(totals["sum"] / totals["count"], 2),
+                    "interview_count": totals["count"]
+                })
             
             return trend_data[-8:]  # Last 8 weeks
-            
+        
         except Exception as e:
             logging.error(f"Time trend calculation error: {e}")
             return []
     
-    async def _extract_feedback_themes(self, assessments: list) -> list:
-        """Extract common feedback themes from assessments"""
+    def _extract_feedback_themes(self, rows: List[dict]) -> list:
+        """Most common feedback themes across assessments"""
         try:
-            # Common positive and negative themes  
-            positive_themes = ['communication', 'technical skills', 'problem solving', 'enthusiasm', 'experience']
-            negative_themes = ['clarity', 'confidence', 'technical depth', 'preparation', 'engagement']
-            
-            theme_counts = {}
-            
-            for assessment in assessments:
-                feedback_texts = [
-                    assessment.get('technical_feedback', ''),
-                    assessment.get('behavioral_feedback', ''),
-                    assessment.get('overall_feedback', '')
-                ]
-                
-                combined_feedback = ' '.join(feedback_texts).lower()
-                
-                for theme in positive_themes + negative_themes:
-                    if theme in combined_feedback:
-                        theme_counts[theme] = theme_counts.get(theme, 0) + 1
-            
+            theme_counts = self._merge_counts(rows, "feedback_themes")
             # Return top 5 themes
             sorted_themes = sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)
             return [{"theme": theme, "count": count} for theme, count in sorted_themes[:5]]
-            
+        
         except Exception as e:
             logging.error(f"Feedback theme extraction error: {e}")
             return []
     
-    async def _calculate_prediction_accuracy(self, assessments: list) -> float:
+    def _calculate_prediction_accuracy(self, rows: List[dict]) -> float:
         """Calculate prediction accuracy based on follow-up data"""
         # This would require actual hiring outcome data
-        # For now, return a simulated accuracy based on consistency
+        # For now, a prediction counts as accurate when within 20% of the actual score
         try:
-            accurate_predictions = 0
-            total_predictions = 0
-            
-            for assessment in assessments:
-                predictive_data = assessment.get('predictive_analytics', {})
-                if predictive_data:
-                    success_prob = predictive_data.get('success_probability', 0)
-                    overall_score = assessment.get('overall_score', 0) / 100
-                    
-                    # Consider prediction accurate if within 20% of actual score
-                    if abs(success_prob - overall_score) <= 0.2:
-                        accurate_predictions += 1
-                    total_predictions += 1
-            
+            total_predictions = self._total(rows, "predictions.total")
+            accurate_predictions = self._total(rows, "predictions.accurate")
             return round((accurate_predictions / total_predictions * 100), 2) if total_predictions > 0 else 0
-            
+        
         except Exception as e:
             logging.error(f"Prediction accuracy calculation error: {e}")
             return 0
     
-    async def _calculate_fairness_metrics(self, assessments: list) -> dict:
+    def _calculate_fairness_metrics(self) -> dict:
         """Calculate fairness metrics for bias analysis"""
         try:
             # Simulate demographic parity and equalized odds
@@ -2088,7 +2256,7 @@ class ExecutiveAnalytics:
                 "calibration": 0
             }
     
-    async def _calculate_diversity_trends(self, sessions: list) -> list:
+    def _calculate_diversity_trends(self, session_count: int) -> list:
         """Calculate diversity trends over time"""
         try:
             # This would analyze actual demographic data in a real system
@@ -2101,11 +2269,11 @@ class ExecutiveAnalytics:
                 trends.append({
                     "month": month_date.strftime("%Y-%m"),
                     "diversity_score": 0.7 + (i * 0.05),  # Improving trend
-                    "interview_count": len(sessions) // 6
+                    "interview_count": session_count // 6
                 })
             
             return list(reversed(trends))
-            
+        
         except Exception as e:
             logging.error(f"Diversity trends calculation error: {e}")
             return []
@@ -2538,7 +2706,7 @@ class AdvancedVideoAnalyzer:
         """Analyze overall engagement throughout the interview"""
         try:
             # Get video analysis data for the session
-            video_analyses = await db.video_analysis.find({"session_id": session_id}).to_list(None)
+            video_analyses = await session_analysis_store.load_events("video", session_id)
             
             if not video_analyses:
                 return {"error": "No video analysis data found for session"}
@@ -2730,19 +2898,18 @@ class AudioEnhancementEngine:
                 "advanced_metrics": {}
             }
 
-# Initialize advanced analyzers
-advanced_video_analyzer = AdvancedVideoAnalyzer()
-audio_enhancement_engine = AudioEnhancementEngine()
+# Initialize advanced analyzers (constructed on first use)
+advanced_video_analyzer = engine_registry.register("advanced_video_analyzer", AdvancedVideoAnalyzer)
+audio_enhancement_engine = engine_registry.register("audio_enhancement_engine", AudioEnhancementEngine)
 
-# Enhanced predictive analytics and hiring model
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score
-import pandas as pd
+# Enhanced predictive analytics and hiring model (sklearn is imported by the model itself)
+pd = lazy_import("pandas")
 
 class PredictiveHiringModel:
     """ML-Based Success Prediction with Random Forest"""
     
     def __init__(self):
+        from sklearn.ensemble import RandomForestClassifier
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.feature_columns = [
             'technical_score', 'behavioral_score', 'communication_score',
@@ -2756,7 +2923,7 @@ class PredictiveHiringModel:
             "communication_effectiveness": 0.20
         }
     
-    def train_model(self, historical_data: pd.DataFrame) -> dict:
+    def train_model(self, historical_data: "pd.DataFrame") -> dict:
         """Train model on historical hiring data"""
         try:
             if 'hiring_success' not in historical_data.columns:
@@ -2784,6 +2951,7 @@ class PredictiveHiringModel:
             self.is_trained = True
             
             # Calculate training metrics
+            from sklearn.metrics import accuracy_score, precision_score, recall_score
             predictions = self.model.predict(X)
             accuracy = accuracy_score(y, predictions)
             precision = precision_score(y, predictions, zero_division=0)
@@ -3104,8 +3272,8 @@ class PredictiveAnalytics:
         return improvements[:2]  # Top 2 improvement areas
 
 # Initialize predictive analytics
-predictive_analytics = PredictiveAnalytics()
-predictive_hiring_model = PredictiveHiringModel()
+predictive_analytics = engine_registry.register("predictive_analytics", PredictiveAnalytics)
+predictive_hiring_model = engine_registry.register("predictive_hiring_model", PredictiveHiringModel)
 
 # Enhanced bias detection and mitigation
 class BiasDetectionEngine:
@@ -3373,7 +3541,7 @@ Evaluate only the substantive content of the response:
         return bias_mitigation_prefix + base_prompt
 
 # Initialize bias detection
-bias_detector = BiasDetectionEngine()
+bias_detector = engine_registry.register("bias_detector", BiasDetectionEngine)
 
 # Enhanced Emotion & Personality Analysis
 class PersonalityAnalyzer:
@@ -4558,25 +4726,47 @@ def _parse_individual_score_response(response: str, answer: str) -> Dict[str, An
         return _fallback_individual_scoring("", answer, True)
 
 # Initialize all managers and analyzers with Open-Source AI Integration
-interview_ai = InterviewAI()
+interview_ai = engine_registry.register("interview_ai", InterviewAI)
 voice_processor = VoiceProcessor()
 data_privacy_manager = DataPrivacyManager()
-personality_analyzer = PersonalityAnalyzer()
+personality_analyzer = engine_registry.register("personality_analyzer", PersonalityAnalyzer)
 
 # Phase 3: Initialize Open-Source AI Components - Temporarily disabled due to dependency issues
 try:
     # open_source_ai_engine = get_ai_engine()
     # speech_analyzer = get_speech_analyzer()
-    # emotion_detector = get_emotion_detector()
     open_source_ai_engine = None
     speech_analyzer = None
-    emotion_detector = None
     logging.info("⚠️  Phase 3: Open-Source AI components temporarily disabled due to dependency issues")
 except Exception as e:
     logging.error(f"❌ Error initializing open-source AI components: {str(e)}")
     open_source_ai_engine = None
     speech_analyzer = None
-    emotion_detector = None
+
+# Phase 3: Computer vision emotion detector (OpenCV/FER/torch), loaded on first use
+def _load_emotion_detector():
+    try:
+        from computer_vision_emotion_detector import get_emotion_detector
+        detector = get_emotion_detector()
+        print("✅ Computer Vision Emotion Detector loaded successfully")
+        return detector
+    except Exception as e:
+        # Missing CV dependencies: cache the miss so each request doesn't retry the import
+        print(f"⚠️  Warning: Could not load Computer Vision Emotion Detector - {e}")
+        return None
+
+engine_registry.register("emotion_detector", _load_emotion_detector)
+
+def get_vision_emotion_detector():
+    """The loaded detector, or None when its dependencies are not installed"""
+    return engine_registry.get("emotion_detector")
+
+def release_vision_session(session_id: Optional[str]):
+    """Drop a finished session's frame sampling/tracking state (never loads the detector)"""
+    if session_id and engine_registry.is_loaded("emotion_detector"):
+        emotion_detector = get_vision_emotion_detector()
+        if emotion_detector is not None:
+            emotion_detector.release_session(session_id)
 
 # Background task for automatic data cleanup
 async def scheduled_data_cleanup():
@@ -4588,6 +4778,9 @@ async def scheduled_data_cleanup():
             
             # Perform cleanup
             result = await data_privacy_manager.cleanup_expired_data()
+            # Biometric chunks also expire through a TTL index; purge explicitly once the engine is in use
+            if engine_registry.is_loaded("behavioral_biometrics"):
+                result["biometric_purge"] = await privacy_manager.purge_expired_data()
             
             # Log the automated cleanup
             audit_record = {
@@ -4616,6 +4809,81 @@ async def startup_background_tasks():
 def generate_secure_token() -> str:
     return ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(16))
 
+# ===== Reference Data Cache: candidate tokens, jobs, aptitude configs/tokens =====
+from reference_cache import ReadThroughCache, watch_collection_invalidations
+
+REFERENCE_CACHE_TTL_SECONDS = float(os.environ.get('REFERENCE_CACHE_TTL_SECONDS', '60'))
+REFERENCE_CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get('REFERENCE_CACHE_NEGATIVE_TTL_SECONDS', '5'))
+
+candidate_token_cache = ReadThroughCache("candidate_tokens", REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_NEGATIVE_TTL_SECONDS)
+job_cache = ReadThroughCache("jobs", REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_NEGATIVE_TTL_SECONDS)
+aptitude_config_cache = ReadThroughCache("aptitude_configs", REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_NEGATIVE_TTL_SECONDS)
+aptitude_token_cache = ReadThroughCache("aptitude_tokens", REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_NEGATIVE_TTL_SECONDS)
+
+async def get_candidate_token(token: str) -> (Optional[dict], bool):
+    """
+    Interview token lookup (enhanced first, then regular) through the cache; returns (token_data, is_enhanced).
+    The one-time `used` flag is never cached: check it with is_candidate_token_used() or claim the token.
+    """
+    async def _load():
+        for collection, is_enhanced in ((db.enhanced_tokens, True), (db.tokens, False)):
+            doc = await collection.find_one({"token": token}, {"used": 0})
+            if doc:
+                return {"doc": doc, "is_enhanced": is_enhanced}
+        return None
+    
+    entry = await candidate_token_cache.get_or_load(token, _load)
+    if not entry:
+        return None, False
+    return entry["doc"], entry["is_enhanced"]
+
+async def is_candidate_token_used(token: str, is_enhanced: bool) -> bool:
+    collection = db.enhanced_tokens if is_enhanced else db.tokens
+    doc = await collection.find_one({"token": token}, {"_id": 0, "used": 1})
+    return not doc or doc.get("used", False)
+
+async def claim_candidate_token(token: str, is_enhanced: bool) -> bool:
+    """Atomically mark a one-time interview token as used; False if another request already claimed it"""
+    collection = db.enhanced_tokens if is_enhanced else db.tokens
+    claimed = await collection.update_one({"token": token, "used": {"$ne": True}}, {"$set": {"used": True}})
+    candidate_token_cache.invalidate(token)
+    return claimed.matched_count > 0
+
+async def get_job(job_id: str) -> Optional[dict]:
+    return await job_cache.get_or_load(job_id, lambda: db.jobs.find_one({"id": job_id}))
+
+async def get_aptitude_config(config_id: str) -> Optional[dict]:
+    return await aptitude_config_cache.get_or_load(config_id, lambda: db.aptitude_configs.find_one({"id": config_id}))
+
+async def get_aptitude_token(token: str) -> Optional[dict]:
+    return await aptitude_token_cache.get_or_load(token, lambda: db.aptitude_tokens.find_one({"token": token}))
+
+def clear_reference_caches():
+    for cache in (candidate_token_cache, job_cache, aptitude_config_cache, aptitude_token_cache):
+        cache.clear()
+
+@app.on_event("startup")
+async def startup_reference_cache_listeners():
+    """Optional cross-worker invalidation via change streams (requires a replica set)"""
+    if os.environ.get('REFERENCE_CACHE_CHANGE_STREAMS', 'false').lower() != 'true':
+        return
+    asyncio.create_task(watch_collection_invalidations(db.enhanced_tokens, [(candidate_token_cache, "token")]))
+    asyncio.create_task(watch_collection_invalidations(db.tokens, [(candidate_token_cache, "token")]))
+    asyncio.create_task(watch_collection_invalidations(db.jobs, [(job_cache, "id")]))
+    asyncio.create_task(watch_collection_invalidations(db.aptitude_configs, [(aptitude_config_cache, "id")]))
+    asyncio.create_task(watch_collection_invalidations(db.aptitude_tokens, [(aptitude_token_cache, "token")]))
+    logging.info("Reference cache change stream listeners started")
+
+@api_router.get("/admin/reference-cache/stats")
+async def get_reference_cache_stats():
+    """Hit rates and sizes of the reference data caches"""
+    return {
+        "success": True,
+        "caches": [cache.get_stats() for cache in (candidate_token_cache, job_cache, aptitude_config_cache, aptitude_token_cache)],
+        "change_streams_enabled": os.environ.get('REFERENCE_CACHE_CHANGE_STREAMS', 'false').lower() == 'true',
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # ===== Aptitude: Security, Validation, Anti-cheat, Rate Limiting =====
 RATE_LIMIT_STORE: Dict[str, List[float]] = {}
 
@@ -6219,6 +6487,19 @@ async def mark_anti_cheat_flag(session_id: str, flag_type: str, details: dict):
 
 
 # ===== Aptitude: Collections & Indexes =====
+from question_analytics import (backfill_source_kind, ensure_question_analytics_indexes, get_ai_analytics,
+                                record_questions, reset_question_analytics, tag_source_kind)
+from question_bank_stats import (get_bank_counters, reconcile_bank_stats, reconcile_bank_stats_loop,
+                                 record_bank_changes, reset_bank_stats, summarize_bank_stats)
+from fastapi.responses import StreamingResponse
+from question_import import (IMPORT_REPORT_MODES, IMPORT_STATUSES, ImportFormatError, InvalidQuestionRow,
+                             backfill_content_hash, content_hash, detect_import_format, ensure_content_hash_index,
+                             import_questions, import_report_lines, iter_import_rows, stamp_content_hash,
+                             write_questions)
+from question_similarity import (NEAR_DUPLICATE_THRESHOLD, NearDuplicateGuard, backfill_minhash,
+                                 cluster_near_duplicates, ensure_near_duplicate_index, find_near_duplicates,
+                                 stamp_minhash)
+
 async def ensure_aptitude_indexes():
     try:
         await db.aptitude_questions.create_index([("id", 1)], unique=True)
@@ -6226,6 +6507,9 @@ async def ensure_aptitude_indexes():
         await db.aptitude_questions.create_index([("subtopic", 1)])
         await db.aptitude_questions.create_index([("difficulty", 1)])
         await db.aptitude_questions.create_index([("topic", 1), ("difficulty", 1)])
+        await db.aptitude_questions.create_index([("topic", 1), ("difficulty", 1), ("created_at", -1)])
+        await db.aptitude_questions.create_index([("topic", 1), ("subtopic", 1), ("difficulty", 1), ("question_type", 1)])
+        await db.aptitude_questions.create_index([("question_type", 1)])
         await db.aptitude_questions.create_index([("created_at", -1)])
         await db.aptitude_questions.create_index([("success_rate", -1)])
         # Configs/tokens/sessions/results
@@ -6236,6 +6520,12 @@ async def ensure_aptitude_indexes():
         await db.aptitude_sessions.create_index([("token", 1)])
         await db.aptitude_results.create_index([("result_id", 1)], unique=True)
         await db.aptitude_results.create_index([("session_id", 1)])
+        await ensure_question_analytics_indexes(db)
+        await backfill_source_kind(db)
+        await ensure_content_hash_index(db)
+        await backfill_content_hash(db)
+        await ensure_near_duplicate_index(db)
+        await backfill_minhash(db)
         logging.info("Aptitude indexes ensured")
     except Exception as e:
         logging.error(f"Failed creating aptitude indexes: {e}")
@@ -6245,6 +6535,47 @@ async def ensure_aptitude_indexes():
 async def startup_aptitude_indexes():
     await ensure_aptitude_indexes()
 
+question_bank_stats_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def startup_question_bank_stats():
+    global question_bank_stats_task
+    try:
+        await get_bank_counters(db)
+    except Exception as e:
+        logging.error(f"Question bank stats reconciliation failed: {e}")
+    question_bank_stats_task = asyncio.create_task(reconcile_bank_stats_loop(db))
+
+@app.on_event("shutdown")
+async def shutdown_question_bank_stats():
+    if question_bank_stats_task is not None:
+        question_bank_stats_task.cancel()
+        try:
+            await question_bank_stats_task
+        except asyncio.CancelledError:
+            pass
+
+async def record_question_changes(removed: List[Dict[str, Any]] = (), added: List[Dict[str, Any]] = ()):
+    """Apply question writes to the bank stats and AI analytics counters"""
+    await asyncio.gather(record_bank_changes(db, removed, added), record_questions(db, removed, added))
+
+async def reset_question_stats():
+    """Counters for an emptied question bank"""
+    await asyncio.gather(reset_bank_stats(db), reset_question_analytics(db))
+
+async def insert_aptitude_questions(docs: List[Dict[str, Any]]):
+    """Insert question documents, skipping content duplicates of banked questions and keeping the question counters current"""
+    for doc in docs:
+        tag_source_kind(doc)
+        stamp_content_hash(doc)
+        if "minhash_bands" not in doc:
+            stamp_minhash(doc)
+    outcome = await write_questions(db.aptitude_questions, docs)
+    if outcome.errors:
+        logging.warning(f"{len(outcome.errors)} question inserts failed: {next(iter(outcome.errors.values()))}")
+    await record_question_changes(added=outcome.inserted)
+    return outcome
+
 # ===== Aptitude: Question Validation & Generation =====
 
 def validate_aptitude_question(q: AptitudeQuestion) -> Dict[str, Any]:
@@ -6709,17 +7040,19 @@ async def generate_aptitude_question_pool(target_total: int = 800) -> Dict[str,
                 check = validate_aptitude_question(q)
                 q.metadata["quality"] = check
                 docs.append(q.dict())
-    # Insert in chunks
+    # Insert in chunks, skipping near-duplicates of banked or earlier generated questions
     inserted = 0
     CHUNK = 200
+    near_duplicates = NearDuplicateGuard(db.aptitude_questions)
     for i in range(0, len(docs), CHUNK):
         chunk = docs[i:i+CHUNK]
         try:
-            res = await db.aptitude_questions.insert_many(chunk)
-            inserted += len(res.inserted_ids)
+            chunk, _ = await near_duplicates.screen(chunk)
+            res = await insert_aptitude_questions(chunk)
+            inserted += len(res.inserted)
         except Exception as e:
             logging.error(f"Chunk insert failed: {e}")
-    return {"generated": len(docs), "inserted": inserted}
+    return {"generated": len(docs), "inserted": inserted, "near_duplicates": near_duplicates.rejected}
 
 # ===== Admin endpoint to seed questions =====
 class AptitudeSeedRequest(BaseModel):
@@ -6735,12 +7068,14 @@ async def seed_aptitude_questions(req: AptitudeSeedRequest):
         # If force: delete and reseed
         if req.force and current > 0:
             await db.aptitude_questions.delete_many({})
+            await reset_question_stats()
         result = await generate_aptitude_question_pool(req.target_total)
         final_count = await db.aptitude_questions.count_documents({})
         return {
             "success": True,
             "generated": result["generated"],
             "inserted": result["inserted"],
+            "near_duplicates_skipped": result["near_duplicates"],
             "total_in_db": final_count
         }
     except Exception as e:
@@ -6748,20 +7083,27 @@ async def seed_aptitude_questions(req: AptitudeSeedRequest):
         raise HTTPException(status_code=500, detail=f"Seeding failed: {str(e)}")
 
 @api_router.get("/admin/aptitude-questions/stats")
-async def aptitude_questions_stats():
+async def aptitude_questions_stats(refresh: bool = False):
+    """Question bank breakdowns from the maintained counters (refresh=true reconciles them first)"""
     try:
-        total = await db.aptitude_questions.count_documents({})
-        by_topic = {}
-        for topic in TOPICS_SUBTOPICS.keys():
-            by_topic[topic] = await db.aptitude_questions.count_documents({"topic": topic})
-        by_difficulty = {}
-        for d in ["easy", "medium", "hard"]:
-            by_difficulty[d] = await db.aptitude_questions.count_documents({"difficulty": d})
-        return {"success": True, "total": total, "by_topic": by_topic, "by_difficulty": by_difficulty}
+        stats = await get_bank_counters(db, refresh)
+        summary = summarize_bank_stats(stats["counters"], TOPICS_SUBTOPICS.keys(), ["easy", "medium", "hard"])
+        return {"success": True, **summary, "computed_from": stats["computed_from"], "reconciled_at": stats["reconciled_at"]}
     except Exception as e:
         logging.error(f"Stats error: {e}")
         raise HTTPException(status_code=500, detail="Failed to compute stats")
 
+@api_router.post("/admin/aptitude-questions/stats/reconcile")
+async def reconcile_aptitude_questions_stats():
+    """Rebuild the question bank counters from one aggregation"""
+    try:
+        result = await reconcile_bank_stats(db)
+        return {"success": True, "total": result["counters"]["total"],
+                "cells": len(result["counters"]["cells"]), "reconciled_at": result["reconciled_at"]}
+    except Exception as e:
+        logging.error(f"Stats reconciliation error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to reconcile stats")
+
 
 # Admin Routes
 @api_router.post("/admin/login")
@@ -6812,6 +7154,7 @@ async def create_aptitude_test_config(req: CreateAptitudeConfigRequest):
             randomize_options=req.randomize_options
         )
         await db.aptitude_configs.insert_one(cfg.dict())
+        aptitude_config_cache.invalidate(cfg.id)
         return {"success": True, "config_id": cfg.id}
     except HTTPException:
         raise
@@ -6859,7 +7202,7 @@ async def generate_aptitude_test_token(req: GenerateAptitudeTokenRequest, reques
         # Basic rate limit to prevent abuse
         ip = request.client.host if request.client else ""
         check_rate_limit("gen_token", ip, limit=10, window_sec=60)
-        cfg = await db.aptitude_configs.find_one({"id": req.config_id})
+        cfg = await get_aptitude_config(req.config_id)
         if not cfg:
             raise HTTPException(status_code=404, detail="Config not found")
         token_obj = AptitudeTestToken(
@@ -6869,6 +7212,7 @@ async def generate_aptitude_test_token(req: GenerateAptitudeTokenRequest, reques
             candidate_restrictions=req.candidate_restrictions
         )
         await db.aptitude_tokens.insert_one(token_obj.dict())
+        aptitude_token_cache.invalidate(token_obj.token)
         return {"success": True, "token": token_obj.token, "expires_at": token_obj.expires_at}
     except HTTPException:
         raise
@@ -6887,8 +7231,8 @@ async def validate_token_and_start_test(req: ValidateTokenRequest, request: Requ
     try:
         ip = request.client.host if request.client else ""
         check_rate_limit("validate_token", ip, limit=60, window_sec=60)
-        tok = await db.aptitude_tokens.find_one({"token": req.token, "is_active": True})
-        if not tok:
+        tok = await get_aptitude_token(req.token)
+        if not tok or not tok.get("is_active"):
             raise HTTPException(status_code=400, detail="Invalid or inactive token")
         if datetime.utcnow() > tok["expires_at"]:
             raise HTTPException(status_code=400, detail="Token expired")
@@ -6909,9 +7253,15 @@ async def validate_token_and_start_test(req: ValidateTokenRequest, request: Requ
             ip_address=request.client.host if request.client else "",
             user_agent=request.headers.get("user-agent", "")
         )
+        # Increment token use atomically so a stale cached used_count can't grant extra attempts
+        claimed = await db.aptitude_tokens.update_one(
+            {"token": req.token, "used_count": {"$lt": tok.get("max_attempts", 1)}},
+            {"$inc": {"used_count": 1}}
+        )
+        aptitude_token_cache.invalidate(req.token)
+        if claimed.matched_count == 0:
+            raise HTTPException(status_code=400, detail="Maximum attempts exceeded")
         await db.aptitude_sessions.insert_one(session.dict())
-        # Increment token use
-        await db.aptitude_tokens.update_one({"token": req.token}, {"$inc": {"used_count": 1}})
         return {"success": True, "session_id": session.session_id}
     except HTTPException:
         raise
@@ -6947,7 +7297,7 @@ async def get_next_question(session_id: str, request: Request):
         if not sess:
             raise HTTPException(status_code=404, detail="Session not found")
             
-        cfg = await db.aptitude_configs.find_one({"id": sess["config_id"]})
+        cfg = await get_aptitude_config(sess["config_id"])
         if not cfg:
             raise HTTPException(status_code=404, detail="Config not found")
         
@@ -7204,7 +7554,7 @@ async def submit_answer(session_id: str, req: SubmitAnswerRequest, request: Requ
         new_idx = sess.get("current_question_index", 0) + 1
         status = sess.get("status", "in_progress")
         
-        cfg = await db.aptitude_configs.find_one({"id": sess["config_id"]})
+        cfg = await get_aptitude_config(sess["config_id"])
         if cfg:
             # Calculate current topic counts
             current_topic_counts = {}
@@ -7250,6 +7600,7 @@ async def submit_answer(session_id: str, req: SubmitAnswerRequest, request: Requ
             {"session_id": session_id},
             {"$set": update_data}
         )
+        mark_session_risk_dirty(session_id)
         
         # Return enhanced response
         return {
@@ -7596,7 +7947,7 @@ async def get_test_results(session_id: str):
         if not sess:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        cfg = await db.aptitude_configs.find_one({"id": sess["config_id"]})
+        cfg = await get_aptitude_config(sess["config_id"])
         answers = sess.get("answers", {})
         total = len(sess.get("questions_sequence", []))
         
@@ -7717,589 +8068,82 @@ async def get_test_results(session_id: str):
         raise HTTPException(status_code=500, detail="Failed to get comprehensive results")
 
 # ===== PROFESSIONAL PDF REPORT GENERATION SYSTEM (PHASE 1 - PART 8) =====
+# Report layouts and charts live in report_templates; report_renderer runs them in a
+# process pool and keeps the PDFs in GridFS so any worker can serve the download.
+from report_renderer import ReportRenderer, ReportArtifactNotFound
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Circle
-import seaborn as sns
-import numpy as np
-from io import BytesIO
-import base64
+report_renderer = ReportRenderer(db)
 
-# Set professional color palette
-APTITUDE_COLORS = {
-    'primary': '#2E86AB',      # Professional Blue
-    'secondary': '#A23B72',    # Magenta
-    'success': '#F18F01',      # Orange
-    'warning': '#C73E1D',      # Red
-    'info': '#6C7B7F',         # Gray
-    'light': '#F5F5F5',        # Light Gray
-    'dark': '#2C3E50'          # Dark Blue
-}
 
-TOPIC_COLORS = {
-    'numerical_reasoning': '#2E86AB',
-    'logical_reasoning': '#A23B72', 
-    'verbal_comprehension': '#F18F01',
-    'spatial_reasoning': '#C73E1D'
-}
+async def stream_stored_report(record: dict, filename: str):
+    """Stream a report PDF from GridFS, falling back to the /tmp path of older records"""
+    artifact_id = record.get("pdf_artifact_id")
+    if artifact_id:
+        try:
+            return await report_renderer.stream_response(artifact_id, filename)
+        except ReportArtifactNotFound:
+            raise HTTPException(status_code=404, detail="PDF file not found")
+
+    pdf_path = record.get("pdf_path", "")
+    if not pdf_path or not os.path.exists(pdf_path):
+        raise HTTPException(status_code=404, detail="PDF file not found")
 
+    from fastapi.responses import FileResponse
+    return FileResponse(path=pdf_path, media_type='application/pdf', filename=filename)
 
-def create_performance_radar_chart(topic_scores: Dict[str, Dict[str, Any]]) -> str:
-    """Create radar chart for topic performance"""
+
+async def generate_professional_aptitude_pdf(session_id: str) -> dict:
+    """Render (or reuse) the professional PDF report and return its stored artifact"""
     try:
-        plt.style.use('seaborn-v0_8-whitegrid')
-        fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
-        
-        # Prepare data
-        topics = list(topic_scores.keys())
-        topic_names = {
-            'numerical_reasoning': 'Numerical\nReasoning',
-            'logical_reasoning': 'Logical\nReasoning', 
-            'verbal_comprehension': 'Verbal\nComprehension',
-            'spatial_reasoning': 'Spatial\nReasoning'
-        }
-        
-        labels = [topic_names.get(topic, topic.replace('_', ' ').title()) for topic in topics]
-        values = [topic_scores[topic].get('percentage', 0) for topic in topics]
-        
-        # Close the plot
-        values += values[:1]
-        labels += labels[:1]
-        
-        # Create angles for each topic
-        angles = np.linspace(0, 2 * np.pi, len(labels), endpoint=True)
-        
-        # Plot
-        ax.plot(angles, values, 'o-', linewidth=3, color=APTITUDE_COLORS['primary'], markersize=8)
-        ax.fill(angles, values, alpha=0.25, color=APTITUDE_COLORS['primary'])
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(labels[:-1], fontsize=11, fontweight='bold')
-        ax.set_ylim(0, 100)
-        ax.set_yticks([20, 40, 60, 80, 100])
-        ax.set_yticklabels(['20%', '40%', '60%', '80%', '100%'], fontsize=9)
-        ax.grid(True, alpha=0.3)
-        
-        # Add performance zones
-        ax.fill_between(angles, 0, 40, alpha=0.1, color='red', label='Needs Improvement')
-        ax.fill_between(angles, 40, 70, alpha=0.1, color='orange', label='Good')
-        ax.fill_between(angles, 70, 100, alpha=0.1, color='green', label='Excellent')
-        
-        plt.title('Topic Performance Overview', pad=30, fontsize=16, fontweight='bold')
+        # Get comprehensive results
+        result = await db.aptitude_results.find_one({"session_id": session_id}, {"_id": 0})
+        if not result:
+            raise HTTPException(status_code=404, detail="Results not found")
         
-        # Save to base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-        buffer.seek(0)
-        chart_b64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
+        session = await db.aptitude_sessions.find_one(
+            {"session_id": session_id}, {"_id": 0, "candidate_name": 1, "start_time": 1}
+        )
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
         
-        return chart_b64
+        # Unchanged results hash to the same render key and are served from storage
+        return await report_renderer.render(
+            "aptitude_report",
+            {"result": result, "session": session},
+            f"aptitude_assessment_report_{session_id}.pdf"
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Radar chart creation error: {e}")
-        return ""
+        logging.error(f"Professional PDF generation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate professional PDF: {str(e)}")
 
 
-def create_difficulty_progression_chart(difficulty_performance: Dict[str, Dict[str, Any]]) -> str:
-    """Create bar chart for difficulty progression"""
+@api_router.get("/aptitude-test/results/{session_id}/pdf")
+async def download_results_pdf(session_id: str):
+    """Generate and download comprehensive professional PDF report"""
     try:
-        plt.style.use('seaborn-v0_8-whitegrid')
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        difficulties = ['easy', 'medium', 'hard']
-        percentages = [difficulty_performance.get(diff, {}).get('percentage', 0) for diff in difficulties]
-        totals = [difficulty_performance.get(diff, {}).get('total', 0) for diff in difficulties]
-        
-        colors = [APTITUDE_COLORS['success'], APTITUDE_COLORS['primary'], APTITUDE_COLORS['warning']]
-        
-        bars = ax.bar(difficulties, percentages, color=colors, alpha=0.8, edgecolor='white', linewidth=2)
-        
-        # Add value labels on bars
-        for i, (bar, percentage, total) in enumerate(zip(bars, percentages, totals)):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 1,
-                   f'{percentage:.1f}%\n({total} questions)',
-                   ha='center', va='bottom', fontweight='bold', fontsize=10)
-        
-        ax.set_ylim(0, 100)
-        ax.set_ylabel('Success Rate (%)', fontsize=12, fontweight='bold')
-        ax.set_xlabel('Difficulty Level', fontsize=12, fontweight='bold')
-        ax.set_title('Performance by Difficulty Level', fontsize=14, fontweight='bold', pad=20)
-        
-        # Add performance zones
-        ax.axhspan(0, 40, alpha=0.1, color='red', label='Needs Improvement')
-        ax.axhspan(40, 70, alpha=0.1, color='orange', label='Good')
-        ax.axhspan(70, 100, alpha=0.1, color='green', label='Excellent')
-        
-        ax.grid(axis='y', alpha=0.3)
-        ax.set_xticklabels([d.title() for d in difficulties], fontsize=11)
-        
-        # Save to base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-        buffer.seek(0)
-        chart_b64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        return chart_b64
+        artifact = await generate_professional_aptitude_pdf(session_id)
+        return await report_renderer.stream_response(
+            artifact["artifact_id"],
+            f"aptitude_assessment_report_{session_id}.pdf",
+            inline=True
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Difficulty chart creation error: {e}")
-        return ""
+        logging.error(f"PDF download error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate PDF report")
 
 
-def create_time_management_chart(time_analysis: Dict[str, Any]) -> str:
-    """Create time management visualization"""
-    try:
-        plt.style.use('seaborn-v0_8-whitegrid')
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        
-        # Time efficiency gauge
-        efficiency_score = time_analysis.get('time_efficiency_score', 50)
-        
-        # Create gauge chart
-        theta = np.linspace(0, np.pi, 100)
-        r = 1
-        
-        ax1.plot(r * np.cos(theta), r * np.sin(theta), 'k-', linewidth=3)
-        ax1.fill_between(r * np.cos(theta), 0, r * np.sin(theta), alpha=0.1, color='lightgray')
-        
-        # Color zones
-        zones = [
-            (0, 40, 'red', 'Needs Improvement'),
-            (40, 70, 'orange', 'Good'),
-            (70, 100, 'green', 'Excellent')
-        ]
-        
-        for start, end, color, label in zones:
-            start_angle = np.pi * (1 - start/100)
-            end_angle = np.pi * (1 - end/100)
-            theta_zone = np.linspace(end_angle, start_angle, 50)
-            ax1.fill_between(r * np.cos(theta_zone), 0, r * np.sin(theta_zone), 
-                           alpha=0.3, color=color, label=label)
-        
-        # Needle
-        needle_angle = np.pi * (1 - efficiency_score/100)
-        ax1.arrow(0, 0, 0.8 * np.cos(needle_angle), 0.8 * np.sin(needle_angle),
-                 head_width=0.05, head_length=0.05, fc='black', ec='black', linewidth=3)
-        
-        ax1.set_xlim(-1.2, 1.2)
-        ax1.set_ylim(-0.2, 1.2)
-        ax1.set_aspect('equal')
-        ax1.axis('off')
-        ax1.set_title(f'Time Efficiency: {efficiency_score:.1f}%', fontsize=14, fontweight='bold', pad=20)
-        
-        # Time by topic
-        time_by_topic = time_analysis.get('time_by_topic', {})
-        if time_by_topic:
-            topics = list(time_by_topic.keys())
-            avg_times = [time_by_topic[topic].get('avg_time', 0) for topic in topics]
-            
-            topic_names = {
-                'numerical_reasoning': 'Numerical',
-                'logical_reasoning': 'Logical', 
-                'verbal_comprehension': 'Verbal',
-                'spatial_reasoning': 'Spatial'
-            }
-            
-            labels = [topic_names.get(topic, topic.replace('_', ' ').title()) for topic in topics]
-            colors = [TOPIC_COLORS.get(topic, APTITUDE_COLORS['info']) for topic in topics]
-            
-            bars = ax2.bar(labels, avg_times, color=colors, alpha=0.8, edgecolor='white', linewidth=2)
-            
-            # Add value labels
-            for bar, time_val in zip(bars, avg_times):
-                height = bar.get_height()
-                ax2.text(bar.get_x() + bar.get_width()/2., height + 2,
-                        f'{time_val:.1f}s',
-                        ha='center', va='bottom', fontweight='bold', fontsize=10)
-            
-            ax2.set_ylabel('Average Time (seconds)', fontsize=12, fontweight='bold')
-            ax2.set_xlabel('Topic', fontsize=12, fontweight='bold')
-            ax2.set_title('Average Time per Topic', fontsize=14, fontweight='bold', pad=20)
-            ax2.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        
-        # Save to base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-        buffer.seek(0)
-        chart_b64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        return chart_b64
-        
-    except Exception as e:
-        logging.error(f"Time chart creation error: {e}")
-        return ""
-
-
-def create_percentile_visualization(percentile_rank: float, overall_score: float) -> str:
-    """Create percentile comparison visualization"""
-    try:
-        plt.style.use('seaborn-v0_8-whitegrid')
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        
-        # Percentile distribution
-        x = np.linspace(0, 100, 1000)
-        y = np.exp(-(x-50)**2/800)  # Bell curve approximation
-        
-        ax1.fill_between(x, 0, y, alpha=0.3, color=APTITUDE_COLORS['info'], label='All Test Takers')
-        ax1.fill_between(x[x <= percentile_rank], 0, y[x <= percentile_rank], 
-                        alpha=0.7, color=APTITUDE_COLORS['primary'], label=f'Your Percentile: {percentile_rank:.1f}%')
-        
-        ax1.axvline(percentile_rank, color=APTITUDE_COLORS['warning'], linewidth=3, linestyle='--', label='Your Position')
-        ax1.set_xlabel('Percentile Rank', fontsize=12, fontweight='bold')
-        ax1.set_ylabel('Distribution Density', fontsize=12, fontweight='bold')
-        ax1.set_title('Percentile Ranking', fontsize=14, fontweight='bold', pad=20)
-        ax1.legend()
-        ax1.grid(alpha=0.3)
-        
-        # Score comparison
-        score_ranges = [
-            (0, 40, 'Below Average', 'red'),
-            (40, 60, 'Average', 'orange'),
-            (60, 80, 'Above Average', 'lightgreen'),
-            (80, 100, 'Excellent', 'green')
-        ]
-        
-        for i, (start, end, label, color) in enumerate(score_ranges):
-            ax2.barh(i, end-start, left=start, color=color, alpha=0.6, edgecolor='white', linewidth=2)
-            ax2.text(start + (end-start)/2, i, label, ha='center', va='center', fontweight='bold', fontsize=10)
-        
-        # Your score indicator
-        ax2.axvline(overall_score, color='black', linewidth=4, linestyle='-', label=f'Your Score: {overall_score:.1f}%')
-        
-        ax2.set_xlabel('Score (%)', fontsize=12, fontweight='bold')
-        ax2.set_title('Score Comparison', fontsize=14, fontweight='bold', pad=20)
-        ax2.set_yticks([])
-        ax2.legend()
-        ax2.grid(axis='x', alpha=0.3)
-        
-        plt.tight_layout()
-        
-        # Save to base64
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-        buffer.seek(0)
-        chart_b64 = base64.b64encode(buffer.read()).decode()
-        plt.close()
-        
-        return chart_b64
-        
-    except Exception as e:
-        logging.error(f"Percentile chart creation error: {e}")
-        return ""
-
-
-async def generate_professional_aptitude_pdf(session_id: str) -> str:
-    """Generate comprehensive professional PDF report"""
-    try:
-        from reportlab.lib.pagesizes import A4, letter
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch, cm
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
-        from reportlab.graphics.shapes import Drawing, Rect
-        from reportlab.graphics import renderPDF
-        
-        # Get comprehensive results
-        result = await db.aptitude_results.find_one({"session_id": session_id})
-        if not result:
-            raise HTTPException(status_code=404, detail="Results not found")
-        
-        session = await db.aptitude_sessions.find_one({"session_id": session_id})
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Create PDF file
-        tmp_dir = "/tmp"
-        os.makedirs(tmp_dir, exist_ok=True)
-        pdf_path = os.path.join(tmp_dir, f"aptitude_report_{session_id}.pdf")
-        
-        # Create document
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-        story = []
-        
-        # Get styles
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor(APTITUDE_COLORS['primary'])
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceAfter=12,
-            spaceBefore=20,
-            textColor=colors.HexColor(APTITUDE_COLORS['dark'])
-        )
-        
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=12,
-            alignment=TA_JUSTIFY
-        )
-        
-        # Header
-        story.append(Paragraph("APTITUDE TEST COMPREHENSIVE REPORT", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Executive Summary Section
-        story.append(Paragraph("EXECUTIVE SUMMARY", heading_style))
-        
-        candidate_name = session.get('candidate_name', 'Anonymous')
-        test_date = session.get('start_time', datetime.utcnow()).strftime('%B %d, %Y')
-        overall_score = result.get('overall_score', 0)
-        percentile_rank = result.get('percentile_rank', 50)
-        
-        summary_data = [
-            ['Candidate Name:', candidate_name],
-            ['Test Date:', test_date],
-            ['Overall Score:', f"{overall_score:.1f}%"],
-            ['Percentile Rank:', f"{percentile_rank:.1f}th percentile"],
-            ['Questions Attempted:', f"{result.get('questions_attempted', 0)} questions"],
-            ['Time Taken:', f"{result.get('total_time_taken', 0) // 60} minutes {result.get('total_time_taken', 0) % 60} seconds"]
-        ]
-        
-        summary_table = Table(summary_data, colWidths=[2*inch, 3*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor(APTITUDE_COLORS['dark'])),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('PADDIN', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6'))
-        ]))
-        
-        story.append(summary_table)
-        story.append(Spacer(1, 20))
-        
-        # Performance Level Assessment
-        if overall_score >= 80:
-            performance_level = "EXCELLENT"
-            level_color = "green"
-            level_description = "Outstanding performance demonstrating exceptional cognitive abilities across multiple domains."
-        elif overall_score >= 60:
-            performance_level = "GOOD"
-            level_color = "orange"
-            level_description = "Solid performance showing good aptitude with identified areas for targeted improvement."
-        elif overall_score >= 40:
-            performance_level = "AVERAGE"
-            level_color = "orange" 
-            level_description = "Average performance indicating foundational skills with significant development opportunities."
-        else:
-            performance_level = "NEEDS IMPROVEMENT"
-            level_color = "red"
-            level_description = "Performance indicates need for substantial skill development across core areas."
-        
-        story.append(Paragraph(f"<b>Performance Level: {performance_level}</b>", 
-                             ParagraphStyle('PerformanceLevel', parent=body_style, 
-                                          textColor=colors.HexColor(APTITUDE_COLORS[level_color if level_color != 'green' else 'success']),
-                                          fontSize=14, spaceAfter=10)))
-        story.append(Paragraph(level_description, body_style))
-        story.append(Spacer(1, 20))
-        
-        # Topic Performance Charts
-        story.append(Paragraph("DETAILED PERFORMANCE ANALYSIS", heading_style))
-        
-        # Create and add radar chart
-        radar_chart = create_performance_radar_chart(result.get('topic_scores', {}))
-        if radar_chart:
-            try:
-                radar_img_data = base64.b64decode(radar_chart)
-                radar_img = Image(BytesIO(radar_img_data), width=6*inch, height=4*inch)
-                story.append(radar_img)
-                story.append(Spacer(1, 15))
-            except Exception as e:
-                logging.error(f"Error adding radar chart: {e}")
-        
-        # Topic Scores Table
-        story.append(Paragraph("Topic-wise Performance Breakdown", 
-                             ParagraphStyle('SubHeading', parent=heading_style, fontSize=14)))
-        
-        topic_names = {
-            'numerical_reasoning': 'Numerical Reasoning',
-            'logical_reasoning': 'Logical Reasoning', 
-            'verbal_comprehension': 'Verbal Comprehension',
-            'spatial_reasoning': 'Spatial Reasoning'
-        }
-        
-        topic_data = [['Topic', 'Score', 'Total', 'Percentage', 'Avg. Time', 'Assessment']]
-        
-        for topic, scores in result.get('topic_scores', {}).items():
-            topic_name = topic_names.get(topic, topic.replace('_', ' ').title())
-            score = scores.get('score', 0)
-            total = scores.get('total', 0)
-            percentage = scores.get('percentage', 0)
-            avg_time = scores.get('avg_time', 0)
-            
-            if percentage >= 75:
-                assessment = "Strong"
-            elif percentage >= 50:
-                assessment = "Moderate"
-            else:
-                assessment = "Needs Work"
-            
-            topic_data.append([
-                topic_name,
-                str(score),
-                str(total),
-                f"{percentage:.1f}%",
-                f"{avg_time:.1f}s",
-                assessment
-            ])
-        
-        topic_table = Table(topic_data, colWidths=[2.2*inch, 0.6*inch, 0.6*inch, 0.8*inch, 0.8*inch, 1*inch])
-        topic_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(APTITUDE_COLORS['primary'])),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6')),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDINGX', (0, 0), (-1, -1), 6),
-            ('PADDINGY', (0, 0), (-1, -1), 8)
-        ]))
-        
-        story.append(topic_table)
-        story.append(PageBreak())
-        
-        # Difficulty Analysis
-        story.append(Paragraph("DIFFICULTY PROGRESSION ANALYSIS", heading_style))
-        
-        difficulty_chart = create_difficulty_progression_chart(result.get('difficulty_performance', {}))
-        if difficulty_chart:
-            try:
-                diff_img_data = base64.b64decode(difficulty_chart)
-                diff_img = Image(BytesIO(diff_img_data), width=7*inch, height=4*inch)
-                story.append(diff_img)
-                story.append(Spacer(1, 15))
-            except Exception as e:
-                logging.error(f"Error adding difficulty chart: {e}")
-        
-        # Time Management Analysis
-        story.append(Paragraph("TIME MANAGEMENT ANALYSIS", heading_style))
-        
-        time_analysis = result.get('time_management_analytics', {})
-        time_chart = create_time_management_chart(time_analysis)
-        if time_chart:
-            try:
-                time_img_data = base64.b64decode(time_chart)
-                time_img = Image(BytesIO(time_img_data), width=7*inch, height=4*inch)
-                story.append(time_img)
-                story.append(Spacer(1, 15))
-            except Exception as e:
-                logging.error(f"Error adding time chart: {e}")
-        
-        # Time Management Insights
-        time_insights = time_analysis.get('time_management_insights', [])
-        if time_insights:
-            story.append(Paragraph("Time Management Insights:", 
-                                 ParagraphStyle('InsightHeading', parent=body_style, fontName='Helvetica-Bold')))
-            for insight in time_insights:
-                story.append(Paragraph(f"• {insight}", body_style))
-            story.append(Spacer(1, 15))
-        
-        # Percentile Comparison
-        story.append(Paragraph("COMPARATIVE PERFORMANCE", heading_style))
-        
-        percentile_chart = create_percentile_visualization(percentile_rank, overall_score)
-        if percentile_chart:
-            try:
-                perc_img_data = base64.b64decode(percentile_chart)
-                perc_img = Image(BytesIO(perc_img_data), width=7*inch, height=4*inch)
-                story.append(perc_img)
-                story.append(Spacer(1, 15))
-            except Exception as e:
-                logging.error(f"Error adding percentile chart: {e}")
-        
-        # Improvement Recommendations
-        story.append(Paragraph("PERSONALIZED IMPROVEMENT RECOMMENDATIONS", heading_style))
-        
-        recommendations = result.get('recommendations', [])
-        if recommendations:
-            for i, rec in enumerate(recommendations, 1):
-                story.append(Paragraph(f"<b>{i}.</b> {rec}", body_style))
-                story.append(Spacer(1, 8))
-        
-        story.append(Spacer(1, 20))
-        
-        # Detailed Analysis
-        detailed_analysis = result.get('detailed_analysis', '')
-        if detailed_analysis:
-            story.append(Paragraph("COMPREHENSIVE ANALYSIS", heading_style))
-            # Split analysis into paragraphs
-            analysis_parts = detailed_analysis.split('**')
-            for part in analysis_parts:
-                if part.strip():
-                    if part.strip().endswith(':'):
-                        # This is a heading
-                        story.append(Paragraph(f"<b>{part.strip()}</b>", 
-                                             ParagraphStyle('AnalysisHeading', parent=body_style, 
-                                                           fontName='Helvetica-Bold', spaceAfter=8)))
-                    else:
-                        story.append(Paragraph(part.strip(), body_style))
-        
-        # Footer
-        story.append(Spacer(1, 30))
-        story.append(Paragraph("Generated by Elite AI Aptitude Assessment System", 
-                             ParagraphStyle('Footer', parent=styles['Normal'], 
-                                          fontSize=9, alignment=TA_CENTER, 
-                                          textColor=colors.HexColor('#6C757D'))))
-        
-        # Build PDF
-        doc.build(story)
-        
-        return pdf_path
-        
-    except Exception as e:
-        logging.error(f"Professional PDF generation error: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate professional PDF: {str(e)}")
+@api_router.get("/admin/report-renderer/stats")
+async def get_report_renderer_stats():
+    """Render counts, artifact cache hits and process pool state for this worker"""
+    return {"success": True, "report_renderer": report_renderer.get_stats()}
 
 
-@api_router.get("/aptitude-test/results/{session_id}/pdf")
-async def download_results_pdf(session_id: str):
-    """Generate and download comprehensive professional PDF report"""
-    try:
-        # Generate professional PDF
-        pdf_path = await generate_professional_aptitude_pdf(session_id)
-        
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            pdf_path, 
-            media_type='application/pdf', 
-            filename=f"aptitude_assessment_report_{session_id}.pdf",
-            headers={"Content-Disposition": f"inline; filename=aptitude_assessment_report_{session_id}.pdf"}
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.error(f"PDF download error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate PDF report")
-
 # Admin & Management Endpoints
 @api_router.get("/admin/aptitude-questions")
 async def list_aptitude_questions(topic: Optional[str] = None, difficulty: Optional[str] = None, page: int = 1, page_size: int = 20):
@@ -8322,26 +8166,61 @@ async def list_aptitude_questions(topic: Optional[str] = None, difficulty: Optio
         raise HTTPException(status_code=500, detail="Failed to list questions")
 
 class BulkImportQuestionsRequest(BaseModel):
-    questions: List[AptitudeQuestion]
+    questions: List[Dict[str, Any]]
+
+def prepare_import_question(data: Dict[str, Any], source: str = "bulk_import") -> Dict[str, Any]:
+    """Validated question document for one import row (raises ValueError when invalid)"""
+    question = AptitudeQuestion(**data)
+    check = validate_aptitude_question(question)
+    if not check["valid"]:
+        raise InvalidQuestionRow(check["issues"])
+    doc = question.dict()
+    doc["metadata"] = {**(doc.get("metadata") or {}), "quality": check, "source": doc.get("metadata", {}).get("source", source)}
+    return doc
 
 @api_router.post("/admin/aptitude-questions/bulk-import")
 async def bulk_import_questions(req: BulkImportQuestionsRequest):
+    """Import a JSON array of questions; invalid and duplicate rows are reported without aborting the import"""
+    async def rows():
+        for row, data in enumerate(req.questions, 1):
+            yield row, data
+
     try:
-        docs = []
-        for q in req.questions:
-            data = q.dict()
-            check = validate_aptitude_question(AptitudeQuestion(**data))
-            if not check["valid"]:
-                return {"success": False, "error": "validation_failed", "details": check}
-            data["metadata"] = {**(data.get("metadata") or {}), "quality": check, "source": data.get("metadata", {}).get("source", "admin_bulk")}
-            docs.append(data)
-        if docs:
-            await db.aptitude_questions.insert_many(docs)
-        return {"success": True, "inserted": len(docs)}
+        reports = [report async for report in import_questions(
+            rows(), lambda data: prepare_import_question(data, source="admin_bulk"), insert_aptitude_questions)]
+        counts = {status: sum(1 for report in reports if report["status"] == status)
+                  for status in IMPORT_STATUSES}
+        return {
+            "success": True,
+            "inserted": counts["inserted"],
+            "duplicates": counts["duplicate"],
+            "invalid": counts["invalid"],
+            "failed": counts["error"],
+            "rows": [report for report in reports if report["status"] != "inserted"]
+        }
     except Exception as e:
         logging.error(f"Bulk import error: {e}")
         raise HTTPException(status_code=500, detail="Failed to import questions")
 
+@api_router.post("/admin/aptitude-questions/import")
+async def stream_import_questions(request: Request, format: Optional[str] = None, report: str = "all"):
+    """
+    Streaming NDJSON/CSV question import of any size.
+    The response is NDJSON: one line per row (report=all), per non-inserted row (report=errors)
+    or none (report=summary), followed by a {"summary": ...} line.
+    """
+    try:
+        fmt = detect_import_format(format, request.headers.get("content-type"))
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if report not in IMPORT_REPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"report must be one of {', '.join(IMPORT_REPORT_MODES)}")
+    rows = iter_import_rows(request.stream(), fmt)
+    return StreamingResponse(
+        import_report_lines(rows, prepare_import_question, insert_aptitude_questions, report),
+        media_type="application/x-ndjson"
+    )
+
 
 # ===== ENHANCED AI QUESTION GENERATION ENGINE (PHASE 1 - PART 3) =====
 
@@ -8839,6 +8718,7 @@ async def admin_ai_generate_questions(request: AIQuestionGenerateRequest):
         # Enhanced AI generation loop with quality control
         attempts = 0
         max_attempts = ai_n * 3  # Allow multiple attempts for quality
+        near_duplicates = NearDuplicateGuard(db.aptitude_questions)
         
         while len(ai_questions) < ai_n and attempts < max_attempts:
             attempts += 1
@@ -8846,27 +8726,27 @@ async def admin_ai_generate_questions(request: AIQuestionGenerateRequest):
             
             if q:
                 generated += 1
+                # Paraphrases of banked (or already accepted) questions are discarded
+                doc = q.dict()
+                if await near_duplicates.check(doc):
+                    continue
                 # Check quality if using enhanced generation
                 if request.contextual_enhancement:
                     quality_validation = q.metadata.get("quality_validation", {})
-                    if quality_validation.get("quality_score", 0) >= request.quality_threshold:
-                        ai_questions.append(q.dict())
-                    else:
+                    if quality_validation.get("quality_score", 0) < request.quality_threshold:
                         failed_quality += 1
                         if failed_quality < ai_n * 2:  # Allow some failures
                             continue
-                        else:
-                            # Accept lower quality if too many failures
-                            ai_questions.append(q.dict())
-                else:
-                    # Legacy mode - accept all valid questions
-                    ai_questions.append(q.dict())
+                        # Accept lower quality if too many failures
+                # Legacy mode accepts all valid questions; only kept ones are compared with later ones
+                near_duplicates.accept(doc)
+                ai_questions.append(doc)
 
         # Insert AI questions
         if ai_questions:
             try:
-                res = await db.aptitude_questions.insert_many(ai_questions)
-                inserted += len(res.inserted_ids)
+                res = await insert_aptitude_questions(ai_questions)
+                inserted += len(res.inserted)
             except Exception as e:
                 logging.error(f"Insert AI questions failed: {e}")
 
@@ -8887,6 +8767,7 @@ async def admin_ai_generate_questions(request: AIQuestionGenerateRequest):
             "ai_generated": generated,
             "ai_inserted": inserted,
             "failed_quality_check": failed_quality,
+            "near_duplicates_rejected": near_duplicates.rejected,
             "curated_mixed": len(curated_docs),
             "delivered": len(result_docs),
             "topic": request.topic,
@@ -8947,13 +8828,15 @@ async def admin_ai_generate_contextual_questions(request: JobContextualGeneratio
             }
         }
         
+        near_duplicates = NearDuplicateGuard(db.aptitude_questions)
+        
         # Generate questions for each topic
         for topic, count in questions_per_topic.items():
             if count <= 0:
                 continue
                 
             topic_questions = []
-            topic_stats = {"generated": 0, "inserted": 0, "failed_quality": 0}
+            topic_stats = {"generated": 0, "inserted": 0, "failed_quality": 0, "near_duplicates": 0}
             
             # Distribute difficulties for this topic
             difficulties = []
@@ -8983,23 +8866,29 @@ async def admin_ai_generate_contextual_questions(request: JobContextualGeneratio
                 if question:
                     topic_stats["generated"] += 1
                     generation_stats["by_difficulty"][difficulty] += 1
+                    doc = question.dict()
+                    if await near_duplicates.check(doc):
+                        topic_stats["near_duplicates"] += 1
+                        continue
                     
                     # Check quality
                     quality_score = question.metadata.get("quality_validation", {}).get("quality_score", 0.5)
                     if quality_score >= request.quality_threshold:
-                        topic_questions.append(question.dict())
                         generation_stats["quality_metrics"]["high_quality_count"] += 1
                     else:
                         topic_stats["failed_quality"] += 1
                         # Still include if we're not too strict
-                        if len(topic_questions) < count * 0.8:  # Accept if we need more questions
-                            topic_questions.append(question.dict())
+                        if len(topic_questions) >= count * 0.8:  # Accept if we need more questions
+                            continue
+                    # Only questions that will be inserted are compared with later ones
+                    near_duplicates.accept(doc)
+                    topic_questions.append(doc)
             
             # Insert topic questions
             if topic_questions:
                 try:
-                    res = await db.aptitude_questions.insert_many(topic_questions)
-                    topic_stats["inserted"] = len(res.inserted_ids)
+                    res = await insert_aptitude_questions(topic_questions)
+                    topic_stats["inserted"] = len(res.inserted)
                     all_generated.extend(topic_questions)
                 except Exception as e:
                     logging.error(f"Insert questions for topic {topic} failed: {e}")
@@ -9103,6 +8992,7 @@ Return JSON with: question_text, question_type, options, correct_answer, explana
             updates["explanation"] = str(refined["explanation"]).strip()
         
         # Update metadata
+        original = {**doc, "metadata": dict(doc.get("metadata") or {})}
         metadata = doc.get("metadata", {})
         metadata["refined"] = True
         metadata["refinement_instruction"] = req.instruction
@@ -9115,14 +9005,31 @@ Return JSON with: question_text, question_type, options, correct_answer, explana
         validation = await validate_ai_question_quality(temp_question)
         updates["metadata"]["post_refinement_validation"] = validation
         
+        updates["content_hash"] = content_hash({**doc, **updates})
+        refined_doc = {**doc, **updates}
+        near_duplicate = await find_near_duplicates(db.aptitude_questions, refined_doc, exclude_ids=[req.question_id])
+        if near_duplicate:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Refined question is a near-duplicate of question {near_duplicate['near_duplicate_of']} "
+                       f"(similarity {near_duplicate['similarity']})"
+            )
+        updates["minhash_signature"] = refined_doc["minhash_signature"]
+        updates["minhash_bands"] = refined_doc["minhash_bands"]
+        updates["minhash_version"] = refined_doc["minhash_version"]
+        
         # Update in database
-        result = await db.aptitude_questions.update_one(
-            {"id": req.question_id}, 
-            {"$set": updates}
-        )
+        try:
+            result = await db.aptitude_questions.update_one(
+                {"id": req.question_id}, 
+                {"$set": updates}
+            )
+        except pymongo.errors.DuplicateKeyError:
+            raise HTTPException(status_code=409, detail="Refined question duplicates an existing question")
         
         if result.modified_count == 0:
             raise HTTPException(status_code=500, detail="Failed to update question")
+        await record_question_changes(removed=[original], added=[{**doc, **updates}])
         
         return {
             "success": True,
@@ -9183,107 +9090,59 @@ async def validate_question_quality(question_id: str):
 
 
 @api_router.get("/admin/aptitude-questions/ai-analytics")
-async def get_ai_question_analytics():
-    """Get analytics on AI-generated questions and their quality"""
+async def get_ai_question_analytics(refresh: bool = False):
+    """Get analytics on AI-generated questions and their quality (refresh=true re-runs the aggregation)"""
     try:
-        # Get all AI-generated questions
-        ai_questions = await db.aptitude_questions.find({
-            "metadata.source": {"$regex": "ai_"}
-        }).to_list(length=None)
-        
-        if not ai_questions:
+        result = await get_ai_analytics(db, refresh)
+        if result["report"] is None:
             return {
                 "success": True,
                 "total_ai_questions": 0,
-                "analytics": "No AI-generated questions found"
+                "analytics": "No AI-generated questions found",
+                "computed_from": result["computed_from"],
+                "reconciled_at": result["reconciled_at"]
             }
-        
-        # Calculate analytics
-        analytics = {
-            "total_ai_questions": len(ai_questions),
-            "by_source": {},
-            "by_topic": {},
-            "by_difficulty": {},
-            "by_industry": {},
-            "quality_metrics": {
-                "average_quality_score": 0.0,
-                "average_job_relevance": 0.0,
-                "high_quality_count": 0,
-                "contextual_questions": 0
-            },
-            "validation_status": {
-                "validated": 0,
-                "needs_validation": 0,
-                "failed_validation": 0
-            }
-        }
-        
-        quality_scores = []
-        relevance_scores = []
-        
-        for q in ai_questions:
-            metadata = q.get("metadata", {})
-            
-            # Source analysis
-            source = metadata.get("source", "unknown")
-            analytics["by_source"][source] = analytics["by_source"].get(source, 0) + 1
-            
-            # Topic analysis
-            topic = q.get("topic", "unknown")
-            analytics["by_topic"][topic] = analytics["by_topic"].get(topic, 0) + 1
-            
-            # Difficulty analysis
-            difficulty = q.get("difficulty", "unknown")
-            analytics["by_difficulty"][difficulty] = analytics["by_difficulty"].get(difficulty, 0) + 1
-            
-            # Industry analysis
-            industry = metadata.get("industry", "general")
-            analytics["by_industry"][industry] = analytics["by_industry"].get(industry, 0) + 1
-            
-            # Quality metrics
-            quality_validation = metadata.get("quality_validation", {})
-            quality_score = quality_validation.get("quality_score", 0.5)
-            job_relevance = metadata.get("job_relevance_score", 0.5)
-            
-            quality_scores.append(quality_score)
-            relevance_scores.append(job_relevance)
-            
-            if quality_score >= 0.8:
-                analytics["quality_metrics"]["high_quality_count"] += 1
-            
-            if metadata.get("contextual_enhancement"):
-                analytics["quality_metrics"]["contextual_questions"] += 1
-            
-            # Validation status
-            if quality_validation:
-                if quality_validation.get("valid", False):
-                    analytics["validation_status"]["validated"] += 1
-                else:
-                    analytics["validation_status"]["failed_validation"] += 1
-            else:
-                analytics["validation_status"]["needs_validation"] += 1
-        
-        # Calculate averages
-        if quality_scores:
-            analytics["quality_metrics"]["average_quality_score"] = round(sum(quality_scores) / len(quality_scores), 3)
-        if relevance_scores:
-            analytics["quality_metrics"]["average_job_relevance"] = round(sum(relevance_scores) / len(relevance_scores), 3)
-        
         return {
             "success": True,
-            "analytics": analytics,
-            "summary": {
-                "total_questions": len(ai_questions),
-                "contextual_percentage": round((analytics["quality_metrics"]["contextual_questions"] / len(ai_questions)) * 100, 1),
-                "high_quality_percentage": round((analytics["quality_metrics"]["high_quality_count"] / len(ai_questions)) * 100, 1),
-                "validation_coverage": round((analytics["validation_status"]["validated"] / len(ai_questions)) * 100, 1)
-            }
+            **result["report"],
+            "computed_from": result["computed_from"],
+            "reconciled_at": result["reconciled_at"]
         }
     
     except Exception as e:
         logging.error(f"AI analytics error: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate analytics")
 
+@api_router.get("/admin/aptitude-questions/near-duplicates")
+async def get_near_duplicate_questions(threshold: float = NEAR_DUPLICATE_THRESHOLD, topic: Optional[str] = None, limit: int = 50):
+    """Cluster near-duplicate questions in one pass over the bank (largest clusters first)"""
+    if not 0 < threshold <= 1:
+        raise HTTPException(status_code=400, detail="threshold must be in (0, 1]")
+    try:
+        result = await cluster_near_duplicates(db.aptitude_questions, threshold, {"topic": topic} if topic else None)
+        clusters = result["clusters"][:max(1, min(limit, 500))]
+        member_ids = [question_id for cluster in clusters for question_id in cluster]
+        details = {}
+        async for doc in db.aptitude_questions.find(
+                {"id": {"$in": member_ids}},
+                {"_id": 0, "id": 1, "question_text": 1, "topic": 1, "subtopic": 1, "difficulty": 1,
+                 "usage_count": 1, "metadata.source": 1, "created_at": 1}):
+            details[doc["id"]] = doc
+        return {
+            "success": True,
+            "threshold": threshold,
+            "scanned": result["scanned"],
+            "cluster_count": len(result["clusters"]),
+            "clustered_questions": sum(len(cluster) for cluster in result["clusters"]),
+            "clusters": [
+                {"size": len(cluster), "questions": [details.get(question_id, {"id": question_id}) for question_id in cluster]}
+                for cluster in clusters
+            ]
+        }
+    except Exception as e:
+        logging.error(f"Near-duplicate clustering error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to cluster near-duplicate questions")
+
 @api_router.post("/admin/upload")
 async def placement_preparation_upload(resume: UploadFile = File(...)):
     """
@@ -9371,6 +9230,7 @@ async def placement_preparation_create_token(request: dict):
             requirements=job_requirements
         )
         await db.jobs.insert_one(job_data.dict())
+        job_cache.invalidate(job_data.id)
         
         # Generate secure token
         token = generate_secure_token()
@@ -9393,6 +9253,7 @@ async def placement_preparation_create_token(request: dict):
             manual_questions=manual_questions
         )
         await db.enhanced_tokens.insert_one(token_data.dict())
+        candidate_token_cache.invalidate(token_data.token)
         
         return {
             "success": True,
@@ -9450,6 +9311,7 @@ async def upload_job_enhanced(
         requirements=job_requirements
     )
     await db.jobs.insert_one(job_data.dict())
+    job_cache.invalidate(job_data.id)
     
     # Generate secure token
     token = generate_secure_token()
@@ -9480,6 +9342,7 @@ async def upload_job_enhanced(
         ai_difficulty_adjustment=ai_difficulty_adjustment
     )
     await db.enhanced_tokens.insert_one(token_data.dict())
+    candidate_token_cache.invalidate(token_data.token)
     
     # Estimate duration based on features and question count
     base_duration = max_questions * 3  # 3 minutes per question average
@@ -9507,83 +9370,43 @@ async def upload_job_enhanced(
         "message": f"{'AI-Powered Personalized' if interview_mode == 'personalized' else 'Enhanced'} interview and resume ({resume_file.filename}) created successfully."
     }
 
+from candidate_pipeline import PIPELINE_PAGE_SIZE, PipelineQueryError, ensure_pipeline_indexes, fetch_pipeline_page
+from candidate_reads import (ADMIN_REPORTS_QUERY, COMPARISON_PROJECTION, PLACEMENT_REPORTS_QUERY,
+                             SESSION_TRANSCRIPT_PROJECTION, ensure_candidate_read_indexes, find_by_tokens,
+                             list_reports, load_candidates, load_session_with_assessment)
+
 @api_router.get("/admin/candidate-pipeline")
-async def get_candidate_pipeline():
-    """Get all candidates with their current status"""
-    # Get all tokens (both regular and enhanced)
-    regular_tokens = await db.tokens.find().to_list(1000)
-    enhanced_tokens = await db.enhanced_tokens.find().to_list(1000)
-    
-    pipeline = []
-    
-    # Process regular tokens
-    for token_data in regular_tokens:
-        session = await db.sessions.find_one({"token": token_data["token"]})
-        assessment = await db.assessments.find_one({"token": token_data["token"]})
-        
-        status = "Invited"
-        if session:
-            if session.get("status") == "completed":
-                status = "Completed"
-            else:
-                status = "In Progress"
-        if assessment:
-            status = "Report Ready"
-            
-        pipeline.append({
-            "token": token_data["token"],
-            "candidate_name": session.get("candidate_name", "Not Started") if session else "Not Started",
-            "job_title": token_data["job_description"].split("\n")[0],
-            "status": status,
-            "created_at": token_data["created_at"],
-            "overall_score": assessment.get("overall_score") if assessment else None,
-            "interview_type": "Standard",
-            "session_id": session.get("session_id") if session else None
-        })
-    
-    # Process enhanced tokens
-    for token_data in enhanced_tokens:
-        session = await db.sessions.find_one({"token": token_data["token"]})
-        assessment = await db.assessments.find_one({"token": token_data["token"]})
-        
-        status = "Invited"
-        if session:
-            if session.get("status") == "completed":
-                status = "Completed"
-            else:
-                status = "In Progress"
-        if assessment:
-            status = "Report Ready"
-            
-        pipeline.append({
-            "token": token_data["token"],
-            "candidate_name": session.get("candidate_name", "Not Started") if session else "Not Started",
-            "job_title": token_data["job_description"].split("\n")[0],
-            "status": status,
-            "created_at": token_data["created_at"],
-            "overall_score": assessment.get("overall_score") if assessment else None,
-            "interview_type": "Enhanced",
-            "session_id": session.get("session_id") if session else None,
-            "features": {
-                "coding_challenge": token_data.get("include_coding_challenge", False),
-                "role_archetype": token_data.get("role_archetype", "General"),
-                "interview_focus": token_data.get("interview_focus", "Balanced")
-            }
-        })
-    
-    # Sort by creation date
-    pipeline.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    return {"pipeline": pipeline}
+async def get_candidate_pipeline(status: Optional[str] = None, job_id: Optional[str] = None,
+                                 job_title: Optional[str] = None, interview_type: Optional[str] = None,
+                                 cursor: Optional[str] = None, limit: int = PIPELINE_PAGE_SIZE):
+    """
+    Candidates with their current status, newest first. One aggregation per page;
+    filter with status (comma-separated), job_id, job_title (prefix) or interview_type
+    and pass next_cursor back as cursor for the next page.
+    """
+    try:
+        return await fetch_pipeline_page(db, status=status, job_id=job_id, job_title=job_title,
+                                         interview_type=interview_type, cursor=cursor, limit=limit)
+    except PipelineQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.on_event("startup")
+async def startup_candidate_pipeline_indexes():
+    try:
+        await ensure_pipeline_indexes(db)
+        await ensure_candidate_read_indexes(db)
+    except Exception as e:
+        logging.error(f"Failed creating candidate pipeline indexes: {e}")
 
 @api_router.post("/admin/compare-candidates")
 async def compare_candidates(candidate_tokens: List[str]):
     """Compare multiple candidates side by side"""
     comparisons = []
+    assessments, sessions = await load_candidates(db, candidate_tokens, assessment_projection=COMPARISON_PROJECTION)
     
-    for token in candidate_tokens:
-        assessment = await db.assessments.find_one({"token": token})
-        session = await db.sessions.find_one({"token": token})
+    for token in dict.fromkeys(candidate_tokens):
+        assessment = assessments.get(token)
+        session = sessions.get(token)
         
         if assessment and session:
             comparisons.append({
@@ -9605,9 +9428,7 @@ async def compare_candidates(candidate_tokens: List[str]):
 async def camera_test(request: CameraTestRequest):
     """Test camera and microphone functionality"""
     # This is primarily handled by frontend, backend just validates token
-    token_data = await db.enhanced_tokens.find_one({"token": request.token})
-    if not token_data:
-        token_data = await db.tokens.find_one({"token": request.token})
+    token_data, _ = await get_candidate_token(request.token)
     
     if not token_data:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -9627,9 +9448,7 @@ async def camera_test(request: CameraTestRequest):
 async def start_practice_round(request: PracticeRoundRequest):
     """Start practice round for candidate"""
     # Validate token
-    token_data = await db.enhanced_tokens.find_one({"token": request.token})
-    if not token_data:
-        token_data = await db.tokens.find_one({"token": request.token})
+    token_data, _ = await get_candidate_token(request.token)
     
     if not token_data:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -9689,8 +9508,8 @@ async def get_coding_challenge(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Check if coding challenge is enabled
-    token_data = await db.enhanced_tokens.find_one({"token": session["token"]})
-    if not token_data or not token_data.get("include_coding_challenge"):
+    token_data, is_enhanced = await get_candidate_token(session["token"])
+    if not token_data or not is_enhanced or not token_data.get("include_coding_challenge"):
         raise HTTPException(status_code=400, detail="Coding challenge not enabled for this interview")
     
     # Check if challenge already exists
@@ -9759,8 +9578,8 @@ async def get_sjt_test(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     # Get role archetype
-    token_data = await db.enhanced_tokens.find_one({"token": session["token"]})
-    role_archetype = token_data.get("role_archetype", "Software Engineer") if token_data else "Software Engineer"
+    token_data, is_enhanced = await get_candidate_token(session["token"])
+    role_archetype = token_data.get("role_archetype", "Software Engineer") if token_data and is_enhanced else "Software Engineer"
     
     # Check if SJT already exists
     existing_sjt = await db.sjt_tests.find_one({"session_id": session_id})
@@ -9840,6 +9659,7 @@ async def upload_job_legacy(
         requirements=job_requirements
     )
     await db.jobs.insert_one(job_data.dict())
+    job_cache.invalidate(job_data.id)
     
     # Generate secure token
     token = generate_secure_token()
@@ -9853,6 +9673,7 @@ async def upload_job_legacy(
         created_via="admin"  # Mark as admin source
     )
     await db.tokens.insert_one(token_data.dict())
+    candidate_token_cache.invalidate(token_data.token)
     
     return {
         "success": True,
@@ -9885,6 +9706,7 @@ async def upload_job_and_resume(
         requirements=job_requirements
     )
     await db.jobs.insert_one(job_data.dict())
+    job_cache.invalidate(job_data.id)
     
     # Generate secure token
     token = generate_secure_token()
@@ -9898,6 +9720,7 @@ async def upload_job_and_resume(
         created_via="admin"  # Mark as admin source
     )
     await db.tokens.insert_one(token_data.dict())
+    candidate_token_cache.invalidate(token_data.token)
     
     return {
         "success": True,
@@ -9909,17 +9732,9 @@ async def upload_job_and_resume(
 @api_router.get("/admin/reports")
 async def get_all_reports():
     """Get all assessment reports created via admin dashboard - legacy endpoint updated with filtering"""
-    # Include assessments without created_via field (legacy) and those explicitly marked as admin
-    reports = await db.assessments.find({
-        "$or": [
-            {"created_via": "admin"},
-            {"created_via": {"$exists": False}}  # Legacy assessments without created_via field
-        ]
-    }).to_list(1000)
-    # Convert MongoDB ObjectIds to strings for JSON serialization
-    for report in reports:
-        if '_id' in report:
-            report['_id'] = str(report['_id'])
+    # Include assessments without created_via field (legacy) and those explicitly marked as admin.
+    # Listing fields only, newest first; the full report is served per session below
+    reports = await list_reports(db, ADMIN_REPORTS_QUERY)
     return {"reports": reports}
 
 @api_router.get("/admin/reports/{session_id}")
@@ -9943,12 +9758,8 @@ async def get_report_by_session(session_id: str):
 # Placement Preparation Reports Endpoints
 @api_router.get("/placement-preparation/reports")
 async def get_placement_preparation_reports():
-    """Get all assessment reports created via placement preparation"""
-    reports = await db.assessments.find({"created_via": "placement_preparation"}).to_list(1000)
-    # Convert MongoDB ObjectIds to strings for JSON serialization
-    for report in reports:
-        if '_id' in report:
-            report['_id'] = str(report['_id'])
+    """Get all assessment reports created via placement preparation (listing fields, newest first)"""
+    reports = await list_reports(db, PLACEMENT_REPORTS_QUERY)
     return {"reports": reports}
 
 @api_router.get("/placement-preparation/reports/{session_id}")
@@ -9977,6 +9788,7 @@ class ResumeAnalysis(BaseModel):
     resume_content: str
     analysis_results: Dict[str, Any]
     pdf_path: str = ""
+    pdf_artifact_id: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # ATS Score Calculator Data Models
@@ -9992,6 +9804,7 @@ class ATSScoreResult(BaseModel):
     ats_score: int
     ats_details: Dict[str, Any]
     pdf_path: str = ""
+    pdf_artifact_id: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 # Resume Analysis Endpoints
@@ -10192,60 +10005,14 @@ Provide a comprehensive analysis with ALL rejection reasons following the exact
             analysis_results=formatted_analysis
         )
         
-        # Generate PDF using reportlab
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-        from reportlab.lib.units import inch
-        import os
-        
-        # Create unique filename
+        # Render the PDF off the event loop and store it in GridFS
         pdf_filename = f"resume_analysis_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = f"/tmp/{pdf_filename}"
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=20,
-            textColor='darkblue'
-        )
-        story.append(Paragraph("Resume Gap Analysis Report", title_style))
-        story.append(Spacer(1, 12))
-        
-        # Job details
-        story.append(Paragraph(f"<b>Position:</b> {request.job_title}", styles['Normal']))
-        story.append(Paragraph(f"<b>Generated on:</b> {current_time} UTC", styles['Normal']))
-        story.append(Spacer(1, 20))
-        
-        # Job description
-        story.append(Paragraph("<b>Job Requirements:</b>", styles['Heading2']))
-        story.append(Paragraph(request.job_description, styles['Normal']))
-        story.append(Spacer(1, 20))
-        
-        # Analysis results
-        story.append(Paragraph("<b>Gap Analysis Results:</b>", styles['Heading2']))
-        story.append(Spacer(1, 12))
-        
-        # Format the analysis text for PDF
-        analysis_lines = analysis_text.split('\n')
-        for line in analysis_lines:
-            if line.strip():
-                if line.startswith('•'):
-                    story.append(Paragraph(line, styles['Normal']))
-                else:
-                    story.append(Paragraph(line, styles['Normal']))
-                story.append(Spacer(1, 6))
-        
-        # Build PDF
-        doc.build(story)
+        artifact = await report_renderer.render("resume_analysis", {
+            "job_title": request.job_title,
+            "job_description": request.job_description,
+            "analysis_text": analysis_text,
+            "generated_at": current_time
+        }, pdf_filename)
         
         # Store analysis in database
         analysis_record = ResumeAnalysis(
@@ -10253,7 +10020,8 @@ Provide a comprehensive analysis with ALL rejection reasons following the exact
             job_description=request.job_description,
             resume_content=resume_content,
             analysis_results={"analysis_text": analysis_text, "html_content": html_content},
-            pdf_path=pdf_path
+            pdf_path=pdf_filename,
+            pdf_artifact_id=artifact["artifact_id"]
         )
         
         # Convert to dict for MongoDB
@@ -10294,16 +10062,7 @@ async def download_resume_analysis_pdf(analysis_id: str):
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
         
-        pdf_path = analysis.get("pdf_path", "")
-        if not os.path.exists(pdf_path):
-            raise HTTPException(status_code=404, detail="PDF file not found")
-        
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=pdf_path,
-            media_type='application/pdf',
-            filename=f"resume_analysis_{analysis_id}.pdf"
-        )
+        return await stream_stored_report(analysis, f"resume_analysis_{analysis_id}.pdf")
     except HTTPException:
         raise
     except Exception as e:
@@ -10322,6 +10081,7 @@ class RejectionReasonsAnalysis(BaseModel):
     resume_content: str
     rejection_reasons: str
     pdf_path: str = ""
+    pdf_artifact_id: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class TechnicalInterviewQuestionsAnalysis(BaseModel):
@@ -10331,6 +10091,7 @@ class TechnicalInterviewQuestionsAnalysis(BaseModel):
     resume_content: str
     interview_questions: str
     pdf_path: str = ""
+    pdf_artifact_id: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class BehavioralInterviewQuestionsAnalysis(BaseModel):
@@ -10340,6 +10101,7 @@ class BehavioralInterviewQuestionsAnalysis(BaseModel):
     resume_content: str
     interview_questions: str
     pdf_path: str = ""
+    pdf_artifact_id: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 @api_router.post("/placement-preparation/rejection-reasons")
@@ -10509,281 +10271,14 @@ Before submitting, verify:
   - Candidate Reality: Manual document review required
   - Gap Impact: Unable to validate qualification requirements"""
         
-        # Generate Enhanced PDF using reportlab with improved formatting
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib.colors import HexColor, black, white, red, darkred, darkblue, darkgreen, orange
-        from reportlab.lib import colors
-        import os
-        import re
-        
-        # Create unique filename
+        # Render the PDF off the event loop and store it in GridFS
         pdf_filename = f"rejection_reasons_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-        pdf_path = f"/tmp/{pdf_filename}"
-        
-        # Create PDF document with margins
-        doc = SimpleDocTemplate(
-            pdf_path, 
-            pagesize=A4,
-            rightMargin=50,
-            leftMargin=50,
-            topMargin=50,
-            bottomMargin=50
-        )
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Enhanced Title with background
-        title_style = ParagraphStyle(
-            'EnhancedTitle',
-            parent=styles['Title'],
-            fontSize=22,
-            spaceAfter=30,
-            spaceBefore=10,
-            textColor=white,
-            backColor=HexColor('#8B0000'),  # Dark red background
-            borderPadding=15,
-            alignment=1  # Center alignment
-        )
-        story.append(Paragraph("🚫 CANDIDATE REJECTION REASONS ANALYSIS", title_style))
-        story.append(Spacer(1, 20))
-        
-        # Job details in a styled box
-        current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-        job_info_style = ParagraphStyle(
-            'JobInfo',
-            parent=styles['Normal'],
-            fontSize=12,
-            spaceAfter=6,
-            textColor=darkblue,
-            backColor=HexColor('#F0F8FF'),  # Light blue background
-            borderPadding=10
-        )
-        
-        story.append(Paragraph(f"<b>📋 Position:</b> {job_title}", job_info_style))
-        story.append(Paragraph(f"<b>🕒 Generated on:</b> {current_time} UTC", job_info_style))
-        story.append(Spacer(1, 25))
-        
-        # Executive Summary Section
-        summary_title_style = ParagraphStyle(
-            'SummaryTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=15,
-            textColor=white,
-            backColor=HexColor('#2E8B57'),  # Sea green
-            borderPadding=8,
-            alignment=0
-        )
-        story.append(Paragraph("📊 EXECUTIVE SUMMARY", summary_title_style))
-        
-        # Parse rejection reasons to count gaps by severity
-        critical_count = len(re.findall(r'CRITICAL', rejection_reasons_text, re.IGNORECASE))
-        major_count = len(re.findall(r'MAJOR', rejection_reasons_text, re.IGNORECASE))
-        moderate_count = len(re.findall(r'MODERATE', rejection_reasons_text, re.IGNORECASE))
-        total_gaps = len(re.findall(r'• \*\*.*?\*\*:', rejection_reasons_text))
-        
-        summary_style = ParagraphStyle(
-            'Summary',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=8,
-            backColor=HexColor('#F5F5F5'),
-            borderPadding=8
-        )
-        
-        story.append(Paragraph(f"<b>Total Rejection Reasons Identified:</b> {total_gaps}", summary_style))
-        story.append(Paragraph(f"<b>🔴 Critical Issues:</b> {critical_count} | <b>🟠 Major Issues:</b> {major_count} | <b>🟡 Moderate Issues:</b> {moderate_count}", summary_style))
-        story.append(Paragraph("<b>Recommendation:</b> <font color='red'>REJECT</font> - Multiple critical gaps identified that prevent successful role performance.", summary_style))
-        story.append(Spacer(1, 20))
-        
-        # Job Requirements Section
-        job_req_title_style = ParagraphStyle(
-            'JobReqTitle',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            textColor=white,
-            backColor=HexColor('#4682B4'),  # Steel blue
-            borderPadding=8
-        )
-        story.append(Paragraph("📋 JOB REQUIREMENTS", job_req_title_style))
-        
-        job_desc_style = ParagraphStyle(
-            'JobDesc',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=10,
-            backColor=HexColor('#F8F8FF'),  # Ghost white
-            borderPadding=10,
-            firstLineIndent=0
-        )
-        story.append(Paragraph(job_description, job_desc_style))
-        story.append(Spacer(1, 20))
-        
-        # Main Analysis Section
-        analysis_title_style = ParagraphStyle(
-            'AnalysisTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=15,
-            textColor=white,
-            backColor=HexColor('#8B0000'),  # Dark red
-            borderPadding=8
-        )
-        story.append(Paragraph("🔍 COMPREHENSIVE REJECTION ANALYSIS", analysis_title_style))
-        story.append(Spacer(1, 10))
-        
-        # Enhanced formatting for rejection reasons
-        rejection_lines = rejection_reasons_text.split('\n')
-        current_category = ""
-        gap_counter = 1
-        
-        for line in rejection_lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Main rejection reason (bullet point)
-            if line.startswith('• **') and line.endswith('**:') or '**:' in line:
-                # Extract category and reason
-                main_bullet_style = ParagraphStyle(
-                    'MainBullet',
-                    parent=styles['Normal'],
-                    fontSize=12,
-                    spaceAfter=8,
-                    spaceBefore=15,
-                    leftIndent=10,
-                    textColor=white,
-                    backColor=HexColor('#DC143C'),  # Crimson
-                    borderPadding=8,
-                    fontName='Helvetica-Bold'
-                )
-                
-                # Clean up the formatting and add numbering
-                clean_line = line.replace('• **', '').replace('**:', '')
-                numbered_line = f"#{gap_counter}. {clean_line}"
-                story.append(Paragraph(numbered_line, main_bullet_style))
-                gap_counter += 1
-                
-            # Sub-points (Required, Candidate Reality, Gap Impact)
-            elif line.startswith('- '):
-                if 'Required:' in line:
-                    required_style = ParagraphStyle(
-                        'Required',
-                        parent=styles['Normal'],
-                        fontSize=10,
-                        spaceAfter=4,
-                        leftIndent=25,
-                        textColor=HexColor('#8B0000'),  # Dark red
-                        fontName='Helvetica-Bold'
-                    )
-                    story.append(Paragraph(f"🎯 {line}", required_style))
-                    
-                elif 'Candidate Reality:' in line:
-                    reality_style = ParagraphStyle(
-                        'Reality',
-                        parent=styles['Normal'],
-                        fontSize=10,
-                        spaceAfter=4,
-                        leftIndent=25,
-                        textColor=HexColor('#4682B4'),  # Steel blue
-                        fontName='Helvetica-Bold'
-                    )
-                    story.append(Paragraph(f"👤 {line}", reality_style))
-                    
-                elif 'Gap Impact:' in line:
-                    impact_style = ParagraphStyle(
-                        'Impact',
-                        parent=styles['Normal'],
-                        fontSize=10,
-                        spaceAfter=4,
-                        leftIndent=25,
-                        textColor=HexColor('#FF4500'),  # Orange red
-                        fontName='Helvetica-Bold'
-                    )
-                    story.append(Paragraph(f"⚠️ {line}", impact_style))
-                    
-                else:
-                    # Other sub-points
-                    sub_style = ParagraphStyle(
-                        'SubPoint',
-                        parent=styles['Normal'],
-                        leftIndent=30,
-                        spaceAfter=3,
-                        fontSize=10,
-                        textColor=black
-                    )
-                    story.append(Paragraph(line, sub_style))
-                    
-            # Section headers
-            elif line.startswith('**') and line.endswith('**') and ':' not in line:
-                section_style = ParagraphStyle(
-                    'SectionHeader',
-                    parent=styles['Heading3'],
-                    fontSize=13,
-                    spaceAfter=10,
-                    spaceBefore=15,
-                    textColor=HexColor('#2E8B57'),  # Sea green
-                    fontName='Helvetica-Bold'
-                )
-                clean_section = line.replace('**', '')
-                story.append(Paragraph(f"📂 {clean_section}", section_style))
-                
-            # Regular text
-            else:
-                if line:
-                    regular_style = ParagraphStyle(
-                        'Regular',
-                        parent=styles['Normal'],
-                        fontSize=10,
-                        spaceAfter=6,
-                        leftIndent=15
-                    )
-                    story.append(Paragraph(line, regular_style))
-        
-        # Enhanced Footer Section
-        story.append(Spacer(1, 30))
-        
-        # Add a separator line
-        line_style = ParagraphStyle(
-            'Line',
-            parent=styles['Normal'],
-            fontSize=14,
-            alignment=1,
-            textColor=HexColor('#8B0000')
-        )
-        story.append(Paragraph("_" * 80, line_style))
-        story.append(Spacer(1, 15))
-        
-        footer_title_style = ParagraphStyle(
-            'FooterTitle',
-            parent=styles['Heading3'],
-            fontSize=12,
-            spaceAfter=8,
-            textColor=HexColor('#2E8B57'),
-            alignment=1,
-            fontName='Helvetica-Bold'
-        )
-        story.append(Paragraph("📝 ANALYSIS NOTES", footer_title_style))
-        
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=HexColor('#666666'),
-            alignment=1,  # Center alignment
-            spaceAfter=4
-        )
-        story.append(Paragraph("🤖 This comprehensive rejection analysis was generated using advanced AI-powered gap analysis technology.", footer_style))
-        story.append(Paragraph("📞 For questions or clarifications, please consult with HR or the hiring manager.", footer_style))
-        story.append(Paragraph("⚡ Analysis considers technical skills, experience, qualifications, and cultural fit factors.", footer_style))
-        
-        # Build PDF
-        doc.build(story)
+        artifact = await report_renderer.render("rejection_reasons", {
+            "job_title": job_title,
+            "job_description": job_description,
+            "rejection_reasons": rejection_reasons_text,
+            "generated_at": datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        }, pdf_filename)
         
         # Store analysis in database
         rejection_analysis = RejectionReasonsAnalysis(
@@ -10791,7 +10286,8 @@ Before submitting, verify:
             job_description=job_description,
             resume_content=resume_content,
             rejection_reasons=rejection_reasons_text,
-            pdf_path=pdf_path
+            pdf_path=pdf_filename,
+            pdf_artifact_id=artifact["artifact_id"]
         )
         
         # Convert to dict for MongoDB
@@ -10832,16 +10328,7 @@ async def download_rejection_reasons_pdf(rejection_id: str):
         if not analysis:
             raise HTTPException(status_code=404, detail="Rejection reasons analysis not found")
         
-        pdf_path = analysis.get("pdf_path", "")
-        if not os.path.exists(pdf_path):
-            raise HTTPException(status_code=404, detail="PDF file not found")
-        
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=pdf_path,
-            media_type='application/pdf',
-            filename=f"rejection_reasons_{rejection_id}.pdf"
-        )
+        return await stream_stored_report(analysis, f"rejection_reasons_{rejection_id}.pdf")
     except HTTPException:
         raise
     except Exception as e:
@@ -11175,179 +10662,14 @@ You MUST generate exactly 25 technical questions distributed as follows:
 </html>"""
         
         
-        # Convert HTML to PDF using weasyprint for better quality
-        try:
-            # Generate PDF from HTML using weasyprint
-            import weasyprint
-            import uuid
-            
-            # Create unique filename
-            analysis_id = str(uuid.uuid4())
-            pdf_filename = f"technical_interview_questions_{analysis_id[:8]}.pdf"
-            pdf_path = f"/tmp/{pdf_filename}"
-            
-            # Convert HTML to PDF with proper styling
-            try:
-                weasyprint.HTML(string=html_content).write_pdf(pdf_path)
-                logging.info(f"Successfully generated PDF using weasyprint: {pdf_path}")
-            except Exception as weasy_error:
-                logging.warning(f"Weasyprint error: {weasy_error}, trying pdfkit fallback")
-                # Try pdfkit as fallback
-                import pdfkit
-                options = {
-                    'page-size': 'A4',
-                    'margin-top': '0.75in',
-                    'margin-right': '0.75in',
-                    'margin-bottom': '0.75in',
-                    'margin-left': '0.75in',
-                    'encoding': "UTF-8",
-                    'no-outline': None,
-                    'enable-local-file-access': None
-                }
-                pdfkit.from_string(html_content, pdf_path, options=options)
-                logging.info(f"Successfully generated PDF using pdfkit: {pdf_path}")
-                
-        except ImportError as import_error:
-            logging.warning(f"HTML to PDF libraries not available: {import_error}, using reportlab fallback")
-            # Final fallback to reportlab with HTML parsing
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter, A4
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.units import inch
-            from reportlab.lib.colors import HexColor, white, darkblue
-            import uuid
-            import re
-            from html import unescape
-            
-            # Create unique filename
-            analysis_id = str(uuid.uuid4())
-            pdf_filename = f"technical_interview_questions_{analysis_id[:8]}.pdf"
-            pdf_path = f"/tmp/{pdf_filename}"
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(pdf_path, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Title
-            title_style = ParagraphStyle(
-                'EnhancedTitle',
-                parent=styles['Title'],
-                fontSize=22,
-                spaceAfter=30,
-                spaceBefore=10,
-                textColor=white,
-                backColor=HexColor('#2c3e50'),
-                borderPadding=15,
-                alignment=1
-            )
-            story.append(Paragraph("💻 TECHNICAL INTERVIEW QUESTIONS", title_style))
-            story.append(Spacer(1, 20))
-            
-            # Job details
-            current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-            job_info_style = ParagraphStyle(
-                'JobInfo',
-                parent=styles['Normal'],
-                fontSize=12,
-                spaceAfter=6,
-                textColor=darkblue,
-                backColor=HexColor('#ecf0f1'),
-                borderPadding=10
-            )
-            
-            story.append(Paragraph(f"<b>📋 Position:</b> {job_title}", job_info_style))
-            story.append(Paragraph(f"<b>🕒 Generated on:</b> {current_time} UTC", job_info_style))
-            story.append(Spacer(1, 25))
-            
-            # Parse HTML content and extract text for PDF
-            # Remove HTML tags but preserve structure
-            clean_text = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
-            clean_text = re.sub(r'<script[^>]*>.*?</script>', '', clean_text, flags=re.DOTALL)
-            clean_text = re.sub(r'<head[^>]*>.*?</head>', '', clean_text, flags=re.DOTALL)
-            clean_text = re.sub(r'<[^>]+>', ' ', clean_text)
-            clean_text = unescape(clean_text)
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-            
-            # Split into paragraphs and create PDF content
-            content_style = ParagraphStyle('Content', parent=styles['Normal'], fontSize=11, spaceAfter=12, leftIndent=20)
-            
-            # Look for question patterns
-            question_blocks = []
-            lines = clean_text.split('\n')
-            current_block = []
-            
-            for line in lines:
-                line = line.strip()
-                if line:
-                    if 'Question' in line and ':' in line:
-                        if current_block:
-                            question_blocks.append(' '.join(current_block))
-                        current_block = [line]
-                    else:
-                        current_block.append(line)
-            
-            if current_block:
-                question_blocks.append(' '.join(current_block))
-            
-            # Add content to PDF
-            if question_blocks:
-                for i, block in enumerate(question_blocks[:25], 1):  # Limit to 25 questions max
-                    if block.strip():
-                        # Clean the text for safe PDF rendering
-                        safe_block = block.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                        safe_block = re.sub(r'\s+', ' ', safe_block).strip()
-                        
-                        if len(safe_block) > 500:  # Split very long blocks
-                            parts = [safe_block[i:i+500] for i in range(0, len(safe_block), 500)]
-                            for part in parts:
-                                if part.strip():
-                                    story.append(Paragraph(part, content_style))
-                                    story.append(Spacer(1, 8))
-                        else:
-                            story.append(Paragraph(safe_block, content_style))
-                            story.append(Spacer(1, 12))
-            else:
-                # Fallback content if no questions were parsed
-                fallback_content = """
-                This document contains technical interview questions generated for the specified role.
-                The questions are designed to assess technical competency and role alignment.
-                """
-                story.append(Paragraph(fallback_content, content_style))
-            
-            # Build PDF
-            try:
-                doc.build(story)
-                logging.info(f"Successfully generated PDF using reportlab fallback: {pdf_path}")
-            except Exception as build_error:
-                logging.error(f"PDF build error: {build_error}")
-                # Create minimal PDF as last resort
-                c = canvas.Canvas(pdf_path, pagesize=A4)
-                c.drawString(100, 750, f"Technical Interview Questions - {job_title}")
-                c.drawString(100, 720, f"Generated on: {current_time}")
-                c.drawString(100, 680, "Technical interview questions are available in the system.")
-                c.save()
-                logging.info(f"Created minimal fallback PDF: {pdf_path}")
-        
-        except Exception as pdf_error:
-            logging.error(f"PDF generation error: {pdf_error}")
-            # Create minimal PDF as final fallback
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import A4
-            import uuid
-            
-            analysis_id = str(uuid.uuid4())
-            pdf_filename = f"technical_interview_questions_{analysis_id[:8]}.pdf"
-            pdf_path = f"/tmp/{pdf_filename}"
-            
-            c = canvas.Canvas(pdf_path, pagesize=A4)
-            current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-            c.drawString(100, 750, f"Technical Interview Questions - {job_title}")
-            c.drawString(100, 720, f"Generated on: {current_time}")
-            c.drawString(100, 680, "Error generating detailed questions. Please try again.")
-            c.save()
-            logging.info(f"Created error fallback PDF: {pdf_path}")
+        # Render the PDF off the event loop and store it in GridFS
+        analysis_id = str(uuid.uuid4())
+        pdf_filename = f"technical_interview_questions_{analysis_id[:8]}.pdf"
+        artifact = await report_renderer.render("technical_interview_questions", {
+            "job_title": job_title,
+            "html_content": html_content,
+            "generated_at": datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        }, pdf_filename)
         
         # Store analysis in database
         technical_analysis = TechnicalInterviewQuestionsAnalysis(
@@ -11355,7 +10677,8 @@ You MUST generate exactly 25 technical questions distributed as follows:
             job_description=job_description,
             resume_content=resume_content,
             interview_questions=interview_questions_text,
-            pdf_path=pdf_path
+            pdf_path=pdf_filename,
+            pdf_artifact_id=artifact["artifact_id"]
         )
         
         # Insert into MongoDB
@@ -11396,16 +10719,7 @@ async def download_technical_interview_questions_pdf(analysis_id: str):
         if not analysis:
             raise HTTPException(status_code=404, detail="Technical interview questions analysis not found")
         
-        pdf_path = analysis.get("pdf_path", "")
-        if not os.path.exists(pdf_path):
-            raise HTTPException(status_code=404, detail="PDF file not found")
-        
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=pdf_path,
-            media_type='application/pdf',
-            filename=f"technical_interview_questions_{analysis_id}.pdf"
-        )
+        return await stream_stored_report(analysis, f"technical_interview_questions_{analysis_id}.pdf")
     except HTTPException:
         raise
     except Exception as e:
@@ -11935,447 +11249,43 @@ MANDATORY HTML OUTPUT FORMAT:
     <style>
         body {{ font-family: 'Calibri', Arial, sans-serif; margin: 40px; line-height: 1.6; color: #333; }}
         .header {{ text-align: center; border-bottom: 3px solid #2c3e50; padding-bottom: 20px; margin-bottom: 30px; }}
-        .title {{ font-size: 24pt; font-weight: bold; color: #2c3e50; margin-bottom: 10px; }}
-        .subtitle {{ font-size: 14pt; color: #7f8c8d; font-style: italic; }}
-        .error {{ background: #f8d7da; color: #721c24; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-        .fallback {{ margin: 20px 0; padding: 15px; background: #fff3cd; border-left: 4px solid #ffc107; }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="title">Behavioral Interview Questions</div>
-        <div class="subtitle">{job_title} Cultural Fit & Competency Assessment</div>
-    </div>
-    <div class="error">
-        <strong>AI Generation Error:</strong> Unable to generate automated behavioral interview questions due to API limitations.
-    </div>
-    <div class="fallback">
-        <strong>Recommended Action:</strong> Please conduct manual review of candidate qualifications and prepare role-specific behavioral questions based on the job requirements and resume content.
-        <br><br>
-        <strong>Key Areas to Focus On:</strong>
-        <ul>
-            <li>Leadership and influence demonstrated in previous roles</li>
-            <li>Problem-solving approach and decision-making under pressure</li>
-            <li>Collaboration and teamwork in complex organizational environments</li>
-            <li>Adaptability and resilience during organizational changes</li>
-            <li>Cultural fit and values alignment with company mission</li>
-        </ul>
-    </div>
-</body>
-</html>"""
-        
-        # Convert HTML to PDF using the same approach as technical questions
-        try:
-            # Generate PDF from HTML using weasyprint
-            import weasyprint
-            import uuid
-            
-            # Create unique filename
-            analysis_id = str(uuid.uuid4())
-            pdf_filename = f"behavioral_interview_questions_{analysis_id[:8]}.pdf"
-            pdf_path = f"/tmp/{pdf_filename}"
-            
-            # Convert HTML to PDF with proper styling
-            try:
-                weasyprint.HTML(string=html_content).write_pdf(pdf_path)
-                logging.info(f"Successfully generated PDF using weasyprint: {pdf_path}")
-            except Exception as weasy_error:
-                logging.warning(f"Weasyprint error: {weasy_error}, trying pdfkit fallback")
-                # Try pdfkit as fallback
-                import pdfkit
-                options = {
-                    'page-size': 'A4',
-                    'margin-top': '0.75in',
-                    'margin-right': '0.75in',
-                    'margin-bottom': '0.75in',
-                    'margin-left': '0.75in',
-                    'encoding': "UTF-8",
-                    'no-outline': None,
-                    'enable-local-file-access': None
-                }
-                pdfkit.from_string(html_content, pdf_path, options=options)
-                logging.info(f"Successfully generated PDF using pdfkit: {pdf_path}")
-                
-        except ImportError as import_error:
-            logging.warning(f"HTML to PDF libraries not available: {import_error}, using reportlab fallback")
-            # Final fallback to reportlab with HTML parsing
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter, A4
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-            from reportlab.lib.units import inch
-            from reportlab.lib.colors import HexColor, white, darkblue
-            import uuid
-            import re
-            from html import unescape
-            
-            # Create unique filename
-            analysis_id = str(uuid.uuid4())
-            pdf_filename = f"behavioral_interview_questions_{analysis_id[:8]}.pdf"
-            pdf_path = f"/tmp/{pdf_filename}"
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(pdf_path, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Title - Using same styling as technical questions
-            title_style = ParagraphStyle(
-                'EnhancedTitle',
-                parent=styles['Title'],
-                fontSize=22,
-                spaceAfter=30,
-                spaceBefore=10,
-                textColor=white,
-                backColor=HexColor('#2c3e50'),  # Same as technical questions
-                borderPadding=15,
-                alignment=1
-            )
-            story.append(Paragraph("🗣️ BEHAVIORAL INTERVIEW QUESTIONS", title_style))
-            story.append(Spacer(1, 20))
-            
-            # Job details - Using same styling as technical questions
-            current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-            job_info_style = ParagraphStyle(
-                'JobInfo',
-                parent=styles['Normal'],
-                fontSize=12,
-                spaceAfter=6,
-                textColor=darkblue,
-                backColor=HexColor('#ecf0f1'),  # Same as technical questions
-                borderPadding=10
-            )
-            
-            story.append(Paragraph(f"<b>📋 Position:</b> {job_title}", job_info_style))
-            story.append(Paragraph(f"<b>🕒 Generated on:</b> {current_time} UTC", job_info_style))
-            story.append(Spacer(1, 25))
-            
-            # Parse HTML content and extract text for PDF with enhanced question detection
-            # Remove HTML tags but preserve structure
-            clean_text = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
-            clean_text = re.sub(r'<script[^>]*>.*?</script>', '', clean_text, flags=re.DOTALL)
-            clean_text = re.sub(r'<head[^>]*>.*?</head>', '', clean_text, flags=re.DOTALL)
-            clean_text = re.sub(r'<[^>]+>', '\n', clean_text)  # Replace HTML tags with newlines for better parsing
-            clean_text = unescape(clean_text)
-            clean_text = re.sub(r'\n\s*\n', '\n\n', clean_text)  # Normalize multiple newlines
-            clean_text = clean_text.strip()
-            
-            # Enhanced question extraction with multiple patterns and improved formatting
-            content_style = ParagraphStyle('Content', parent=styles['Normal'], fontSize=11, spaceAfter=12, leftIndent=20)
-            question_header_style = ParagraphStyle('QuestionHeader', parent=styles['Normal'], fontSize=12, spaceAfter=8, 
-                                                 textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold')
-            
-            # Look for various question patterns
-            question_blocks = []
-            
-            # Split by common separators that indicate new questions
-            potential_questions = []
-            
-            # Try multiple splitting patterns
-            patterns = [
-                r'(?=Question\s*\d+)',  # Split before "Question 1", "Question 2", etc.
-                r'(?=\d+\.\s)',         # Split before "1. ", "2. ", etc.
-                r'(?=Q\d+)',           # Split before "Q1", "Q2", etc.
-                r'(?=\n\s*\d+\s*[.:])', # Split before numbered items with various separators
-            ]
-            
-            for pattern in patterns:
-                splits = re.split(pattern, clean_text, flags=re.MULTILINE)
-                if len(splits) > len(potential_questions):
-                    potential_questions = splits
-            
-            # If no clear pattern found, split by double newlines and look for question-like content
-            if len(potential_questions) <= 3:
-                potential_questions = clean_text.split('\n\n')
-            
-            # Process and filter questions with enhanced section header detection
-            processed_questions = []
-            section_headers = []
-            question_count = 0
-            
-            # First pass: identify section headers
-            section_header_patterns = [
-                r'(?i)(leadership|strategic\s+thinking|collaboration|resilience|role-specific).*?(excellence|mastery|leadership)',
-                r'(?i)^(leadership|strategic|collaboration|resilience|role-specific)\s*$'
-            ]
-            
-            for i, block in enumerate(potential_questions):
-                block = block.strip()
-                if not block:
-                    continue
-                
-                # Check if this is a section header
-                is_header = False
-                for pattern in section_header_patterns:
-                    if re.search(pattern, block) and len(block) < 150 and not any(word in block.lower() for word in ['describe', 'tell me', 'give me', 'how did', 'what was']):
-                        section_headers.append((i, block.title()))
-                        is_header = True
-                        break
-                
-                if is_header:
-                    continue
-                    
-                # Skip metadata sections
-                if any(skip_term in block.lower() for skip_term in ['behavioral interview questions', 'cultural fit', 'assessment', 'star method', 'candidate:', 'position:', 'generated on']):
-                    continue
-                    
-                # Look for question-like content
-                if (len(block) > 50 and  # Reasonable length
-                    ('?' in block or 'question' in block.lower() or 
-                     any(word in block.lower() for word in ['describe', 'tell me', 'give me an example', 'how did you', 'what was', 'when have you']))):
-                    
-                    question_count += 1
-                    
-                    # Clean and format the question with improved structure
-                    formatted_block = re.sub(r'\s+', ' ', block).strip()
-                    
-                    processed_questions.append((question_count, formatted_block))
-                    
-                    # Limit to 25 questions
-                    if question_count >= 25:
-                        break
-            
-            # If we still don't have enough questions, try a more aggressive extraction
-            if len(processed_questions) < 15:
-                # Split by sentences and look for question patterns
-                sentences = re.split(r'[.!?]+', clean_text)
-                question_sentences = []
-                
-                for sentence in sentences:
-                    sentence = sentence.strip()
-                    if (len(sentence) > 30 and
-                        any(pattern in sentence.lower() for pattern in [
-                            'describe', 'tell me', 'give me an example', 'how did you', 'what was',
-                            'when have you', 'can you share', 'walk me through', 'explain how'
-                        ])):
-                        question_sentences.append(sentence + '?')
-                
-                # Combine with processed questions
-                processed_questions.extend(question_sentences[:25-len(processed_questions)])
-            
-            # Add content to PDF with improved formatting and line breaks
-            if processed_questions:
-                # Add section header
-                section_header = ParagraphStyle('SectionHeader', parent=styles['Normal'], fontSize=14, spaceAfter=15,
-                                              textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold')
-                story.append(Paragraph("COMPREHENSIVE BEHAVIORAL ASSESSMENT QUESTIONS", section_header))
-                story.append(Spacer(1, 15))
-                
-                # Create enhanced styles for better formatting
-                question_number_style = ParagraphStyle('QuestionNumber', parent=styles['Normal'], fontSize=12, spaceAfter=4,
-                                                     textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold')
-                question_content_style = ParagraphStyle('QuestionContent', parent=styles['Normal'], fontSize=11, spaceAfter=6,
-                                                       leftIndent=20, rightIndent=20, alignment=0)
-                assessment_style = ParagraphStyle('Assessment', parent=styles['Normal'], fontSize=10, spaceAfter=4,
-                                                leftIndent=30, rightIndent=20, textColor=HexColor('#555555'))
-                probes_style = ParagraphStyle('Probes', parent=styles['Normal'], fontSize=10, spaceAfter=8,
-                                            leftIndent=40, rightIndent=20, textColor=HexColor('#27ae60'))
-                subsection_header_style = ParagraphStyle('SubsectionHeader', parent=styles['Normal'], fontSize=13, spaceAfter=10, spaceBefore=20,
-                                                       textColor=HexColor('#2c3e50'), fontName='Helvetica-Bold', backColor=HexColor('#ecf0f1'), borderPadding=8)
-                
-                # ENHANCED FORMATTING: Add proper line breaks and structure formatting
-                def format_text_with_breaks(text):
-                    """Add proper line breaks and structure for better readability"""
-                    
-                    # First, identify and separate different parts of the question
-                    # Look for "Assesses" pattern which indicates the assessment section
-                    assessment_pattern = r'(\?\s*)(Assesses [^.]*\.)'
-                    assessment_match = re.search(assessment_pattern, text)
-                    
-                    # Look for "Follow-up Probes" pattern
-                    probes_pattern = r'(Follow-up Probes?:\s*)(.*?)$'
-                    probes_match = re.search(probes_pattern, text, re.DOTALL)
-                    
-                    # Separate question, assessment, and probes
-                    if assessment_match:
-                        question_text = text[:assessment_match.start(2)].strip()
-                        
-                        if probes_match:
-                            assessment_text = text[assessment_match.start(2):probes_match.start(1)].strip()
-                            probes_text = text[probes_match.start():]
-                        else:
-                            assessment_text = text[assessment_match.start(2):].strip()
-                            probes_text = ""
-                    else:
-                        # If no clear assessment pattern, just split on question marks
-                        parts = text.split('?', 1)
-                        if len(parts) > 1:
-                            question_text = parts[0] + '?'
-                            remaining = parts[1].strip()
-                            
-                            if probes_match:
-                                assessment_text = remaining[:probes_match.start(1) - len(parts[0]) - 1].strip()
-                                probes_text = remaining[probes_match.start(1) - len(parts[0]) - 1:]
-                            else:
-                                assessment_text = remaining
-                                probes_text = ""
-                        else:
-                            question_text = text
-                            assessment_text = ""
-                            probes_text = ""
-                    
-                    # Format each section with proper breaks
-                    formatted_parts = []
-                    
-                    # 1. Format the main question
-                    if question_text:
-                        # Add line breaks after periods and question marks within the question
-                        q = re.sub(r'(\.)(\s+)([A-Z][a-z])', r'\1<br/><br/>\3', question_text)
-                        q = re.sub(r'(\?)(\s+)([A-Z][a-z])', r'\1<br/><br/>\3', q)
-                        formatted_parts.append(f'<b>{q.strip()}</b>')
-                    
-                    # 2. Format the assessment section
-                    if assessment_text:
-                        # Clean up assessment text
-                        assessment_clean = assessment_text.replace('Assesses ', '').strip()
-                        if assessment_clean:
-                            formatted_parts.append(f'<br/><i><b>Assessment Focus:</b> {assessment_clean}</i>')
-                    
-                    # 3. Format the follow-up probes section
-                    if probes_text:
-                        probes_clean = probes_text.replace('Follow-up Probes:', '').replace('Follow-up Probe:', '').strip()
-                        
-                        # Split probes by question marks for better formatting
-                        if probes_clean:
-                            # Split individual probe questions
-                            probe_questions = re.split(r'(\?\s*)', probes_clean)
-                            formatted_probes = []
-                            current_probe = ""
-                            
-                            for part in probe_questions:
-                                if part.strip() == '?' or part.strip() == '? ':
-                                    current_probe += '?'
-                                    if current_probe.strip():
-                                        formatted_probes.append(f'• {current_probe.strip()}')
-                                        current_probe = ""
-                                else:
-                                    current_probe += part
-                            
-                            # Add any remaining probe
-                            if current_probe.strip():
-                                formatted_probes.append(f'• {current_probe.strip()}')
-                            
-                            if formatted_probes:
-                                formatted_parts.append('<br/><b>Follow-up Probes:</b>')
-                                for probe in formatted_probes:
-                                    formatted_parts.append(f'<br/>{probe}')
-                    
-                    # Join all parts with proper spacing
-                    return '<br/>'.join(formatted_parts)
-                
-                current_section = ""
-                for item in processed_questions[:25]:
-                    # Handle both tuple and string formats for backward compatibility
-                    if isinstance(item, tuple):
-                        question_num, question_text = item
-                    else:
-                        question_num = processed_questions.index(item) + 1
-                        question_text = item
-                    
-                    # Check if we need to add a section header before this question
-                    for header_index, header_text in section_headers:
-                        if header_index <= question_num <= header_index + 6:  # Section applies to next few questions
-                            if header_text != current_section:
-                                story.append(Paragraph(f"📋 {header_text.upper()}", subsection_header_style))
-                                story.append(Spacer(1, 10))
-                                current_section = header_text
-                            break
-                    
-                    if question_text.strip():
-                        # Add question number
-                        story.append(Paragraph(f"Question {question_num:02d}.", question_number_style))
-                        
-                        # Apply enhanced formatting to the question
-                        formatted_question = format_text_with_breaks(question_text)
-                        
-                        # Clean and safely format the question text for PDF rendering
-                        # Remove any malformed HTML tags and clean the content
-                        clean_question = re.sub(r'<[^>]*>', '', formatted_question)  # Remove all HTML tags first
-                        clean_question = re.sub(r'\s+', ' ', clean_question).strip()  # Normalize whitespace
-                        
-                        # Now apply safe formatting without HTML tags for reportlab
-                        # Split content by logical sections for proper styling
-                        content_parts = clean_question.split('Assessment Focus:')
-                        
-                        # Main question part
-                        main_question = content_parts[0].strip()
-                        if main_question:
-                            story.append(Paragraph(main_question, question_content_style))
-                        
-                        # Assessment and probes part
-                        if len(content_parts) > 1:
-                            remaining_content = content_parts[1].strip()
-                            
-                            # Split assessment from probes
-                            if 'Follow-up Probes:' in remaining_content:
-                                assessment_and_probes = remaining_content.split('Follow-up Probes:', 1)
-                                
-                                # Assessment section
-                                if assessment_and_probes[0].strip():
-                                    story.append(Paragraph(f"Assessment Focus: {assessment_and_probes[0].strip()}", assessment_style))
-                                
-                                # Probes section
-                                if len(assessment_and_probes) > 1 and assessment_and_probes[1].strip():
-                                    story.append(Paragraph("Follow-up Probes:", assessment_style))
-                                    # Split individual probes
-                                    probes = assessment_and_probes[1].strip()
-                                    probe_lines = [line.strip() for line in probes.split('•') if line.strip()]
-                                    for probe in probe_lines:
-                                        if probe:
-                                            story.append(Paragraph(f"• {probe}", probes_style))
-                            else:
-                                # Just assessment, no probes
-                                story.append(Paragraph(f"Assessment Focus: {remaining_content}", assessment_style))
-                        
-                        # Add extra spacing between questions
-                        story.append(Spacer(1, 25))
-            else:
-                # Enhanced fallback content
-                fallback_content = f"""
-                <b>Comprehensive Behavioral Interview Questions for {job_title}</b><br/><br/>
-                This document contains professionally crafted behavioral interview questions designed to assess:<br/>
-                • Leadership and influence capabilities<br/>
-                • Strategic thinking and decision-making skills<br/>  
-                • Collaboration and teamwork effectiveness<br/>
-                • Resilience and adaptability under pressure<br/>
-                • Role-specific competencies and cultural fit<br/><br/>
-                Each question follows the STAR methodology (Situation, Task, Action, Result) to evaluate past behavior as a predictor of future performance.<br/><br/>
-                <i>Note: The complete set of 25 behavioral questions is available in the system for comprehensive candidate assessment.</i>
-                """
-                story.append(Paragraph(fallback_content, content_style))
-            
-            # Build PDF
-            try:
-                doc.build(story)
-                logging.info(f"Successfully generated PDF using reportlab fallback: {pdf_path}")
-            except Exception as build_error:
-                logging.error(f"PDF build error: {build_error}")
-                # Create minimal PDF as last resort
-                c = canvas.Canvas(pdf_path, pagesize=A4)
-                c.drawString(100, 750, f"Behavioral Interview Questions - {job_title}")
-                c.drawString(100, 720, f"Generated on: {current_time}")
-                c.drawString(100, 680, "Behavioral interview questions are available in the system.")
-                c.save()
-                logging.info(f"Created minimal fallback PDF: {pdf_path}")
-        
-        except Exception as pdf_error:
-            logging.error(f"PDF generation error: {pdf_error}")
-            # Create minimal PDF as final fallback
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import A4
-            import uuid
-            
-            analysis_id = str(uuid.uuid4())
-            pdf_filename = f"behavioral_interview_questions_{analysis_id[:8]}.pdf"
-            pdf_path = f"/tmp/{pdf_filename}"
-            
-            c = canvas.Canvas(pdf_path, pagesize=A4)
-            current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-            c.drawString(100, 750, f"Behavioral Interview Questions - {job_title}")
-            c.drawString(100, 720, f"Generated on: {current_time}")
-            c.drawString(100, 680, "Error generating detailed questions. Please try again.")
-            c.save()
-            logging.info(f"Created error fallback PDF: {pdf_path}")
+        .title {{ font-size: 24pt; font-weight: bold; color: #2c3e50; margin-bottom: 10px; }}
+        .subtitle {{ font-size: 14pt; color: #7f8c8d; font-style: italic; }}
+        .error {{ background: #f8d7da; color: #721c24; padding: 15px; border-radius: 5px; margin: 20px 0; }}
+        .fallback {{ margin: 20px 0; padding: 15px; background: #fff3cd; border-left: 4px solid #ffc107; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <div class="title">Behavioral Interview Questions</div>
+        <div class="subtitle">{job_title} Cultural Fit & Competency Assessment</div>
+    </div>
+    <div class="error">
+        <strong>AI Generation Error:</strong> Unable to generate automated behavioral interview questions due to API limitations.
+    </div>
+    <div class="fallback">
+        <strong>Recommended Action:</strong> Please conduct manual review of candidate qualifications and prepare role-specific behavioral questions based on the job requirements and resume content.
+        <br><br>
+        <strong>Key Areas to Focus On:</strong>
+        <ul>
+            <li>Leadership and influence demonstrated in previous roles</li>
+            <li>Problem-solving approach and decision-making under pressure</li>
+            <li>Collaboration and teamwork in complex organizational environments</li>
+            <li>Adaptability and resilience during organizational changes</li>
+            <li>Cultural fit and values alignment with company mission</li>
+        </ul>
+    </div>
+</body>
+</html>"""
+        
+        # Render the PDF off the event loop and store it in GridFS
+        analysis_id = str(uuid.uuid4())
+        pdf_filename = f"behavioral_interview_questions_{analysis_id[:8]}.pdf"
+        artifact = await report_renderer.render("behavioral_interview_questions", {
+            "job_title": job_title,
+            "html_content": html_content,
+            "generated_at": datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        }, pdf_filename)
         
         # Store analysis in database
         behavioral_analysis = BehavioralInterviewQuestionsAnalysis(
@@ -12383,7 +11293,8 @@ MANDATORY HTML OUTPUT FORMAT:
             job_description=job_description,
             resume_content=resume_content,
             interview_questions=interview_questions_text,
-            pdf_path=pdf_path
+            pdf_path=pdf_filename,
+            pdf_artifact_id=artifact["artifact_id"]
         )
         
         # Insert into MongoDB
@@ -12424,16 +11335,7 @@ async def download_behavioral_interview_questions_pdf(analysis_id: str):
         if not analysis:
             raise HTTPException(status_code=404, detail="Behavioral interview questions analysis not found")
         
-        pdf_path = analysis.get("pdf_path", "")
-        if not os.path.exists(pdf_path):
-            raise HTTPException(status_code=404, detail="PDF file not found")
-        
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=pdf_path,
-            media_type='application/pdf',
-            filename=f"behavioral_interview_questions_{analysis_id}.pdf"
-        )
+        return await stream_stored_report(analysis, f"behavioral_interview_questions_{analysis_id}.pdf")
     except HTTPException:
         raise
     except Exception as e:
@@ -12984,953 +11886,17 @@ Note: Full AI analysis unavailable. Scores based on programmatic validation only
         import uuid
         ats_id = str(uuid.uuid4())
         pdf_filename = f"ats_score_report_{ats_id[:8]}.pdf"
-        pdf_path = f"/tmp/{pdf_filename}"
-        
-        # Generate PDF using reportlab with enhanced professional formatting
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle, KeepTogether
-        from reportlab.lib.units import inch
-        from reportlab.lib.colors import HexColor, Color
-        from reportlab.lib import colors
-        from reportlab.graphics.shapes import Drawing, Rect
-        from reportlab.graphics.charts.barcharts import VerticalBarChart
-        from reportlab.graphics.charts.textlabels import Label
-        import os
-        import re
-        
-        def parse_ats_analysis(analysis_text):
-            """Parse the ATS analysis text into structured sections with comprehensive modern format recognition"""
-            sections = {}
-            lines = analysis_text.split('\n')
-            current_section = None
-            current_content = []
-            
-            # Extract key sections using modern AI-generated patterns
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check for AI-generated section headers (updated for current format)
-                if any(keyword in line.upper() for keyword in ['COMPREHENSIVE ATS SCORE', 'OVERALL ATS SCORE', 'FINAL SCORE']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'ats_score'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['DETAILED SCORING BREAKDOWN', 'SCORE BREAKDOWN', 'SCORING BREAKDOWN']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'scoring_breakdown'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['CRITICAL IMPROVEMENT AREAS', 'IMPROVEMENT AREAS', 'AREAS FOR IMPROVEMENT']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'improvement_areas'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['IMPLEMENTATION ROADMAP', 'ROADMAP', 'ACTION PLAN']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'implementation_roadmap'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['IMMEDIATE FIXES', 'SHORT TERM', 'STRATEGIC DEVELOPMENT']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'timeline_improvements'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['ATS OPTIMIZATION CHECKLIST', 'OPTIMIZATION CHECKLIST', 'CHECKLIST']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'optimization_checklist'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['HIRING PROBABILITY', 'PROBABILITY ASSESSMENT', 'COMPETITIVE POSITIONING']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'probability_assessment'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['ENHANCED ANALYSIS INSIGHTS', 'CONTENT ANALYSIS RESULTS', 'KEYWORD MATCHING ANALYSIS', 'HYBRID SCORING CALCULATION']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'enhanced_insights'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['SCORE ENHANCEMENT RECOMMENDATIONS', 'RECOMMENDATIONS', 'SUGGESTIONS']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'recommendations'
-                    current_content = [line]
-                # Legacy format support for backward compatibility
-                elif any(keyword in line.upper() for keyword in ['EDUCATIONAL', 'EDUCATION', 'DEGREE', 'CERTIFICATION']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'education'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['JOB HISTORY', 'WORK EXPERIENCE', 'PROFESSIONAL EXPERIENCE', 'CAREER']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'job_history'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['PROJECTS', 'PROJECT', 'PORTFOLIO']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'projects'
-                    current_content = [line]
-                elif any(keyword in line.upper() for keyword in ['SKILL', 'TECHNICAL', 'COMPETENC', 'TECHNOLOG']):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = 'skills'
-                    current_content = [line]
-                elif current_section:
-                    current_content.append(line)
-                else:
-                    # Start a general section for unmatched content
-                    if not current_section:
-                        current_section = 'general_analysis'
-                        current_content = [line]
-                    else:
-                        current_content.append(line)
-            
-            # Add the last section
-            if current_section:
-                sections[current_section] = '\n'.join(current_content)
-            
-            return sections
         
-        def extract_scores(analysis_text):
-            """Extract individual scores from the analysis text across multiple known formats.
-            Returns dict like {category: {score: int, max: int, label: str}}
-            Supported categories: keyword, experience, technical, education, achievements, projects
-            """
-            scores = {}
-            text = analysis_text
-            # Normalize unicode emojis and bold markers away for easier matching
-            text = text.replace('**', '')
-
-            # Helper to register a score if better info found later
-            def set_score(key, score, max_score, label):
-                prev = scores.get(key)
-                max_score_int = int(max_score)  # Convert to int before comparison
-                if not prev or (prev and prev['max'] < max_score_int):
-                    scores[key] = {'score': int(score), 'max': max_score_int, 'label': label}
-
-            # Patterns (case-insensitive) for multiple phrasings
-            patterns = [
-                # Modern breakdown with names
-                (r"Keyword\s+Optimization\s*:\s*(\d+)\s*/\s*(\d+)", 'keyword', 'Keyword Optimization'),
-                (r"Keyword\s+Analysis\s*:\s*(\d+)\s*/\s*(\d+)", 'keyword', 'Keyword Analysis'),
-
-                (r"Experience\s+Relevance\s*:\s*(\d+)\s*/\s*(\d+)", 'experience', 'Experience Relevance'),
-                (r"Experience\s+Evaluation\s*:\s*(\d+)\s*/\s*(\d+)", 'experience', 'Experience Evaluation'),
-
-                (r"Technical\s+Competenc(?:y|ies)\s*:\s*(\d+)\s*/\s*(\d+)", 'technical', 'Technical Competency'),
-                (r"Technical\s+Skills?\s*:\s*(\d+)\s*/\s*(\d+)", 'technical', 'Technical Skills'),
-
-                (r"Qualifications\s*:\s*(\d+)\s*/\s*(\d+)", 'education', 'Qualifications'),
-                (r"Education.*Certifications\s*:\s*(\d+)\s*/\s*(\d+)", 'education', 'Education & Certifications'),
-
-                (r"Quantified\s+Achievements\s*:\s*(\d+)\s*/\s*(\d+)", 'achievements', 'Quantified Achievements'),
-
-                (r"Project\s+Innovation\s*:\s*(\d+)\s*/\s*(\d+)", 'projects', 'Project Innovation'),
-                (r"Projects?\s*:\s*(\d+)\s*/\s*(\d+)", 'projects', 'Projects')
-            ]
-
-            # Remove common emojis before regex checking
-            emoji_pattern = r"[🎯💼⚙️🎓📊🚀🔍💡📈📋⭐✅⏱️🗺️]"
-            text_wo_emoji = re.sub(emoji_pattern, '', text)
-
-            # Try explicit patterns first on full text
-            for pat, key, label in patterns:
-                m = re.search(pat, text_wo_emoji, flags=re.IGNORECASE)
-                if m:
-                    set_score(key, m.group(1), m.group(2), label)
-
-            # Additionally, within the 'DETAILED SCORING BREAKDOWN' section, capture generic 'Name: x/y' lines
-            breakdown_match = re.search(r"(DETAILED\s+SCORING\s+BREAKDOWN|SCORE\s+BREAKDOWN|SCORING\s+BREAKDOWN)([\s\S]+?)(?:\n\s*\n|\Z)", text_wo_emoji, flags=re.IGNORECASE)
-            if breakdown_match:
-                block = breakdown_match.group(2)
-                for line in block.split('\n'):
-                    line = line.strip()
-                    m = re.search(r"([A-Za-z &]+)\s*:\s*(\d+)\s*/\s*(\d+)", line)
-                    if m:
-                        raw_label = m.group(1).strip()
-                        score_v = m.group(2)
-                        max_v = m.group(3)
-                        label_lower = raw_label.lower()
-                        if 'keyword' in label_lower:
-                            set_score('keyword', score_v, max_v, raw_label)
-                        elif 'experience' in label_lower:
-                            set_score('experience', score_v, max_v, raw_label)
-                        elif 'technical' in label_lower or 'tech' in label_lower:
-                            set_score('technical', score_v, max_v, raw_label)
-                        elif 'qualif' in label_lower or 'education' in label_lower or 'cert' in label_lower:
-                            set_score('education', score_v, max_v, raw_label)
-                        elif 'achievement' in label_lower:
-                            set_score('achievements', score_v, max_v, raw_label)
-                        elif 'project' in label_lower:
-                            set_score('projects', score_v, max_v, raw_label)
-
-            return scores
-        
-        def create_progress_bar(score, max_score=100, width=3*inch, height=0.2*inch):
-            """Create a visual progress bar for score representation"""
-            drawing = Drawing(width, height)
-            
-            # Determine color based on score percentage
-            percentage = (score / max_score) * 100 if max_score > 0 else 0
-            if percentage >= 75:
-                bar_color = HexColor('#28A745')  # Green for good scores
-            elif percentage >= 50:
-                bar_color = HexColor('#FFC107')  # Orange for needs improvement
-            else:
-                bar_color = HexColor('#DC3545')  # Red for critical areas
-            
-            # Background bar (light gray)
-            bg_rect = Rect(0, 0, width, height)
-            bg_rect.fillColor = HexColor('#e5e7eb')
-            bg_rect.strokeColor = HexColor('#d1d5db')
-            bg_rect.strokeWidth = 1
-            drawing.add(bg_rect)
-            
-            # Progress bar (colored based on score)
-            progress_width = (score / max_score) * width if max_score > 0 else 0
-            if progress_width > 0:
-                progress_rect = Rect(0, 0, progress_width, height)
-                progress_rect.fillColor = bar_color
-                progress_rect.strokeColor = bar_color
-                drawing.add(progress_rect)
-            
-            return drawing
-            
-        def get_score_color(score, max_score=100):
-            """Get color based on score percentage"""
-            percentage = (score / max_score) * 100 if max_score > 0 else 0
-            if percentage >= 75:
-                return HexColor('#28A745')  # Green
-            elif percentage >= 50:
-                return HexColor('#FFC107')  # Orange
-            else:
-                return HexColor('#DC3545')  # Red
-
+        # Render the PDF off the event loop and store it in GridFS
+        pdf_artifact_id = ""
         try:
-            # Create PDF document with enhanced margins and professional layout
-            doc = SimpleDocTemplate(
-                pdf_path, 
-                pagesize=A4,
-                leftMargin=0.75*inch,
-                rightMargin=0.75*inch,
-                topMargin=1*inch,
-                bottomMargin=0.75*inch
-            )
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Enhanced custom styles with professional typography
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                spaceAfter=20,
-                textColor=HexColor('#1f2937'),
-                alignment=1,
-                fontName='Helvetica-Bold'
-            )
-            
-            header_style = ParagraphStyle(
-                'HeaderStyle',
-                parent=styles['Heading2'],
-                fontSize=16,
-                spaceAfter=12,
-                spaceBefore=20,
-                textColor=HexColor('#1f2937'),
-                fontName='Helvetica-Bold',
-                backColor=HexColor('#f8fafc'),
-                borderColor=HexColor('#e2e8f0'),
-                borderWidth=1,
-                borderPadding=8,
-                leftIndent=12,
-                rightIndent=12
-            )
-            
-            subheader_style = ParagraphStyle(
-                'SubHeaderStyle',
-                parent=styles['Heading3'],
-                fontSize=14,
-                spaceAfter=8,
-                spaceBefore=12,
-                textColor=HexColor('#374151'),
-                fontName='Helvetica-Bold'
-            )
-            
-            normal_style = ParagraphStyle(
-                'NormalStyle',
-                parent=styles['Normal'],
-                fontSize=11,
-                spaceAfter=6,
-                textColor=HexColor('#4b5563'),
-                leading=15
-            )
-            
-            bullet_style = ParagraphStyle(
-                'BulletStyle',
-                parent=styles['Normal'],
-                fontSize=11,
-                spaceAfter=4,
-                textColor=HexColor('#4b5563'),
-                leading=14,
-                leftIndent=20,
-                bulletIndent=10
-            )
-            
-            job_info_style = ParagraphStyle(
-                'JobInfoStyle',
-                parent=styles['Normal'],
-                fontSize=12,
-                spaceAfter=6,
-                textColor=HexColor('#6b7280'),
-                alignment=1,
-                fontName='Helvetica'
-            )
-            
-            summary_title_style = ParagraphStyle(
-                'SummaryTitle',
-                parent=styles['Heading2'],
-                fontSize=18,
-                spaceAfter=15,
-                spaceBefore=10,
-                textColor=HexColor('#1f2937'),
-                fontName='Helvetica-Bold',
-                alignment=1
-            )
-            
-            callout_style = ParagraphStyle(
-                'CalloutStyle',
-                parent=styles['Normal'],
-                fontSize=12,
-                spaceAfter=8,
-                textColor=HexColor('#1f2937'),
-                backColor=HexColor('#f0f9ff'),
-                borderColor=HexColor('#0ea5e9'),
-                borderWidth=1,
-                borderPadding=10,
-                leftIndent=10,
-                rightIndent=10,
-                fontName='Helvetica-Bold'
-            )
-            
-            # Professional title with enhanced styling
-            story.append(Paragraph("📊 ATS SCORE ANALYSIS REPORT", title_style))
-            story.append(Spacer(1, 15))
-            
-            # Job details in professional box
-            job_info_table = Table([
-                [f"Position: {job_title}"],
-                [f"Analysis Date: {current_time} UTC"]
-            ], colWidths=[5*inch])
-            job_info_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), HexColor('#f8fafc')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#374151')),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 11),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-                ('TOPPADDING', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8)
-            ]))
-            story.append(job_info_table)
-            story.append(Spacer(1, 20))
-            
-            # EXECUTIVE SUMMARY SECTION
-            story.append(Paragraph("📋 EXECUTIVE SUMMARY", summary_title_style))
-            story.append(Spacer(1, 10))
-            
-            # ATS Score with enhanced presentation
-            try:
-                ats_score_num = int(float(ats_score))
-            except Exception:
-                ats_score_num = 0
-
-            score_color = get_score_color(ats_score_num)
-            compatibility_level = (
-                'EXCEPTIONAL (95-100)' if ats_score_num >= 95 else
-                'OUTSTANDING (85-94)' if ats_score_num >= 85 else
-                'STRONG (75-84)' if ats_score_num >= 75 else
-                'GOOD (65-74)' if ats_score_num >= 65 else
-                'MODERATE (55-64)' if ats_score_num >= 55 else
-                'NEEDS IMPROVEMENT (<55)'
-            )
-            
-            # Overall score table with enhanced styling
-            score_data = [
-                ['OVERALL ATS SCORE', f'{ats_score_num}/100', compatibility_level]
-            ]
-            
-            score_table = Table(score_data, colWidths=[1.8*inch, 1.2*inch, 2.5*inch])
-            score_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), HexColor('#ffffff')),
-                ('BACKGROUND', (1, 0), (1, 0), score_color),
-                ('TEXTCOLOR', (0, 0), (0, 0), HexColor('#1f2937')),
-                ('TEXTCOLOR', (1, 0), (1, 0), colors.white),
-                ('TEXTCOLOR', (2, 0), (2, 0), score_color),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 14),
-                ('FONTSIZE', (1, 0), (1, 0), 18),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('GRID', (0, 0), (-1, -1), 2, HexColor('#e2e8f0')),
-                ('TOPPADDING', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12)
-            ]))
-            story.append(score_table)
-            story.append(Spacer(1, 15))
-            
-            # Add progress bar for overall score
-            progress_bar = create_progress_bar(ats_score_num, 100)
-            story.append(progress_bar)
-            story.append(Spacer(1, 20))
-            
-            # Parse sections from analysis to get top recommendations
-            sections = parse_ats_analysis(ats_analysis_text)
-            scores = extract_scores(ats_analysis_text)
-            
-            # Generate Top 3 Recommendations based on lowest scoring categories
-            top_recommendations = []
-            if scores:
-                # Sort categories by score gap (max - current score)
-                sorted_categories = sorted(
-                    scores.items(),
-                    key=lambda x: x[1].get('max', 0) - x[1].get('score', 0),
-                    reverse=True
-                )
-                
-                category_names = {
-                    'keyword': 'Add missing job-specific keywords',
-                    'experience': 'Quantify achievements with metrics',
-                    'technical': 'Update with trending technologies',
-                    'education': 'Include relevant certifications',
-                    'achievements': 'Add measurable impact statements',
-                    'projects': 'Showcase high-impact projects'
-                }
-                
-                for category, score_info in sorted_categories[:3]:
-                    if score_info.get('score', 0) < score_info.get('max', 0):
-                        gap = score_info.get('max', 0) - score_info.get('score', 0)
-                        recommendation = category_names.get(category, f"Improve {category}")
-                        top_recommendations.append(f"• {recommendation} (+{gap} points)")
-            
-            # If no specific scores, provide generic recommendations
-            if not top_recommendations:
-                top_recommendations = [
-                    "• Add more job-specific keywords throughout resume",
-                    "• Include quantified achievements with metrics",
-                    "• Update technical skills with current technologies"
-                ]
-            
-            # Top 3 Recommendations in callout box
-            story.append(Paragraph("🎯 TOP 3 PRIORITY IMPROVEMENTS", subheader_style))
-            story.append(Spacer(1, 8))
-            
-            recommendations_table = Table([['\n'.join(top_recommendations)]], colWidths=[5.5*inch])
-            recommendations_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), HexColor('#f0f9ff')),
-                ('TEXTCOLOR', (0, 0), (-1, -1), HexColor('#1f2937')),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 11),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('GRID', (0, 0), (-1, -1), 2, HexColor('#0ea5e9')),
-                ('TOPPADDING', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('LEFTPADDING', (0, 0), (-1, -1), 15),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 15)
-            ]))
-            story.append(recommendations_table)
-            story.append(Spacer(1, 25))
-            
-            # Enhanced Score Breakdown Section with progress bars
-            if scores:
-                story.append(Paragraph("📈 DETAILED SCORE BREAKDOWN", header_style))
-                story.append(Spacer(1, 12))
-                
-                # Compute weights based on max points of each category
-                total_max = sum(int(info.get('max', 0)) for info in scores.values()) or 100
-
-                # Create enhanced score breakdown with progress bars
-                score_breakdown_data = [['CATEGORY', 'SCORE', 'PERCENTAGE', 'WEIGHT', 'PROGRESS']]
-                
-                for category, score_info in scores.items():
-                    category_name = {
-                        'keyword': '🎯 Keyword Optimization',
-                        'experience': '💼 Experience Relevance', 
-                        'technical': '⚙️ Technical Competency',
-                        'education': '🎓 Qualifications',
-                        'achievements': '📊 Quantified Achievements',
-                        'projects': '🚀 Project Innovation'
-                    }.get(category, score_info.get('label') or category.title())
-                    
-                    score_val = int(score_info.get('score', 0))
-                    max_val = int(score_info.get('max', 1))
-                    percentage = int((score_val / max_val) * 100) if max_val > 0 else 0
-                    weight_pct = int(round((max_val / total_max) * 100)) if total_max > 0 else 0
-                    
-                    # Create mini progress bar for this row
-                    progress_drawing = create_progress_bar(score_val, max_val, width=1.2*inch, height=0.15*inch)
-                    
-                    score_breakdown_data.append([
-                        category_name,
-                        f"{score_val}/{max_val}",
-                        f"{percentage}%",
-                        f"{weight_pct}%",
-                        progress_drawing
-                    ])
-                
-                breakdown_table = Table(
-                    score_breakdown_data, 
-                    colWidths=[2.2*inch, 0.8*inch, 0.7*inch, 0.7*inch, 1.3*inch]
-                )
-                breakdown_table.setStyle(TableStyle([
-                    # Header row styling
-                    ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1f2937')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 11),
-                    # Data rows styling
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('ALIGN', (0, 0), (0, -1), 'LEFT'),  # Category names left-aligned
-                    ('ALIGN', (1, 0), (-2, -1), 'CENTER'),  # Scores and percentages centered
-                    ('ALIGN', (-1, 1), (-1, -1), 'CENTER'),  # Progress bars centered
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-                    # Alternating row colors
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), 
-                     [HexColor('#ffffff'), HexColor('#f8fafc')] * 10),
-                    # Padding
-                    ('TOPPADDING', (0, 0), (-1, -1), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 10),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 10)
-                ]))
-                story.append(breakdown_table)
-                story.append(Spacer(1, 20))
-            
-            # Educational Background with enhanced formatting
-            if 'education' in sections:
-                story.append(Paragraph("🎓 EDUCATIONAL QUALIFICATIONS", header_style))
-                story.append(Spacer(1, 8))
-                education_content = sections['education'].replace('**', '').replace('*', '')
-                for line in education_content.split('\n'):
-                    if line.strip():
-                        story.append(Paragraph(f"• {line.strip()}", bullet_style))
-                story.append(Spacer(1, 15))
-            
-            # Professional Experience with enhanced formatting
-            if 'job_history' in sections:
-                story.append(Paragraph("💼 PROFESSIONAL EXPERIENCE", header_style))
-                story.append(Spacer(1, 8))
-                job_content = sections['job_history'].replace('**', '').replace('*', '')
-                if 'no formal job history' in job_content.lower():
-                    story.append(Paragraph("• No formal job history listed in resume", bullet_style))
-                else:
-                    for line in job_content.split('\n'):
-                        if line.strip():
-                            story.append(Paragraph(f"• {line.strip()}", bullet_style))
-                story.append(Spacer(1, 15))
-            
-            # Key Projects with enhanced formatting
-            if 'projects' in sections:
-                story.append(Paragraph("🚀 KEY PROJECTS", header_style))
-                story.append(Spacer(1, 8))
-                projects_content = sections['projects'].replace('**', '').replace('*', '')
-                project_lines = projects_content.split('\n')
-                for line in project_lines:
-                    if line.strip():
-                        # Check if it's a project title (contains parentheses with tech stack)
-                        if '(' in line and ')' in line and ':' in line:
-                            story.append(Paragraph(f"<b>• {line.strip()}</b>", subheader_style))
-                        else:
-                            story.append(Paragraph(f"  → {line.strip()}", bullet_style))
-                story.append(Spacer(1, 15))
-            
-            # Skills & Competencies with enhanced formatting
-            if 'skills' in sections:
-                story.append(Paragraph("⚡ SKILLS & COMPETENCIES", header_style))
-                story.append(Spacer(1, 8))
-                skills_content = sections['skills'].replace('**', '').replace('*', '')
-                for line in skills_content.split('\n'):
-                    if line.strip():
-                        if any(keyword in line for keyword in ['Core Technical Skills:', 'Specialized Tools:', 'Soft Skills:', 'Domain Expertise:']):
-                            story.append(Paragraph(f"<b>{line.strip()}</b>", subheader_style))
-                        else:
-                            story.append(Paragraph(f"• {line.strip()}", bullet_style))
-                story.append(Spacer(1, 15))
-            
-            # Enhanced Scoring Explanation with better structure
-            if scores:
-                story.append(Paragraph("🧮 HOW THE SCORE WAS CALCULATED", header_style))
-                story.append(Spacer(1, 12))
-                
-                for category_key, score_info in scores.items():
-                    category_names = {
-                        'keyword': 'Keyword Optimization',
-                        'experience': 'Experience Relevance',
-                        'technical': 'Technical Competency',
-                        'education': 'Qualifications',
-                        'achievements': 'Quantified Achievements',
-                        'projects': 'Project Innovation'
-                    }
-                    label = category_names.get(category_key, score_info.get('label') or category_key.title())
-
-                    # Category header with score
-                    score_val = score_info.get('score', 0)
-                    max_val = score_info.get('max', 1)
-                    percentage = int((score_val / max_val) * 100) if max_val > 0 else 0
-                    category_color = get_score_color(percentage)
-                    
-                    # Create category table with score and color coding
-                    category_data = [[
-                        f"{label}",
-                        f"{score_val}/{max_val}",
-                        f"{percentage}%"
-                    ]]
-                    
-                    category_table = Table(category_data, colWidths=[2.5*inch, 0.8*inch, 0.8*inch])
-                    category_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, -1), HexColor('#f8fafc')),
-                        ('BACKGROUND', (1, 0), (2, 0), category_color),
-                        ('TEXTCOLOR', (0, 0), (0, 0), HexColor('#1f2937')),
-                        ('TEXTCOLOR', (1, 0), (2, 0), colors.white),
-                        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 12),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                        ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-                        ('TOPPADDING', (0, 0), (-1, -1), 6),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 6)
-                    ]))
-                    story.append(category_table)
-                    story.append(Spacer(1, 8))
-                    
-                    # Explanation extraction with better formatting
-                    explanation = []
-                    lines = ats_analysis_text.split('\n')
-                    capture = False
-                    section_keywords = {
-                        'keyword': ['KEYWORD OPTIMIZATION', 'KEYWORD ANALYSIS'],
-                        'experience': ['EXPERIENCE RELEVANCE', 'EXPERIENCE EVALUATION'],
-                        'technical': ['TECHNICAL COMPETENCY', 'TECHNICAL SKILLS'],
-                        'education': ['QUALIFICATIONS', 'EDUCATION'],
-                        'achievements': ['QUANTIFIED ACHIEVEMENTS'],
-                        'projects': ['PROJECT INNOVATION', 'PROJECTS']
-                    }
-                    
-                    for ln in lines:
-                        lcu = ln.upper()
-                        if any(k in lcu for k in section_keywords.get(category_key, [])):
-                            capture = True
-                            continue
-                        if capture:
-                            # Stop when we hit another section
-                            if re.search(r"^[A-Z].+:\s*\d+\s*/\s*\d+", ln) or any(h in lcu for h in [
-                                'COMPREHENSIVE ATS SCORE','DETAILED SCORING BREAKDOWN',
-                                'CRITICAL IMPROVEMENT','IMPLEMENTATION ROADMAP',
-                                'ATS OPTIMIZATION','HIRING PROBABILITY'
-                            ]):
-                                break
-                            if ln.strip():
-                                explanation.append(ln.strip())
-                    
-                    # Fallback explanation
-                    if not explanation:
-                        if percentage >= 75:
-                            explanation.append("Strong performance in this category.")
-                        elif percentage >= 50:
-                            explanation.append("Adequate performance with room for improvement.")
-                        else:
-                            explanation.append("Significant improvement needed in this category.")
-                        explanation.append(f"Score {score_val}/{max_val}. See detailed analysis for specific recommendations.")
-
-                    # Display explanation with better formatting
-                    for i, ln in enumerate(explanation[:4]):  # Limit to 4 lines
-                        story.append(Paragraph(f"• {ln}", bullet_style))
-                    
-                    # Weight contribution
-                    total_max = sum(v.get('max', 0) for v in scores.values()) or 100
-                    weight_pct = int(round((max_val / total_max) * 100))
-                    story.append(Paragraph(f"Weight: {weight_pct}% of total ATS score", normal_style))
-                    story.append(Spacer(1, 12))
-
-                story.append(Spacer(1, 15))
-                
-                # Enhanced Improvement Roadmap with color-coded priorities
-                story.append(Paragraph("🚀 IMPROVEMENT ROADMAP BY CATEGORY", header_style))
-                story.append(Spacer(1, 12))
-                
-                improvement_items = []
-                for category_key, score_info in scores.items():
-                    score_val = score_info.get('score', 0)
-                    max_val = score_info.get('max', 0)
-                    if score_val >= max_val:
-                        continue  # Skip categories that are already at max
-                    
-                    gap = max_val - score_val
-                    percentage = int((score_val / max_val) * 100) if max_val > 0 else 0
-                    
-                    category_names = {
-                        'keyword': 'Keyword Optimization',
-                        'experience': 'Experience Relevance',
-                        'technical': 'Technical Competency',
-                        'education': 'Qualifications',
-                        'achievements': 'Quantified Achievements',
-                        'projects': 'Project Innovation'
-                    }
-                    label = category_names.get(category_key, category_key.title())
-                    
-                    # Determine priority based on gap and percentage
-                    if percentage < 50:
-                        priority = "HIGH"
-                        priority_color = HexColor('#DC3545')
-                        priority_bg = HexColor('#fef2f2')
-                    elif percentage < 75:
-                        priority = "MEDIUM"
-                        priority_color = HexColor('#FFC107')
-                        priority_bg = HexColor('#fffbeb')
-                    else:
-                        priority = "LOW"
-                        priority_color = HexColor('#28A745')
-                        priority_bg = HexColor('#f0fdf4')
-                    
-                    # Generate specific recommendations
-                    recommendations = {
-                        'keyword': [
-                            "Add missing job-specific keywords throughout resume",
-                            "Include industry terminology and technical terms",
-                            "Use keyword variations and synonyms"
-                        ],
-                        'experience': [
-                            "Quantify achievements with specific metrics",
-                            "Add measurable results and impact statements", 
-                            "Include percentage improvements and cost savings"
-                        ],
-                        'technical': [
-                            "Update with current trending technologies",
-                            "Add certifications in relevant tools",
-                            "Include hands-on project experience"
-                        ],
-                        'education': [
-                            "Add relevant professional certifications",
-                            "Include continuing education courses",
-                            "Highlight academic achievements"
-                        ],
-                        'achievements': [
-                            "Convert responsibilities into achievements",
-                            "Add quantified results (%, $, time)",
-                            "Include awards and recognition"
-                        ],
-                        'projects': [
-                            "Add 1-2 high-impact projects",
-                            "Include project outcomes and metrics",
-                            "Showcase technical complexity"
-                        ]
-                    }
-                    
-                    improvement_items.append({
-                        'category': label,
-                        'priority': priority,
-                        'priority_color': priority_color,
-                        'priority_bg': priority_bg,
-                        'gap': gap,
-                        'recommendations': recommendations.get(category_key, [])[:3]
-                    })
-                
-                # Sort by priority (HIGH first)
-                priority_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-                improvement_items.sort(key=lambda x: priority_order.get(x['priority'], 3))
-                
-                for item in improvement_items:
-                    # Category header with priority
-                    priority_data = [[
-                        f"{item['category']}",
-                        f"PRIORITY: {item['priority']}",
-                        f"+{item['gap']} POINTS"
-                    ]]
-                    
-                    priority_table = Table(priority_data, colWidths=[2*inch, 1.5*inch, 1*inch])
-                    priority_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (0, 0), HexColor('#f8fafc')),
-                        ('BACKGROUND', (1, 0), (1, 0), item['priority_bg']),
-                        ('BACKGROUND', (2, 0), (2, 0), item['priority_color']),
-                        ('TEXTCOLOR', (0, 0), (1, 0), HexColor('#1f2937')),
-                        ('TEXTCOLOR', (1, 0), (1, 0), item['priority_color']),
-                        ('TEXTCOLOR', (2, 0), (2, 0), colors.white),
-                        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 10),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                        ('GRID', (0, 0), (-1, -1), 1, HexColor('#e2e8f0')),
-                        ('TOPPADDING', (0, 0), (-1, -1), 6),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 6)
-                    ]))
-                    story.append(priority_table)
-                    story.append(Spacer(1, 6))
-                    
-                    # Recommendations
-                    for rec in item['recommendations']:
-                        story.append(Paragraph(f"• {rec}", bullet_style))
-                    story.append(Spacer(1, 12))
-
-            # Enhanced Comprehensive Analysis Section with better visual hierarchy
-            story.append(Paragraph("📋 COMPREHENSIVE ATS ANALYSIS", header_style))
-            story.append(Spacer(1, 12))
-            
-            # Process all sections with enhanced formatting and visual elements
-            section_order = [
-                'ats_score', 'scoring_breakdown', 'improvement_areas', 'implementation_roadmap', 
-                'timeline_improvements', 'optimization_checklist', 'probability_assessment', 
-                'enhanced_insights', 'recommendations', 'scoring', 'detailed_analysis', 'general_analysis'
-            ]
-            
-            section_icons = {
-                'ats_score': '🎯',
-                'scoring_breakdown': '📊',
-                'improvement_areas': '🔍',
-                'implementation_roadmap': '🗺️',
-                'timeline_improvements': '⏱️',
-                'optimization_checklist': '✅',
-                'probability_assessment': '📈',
-                'enhanced_insights': '💡',
-                'recommendations': '⭐',
-                'scoring': '🎯',
-                'detailed_analysis': '🔍',
-                'general_analysis': '📋'
-            }
-            
-            for section_name in section_order:
-                if section_name in sections:
-                    content = sections[section_name]
-                    if content and content.strip():
-                        # Add section header with icon
-                        icon = section_icons.get(section_name, '📄')
-                        section_titles = {
-                            'ats_score': f'{icon} ATS SCORE SUMMARY',
-                            'scoring_breakdown': f'{icon} DETAILED SCORING BREAKDOWN',
-                            'improvement_areas': f'{icon} CRITICAL IMPROVEMENT AREAS',
-                            'implementation_roadmap': f'{icon} IMPLEMENTATION ROADMAP',
-                            'timeline_improvements': f'{icon} TIMELINE-BASED IMPROVEMENTS',
-                            'optimization_checklist': f'{icon} ATS OPTIMIZATION CHECKLIST',
-                            'probability_assessment': f'{icon} HIRING PROBABILITY ASSESSMENT',
-                            'enhanced_insights': f'{icon} ENHANCED ANALYSIS INSIGHTS',
-                            'recommendations': f'{icon} SCORE ENHANCEMENT RECOMMENDATIONS',
-                            'scoring': f'{icon} SCORING ANALYSIS',
-                            'detailed_analysis': f'{icon} DETAILED INSIGHTS',
-                            'general_analysis': f'{icon} ANALYSIS OVERVIEW'
-                        }
-                        
-                        section_title = section_titles.get(section_name, f'{icon} {section_name.upper()}')
-                        story.append(Paragraph(section_title, subheader_style))
-                        story.append(Spacer(1, 8))
-                        
-                        # Process content with enhanced formatting
-                        content_lines = content.split('\n')
-                        in_list = False
-                        
-                        for line in content_lines:
-                            if line.strip():
-                                clean_line = line.replace('**', '').replace('*', '').replace('■', '•')
-                                clean_line = re.sub(r'[🎯💼⚙️🎓📊🚀🔍💡📈📋⭐✅⏱️🗺️]', '', clean_line)
-                                
-                                # Enhanced line formatting with better hierarchy
-                                if any(keyword in line.upper() for keyword in [
-                                    'COMPREHENSIVE ATS SCORE', 'OVERALL ATS SCORE', 'FINAL SCORE',
-                                    'KEYWORD OPTIMIZATION', 'EXPERIENCE RELEVANCE', 'TECHNICAL COMPETENCY', 
-                                    'QUALIFICATIONS', 'QUANTIFIED ACHIEVEMENTS',
-                                    'HIGH-IMPACT KEYWORDS', 'EXPERIENCE GAPS', 'TECHNICAL SKILLS',
-                                    'QUANTIFICATION OPPORTUNITIES', 'ATS FORMATTING ISSUES',
-                                    'IMMEDIATE FIXES', 'SHORT TERM', 'STRATEGIC DEVELOPMENT',
-                                    'HIRING PROBABILITY', 'COMPETITIVE POSITIONING',
-                                    'CONTENT ANALYSIS RESULTS', 'KEYWORD MATCHING ANALYSIS',
-                                    'HYBRID SCORING CALCULATION', 'SCORE ENHANCEMENT'
-                                ]):
-                                    # Major section headers
-                                    story.append(Paragraph(f"<b>{clean_line.strip()}</b>", subheader_style))
-                                    story.append(Spacer(1, 4))
-                                    in_list = False
-                                elif line.strip().startswith(('•', '-', '→', '✓', '✗', '▪', '▫')):
-                                    # Bullet points with consistent formatting
-                                    bullet_text = clean_line.strip().lstrip('•-→✓✗▪▫ ')
-                                    story.append(Paragraph(f"• {bullet_text}", bullet_style))
-                                    in_list = True
-                                elif ':' in clean_line and len(clean_line.split(':')[0]) < 60:
-                                    # Label-value pairs
-                                    parts = clean_line.split(':', 1)
-                                    if len(parts) == 2:
-                                        story.append(Paragraph(f"<b>{parts[0].strip()}:</b> {parts[1].strip()}", normal_style))
-                                        story.append(Spacer(1, 2))
-                                    in_list = False
-                                elif re.search(r'\d+/\d+|\d+%|\d+\.\d+%', clean_line):
-                                    # Numeric scores and percentages - highlight them
-                                    story.append(Paragraph(f"<b>{clean_line.strip()}</b>", normal_style))
-                                    story.append(Spacer(1, 2))
-                                    in_list = False
-                                elif clean_line.strip():
-                                    # Regular paragraphs
-                                    if in_list:
-                                        # Continuation of list item
-                                        story.append(Paragraph(f"  {clean_line.strip()}", bullet_style))
-                                    else:
-                                        story.append(Paragraph(clean_line.strip(), normal_style))
-                                        story.append(Spacer(1, 3))
-                        
-                        story.append(Spacer(1, 15))
-            
-            # Enhanced fallback section if no structured sections found
-            if not any(section in sections for section in section_order):
-                story.append(Paragraph("🔍 COMPLETE ANALYSIS", subheader_style))
-                story.append(Spacer(1, 10))
-                
-                # Process raw analysis with better formatting
-                analysis_lines = ats_analysis_text.split('\n')
-                for line in analysis_lines:
-                    if line.strip():
-                        clean_line = line.replace('**', '').replace('*', '').replace('■', '•')
-                        clean_line = re.sub(r'[🎯💼⚙️🎓📊🚀🔍💡📈📋⭐✅⏱️🗺️]', '', clean_line)
-                        
-                        if clean_line.strip():
-                            if any(keyword in line.upper() for keyword in [
-                                'COMPREHENSIVE ATS SCORE', 'KEYWORD ANALYSIS', 'EXPERIENCE EVALUATION',
-                                'TECHNICAL COMPETENCY', 'EDUCATION', 'QUANTIFIED ACHIEVEMENTS',
-                                'CRITICAL IMPROVEMENT', 'SCORE ENHANCEMENT', 'IMPLEMENTATION ROADMAP',
-                                'IMMEDIATE FIXES', 'SHORT TERM', 'STRATEGIC DEVELOPMENT',
-                                'ATS OPTIMIZATION', 'HIRING PROBABILITY', 'COMPETITIVE POSITIONING'
-                            ]):
-                                story.append(Paragraph(f"<b>{clean_line.strip()}</b>", subheader_style))
-                                story.append(Spacer(1, 4))
-                            elif line.strip().startswith(('•', '-', '→', '✓', '✗')):
-                                bullet_text = clean_line.strip().lstrip('•-→✓✗ ')
-                                story.append(Paragraph(f"• {bullet_text}", bullet_style))
-                            else:
-                                story.append(Paragraph(clean_line.strip(), normal_style))
-                                story.append(Spacer(1, 3))
-                story.append(Spacer(1, 15))
-            
-            # Footer with timestamp and professional note
-            footer_style = ParagraphStyle(
-                'FooterStyle',
-                parent=styles['Normal'],
-                fontSize=9,
-                textColor=HexColor('#6b7280'),
-                alignment=1,
-                spaceBefore=20
-            )
-            
-            story.append(Paragraph(
-                f"Generated by ATS Analysis System | {current_time} UTC<br/>"
-                "This analysis is based on industry-standard ATS parsing algorithms and best practices.",
-                footer_style
-            ))
-            
-            # Build the enhanced PDF
-            doc.build(story)
-            
+            artifact = await report_renderer.render("ats_score", {
+                "job_title": job_title,
+                "analysis_text": ats_analysis_text,
+                "ats_score": ats_score,
+                "generated_at": current_time
+            }, pdf_filename)
+            pdf_artifact_id = artifact["artifact_id"]
         except Exception as e:
             logging.error(f"Enhanced PDF generation error: {e}")
             pdf_filename = ""  # Continue without PDF if generation fails
@@ -13943,7 +11909,8 @@ Note: Full AI analysis unavailable. Scores based on programmatic validation only
             resume_content=resume_content,
             ats_score=ats_score,
             ats_details={"analysis_text": ats_analysis_text, "generated_at": current_time},
-            pdf_path=pdf_path
+            pdf_path=pdf_filename,
+            pdf_artifact_id=pdf_artifact_id
         )
         
         # Convert to dict for MongoDB
@@ -13971,16 +11938,7 @@ async def download_ats_score_pdf(ats_id: str):
         if not ats_analysis:
             raise HTTPException(status_code=404, detail="ATS analysis not found")
         
-        pdf_path = ats_analysis.get("pdf_path", "")
-        if not os.path.exists(pdf_path):
-            raise HTTPException(status_code=404, detail="PDF file not found")
-        
-        from fastapi.responses import FileResponse
-        return FileResponse(
-            path=pdf_path,
-            media_type='application/pdf',
-            filename=f"ats_score_report_{ats_id}.pdf"
-        )
+        return await stream_stored_report(ats_analysis, f"ats_score_report_{ats_id}.pdf")
     except HTTPException:
         raise
     except Exception as e:
@@ -14910,18 +12868,17 @@ async def generate_comprehensive_ai_analysis(
 @api_router.get("/admin/detailed-report/{session_id}")
 async def get_detailed_report_by_session(session_id: str):
     """Get comprehensive interview analysis with AI insights, individual question scoring, and advanced assessment"""
-    # Get the assessment
-    assessment = await db.assessments.find_one({"session_id": session_id})
+    # Get the assessment, the session transcript (message text only) and the session metadata concurrently
+    (session, assessment), session_metadata = await asyncio.gather(
+        load_session_with_assessment(db, session_id, session_projection={**SESSION_TRANSCRIPT_PROJECTION, "created_at": 1}),
+        db.session_metadata.find_one({"session_id": session_id})
+    )
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
-    
-    # Get the session data for messages
-    session = await db.sessions.find_one({"session_id": session_id})
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get session metadata for questions
-    session_metadata = await db.session_metadata.find_one({"session_id": session_id})
+    # Session metadata holds the questions
     if not session_metadata:
         raise HTTPException(status_code=404, detail="Session metadata not found")
     
@@ -15134,7 +13091,7 @@ async def process_voice_answer(
         voice_analysis = ei_analyzer.analyze_voice_features(audio_content)
         
         # ENHANCED: Analyze text sentiment from transcript
-        text_analysis = ei_analyzer.analyze_text_sentiment(transcript)
+        text_analysis = await ei_analyzer.analyze_text_sentiment_async(transcript)
         
         # Combine voice and text analysis
         combined_ei_analysis = {
@@ -15165,6 +13122,23 @@ async def process_voice_answer(
                             "emotional_analysis": combined_ei_analysis
                         })
         
+        try:
+            await session_analysis_store.record("ei", session_id, [{
+                "analysis": {
+                    "emotional_intelligence": {
+                        "confidence": combined_ei_analysis["combined_confidence"],
+                        "stress_level": combined_ei_analysis["combined_stress"],
+                        "enthusiasm": combined_ei_analysis["combined_enthusiasm"]
+                    },
+                    "emotions": combined_ei_analysis["text_emotions"]
+                },
+                "question_number": question_number,
+                "source": "voice",
+                "timestamp": datetime.utcnow().isoformat()
+            }])
+        except Exception as e:
+            logging.error(f"Failed to store EI analysis: {e}")
+        
         # Store answer with enhanced analysis in session metadata
         await db.session_metadata.update_one(
             {"session_id": session_id},
@@ -15194,16 +13168,13 @@ async def process_voice_answer(
 # Candidate Routes
 @api_router.post("/candidate/validate-token")
 async def validate_token(request: TokenValidationRequest):
-    # Try enhanced token first, then fallback to regular token
-    token_data = await db.enhanced_tokens.find_one({"token": request.token})
-    
-    if not token_data:
-        token_data = await db.tokens.find_one({"token": request.token})
+    # Try enhanced token first, then fallback to regular token (cached)
+    token_data, is_enhanced = await get_candidate_token(request.token)
     
-    if not token_data or token_data.get('used', False):
+    if not token_data or await is_candidate_token_used(request.token, is_enhanced):
         raise HTTPException(status_code=401, detail="Invalid or used token")
     
-    job_data = await db.jobs.find_one({"id": token_data['job_id']})
+    job_data = await get_job(token_data['job_id'])
     
     return {
         "valid": True,
@@ -15213,18 +13184,13 @@ async def validate_token(request: TokenValidationRequest):
 
 @api_router.post("/candidate/start-interview")
 async def start_interview(request: InterviewStartRequest):
-    # Try enhanced token first, then fallback to regular token
-    token_data = await db.enhanced_tokens.find_one({"token": request.token})
-    is_enhanced = True
+    # Try enhanced token first, then fallback to regular token (cached)
+    token_data, is_enhanced = await get_candidate_token(request.token)
     
-    if not token_data:
-        token_data = await db.tokens.find_one({"token": request.token})
-        is_enhanced = False
-    
-    if not token_data or token_data.get('used', False):
+    if not token_data or await is_candidate_token_used(request.token, is_enhanced):
         raise HTTPException(status_code=401, detail="Invalid or used token")
     
-    job_data = await db.jobs.find_one({"id": token_data['job_id']})
+    job_data = await get_job(token_data['job_id'])
     
     # Generate interview questions with enhanced parameters if available
     if is_enhanced:
@@ -15281,7 +13247,12 @@ async def start_interview(request: InterviewStartRequest):
         current_question=0
     )
     
+    # Claim the token atomically before creating the session: concurrent starts on any worker get exactly one winner
+    if not await claim_candidate_token(request.token, is_enhanced):
+        raise HTTPException(status_code=401, detail="Invalid or used token")
+    
     await db.sessions.insert_one(session_data.dict())
+    await daily_metrics_store.record_session_started(session_data.dict())
     
     # Store questions and enhanced features in session metadata
     session_metadata = {
@@ -15318,13 +13289,6 @@ async def start_interview(request: InterviewStartRequest):
     
     await db.session_metadata.insert_one(session_metadata)
     
-    # Mark token as used
-    collection = db.enhanced_tokens if is_enhanced else db.tokens
-    await collection.update_one(
-        {"token": request.token},
-        {"$set": {"used": True}}
-    )
-    
     response_data = {
         "session_id": session_id,
         "first_question": questions[0] if questions else "Tell me about your experience with software development.",
@@ -15390,7 +13354,15 @@ async def send_interview_message(request: InterviewMessageRequest):
         raise HTTPException(status_code=400, detail="Interview already completed")
     
     # ENHANCED: Perform emotional intelligence analysis on the answer
-    ei_analysis = ei_analyzer.analyze_text_sentiment(request.message)
+    ei_analysis = await ei_analyzer.analyze_text_sentiment_async(request.message)
+    try:
+        await session_analysis_store.record("ei", session['session_id'], [{
+            "analysis": ei_analysis,
+            "question_number": current_q_num,
+            "timestamp": datetime.utcnow().isoformat()
+        }])
+    except Exception as e:
+        logging.error(f"Failed to store EI analysis: {e}")
     
     # Apply bias detection to the evaluation process
     current_question = questions[current_q_num]
@@ -15477,6 +13449,7 @@ async def send_interview_message(request: InterviewMessageRequest):
     
     if next_q_num >= len(questions):
         # Interview completed - Generate enhanced assessment with predictive analytics
+        completed_at = datetime.utcnow()
         await db.sessions.update_one(
             {"session_id": session['session_id']},
             {
@@ -15484,10 +13457,12 @@ async def send_interview_message(request: InterviewMessageRequest):
                 "$set": {
                     "current_question": next_q_num,
                     "status": "completed",
-                    "completed_at": datetime.utcnow()
+                    "completed_at": completed_at
                 }
             }
         )
+        await daily_metrics_store.record_session_completed(session, completed_at)
+        release_vision_session(session['session_id'])
         
         # Prepare data for enhanced assessment
         assessment_data = {
@@ -15521,15 +13496,10 @@ async def send_interview_message(request: InterviewMessageRequest):
         token_data = None
         created_via = "admin"  # Default fallback
         
-        # Try enhanced tokens first
-        token_data = await db.enhanced_tokens.find_one({"token": request.token})
+        # Enhanced tokens first, then regular tokens (cached)
+        token_data, _ = await get_candidate_token(request.token)
         if token_data:
             created_via = token_data.get("created_via", "admin")
-        else:
-            # Check regular tokens
-            token_data = await db.tokens.find_one({"token": request.token})
-            if token_data:
-                created_via = token_data.get("created_via", "admin")
         
         # Enhanced assessment with all new features
         enhanced_assessment = {
@@ -15546,6 +13516,7 @@ async def send_interview_message(request: InterviewMessageRequest):
         }
         
         await db.assessments.insert_one(enhanced_assessment)
+        await daily_metrics_store.record_assessment(enhanced_assessment)
         
         return {
             "completed": True,
@@ -15616,6 +13587,344 @@ async def send_interview_message(request: InterviewMessageRequest):
         
         return response_data
 
+# ===== Session Analysis Storage: per-minute buckets + incremental rollups =====
+ANALYSIS_BUCKET_MAX_SAMPLES = 200
+ROLLUP_REBUILD_ATTEMPTS = 3  # conditional rollup replaces retried when an ingest lands mid-rebuild
+
+class SessionAnalysisStore:
+    """
+    Stores video/audio/EI analysis events in per-minute bucket documents
+    (video_analysis_buckets, audio_analysis_buckets, ei_analysis_buckets) and
+    maintains one rollup document per session in session_analysis_rollups.
+    The rollup keeps count/sum/sum-of-squares per metric and a per-minute
+    timeline, updated with $inc on every ingest, so session insights are a
+    single indexed read regardless of interview length. Rollups are rebuilt
+    from the stored events once (backfilled=True) to pick up pre-rollup data;
+    sessions without any events keep an empty backfilled marker.
+    """
+    
+    STREAM_COLLECTIONS = {
+        "video": ("video_analysis_buckets", "video_analysis"),
+        "audio": ("audio_analysis_buckets", "audio_analysis"),
+        "ei": ("ei_analysis_buckets", None)
+    }
+    
+    def __init__(self):
+        self.rollups = db.session_analysis_rollups
+    
+    async def ensure_indexes(self):
+        try:
+            for bucket_collection, legacy_collection in self.STREAM_COLLECTIONS.values():
+                await db[bucket_collection].create_index([("session_id", 1), ("minute", 1)])
+                await db[bucket_collection].create_index([("minute", 1)])
+                if legacy_collection:
+                    await db[legacy_collection].create_index([("session_id", 1)])
+            await self.rollups.create_index([("session_id", 1)], unique=True)
+            logging.info("Session analysis storage indexes ensured")
+        except Exception as e:
+            logging.error(f"Failed creating session analysis indexes: {e}")
+    
+    @staticmethod
+    def _parse_timestamp(value) -> datetime:
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if isinstance(value, str) and value:
+            try:
+                return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                pass
+        return datetime.utcnow()
+    
+    @staticmethod
+    def _safe_key(name) -> str:
+        return str(name).replace(".", "_").replace("$", "_") or "unknown"
+    
+    @staticmethod
+    def _extract_metrics(stream: str, data: dict) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Return (scalar metrics, emotion scores) for one analysis payload"""
+        data = data or {}
+        metrics = {}
+        emotions = {}
+        
+        def _emotion_items(value):
+            if isinstance(value, dict):
+                return value.items()
+            if isinstance(value, list):
+                return [(item.get("emotion"), item.get("confidence", 0)) for item in value if isinstance(item, dict)]
+            return []
+        
+        if stream == "video":
+            engagement_metrics = data.get("engagement_metrics", {}) or {}
+            metrics["engagement"] = data.get("engagement_score", engagement_metrics.get("overall_engagement", 0))
+            metrics["attention"] = data.get("attention_level", engagement_metrics.get("attention_level", 0))
+            metrics["stress"] = (data.get("stress_indicators", {}) or {}).get("overall_stress", 0)
+            for emotion, score in _emotion_items(data.get("emotions")):
+                if emotion:
+                    emotions[emotion] = score
+        elif stream == "audio":
+            speech_metrics = data.get("speech_metrics", {}) or {}
+            metrics["confidence"] = speech_metrics.get("confidence_level", 0)
+            metrics["speaking_rate"] = speech_metrics.get("speaking_rate", 0)
+            metrics["fluency"] = data.get("fluency_score", 0)
+            metrics["clarity"] = data.get("clarity_score", 0)
+            metrics["quality"] = data.get("overall_quality", 0)
+            metrics["stress"] = (data.get("stress_indicators", {}) or {}).get("overall_stress", 0)
+            for emotion, score in _emotion_items(data.get("emotional_tones")):
+                if emotion:
+                    emotions[emotion] = score
+        elif stream == "ei":
+            ei = data.get("emotional_intelligence", data) or {}
+            metrics["confidence"] = ei.get("confidence", 0)
+            metrics["stress"] = ei.get("stress_level", 0)
+            metrics["enthusiasm"] = ei.get("enthusiasm", 0)
+            metrics["emotional_stability"] = ei.get("emotional_stability", 0)
+            for emotion, score in _emotion_items(data.get("emotions")):
+                if emotion:
+                    emotions[emotion] = score
+        
+        clean = {}
+        for name, value in metrics.items():
+            try:
+                clean[name] = float(value or 0)
+            except (TypeError, ValueError):
+                clean[name] = 0.0
+        clean_emotions = {}
+        for name, value in emotions.items():
+            try:
+                clean_emotions[SessionAnalysisStore._safe_key(name)] = float(value or 0)
+            except (TypeError, ValueError):
+                continue
+        return clean, clean_emotions
+    
+    def _rollup_increments(self, stream: str, events: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Dotted-path $inc document for a list of {"analysis", "timestamp"} events"""
+        inc: Dict[str, float] = {}
+        
+        def _add(path, value):
+            inc[path] = inc.get(path, 0) + value
+        
+        for event in events:
+            metrics, emotions = self._extract_metrics(stream, event.get("analysis"))
+            minute_key = self._parse_timestamp(event.get("timestamp")).strftime("%Y%m%d%H%M")
+            _add(f"streams.{stream}.count", 1)
+            for name, value in metrics.items():
+                _add(f"streams.{stream}.metrics.{name}.sum", value)
+                _add(f"streams.{stream}.metrics.{name}.sq_sum", value * value)
+                _add(f"timeline.{minute_key}.{stream}.{name}_sum", value)
+            for name, value in emotions.items():
+                _add(f"streams.{stream}.emotions.{name}.sum", value)
+                _add(f"streams.{stream}.emotions.{name}.sq_sum", value * value)
+                _add(f"streams.{stream}.emotions.{name}.count", 1)
+            _add(f"timeline.{minute_key}.{stream}.count", 1)
+        return inc
+    
+    async def record(self, stream: str, session_id: str, events: List[Dict[str, Any]]):
+        """
+        Append analysis events ({"analysis": {...}, "timestamp": iso, ...}) for a session.
+        One bucket upsert per touched minute plus one rollup $inc.
+        """
+        if not session_id or not events:
+            return
+        bucket_collection = db[self.STREAM_COLLECTIONS[stream][0]]
+        
+        by_minute: Dict[datetime, List[Dict[str, Any]]] = {}
+        timestamps = []
+        for event in events:
+            ts = self._parse_timestamp(event.get("timestamp"))
+            timestamps.append(ts)
+            by_minute.setdefault(ts.replace(second=0, microsecond=0), []).append(
+                {**event, "timestamp": event.get("timestamp") or ts.isoformat()}
+            )
+        
+        # Bucket pattern: fill the open bucket for the minute, overflow into a new one when full
+        for minute, samples in by_minute.items():
+            for start in range(0, len(samples), ANALYSIS_BUCKET_MAX_SAMPLES):
+                chunk = samples[start:start + ANALYSIS_BUCKET_MAX_SAMPLES]
+                await bucket_collection.update_one(
+                    {
+                        "session_id": session_id,
+                        "minute": minute,
+                        "count": {"$lte": ANALYSIS_BUCKET_MAX_SAMPLES - len(chunk)}
+                    },
+                    {
+                        "$push": {"samples": {"$each": chunk}},
+                        "$inc": {"count": len(chunk)},
+                        "$setOnInsert": {"bucket_id": str(uuid.uuid4())}
+                    },
+                    upsert=True
+                )
+        
+        await self.rollups.update_one(
+            {"session_id": session_id},
+            {
+                "$inc": self._rollup_increments(stream, events),
+                "$min": {"first_event_at": min(timestamps)},
+                "$max": {"last_event_at": max(timestamps)},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+    
+    async def load_events(self, stream: str, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Per-event documents for a session in the legacy {"session_id", "analysis", "timestamp"}
+        shape, read from the buckets plus any pre-bucket documents in the legacy collection.
+        """
+        bucket_name, legacy_name = self.STREAM_COLLECTIONS[stream]
+        events: List[Dict[str, Any]] = []
+        if legacy_name:
+            events.extend(await db[legacy_name].find({"session_id": session_id}).to_list(None))
+        async for bucket in db[bucket_name].find({"session_id": session_id}).sort("minute", 1):
+            for sample in bucket.get("samples", []):
+                events.append({"session_id": session_id, **sample})
+        return events
+    
+    async def count_events_since(self, stream: str, since: datetime) -> int:
+        """Number of events stored since a point in time (buckets + legacy documents)"""
+        bucket_name, legacy_name = self.STREAM_COLLECTIONS[stream]
+        total = 0
+        async for row in db[bucket_name].aggregate([
+            {"$match": {"minute": {"$gte": since.replace(second=0, microsecond=0)}}},
+            {"$group": {"_id": None, "total": {"$sum": "$count"}}}
+        ]):
+            total += row.get("total", 0)
+        if legacy_name:
+            total += await db[legacy_name].count_documents({"timestamp": {"$gte": since.isoformat()}})
+        return total
+    
+    async def delete_before(self, stream: str, cutoff: datetime) -> int:
+        """Retention: drop buckets (and legacy documents) older than cutoff"""
+        bucket_name, legacy_name = self.STREAM_COLLECTIONS[stream]
+        result = await db[bucket_name].delete_many({"minute": {"$lt": cutoff}})
+        deleted = result.deleted_count
+        if legacy_name:
+            legacy_result = await db[legacy_name].delete_many({"timestamp": {"$lt": cutoff.isoformat()}})
+            deleted += legacy_result.deleted_count
+        return deleted
+    
+    @staticmethod
+    def _event_count(rollup: Optional[dict]) -> int:
+        return sum(stream.get("count", 0) for stream in ((rollup or {}).get("streams") or {}).values())
+    
+    async def _replace_rollup_if_unchanged(self, session_id: str, existing: Optional[dict], rollup: dict) -> bool:
+        """Write a rebuilt rollup only if no ingest touched it since it was read (record() always sets updated_at)"""
+        if existing is None:
+            try:
+                await self.rollups.insert_one(dict(rollup))
+                return True
+            except pymongo.errors.DuplicateKeyError:
+                return False
+        result = await self.rollups.replace_one(
+            {"session_id": session_id, "updated_at": existing.get("updated_at")}, rollup
+        )
+        return result.matched_count > 0
+    
+    async def rebuild_rollup(self, session_id: str, existing: Optional[dict] = None) -> Optional[dict]:
+        """
+        Recompute a session rollup from its stored events (backfill for pre-rollup sessions)
+        and mark it backfilled. An existing rollup covering more events than are still
+        stored (buckets past retention) is kept and only marked. existing must be read
+        before the events; when an ingest lands in between, the rebuild starts over.
+        """
+        for attempt in range(ROLLUP_REBUILD_ATTEMPTS):
+            if attempt:
+                existing = await self.rollups.find_one({"session_id": session_id}, {"_id": 0})
+            rollup: Dict[str, Any] = {"session_id": session_id, "backfilled": True}
+            timestamps = []
+            for stream in self.STREAM_COLLECTIONS:
+                events = await self.load_events(stream, session_id)
+                for path, value in self._rollup_increments(stream, events).items():
+                    node = rollup
+                    parts = path.split(".")
+                    for part in parts[:-1]:
+                        node = node.setdefault(part, {})
+                    node[parts[-1]] = node.get(parts[-1], 0) + value
+                timestamps.extend(self._parse_timestamp(event.get("timestamp")) for event in events)
+            if not timestamps or self._event_count(rollup) < self._event_count(existing):
+                # Nothing to rebuild from: remember that, so the next read doesn't rescan
+                await self.rollups.update_one(
+                    {"session_id": session_id},
+                    {"$set": {"backfilled": True, "updated_at": datetime.utcnow()}},
+                    upsert=True
+                )
+                return existing
+            rollup["first_event_at"] = min(timestamps)
+            rollup["last_event_at"] = max(timestamps)
+            rollup["updated_at"] = datetime.utcnow()
+            if await self._replace_rollup_if_unchanged(session_id, existing, rollup):
+                return rollup
+        # Still being written to: keep the incremental rollup, a later read retries the backfill
+        logging.warning(f"Rollup rebuild for session {session_id} kept losing to concurrent ingests")
+        return await self.rollups.find_one({"session_id": session_id}, {"_id": 0})
+    
+    async def get_rollup(self, session_id: str) -> Optional[dict]:
+        rollup = await self.rollups.find_one({"session_id": session_id}, {"_id": 0})
+        if rollup is None or not rollup.get("backfilled"):
+            rollup = await self.rebuild_rollup(session_id, rollup)
+        if not rollup or "streams" not in rollup:
+            return None
+        return rollup
+    
+    @staticmethod
+    def summarize_stream(stream_rollup: dict) -> Dict[str, Any]:
+        """Mean/variance per metric and emotion from a stream's running sums"""
+        count = stream_rollup.get("count", 0) if stream_rollup else 0
+        summary = {"count": count, "metrics": {}, "emotions": {}}
+        if not count:
+            return summary
+        for name, sums in stream_rollup.get("metrics", {}).items():
+            mean = sums.get("sum", 0) / count
+            summary["metrics"][name] = {
+                "mean": mean,
+                "variance": max(0.0, sums.get("sq_sum", 0) / count - mean * mean)
+            }
+        for name, sums in stream_rollup.get("emotions", {}).items():
+            n = sums.get("count", 0) or 1
+            mean = sums.get("sum", 0) / n
+            summary["emotions"][name] = {
+                "mean": mean,
+                "variance": max(0.0, sums.get("sq_sum", 0) / n - mean * mean),
+                "count": sums.get("count", 0)
+            }
+        return summary
+    
+    @staticmethod
+    def build_timelines(timeline: dict) -> Dict[str, List[Dict[str, Any]]]:
+        """Per-minute engagement, attention and confidence series from the rollup timeline"""
+        series = {"engagement": [], "attention": [], "confidence": []}
+        for minute_key in sorted(timeline or {}):
+            minute = datetime.strptime(minute_key, "%Y%m%d%H%M").isoformat()
+            entry = timeline[minute_key]
+            video = entry.get("video", {})
+            if video.get("count"):
+                series["engagement"].append({"minute": minute, "value": video.get("engagement_sum", 0) / video["count"]})
+                series["attention"].append({"minute": minute, "value": video.get("attention_sum", 0) / video["count"]})
+            confidence_sum = 0.0
+            confidence_count = 0
+            for stream in ("audio", "ei"):
+                stream_entry = entry.get(stream, {})
+                if stream_entry.get("count"):
+                    confidence_sum += stream_entry.get("confidence_sum", 0)
+                    confidence_count += stream_entry["count"]
+            if confidence_count:
+                series["confidence"].append({"minute": minute, "value": confidence_sum / confidence_count})
+        return series
+
+session_analysis_store = SessionAnalysisStore()
+
+@app.on_event("startup")
+async def startup_session_analysis_indexes():
+    await session_analysis_store.ensure_indexes()
+
+@app.on_event("startup")
+async def startup_daily_metrics():
+    """Ensure rollup indexes; backfill once when the rollup collection is still empty"""
+    await daily_metrics_store.ensure_indexes()
+    if os.environ.get('DAILY_METRICS_BACKFILL_ON_STARTUP', 'true').lower() != 'true':
+        return
+    if await db.daily_metrics.estimated_document_count() == 0:
+        asyncio.create_task(daily_metrics_store.backfill())
+
 # Advanced Video Analysis Endpoint
 @api_router.post("/analysis/video-frame")
 async def analyze_video_frame(request: dict):
@@ -15640,11 +13949,10 @@ async def analyze_video_frame(request: dict):
         # Store analysis in database if session_id provided
         if session_id:
             try:
-                await db.video_analysis.insert_one({
-                    "session_id": session_id,
+                await session_analysis_store.record("video", session_id, [{
                     "analysis": analysis_result,
                     "timestamp": datetime.utcnow().isoformat()
-                })
+                }])
             except Exception as e:
                 logging.error(f"Failed to store video analysis: {e}")
         
@@ -15657,6 +13965,91 @@ async def analyze_video_frame(request: dict):
         logging.error(f"Video analysis error: {e}")
         raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
 
+MAX_VIDEO_FRAMES_PER_BATCH = 60
+
+# Batched Video Analysis Endpoint
+@api_router.post("/analysis/video-frames/batch")
+async def analyze_video_frame_batch(request: dict):
+    """
+    Analyze a batch of consecutive video frames for one session.
+    Low-motion frames are skipped, faces are tracked between detections and all
+    analyzed frames are appended to the session's minute bucket(s) in one write.
+    Expected request: {"session_id": "session_uuid",
+                       "frames": [{"frame_data": "base64_jpeg", "timestamp": "iso"}, ...],
+                       "final": false}
+    "final": true marks the last batch of the session and releases its tracking state.
+    """
+    try:
+        session_id = request.get("session_id")
+        frames = request.get("frames") or []
+        if request.get("final") and not frames:
+            release_vision_session(session_id)
+            return {"analyses": [], "latest_analysis": None, "frames_received": 0, "status": "released"}
+        
+        if not frames:
+            raise HTTPException(status_code=400, detail="No frames provided")
+        if len(frames) > MAX_VIDEO_FRAMES_PER_BATCH:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_VIDEO_FRAMES_PER_BATCH} frames per batch")
+        
+        frame_payloads = []
+        timestamps = []
+        for frame in frames:
+            if isinstance(frame, dict):
+                frame_payloads.append(frame.get("frame_data", ""))
+                try:
+                    timestamps.append(datetime.fromisoformat(frame["timestamp"].replace("Z", "+00:00")).replace(tzinfo=None) if frame.get("timestamp") else None)
+                except ValueError:
+                    timestamps.append(None)
+            else:
+                frame_payloads.append(frame)
+                timestamps.append(None)
+        
+        emotion_detector = get_vision_emotion_detector()
+        if emotion_detector is None:
+            return {
+                "analysis": None,
+                "frames_received": len(frame_payloads),
+                "message": "Emotion detector not available"
+            }
+        
+        batch_result = await emotion_detector.analyze_frame_batch(frame_payloads, timestamps, session_id)
+        analyses = batch_result.get("analyses", [])
+        
+        # Store all analyzed frames of the batch together
+        if session_id and analyses:
+            batch_id = str(uuid.uuid4())
+            try:
+                await session_analysis_store.record("video", session_id, [
+                    {
+                        "batch_id": batch_id,
+                        "frame_index": analysis.get("frame_index"),
+                        "analysis": analysis,
+                        "timestamp": analysis.get("timestamp", datetime.utcnow().isoformat())
+                    }
+                    for analysis in analyses
+                ])
+            except Exception as e:
+                logging.error(f"Failed to store video analysis batch: {e}")
+        if request.get("final"):
+            release_vision_session(session_id)
+        
+        return {
+            "analyses": analyses,
+            "latest_analysis": analyses[-1] if analyses else None,
+            "frames_received": batch_result.get("frames_received", 0),
+            "frames_analyzed": batch_result.get("frames_analyzed", 0),
+            "frames_skipped": batch_result.get("frames_skipped", 0),
+            "frames_invalid": batch_result.get("frames_invalid", 0),
+            "face_detections_run": batch_result.get("face_detections_run", 0),
+            "status": "success"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Video batch analysis error: {e}")
+        raise HTTPException(status_code=500, detail=f"Video batch analysis failed: {str(e)}")
+
 # Advanced Audio Analysis Endpoint
 @api_router.post("/analysis/audio-stream")
 async def analyze_audio_stream(audio_file: UploadFile = File(...), session_id: str = Form(...)):
@@ -15678,12 +14071,11 @@ async def analyze_audio_stream(audio_file: UploadFile = File(...), session_id: s
         
         # Store analysis in database
         try:
-            await db.audio_analysis.insert_one({
-                "session_id": session_id,
+            await session_analysis_store.record("audio", session_id, [{
                 "analysis": analysis_result,
                 "filename": audio_file.filename,
                 "timestamp": datetime.utcnow().isoformat()
-            })
+            }])
         except Exception as e:
             logging.error(f"Failed to store audio analysis: {e}")
         
@@ -15703,19 +14095,32 @@ async def get_session_insights(session_id: str):
     Get comprehensive analysis insights for a session
     """
     try:
-        # Get video analysis data
-        video_analyses = await db.video_analysis.find({"session_id": session_id}).to_list(None)
-        audio_analyses = await db.audio_analysis.find({"session_id": session_id}).to_list(None)
+        # Single indexed read of the incrementally maintained rollup
+        rollup = await session_analysis_store.get_rollup(session_id) or {}
+        streams = rollup.get("streams", {})
+        video_summary = SessionAnalysisStore.summarize_stream(streams.get("video"))
+        audio_summary = SessionAnalysisStore.summarize_stream(streams.get("audio"))
+        ei_summary = SessionAnalysisStore.summarize_stream(streams.get("ei"))
+        
+        video_metrics = _video_metrics_from_summary(video_summary)
+        audio_metrics = _audio_metrics_from_summary(audio_summary)
         
-        # Calculate aggregated metrics
         insights = {
             "session_id": session_id,
-            "video_metrics": _aggregate_video_metrics(video_analyses),
-            "audio_metrics": _aggregate_audio_metrics(audio_analyses),
-            "combined_insights": _generate_combined_insights(video_analyses, audio_analyses),
+            "video_metrics": video_metrics,
+            "audio_metrics": audio_metrics,
+            "emotional_intelligence_metrics": ei_summary["metrics"],
+            "combined_insights": _combine_session_metrics(video_metrics, audio_metrics),
+            "rollup_statistics": {
+                "video": video_summary,
+                "audio": audio_summary,
+                "emotional_intelligence": ei_summary
+            },
+            "timelines": SessionAnalysisStore.build_timelines(rollup.get("timeline", {})),
             "analysis_count": {
-                "video_frames": len(video_analyses),
-                "audio_clips": len(audio_analyses)
+                "video_frames": video_summary["count"],
+                "audio_clips": audio_summary["count"],
+                "text_responses": ei_summary["count"]
             }
         }
         
@@ -15825,11 +14230,44 @@ def _aggregate_audio_metrics(audio_analyses: List[Dict]) -> Dict:
         "total_audio_analyzed": len(audio_analyses)
     }
 
+def _video_metrics_from_summary(summary: Dict) -> Dict:
+    """Rollup summary -> the _aggregate_video_metrics response shape"""
+    if not summary.get("count"):
+        return {}
+    metrics = summary.get("metrics", {})
+    return {
+        "average_engagement": metrics.get("engagement", {}).get("mean", 0),
+        "average_attention": metrics.get("attention", {}).get("mean", 0),
+        "average_stress": metrics.get("stress", {}).get("mean", 0),
+        "dominant_emotions": {emotion: stats["mean"] for emotion, stats in summary.get("emotions", {}).items()},
+        "total_frames_analyzed": summary["count"]
+    }
+
+def _audio_metrics_from_summary(summary: Dict) -> Dict:
+    """Rollup summary -> the _aggregate_audio_metrics response shape"""
+    if not summary.get("count"):
+        return {}
+    metrics = summary.get("metrics", {})
+    return {
+        "average_confidence": metrics.get("confidence", {}).get("mean", 0),
+        "average_fluency": metrics.get("fluency", {}).get("mean", 0),
+        "average_clarity": metrics.get("clarity", {}).get("mean", 0),
+        "average_quality": metrics.get("quality", {}).get("mean", 0),
+        "average_speaking_rate": metrics.get("speaking_rate", {}).get("mean", 0),
+        "average_stress": metrics.get("stress", {}).get("mean", 0),
+        "emotional_tones": {emotion: stats["mean"] for emotion, stats in summary.get("emotions", {}).items()},
+        "total_audio_analyzed": summary["count"]
+    }
+
 def _generate_combined_insights(video_analyses: List[Dict], audio_analyses: List[Dict]) -> Dict:
     """Generate combined insights from video and audio analysis"""
-    video_metrics = _aggregate_video_metrics(video_analyses)
-    audio_metrics = _aggregate_audio_metrics(audio_analyses)
-    
+    return _combine_session_metrics(
+        _aggregate_video_metrics(video_analyses),
+        _aggregate_audio_metrics(audio_analyses)
+    )
+
+def _combine_session_metrics(video_metrics: Dict, audio_metrics: Dict) -> Dict:
+    """Generate combined insights from aggregated video and audio metrics"""
     insights = {
         "overall_performance": "good",  # Default
         "key_strengths": [],
@@ -16219,11 +14657,11 @@ async def analyze_personality(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get audio analysis data if available
-        audio_analyses = await db.audio_analysis.find({"session_id": session_id}).to_list(None)
+        audio_analyses = await session_analysis_store.load_events("audio", session_id)
         speech_data = audio_analyses[0] if audio_analyses else {}
         
         # Get video analysis data if available
-        video_analyses = await db.video_analysis.find({"session_id": session_id}).to_list(None)
+        video_analyses = await session_analysis_store.load_events("video", session_id)
         video_data = video_analyses[0] if video_analyses else {}
         
         # Get text responses
@@ -17810,6 +16248,18 @@ async def perform_ats_analysis(resume: dict, job_requirements: dict) -> ATSAnaly
 async def health_check():
     return {"status": "healthy", "message": "AI Interview Agent is running"}
 
+@api_router.get("/health/engines")
+async def engine_health():
+    """Report which lazily constructed engines are loaded in this worker"""
+    return {"status": "healthy", "pid": os.getpid(), **engine_registry.status()}
+
+@app.on_event("startup")
+async def prewarm_engines():
+    """Construct the engines listed in ENGINE_PREWARM (comma separated, or 'all') at startup"""
+    report = await asyncio.get_running_loop().run_in_executor(None, engine_registry.prewarm_from_env)
+    if report:
+        logging.info(f"Engine prewarm: {report}")
+
 @api_router.get("/")
 async def root():
     return {"message": "AI-Powered Interview Agent API with Voice Support"}
@@ -17834,30 +16284,19 @@ logger = logging.getLogger(__name__)
 # Phase 4: Executive Dashboard API Endpoints
 
 @api_router.get("/admin/executive-dashboard/metrics")
-async def get_executive_dashboard_metrics():
+async def get_executive_dashboard_metrics(job_title: Optional[str] = None):
     """Get comprehensive executive dashboard metrics"""
     try:
         # Calculate date ranges
         current_date = datetime.utcnow()
         last_30_days = (current_date - timedelta(days=30), current_date)
-        last_90_days = (current_date - timedelta(days=90), current_date)
         
-        # Get all key metrics
-        time_to_hire = await executive_analytics.calculate_time_to_hire_metrics(last_30_days)
-        candidate_experience = await executive_analytics.calculate_candidate_experience_metrics(last_30_days)
-        hiring_quality = await executive_analytics.calculate_hiring_quality_metrics(last_30_days)
-        diversity_metrics = await executive_analytics.calculate_diversity_metrics(last_30_days)
-        cost_metrics = await executive_analytics.calculate_cost_per_hire(last_30_days)
+        # Get all key metrics from the daily rollups
+        dashboard_metrics = await executive_analytics.calculate_dashboard_metrics(last_30_days, job_title)
         
         return {
             "success": True,
-            "dashboard_metrics": {
-                "time_to_hire": time_to_hire,
-                "candidate_experience": candidate_experience,
-                "hiring_quality": hiring_quality,
-                "diversity_metrics": diversity_metrics,
-                "cost_metrics": cost_metrics
-            },
+            "dashboard_metrics": dashboard_metrics,
             "last_updated": current_date.isoformat(),
             "date_range": {
                 "start": last_30_days[0].isoformat(),
@@ -17869,32 +16308,33 @@ async def get_executive_dashboard_metrics():
         raise HTTPException(status_code=500, detail=f"Failed to get dashboard metrics: {str(e)}")
 
 @api_router.get("/admin/executive-dashboard/historical-trends")
-async def get_historical_trends():
+async def get_historical_trends(job_title: Optional[str] = None):
     """Get historical trends for executive dashboard"""
     try:
-        # Get trends for last 6 months
+        # Get trends for last 6 months with one read of the daily rollups
         current_date = datetime.utcnow()
+        rows = await daily_metrics_store.load((current_date - timedelta(days=180), current_date), job_title)
         trends_data = []
         
         for i in range(6):
             start_date = current_date - timedelta(days=30*(i+1))
             end_date = current_date - timedelta(days=30*i)
-            date_range = (start_date, end_date)
+            # Days on a window boundary belong to the newer window
+            window_rows = [
+                row for row in rows
+                if DailyMetricsStore._day(start_date) < row["day"] <= DailyMetricsStore._day(end_date)
+            ]
             
-            time_to_hire = await executive_analytics.calculate_time_to_hire_metrics(date_range)
-            candidate_experience = await executive_analytics.calculate_candidate_experience_metrics(date_range)
-            hiring_quality = await executive_analytics.calculate_hiring_quality_metrics(date_range)
-            diversity_metrics = await executive_analytics.calculate_diversity_metrics(date_range)
-            cost_metrics = await executive_analytics.calculate_cost_per_hire(date_range)
+            metrics = await executive_analytics.calculate_dashboard_metrics(rows=window_rows)
             
             trends_data.append({
                 "month": start_date.strftime("%Y-%m"),
-                "time_to_hire": time_to_hire["average_time_to_hire"],
-                "candidate_experience": candidate_experience["average_experience_score"],
-                "hiring_quality": hiring_quality["average_quality_score"],
-                "diversity_score": 1 - diversity_metrics["bias_score"],  # Convert bias to diversity score
-                "cost_per_hire": cost_metrics["cost_per_hire"],
-                "total_interviews": time_to_hire["total_hires"]
+                "time_to_hire": metrics["time_to_hire"]["average_time_to_hire"],
+                "candidate_experience": metrics["candidate_experience"]["average_experience_score"],
+                "hiring_quality": metrics["hiring_quality"]["average_quality_score"],
+                "diversity_score": 1 - metrics["diversity_metrics"]["bias_score"],  # Convert bias to diversity score
+                "cost_per_hire": metrics["cost_metrics"]["cost_per_hire"],
+                "total_interviews": metrics["time_to_hire"]["total_hires"]
             })
         
         return {
@@ -17906,6 +16346,17 @@ async def get_historical_trends():
         logging.error(f"Historical trends error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get historical trends: {str(e)}")
 
+@api_router.post("/admin/executive-dashboard/rebuild-rollups")
+async def rebuild_executive_dashboard_rollups(days: Optional[int] = None):
+    """Rebuild the daily dashboard rollups from sessions and assessments (all history, or the last N days)"""
+    try:
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        result = await daily_metrics_store.backfill(since)
+        return {"success": True, "rebuilt": result, "timestamp": datetime.utcnow().isoformat()}
+    except Exception as e:
+        logging.error(f"Daily metrics rebuild error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild rollups: {str(e)}")
+
 @api_router.get("/admin/executive-dashboard/real-time-analytics")
 async def get_real_time_analytics():
     """Get real-time analytics for executive dashboard"""
@@ -17999,14 +16450,19 @@ async def get_advanced_reporting_data():
         
         # Performance by role archetype
         role_performance = {}
-        enhanced_tokens = await db.enhanced_tokens.find({}).to_list(None)
+        enhanced_tokens = await db.enhanced_tokens.find(
+            {}, {"_id": 0, "token": 1, "role_archetype": 1, "interview_focus": 1}
+        ).to_list(None)
+        assessments_by_token = await find_by_tokens(
+            db.assessments, [token["token"] for token in enhanced_tokens], {"_id": 0, "token": 1, "overall_score": 1}
+        )
         for token in enhanced_tokens:
             role = token.get("role_archetype", "General")
             if role not in role_performance:
                 role_performance[role] = {"interviews": 0, "avg_score": 0, "total_score": 0}
             
             # Find assessment for this token
-            assessment = await db.assessments.find_one({"token": token["token"]})
+            assessment = assessments_by_token.get(token["token"])
             if assessment:
                 role_performance[role]["interviews"] += 1
                 role_performance[role]["total_score"] += assessment.get("overall_score", 0)
@@ -18019,7 +16475,7 @@ async def get_advanced_reporting_data():
             if focus not in focus_effectiveness:
                 focus_effectiveness[focus] = {"interviews": 0, "success_rate": 0, "successful": 0}
             
-            assessment = await db.assessments.find_one({"token": token["token"]})
+            assessment = assessments_by_token.get(token["token"])
             if assessment:
                 focus_effectiveness[focus]["interviews"] += 1
                 if assessment.get("overall_score", 0) >= 70:
@@ -18302,16 +16758,21 @@ async def analyze_speech_patterns(audio_data: UploadFile = File(...)):
 async def get_comprehensive_analysis_report(session_id: str):
     """Get comprehensive analysis report combining all advanced features"""
     try:
-        # Get session and assessment data
-        session = await db.sessions.find_one({"session_id": session_id})
-        assessment = await db.assessments.find_one({"session_id": session_id})
+        # Get session and assessment data (summary fields only)
+        session, assessment = await load_session_with_assessment(
+            db, session_id,
+            session_projection={"_id": 0, "session_id": 1, "candidate_name": 1, "job_title": 1, "duration": 1, "status": 1},
+            assessment_projection={"_id": 0, "technical_score": 1, "behavioral_score": 1, "overall_score": 1,
+                                   "predictive_analytics": 1, "bias_analysis": 1, "personality_analysis": 1,
+                                   "key_strengths": 1, "areas_for_improvement": 1}
+        )
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
         # Get video analysis data
-        video_analyses = await db.video_analysis.find({"session_id": session_id}).to_list(None)
-        audio_analyses = await db.audio_analysis.find({"session_id": session_id}).to_list(None)
+        video_analyses = await session_analysis_store.load_events("video", session_id)
+        audio_analyses = await session_analysis_store.load_events("audio", session_id)
         
         # Get engagement analysis
         engagement_analysis = await advanced_video_analyzer.analyze_interview_engagement(session_id)
@@ -18381,13 +16842,9 @@ async def get_advanced_analytics_summary():
         current_date = datetime.utcnow()
         last_7_days = current_date - timedelta(days=7)
         
-        video_analyses_count = await db.video_analysis.count_documents({
-            "timestamp": {"$gte": last_7_days.isoformat()}
-        })
+        video_analyses_count = await session_analysis_store.count_events_since("video", last_7_days)
         
-        audio_analyses_count = await db.audio_analysis.count_documents({
-            "timestamp": {"$gte": last_7_days.isoformat()}
-        })
+        audio_analyses_count = await session_analysis_store.count_events_since("audio", last_7_days)
         
         # Get analytics capabilities
         analytics_summary = {
@@ -18441,6 +16898,11 @@ async def get_advanced_analytics_summary():
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    report_renderer.shutdown()
+    if engine_registry.is_loaded("session_fingerprinting"):
+        # Flush buffered device and session state before the client goes away
+        await device_fingerprinting_engine.close_device_state()
+        await session_integrity_monitor.close_session_state()
     client.close()
 
 # Phase 3: Open-Source AI Integration API Endpoints (Week 7)
@@ -18459,6 +16921,19 @@ async def get_ai_status():
         logging.error(f"AI status error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get AI status: {str(e)}")
 
+@api_router.get("/ai/inference-batchers/stats")
+async def get_inference_batcher_stats():
+    """Micro-batching statistics (batch sizes, latency percentiles) for text inference"""
+    try:
+        return {
+            "success": True,
+            "batchers": get_batcher_stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logging.error(f"Inference batcher stats error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get inference batcher stats: {str(e)}")
+
 @api_router.post("/ai/analyze-question")
 async def analyze_question_quality(data: dict):
     """Analyze interview question quality using open-source AI"""
@@ -18530,6 +17005,7 @@ async def analyze_video_emotion(data: dict):
         except Exception as e:
             raise HTTPException(status_code=400, detail="Invalid frame data format")
         
+        emotion_detector = get_vision_emotion_detector()
         if emotion_detector:
             analysis = await emotion_detector.analyze_frame_emotions(frame_bytes)
         else:
@@ -18554,6 +17030,7 @@ async def analyze_session_video(data: dict):
         if not frame_analyses:
             raise HTTPException(status_code=400, detail="Frame analyses are required")
         
+        emotion_detector = get_vision_emotion_detector()
         if emotion_detector:
             analysis = await emotion_detector.analyze_video_session(frame_analyses, session_duration)
         else:
@@ -18787,6 +17264,7 @@ async def submit_biometric_data(request: BiometricDataSubmissionRequest):
             logging.info(f"Stored biometric analysis results for session {request.session_id}")
         except Exception as e:
             logging.error(f"Error storing biometric analysis results: {str(e)}")
+        mark_session_risk_dirty(request.session_id)
         
         return {
             "success": True,
@@ -18800,6 +17278,169 @@ async def submit_biometric_data(request: BiometricDataSubmissionRequest):
         logging.error(f"Error submitting biometric data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Biometric data submission failed: {str(e)}")
 
+KEYSTROKE_STREAM_PROGRESS_TTL_SECONDS = int(os.environ.get("KEYSTROKE_STREAM_PROGRESS_TTL_SECONDS", "86400"))
+
+@app.on_event("startup")
+async def startup_keystroke_stream_indexes():
+    try:
+        await db.keystroke_stream_progress.create_index([("stream_id", 1)], unique=True)
+        await db.keystroke_stream_progress.create_index(
+            [("updated_at", 1)], expireAfterSeconds=KEYSTROKE_STREAM_PROGRESS_TTL_SECONDS
+        )
+    except Exception as e:
+        logging.error(f"Failed creating keystroke stream indexes: {e}")
+
+@api_router.post("/security/biometric-data/keystroke-stream")
+async def stream_keystroke_data(request: KeystrokeStreamRequest):
+    """
+    Submit keystroke events in batches while the candidate types
+    Running statistics are kept per session in the worker's memory, so a
+    session's batches must reach the same worker (sticky sessions). Batch and
+    event counts are shared through keystroke_stream_progress; a batch whose
+    earlier batches were analyzed elsewhere is reported as stream.restarted
+    (stream.missed_batches: batches missing from the statistics).
+    The final batch (finalize=true) stores the keystroke analysis like a
+    regular submission
+    """
+    try:
+        if not request.consent_given:
+            raise HTTPException(status_code=400, detail="User consent required for biometric data collection")
+        
+        progress = await db.keystroke_stream_progress.find_one_and_update(
+            {"stream_id": request.session_id},
+            {
+                "$inc": {"batches": 1, "events": len(request.keystroke_data)},
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            upsert=True,
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+        if request.finalize:
+            await db.keystroke_stream_progress.delete_one({"stream_id": request.session_id})
+        
+        keystroke_result = keystroke_analyzer.update_typing_stream(
+            request.session_id, request.keystroke_data, finalize=request.finalize,
+            batch_number=progress["batches"]
+        )
+        if "stream" in keystroke_result:
+            keystroke_result["stream"]["stream_batches"] = progress["batches"]
+            keystroke_result["stream"]["stream_events"] = progress["events"]
+        
+        if request.finalize and "typing_patterns" in keystroke_result:
+            try:
+                analysis_record = BiometricAnalysisResult(
+                    session_id=request.session_id,
+                    analysis_type="keystroke_dynamics",
+                    analysis_results={"keystroke_analysis": {"typing_patterns": keystroke_result["typing_patterns"]}},
+                    anomaly_score=0.0,
+                    intervention_level="none"
+                )
+                await db.biometric_analysis_results.insert_one(analysis_record.dict())
+            except Exception as e:
+                logging.error(f"Error storing keystroke stream analysis: {str(e)}")
+        
+        return {
+            "success": "stream" in keystroke_result,
+            "session_id": request.session_id,
+            "keystroke_analysis": keystroke_result
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error streaming keystroke data: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Keystroke stream failed: {str(e)}")
+
+def _analyze_biometric_batch(batch) -> Dict[str, Any]:
+    """Analysis of a decoded wire-format frame, mirroring submit_biometric_data"""
+    analysis_results = {}
+    
+    keystrokes = batch.columns["keystroke"]
+    if len(keystrokes["t"]):
+        analysis_results["keystroke_analysis"] = keystroke_analyzer.analyze_keystroke_columns(
+            keystrokes["t"], keystrokes["key"], keystrokes["flags"] & KEYUP_FLAG, batch.key_names
+        )
+    
+    mouse_data = batch.mouse_records()
+    if mouse_data:
+        analysis_results["mouse_analysis"] = interaction_analyzer.analyze_mouse_movement_patterns(mouse_data)
+    
+    scroll_data = batch.scroll_records()
+    if scroll_data:
+        analysis_results["scroll_analysis"] = interaction_analyzer.analyze_scroll_behavior(scroll_data)
+    
+    click_data = batch.click_records()
+    if click_data:
+        click_timings, click_positions = batch.click_columns()
+        analysis_results["click_analysis"] = interaction_analyzer.detect_click_patterns(click_timings, click_positions)
+    
+    if batch.timing_data:
+        analysis_results["timing_analysis"] = timing_analyzer.analyze_question_response_patterns(batch.timing_data)
+    
+    if mouse_data or click_data or scroll_data:
+        analysis_results["interaction_consistency"] = interaction_analyzer.calculate_interaction_consistency_score(
+            mouse_data, click_data, scroll_data
+        )
+    return analysis_results
+
+@api_router.post("/security/biometric-data/ingest")
+async def ingest_biometric_frame(request: Request):
+    """
+    Submit biometric data as a compact columnar frame (see biometric_wire_format)
+    The body is a binary frame, optionally gzip-compressed; events are decoded
+    straight into NumPy columns, analyzed like /security/biometric-data/submit
+    and stored as a compressed columnar chunk under the retention policy
+    """
+    try:
+        body = await request.body()
+        try:
+            batch = decode_biometric_frame(body)
+        except WireFormatError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid biometric frame: {str(e)}")
+        
+        if not batch.session_id:
+            raise HTTPException(status_code=400, detail="Biometric frame is missing session_id")
+        if not batch.header.get("consent_given"):
+            raise HTTPException(status_code=400, detail="User consent required for biometric data collection")
+        
+        analysis_results = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: _analyze_biometric_batch(batch)
+        )
+        
+        storage_result = await privacy_manager.store_event_chunk(batch, consent_given=True)
+        
+        try:
+            analysis_record = BiometricAnalysisResult(
+                session_id=batch.session_id,
+                analysis_type="comprehensive_biometric_analysis",
+                analysis_results=analysis_results,
+                anomaly_score=0.0,
+                intervention_level="none"
+            )
+            await db.biometric_analysis_results.insert_one(analysis_record.dict())
+        except Exception as e:
+            logging.error(f"Error storing biometric analysis results: {str(e)}")
+        mark_session_risk_dirty(batch.session_id)
+        
+        return {
+            "success": True,
+            "session_id": batch.session_id,
+            "schema_version": batch.version,
+            "upload_id": batch.upload_id,
+            "sequence": batch.sequence,
+            "events_received": batch.total_events,
+            "payload_bytes": len(body),
+            "analysis_results": analysis_results,
+            "storage_result": storage_result,
+            "message": "Biometric data submitted and analyzed successfully"
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error ingesting biometric frame: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Biometric frame ingestion failed: {str(e)}")
+
 @api_router.post("/security/biometric-analysis/detect-anomalies")
 async def detect_biometric_anomalies(request: BiometricAnalysisRequest):
     """
@@ -19187,6 +17828,10 @@ class PerformanceAnalysisRequest(BaseModel):
 class ProbabilityCalculationRequest(BaseModel):
     session_data: Dict[str, Any]
 
+class BatchAnomalyScoringRequest(BaseModel):
+    sessions: List[Dict[str, Any]] = Field(..., min_length=1, max_length=5000)
+    include_response_patterns: bool = True
+
 # Statistical Anomaly Analyzer Request Models (Step 2.2)
 class AnswerPatternAnalysisRequest(BaseModel):
     session_data: Dict[str, Any]
@@ -19201,6 +17846,14 @@ class CollaborativeCheatingAnalysisRequest(BaseModel):
     session_data: Dict[str, Any]
     comparison_sessions: Optional[List[Dict]] = None
 
+class CohortCollaborationRequest(BaseModel):
+    sessions: List[Dict[str, Any]]
+    cohort_id: Optional[str] = None
+    min_common_questions: int = 5
+    answer_threshold: float = 0.8
+    score_threshold: float = 0.7
+    max_reported_pairs: int = 500
+
 @api_router.post("/anomaly-detection/train-baseline-models")
 async def train_baseline_models(request: BaselineTrainingRequest):
     """
@@ -19216,8 +17869,10 @@ async def train_baseline_models(request: BaselineTrainingRequest):
         if not request.historical_data:
             raise HTTPException(status_code=400, detail="Historical data is required for training")
         
-        # Train the baseline models
-        training_results = anomaly_detection_engine.train_baseline_models(request.historical_data)
+        # Train the baseline models (the new version is hot-swapped in by every worker)
+        training_results = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: anomaly_detection_engine.train_baseline_models(request.historical_data)
+        )
         
         if not training_results.get('success'):
             raise HTTPException(status_code=500, detail="Model training failed")
@@ -19226,6 +17881,7 @@ async def train_baseline_models(request: BaselineTrainingRequest):
         training_record = {
             "training_id": str(uuid.uuid4()),
             "training_date": datetime.utcnow(),
+            "model_version": training_results.get('model_version'),
             "num_training_samples": training_results.get('num_training_samples', 0),
             "num_features": training_results.get('num_features', 0),
             "feature_names": training_results.get('feature_names', []),
@@ -19307,6 +17963,53 @@ async def detect_response_pattern_anomalies(request: AnomalyDetectionRequest):
         logging.error(f"Error in response pattern anomaly detection: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Anomaly detection failed: {str(e)}")
 
+@api_router.post("/anomaly-detection/score-sessions-batch")
+async def score_sessions_batch(request: BatchAnomalyScoringRequest):
+    """
+    Score many sessions against the trained anomaly models in one pass
+    
+    Builds one feature matrix for all sessions and runs each model once
+    (Isolation Forest decision_function, PCA reconstruction, statistical z-scores)
+    """
+    try:
+        batch_results = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: anomaly_detection_engine.score_sessions_batch(request.sessions, request.include_response_patterns)
+        )
+        
+        if not batch_results.get('success'):
+            error_msg = batch_results.get('error', 'Unknown error in batch anomaly scoring')
+            raise HTTPException(status_code=500, detail=f"Batch anomaly scoring failed: {error_msg}")
+        
+        # Store one analysis per session, as the single-session endpoint does
+        analysis_records = [
+            {
+                "analysis_id": str(uuid.uuid4()),
+                "session_id": session_id,
+                "analysis_timestamp": datetime.utcnow(),
+                "anomaly_results": session_results,
+                "overall_assessment": session_results["overall_assessment"],
+                "risk_level": session_results["overall_assessment"].get('risk_level', 'MEDIUM'),
+                "anomaly_detected": session_results["overall_assessment"].get('anomaly_detected', False),
+                "model_version": batch_results.get('model_version'),
+                "created_at": datetime.utcnow()
+            }
+            for session_id, session_results in batch_results['results'].items()
+        ]
+        if analysis_records:
+            await db.anomaly_analyses.insert_many(analysis_records)
+        
+        return {
+            "success": True,
+            "message": f"Scored {batch_results['sessions_scored']} sessions",
+            "batch_results": batch_results
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error in batch anomaly scoring: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch anomaly scoring failed: {str(e)}")
+
 @api_router.post("/anomaly-detection/analyze-performance-inconsistencies")
 async def analyze_performance_inconsistencies(request: PerformanceAnalysisRequest):
     """
@@ -19487,7 +18190,8 @@ async def get_anomaly_detection_model_status():
                 "pca_reconstruction",
                 "dbscan_clustering"
             ],
-            "model_performance": latest_training.get("model_performance", {}) if latest_training else {}
+            "model_performance": latest_training.get("model_performance", {}) if latest_training else {},
+            "model_registry": anomaly_detection_engine.get_model_registry_status()
         }
         
         # Get analysis statistics
@@ -19731,6 +18435,65 @@ async def detect_collaborative_cheating_patterns(request: CollaborativeCheatingA
         logging.error(f"Error in collaborative cheating analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Collaboration analysis failed: {str(e)}")
 
+@api_router.post("/statistical-analysis/detect-cohort-collaboration")
+async def detect_cohort_collaboration(request: CohortCollaborationRequest):
+    """
+    Detect clusters of colluding test-takers across a whole cohort (e.g. one exam day)
+
+    Candidate pairs come from MinHash LSH over (question, answer) pairs, so only
+    sessions with similar answer sets are compared; flagged pairs are grouped
+    into clusters.
+    """
+    try:
+        if len(request.sessions) < 2:
+            raise HTTPException(status_code=400, detail="At least two sessions are required")
+
+        # CPU-bound: keep the event loop free while the cohort is scored
+        analysis_results = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: statistical_anomaly_analyzer.detect_cohort_collaboration(
+                request.sessions,
+                min_common_questions=request.min_common_questions,
+                answer_threshold=request.answer_threshold,
+                score_threshold=request.score_threshold,
+                max_reported_pairs=request.max_reported_pairs
+            )
+        )
+
+        if not analysis_results.get('success'):
+            error_msg = analysis_results.get('error', 'Unknown error in cohort collaboration analysis')
+            raise HTTPException(status_code=500, detail=f"Cohort collaboration analysis failed: {error_msg}")
+
+        clusters = analysis_results.get('clusters', [])
+        cluster_risks = {cluster['risk_level'] for cluster in clusters}
+        analysis_record = {
+            "analysis_id": str(uuid.uuid4()),
+            "cohort_id": request.cohort_id,
+            "session_ids": sorted({sid for cluster in clusters for sid in cluster['session_ids']}),
+            "analysis_type": "cohort_collaboration",
+            "analysis_timestamp": datetime.utcnow(),
+            "analysis_results": analysis_results,
+            "risk_level": "HIGH" if "HIGH" in cluster_risks else "MEDIUM" if cluster_risks else "MINIMAL",
+            "sessions_analyzed": analysis_results.get('sessions_analyzed', 0),
+            "created_at": datetime.utcnow()
+        }
+
+        await db.statistical_anomaly_analyses.insert_one(analysis_record)
+
+        return {
+            "success": True,
+            "message": "Cohort collaboration analysis completed",
+            "analysis_id": analysis_record["analysis_id"],
+            "cohort_id": request.cohort_id,
+            "analysis_results": analysis_results
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error in cohort collaboration analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Cohort collaboration analysis failed: {str(e)}")
+
 @api_router.get("/statistical-analysis/session-analysis/{session_id}")
 async def get_statistical_anomaly_analysis(session_id: str):
     """
@@ -19792,7 +18555,8 @@ async def get_statistical_analysis_status():
                 "answer_pattern_irregularities",
                 "difficulty_progression_anomalies", 
                 "timezone_manipulation",
-                "collaborative_cheating_patterns"
+                "collaborative_cheating_patterns",
+                "cohort_collaboration"
             ],
             "analysis_statistics": {
                 "total_analyses": total_analyses,
@@ -19876,6 +18640,59 @@ async def _calculate_overall_session_risk(analyses: Dict[str, Any]) -> Dict[str,
 
 # ===== REAL-TIME RISK SCORING SYSTEM ENDPOINTS (Step 2.3) =====
 
+async def _load_risk_session_data(session_id: str) -> Optional[Dict[str, Any]]:
+    """Session responses for risk scoring from the aptitude session (None if it is not an aptitude session)"""
+    sess = await db.aptitude_sessions.find_one(
+        {"session_id": session_id},
+        {"_id": 0, "answers": 1, "start_time": 1, "status": 1, "config_id": 1}
+    )
+    if not sess:
+        return None
+    responses = [
+        {
+            "question_id": question_id,
+            "answer": answer.get("answer"),
+            "is_correct": bool(answer.get("correct")),
+            "response_time": float(answer.get("time_taken") or 0.0),
+            "timestamp": answer.get("timestamp")
+        }
+        for question_id, answer in sess.get("answers", {}).items()
+    ]
+    return {
+        "session_id": session_id,
+        "responses": responses,
+        "timings": [r["response_time"] for r in responses],
+        "metadata": {"source": "aptitude_session", "status": sess.get("status"), "config_id": sess.get("config_id")},
+        "start_time": sess.get("start_time"),
+        "last_update": datetime.utcnow()
+    }
+
+def _risk_score_record(session_id: str, risk_assessment: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "session_id": session_id,
+        "risk_assessment": risk_assessment,
+        "composite_risk_score": risk_assessment.get('composite_risk_score', 0.0),
+        "risk_level": risk_assessment.get('risk_level', 'MEDIUM'),
+        "risk_breakdown": risk_assessment.get('risk_breakdown', {}),
+        "confidence_intervals": risk_assessment.get('confidence_intervals', {}),
+        "alerts_triggered": risk_assessment.get('alerts_triggered', []),
+        "created_at": datetime.utcnow()
+    }
+
+async def _store_scheduled_risk_assessment(session_id: str, risk_assessment: Dict[str, Any]):
+    """Persist scheduler recomputations so /risk-scoring/current-risk serves the latest score"""
+    try:
+        record = _risk_score_record(session_id, risk_assessment)
+        record["source"] = "scheduler"
+        await db.real_time_risk_scores.insert_one(record)
+    except Exception as e:
+        logging.error(f"Error storing scheduled risk assessment for {session_id}: {str(e)}")
+
+def mark_session_risk_dirty(session_id: str, event: Optional[Dict[str, Any]] = None):
+    """Schedule a risk recomputation for a monitored session (no-op until the risk calculator is in use)"""
+    if engine_registry.is_loaded("real_time_risk_calculator"):
+        real_time_risk_calculator.mark_session_dirty(session_id, event)
+
 # Pydantic models for risk scoring endpoints
 class CompositeRiskRequest(BaseModel):
     session_id: str
@@ -19893,6 +18710,9 @@ class ConfidenceIntervalRequest(BaseModel):
     session_id: str
     risk_factors: Optional[List[Dict[str, Any]]] = None
 
+class BatchConfidenceIntervalRequest(BaseModel):
+    session_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
 @api_router.post("/risk-scoring/calculate-composite-score")
 async def calculate_composite_risk_score(request: CompositeRiskRequest):
     """
@@ -19919,16 +18739,7 @@ async def calculate_composite_risk_score(request: CompositeRiskRequest):
         
         # Store risk assessment in database
         session_id = request.session_id
-        risk_score_record = {
-            "session_id": session_id,
-            "risk_assessment": risk_assessment,
-            "composite_risk_score": risk_assessment.get('composite_risk_score', 0.0),
-            "risk_level": risk_assessment.get('risk_level', 'MEDIUM'),
-            "risk_breakdown": risk_assessment.get('risk_breakdown', {}),
-            "confidence_intervals": risk_assessment.get('confidence_intervals', {}),
-            "alerts_triggered": risk_assessment.get('alerts_triggered', []),
-            "created_at": datetime.utcnow()
-        }
+        risk_score_record = _risk_score_record(session_id, risk_assessment)
         
         # Insert into real_time_risk_scores collection
         result = await db.real_time_risk_scores.insert_one(risk_score_record)
@@ -20226,57 +19037,181 @@ async def get_confidence_intervals(session_id: str):
         logging.error(f"Error in confidence interval calculation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Confidence interval calculation failed: {str(e)}")
 
-# ===== MODULE 3: ADVANCED SESSION FINGERPRINTING SYSTEM ENDPOINTS =====
+@api_router.post("/risk-scoring/confidence-intervals/batch")
+async def get_confidence_intervals_batch(request: BatchConfidenceIntervalRequest):
+    """
+    Confidence intervals for many sessions in one request
+    Uses each session's recorded risk score history; all sessions are bootstrapped together
+    """
+    try:
+        batch_results = await real_time_risk_calculator.generate_confidence_intervals_batch(request.session_ids)
+        
+        if not batch_results.get('success'):
+            error_msg = batch_results.get('error', 'Unknown error in confidence interval calculation')
+            raise HTTPException(status_code=500, detail=f"Confidence interval calculation failed: {error_msg}")
+        
+        return {
+            "success": True,
+            "calculation_timestamp": datetime.utcnow(),
+            "batch_results": batch_results
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error in batch confidence interval calculation: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Confidence interval calculation failed: {str(e)}")
 
-# Import Device Fingerprinting Engine
-try:
-    from session_fingerprinting_engine import (
-        DeviceFingerprintingEngine, 
-        DeviceFingerprint, 
-        DeviceTrackingRecord,
-        device_fingerprinting_engine,
-        EnvironmentAnalyzer,
-        environment_analyzer,
-        SessionIntegrityMonitor,
-        session_integrity_monitor
+@api_router.websocket("/admin/risk-updates/ws")
+async def risk_updates_websocket(websocket: WebSocket, session_ids: Optional[str] = None):
+    """
+    Live risk score changes for the admin dashboard
+    Subscribes to the given comma-separated session_ids (all sessions if omitted);
+    clients can send {"action": "subscribe" | "unsubscribe", "session_ids": [...]}
+    """
+    await websocket.accept()
+    subscription = risk_update_broker.subscribe(
+        [sid for sid in session_ids.split(",") if sid] if session_ids else None
     )
-    print("✅ Device Fingerprinting Engine loaded successfully")
-except Exception as e:
-    print(f"⚠️  Warning: Could not load Device Fingerprinting Engine - {e}")
-    # Create stub classes
-    class DeviceFingerprintingEngine:
-        def __init__(self): pass
-        def generate_device_signature(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_virtual_machines(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def analyze_hardware_characteristics(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def track_device_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class EnvironmentAnalyzer:
-        def __init__(self): pass
-        def analyze_browser_fingerprint(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_automation_tools(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def monitor_network_characteristics(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def track_timezone_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    class SessionIntegrityMonitor:
-        def __init__(self): pass
-        def monitor_session_continuity(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def detect_session_manipulation(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def validate_session_authenticity(self, *args, **kwargs): return {"error": "Module not loaded"}
-        def track_session_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
-    
-    device_fingerprinting_engine = DeviceFingerprintingEngine()
-    environment_analyzer = EnvironmentAnalyzer()
-    session_integrity_monitor = SessionIntegrityMonitor()
+
+    async def receive_commands():
+        while True:
+            command = await websocket.receive_json()
+            ids = command.get("session_ids", [])
+            if command.get("action") == "subscribe":
+                subscription.subscribe_sessions(ids)
+            elif command.get("action") == "unsubscribe":
+                subscription.unsubscribe_sessions(ids)
+
+    receiver = asyncio.create_task(receive_commands())
+    try:
+        while True:
+            next_message = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({next_message, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                # Client disconnected (or sent something that is not JSON)
+                next_message.cancel()
+                break
+            await websocket.send_text(json.dumps(next_message.result(), default=str))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logging.warning(f"Risk update WebSocket closed: {str(e)}")
+    finally:
+        subscription.close()
+        receiver.cancel()
+
+@api_router.get("/admin/risk-updates/stats")
+async def get_risk_update_stats():
+    """Scheduler (dirty sessions, coalescing, recomputations) and fan-out statistics"""
+    stats = {"broker": risk_update_broker.get_stats(), "calculator_loaded": engine_registry.is_loaded("real_time_risk_calculator")}
+    if stats["calculator_loaded"]:
+        stats.update(real_time_risk_calculator.get_continuous_update_stats())
+    return {"success": True, "stats": stats, "timestamp": datetime.utcnow().isoformat()}
+
+risk_update_relay: Optional[MongoChangeStreamRelay] = None
+
+@app.on_event("startup")
+async def startup_risk_update_relay():
+    """Multi-worker fan-out of risk updates through a change stream (needs a replica set)"""
+    global risk_update_relay
+    if os.environ.get('RISK_UPDATES_CHANGE_STREAM', 'false').lower() == 'true':
+        risk_update_relay = MongoChangeStreamRelay(db.risk_update_events)
+        risk_update_relay.start(risk_update_broker)
+
+@app.on_event("shutdown")
+async def shutdown_risk_updates():
+    if engine_registry.is_loaded("real_time_risk_calculator"):
+        real_time_risk_calculator.stop_continuous_updates()
+    if risk_update_relay is not None:
+        await risk_update_relay.stop()
+
+# ===== MODULE 3: ADVANCED SESSION FINGERPRINTING SYSTEM ENDPOINTS =====
+
+# Device Fingerprinting Engine (loaded on first use)
+def _load_session_fingerprinting():
+    try:
+        from session_fingerprinting_engine import (
+            device_fingerprinting_engine,
+            environment_analyzer,
+            session_integrity_monitor
+        )
+        device_fingerprinting_engine.attach_storage(db)
+        session_integrity_monitor.attach_storage(db)
+        print("✅ Device Fingerprinting Engine loaded successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load Device Fingerprinting Engine - {e}")
+        # Create stub classes
+        class DeviceFingerprintingEngine:
+            def __init__(self): pass
+            def generate_device_signature(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_virtual_machines(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def analyze_hardware_characteristics(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def track_device_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def find_similar_devices(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def load_device_state(self, *args, **kwargs): pass
+            async def flush_device_state(self, *args, **kwargs): pass
+            async def close_device_state(self): pass
+            def get_device_state_stats(self): return []
+
+        class EnvironmentAnalyzer:
+            def __init__(self): pass
+            def analyze_browser_fingerprint(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_automation_tools(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def monitor_network_characteristics(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def track_timezone_consistency(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def lookup_ip_reputation(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def get_ip_reputation_stats(self): return {}
+
+        class SessionIntegrityMonitor:
+            def __init__(self): pass
+            def monitor_session_continuity(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def detect_session_manipulation(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def validate_session_authenticity(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def track_session_anomalies(self, *args, **kwargs): return {"error": "Module not loaded"}
+            def record_session_events(self, *args, **kwargs): return {"error": "Module not loaded"}
+            async def load_session_state(self, *args, **kwargs): pass
+            async def flush_session_state(self, *args, **kwargs): pass
+            async def close_session_state(self): pass
+            def get_session_state_stats(self): return {}
+
+        device_fingerprinting_engine = DeviceFingerprintingEngine()
+        environment_analyzer = EnvironmentAnalyzer()
+        session_integrity_monitor = SessionIntegrityMonitor()
+
+    return {
+        "device_fingerprinting_engine": device_fingerprinting_engine,
+        "environment_analyzer": environment_analyzer,
+        "session_integrity_monitor": session_integrity_monitor
+    }
+
+engine_registry.register("session_fingerprinting", _load_session_fingerprinting)
+device_fingerprinting_engine = engine_registry.proxy("session_fingerprinting", "device_fingerprinting_engine")
+environment_analyzer = engine_registry.proxy("session_fingerprinting", "environment_analyzer")
+session_integrity_monitor = engine_registry.proxy("session_fingerprinting", "session_integrity_monitor")
+
+@app.on_event("startup")
+async def startup_device_fingerprint_indexes():
+    try:
+        await db.device_fingerprints.create_index([("device_id", 1)])
+        await db.device_fingerprints.create_index([("lsh_bands", 1)])
+    except Exception as e:
+        logging.error(f"Failed creating device fingerprint indexes: {e}")
 
 # Pydantic models for API requests
 class DeviceFingerprintRequest(BaseModel):
     device_data: Dict[str, Any]
     session_id: str
 
+class SimilarDeviceRequest(BaseModel):
+    device_data: Dict[str, Any]
+    threshold: float = 0.5
+    limit: int = 10
+
 class DeviceTrackingRequest(BaseModel):
     device_id: str
     current_signature: Dict[str, Any]
+    user_id: Optional[str] = None
 
 class BrowserFingerprintRequest(BaseModel):
     browser_data: Dict[str, Any]
@@ -20295,6 +19230,9 @@ class TimezoneAnalysisRequest(BaseModel):
     timezone_data: Dict[str, Any]
     session_id: str
 
+class IPReputationLookupRequest(BaseModel):
+    ip_addresses: List[str] = Field(..., min_length=1, max_length=10000)
+
 class SessionContinuityRequest(BaseModel):
     session_data: Dict[str, Any]
     session_id: str
@@ -20311,6 +19249,10 @@ class SessionAnomalyRequest(BaseModel):
     session_data: Dict[str, Any]
     session_id: str
 
+class SessionEventStreamRequest(BaseModel):
+    session_id: str
+    events: List[Dict[str, Any]] = Field(..., min_length=1, max_length=10000)
+
 @api_router.post("/session-fingerprinting/generate-device-signature")
 async def generate_device_signature(request: DeviceFingerprintRequest):
     """
@@ -20371,7 +19313,10 @@ async def generate_device_signature(request: DeviceFingerprintRequest):
                 "persistence_tracking": result['persistence_tracking'],
                 "signature_version": result['signature_version'],
                 "created_at": datetime.utcnow(),
-                "device_data_hash": hashlib.sha256(json.dumps(request.device_data, sort_keys=True).encode()).hexdigest()[:16]
+                "device_data_hash": hashlib.sha256(json.dumps(request.device_data, sort_keys=True).encode()).hexdigest()[:16],
+                # MinHash signature and LSH band keys for cross-worker near-match lookup
+                "minhash": result.get('similarity_signature', {}).get('minhash', []),
+                "lsh_bands": result.get('similarity_signature', {}).get('lsh_bands', [])
             }
             
             # Insert into device_fingerprints collection
@@ -20390,6 +19335,61 @@ async def generate_device_signature(request: DeviceFingerprintRequest):
         logging.error(f"Error generating device signature: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Device signature generation failed: {str(e)}")
 
+@api_router.post("/session-fingerprinting/find-similar-devices")
+async def find_similar_devices(request: SimilarDeviceRequest):
+    """
+    Find stored devices that are near matches of this device (e.g. same machine
+    with an updated browser) through the MinHash LSH index. Candidates from this
+    worker's in-memory index are merged with candidates sharing an LSH band in
+    device_fingerprints, so fingerprints stored by other workers are found too.
+    """
+    try:
+        result = device_fingerprinting_engine.find_similar_devices(request.device_data, request.threshold, request.limit)
+        if not result.get('success'):
+            raise HTTPException(status_code=500, detail=result.get('error', 'Similar device lookup failed'))
+        
+        matches = {match['device_id']: match['similarity'] for match in result['similar_devices']}
+        query_minhash = result['similarity_signature']['minhash']
+        query_bands = result['similarity_signature']['lsh_bands']
+        # One candidate per device (its fingerprint sharing the most bands), ranked by shared bands
+        # before truncating, so a device with many stored sessions can't crowd out the others
+        cursor = db.device_fingerprints.aggregate([
+            {"$match": {"lsh_bands": {"$in": query_bands}, "device_id": {"$ne": result['device_id']}}},
+            {"$project": {"_id": 0, "device_id": 1, "minhash": 1,
+                          "shared_bands": {"$size": {"$setIntersection": ["$lsh_bands", query_bands]}}}},
+            {"$sort": {"shared_bands": -1}},
+            {"$group": {"_id": "$device_id", "minhash": {"$first": "$minhash"}, "shared_bands": {"$first": "$shared_bands"}}},
+            {"$sort": {"shared_bands": -1}},
+            {"$limit": 256},
+            {"$project": {"_id": 0, "device_id": "$_id", "minhash": 1}}
+        ])
+        async for doc in cursor:
+            stored_minhash = doc.get('minhash') or []
+            if len(stored_minhash) != len(query_minhash):
+                continue
+            similarity = round(sum(1 for a, b in zip(stored_minhash, query_minhash) if a == b) / len(query_minhash), 4)
+            if similarity >= request.threshold:
+                matches[doc['device_id']] = max(similarity, matches.get(doc['device_id'], 0))
+        
+        known_device = result['known_device'] or await db.device_fingerprints.count_documents({"device_id": result['device_id']}, limit=1) > 0
+        similar_devices = sorted(
+            [{"device_id": device_id, "similarity": similarity} for device_id, similarity in matches.items()],
+            key=lambda match: match['similarity'], reverse=True
+        )[:request.limit]
+        
+        return {
+            "success": True,
+            "device_id": result['device_id'],
+            "known_device": known_device,
+            "similar_devices": similar_devices,
+            "index_stats": result['index_stats']
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error finding similar devices: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Similar device lookup failed: {str(e)}")
+
 @api_router.post("/session-fingerprinting/detect-virtual-machines")
 async def detect_virtual_machines(request: DeviceFingerprintRequest):
     """
@@ -20483,11 +19483,14 @@ async def track_device_consistency(request: DeviceTrackingRequest):
     try:
         logging.info(f"Tracking device consistency for device: {request.device_id}")
         
-        # Perform device consistency tracking using the engine
+        # Perform device consistency tracking using the engine (device history shared across workers)
+        await device_fingerprinting_engine.load_device_state([request.device_id])
         result = device_fingerprinting_engine.track_device_consistency(
             request.device_id, 
-            request.current_signature
+            request.current_signature,
+            user_id=request.user_id
         )
+        await device_fingerprinting_engine.flush_device_state()
         
         if result.get('success'):
             # Store device tracking results in MongoDB
@@ -20542,6 +19545,28 @@ async def track_device_consistency(request: DeviceTrackingRequest):
         logging.error(f"Error tracking device consistency: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Device tracking failed: {str(e)}")
 
+@api_router.get("/admin/device-state/stats")
+async def get_device_state_stats():
+    """Cache and write-buffer statistics of the device fingerprinting state stores"""
+    loaded = engine_registry.is_loaded("session_fingerprinting")
+    return {
+        "success": True,
+        "engine_loaded": loaded,
+        "stores": device_fingerprinting_engine.get_device_state_stats() if loaded else [],
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@api_router.get("/admin/session-state/stats")
+async def get_session_state_stats():
+    """Eviction, heartbeat and compaction statistics of the session integrity state"""
+    loaded = engine_registry.is_loaded("session_fingerprinting")
+    return {
+        "success": True,
+        "engine_loaded": loaded,
+        "session_state": session_integrity_monitor.get_session_state_stats() if loaded else {},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @api_router.get("/session-fingerprinting/device-consistency/{device_id}")
 async def get_device_consistency_history(device_id: str):
     """
@@ -20946,6 +19971,34 @@ async def track_timezone_consistency(request: TimezoneAnalysisRequest):
         logging.error(f"Error tracking timezone consistency: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Timezone consistency analysis failed: {str(e)}")
 
+@api_router.post("/session-fingerprinting/ip-reputation")
+async def lookup_ip_reputation(request: IPReputationLookupRequest):
+    """
+    Datacenter / VPN / proxy / Tor exit / blocklist categories of a batch of IPs
+    from the local reputation feeds (IPv4 and IPv6, longest and all containing prefixes)
+    """
+    try:
+        result = environment_analyzer.lookup_ip_reputation(request.ip_addresses)
+        if not result.get('success'):
+            raise HTTPException(status_code=500, detail=result.get('error', 'IP reputation lookup failed'))
+        return {"success": True, "results": result['results'], "index_version": result['index_version']}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error looking up IP reputation: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"IP reputation lookup failed: {str(e)}")
+
+@api_router.get("/admin/ip-reputation/stats")
+async def get_ip_reputation_stats():
+    """Loaded feeds, prefix counts, index version and reload status of the IP reputation index"""
+    loaded = engine_registry.is_loaded("session_fingerprinting")
+    return {
+        "success": True,
+        "engine_loaded": loaded,
+        "ip_reputation": environment_analyzer.get_ip_reputation_stats() if loaded else {},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # ===== PHASE 3.3: SESSION INTEGRITY MONITORING ENDPOINTS =====
 
 @api_router.post("/session-fingerprinting/monitor-session-continuity")
@@ -20993,6 +20046,7 @@ async def monitor_session_continuity(request: SessionContinuityRequest):
         
         # Perform session continuity analysis using the session integrity monitor
         result = session_integrity_monitor.monitor_session_continuity(request.session_data)
+        await session_integrity_monitor.flush_session_state()
         
         if result.get('success'):
             # Store session continuity analysis results in MongoDB
@@ -21057,6 +20111,8 @@ async def detect_session_manipulation(request: SessionManipulationRequest):
         logging.info(f"Starting session manipulation detection for session: {request.session_id}")
         
         # Perform session manipulation detection using the session integrity monitor
+        # (the user's active sessions on other workers are loaded for cross-session correlation)
+        await session_integrity_monitor.load_session_state([request.session_data.get('user_id', '')])
         result = session_integrity_monitor.detect_session_manipulation(request.session_data)
         
         if result.get('success'):
@@ -21205,6 +20261,7 @@ async def track_session_anomalies(request: SessionAnomalyRequest):
         
         # Perform session anomaly tracking using the session integrity monitor
         result = session_integrity_monitor.track_session_anomalies(request.session_data)
+        await session_integrity_monitor.flush_session_state()
         
         if result.get('success'):
             # Store session anomaly analysis results in MongoDB
@@ -21288,6 +20345,7 @@ async def track_multi_device_usage(request: MultiDeviceUsageRequest):
         
         # Perform multi-device usage tracking using the session integrity monitor
         result = session_integrity_monitor.track_multi_device_usage(request.session_data)
+        await session_integrity_monitor.flush_session_state()
         
         if result.get('success'):
             # Store multi-device usage analysis results in MongoDB
@@ -21316,5 +20374,32 @@ async def track_multi_device_usage(request: MultiDeviceUsageRequest):
         logging.error(f"Error tracking multi-device usage: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Multi-device usage tracking failed: {str(e)}")
 
+@api_router.post("/session-fingerprinting/record-session-events")
+async def record_session_events(request: SessionEventStreamRequest):
+    """
+    Incremental replay and synchronized-activity detection. Post a session's new
+    requests/activities as they arrive (method, path, body_hash, timestamp); each
+    call only processes the new events. New replayed sequences and cross-session
+    synchronized events are stored in session_integrity_events.
+    """
+    try:
+        result = session_integrity_monitor.record_session_events(request.session_id, request.events)
+        if not result.get('success'):
+            raise HTTPException(status_code=500, detail=result.get('error', 'Session event recording failed'))
+        
+        if result['new_duplicate_sequences'] or result['synchronized_events']:
+            await db.session_integrity_events.insert_one({
+                "session_id": request.session_id,
+                "duplicate_sequences": result['new_duplicate_sequences'],
+                "synchronized_events": result['synchronized_events'],
+                "created_at": datetime.utcnow()
+            })
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error recording session events: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Session event recording failed: {str(e)}")
+
 # Include the router in the main app after all routes are defined
 app.include_router(api_router)
\ No newline at end of file
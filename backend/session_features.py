@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Session Feature Bundle
+
+Parsed per-session features shared by the statistical anomaly analyses and the
+real-time risk calculator. Every analysis used to walk the raw response list
+itself (answer choices, response times, difficulty rows, parsed timestamps);
+a full risk evaluation repeated that parsing four or more times.
+
+Key Features:
+- SessionFeatureBundle wraps the raw session dict; each feature is computed on
+  first access and reused by every analysis in the same evaluation
+- as_feature_bundle() lets analyzer entry points accept either a session dict
+  or a bundle, so existing callers keep passing dicts
+- SessionFeatureCache keeps bundles across evaluations and rebuilds one when
+  the session's data version changes (new answers) or it is invalidated
+"""
+
+import math
+import statistics
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+import numpy as np
+
+
+def _parse_timestamp(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
+
+def data_version(session_data: Dict[str, Any]) -> Hashable:
+    """Version of a session's data: changes whenever an answer is added or the last one is revised"""
+    responses = session_data.get('responses', [])
+    if not responses:
+        return (0,)
+    last = responses[-1]
+    return (len(responses), str(last.get('question_id')), str(last.get('response')),
+            str(last.get('timestamp')), last.get('response_time'))
+
+
+class SessionFeatureBundle:
+    """Lazily computed features of one session (treat the wrapped session data as read-only)"""
+
+    def __init__(self, session_data: Dict[str, Any], version: Optional[Hashable] = None):
+        self.session_data = session_data
+        self.version = version if version is not None else data_version(session_data)
+
+    @property
+    def session_id(self) -> str:
+        return self.session_data.get('session_id', 'unknown')
+
+    @property
+    def responses(self) -> List[Dict[str, Any]]:
+        return self.session_data.get('responses', [])
+
+    @property
+    def declared_timezone(self) -> str:
+        return self.session_data.get('timezone', 'UTC')
+
+    # ----- answers -----
+
+    @cached_property
+    def answer_choices(self) -> List[Any]:
+        """Submitted answers, for responses that have one"""
+        return [response['response'] for response in self.responses if 'response' in response]
+
+    @cached_property
+    def answer_changes(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'question_id': response.get('question_id'),
+                'from': response.get('previous_response'),
+                'to': response.get('response'),
+                'change_time': response.get('change_timestamp')
+            }
+            for response in self.responses
+            if 'previous_response' in response and response.get('previous_response') != response.get('response')
+        ]
+
+    @cached_property
+    def answer_patterns(self) -> Dict[str, Any]:
+        """Answer sequence and distribution ('' for responses without an answer)"""
+        if not self.responses:
+            return {}
+        answers = [response.get('response', '') for response in self.responses]
+        counts = Counter(answers)
+        return {
+            'sequence': ''.join(answers),
+            'distribution': dict(counts),
+            'length': len(answers),
+            'unique_answers': len(counts),
+            'most_common': counts.most_common(3),
+        }
+
+    # ----- timing -----
+
+    @cached_property
+    def response_times(self) -> List[float]:
+        """response_time of every response that reports one"""
+        return [response['response_time'] for response in self.responses if 'response_time' in response]
+
+    @cached_property
+    def positive_response_times(self) -> List[float]:
+        """Response times > 0 (missing times count as 0)"""
+        return [response.get('response_time', 0) for response in self.responses if response.get('response_time', 0) > 0]
+
+    @cached_property
+    def response_time_array(self) -> np.ndarray:
+        return np.asarray(self.positive_response_times, dtype=float)
+
+    @cached_property
+    def timing_data(self) -> Dict[str, Any]:
+        """Parsed response timestamps, intervals and session duration"""
+        try:
+            responses = self.responses
+            session_start = self.session_data.get('session_start_timestamp')
+            session_end = self.session_data.get('session_end_timestamp')
+
+            timestamps = []
+            response_intervals = []
+            for i, response in enumerate(responses):
+                if 'timestamp' in response:
+                    timestamp = response['timestamp']
+                    if isinstance(timestamp, str):
+                        try:
+                            timestamp = _parse_timestamp(timestamp)
+                        except ValueError:
+                            timestamp = datetime.utcnow()
+                    timestamps.append(timestamp)
+
+                    # Intervals between responses
+                    if i > 0 and len(timestamps) > 1:
+                        response_intervals.append((timestamps[-1] - timestamps[-2]).total_seconds())
+
+            total_duration_minutes = 0
+            if session_start and session_end:
+                session_start = _parse_timestamp(session_start)
+                session_end = _parse_timestamp(session_end)
+                total_duration_minutes = (session_end - session_start).total_seconds() / 60
+            elif timestamps:
+                total_duration_minutes = (timestamps[-1] - timestamps[0]).total_seconds() / 60
+
+            return {
+                'timestamps': timestamps,
+                'session_start': session_start,
+                'session_end': session_end,
+                'total_duration_minutes': total_duration_minutes,
+                'response_intervals': response_intervals,
+                'average_interval': statistics.mean(response_intervals) if response_intervals else 0,
+                'total_responses': len(responses)
+            }
+        except Exception:
+            return {'timestamps': [], 'session_start': None, 'session_end': None, 'total_duration_minutes': 0}
+
+    # ----- correctness and difficulty -----
+
+    @cached_property
+    def correctness(self) -> np.ndarray:
+        """1/0 per response (missing is_correct counts as incorrect)"""
+        return np.fromiter((1 if response.get('is_correct', False) else 0 for response in self.responses),
+                           dtype=np.int8, count=len(self.responses))
+
+    @cached_property
+    def difficulty_data(self) -> List[Dict[str, Any]]:
+        """Rows for responses that have both a difficulty and is_correct"""
+        return [
+            {
+                'question_id': response.get('question_id'),
+                'difficulty': float(response['difficulty']),
+                'is_correct': bool(response['is_correct']),
+                'response_time': response.get('response_time', 0),
+                'topic': response.get('topic', 'unknown')
+            }
+            for response in self.responses
+            if 'difficulty' in response and 'is_correct' in response
+        ]
+
+    @cached_property
+    def difficulty_sequence(self) -> np.ndarray:
+        """Difficulty per response (0.5 where missing)"""
+        return np.asarray([response.get('difficulty', 0.5) for response in self.responses], dtype=float)
+
+    @cached_property
+    def clustering_features(self) -> Optional[List[float]]:
+        """[accuracy, mean time, time std, answer entropy, mean difficulty] for cross-session clustering"""
+        if not self.responses:
+            return None
+        times = self.positive_response_times
+        counts = Counter(response.get('response', '') for response in self.responses)
+        total = len(self.responses)
+        entropy = -sum((count / total) * math.log2(count / total) for count in counts.values() if count > 0)
+        return [
+            float(self.correctness.mean()),
+            statistics.mean(times) if times else 0,
+            statistics.stdev(times) if len(times) > 1 else 0,
+            entropy,
+            statistics.mean(self.difficulty_sequence.tolist()),
+        ]
+
+
+SessionInput = Union[Dict[str, Any], SessionFeatureBundle]
+
+
+def as_feature_bundle(session: SessionInput) -> SessionFeatureBundle:
+    return session if isinstance(session, SessionFeatureBundle) else SessionFeatureBundle(session)
+
+
+class SessionFeatureCache:
+    """
+    Bundles for recently evaluated sessions (LRU, max_sessions). get() reuses
+    the cached bundle while the session's data version is unchanged.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self._bundles: "OrderedDict[str, SessionFeatureBundle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_data: Dict[str, Any], version: Optional[Hashable] = None) -> SessionFeatureBundle:
+        session_id = session_data.get('session_id', 'unknown')
+        version = version if version is not None else data_version(session_data)
+        with self._lock:
+            bundle = self._bundles.get(session_id)
+            if bundle is not None and bundle.version == version:
+                self._bundles.move_to_end(session_id)
+                self.hits += 1
+                return bundle
+            self.misses += 1
+            bundle = SessionFeatureBundle(session_data, version)
+            self._bundles[session_id] = bundle
+            self._bundles.move_to_end(session_id)
+            while len(self._bundles) > self.max_sessions:
+                self._bundles.popitem(last=False)
+            return bundle
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._bundles.pop(session_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'cached_sessions': len(self._bundles),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -25,11 +25,19 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 import asyncio
 import statistics
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import re
+import ipaddress
 import base64
 import zlib
 
+from device_similarity import DeviceSimilarityIndex, band_keys, canonical_features, device_digest
+from device_state_store import DeviceStateStore
+from ip_reputation import ANONYMIZER_CATEGORIES, IPReputation, IPReputationIndex
+from session_state_store import SessionStateStore
+from replay_detection import (ReplayDetector, SynchronizedActivityTracker, find_duplicate_sequences,
+                              find_synchronized_groups, parse_activity_time, request_signature)
+
 
 @dataclass
 class DeviceFingerprint:
@@ -78,11 +86,18 @@ class DeviceFingerprintingEngine:
         self.confidence_threshold = 0.85
         self.tracking_retention_days = 365  # 1 year retention
         
-        # Device tracking data structures (in-memory storage)
-        # In production, these would be backed by MongoDB or another persistent store
-        self.device_history = {}  # device_id -> List[signature_dict]
-        self.device_sessions = {}  # device_id -> List[session_dict]
-        self.device_tracking_records = {}  # device_id -> DeviceTrackingRecord
+        # Device tracking data structures: LRU-bounded in process, durable in MongoDB once attach_storage() is called
+        self.device_history = DeviceStateStore("device_signature_history", max_items=50,
+                                               retention_days=self.tracking_retention_days)  # device_id -> List[signature_dict]
+        self.device_sessions = DeviceStateStore("device_session_history", max_items=100,
+                                                retention_days=self.tracking_retention_days)  # device_id -> List[session_dict]
+        self.device_tracking_records = DeviceStateStore("device_tracking_state", kind="record",
+                                                        retention_days=self.tracking_retention_days)  # device_id -> tracking metadata
+        self._device_state_indexes_ready = False
+        
+        # MinHash LSH index over fingerprint features for near-match lookup
+        self.similarity_index = DeviceSimilarityIndex()
+        self.similarity_threshold = 0.5
         
         # Hardware component weights for signature generation
         self.hardware_weights = {
@@ -180,7 +195,16 @@ class DeviceFingerprintingEngine:
                 'performance': performance_profile
             }
             
-            device_hash, collision_resistance_score = self._generate_collision_resistant_hash(signature_components)
+            device_features = canonical_features(signature_components)
+            device_hash, collision_resistance_score = self._generate_collision_resistant_hash(signature_components, device_features)
+            
+            # Near matches (same device with e.g. an updated browser) before indexing this fingerprint
+            known_device = device_hash in self.similarity_index
+            minhash_signature = self.similarity_index.signature_for(device_features)
+            similar_devices = self.similarity_index.query(
+                minhash_signature, threshold=self.similarity_threshold, exclude=device_hash
+            )
+            self.similarity_index.add(device_hash, minhash_signature)
             
             # 9. Calculate Confidence Score
             confidence_score = self._calculate_signature_confidence(signature_components, vm_indicators)
@@ -219,8 +243,13 @@ class DeviceFingerprintingEngine:
                     'signature_hash': device_fingerprint.signature_hash,
                     'confidence_score': device_fingerprint.confidence_score,
                     'collision_resistance_score': device_fingerprint.collision_resistance_score,
-                    'collection_timestamp': device_fingerprint.collection_timestamp.isoformat()
+                    'collection_timestamp': device_fingerprint.collection_timestamp.isoformat(),
+                    'known_device': known_device,
+                    'similar_devices': [
+                        {'device_id': similar_id, 'similarity': similarity} for similar_id, similarity in similar_devices
+                    ]
                 },
+                'similarity_signature': self._similarity_signature(minhash_signature),
                 'hardware_analysis': {
                     'hardware_signature': hardware_signature,
                     'vm_detection': vm_indicators,
@@ -438,7 +467,85 @@ class DeviceFingerprintingEngine:
                 'analysis_timestamp': datetime.utcnow().isoformat()
             }
     
-    def track_device_consistency(self, device_id: str, current_signature: Dict[str, Any]) -> Dict[str, Any]:
+    # ===== DEVICE SIMILARITY =====
+    
+    def _similarity_signature(self, minhash_signature) -> Dict[str, Any]:
+        """MinHash signature and LSH band keys in a storable form (band keys as signed 64-bit ints)"""
+        bands = band_keys(minhash_signature, self.similarity_index.bands)[0]
+        return {
+            'minhash': [int(value) for value in minhash_signature],
+            'lsh_bands': [int(key) for key in bands.view('int64')]
+        }
+    
+    def find_similar_devices(self, device_data: Dict[str, Any], threshold: Optional[float] = None,
+                             limit: int = 10) -> Dict[str, Any]:
+        """Near-match lookup for a device without registering it in the index"""
+        try:
+            signature_components = {
+                'hardware': self._generate_hardware_fingerprint(device_data.get('hardware', {})),
+                'os': self._analyze_os_characteristics(device_data.get('os', {})),
+                'browser': self._analyze_browser_characteristics(device_data.get('browser', {})),
+                'network': self._analyze_network_characteristics(device_data.get('network', {})),
+                'screen': self._analyze_screen_characteristics(device_data.get('screen', {})),
+                'performance': self._analyze_performance_profile(device_data.get('performance', {}))
+            }
+            features = canonical_features(signature_components)
+            device_hash = device_digest(features)
+            minhash_signature = self.similarity_index.signature_for(features)
+            matches = self.similarity_index.query(
+                minhash_signature,
+                threshold=self.similarity_threshold if threshold is None else threshold,
+                limit=limit,
+                exclude=device_hash
+            )
+            return {
+                'success': True,
+                'device_id': device_hash,
+                'known_device': device_hash in self.similarity_index,
+                'similar_devices': [{'device_id': similar_id, 'similarity': similarity} for similar_id, similarity in matches],
+                'similarity_signature': self._similarity_signature(minhash_signature),
+                'index_stats': self.similarity_index.get_stats()
+            }
+        except Exception as e:
+            self.logger.error(f"Error finding similar devices: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
+    # ===== DEVICE STATE STORAGE =====
+    
+    def _device_state_stores(self) -> List[DeviceStateStore]:
+        return [self.device_history, self.device_sessions, self.device_tracking_records]
+    
+    def attach_storage(self, db):
+        """Persist device state in MongoDB (one collection per store)"""
+        for store in self._device_state_stores():
+            store.attach(db[store.name])
+    
+    async def load_device_state(self, device_ids: List[str]):
+        """Refresh the given devices from storage before running synchronous analysis on them"""
+        if not self._device_state_indexes_ready:
+            self._device_state_indexes_ready = True
+            for store in self._device_state_stores():
+                await store.ensure_indexes()
+        for store in self._device_state_stores():
+            await store.hydrate(device_ids)
+    
+    async def flush_device_state(self, force: bool = False):
+        """Write buffered device updates (only once a batch is full unless force=True)"""
+        for store in self._device_state_stores():
+            if force:
+                await store.flush()
+            else:
+                await store.flush_if_due()
+    
+    async def close_device_state(self):
+        for store in self._device_state_stores():
+            await store.close()
+    
+    def get_device_state_stats(self) -> List[Dict[str, Any]]:
+        return [store.get_stats() for store in self._device_state_stores()]
+    
+    def track_device_consistency(self, device_id: str, current_signature: Dict[str, Any],
+                                 user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Track device signature evolution, hardware change detection,
         and suspicious device switching patterns
@@ -446,6 +553,7 @@ class DeviceFingerprintingEngine:
         Args:
             device_id: Unique device identifier
             current_signature: Current device signature data
+            user_id: Optional candidate/user the device is being used by
             
         Returns:
             Dict containing device consistency tracking analysis
@@ -476,7 +584,7 @@ class DeviceFingerprintingEngine:
             consistency_analysis['session_correlation'] = session_correlation
             
             # 6. Update Device Tracking Record
-            tracking_update = self._update_device_tracking_record(device_id, current_signature, consistency_analysis)
+            tracking_update = self._update_device_tracking_record(device_id, current_signature, consistency_analysis, user_id)
             
             return {
                 'success': True,
@@ -757,24 +865,16 @@ class DeviceFingerprintingEngine:
             self.logger.error(f"Error detecting VM indicators: {str(e)}")
             return {'overall_vm_probability': 0.0}
     
-    def _generate_collision_resistant_hash(self, signature_components: Dict[str, Any]) -> Tuple[str, float]:
-        """Generate collision-resistant device hash"""
+    def _generate_collision_resistant_hash(self, signature_components: Dict[str, Any],
+                                           features: Optional[List[str]] = None) -> Tuple[str, float]:
+        """Generate deterministic device hash (BLAKE2b over the canonical feature serialization)"""
         try:
-            # Create deterministic string from all components
-            component_string = json.dumps(signature_components, sort_keys=True, default=str)
-            
-            # Add timestamp microseconds for additional uniqueness
-            timestamp_component = str(datetime.utcnow().timestamp() * 1000000)
-            
-            # Create multi-layer hash
-            layer1 = hashlib.sha256(component_string.encode()).hexdigest()
-            layer2 = hashlib.sha384((layer1 + timestamp_component).encode()).hexdigest()
-            layer3 = hashlib.sha512((layer2 + component_string).encode()).hexdigest()
-            
-            # Final device hash (first 32 characters for readability)
-            device_hash = layer3[:32]
+            # Same stable characteristics -> same device id; volatile readings are excluded
+            features = features if features is not None else canonical_features(signature_components)
+            device_hash = device_digest(features)
             
             # Calculate collision resistance score based on entropy
+            component_string = "\n".join(features)
             entropy_score = self._calculate_hash_entropy(component_string)
             collision_resistance_score = min(1.0, entropy_score / 10.0)
             
@@ -2441,7 +2541,7 @@ class DeviceFingerprintingEngine:
             
             if not historical_signatures:
                 # First time seeing this device
-                self.device_history[device_id] = [current_signature]
+                self.device_history.append(device_id, current_signature)
                 return {
                     'signature_changes': 0,
                     'stability_score': 1.0,
@@ -2456,11 +2556,8 @@ class DeviceFingerprintingEngine:
             last_signature = historical_signatures[-1]
             changes_detected = self._compare_signatures(last_signature, current_signature)
             
-            # Add current signature to history (keep last 50 signatures)
-            historical_signatures.append(current_signature)
-            if len(historical_signatures) > 50:
-                historical_signatures.pop(0)
-            self.device_history[device_id] = historical_signatures
+            # Add current signature to history (store keeps the last 50 signatures)
+            historical_signatures = self.device_history.append(device_id, current_signature)
             
             # Calculate evolution metrics
             signature_changes = len(changes_detected['changed_fields'])
@@ -2841,7 +2938,8 @@ class DeviceFingerprintingEngine:
             }
     
     def _update_device_tracking_record(self, device_id: str, current_signature: Dict[str, Any], 
-                                     consistency_analysis: Dict[str, Any]) -> Dict[str, Any]:
+                                     consistency_analysis: Dict[str, Any],
+                                     user_id: Optional[str] = None) -> Dict[str, Any]:
         """Update device tracking record with new data"""
         try:
             # Update device session history
@@ -2850,21 +2948,16 @@ class DeviceFingerprintingEngine:
                 'timestamp': current_time,
                 'signature': current_signature,
                 'consistency_score': consistency_analysis.get('reputation_score', 0.5),
-                'session_id': str(uuid.uuid4())
+                'session_id': str(uuid.uuid4()),
+                'user_id': user_id
             }
             
-            if device_id not in self.device_sessions:
-                self.device_sessions[device_id] = []
-            
-            self.device_sessions[device_id].append(session_entry)
-            
-            # Keep only last 100 sessions per device
-            if len(self.device_sessions[device_id]) > 100:
-                self.device_sessions[device_id] = self.device_sessions[device_id][-100:]
+            # Store keeps only the last 100 sessions per device
+            device_sessions = self.device_sessions.append(device_id, session_entry, user_id)
             
             # Calculate tracking statistics
-            total_sessions = len(self.device_sessions[device_id])
-            first_seen = self.device_sessions[device_id][0]['timestamp'] if self.device_sessions[device_id] else current_time
+            total_sessions = len(device_sessions)
+            first_seen = device_sessions[0]['timestamp'] if device_sessions else current_time
             device_age_days = (current_time - first_seen).days
             
             # Update device tracking metadata
@@ -2878,6 +2971,7 @@ class DeviceFingerprintingEngine:
                 'consistency_trend': self._calculate_consistency_trend(device_id),
                 'risk_level_history': self._get_risk_level_history(device_id)
             }
+            self.device_tracking_records.set(device_id, tracking_metadata, user_id)
             
             return {
                 'record_updated': True,
@@ -4031,9 +4125,13 @@ class EnvironmentAnalyzer:
     to identify sophisticated evasion techniques and fraudulent session behavior.
     """
     
-    def __init__(self):
+    def __init__(self, ip_reputation: Optional[IPReputationIndex] = None):
         self.logger = logging.getLogger(__name__)
         
+        # Datacenter / VPN / Tor / blocklist prefixes from local feeds
+        self.ip_reputation = ip_reputation or IPReputationIndex()
+        self._last_ip_reputation: Optional[Tuple[str, IPReputation]] = None
+        
         # Browser fingerprinting patterns and signatures
         self.browser_patterns = {
             'user_agent_inconsistencies': [
@@ -5459,7 +5557,8 @@ class EnvironmentAnalyzer:
                     'blacklist_status': self._check_ip_blacklists(ip_address),
                     'threat_indicators': self._identify_threat_indicators(ip_address),
                     'ip_type': self._classify_ip_address_type(ip_address),
-                    'reputation_sources': ['builtin_patterns', 'heuristic_analysis']
+                    'feed_categories': list(self._lookup_ip_reputation(ip_address).categories),
+                    'reputation_sources': ['ip_reputation_feeds', 'heuristic_analysis']
                 }
             }
             
@@ -5511,10 +5610,14 @@ class EnvironmentAnalyzer:
             if self._has_suspicious_ip_pattern(ip_address):
                 reputation_score -= 0.4
             
-            # Check for known hosting/datacenter ranges (heuristic)
+            # Check for known hosting/datacenter ranges
             if self._is_likely_datacenter_ip(ip_address):
                 reputation_score -= 0.2
             
+            # Check for VPN, proxy and Tor exit ranges
+            if ANONYMIZER_CATEGORIES.intersection(self._lookup_ip_reputation(ip_address).categories):
+                reputation_score -= 0.3
+            
             return max(0.0, min(1.0, reputation_score))
             
         except Exception as e:
@@ -5545,43 +5648,67 @@ class EnvironmentAnalyzer:
         except Exception:
             return False
     
+    def lookup_ip_reputation(self, ip_addresses: List[str]) -> Dict[str, Any]:
+        """Feed categories, matched prefixes and reputation penalty for a batch of IPs"""
+        try:
+            results = self.ip_reputation.lookup_many(ip_addresses)
+            return {
+                'success': True,
+                'results': [result.to_dict() for result in results],
+                'index_version': self.ip_reputation.snapshot.version
+            }
+        except Exception as e:
+            self.logger.error(f"Error looking up IP reputation: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
+    def get_ip_reputation_stats(self) -> Dict[str, Any]:
+        return self.ip_reputation.get_stats()
+    
+    def _lookup_ip_reputation(self, ip_address: str) -> IPReputation:
+        """Feed lookup for an IP (the checks of one analysis share the last result)"""
+        cached = self._last_ip_reputation
+        if cached is not None and cached[0] == ip_address and cached[1].index_version == self.ip_reputation.snapshot.version:
+            return cached[1]
+        reputation = self.ip_reputation.lookup(ip_address)
+        self._last_ip_reputation = (ip_address, reputation)
+        return reputation
+    
     def _has_suspicious_ip_pattern(self, ip_address: str) -> bool:
-        """Check for suspicious IP address patterns"""
+        """Check for unroutable special addresses and blocklisted ranges"""
         try:
-            # Simple heuristic checks
-            suspicious_patterns = [
-                '0.0.0.0', '255.255.255.255', '127.0.0.1'
-            ]
+            address = ipaddress.ip_address(ip_address.strip())
+            if address.is_unspecified or address.is_loopback or address.is_multicast or address.is_reserved:
+                return True
             
-            return ip_address in suspicious_patterns
+            return self._lookup_ip_reputation(ip_address).has('blocklist')
             
         except Exception:
             return False
     
     def _is_likely_datacenter_ip(self, ip_address: str) -> bool:
-        """Heuristic to identify likely datacenter/hosting IPs"""
+        """Check whether the IP is in a datacenter/hosting range from the feeds"""
         try:
-            # Simple heuristic: certain ranges often used by cloud providers
-            parts = ip_address.split('.')
-            if len(parts) != 4:
-                return False
-            
-            first = int(parts[0])
-            
-            # Common cloud provider ranges (simplified heuristic)
-            cloud_ranges = [52, 54, 3, 13, 35, 34, 104, 108, 142, 146, 162, 185]
-            
-            return first in cloud_ranges
-            
+            return self._lookup_ip_reputation(ip_address).has('datacenter')
         except Exception:
             return False
     
     def _check_ip_blacklists(self, ip_address: str) -> Dict[str, Any]:
-        """Check IP against simulated blacklists"""
+        """Check IP against the local blocklist and anonymizer feeds"""
+        reputation = self._lookup_ip_reputation(ip_address)
+        if reputation.has('blocklist'):
+            threat_level = 'HIGH'
+        elif ANONYMIZER_CATEGORIES.intersection(reputation.categories):
+            threat_level = 'MEDIUM'
+        else:
+            threat_level = 'LOW'
+        
         return {
-            'blacklisted': False,
-            'sources_checked': ['heuristic_patterns'],
-            'threat_level': 'LOW',
+            'blacklisted': reputation.has('blocklist'),
+            'categories': list(reputation.categories),
+            'matched_prefixes': list(reputation.matched_prefixes),
+            'sources_checked': sorted(self.ip_reputation.snapshot.feeds),
+            'index_version': reputation.index_version,
+            'threat_level': threat_level,
             'last_check': datetime.utcnow().isoformat()
         }
     
@@ -5595,6 +5722,14 @@ class EnvironmentAnalyzer:
         if self._is_likely_datacenter_ip(ip_address):
             indicators.append('datacenter_hosting_range')
         
+        categories = self._lookup_ip_reputation(ip_address).categories
+        if 'tor_exit' in categories:
+            indicators.append('tor_exit_node')
+        if 'vpn' in categories:
+            indicators.append('vpn_range')
+        if 'proxy' in categories:
+            indicators.append('proxy_range')
+        
         return indicators
     
     def _classify_ip_address_type(self, ip_address: str) -> str:
@@ -5602,6 +5737,8 @@ class EnvironmentAnalyzer:
         try:
             if self._is_private_ip(ip_address):
                 return 'private'
+            elif ANONYMIZER_CATEGORIES.intersection(self._lookup_ip_reputation(ip_address).categories):
+                return 'anonymizer'
             elif self._is_likely_datacenter_ip(ip_address):
                 return 'datacenter'
             else:
@@ -5755,8 +5892,18 @@ class EnvironmentAnalyzer:
                 detection_result['tor_detected'] = True
                 detection_result['tor_indicators'] = ['routing_anomalies', 'hop_patterns']
             
+            # Proxy, VPN and Tor exit lists are direct evidence
+            feed_categories = self._lookup_ip_reputation(network_data.get('ip_address', '')).categories
+            for category, detected_key, indicators_key in (('proxy', 'proxy_detected', 'proxy_indicators'),
+                                                           ('vpn', 'vpn_detected', 'vpn_indicators'),
+                                                           ('tor_exit', 'tor_detected', 'tor_indicators')):
+                if category in feed_categories:
+                    detection_result[detected_key] = True
+                    detection_result[indicators_key] = list(detection_result[indicators_key]) + ['ip_reputation_feed']
+            feed_confidence = 0.9 if ANONYMIZER_CATEGORIES.intersection(feed_categories) else 0.0
+            
             # Overall anonymity assessment
-            detection_result['detection_confidence'] = max(proxy_confidence, vpn_confidence, tor_confidence)
+            detection_result['detection_confidence'] = max(proxy_confidence, vpn_confidence, tor_confidence, feed_confidence)
             
             if detection_result['tor_detected']:
                 detection_result['anonymity_level'] = 'CRITICAL'
@@ -6626,14 +6773,92 @@ class SessionIntegrityMonitor:
             }
         }
         
-        # Session tracking data structures (in-memory for this implementation)
-        self.active_sessions = {}  # session_id -> session_data
-        self.session_history = {}  # session_id -> List[activity_record]
-        self.user_sessions = {}  # user_id -> List[session_id]
-        self.session_anomalies = {}  # session_id -> List[anomaly_record]
+        # Session tracking state: ring-buffered and idle-evicted in process, shared across
+        # workers (heartbeats) and compacted into MongoDB summaries once attach_storage() is called
+        self.session_state = SessionStateStore()
+        
+        # Incremental replay / synchronized-activity detection for streamed session events
+        self.sync_window_seconds = 30
+        self.max_replay_sessions = 10000
+        self.replay_detectors: "OrderedDict[str, ReplayDetector]" = OrderedDict()  # session_id -> detector (LRU)
+        self.activity_tracker = SynchronizedActivityTracker(self.sync_window_seconds)
         
         self.logger.info("SessionIntegrityMonitor initialized successfully")
     
+    def attach_storage(self, db):
+        """Share active sessions and compact session history in MongoDB"""
+        self.session_state.attach(db.integrity_active_sessions, db.session_integrity_summaries)
+    
+    async def load_session_state(self, user_ids: List[str]):
+        """Load the users' active sessions from other workers before running synchronous analysis"""
+        await self.session_state.hydrate_users(user_ids)
+    
+    async def flush_session_state(self, force: bool = False):
+        """Write buffered heartbeats and summaries (only once a batch is full unless force=True)"""
+        if force:
+            await self.session_state.flush()
+        else:
+            await self.session_state.flush_if_due()
+    
+    async def close_session_state(self):
+        await self.session_state.close()
+    
+    def get_session_state_stats(self) -> Dict[str, Any]:
+        return self.session_state.get_stats()
+    
+    def record_session_events(self, session_id: str, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Incremental replay and synchronized-activity detection as events arrive.
+        Requests (method/path/body_hash) extend the session's rolling-hash replay
+        detector; timestamped events are joined against other sessions' events
+        within sync_window_seconds. Each call only processes the new events.
+        """
+        try:
+            detector = self.replay_detectors.get(session_id)
+            if detector is None:
+                detector = self.replay_detectors[session_id] = ReplayDetector()
+                while len(self.replay_detectors) > self.max_replay_sessions:
+                    self.replay_detectors.popitem(last=False)
+            self.replay_detectors.move_to_end(session_id)
+            
+            new_runs = []
+            synchronized_events = []
+            for event in events:
+                if 'method' in event or 'path' in event:
+                    run = detector.add(request_signature(event))
+                    if run is not None and run['sequence_length'] == detector.sequence_length:
+                        new_runs.append(run)
+                
+                moment = parse_activity_time(event.get('timestamp'))
+                if moment is not None:
+                    other_sessions = self.activity_tracker.add(session_id, moment)
+                    if other_sessions:
+                        synchronized_events.append({
+                            'timestamp': event.get('timestamp'),
+                            'synchronized_sessions': other_sessions
+                        })
+            
+            return {
+                'success': True,
+                'session_id': session_id,
+                'events_processed': len(events),
+                'requests_seen': detector.position,
+                'replay_detected': len(detector.duplicate_runs) > 0,
+                'new_duplicate_sequences': new_runs,
+                'duplicate_sequence_count': len(detector.duplicate_runs),
+                'synchronized_events': synchronized_events,
+                'synchronized_sessions': sorted({other for event in synchronized_events for other in event['synchronized_sessions']}),
+                'analysis_timestamp': datetime.utcnow().isoformat()
+            }
+        
+        except Exception as e:
+            self.logger.error(f"Error recording session events: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'analysis_timestamp': datetime.utcnow().isoformat()
+            }
+    
     def monitor_session_continuity(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         🔍 MONITOR SESSION CONTINUITY
@@ -8540,31 +8765,16 @@ class SessionIntegrityMonitor:
     def _update_session_tracking(self, session_id: str, session_data: Dict[str, Any], analysis_result: Dict[str, Any]):
         """Update session tracking data structures"""
         try:
-            # Update active sessions
-            self.active_sessions[session_id] = {
-                'session_data': session_data,
-                'last_analysis': analysis_result,
-                'last_update': datetime.utcnow()
-            }
+            # Update active sessions (also maps the session to its user)
+            self.session_state.touch_session(session_id, session_data, analysis_result)
             
             # Update session history
-            if session_id not in self.session_history:
-                self.session_history[session_id] = []
-            
-            self.session_history[session_id].append({
+            self.session_state.append_history(session_id, {
                 'timestamp': datetime.utcnow(),
                 'continuity_score': analysis_result.get('continuity_score', 0.5),
                 'risk_level': analysis_result.get('risk_assessment', {}).get('risk_level', 'MEDIUM')
             })
             
-            # Update user sessions mapping
-            user_id = session_data.get('user_id', '')
-            if user_id:
-                if user_id not in self.user_sessions:
-                    self.user_sessions[user_id] = []
-                if session_id not in self.user_sessions[user_id]:
-                    self.user_sessions[user_id].append(session_id)
-            
         except Exception as e:
             self.logger.error(f"Error updating session tracking: {str(e)}")
     
@@ -8685,34 +8895,9 @@ class SessionIntegrityMonitor:
             return {'error': str(e), 'threat_score': 0.0}
     
     def _find_duplicate_request_sequences(self, request_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Find duplicate request sequences indicating replay attacks"""
+        """Find replayed request sequences (runs of 3+ requests repeating an earlier run) in linear time"""
         try:
-            duplicates = []
-            
-            # Simple duplicate detection - compare request signatures
-            request_signatures = []
-            for request in request_history:
-                signature = f"{request.get('method', '')}:{request.get('path', '')}:{request.get('body_hash', '')}"
-                request_signatures.append(signature)
-            
-            # Find exact duplicate sequences of length 3 or more
-            sequence_length = 3
-            for i in range(len(request_signatures) - sequence_length + 1):
-                sequence = request_signatures[i:i + sequence_length]
-                
-                # Look for this sequence later in the history
-                for j in range(i + sequence_length, len(request_signatures) - sequence_length + 1):
-                    compare_sequence = request_signatures[j:j + sequence_length]
-                    
-                    if sequence == compare_sequence:
-                        duplicates.append({
-                            'original_start': i,
-                            'duplicate_start': j,
-                            'sequence_length': sequence_length,
-                            'sequence': sequence
-                        })
-            
-            return duplicates
+            return find_duplicate_sequences([request_signature(request) for request in request_history])
             
         except Exception:
             return []
@@ -8988,9 +9173,8 @@ class SessionIntegrityMonitor:
             if not user_id:
                 return analysis
             
-            # Get user's other sessions
-            user_sessions = self.user_sessions.get(user_id, [])
-            active_sessions = [sid for sid in user_sessions if sid in self.active_sessions]
+            # Get user's active sessions, including those heartbeated by other workers
+            active_sessions = self.session_state.active_sessions_for_user(user_id)
             
             analysis['concurrent_sessions'] = len(active_sessions)
             
@@ -9032,8 +9216,8 @@ class SessionIntegrityMonitor:
             
             # Compare with other active sessions
             for session_id in active_sessions:
-                if session_id in self.active_sessions:
-                    other_session = self.active_sessions[session_id]['session_data']
+                other_session = self.session_state.get_session_data(session_id)
+                if other_session is not None:
                     other_device = other_session.get('device_fingerprint', {})
                     
                     if other_device:
@@ -9892,9 +10076,6 @@ class SessionIntegrityMonitor:
     def _update_anomaly_tracking(self, session_id: str, analysis_result: Dict[str, Any]):
         """Update anomaly tracking data structures"""
         try:
-            if session_id not in self.session_anomalies:
-                self.session_anomalies[session_id] = []
-            
             anomaly_record = {
                 'timestamp': datetime.utcnow(),
                 'anomaly_score': analysis_result.get('anomaly_score', 0.0),
@@ -9903,11 +10084,8 @@ class SessionIntegrityMonitor:
                 'monitoring_level': self._recommend_monitoring_level(analysis_result)
             }
             
-            self.session_anomalies[session_id].append(anomaly_record)
-            
-            # Keep only last 10 anomaly records per session
-            if len(self.session_anomalies[session_id]) > 10:
-                self.session_anomalies[session_id] = self.session_anomalies[session_id][-10:]
+            # Ring buffer of the last anomaly records per session (older ones live on in the summary)
+            self.session_state.append_anomaly(session_id, anomaly_record)
             
         except Exception as e:
             self.logger.error(f"Error updating anomaly tracking: {str(e)}")
@@ -10693,41 +10871,9 @@ class SessionIntegrityMonitor:
             return {'valid': False, 'score': 0.0, 'issues': ['validation_error']}
     
     def _detect_synchronized_activities(self, device_activity_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Detect synchronized activities across devices"""
+        """Detect activities from several devices within a 30-second window (sort + sweep)"""
         try:
-            synchronized_activities = []
-            
-            # Group activities by timestamp (within 30-second windows)
-            time_groups = {}
-            for activity in device_activity_data:
-                timestamp_str = activity.get('timestamp', '')
-                if timestamp_str:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        # Round to nearest 30-second interval
-                        rounded_timestamp = timestamp.replace(second=(timestamp.second // 30) * 30, microsecond=0)
-                        key = rounded_timestamp.isoformat()
-                        
-                        if key not in time_groups:
-                            time_groups[key] = []
-                        time_groups[key].append(activity)
-                    except Exception:
-                        continue
-            
-            # Find groups with multiple devices
-            for timestamp, activities in time_groups.items():
-                if len(activities) > 1:
-                    unique_devices = set(a.get('device_id', '') for a in activities)
-                    if len(unique_devices) > 1:
-                        synchronized_activities.append({
-                            'timestamp': timestamp,
-                            'device_count': len(unique_devices),
-                            'devices': list(unique_devices),
-                            'activities': activities,
-                            'synchronization_score': len(unique_devices) / len(activities)
-                        })
-            
-            return synchronized_activities
+            return find_synchronized_groups(device_activity_data, self.sync_window_seconds)
             
         except Exception:
             return []
@@ -10937,21 +11083,10 @@ class SessionIntegrityMonitor:
     def _update_multi_device_tracking(self, user_id: str, session_id: str, analysis_result: Dict[str, Any]):
         """Update multi-device tracking data structures"""
         try:
-            # Update user sessions tracking
-            if user_id not in self.user_sessions:
-                self.user_sessions[user_id] = []
-            
-            if session_id not in self.user_sessions[user_id]:
-                self.user_sessions[user_id].append(session_id)
-            
-            # Keep only last 20 sessions per user
-            if len(self.user_sessions[user_id]) > 20:
-                self.user_sessions[user_id] = self.user_sessions[user_id][-20:]
+            # Update user sessions tracking (the last 20 sessions per user are kept)
+            self.session_state.add_user_session(user_id, session_id)
             
             # Update session history with multi-device analysis
-            if session_id not in self.session_history:
-                self.session_history[session_id] = []
-            
             multi_device_record = {
                 'timestamp': datetime.utcnow(),
                 'analysis_type': 'multi_device_usage',
@@ -10960,7 +11095,7 @@ class SessionIntegrityMonitor:
                 'collaboration_detected': analysis_result.get('collaboration_indicators', {}).get('collaboration_detected', False)
             }
             
-            self.session_history[session_id].append(multi_device_record)
+            self.session_state.append_history(session_id, multi_device_record)
             
         except Exception as e:
             self.logger.error(f"Error updating multi-device tracking: {str(e)}")
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Bounded, Shared Session State for SessionIntegrityMonitor
+
+SessionIntegrityMonitor kept active sessions, per-session history, per-user
+session lists and anomaly records in plain dicts. They grew for every session
+ever seen, were lost on restart, and were private to one uvicorn worker, so
+cross-session checks never saw a candidate's sessions handled elsewhere.
+
+Key Features:
+- Ring-buffered per-session windows: history and anomaly records are kept in
+  fixed-size deques (SESSION_STATE_HISTORY_WINDOW / SESSION_STATE_ANOMALY_WINDOW)
+- Idle-session eviction: sessions without activity for SESSION_STATE_IDLE_SECONDS
+  are dropped, and at most SESSION_STATE_CAPACITY sessions are kept (LRU)
+- Periodic compaction: every record is folded into running per-session
+  aggregates (counts, sums, maxima, category counts) that are merged into
+  session_integrity_summaries with $inc/$max/$min, so history that falls out
+  of the ring buffer survives as a summary without being kept in memory
+- Cross-worker visibility: active sessions are heartbeated into a shared
+  integrity_active_sessions collection (TTL index on expires_at); other
+  workers hydrate a user's active sessions from it before correlating
+- Writes are buffered and flushed in unordered bulk_writes by a background task
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from bson.errors import InvalidDocument
+from pymongo import UpdateOne
+
+from counter_documents import field_key
+
+SESSION_STATE_CAPACITY = int(os.environ.get("SESSION_STATE_CAPACITY", "10000"))
+SESSION_STATE_IDLE_SECONDS = float(os.environ.get("SESSION_STATE_IDLE_SECONDS", "1800"))
+SESSION_STATE_HISTORY_WINDOW = int(os.environ.get("SESSION_STATE_HISTORY_WINDOW", "50"))
+SESSION_STATE_ANOMALY_WINDOW = int(os.environ.get("SESSION_STATE_ANOMALY_WINDOW", "10"))
+SESSION_STATE_USER_SESSIONS = int(os.environ.get("SESSION_STATE_USER_SESSIONS", "20"))
+SESSION_STATE_HEARTBEAT_SECONDS = float(os.environ.get("SESSION_STATE_HEARTBEAT_SECONDS", "15"))
+SESSION_STATE_FLUSH_INTERVAL_SECONDS = float(os.environ.get("SESSION_STATE_FLUSH_INTERVAL_SECONDS", "5"))
+SESSION_STATE_FLUSH_BATCH = int(os.environ.get("SESSION_STATE_FLUSH_BATCH", "200"))
+SESSION_STATE_REFRESH_SECONDS = float(os.environ.get("SESSION_STATE_REFRESH_SECONDS", "5"))
+SESSION_SUMMARY_RETENTION_DAYS = int(os.environ.get("SESSION_SUMMARY_RETENTION_DAYS", "365"))
+
+
+class SummaryDelta:
+    """Running aggregate of the records appended to one stream since the last compaction"""
+
+    __slots__ = ("records", "sums", "maxima", "flags", "counts", "first_at", "last_at")
+
+    def __init__(self):
+        self.records = 0
+        self.sums: Dict[str, float] = {}
+        self.maxima: Dict[str, float] = {}
+        self.flags: Dict[str, int] = {}
+        self.counts: Dict[str, Dict[str, int]] = {}
+        self.first_at: Optional[datetime] = None
+        self.last_at: Optional[datetime] = None
+
+    def add(self, record: Dict[str, Any]):
+        self.records += 1
+        for key, value in record.items():
+            if key == "timestamp":
+                continue
+            key = field_key(key)
+            if isinstance(value, bool):
+                self.flags[key] = self.flags.get(key, 0) + int(value)
+            elif isinstance(value, (int, float)):
+                self.sums[key] = self.sums.get(key, 0.0) + value
+                self.maxima[key] = max(self.maxima.get(key, value), value)
+            elif isinstance(value, str):
+                values = self.counts.setdefault(key, {})
+                values[field_key(value)] = values.get(field_key(value), 0) + 1
+        moment = record.get("timestamp")
+        if isinstance(moment, datetime):
+            self.first_at = moment if self.first_at is None else min(self.first_at, moment)
+            self.last_at = moment if self.last_at is None else max(self.last_at, moment)
+
+    def merge(self, other: "SummaryDelta"):
+        self.records += other.records
+        for key, value in other.sums.items():
+            self.sums[key] = self.sums.get(key, 0.0) + value
+        for key, value in other.maxima.items():
+            self.maxima[key] = max(self.maxima.get(key, value), value)
+        for key, value in other.flags.items():
+            self.flags[key] = self.flags.get(key, 0) + value
+        for key, values in other.counts.items():
+            merged = self.counts.setdefault(key, {})
+            for value, count in values.items():
+                merged[value] = merged.get(value, 0) + count
+        for moment in (other.first_at, other.last_at):
+            if moment is not None:
+                self.first_at = moment if self.first_at is None else min(self.first_at, moment)
+                self.last_at = moment if self.last_at is None else max(self.last_at, moment)
+
+    def apply_to(self, prefix: str, update: Dict[str, Dict[str, Any]]):
+        """Add this delta's $inc/$max/$min operations under prefix"""
+        increments = update.setdefault("$inc", {})
+        maxima = update.setdefault("$max", {})
+        minima = update.setdefault("$min", {})
+        increments[f"{prefix}.records"] = self.records
+        for key, value in self.sums.items():
+            increments[f"{prefix}.sums.{key}"] = value
+        for key, value in self.flags.items():
+            increments[f"{prefix}.flags.{key}"] = value
+        for key, values in self.counts.items():
+            for value, count in values.items():
+                increments[f"{prefix}.counts.{key}.{value}"] = count
+        for key, value in self.maxima.items():
+            maxima[f"{prefix}.maxima.{key}"] = value
+        if self.first_at is not None:
+            minima["first_event_at"] = min(self.first_at, minima.get("first_event_at", self.first_at))
+            maxima["last_event_at"] = max(self.last_at, maxima.get("last_event_at", self.last_at))
+
+
+class SessionState:
+    """In-process state of one session"""
+
+    __slots__ = ("session_id", "user_id", "session_data", "last_analysis", "last_update", "last_seen",
+                 "history", "anomalies", "heartbeat_at")
+
+    def __init__(self, session_id: str, history_window: int, anomaly_window: int):
+        self.session_id = session_id
+        self.user_id: Optional[str] = None
+        self.session_data: Optional[Dict[str, Any]] = None   # set once the session is tracked as active
+        self.last_analysis: Optional[Dict[str, Any]] = None
+        self.last_update: Optional[datetime] = None
+        self.last_seen = time.time()
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_window)
+        self.anomalies: Deque[Dict[str, Any]] = deque(maxlen=anomaly_window)
+        self.heartbeat_at = 0.0
+
+
+class SessionStateStore:
+    """
+    Bounded session state for SessionIntegrityMonitor. Works purely in process
+    until attach() gives it the shared active-session and summary collections.
+    """
+
+    def __init__(self, capacity: int = SESSION_STATE_CAPACITY, idle_seconds: float = SESSION_STATE_IDLE_SECONDS,
+                 history_window: int = SESSION_STATE_HISTORY_WINDOW,
+                 anomaly_window: int = SESSION_STATE_ANOMALY_WINDOW,
+                 max_user_sessions: int = SESSION_STATE_USER_SESSIONS):
+        self.capacity = capacity
+        self.idle_seconds = idle_seconds
+        self.history_window = history_window
+        self.anomaly_window = anomaly_window
+        self.max_user_sessions = max_user_sessions
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.active_collection = None
+        self.summary_collection = None
+
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()   # least recently active first
+        self._user_sessions: Dict[str, "OrderedDict[str, None]"] = {}
+        # user_id -> (loaded_at, {session_id: shared active-session document}) from other workers
+        self._remote: Dict[str, Any] = {}
+        self._pending_heartbeats: Dict[str, Dict[str, Any]] = {}
+        # session_id -> {"user_id": ..., "history": SummaryDelta, "anomalies": SummaryDelta}
+        self._pending_summaries: Dict[str, Dict[str, Any]] = {}
+        self._indexes_ready = False
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"idle_evictions": 0, "capacity_evictions": 0, "heartbeats": 0, "compactions": 0,
+                      "remote_loads": 0, "flushes": 0, "flush_errors": 0}
+
+    # ----- in-process tier -----
+
+    def _state(self, session_id: str) -> SessionState:
+        """The session's state, created if needed and marked as just active"""
+        now = time.time()
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = SessionState(session_id, self.history_window, self.anomaly_window)
+        else:
+            self._sessions.move_to_end(session_id)
+        state.last_seen = now
+        self.evict_idle(now)
+        return state
+
+    def _drop(self, session_id: str):
+        state = self._sessions.pop(session_id)
+        if state.user_id:
+            self._drop_user_session(state.user_id, session_id)
+
+    def _drop_user_session(self, user_id: str, session_id: str):
+        sessions = self._user_sessions.get(user_id)
+        if sessions is not None:
+            sessions.pop(session_id, None)
+            if not sessions:
+                del self._user_sessions[user_id]
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop idle sessions and trim to capacity; their summaries stay queued for compaction"""
+        now = time.time() if now is None else now
+        evicted = 0
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_seen > self.idle_seconds:
+                self.stats["idle_evictions"] += 1
+            elif len(self._sessions) > self.capacity:
+                self.stats["capacity_evictions"] += 1
+            else:
+                break
+            self._drop(session_id)
+            evicted += 1
+        return evicted
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def touch_session(self, session_id: str, session_data: Dict[str, Any], last_analysis: Dict[str, Any]):
+        """Record the session as active with its latest data and analysis"""
+        state = self._state(session_id)
+        state.session_data = session_data
+        state.last_analysis = last_analysis
+        state.last_update = datetime.utcnow()
+        user_id = session_data.get("user_id")
+        if user_id:
+            self.add_user_session(user_id, session_id)
+        if self.active_collection is not None and state.last_seen - state.heartbeat_at >= SESSION_STATE_HEARTBEAT_SECONDS:
+            state.heartbeat_at = state.last_seen
+            self._pending_heartbeats[session_id] = {
+                "user_id": state.user_id,
+                "device_fingerprint": session_data.get("device_fingerprint", {}),
+                "last_update": state.last_update,
+                "expires_at": state.last_update + timedelta(seconds=self.idle_seconds)
+            }
+
+    def add_user_session(self, user_id: str, session_id: str):
+        """Map a session to its user (the newest max_user_sessions per user are kept)"""
+        state = self._state(session_id)
+        if state.user_id and state.user_id != user_id:
+            self._drop_user_session(state.user_id, session_id)
+        state.user_id = user_id
+        sessions = self._user_sessions.setdefault(user_id, OrderedDict())
+        sessions[session_id] = None
+        while len(sessions) > self.max_user_sessions:
+            sessions.popitem(last=False)
+
+    def append_history(self, session_id: str, record: Dict[str, Any]):
+        state = self._state(session_id)
+        state.history.append(record)
+        self._summarize(state, "history", record)
+
+    def append_anomaly(self, session_id: str, record: Dict[str, Any]):
+        state = self._state(session_id)
+        state.anomalies.append(record)
+        self._summarize(state, "anomalies", record)
+
+    def _summarize(self, state: SessionState, stream: str, record: Dict[str, Any]):
+        if self.summary_collection is None:
+            return
+        pending = self._pending_summaries.get(state.session_id)
+        if pending is None:
+            pending = self._pending_summaries[state.session_id] = {"history": SummaryDelta(), "anomalies": SummaryDelta()}
+        pending["user_id"] = state.user_id
+        pending[stream].add(record)
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        state = self._sessions.get(session_id)
+        return list(state.history) if state else []
+
+    def get_anomalies(self, session_id: str) -> List[Dict[str, Any]]:
+        state = self._sessions.get(session_id)
+        return list(state.anomalies) if state else []
+
+    def user_session_ids(self, user_id: str) -> List[str]:
+        return list(self._user_sessions.get(user_id, ()))
+
+    def is_active(self, session_id: str, now: Optional[float] = None) -> bool:
+        state = self._sessions.get(session_id)
+        now = time.time() if now is None else now
+        return state is not None and state.session_data is not None and now - state.last_seen <= self.idle_seconds
+
+    def active_sessions_for_user(self, user_id: str) -> List[str]:
+        """Active sessions of a user on this worker, then those heartbeated by other workers"""
+        now = time.time()
+        active = [session_id for session_id in self.user_session_ids(user_id) if self.is_active(session_id, now)]
+        current = datetime.utcnow()
+        for session_id, doc in self._remote.get(user_id, (0, {}))[1].items():
+            if session_id not in self._sessions and doc.get("expires_at", current) > current:
+                active.append(session_id)
+        return active
+
+    def get_session_data(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Latest session data (for sessions of other workers only the shared device fingerprint)"""
+        state = self._sessions.get(session_id)
+        if state is not None and state.session_data is not None:
+            return state.session_data
+        for _, docs in self._remote.values():
+            if session_id in docs:
+                return {"user_id": docs[session_id].get("user_id"),
+                        "device_fingerprint": docs[session_id].get("device_fingerprint", {})}
+        return None
+
+    # ----- shared tier -----
+
+    def attach(self, active_collection, summary_collection):
+        """Share active sessions and compact history through motor collections"""
+        self.active_collection = active_collection
+        self.summary_collection = summary_collection
+
+    async def ensure_indexes(self):
+        if self.active_collection is None or self._indexes_ready:
+            return
+        self._indexes_ready = True
+        try:
+            await self.active_collection.create_index([("session_id", 1)], unique=True)
+            await self.active_collection.create_index([("user_id", 1)])
+            await self.active_collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+            await self.summary_collection.create_index([("session_id", 1)], unique=True)
+            await self.summary_collection.create_index([("user_id", 1)])
+            await self.summary_collection.create_index([("expires_at", 1)], expireAfterSeconds=0)
+        except Exception as e:
+            logging.error(f"Failed creating session state indexes: {e}")
+
+    async def hydrate_users(self, user_ids: Iterable[str], force: bool = False):
+        """
+        Load the active sessions other workers heartbeated for these users
+        (skipped for users loaded within SESSION_STATE_REFRESH_SECONDS unless force=True)
+        """
+        if self.active_collection is None:
+            return
+        await self.ensure_indexes()
+        self._ensure_flusher()
+        now = time.monotonic()
+        stale = [
+            user_id for user_id in dict.fromkeys(user_ids)
+            if user_id and (force or now - self._remote.get(user_id, (-1e9,))[0] > SESSION_STATE_REFRESH_SECONDS)
+        ]
+        if not stale:
+            return
+        loaded: Dict[str, Dict[str, Any]] = {user_id: {} for user_id in stale}
+        cursor = self.active_collection.find(
+            {"user_id": {"$in": stale}, "expires_at": {"$gt": datetime.utcnow()}, "worker_id": {"$ne": self.worker_id}},
+            {"_id": 0, "session_id": 1, "user_id": 1, "device_fingerprint": 1, "last_update": 1, "expires_at": 1}
+        )
+        async for doc in cursor:
+            loaded[doc["user_id"]][doc["session_id"]] = doc
+        self.stats["remote_loads"] += 1
+        for user_id, docs in loaded.items():
+            self._remote[user_id] = (now, docs)
+        # Remote views of users that have gone quiet are not kept around
+        for user_id in [user_id for user_id, (loaded_at, _) in self._remote.items()
+                        if now - loaded_at > self.idle_seconds]:
+            del self._remote[user_id]
+
+    def _build_heartbeats(self, batch: Dict[str, Dict[str, Any]]) -> List[UpdateOne]:
+        return [
+            UpdateOne({"session_id": session_id},
+                      {"$set": {**heartbeat, "worker_id": self.worker_id},
+                       "$setOnInsert": {"session_id": session_id, "first_seen": heartbeat["last_update"]}},
+                      upsert=True)
+            for session_id, heartbeat in batch.items()
+        ]
+
+    def _build_summaries(self, batch: Dict[str, Dict[str, Any]]) -> List[UpdateOne]:
+        now = datetime.utcnow()
+        writes = []
+        for session_id, pending in batch.items():
+            update: Dict[str, Dict[str, Any]] = {
+                "$set": {"updated_at": now, "expires_at": now + timedelta(days=SESSION_SUMMARY_RETENTION_DAYS)},
+                "$setOnInsert": {"session_id": session_id},
+            }
+            if pending.get("user_id"):
+                update["$set"]["user_id"] = pending["user_id"]
+            for stream in ("history", "anomalies"):
+                if pending[stream].records:
+                    pending[stream].apply_to(stream, update)
+            update["$inc"]["compactions"] = 1
+            writes.append(UpdateOne({"session_id": session_id}, {op: fields for op, fields in update.items() if fields},
+                                    upsert=True))
+        return writes
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        return self._flush_lock
+
+    async def flush(self) -> int:
+        """Evict idle sessions, then write heartbeats and compact pending summaries"""
+        self.evict_idle()
+        if self.active_collection is None or not (self._pending_heartbeats or self._pending_summaries):
+            return 0
+        async with self._get_lock():
+            heartbeats, self._pending_heartbeats = self._pending_heartbeats, {}
+            summaries, self._pending_summaries = self._pending_summaries, {}
+            written = 0
+            try:
+                if heartbeats:
+                    await self.active_collection.bulk_write(self._build_heartbeats(heartbeats), ordered=False)
+                    self.stats["heartbeats"] += len(heartbeats)
+                    written += len(heartbeats)
+                    heartbeats = {}
+                if summaries:
+                    await self.summary_collection.bulk_write(self._build_summaries(summaries), ordered=False)
+                    self.stats["compactions"] += len(summaries)
+                    written += len(summaries)
+                self.stats["flushes"] += 1
+                return written
+            except InvalidDocument as e:
+                # Not retryable: drop the batch rather than failing every later flush
+                self.stats["flush_errors"] += 1
+                logging.error(f"Session state batch could not be encoded and was dropped: {e}")
+                return written
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                logging.error(f"Session state flush failed: {e}")
+                # Newer heartbeats win; summary deltas are merged back in front of anything queued meanwhile
+                for session_id, heartbeat in heartbeats.items():
+                    self._pending_heartbeats.setdefault(session_id, heartbeat)
+                for session_id, pending in summaries.items():
+                    newer = self._pending_summaries.get(session_id)
+                    if newer:
+                        pending["history"].merge(newer["history"])
+                        pending["anomalies"].merge(newer["anomalies"])
+                        pending["user_id"] = newer.get("user_id") or pending.get("user_id")
+                    self._pending_summaries[session_id] = pending
+                return written
+
+    async def flush_if_due(self):
+        if len(self._pending_heartbeats) + len(self._pending_summaries) >= SESSION_STATE_FLUSH_BATCH:
+            await self.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        except RuntimeError:
+            self._flusher = None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(SESSION_STATE_FLUSH_INTERVAL_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Session state flush loop error: {e}")
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "tracked_sessions": len(self._sessions),
+            "active_sessions": sum(1 for session_id in self._sessions if self.is_active(session_id)),
+            "tracked_users": len(self._user_sessions),
+            "remote_users": len(self._remote),
+            "capacity": self.capacity,
+            "idle_seconds": self.idle_seconds,
+            "pending_heartbeats": len(self._pending_heartbeats),
+            "pending_summaries": len(self._pending_summaries),
+            "persistent": self.active_collection is not None,
+            **self.stats
+        }
@@ -14,12 +14,15 @@ import statistics
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Union
 from collections import defaultdict, Counter
 import uuid
 import math
 from scipy import stats
 from scipy.stats import chi2_contingency, kstest, anderson
+from scipy.spatial.distance import pdist
+from collaboration_detector import CohortCollaborationDetector, encode_sessions, score_pairs
+from session_features import SessionFeatureBundle, SessionInput, as_feature_bundle
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -71,7 +74,7 @@ class StatisticalAnomalyAnalyzer:
         
         self.logger.info("StatisticalAnomalyAnalyzer initialized successfully")
     
-    def detect_answer_pattern_irregularities(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+    def detect_answer_pattern_irregularities(self, session_data: SessionInput) -> Dict[str, Any]:
         """
         Detect suspicious answer patterns that may indicate cheating
         
@@ -83,14 +86,16 @@ class StatisticalAnomalyAnalyzer:
         - Sequential dependencies between answers
         
         Args:
-            session_data: Session data containing responses and metadata
+            session_data: Session data containing responses and metadata (or its SessionFeatureBundle)
             
         Returns:
             Comprehensive analysis of answer pattern irregularities
         """
+        features = as_feature_bundle(session_data)
+        session_data = features.session_data
         try:
-            session_id = session_data.get('session_id', 'unknown')
-            responses = session_data.get('responses', [])
+            session_id = features.session_id
+            responses = features.responses
             
             if not responses:
                 return self._create_empty_analysis('answer_patterns', session_id, "No response data available")
@@ -98,22 +103,9 @@ class StatisticalAnomalyAnalyzer:
             self.logger.info(f"Analyzing answer patterns for session: {session_id}")
             
             # Extract answer choices
-            answer_choices = []
-            answer_changes = []
-            response_times = []
-            
-            for response in responses:
-                if 'response' in response:
-                    answer_choices.append(response['response'])
-                if 'previous_response' in response and response.get('previous_response') != response.get('response'):
-                    answer_changes.append({
-                        'question_id': response.get('question_id'),
-                        'from': response.get('previous_response'),
-                        'to': response.get('response'),
-                        'change_time': response.get('change_timestamp')
-                    })
-                if 'response_time' in response:
-                    response_times.append(response['response_time'])
+            answer_choices = features.answer_choices
+            answer_changes = features.answer_changes
+            response_times = features.response_times
             
             analysis_results = {}
             
@@ -166,7 +158,7 @@ class StatisticalAnomalyAnalyzer:
                 'error': str(e)
             }
     
-    def analyze_difficulty_progression_anomalies(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_difficulty_progression_anomalies(self, session_data: SessionInput) -> Dict[str, Any]:
         """
         Analyze performance patterns across difficulty levels to detect anomalies
         
@@ -177,14 +169,16 @@ class StatisticalAnomalyAnalyzer:
         - Statistical outliers in difficulty-accuracy correlation
         
         Args:
-            session_data: Session data with difficulty ratings and performance
+            session_data: Session data with difficulty ratings and performance (or its SessionFeatureBundle)
             
         Returns:
             Comprehensive difficulty progression anomaly analysis
         """
+        features = as_feature_bundle(session_data)
+        session_data = features.session_data
         try:
-            session_id = session_data.get('session_id', 'unknown')
-            responses = session_data.get('responses', [])
+            session_id = features.session_id
+            responses = features.responses
             
             if not responses:
                 return self._create_empty_analysis('difficulty_progression', session_id, "No response data available")
@@ -192,16 +186,7 @@ class StatisticalAnomalyAnalyzer:
             self.logger.info(f"Analyzing difficulty progression for session: {session_id}")
             
             # Extract difficulty and accuracy data
-            difficulty_data = []
-            for response in responses:
-                if 'difficulty' in response and 'is_correct' in response:
-                    difficulty_data.append({
-                        'question_id': response.get('question_id'),
-                        'difficulty': float(response['difficulty']),
-                        'is_correct': bool(response['is_correct']),
-                        'response_time': response.get('response_time', 0),
-                        'topic': response.get('topic', 'unknown')
-                    })
+            difficulty_data = features.difficulty_data
             
             if len(difficulty_data) < 3:
                 return self._create_empty_analysis('difficulty_progression', session_id, "Insufficient difficulty data")
@@ -261,7 +246,7 @@ class StatisticalAnomalyAnalyzer:
                 'error': str(e)
             }
     
-    def identify_time_zone_manipulation(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+    def identify_time_zone_manipulation(self, session_data: SessionInput) -> Dict[str, Any]:
         """
         Identify suspicious timing patterns that may indicate time zone manipulation
         
@@ -272,19 +257,20 @@ class StatisticalAnomalyAnalyzer:
         - Coordination with other time zones
         
         Args:
-            session_data: Session data with timestamps and location information
+            session_data: Session data with timestamps and location information (or its SessionFeatureBundle)
             
         Returns:
             Comprehensive time zone manipulation analysis
         """
+        features = as_feature_bundle(session_data)
+        session_data = features.session_data
         try:
-            session_id = session_data.get('session_id', 'unknown')
-            responses = session_data.get('responses', [])
+            session_id = features.session_id
             
             self.logger.info(f"Analyzing timing patterns for session: {session_id}")
             
             # Extract timing data
-            timing_data = self._extract_timing_data(session_data)
+            timing_data = features.timing_data
             
             if not timing_data['timestamps']:
                 return self._create_empty_analysis('timezone_manipulation', session_id, "No timing data available")
@@ -292,7 +278,7 @@ class StatisticalAnomalyAnalyzer:
             analysis_results = {}
             
             # 1. Time Zone Consistency Analysis
-            timezone_analysis = self._analyze_timezone_consistency(timing_data, session_data)
+            timezone_analysis = self._analyze_timezone_consistency(timing_data, features)
             analysis_results['timezone_analysis'] = timezone_analysis
             
             # 2. Unusual Hour Detection
@@ -308,7 +294,7 @@ class StatisticalAnomalyAnalyzer:
             analysis_results['duration_analysis'] = duration_analysis
             
             # 5. Cross-Reference with Expected Patterns
-            expected_pattern_analysis = self._compare_with_expected_timing_patterns(timing_data, session_data)
+            expected_pattern_analysis = self._compare_with_expected_timing_patterns(timing_data, features)
             analysis_results['expected_pattern_analysis'] = expected_pattern_analysis
             
             # Calculate composite manipulation score
@@ -341,7 +327,7 @@ class StatisticalAnomalyAnalyzer:
                 'error': str(e)
             }
     
-    def detect_collaborative_cheating_patterns(self, session_data: Dict[str, Any], comparison_sessions: List[Dict] = None) -> Dict[str, Any]:
+    def detect_collaborative_cheating_patterns(self, session_data: SessionInput, comparison_sessions: List[SessionInput] = None) -> Dict[str, Any]:
         """
         Detect patterns suggesting collaborative cheating between multiple test-takers
         
@@ -352,15 +338,19 @@ class StatisticalAnomalyAnalyzer:
         - Statistical evidence of information sharing
         
         Args:
-            session_data: Primary session to analyze
-            comparison_sessions: Other sessions to compare against (optional)
+            session_data: Primary session to analyze (session dict or SessionFeatureBundle)
+            comparison_sessions: Other sessions to compare against (optional, dicts or bundles)
             
         Returns:
             Comprehensive collaborative cheating pattern analysis
         """
+        features = as_feature_bundle(session_data)
+        session_data = features.session_data
+        if comparison_sessions:
+            comparison_sessions = [as_feature_bundle(session) for session in comparison_sessions]
         try:
-            session_id = session_data.get('session_id', 'unknown')
-            responses = session_data.get('responses', [])
+            session_id = features.session_id
+            responses = features.responses
             
             if not responses:
                 return self._create_empty_analysis('collaborative_cheating', session_id, "No response data available")
@@ -375,7 +365,8 @@ class StatisticalAnomalyAnalyzer:
             
             # 2. Cross-Session Comparison (if comparison data available)
             if comparison_sessions:
-                cross_session_analysis = self._analyze_cross_session_similarities(session_data, comparison_sessions)
+                cross_session_analysis = self._analyze_cross_session_similarities(
+                    session_data, [comparison.session_data for comparison in comparison_sessions])
                 analysis_results['cross_session_analysis'] = cross_session_analysis
             else:
                 analysis_results['cross_session_analysis'] = {
@@ -384,15 +375,15 @@ class StatisticalAnomalyAnalyzer:
                 }
             
             # 3. Timing Coordination Analysis
-            timing_coordination_analysis = self._analyze_timing_coordination(session_data, comparison_sessions)
+            timing_coordination_analysis = self._analyze_timing_coordination(features, comparison_sessions)
             analysis_results['timing_coordination_analysis'] = timing_coordination_analysis
             
             # 4. Answer Pattern Similarity Analysis
-            pattern_similarity_analysis = self._analyze_answer_pattern_similarities(session_data, comparison_sessions)
+            pattern_similarity_analysis = self._analyze_answer_pattern_similarities(features, comparison_sessions)
             analysis_results['pattern_similarity_analysis'] = pattern_similarity_analysis
             
             # 5. Statistical Clustering Analysis
-            clustering_analysis = self._analyze_statistical_clustering(session_data, comparison_sessions)
+            clustering_analysis = self._analyze_statistical_clustering(features, comparison_sessions)
             analysis_results['clustering_analysis'] = clustering_analysis
             
             # Calculate composite collaboration score
@@ -423,7 +414,50 @@ class StatisticalAnomalyAnalyzer:
                 'analysis_type': 'collaborative_cheating_patterns',
                 'error': str(e)
             }
-    
+
+    def detect_cohort_collaboration(self, sessions: List[Dict[str, Any]], **detector_options) -> Dict[str, Any]:
+        """
+        Detect clusters of colluding test-takers across a whole cohort
+
+        Uses MinHash LSH over each session's (question, answer) pairs to pick
+        candidate pairs, scores only those pairs (answer agreement, shared wrong
+        answers, response time correlation, simultaneity) and groups flagged
+        pairs into clusters with union-find.
+
+        Args:
+            sessions: Sessions with session_id and responses
+            detector_options: CohortCollaborationDetector thresholds
+
+        Returns:
+            Cohort analysis with flagged pairs and clusters
+        """
+        try:
+            if len(sessions) < 2:
+                return {
+                    'success': False,
+                    'analysis_type': 'cohort_collaboration',
+                    'error': 'At least two sessions are required'
+                }
+
+            self.logger.info(f"Analyzing cohort collaboration across {len(sessions)} sessions")
+            max_reported_pairs = detector_options.pop('max_reported_pairs', 500)
+            results = CohortCollaborationDetector(**detector_options).detect(sessions, max_reported_pairs=max_reported_pairs)
+
+            return ensure_json_serializable({
+                'success': True,
+                'analysis_type': 'cohort_collaboration',
+                'analysis_timestamp': datetime.utcnow().isoformat(),
+                **results
+            })
+
+        except Exception as e:
+            self.logger.error(f"Error in cohort collaboration analysis: {str(e)}")
+            return {
+                'success': False,
+                'analysis_type': 'cohort_collaboration',
+                'error': str(e)
+            }
+
     # ===== HELPER METHODS FOR ANSWER PATTERN ANALYSIS =====
     
     def _analyze_answer_distribution(self, answer_choices: List[str]) -> Dict[str, Any]:
@@ -608,9 +642,8 @@ class StatisticalAnomalyAnalyzer:
             choice_to_num = {choice: i for i, choice in enumerate(sorted(answer_counts.keys()))}
             numeric_choices = [choice_to_num[choice] for choice in answer_choices]
             
-            # Test against uniform distribution
-            uniform_data = np.random.uniform(0, len(answer_counts)-1, len(answer_choices))
-            ks_stat, ks_p_value = stats.ks_2samp(numeric_choices, uniform_data)
+            # Test against the uniform CDF itself (a random reference sample made the result vary between calls)
+            ks_stat, ks_p_value = stats.kstest(numeric_choices, 'uniform', args=(0, max(len(answer_counts) - 1, 1)))
             
             return {
                 'available': True,
@@ -858,60 +891,14 @@ class StatisticalAnomalyAnalyzer:
     
     # ===== TIMING ANALYSIS HELPER METHODS =====
     
-    def _extract_timing_data(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_timing_data(self, session_data: SessionInput) -> Dict[str, Any]:
         """Extract comprehensive timing data from session"""
-        try:
-            responses = session_data.get('responses', [])
-            session_start = session_data.get('session_start_timestamp')
-            session_end = session_data.get('session_end_timestamp')
-            
-            # Extract timestamps from responses
-            timestamps = []
-            response_intervals = []
-            
-            for i, response in enumerate(responses):
-                if 'timestamp' in response:
-                    timestamp = response['timestamp']
-                    if isinstance(timestamp, str):
-                        try:
-                            timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        except:
-                            timestamp = datetime.utcnow()
-                    timestamps.append(timestamp)
-                    
-                    # Calculate intervals between responses
-                    if i > 0 and len(timestamps) > 1:
-                        interval = (timestamps[-1] - timestamps[-2]).total_seconds()
-                        response_intervals.append(interval)
-            
-            # Calculate session duration
-            total_duration_minutes = 0
-            if session_start and session_end:
-                if isinstance(session_start, str):
-                    session_start = datetime.fromisoformat(session_start.replace('Z', '+00:00'))
-                if isinstance(session_end, str):
-                    session_end = datetime.fromisoformat(session_end.replace('Z', '+00:00'))
-                total_duration_minutes = (session_end - session_start).total_seconds() / 60
-            elif timestamps:
-                total_duration_minutes = (timestamps[-1] - timestamps[0]).total_seconds() / 60
-            
-            return {
-                'timestamps': timestamps,
-                'session_start': session_start,
-                'session_end': session_end,
-                'total_duration_minutes': total_duration_minutes,
-                'response_intervals': response_intervals,
-                'average_interval': statistics.mean(response_intervals) if response_intervals else 0,
-                'total_responses': len(responses)
-            }
-            
-        except Exception as e:
-            self.logger.warning(f"Error extracting timing data: {str(e)}")
-            return {'timestamps': [], 'session_start': None, 'session_end': None, 'total_duration_minutes': 0}
+        return as_feature_bundle(session_data).timing_data
     
-    def _analyze_timezone_consistency(self, timing_data: Dict, session_data: Dict) -> Dict[str, Any]:
+    def _analyze_timezone_consistency(self, timing_data: Dict, session_data: SessionInput) -> Dict[str, Any]:
         """Analyze timezone consistency and detect suspicious patterns"""
         try:
+            features = as_feature_bundle(session_data)
             timestamps = timing_data.get('timestamps', [])
             if not timestamps:
                 return {'consistent': True, 'anomaly_score': 0.0, 'available': False}
@@ -942,7 +929,7 @@ class StatisticalAnomalyAnalyzer:
                 anomaly_score += 0.3
             
             # Pattern 3: Inconsistent with declared timezone
-            declared_timezone = session_data.get('timezone', 'UTC')
+            declared_timezone = features.declared_timezone
             expected_active_hours = self._get_expected_active_hours(declared_timezone)
             actual_active_hours = set(hours)
             overlap = len(actual_active_hours.intersection(expected_active_hours))
@@ -1128,7 +1115,7 @@ class StatisticalAnomalyAnalyzer:
             self.logger.warning(f"Error analyzing session duration: {str(e)}")
             return {'duration_anomaly': False, 'anomaly_score': 0.0, 'available': False, 'error': str(e)}
     
-    def _compare_with_expected_timing_patterns(self, timing_data: Dict, session_data: Dict) -> Dict[str, Any]:
+    def _compare_with_expected_timing_patterns(self, timing_data: Dict, session_data: SessionInput) -> Dict[str, Any]:
         """Compare actual timing with expected patterns"""
         try:
             total_duration = timing_data.get('total_duration_minutes', 0)
@@ -1277,7 +1264,7 @@ class StatisticalAnomalyAnalyzer:
             return {'consistency_score': 0.8, 'anomalies_detected': [], 'available': False, 'error': str(e)}
     
     def _analyze_cross_session_similarities(self, session_data: Dict, comparison_sessions: Optional[List[Dict]]) -> Dict[str, Any]:
-        """Analyze similarities across sessions"""
+        """Analyze similarities across sessions (all comparison pairs scored in one vectorized pass)"""
         try:
             if not comparison_sessions:
                 return {'similarity_scores': [], 'high_similarity_detected': False, 'available': False}
@@ -1286,22 +1273,49 @@ class StatisticalAnomalyAnalyzer:
             if not current_responses:
                 return {'similarity_scores': [], 'high_similarity_detected': False, 'available': False}
             
+            comparisons = [comp for comp in comparison_sessions if comp.get('responses')]
+            if not comparisons:
+                return {'available': True, 'similarity_scores': [], 'high_similarity_detected': False,
+                        'high_similarity_pairs': [], 'total_comparisons': len(comparison_sessions)}
+            
+            encoding = encode_sessions([session_data] + comparisons)
+            right = np.arange(1, len(comparisons) + 1)
+            metrics = score_pairs(encoding, np.zeros(len(comparisons), dtype=np.int64), right)
+            
+            # Same components as _calculate_session_similarity: answer similarity only when
+            # questions overlap, timing similarity only when both sessions have response times
+            has_answers = metrics['common_questions'] > 0
+            has_timing = (encoding.mean_response_time[0] > 0) & (encoding.mean_response_time[right] > 0)
+            overall = (np.where(has_answers, metrics['answer_similarity'], 0.0) + metrics['performance_similarity']
+                       + np.where(has_timing, metrics['timing_similarity'], 0.0)) / (1 + has_answers + has_timing)
+            
             similarity_scores = []
             high_similarity_pairs = []
             
-            for comp_session in comparison_sessions:
-                comp_responses = comp_session.get('responses', [])
-                if not comp_responses:
-                    continue
+            for k, comp_session in enumerate(comparisons):
+                similar_aspects = []
+                if has_answers[k] and metrics['answer_similarity'][k] > 0.8:
+                    similar_aspects.append("High answer choice similarity")
+                if metrics['performance_similarity'][k] > 0.9:
+                    similar_aspects.append("Very similar performance levels")
+                if has_timing[k] and metrics['timing_similarity'][k] > 0.85:
+                    similar_aspects.append("Similar response timing patterns")
                 
-                # Calculate similarity metrics
-                similarity_metrics = self._calculate_session_similarity(current_responses, comp_responses)
+                similarity_metrics = {
+                    'overall_similarity': float(overall[k]),
+                    'similar_aspects': similar_aspects,
+                    'answer_similarity': float(metrics['answer_similarity'][k]),
+                    'performance_similarity': float(metrics['performance_similarity'][k]),
+                    'timing_similarity': float(metrics['timing_similarity'][k]) if has_timing[k] else 0.0,
+                    'shared_wrong_answers': int(metrics['shared_wrong_answers'][k]),
+                    'time_correlation': float(metrics['time_correlation'][k])
+                }
                 
                 if similarity_metrics['overall_similarity'] > 0.8:  # High similarity threshold
                     high_similarity_pairs.append({
                         'session_id': comp_session.get('session_id', 'unknown'),
                         'similarity_score': similarity_metrics['overall_similarity'],
-                        'similar_aspects': similarity_metrics['similar_aspects']
+                        'similar_aspects': similar_aspects
                     })
                 
                 similarity_scores.append({
@@ -1321,7 +1335,7 @@ class StatisticalAnomalyAnalyzer:
             self.logger.warning(f"Error in cross-session similarity analysis: {str(e)}")
             return {'similarity_scores': [], 'high_similarity_detected': False, 'available': False, 'error': str(e)}
     
-    def _analyze_timing_coordination(self, session_data: Dict, comparison_sessions: Optional[List[Dict]]) -> Dict[str, Any]:
+    def _analyze_timing_coordination(self, session_data: SessionInput, comparison_sessions: Optional[List[SessionInput]]) -> Dict[str, Any]:
         """Analyze timing coordination between sessions"""
         try:
             if not comparison_sessions:
@@ -1335,7 +1349,8 @@ class StatisticalAnomalyAnalyzer:
             coordination_scores = []
             
             for comp_session in comparison_sessions:
-                comp_timing = self._extract_timing_data(comp_session)
+                comp_session = as_feature_bundle(comp_session)
+                comp_timing = comp_session.timing_data
                 if not comp_timing.get('timestamps'):
                     continue
                 
@@ -1345,7 +1360,7 @@ class StatisticalAnomalyAnalyzer:
                 
                 if coordination_metrics['coordination_score'] > 0.7:
                     coordination_evidence.append({
-                        'session_id': comp_session.get('session_id', 'unknown'),
+                        'session_id': comp_session.session_id,
                         'coordination_type': coordination_metrics['coordination_type'],
                         'score': coordination_metrics['coordination_score']
                     })
@@ -1364,14 +1379,13 @@ class StatisticalAnomalyAnalyzer:
             self.logger.warning(f"Error in timing coordination analysis: {str(e)}")
             return {'coordination_detected': False, 'coordination_score': 0.1, 'available': False, 'error': str(e)}
     
-    def _analyze_answer_pattern_similarities(self, session_data: Dict, comparison_sessions: Optional[List[Dict]]) -> Dict[str, Any]:
+    def _analyze_answer_pattern_similarities(self, session_data: SessionInput, comparison_sessions: Optional[List[SessionInput]]) -> Dict[str, Any]:
         """Analyze answer pattern similarities"""
         try:
             if not comparison_sessions:
                 return {'pattern_similarity_score': 0.0, 'suspicious_similarities': [], 'available': False}
             
-            current_responses = session_data.get('responses', [])
-            current_patterns = self._extract_answer_patterns(current_responses)
+            current_patterns = self._extract_answer_patterns(as_feature_bundle(session_data))
             
             if not current_patterns:
                 return {'pattern_similarity_score': 0.0, 'suspicious_similarities': [], 'available': False}
@@ -1380,8 +1394,8 @@ class StatisticalAnomalyAnalyzer:
             similarity_scores = []
             
             for comp_session in comparison_sessions:
-                comp_responses = comp_session.get('responses', [])
-                comp_patterns = self._extract_answer_patterns(comp_responses)
+                comp_session = as_feature_bundle(comp_session)
+                comp_patterns = self._extract_answer_patterns(comp_session)
                 
                 if comp_patterns:
                     pattern_similarity = self._calculate_pattern_similarity(current_patterns, comp_patterns)
@@ -1389,7 +1403,7 @@ class StatisticalAnomalyAnalyzer:
                     
                     if pattern_similarity > 0.75:  # High pattern similarity
                         suspicious_similarities.append({
-                            'session_id': comp_session.get('session_id', 'unknown'),
+                            'session_id': comp_session.session_id,
                             'similarity_score': pattern_similarity,
                             'similar_patterns': self._identify_similar_patterns(current_patterns, comp_patterns)
                         })
@@ -1407,7 +1421,7 @@ class StatisticalAnomalyAnalyzer:
             self.logger.warning(f"Error in answer pattern similarity analysis: {str(e)}")
             return {'pattern_similarity_score': 0.2, 'suspicious_similarities': [], 'available': False, 'error': str(e)}
     
-    def _analyze_statistical_clustering(self, session_data: Dict, comparison_sessions: Optional[List[Dict]]) -> Dict[str, Any]:
+    def _analyze_statistical_clustering(self, session_data: SessionInput, comparison_sessions: Optional[List[SessionInput]]) -> Dict[str, Any]:
         """Analyze statistical clustering between sessions"""
         try:
             if not comparison_sessions or len(comparison_sessions) < 2:
@@ -1419,10 +1433,11 @@ class StatisticalAnomalyAnalyzer:
             session_ids = []
             
             for session in all_sessions:
+                session = as_feature_bundle(session)
                 features = self._extract_session_features(session)
                 if features:
                     feature_vectors.append(features)
-                    session_ids.append(session.get('session_id', 'unknown'))
+                    session_ids.append(session.session_id)
             
             if len(feature_vectors) < 3:
                 return {'clustering_detected': False, 'cluster_strength': 0.0, 'available': False}
@@ -1492,21 +1507,14 @@ class StatisticalAnomalyAnalyzer:
         active_hours = set(range(8, 23))  # 8 AM to 10 PM
         return active_hours
     
-    def _calculate_expected_response_time(self, session_data: Dict) -> float:
+    def _calculate_expected_response_time(self, session_data: SessionInput) -> float:
         """Calculate expected response time based on question difficulty"""
-        responses = session_data.get('responses', [])
-        if not responses:
+        difficulties = as_feature_bundle(session_data).difficulty_sequence
+        if not len(difficulties):
             return 2.0  # Default 2 minutes per question
         
-        # Simple calculation based on difficulty
-        total_expected_time = 0
-        for response in responses:
-            difficulty = response.get('difficulty', 0.5)
-            # Base time: 1-3 minutes based on difficulty
-            expected_time = 1.0 + (difficulty * 2.0)
-            total_expected_time += expected_time
-        
-        return total_expected_time / len(responses) if responses else 2.0
+        # Base time: 1-3 minutes based on difficulty
+        return sum(1.0 + difficulty * 2.0 for difficulty in difficulties.tolist()) / len(difficulties)
     
     def _calculate_session_similarity(self, responses1: List[Dict], responses2: List[Dict]) -> Dict[str, Any]:
         """Calculate similarity between two sessions"""
@@ -1522,11 +1530,10 @@ class StatisticalAnomalyAnalyzer:
             answers2 = [r.get('response', '') for r in responses2]
             
             # Find common questions (by question_id)
-            common_questions = []
-            for r1 in responses1:
-                for r2 in responses2:
-                    if r1.get('question_id') == r2.get('question_id'):
-                        common_questions.append((r1, r2))
+            by_question = defaultdict(list)
+            for r2 in responses2:
+                by_question[r2.get('question_id')].append(r2)
+            common_questions = [(r1, r2) for r1 in responses1 for r2 in by_question.get(r1.get('question_id'), [])]
             
             if common_questions:
                 matching_answers = sum(1 for r1, r2 in common_questions if r1.get('response') == r2.get('response'))
@@ -1585,12 +1592,11 @@ class StatisticalAnomalyAnalyzer:
             coordination_score = 0.0
             coordination_type = 'none'
             
-            simultaneous_count = 0
-            for ts1 in timestamps1:
-                for ts2 in timestamps2:
-                    time_diff = abs((ts1 - ts2).total_seconds())
-                    if time_diff < 300:  # Within 5 minutes
-                        simultaneous_count += 1
+            # Pairs of activities within 5 minutes, counted with a binary search per timestamp
+            seconds1 = np.array([ts.timestamp() for ts in timestamps1])
+            seconds2 = np.sort(np.array([ts.timestamp() for ts in timestamps2]))
+            simultaneous_count = int((np.searchsorted(seconds2, seconds1 + 300, side='left')
+                                      - np.searchsorted(seconds2, seconds1 - 300, side='right')).sum())
             
             if simultaneous_count > 0:
                 coordination_score = min(simultaneous_count / min(len(timestamps1), len(timestamps2)), 1.0)
@@ -1612,25 +1618,20 @@ class StatisticalAnomalyAnalyzer:
             self.logger.warning(f"Error calculating timing coordination: {str(e)}")
             return {'coordination_score': 0.0, 'coordination_type': 'none'}
     
-    def _extract_answer_patterns(self, responses: List[Dict]) -> Dict[str, Any]:
-        """Extract answer patterns from responses"""
+    def _extract_answer_patterns(self, responses: Union[List[Dict], SessionFeatureBundle]) -> Dict[str, Any]:
+        """Extract answer patterns from responses (or a session's feature bundle)"""
         try:
-            if not responses:
+            if not isinstance(responses, SessionFeatureBundle):
+                responses = SessionFeatureBundle({'responses': responses})
+            patterns = responses.answer_patterns
+            if not patterns:
                 return {}
             
-            answers = [r.get('response', '') for r in responses]
-            
-            patterns = {
-                'sequence': ''.join(answers),
-                'distribution': dict(Counter(answers)),
-                'length': len(answers),
-                'unique_answers': len(set(answers)),
-                'most_common': Counter(answers).most_common(3),
-                'alternating_detected': self._detect_alternating_patterns(answers)
+            return {
+                **patterns,
+                'alternating_detected': self._detect_alternating_patterns([r.get('response', '') for r in responses.responses])
             }
             
-            return patterns
-            
         except Exception as e:
             self.logger.warning(f"Error extracting answer patterns: {str(e)}")
             return {}
@@ -1711,41 +1712,10 @@ class StatisticalAnomalyAnalyzer:
         
         return similar_patterns
     
-    def _extract_session_features(self, session_data: Dict) -> Optional[List[float]]:
+    def _extract_session_features(self, session_data: SessionInput) -> Optional[List[float]]:
         """Extract numerical features from session for clustering"""
         try:
-            responses = session_data.get('responses', [])
-            if not responses:
-                return None
-            
-            features = []
-            
-            # Accuracy
-            accuracy = sum(1 for r in responses if r.get('is_correct', False)) / len(responses)
-            features.append(accuracy)
-            
-            # Average response time
-            times = [r.get('response_time', 0) for r in responses if r.get('response_time', 0) > 0]
-            avg_time = statistics.mean(times) if times else 0
-            features.append(avg_time)
-            
-            # Response time variability
-            time_std = statistics.stdev(times) if len(times) > 1 else 0
-            features.append(time_std)
-            
-            # Answer distribution entropy
-            answers = [r.get('response', '') for r in responses]
-            answer_counts = Counter(answers)
-            total = len(answers)
-            entropy = -sum((count/total) * math.log2(count/total) for count in answer_counts.values() if count > 0)
-            features.append(entropy)
-            
-            # Average difficulty
-            difficulties = [r.get('difficulty', 0.5) for r in responses]
-            avg_difficulty = statistics.mean(difficulties)
-            features.append(avg_difficulty)
-            
-            return features
+            return as_feature_bundle(session_data).clustering_features
             
         except Exception as e:
             self.logger.warning(f"Error extracting session features: {str(e)}")
@@ -1758,35 +1728,23 @@ class StatisticalAnomalyAnalyzer:
                 return {'clustering_detected': False, 'cluster_strength': 0.0, 'cluster_assignments': {}, 'suspicious_clusters': []}
             
             # Simple distance-based clustering
-            # Calculate pairwise distances
-            distances = []
-            pairs = []
-            
-            for i in range(len(feature_vectors)):
-                for j in range(i + 1, len(feature_vectors)):
-                    # Euclidean distance
-                    distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(feature_vectors[i], feature_vectors[j])))
-                    distances.append(distance)
-                    pairs.append((i, j))
-            
-            if not distances:
+            # Pairwise Euclidean distances in condensed form (pair k is (i[k], j[k]))
+            distances = pdist(np.asarray(feature_vectors, dtype=float))
+            pair_i, pair_j = np.triu_indices(len(feature_vectors), k=1)
+            
+            if not len(distances):
                 return {'clustering_detected': False, 'cluster_strength': 0.0, 'cluster_assignments': {}, 'suspicious_clusters': []}
             
             # Find close pairs (distance < threshold)
-            avg_distance = statistics.mean(distances)
-            threshold = avg_distance * 0.5  # Pairs closer than half the average distance
-            
-            close_pairs = []
-            for distance, (i, j) in zip(distances, pairs):
-                if distance < threshold:
-                    close_pairs.append({
-                        'session1': session_ids[i],
-                        'session2': session_ids[j],
-                        'distance': distance
-                    })
+            threshold = distances.mean() * 0.5  # Pairs closer than half the average distance
+            close = np.flatnonzero(distances < threshold)
+            close_pairs = [
+                {'session1': session_ids[pair_i[k]], 'session2': session_ids[pair_j[k]], 'distance': float(distances[k])}
+                for k in close
+            ]
             
             clustering_detected = len(close_pairs) > 0
-            cluster_strength = min(len(close_pairs) / len(pairs), 1.0) if pairs else 0.0
+            cluster_strength = min(len(close_pairs) / len(distances), 1.0)
             
             # Identify suspicious clusters (multiple sessions very close to each other)
             suspicious_clusters = []
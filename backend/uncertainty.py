@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Vectorized Bootstrap and Uncertainty Estimation
+
+Shared interval estimation for the risk calculator and the anomaly engines.
+Bootstrap replicates used to be drawn in a Python loop (one np.random.choice
+call per replicate, for every confidence level). Here:
+
+- All replicates come from one (n_resamples x n) resample-index matrix drawn
+  with a seeded Generator, so intervals are reproducible for the same input
+- Percentile and BCa (bias-corrected and accelerated) intervals are read from
+  the same replicates for every requested confidence level
+- Large, roughly symmetric samples skip resampling and use the normal
+  approximation (analytic fast path)
+- batch_bootstrap_intervals() scores many sessions at once: sessions with the
+  same sample size share one index matrix and are resampled as a 2-D array
+
+Statistics must accept an `axis` argument (np.mean, np.median, ...).
+"""
+
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from scipy.stats import norm, t as student_t
+
+DEFAULT_RESAMPLES = int(os.environ.get("BOOTSTRAP_RESAMPLES", "1000"))
+DEFAULT_SEED = int(os.environ.get("BOOTSTRAP_SEED", "0"))
+NORMAL_APPROXIMATION_MIN_N = 30
+NORMAL_APPROXIMATION_MAX_SKEW = 0.5
+BATCH_CHUNK_ELEMENTS = 4_000_000  # sessions x resamples x n per resampling chunk
+
+
+def level_key(confidence_level: float) -> str:
+    return f"{int(round(confidence_level * 100))}%"
+
+
+def bootstrap_indices(n: int, n_resamples: int = DEFAULT_RESAMPLES, seed: Optional[int] = DEFAULT_SEED) -> np.ndarray:
+    """(n_resamples x n) resample indices drawn in one call"""
+    return np.random.default_rng(seed).integers(0, n, size=(n_resamples, n))
+
+
+def _quantiles(sorted_rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Linear-interpolated quantile q[i] of each sorted row i"""
+    positions = np.clip(q, 0.0, 1.0) * (sorted_rows.shape[1] - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, sorted_rows.shape[1] - 1)
+    rows = np.arange(sorted_rows.shape[0])
+    fraction = positions - lower
+    return sorted_rows[rows, lower] * (1 - fraction) + sorted_rows[rows, upper] * fraction
+
+
+def _jackknife(samples: np.ndarray, statistic: Callable) -> np.ndarray:
+    """(sessions x n) leave-one-out statistics"""
+    n = samples.shape[1]
+    if statistic is np.mean:
+        return (samples.sum(axis=1, keepdims=True) - samples) / (n - 1)
+    keep = ~np.eye(n, dtype=bool)
+    leave_one_out = samples[:, np.nonzero(keep)[1].reshape(n, n - 1)]
+    return statistic(leave_one_out, axis=2)
+
+
+def _bca_quantiles(samples: np.ndarray, theta: np.ndarray, replicates: np.ndarray, statistic: Callable,
+                   alphas: np.ndarray) -> np.ndarray:
+    """(sessions x len(alphas)) BCa-adjusted quantile levels"""
+    below = (replicates < theta[:, None]).mean(axis=1) + 0.5 * (replicates == theta[:, None]).mean(axis=1)
+    z0 = norm.ppf(np.clip(below, 1e-6, 1 - 1e-6))
+
+    jack = _jackknife(samples, statistic)
+    deviation = jack.mean(axis=1, keepdims=True) - jack
+    denominator = 6.0 * np.power((deviation ** 2).sum(axis=1), 1.5)
+    acceleration = np.divide((deviation ** 3).sum(axis=1), denominator, out=np.zeros(len(theta)), where=denominator > 0)
+
+    z = norm.ppf(alphas)[None, :]
+    adjusted = z0[:, None] + (z0[:, None] + z) / (1 - acceleration[:, None] * (z0[:, None] + z))
+    return norm.cdf(adjusted)
+
+
+def _interval_tables(samples: np.ndarray, replicates: np.ndarray, statistic: Callable,
+                     confidence_levels: Sequence[float], method: str) -> Dict[str, Any]:
+    """Lower/upper bounds per session and confidence level from (sessions x resamples) replicates"""
+    theta = statistic(samples, axis=1)
+    levels = np.asarray(confidence_levels, dtype=float)
+    alphas = np.concatenate([(1 - levels) / 2, 1 - (1 - levels) / 2])
+    if method == "bca":
+        q = _bca_quantiles(samples, theta, replicates, statistic, alphas)
+        # Degenerate samples (all values equal) have no spread to adjust
+        q = np.where(np.isfinite(q), q, alphas[None, :])
+    else:
+        q = np.broadcast_to(alphas, (len(theta), len(alphas)))
+    ordered = np.sort(replicates, axis=1)
+    bounds = np.column_stack([_quantiles(ordered, q[:, j]) for j in range(q.shape[1])])
+    return {
+        "estimate": theta,
+        "replicate_mean": replicates.mean(axis=1),
+        "standard_error": replicates.std(axis=1, ddof=1),
+        "lower": bounds[:, :len(levels)],
+        "upper": bounds[:, len(levels):],
+    }
+
+
+def analytic_intervals(values: Sequence[float], confidence_levels: Iterable[float],
+                       distribution: str = "auto") -> Dict[str, Dict[str, Any]]:
+    """
+    Mean +/- critical value x standard error at several confidence levels (keyed
+    "95%" etc.), with one quantile call for all levels. distribution="auto" uses
+    the t distribution below NORMAL_APPROXIMATION_MIN_N samples and the normal above.
+    """
+    values = np.asarray(values, dtype=float)
+    levels = list(confidence_levels)
+    n = len(values)
+    mean = float(values.mean())
+    standard_error = float(values.std(ddof=1) / np.sqrt(n)) if n > 1 else 0.0
+    use_t = distribution == "t" or (distribution == "auto" and n < NORMAL_APPROXIMATION_MIN_N)
+    quantiles = (1 + np.asarray(levels, dtype=float)) / 2
+    critical = student_t.ppf(quantiles, df=max(n - 1, 1)) if use_t else norm.ppf(quantiles)
+    intervals = {}
+    for level, value in zip(levels, critical):
+        margin = float(value * standard_error)
+        intervals[level_key(level)] = {
+            "mean_estimate": mean,
+            "lower_bound": mean - margin,
+            "upper_bound": mean + margin,
+            "standard_error": standard_error,
+            "margin_of_error": margin,
+            "distribution_used": "t_distribution" if use_t else "normal_distribution",
+        }
+    return intervals
+
+
+def analytic_interval(values: Sequence[float], confidence_level: float, distribution: str = "auto") -> Dict[str, Any]:
+    """Single-level analytic_intervals()"""
+    return analytic_intervals(values, [confidence_level], distribution)[level_key(confidence_level)]
+
+
+def normal_approximation_applies(values: np.ndarray) -> bool:
+    """Large enough and close enough to symmetric for the central limit theorem to carry the mean"""
+    if len(values) < NORMAL_APPROXIMATION_MIN_N:
+        return False
+    spread = values.std()
+    if spread == 0:
+        return True
+    skew = float(np.mean(((values - values.mean()) / spread) ** 3))
+    return abs(skew) <= NORMAL_APPROXIMATION_MAX_SKEW
+
+
+def _format(estimate: float, lower: float, upper: float, confidence_level: float, interval_type: str,
+            n: int, n_resamples: int, standard_error: float, replicate_mean: float) -> Dict[str, Any]:
+    return {
+        "method": "bootstrap",
+        "interval_type": interval_type,
+        "lower_bound": float(lower),
+        "upper_bound": float(upper),
+        "confidence_level": float(confidence_level),
+        "bootstrap_samples": n_resamples,
+        "mean_estimate": float(replicate_mean),
+        "point_estimate": float(estimate),
+        "standard_error": float(standard_error),
+        "sample_size": n,
+        "available": True,
+    }
+
+
+def bootstrap_intervals(values: Sequence[float],
+                        confidence_levels: Iterable[float] = (0.95,),
+                        method: str = "bca",
+                        n_resamples: int = DEFAULT_RESAMPLES,
+                        seed: Optional[int] = DEFAULT_SEED,
+                        statistic: Callable = np.mean,
+                        allow_normal_approximation: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Bootstrap intervals for one sample at several confidence levels (keyed "95%"
+    etc.) from a single set of replicates. method is "bca" or "percentile".
+    """
+    return batch_bootstrap_intervals([values], confidence_levels, method, n_resamples, seed,
+                                     statistic, allow_normal_approximation)[0]
+
+
+def batch_bootstrap_intervals(samples: Sequence[Sequence[float]],
+                              confidence_levels: Iterable[float] = (0.95,),
+                              method: str = "bca",
+                              n_resamples: int = DEFAULT_RESAMPLES,
+                              seed: Optional[int] = DEFAULT_SEED,
+                              statistic: Callable = np.mean,
+                              allow_normal_approximation: bool = True) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Intervals for many samples (e.g. one score history per session). Samples
+    of equal length share one index matrix and are resampled together; each
+    result matches bootstrap_intervals() on that sample alone with the same seed
+    (up to floating-point rounding).
+    Samples with fewer than 2 values get {"available": False} entries.
+    """
+    if method not in ("bca", "percentile"):
+        raise ValueError(f"Unknown bootstrap method: {method}")
+    levels = list(confidence_levels)
+    arrays = [np.asarray(sample, dtype=float) for sample in samples]
+    results: List[Dict[str, Dict[str, Any]]] = [{} for _ in arrays]
+
+    by_length: Dict[int, List[int]] = {}
+    for position, values in enumerate(arrays):
+        if len(values) < 2:
+            results[position] = {level_key(level): {"method": "bootstrap", "available": False,
+                                                    "error": "At least 2 values are required"} for level in levels}
+        elif statistic is np.mean and allow_normal_approximation and normal_approximation_applies(values):
+            for level, analytic in zip(levels, analytic_intervals(values, levels, distribution="normal").values()):
+                results[position][level_key(level)] = _format(
+                    analytic["mean_estimate"], analytic["lower_bound"], analytic["upper_bound"], level,
+                    "normal_approximation", len(values), 0, analytic["standard_error"], analytic["mean_estimate"])
+        else:
+            by_length.setdefault(len(values), []).append(position)
+
+    for n, positions in by_length.items():
+        indices = bootstrap_indices(n, n_resamples, seed)
+        chunk = max(1, BATCH_CHUNK_ELEMENTS // (n_resamples * n))
+        for start in range(0, len(positions), chunk):
+            members = positions[start:start + chunk]
+            stacked = np.stack([arrays[p] for p in members])
+            replicates = statistic(stacked[:, indices], axis=2)  # (sessions x resamples)
+            tables = _interval_tables(stacked, replicates, statistic, levels, method)
+            for row, position in enumerate(members):
+                for column, level in enumerate(levels):
+                    results[position][level_key(level)] = _format(
+                        tables["estimate"][row], tables["lower"][row, column], tables["upper"][row, column], level,
+                        method, n, n_resamples, tables["standard_error"][row], tables["replicate_mean"][row])
+    return results
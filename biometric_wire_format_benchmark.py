@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Biometric Wire Format Benchmark
+
+Compares the JSON submission payload with the columnar wire format for the
+same synthetic events:
+1. Payload bytes (raw and gzip) per event
+2. Server-side decode CPU per event (json.loads vs decode_frame)
+3. Keystroke analysis from decoded JSON dicts vs decoded columns
+
+Usage: python biometric_wire_format_benchmark.py [--keystrokes 2000] [--mouse 1000] [--repeat 50]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('/app/backend')
+from biometric_wire_format import KEYUP, MOUSE_CLICK, decode_frame, encode_frame
+from behavioral_biometrics_engine import keystroke_analyzer
+
+
+def synth_events(rng, keystrokes, mouse):
+    letters = list("abcdefghijklmnopqrstuvwxyz ")
+    keys = rng.choice(letters, size=keystrokes // 2)
+    downs = 1000 + np.cumsum(rng.uniform(50, 300, size=len(keys)))
+    ups = downs + rng.uniform(30, 150, size=len(keys))
+    keystroke_data = sorted(
+        [{"key": str(k), "code": f"Key{str(k).upper()}", "timestamp": float(t), "event_type": "keydown",
+          "shift_key": False, "ctrl_key": False, "alt_key": False, "meta_key": False} for k, t in zip(keys, downs)] +
+        [{"key": str(k), "code": f"Key{str(k).upper()}", "timestamp": float(t), "event_type": "keyup",
+          "shift_key": False, "ctrl_key": False, "alt_key": False, "meta_key": False} for k, t in zip(keys, ups)],
+        key=lambda event: event["timestamp"]
+    )
+    times = 1000 + np.cumsum(rng.uniform(100, 140, size=mouse))
+    xs = 600 + np.cumsum(rng.integers(-25, 26, size=mouse))
+    ys = 400 + np.cumsum(rng.integers(-25, 26, size=mouse))
+    mouse_data = [{"x": int(x), "y": int(y), "timestamp": float(t), "event_type": "click" if i % 20 == 0 else "mousemove",
+                   "target": "div", "button": 0} for i, (x, y, t) in enumerate(zip(xs, ys, times))]
+    return keystroke_data, mouse_data
+
+
+def to_frame(keystroke_data, mouse_data):
+    key_names = sorted({event["key"] for event in keystroke_data})
+    key_index = {key: i for i, key in enumerate(key_names)}
+    columns = {
+        "keystroke": {"t": [e["timestamp"] for e in keystroke_data], "key": [key_index[e["key"]] for e in keystroke_data],
+                      "flags": [KEYUP if e["event_type"] == "keyup" else 0 for e in keystroke_data]},
+        "mouse": {"t": [e["timestamp"] for e in mouse_data], "x": [e["x"] for e in mouse_data], "y": [e["y"] for e in mouse_data],
+                  "kind": [MOUSE_CLICK if e["event_type"] == "click" else 0 for e in mouse_data],
+                  "button": [e["button"] for e in mouse_data]},
+    }
+    header = {"session_id": "benchmark-session", "consent_given": True, "sequence": 0, "keys": key_names, "timing_data": []}
+    return encode_frame(header, columns)
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keystrokes", type=int, default=2000)
+    parser.add_argument("--mouse", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    keystroke_data, mouse_data = synth_events(rng, args.keystrokes, args.mouse)
+    events = len(keystroke_data) + len(mouse_data)
+    json_payload = json.dumps({"session_id": "benchmark-session", "keystroke_data": keystroke_data,
+                               "mouse_data": mouse_data, "consent_given": True}).encode()
+    frame = to_frame(keystroke_data, mouse_data)
+
+    print(f"📦 Payload for {events:,} events:")
+    for name, payload in (("JSON", json_payload), ("frame", frame)):
+        compressed = gzip.compress(payload)
+        print(f"   • {name:5s}: {len(payload):>9,} bytes ({len(payload) / events:6.1f} B/event), "
+              f"gzip {len(compressed):>8,} bytes ({len(compressed) / events:5.2f} B/event)")
+
+    json_seconds, decoded = timed(lambda: json.loads(json_payload), args.repeat)
+    frame_seconds, batch = timed(lambda: decode_frame(frame), args.repeat)
+    print(f"⏱️ Decode: JSON {json_seconds / events * 1e9:,.0f} ns/event, frame {frame_seconds / events * 1e9:,.0f} ns/event "
+          f"({json_seconds / frame_seconds:.0f}x)")
+
+    keystrokes = batch.columns["keystroke"]
+    dict_seconds, _ = timed(lambda: keystroke_analyzer.analyze_typing_patterns(decoded["keystroke_data"]), args.repeat)
+    column_seconds, _ = timed(lambda: keystroke_analyzer.analyze_keystroke_columns(
+        keystrokes["t"], keystrokes["key"], keystrokes["flags"] & KEYUP, batch.key_names), args.repeat)
+    print(f"⌨️ Keystroke analysis: from dicts {dict_seconds * 1000:.2f} ms, from columns {column_seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
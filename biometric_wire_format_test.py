@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Biometric Wire Format Test
+
+Tests the columnar biometric ingestion endpoint:
+1. A gzip-compressed frame is decoded, analyzed and stored as a compressed chunk
+2. The frame gives the same keystroke statistics as the JSON submission (within the 0.1 ms quantum)
+3. Malformed frames and frames without consent are rejected with 400
+4. A remounted collector (new upload id, sequence restarting at 0) keeps the stored chunks
+"""
+
+import asyncio
+import gzip
+import json
+import random
+import sys
+import uuid
+
+import requests
+
+sys.path.append('/app/backend')
+from behavioral_biometrics_engine import BiometricDataPrivacyManager
+from biometric_wire_format import KEYUP, MOUSE_CLICK, decode_frame, encode_frame
+from pymongo.errors import DuplicateKeyError
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def build_events(seed=7):
+    """JSON-style events as the collector records them"""
+    rng = random.Random(seed)
+    keystrokes, timestamp = [], 1000.0
+    for _ in range(600):
+        key = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+        timestamp += rng.uniform(50, 300)
+        keystrokes.append({"key": key, "timestamp": round(timestamp, 1), "event_type": "keydown"})
+        keystrokes.append({"key": key, "timestamp": round(timestamp + rng.uniform(30, 150), 1), "event_type": "keyup"})
+    keystrokes.sort(key=lambda event: event["timestamp"])
+
+    mouse, x, y, timestamp = [], 600, 400, 1000.0
+    for i in range(400):
+        timestamp += rng.uniform(100, 140)
+        x += rng.randint(-25, 25)
+        y += rng.randint(-25, 25)
+        mouse.append({"x": x, "y": y, "timestamp": round(timestamp, 1),
+                      "event_type": "click" if i % 20 == 0 else "mousemove", "button": 0})
+    return keystrokes, mouse
+
+def to_frame(session_id, keystrokes, mouse, consent_given=True, upload_id=None, sequence=0):
+    key_names = sorted({event["key"] for event in keystrokes})
+    columns = {
+        "keystroke": {
+            "t": [event["timestamp"] for event in keystrokes],
+            "key": [key_names.index(event["key"]) for event in keystrokes],
+            "flags": [KEYUP if event["event_type"] == "keyup" else 0 for event in keystrokes],
+        },
+        "mouse": {
+            "t": [event["timestamp"] for event in mouse],
+            "x": [event["x"] for event in mouse],
+            "y": [event["y"] for event in mouse],
+            "kind": [MOUSE_CLICK if event["event_type"] == "click" else 0 for event in mouse],
+            "button": [event["button"] for event in mouse],
+        },
+    }
+    header = {"session_id": session_id, "consent_given": consent_given, "upload_id": upload_id or str(uuid.uuid4()),
+              "sequence": sequence, "keys": key_names, "timing_data": []}
+    return encode_frame(header, columns, compress=True)
+
+def post_frame(frame):
+    return requests.post(
+        f"{BACKEND_URL}/security/biometric-data/ingest",
+        data=frame,
+        headers={"Content-Type": "application/octet-stream"},
+        timeout=60
+    )
+
+def test_frame_ingestion():
+    """Ingest a gzip-compressed frame"""
+    print("📦 Testing columnar frame ingestion...")
+    try:
+        keystrokes, mouse = build_events()
+        frame = to_frame(f"wire-test-{uuid.uuid4()}", keystrokes, mouse)
+        response = post_frame(frame)
+        if response.status_code != 200:
+            print(f"❌ Ingestion failed: {response.status_code} {response.text}")
+            return False
+
+        result = response.json()
+        storage = result["storage_result"]
+        if result["events_received"] != len(keystrokes) + len(mouse) or not storage.get("success"):
+            print(f"❌ Unexpected ingestion result: {result['events_received']} events, storage {storage}")
+            return False
+        if "mouse_analysis" not in result["analysis_results"] or "click_analysis" not in result["analysis_results"]:
+            print(f"❌ Missing mouse/click analysis: {list(result['analysis_results'])}")
+            return False
+
+        json_bytes = len(json.dumps({"keystroke_data": keystrokes, "mouse_data": mouse}))
+        print(f"   • {result['events_received']} events in {len(frame):,} bytes (JSON {json_bytes:,} bytes), "
+              f"stored {storage.get('compressed_bytes')} compressed bytes")
+        print("✅ Frame decoded, analyzed and stored")
+        return True
+    except Exception as e:
+        print(f"❌ Frame ingestion error: {str(e)}")
+        return False
+
+def test_frame_matches_json_submission():
+    """Keystroke statistics from a frame match the JSON submission"""
+    print("\n⚖️ Testing frame vs JSON keystroke statistics...")
+    try:
+        keystrokes, mouse = build_events()
+        framed = post_frame(to_frame(f"wire-test-{uuid.uuid4()}", keystrokes, mouse)).json()
+        submitted = requests.post(
+            f"{BACKEND_URL}/security/biometric-data/submit",
+            json={"session_id": f"wire-test-{uuid.uuid4()}", "keystroke_data": keystrokes, "consent_given": True},
+            timeout=60
+        ).json()
+
+        framed_dwell = framed["analysis_results"]["keystroke_analysis"]["typing_patterns"]["rhythm_analysis"]["dwell_time_stats"]
+        json_dwell = submitted["analysis_results"]["keystroke_analysis"]["typing_patterns"]["rhythm_analysis"]["dwell_time_stats"]
+        if abs(framed_dwell["mean"] - json_dwell["mean"]) > 0.1 or abs(framed_dwell["max"] - json_dwell["max"]) > 0.1:
+            print(f"❌ Dwell statistics differ: frame {framed_dwell} vs JSON {json_dwell}")
+            return False
+        print(f"   • mean dwell {framed_dwell['mean']:.2f} ms (frame) vs {json_dwell['mean']:.2f} ms (JSON)")
+        print("✅ Frame and JSON submissions agree")
+        return True
+    except Exception as e:
+        print(f"❌ Frame comparison error: {str(e)}")
+        return False
+
+def test_invalid_frames_rejected():
+    """Truncated frames, non-frames and frames without consent return 400"""
+    print("\n🚫 Testing invalid frames...")
+    try:
+        keystrokes, mouse = build_events()
+        frame = gzip.decompress(to_frame(f"wire-test-{uuid.uuid4()}", keystrokes, mouse))
+        cases = {
+            "truncated": frame[:-10],
+            "not a frame": b'{"session_id": "x"}',
+            "no consent": to_frame(f"wire-test-{uuid.uuid4()}", keystrokes, mouse, consent_given=False),
+        }
+        for name, payload in cases.items():
+            status = post_frame(payload).status_code
+            if status != 400:
+                print(f"❌ {name}: expected 400, got {status}")
+                return False
+            print(f"   • {name}: 400")
+        print("✅ Invalid frames rejected")
+        return True
+    except Exception as e:
+        print(f"❌ Invalid frame test error: {str(e)}")
+        return False
+
+class ChunkCollection:
+    """In-memory event chunk collection with the unique (session_hash, upload_id, sequence) index"""
+    def __init__(self):
+        self.docs = []
+
+    async def create_index(self, keys, **kwargs):
+        pass
+
+    async def drop_index(self, name):
+        pass
+
+    async def insert_one(self, doc):
+        key = (doc["session_hash"], doc["upload_id"], doc["sequence"])
+        if any((d["session_hash"], d["upload_id"], d["sequence"]) == key for d in self.docs):
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs.append(doc)
+
+    def find(self, query):
+        docs = [dict(d) for d in self.docs if d["session_hash"] == query["session_hash"]]
+
+        class Cursor:
+            def sort(self, field, direction):
+                docs.sort(key=lambda d: d[field])
+                return self
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if not docs:
+                    raise StopAsyncIteration
+                return docs.pop(0)
+        return Cursor()
+
+def test_remount_keeps_chunks():
+    """Sequence numbers restarting under a new upload id never overwrite stored chunks"""
+    print("\n🔁 Testing collector remount...")
+    try:
+        manager = BiometricDataPrivacyManager()
+        manager.records, manager.event_chunks = ChunkCollection(), ChunkCollection()
+        session_id = f"wire-test-{uuid.uuid4()}"
+        keystrokes, mouse = build_events()
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+
+        async def run():
+            results = []
+            for upload_id, sequence in [(first, 0), (first, 1), (first, 1), (second, 0)]:
+                batch = decode_frame(to_frame(session_id, keystrokes, mouse, upload_id=upload_id, sequence=sequence))
+                results.append(await manager.store_event_chunk(batch, consent_given=True))
+            return results, await manager.load_event_chunks(session_id)
+
+        results, chunks = asyncio.run(run())
+        if [r["duplicate"] for r in results] != [False, False, True, False]:
+            print(f"❌ Unexpected store results: {results}")
+            return False
+        if [(c["upload_id"], c["sequence"]) for c in chunks] != [(first, 0), (first, 1), (second, 0)]:
+            print(f"❌ Unexpected stored chunks: {[(c['upload_id'], c['sequence']) for c in chunks]}")
+            return False
+        print("✅ Remounted collector stored alongside earlier chunks; resend ignored")
+        return True
+    except Exception as e:
+        print(f"❌ Remount test error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_frame_ingestion(),
+        test_frame_matches_json_submission(),
+        test_invalid_frames_rejected(),
+        test_remount_keeps_chunks(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
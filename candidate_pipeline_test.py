@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Candidate Pipeline Test
+
+Tests the aggregation-backed /admin/candidate-pipeline:
+1. Cursors round-trip and invalid filters are rejected
+2. Each token branch is limited on its index before $unionWith, and the
+   session/assessment $lookups only run on the page
+3. Walking every page returns each invitation once, newest first
+4. Status and interview type filters are applied server-side
+"""
+
+import sys
+from datetime import datetime
+
+import requests
+
+sys.path.append('/app/backend')
+from candidate_pipeline import (PipelineQueryError, build_pipeline_aggregation, decode_cursor,
+                                encode_cursor, parse_statuses)
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def test_cursor_and_filters():
+    """Cursor encoding and filter validation"""
+    print("🔖 Testing cursors and filters...")
+    try:
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 123456)
+        cursor = encode_cursor({"created_at": created_at, "token": "ABC123"})
+        if decode_cursor(cursor) != (created_at, "ABC123"):
+            print(f"❌ Cursor did not round-trip: {decode_cursor(cursor)}")
+            return False
+        if parse_statuses("report ready, invited") != ["Report Ready", "Invited"]:
+            print("❌ Status names not normalized")
+            return False
+        for bad in (lambda: decode_cursor("not-a-cursor"), lambda: parse_statuses("Hired")):
+            try:
+                bad()
+                print("❌ Invalid input accepted")
+                return False
+            except PipelineQueryError:
+                pass
+        print("✅ Cursors round-trip and invalid filters are rejected")
+        return True
+    except Exception as e:
+        print(f"❌ Cursor/filter error: {str(e)}")
+        return False
+
+def test_aggregation_shape():
+    """Branches are limited before the union; lookups come after the page limit"""
+    print("\n🧱 Testing aggregation shape...")
+    try:
+        collection, stages = build_pipeline_aggregation((datetime(2026, 1, 1), "T1"), 51, job_id="job-1")
+        operators = [next(iter(stage)) for stage in stages]
+        union = stages[operators.index("$unionWith")]["$unionWith"]
+        if collection != "tokens" or union["coll"] != "enhanced_tokens":
+            print(f"❌ Unexpected branches: {collection}, {union['coll']}")
+            return False
+        if operators[:3] != ["$match", "$sort", "$limit"] or stages[2]["$limit"] != 51 or union["pipeline"][2]["$limit"] != 51:
+            print(f"❌ Branches not limited before the union: {operators}")
+            return False
+        if operators.index("$lookup") < operators.index("$unionWith") + 2:
+            print(f"❌ Lookups run before the page limit: {operators}")
+            return False
+        if stages[0]["$match"]["job_id"] != "job-1" or "$or" not in stages[0]["$match"]:
+            print(f"❌ Filter/cursor missing from branch match: {stages[0]['$match']}")
+            return False
+
+        collection, stages = build_pipeline_aggregation(None, 10, interview_types=["Enhanced"])
+        if collection != "enhanced_tokens" or any("$unionWith" in stage for stage in stages):
+            print("❌ Interview type filter still unions both collections")
+            return False
+        print("✅ Page-sized branches, joins on the page only")
+        return True
+    except Exception as e:
+        print(f"❌ Aggregation shape error: {str(e)}")
+        return False
+
+def test_pipeline_pagination():
+    """Walk all pages: no duplicates, newest first"""
+    print("\n📄 Testing pipeline pagination...")
+    try:
+        seen, previous, cursor, pages = set(), None, None, 0
+        while True:
+            params = {"limit": 25}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{BACKEND_URL}/admin/candidate-pipeline", params=params, timeout=30)
+            if response.status_code != 200:
+                print(f"❌ Request failed: {response.status_code} {response.text}")
+                return False
+            page = response.json()
+            pages += 1
+            for entry in page["pipeline"]:
+                position = (entry["created_at"], entry["token"])
+                if entry["token"] in seen or (previous is not None and position > previous):
+                    print(f"❌ Entry out of order or repeated: {entry['token']}")
+                    return False
+                seen.add(entry["token"])
+                previous = position
+            if not page["has_more"] or pages >= 200:
+                break
+            cursor = page["next_cursor"]
+        print(f"   • {len(seen)} invitations in {pages} pages")
+        print("✅ Pagination returns each invitation once, newest first")
+        return True
+    except Exception as e:
+        print(f"❌ Pagination error: {str(e)}")
+        return False
+
+def test_pipeline_filters():
+    """Status and interview type filters"""
+    print("\n🔎 Testing pipeline filters...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/candidate-pipeline",
+                                params={"status": "Invited,In Progress", "interview_type": "Enhanced"}, timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Request failed: {response.status_code} {response.text}")
+            return False
+        entries = response.json()["pipeline"]
+        if any(entry["status"] not in ("Invited", "In Progress") or entry["interview_type"] != "Enhanced" for entry in entries):
+            print("❌ Filtered page contains other entries")
+            return False
+        response = requests.get(f"{BACKEND_URL}/admin/candidate-pipeline", params={"status": "Hired"}, timeout=30)
+        if response.status_code != 400:
+            print(f"❌ Unknown status accepted: {response.status_code}")
+            return False
+        print("✅ Filters applied server-side")
+        return True
+    except Exception as e:
+        print(f"❌ Filter error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_cursor_and_filters(),
+        test_aggregation_shape(),
+        test_pipeline_pagination(),
+        test_pipeline_filters(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Batched Candidate Reads Test
+
+Tests the batched read layer used by comparison, report listings and
+candidate detail views:
+1. N tokens are resolved with one $in query per collection
+2. POST /admin/compare-candidates keeps input order and skips unknown tokens
+3. Report listings carry listing fields only, newest first
+"""
+
+import asyncio
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from candidate_reads import COMPARISON_PROJECTION, find_by_tokens
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+class RecordingCollection:
+    """In-memory collection that records the queries it receives"""
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        tokens = set(query["token"]["$in"])
+        matches = [doc for doc in self.docs if doc["token"] in tokens]
+
+        async def cursor():
+            for doc in matches:
+                yield doc
+        return cursor()
+
+def test_single_query_per_collection():
+    """200 tokens, one query"""
+    print("📦 Testing batched token resolution...")
+    try:
+        docs = [{"token": f"T{i}", "overall_score": i} for i in range(300)]
+        docs.append({"token": "T5", "overall_score": -1})   # second assessment for a token
+        collection = RecordingCollection(docs)
+        tokens = [f"T{i}" for i in range(0, 400, 2)] + ["T5", ""]
+        found = asyncio.run(find_by_tokens(collection, tokens, COMPARISON_PROJECTION))
+        if len(collection.queries) != 1 or collection.queries[0][1] is not COMPARISON_PROJECTION:
+            print(f"❌ Expected one projected query, got {len(collection.queries)}")
+            return False
+        if len(found) != 151 or found["T5"]["overall_score"] != 5:
+            print(f"❌ Unexpected resolution: {len(found)} tokens, T5 -> {found.get('T5')}")
+            return False
+        print(f"   • {len(tokens)} tokens → {len(found)} documents in 1 query")
+        print("✅ Tokens resolved with a single $in query")
+        return True
+    except Exception as e:
+        print(f"❌ Batched read error: {str(e)}")
+        return False
+
+def test_compare_candidates():
+    """Comparison of pipeline candidates with reports"""
+    print("\n⚖️ Testing compare-candidates...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/candidate-pipeline",
+                                params={"status": "Report Ready", "limit": 5}, timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Pipeline request failed: {response.status_code}")
+            return False
+        tokens = [entry["token"] for entry in response.json()["pipeline"]]
+        response = requests.post(f"{BACKEND_URL}/admin/compare-candidates",
+                                 json=tokens + ["UNKNOWNTOKEN0000"] + tokens[:1], timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Comparison failed: {response.status_code} {response.text}")
+            return False
+        compared = [comparison["token"] for comparison in response.json()["comparisons"]]
+        if compared != tokens:
+            print(f"❌ Expected {tokens}, got {compared}")
+            return False
+        print(f"   • {len(compared)} candidates compared")
+        print("✅ Comparison keeps order and skips unknown tokens")
+        return True
+    except Exception as e:
+        print(f"❌ Comparison error: {str(e)}")
+        return False
+
+def test_report_listings():
+    """Listing payloads without ObjectIds or long-form text"""
+    print("\n📋 Testing report listings...")
+    try:
+        for path in ("/admin/reports", "/placement-preparation/reports"):
+            response = requests.get(f"{BACKEND_URL}{path}", timeout=30)
+            if response.status_code != 200:
+                print(f"❌ {path} failed: {response.status_code}")
+                return False
+            reports = response.json()["reports"]
+            if any("_id" in report or "technical_feedback" in report for report in reports):
+                print(f"❌ {path} returned full documents")
+                return False
+            created = [report.get("created_at") or "" for report in reports]
+            if created != sorted(created, reverse=True):
+                print(f"❌ {path} not sorted newest first")
+                return False
+            print(f"   • {path}: {len(reports)} reports")
+        print("✅ Listings return listing fields, newest first")
+        return True
+    except Exception as e:
+        print(f"❌ Listing error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_single_query_per_collection(),
+        test_compare_candidates(),
+        test_report_listings(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cohort Collaboration Detection Test
+
+Tests cohort-wide collaborative cheating detection:
+1. A planted ring of three copying sessions is reported as one cluster
+2. Independent sessions are not clustered
+3. The per-session collaborative analysis keeps its response shape
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import requests
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+ANSWER_KEY = [random.Random(1).choice("ABCD") for _ in range(30)]
+
+def build_session(rng, ability, start):
+    responses, timestamp = [], start
+    for number, correct_answer in enumerate(ANSWER_KEY):
+        is_correct = rng.random() < ability
+        response_time = rng.uniform(10, 60)
+        timestamp += timedelta(seconds=response_time)
+        responses.append({
+            "question_id": f"q{number}",
+            "response": correct_answer if is_correct else rng.choice([c for c in "ABCD" if c != correct_answer]),
+            "is_correct": is_correct,
+            "response_time": response_time,
+            "timestamp": timestamp.isoformat()
+        })
+    return {"session_id": f"cohort-test-{uuid.uuid4()}", "responses": responses}
+
+def build_cohort(size=200, ring_size=3):
+    rng = random.Random(42)
+    start = datetime(2026, 10, 1, 9, 0)
+    sessions = [build_session(rng, rng.uniform(0.4, 0.9), start + timedelta(minutes=rng.uniform(0, 90)))
+                for _ in range(size)]
+    leader = sessions[0]
+    ring = [leader["session_id"]]
+    for k in range(1, ring_size):
+        copy = {"session_id": f"cohort-ring-{uuid.uuid4()}",
+                "responses": [dict(r, response_time=r["response_time"] * rng.uniform(0.9, 1.1)) for r in leader["responses"]]}
+        sessions[k] = copy
+        ring.append(copy["session_id"])
+    return sessions, ring
+
+def test_planted_ring_detected():
+    """The copying ring forms one cluster"""
+    print("🕸️ Testing cohort collaboration detection...")
+    try:
+        sessions, ring = build_cohort()
+        response = requests.post(
+            f"{BACKEND_URL}/statistical-analysis/detect-cohort-collaboration",
+            json={"sessions": sessions, "cohort_id": "cohort-test"},
+            timeout=120
+        )
+        print(f"Status Code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Cohort analysis failed: {response.text}")
+            return False
+
+        results = response.json()["analysis_results"]
+        print(f"   • {results['candidate_pairs']} candidate pairs of {results['all_pairs']} possible, "
+              f"{results['flagged_pair_count']} flagged, {results['timings_ms']['total_ms']} ms")
+        clusters = results.get("clusters", [])
+        if not any(set(ring) <= set(cluster["session_ids"]) for cluster in clusters):
+            print(f"❌ Planted ring not found in clusters: {clusters}")
+            return False
+        print(f"✅ Planted ring detected ({len(clusters)} cluster(s))")
+        return True
+    except Exception as e:
+        print(f"❌ Cohort collaboration error: {str(e)}")
+        return False
+
+def test_independent_sessions_not_clustered():
+    """A cohort without copying yields no clusters"""
+    print("\n👥 Testing independent cohort...")
+    try:
+        sessions, _ = build_cohort(ring_size=1)
+        response = requests.post(
+            f"{BACKEND_URL}/statistical-analysis/detect-cohort-collaboration",
+            json={"sessions": sessions},
+            timeout=120
+        )
+        if response.status_code != 200:
+            print(f"❌ Cohort analysis failed: {response.text}")
+            return False
+        clusters = response.json()["analysis_results"].get("clusters", [])
+        if clusters:
+            print(f"❌ Unexpected clusters: {[c['session_ids'] for c in clusters]}")
+            return False
+        print("✅ No clusters for independent sessions")
+        return True
+    except Exception as e:
+        print(f"❌ Independent cohort error: {str(e)}")
+        return False
+
+def test_per_session_analysis_shape():
+    """Per-session analysis still reports similarity, timing and clustering sections"""
+    print("\n🔍 Testing per-session collaborative analysis...")
+    try:
+        sessions, ring = build_cohort(size=20)
+        response = requests.post(
+            f"{BACKEND_URL}/statistical-analysis/detect-collaborative-cheating-patterns",
+            json={"session_data": sessions[0], "comparison_sessions": sessions[1:]},
+            timeout=60
+        )
+        if response.status_code != 200:
+            print(f"❌ Collaborative analysis failed: {response.text}")
+            return False
+        detailed = response.json()["analysis_results"]["detailed_analysis"]
+        for key in ["cross_session_analysis", "timing_coordination_analysis", "clustering_analysis"]:
+            if not detailed.get(key, {}).get("available"):
+                print(f"❌ {key} not available")
+                return False
+        flagged = {pair["session_id"] for pair in detailed["cross_session_analysis"]["high_similarity_pairs"]}
+        if not set(ring[1:]) <= flagged:
+            print(f"❌ Ring members missing from high similarity pairs: {flagged}")
+            return False
+        print("✅ Per-session analysis flags the ring members")
+        return True
+    except Exception as e:
+        print(f"❌ Per-session analysis error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_planted_ring_detected(), test_independent_sessions_not_clustered(), test_per_session_analysis_shape()]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
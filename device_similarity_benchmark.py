@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Device Similarity Index Benchmark
+
+Builds a DeviceSimilarityIndex over synthetic device fingerprints (default 1M)
+and measures:
+1. Bulk indexing throughput
+2. Near-match lookup latency for devices with a changed browser version
+3. Recall of the original device versus an exact linear scan of all signatures
+4. Exact-match digest throughput for canonical feature lists
+
+Usage: python device_similarity_benchmark.py [--devices 1000000] [--queries 1000]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('/app/backend')
+from device_similarity import DeviceSimilarityIndex, canonical_features, device_digest
+
+# Feature fields with vocabulary sizes, roughly following the fingerprint components
+FIELDS = {
+    "hardware.cpu_signature.model": 400, "hardware.cpu_signature.cores": 12, "hardware.cpu_signature.vendor": 4,
+    "hardware.cpu_signature.features[]": 60, "hardware.gpu_signature.renderer": 900, "hardware.gpu_signature.vendor": 6,
+    "hardware.gpu_signature.extensions[]": 80, "hardware.memory_signature.total_memory": 10,
+    "os.platform": 8, "os.version": 60, "os.language": 40, "os.timezone": 300,
+    "screen.screen_resolution.width": 30, "screen.screen_resolution.height": 30, "screen.color_depth": 4,
+    "browser.user_agent": 5000, "browser.browser_name": 6, "browser.browser_version": 120,
+    "browser.plugins[]": 200, "browser.languages[]": 60, "network.geolocation.city": 20000,
+}
+MULTI_VALUED = {"hardware.cpu_signature.features[]": 6, "hardware.gpu_signature.extensions[]": 8,
+                "browser.plugins[]": 5, "browser.languages[]": 2}
+BROWSER_FIELDS = ("browser.user_agent", "browser.browser_version")
+
+
+def build_vocabulary(rng):
+    columns, vocab = [], {}
+    for field, size in FIELDS.items():
+        vocab[field] = rng.integers(0, 2 ** 63, size=size, dtype=np.uint64)
+        columns.extend([field] * MULTI_VALUED.get(field, 1))
+    return columns, vocab
+
+
+def synth_tokens(rng, columns, vocab, n):
+    """(n x tokens) matrix of feature-token hashes"""
+    matrix = np.empty((n, len(columns)), dtype=np.uint64)
+    for j, field in enumerate(columns):
+        matrix[:, j] = vocab[field][rng.integers(0, len(vocab[field]), size=n)]
+    return matrix
+
+
+def change_browser(rng, tokens, columns, vocab):
+    changed = tokens.copy()
+    for j, field in enumerate(columns):
+        if field in BROWSER_FIELDS:
+            changed[j] = vocab[field][rng.integers(0, len(vocab[field]))]
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    columns, vocab = build_vocabulary(rng)
+    index = DeviceSimilarityIndex(capacity=args.devices, merge_threshold=4096)
+    print(f"🧮 Indexing {args.devices:,} synthetic fingerprints ({len(columns)} features each)...")
+
+    query_sources = {}
+    query_ids = set(rng.choice(args.devices, size=args.queries, replace=False).tolist())
+    start = time.perf_counter()
+    for offset in range(0, args.devices, args.chunk):
+        n = min(args.chunk, args.devices - offset)
+        tokens = synth_tokens(rng, columns, vocab, n)
+        index.add_many([f"device-{offset + i}" for i in range(n)], index.hasher.signatures(tokens))
+        for i in range(n):
+            if offset + i in query_ids:
+                query_sources[offset + i] = tokens[i]
+    build_seconds = time.perf_counter() - start
+    stats = index.get_stats()
+    print(f"✅ Indexed in {build_seconds:.1f}s ({args.devices / build_seconds:,.0f} fingerprints/s), "
+          f"index memory {stats['memory_bytes'] / 2 ** 20:.0f} MiB")
+
+    latencies, hits, scan_hits, scan_latencies = [], 0, 0, []
+    for device_number, tokens in query_sources.items():
+        signature = index.hasher.signature(change_browser(rng, tokens, columns, vocab))
+        t0 = time.perf_counter()
+        matches = index.query(signature, threshold=0.5, limit=5)
+        latencies.append(time.perf_counter() - t0)
+        hits += any(device_id == f"device-{device_number}" for device_id, _ in matches)
+
+        if len(scan_latencies) < 50:
+            t0 = time.perf_counter()
+            similarity = (index._signatures[:len(index)] == signature).mean(axis=1)
+            best = int(np.argmax(similarity))
+            scan_latencies.append(time.perf_counter() - t0)
+            scan_hits += best == device_number
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"🔎 LSH lookup: p50 {np.percentile(latencies_ms, 50):.3f} ms, p99 {np.percentile(latencies_ms, 99):.3f} ms, "
+          f"recall {hits / len(latencies):.1%} ({len(latencies)} changed-browser queries)")
+    print(f"🐢 Linear scan: p50 {np.median(scan_latencies) * 1000:.1f} ms, top-1 recall {scan_hits / len(scan_latencies):.1%} "
+          f"({len(scan_latencies)} queries)")
+
+    components = {
+        "hardware": {"cpu_signature": {"cores": 8, "vendor": "Intel", "model": "Core i7", "features": ["sse4_2", "avx2"]}},
+        "os": {"platform": "Win32", "version": "10.0", "timezone": "UTC"},
+        "browser": {"user_agent": "Mozilla/5.0 Chrome/118.0", "plugins": ["pdf", "nacl"], "languages": ["en-US"]},
+        "screen": {"screen_resolution": {"width": 1920, "height": 1080}, "color_depth": 24}
+    }
+    t0 = time.perf_counter()
+    for _ in range(10_000):
+        device_digest(canonical_features(components))
+    print(f"🔑 Canonical features + BLAKE2b digest: {(time.perf_counter() - t0) / 10_000 * 1e6:.1f} µs per fingerprint")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Device State Persistence Test
+
+Tests the bounded, MongoDB-backed device state behind device consistency tracking:
+1. Repeated tracking of one device accumulates session history (also across workers)
+2. Device state store statistics are exposed for admins
+"""
+
+import uuid
+import requests
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def build_signature(device_id):
+    return {
+        "device_id": device_id,
+        "hardware": {"cpu": {"cores": 8, "architecture": "x64", "vendor": "Intel"}, "memory": {"total": 16384}},
+        "os": {"platform": "Windows", "version": "10.0"},
+        "screen": {"width": 1920, "height": 1080, "color_depth": 24},
+        "browser": {"user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)", "language": "en-US"}
+    }
+
+def test_device_history_accumulates():
+    """Track the same device three times and check the session count grows"""
+    print("🖥️ Testing device history accumulation...")
+    try:
+        device_id = f"test-device-{uuid.uuid4()}"
+        totals = []
+        for _ in range(3):
+            response = requests.post(
+                f"{BACKEND_URL}/session-fingerprinting/track-device-consistency",
+                json={"device_id": device_id, "current_signature": build_signature(device_id), "user_id": "state-test-user"},
+                timeout=60
+            )
+            if response.status_code != 200:
+                print(f"❌ Tracking failed: {response.status_code} {response.text}")
+                return False
+            tracking = response.json()["device_tracking"]["tracking_update"]["tracking_metadata"]
+            totals.append(tracking["total_sessions"])
+
+        print(f"   • total_sessions per call: {totals}")
+        if totals != sorted(totals) or totals[-1] < 2:
+            print("❌ Device history did not accumulate")
+            return False
+        print("✅ Device history accumulated across calls")
+        return True
+    except Exception as e:
+        print(f"❌ Device history error: {str(e)}")
+        return False
+
+def test_device_state_stats():
+    """Store statistics endpoint"""
+    print("\n📊 Testing device state stats...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/device-state/stats", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Stats request failed: {response.text}")
+            return False
+
+        data = response.json()
+        for store in data.get("stores", []):
+            for key in ["cached_devices", "capacity", "pending_writes", "persistent"]:
+                if key not in store:
+                    print(f"❌ Missing stat {key} for {store.get('name')}")
+                    return False
+            print(f"   • {store['name']}: {store['cached_devices']}/{store['capacity']} cached, persistent={store['persistent']}")
+        print("✅ Device state stats returned")
+        return True
+    except Exception as e:
+        print(f"❌ Device state stats error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_device_history_accumulates(), test_device_state_stats()]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
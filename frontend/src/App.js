@@ -879,6 +879,8 @@ const AdminDashboard = ({ setCurrentPage }) => {
   const [roleArchetype, setRoleArchetype] = useState('General');
   const [interviewFocus, setInterviewFocus] = useState('Balanced');
   const [candidatePipeline, setCandidatePipeline] = useState([]);
+  const [pipelineCursor, setPipelineCursor] = useState(null);
+  const [pipelineLoadingMore, setPipelineLoadingMore] = useState(false);
   const [selectedCandidates, setSelectedCandidates] = useState([]);
   const [comparisonResults, setComparisonResults] = useState([]);
   const [detailedReportModal, setDetailedReportModal] = useState({ show: false, data: null, loading: false });
@@ -1226,12 +1228,30 @@ const AdminDashboard = ({ setCurrentPage }) => {
       if (response.ok) {
         const data = await response.json();
         setCandidatePipeline(data.pipeline || []);
+        setPipelineCursor(data.next_cursor || null);
       }
     } catch (err) {
       console.error('Failed to fetch candidate pipeline:', err);
     }
   };
 
+  const loadMoreCandidatePipeline = async () => {
+    if (!pipelineCursor || pipelineLoadingMore) return;
+    setPipelineLoadingMore(true);
+    try {
+      const response = await fetch(`${API}/admin/candidate-pipeline?cursor=${encodeURIComponent(pipelineCursor)}`);
+      if (response.ok) {
+        const data = await response.json();
+        setCandidatePipeline(prev => [...prev, ...(data.pipeline || [])]);
+        setPipelineCursor(data.next_cursor || null);
+      }
+    } catch (err) {
+      console.error('Failed to load more candidates:', err);
+    } finally {
+      setPipelineLoadingMore(false);
+    }
+  };
+
   const fetchDetailedReport = async (sessionId) => {
     setDetailedReportModal({ show: true, data: null, loading: true });
     try {
@@ -2486,6 +2506,18 @@ const AdminDashboard = ({ setCurrentPage }) => {
                   <p className="text-gray-300">Create interview tokens to see candidates here</p>
                 </div>
               )}
+
+              {pipelineCursor && (
+                <div className="text-center pt-2">
+                  <button
+                    onClick={loadMoreCandidatePipeline}
+                    disabled={pipelineLoadingMore}
+                    className="bg-white/10 hover:bg-white/20 disabled:opacity-50 text-white font-semibold py-2 px-6 rounded-lg border border-white/20 transition-colors duration-300"
+                  >
+                    {pipelineLoadingMore ? 'Loading...' : `Load more (${candidatePipeline.length} shown)`}
+                  </button>
+                </div>
+              )}
             </div>
           </div>
         )}
@@ -8,6 +8,100 @@
 
 import React, { useState, useEffect, useRef, useCallback } from 'react';
 
+// Compact columnar wire format (backend/biometric_wire_format.py, schema version 1):
+// "BBF" | version u8 | header length u32 LE | JSON header | little-endian columns.
+// Timestamps are quantized to 0.1 ms; timestamps and coordinates are delta encoded.
+const WIRE_MAGIC = [0x42, 0x42, 0x46];
+const WIRE_SCHEMA_VERSION = 1;
+const WIRE_TIME_SCALE = 10;
+const KEY_FLAGS = { keyup: 1, shift: 2, ctrl: 4, alt: 8, meta: 16 };
+
+const clamp = (value, min, max) => Math.max(min, Math.min(max, value));
+
+// Column writers: delta columns store the difference to the previous (quantized) value
+const deltaColumn = (ArrayType, values, min, max) => {
+    const column = new ArrayType(values.length);
+    let previous = 0;
+    values.forEach((value, i) => {
+        const current = Math.round(value);
+        column[i] = clamp(current - previous, min, max);
+        previous += column[i];
+    });
+    return column;
+};
+
+const valueColumn = (ArrayType, values) => ArrayType.from(values);
+
+export const encodeBiometricFrame = ({ sessionId, consentGiven, uploadId, sequence, keystrokeData, mouseData, scrollData, timingData }) => {
+    const INT16 = [-32768, 32767];
+    const INT32 = [-2147483648, 2147483647];
+    const time = (events) => deltaColumn(Int32Array, events.map(e => e.timestamp * WIRE_TIME_SCALE), ...INT32);
+
+    const keys = [];
+    const keyIndex = new Map();
+    const keyColumn = keystrokeData.map(e => {
+        if (!keyIndex.has(e.key)) {
+            keyIndex.set(e.key, keys.length);
+            keys.push(e.key);
+        }
+        return keyIndex.get(e.key);
+    });
+    const flags = keystrokeData.map(e => (e.event_type === 'keyup' ? KEY_FLAGS.keyup : 0) |
+        (e.shift_key ? KEY_FLAGS.shift : 0) | (e.ctrl_key ? KEY_FLAGS.ctrl : 0) |
+        (e.alt_key ? KEY_FLAGS.alt : 0) | (e.meta_key ? KEY_FLAGS.meta : 0));
+
+    // Column order must match SCHEMAS[1] on the backend
+    const columns = [
+        time(keystrokeData),
+        valueColumn(Uint16Array, keyColumn),
+        valueColumn(Uint8Array, flags),
+        time(mouseData),
+        deltaColumn(Int16Array, mouseData.map(e => e.x), ...INT16),
+        deltaColumn(Int16Array, mouseData.map(e => e.y), ...INT16),
+        valueColumn(Uint8Array, mouseData.map(e => (e.event_type === 'click' ? 1 : 0))),
+        valueColumn(Int8Array, mouseData.map(e => e.button || 0)),
+        time(scrollData),
+        deltaColumn(Int32Array, scrollData.map(e => e.x), ...INT32),
+        deltaColumn(Int32Array, scrollData.map(e => e.y), ...INT32),
+        valueColumn(Int16Array, scrollData.map(e => clamp(Math.round(e.deltaX), ...INT16))),
+        valueColumn(Int16Array, scrollData.map(e => clamp(Math.round(e.deltaY), ...INT16)))
+    ];
+
+    const header = new TextEncoder().encode(JSON.stringify({
+        session_id: sessionId,
+        consent_given: consentGiven,
+        upload_id: uploadId,
+        sequence: sequence,
+        counts: { keystroke: keystrokeData.length, mouse: mouseData.length, scroll: scrollData.length },
+        keys: keys,
+        timing_data: timingData
+    }));
+
+    const bodyLength = columns.reduce((total, column) => total + column.byteLength, 0);
+    const frame = new Uint8Array(8 + header.length + bodyLength);
+    frame.set(WIRE_MAGIC, 0);
+    frame[3] = WIRE_SCHEMA_VERSION;
+    new DataView(frame.buffer).setUint32(4, header.length, true);
+    frame.set(header, 8);
+    let offset = 8 + header.length;
+    columns.forEach(column => {
+        frame.set(new Uint8Array(column.buffer), offset);  // typed arrays are little-endian on all browser platforms
+        offset += column.byteLength;
+    });
+    return frame;
+};
+
+const newUploadId = () => {
+    if (typeof crypto !== 'undefined' && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+};
+
+const gzipFrame = async (frame) => {
+    if (typeof CompressionStream === 'undefined') return frame;
+    const stream = new Blob([frame]).stream().pipeThrough(new CompressionStream('gzip'));
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+};
+
 class BiometricDataCollector {
     constructor(sessionId, consentGiven = false) {
         this.sessionId = sessionId;
@@ -25,6 +119,10 @@ class BiometricDataCollector {
         this.maxDataPoints = 1000; // Limit data collection to prevent memory issues
         this.submitInterval = 30000; // Submit every 30 seconds
         this.submitTimer = null;
+        this.useWireFormat = typeof TextEncoder !== 'undefined';
+        // Chunks are stored per (session, upload, sequence): a new collector (reload, remount) starts a new upload
+        this.uploadId = newUploadId();
+        this.chunkSequence = 0;
         
         // Event listeners
         this.boundKeydownHandler = this.handleKeydown.bind(this);
@@ -279,23 +377,9 @@ class BiometricDataCollector {
         try {
             const backendUrl = process.env.REACT_APP_BACKEND_URL || '';
             
-            const payload = {
-                session_id: this.sessionId,
-                keystroke_data: [...this.keystrokeData],
-                mouse_data: [...this.mouseData],
-                scroll_data: [...this.scrollData],
-                click_data: [...this.clickData],
-                timing_data: [...this.timingData],
-                consent_given: this.consentGiven
-            };
-            
-            const response = await fetch(`${backendUrl}/api/security/biometric-data/submit`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(payload)
-            });
+            const response = this.useWireFormat
+                ? await this.postWireFrame(backendUrl)
+                : await this.postJson(backendUrl);
             
             if (response.ok) {
                 const result = await response.json();
@@ -317,6 +401,54 @@ class BiometricDataCollector {
         }
     }
     
+    async postWireFrame(backendUrl) {
+        const sequence = this.chunkSequence++;
+        const frame = encodeBiometricFrame({
+            sessionId: this.sessionId,
+            consentGiven: this.consentGiven,
+            uploadId: this.uploadId,
+            sequence: sequence,
+            keystrokeData: this.keystrokeData,
+            mouseData: this.mouseData,
+            scrollData: this.scrollData,
+            timingData: this.timingData
+        });
+        const response = await fetch(`${backendUrl}/api/security/biometric-data/ingest`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/octet-stream',
+            },
+            body: await gzipFrame(frame)
+        });
+        
+        // Older backends without the ingest endpoint: fall back to JSON for the rest of the session
+        if (response.status === 404 || response.status === 415) {
+            this.useWireFormat = false;
+            return this.postJson(backendUrl);
+        }
+        return response;
+    }
+    
+    postJson(backendUrl) {
+        const payload = {
+            session_id: this.sessionId,
+            keystroke_data: [...this.keystrokeData],
+            mouse_data: [...this.mouseData],
+            scroll_data: [...this.scrollData],
+            click_data: [...this.clickData],
+            timing_data: [...this.timingData],
+            consent_given: this.consentGiven
+        };
+        
+        return fetch(`${backendUrl}/api/security/biometric-data/submit`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(payload)
+        });
+    }
+    
     // Get current data stats (for debugging)
     getDataStats() {
         return {
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Inference Micro-Batching Test
+
+Tests the /api/ai/inference-batchers/stats endpoint and that concurrent
+interview-message style requests are grouped into batches.
+"""
+
+import requests
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def test_batcher_stats():
+    """Registered batchers report batch sizes and latency percentiles"""
+    print("📦 Testing inference batcher stats...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/ai/inference-batchers/stats", timeout=30)
+        print(f"Status Code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Request failed: {response.text}")
+            return False
+
+        batchers = response.json().get("batchers", {})
+        for name in ["text_emotion"]:
+            if name not in batchers:
+                print(f"❌ Missing batcher: {name}")
+                return False
+            stats = batchers[name]
+            for key in ["requests", "batches", "avg_batch_size", "latency_ms"]:
+                if key not in stats:
+                    print(f"❌ Batcher {name} missing stat {key}")
+                    return False
+            print(f"   • {name}: {stats['requests']} requests in {stats['batches']} batches "
+                  f"(avg {stats['avg_batch_size']}), p95 {stats['latency_ms']['p95']} ms")
+        print("✅ Inference batcher stats available")
+        return True
+    except Exception as e:
+        print(f"❌ Batcher stats error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    test_batcher_stats()
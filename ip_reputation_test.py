@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+IP Reputation Index Test
+
+Tests the feed-backed IP reputation index using the bundled sample feeds
+(backend/ip_feeds, documentation address space only):
+1. Sample feed lookups for IPv4, IPv6 and IPv4-mapped addresses
+2. Trie lookups agree with a brute-force scan over random prefixes
+3. Feed changes are picked up by an atomic reload; old snapshots stay intact
+4. Lookup latency with a large synthetic feed
+5. POST /session-fingerprinting/ip-reputation
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.append('/app/backend')
+from ip_reputation import IPReputationIndex, PrefixTrie
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+SAMPLE_FEEDS = os.path.join('/app/backend', 'ip_feeds')
+
+def test_sample_feed_lookups():
+    """Known addresses from the bundled sample feeds"""
+    print("🌐 Testing sample feed lookups...")
+    try:
+        index = IPReputationIndex(SAMPLE_FEEDS, background_reload=False)
+        expected = {
+            "198.51.100.70": {"datacenter", "vpn"},
+            "203.0.113.70": {"datacenter", "blocklist"},
+            "203.0.113.200": set(),
+            "192.0.2.11": {"tor_exit", "blocklist"},
+            "::ffff:192.0.2.10": {"tor_exit"},
+            "2001:db8:1000::5": {"datacenter"},
+            "2001:db8:dead::1": {"blocklist"},
+            "8.8.8.8": set(),
+        }
+        for ip_address, categories in expected.items():
+            result = index.lookup(ip_address)
+            if set(result.categories) != categories:
+                print(f"❌ {ip_address}: expected {sorted(categories)}, got {list(result.categories)}")
+                return False
+        if index.lookup("invalid_ip").valid:
+            print("❌ invalid_ip reported as a valid address")
+            return False
+        stats = index.get_stats()
+        print(f"   • {stats['ipv4_prefixes']} IPv4 / {stats['ipv6_prefixes']} IPv6 prefixes from {len(stats['feeds'])} feeds")
+        print("✅ Sample feed lookups correct")
+        return True
+    except Exception as e:
+        print(f"❌ Sample feed error: {str(e)}")
+        return False
+
+def test_trie_matches_brute_force():
+    """All containing prefixes, compared with a linear scan"""
+    print("\n🌳 Testing trie against brute force...")
+    try:
+        rng = random.Random(7)
+        for width in (32, 128):
+            trie = PrefixTrie(width)
+            prefixes = []
+            for _ in range(2000):
+                length = rng.randint(0, width) if rng.random() < 0.2 else rng.randint(8, width // 2)
+                value = rng.getrandbits(width) >> (width - length) << (width - length) if length else 0
+                tag = 1 << rng.randrange(4)
+                prefixes.append((value, length, tag))
+                trie.insert(value, length, tag)
+
+            for _ in range(2000):
+                base_value, base_length, _ = rng.choice(prefixes)
+                address = base_value | rng.getrandbits(width - base_length) if rng.random() < 0.8 else rng.getrandbits(width)
+                expected = 0
+                for value, length, tag in prefixes:
+                    if length == 0 or not (address ^ value) >> (width - length):
+                        expected |= tag
+                found = 0
+                for node in trie.matches(address):
+                    found |= trie.tags[node]
+                if found != expected:
+                    print(f"❌ IPv{4 if width == 32 else 6} address {address:x}: expected tags {expected}, got {found}")
+                    return False
+        print("✅ Trie matches brute force for IPv4 and IPv6")
+        return True
+    except Exception as e:
+        print(f"❌ Brute-force comparison error: {str(e)}")
+        return False
+
+def test_atomic_reload():
+    """A changed feed swaps in a new snapshot without touching the old one"""
+    print("\n🔄 Testing feed reload...")
+    try:
+        feed_dir = tempfile.mkdtemp()
+        for name in os.listdir(SAMPLE_FEEDS):
+            shutil.copy(os.path.join(SAMPLE_FEEDS, name), feed_dir)
+        index = IPReputationIndex(feed_dir, refresh_seconds=0, background_reload=False)
+        old_snapshot = index.snapshot
+        if index.lookup("100.64.1.1").categories:
+            print("❌ 100.64.1.1 tagged before it was added")
+            return False
+
+        # Feeds are replaced by rename, the way a feed updater should write them
+        staged = os.path.join(feed_dir, ".proxy.txt.tmp")
+        with open(staged, "w") as handle:
+            handle.write("# open proxies\n100.64.0.0/16\n")
+        os.replace(staged, os.path.join(feed_dir, "proxy.txt"))
+
+        result = index.lookup("100.64.1.1")
+        if result.categories != ("proxy",) or result.index_version == old_snapshot.version:
+            print(f"❌ Reload not applied: {result.to_dict()}")
+            return False
+        if old_snapshot.lookup("100.64.1.1").categories:
+            print("❌ Previous snapshot was modified in place")
+            return False
+        if index.reload():
+            print("❌ Reload without feed changes rebuilt the index")
+            return False
+        print(f"   • {old_snapshot.version} → {result.index_version}")
+        print("✅ Feed change reloaded atomically")
+        return True
+    except Exception as e:
+        print(f"❌ Reload error: {str(e)}")
+        return False
+
+def test_large_feed_lookup_latency(prefix_count=500000):
+    """Bulk build and per-lookup latency with a large synthetic IPv4 feed"""
+    print(f"\n⏱️ Testing lookup latency with {prefix_count} prefixes...")
+    try:
+        rng = random.Random(11)
+        prefixes = []
+        for _ in range(prefix_count):
+            length = rng.randint(16, 32)
+            prefixes.append((rng.getrandbits(32) >> (32 - length) << (32 - length), length, 1, None))
+        started = time.perf_counter()
+        trie = PrefixTrie(32)
+        trie.insert_sorted(sorted(prefixes, key=lambda prefix: (prefix[0], prefix[1])))
+        trie.finalize()
+        build_seconds = time.perf_counter() - started
+
+        addresses = [rng.getrandbits(32) for _ in range(100000)]
+        started = time.perf_counter()
+        for address in addresses:
+            trie.matches(address)
+        lookup_us = (time.perf_counter() - started) / len(addresses) * 1e6
+        print(f"   • build {build_seconds:.1f}s, {trie.node_count} nodes, {lookup_us:.1f} µs per lookup")
+        if lookup_us > 50:
+            print("❌ Lookups slower than expected")
+            return False
+        print("✅ Lookups stay in microseconds")
+        return True
+    except Exception as e:
+        print(f"❌ Latency test error: {str(e)}")
+        return False
+
+def test_ip_reputation_endpoint():
+    """POST /session-fingerprinting/ip-reputation with the bundled sample feeds"""
+    print("\n📡 Testing IP reputation endpoint...")
+    try:
+        response = requests.post(
+            f"{BACKEND_URL}/session-fingerprinting/ip-reputation",
+            json={"ip_addresses": ["192.0.2.10", "203.0.113.70", "8.8.8.8", "2001:db8:dead::1"]},
+            timeout=30
+        )
+        if response.status_code != 200:
+            print(f"❌ Lookup failed: {response.status_code} {response.text}")
+            return False
+        results = {result["ip_address"]: result for result in response.json()["results"]}
+        if "tor_exit" not in results["192.0.2.10"]["categories"] or results["8.8.8.8"]["categories"]:
+            print(f"❌ Unexpected categories: {results}")
+            return False
+        print(f"   • index version {response.json()['index_version']}")
+        print("✅ IP reputation endpoint working")
+        return True
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_sample_feed_lookups(),
+        test_trie_matches_brute_force(),
+        test_atomic_reload(),
+        test_large_feed_lookup_latency(),
+        test_ip_reputation_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Keystroke Dynamics Test
+
+Tests the array-based keystroke analyzer:
+1. A one-shot submission returns dwell/flight statistics and digraph statistics
+2. Streaming the same events in batches gives the same totals as one submission
+"""
+
+import random
+import uuid
+
+import requests
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def build_keystrokes(count=2000, seed=7):
+    rng = random.Random(seed)
+    events, timestamp = [], 1700000000.0
+    for _ in range(count // 2):
+        key = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+        timestamp += rng.uniform(0.05, 0.3)
+        events.append({"key": key, "timestamp": timestamp, "event_type": "keydown"})
+        events.append({"key": key, "timestamp": timestamp + rng.uniform(0.03, 0.15), "event_type": "keyup"})
+    return events
+
+def test_one_shot_analysis():
+    """Submit all keystrokes at once"""
+    print("⌨️ Testing keystroke analysis...")
+    try:
+        response = requests.post(
+            f"{BACKEND_URL}/security/biometric-data/submit",
+            json={"session_id": f"keystroke-test-{uuid.uuid4()}", "keystroke_data": build_keystrokes(), "consent_given": True},
+            timeout=60
+        )
+        if response.status_code != 200:
+            print(f"❌ Submission failed: {response.status_code} {response.text}")
+            return False
+
+        patterns = response.json()["analysis_results"]["keystroke_analysis"]["typing_patterns"]
+        rhythm = patterns["rhythm_analysis"]
+        if "dwell_time_stats" not in rhythm or not patterns.get("digraph_statistics"):
+            print(f"❌ Missing rhythm or digraph statistics: {rhythm}")
+            return False
+        print(f"   • mean dwell {rhythm['dwell_time_stats']['mean']:.3f}s, mean flight {rhythm['flight_time_stats']['mean']:.3f}s, "
+              f"top digraph {patterns['digraph_statistics'][0]['digraph']}")
+        print("✅ Keystroke analysis returned rhythm and digraph statistics")
+        return True
+    except Exception as e:
+        print(f"❌ Keystroke analysis error: {str(e)}")
+        return False
+
+def test_streamed_batches_match_one_shot():
+    """Stream events in four batches and compare totals with a one-shot analysis"""
+    print("\n🌊 Testing keystroke stream...")
+    try:
+        events = build_keystrokes()
+        session_id = f"keystroke-stream-{uuid.uuid4()}"
+        batches = [events[i:i + 500] for i in range(0, len(events), 500)]
+        result = None
+        for number, batch in enumerate(batches):
+            response = requests.post(
+                f"{BACKEND_URL}/security/biometric-data/keystroke-stream",
+                json={"session_id": session_id, "keystroke_data": batch, "consent_given": True,
+                      "finalize": number == len(batches) - 1},
+                timeout=30
+            )
+            if response.status_code != 200:
+                print(f"❌ Stream batch {number} failed: {response.text}")
+                return False
+            result = response.json()["keystroke_analysis"]
+
+        one_shot = requests.post(
+            f"{BACKEND_URL}/security/biometric-data/submit",
+            json={"session_id": f"keystroke-test-{uuid.uuid4()}", "keystroke_data": events, "consent_given": True},
+            timeout=60
+        ).json()["analysis_results"]["keystroke_analysis"]["typing_patterns"]
+
+        streamed = result["typing_patterns"]
+        print(f"   • batches {result['stream']['batches']}, keystrokes {streamed['total_keystrokes']} vs {one_shot['total_keystrokes']}")
+        if result["stream"]["restarted"] or result["stream"]["missed_batches"]:
+            print(f"❌ Stream restarted mid-session: {result['stream']}")
+            return False
+        if streamed["total_keystrokes"] != one_shot["total_keystrokes"]:
+            print("❌ Keystroke totals differ")
+            return False
+        streamed_mean = streamed["rhythm_analysis"]["dwell_time_stats"]["mean"]
+        one_shot_mean = one_shot["rhythm_analysis"]["dwell_time_stats"]["mean"]
+        if abs(streamed_mean - one_shot_mean) > 1e-9:
+            print(f"❌ Mean dwell differs: {streamed_mean} vs {one_shot_mean}")
+            return False
+        print("✅ Streamed statistics match the one-shot analysis")
+        return True
+    except Exception as e:
+        print(f"❌ Keystroke stream error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_one_shot_analysis(), test_streamed_batches_match_one_shot()]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Anomaly Model Registry Test
+
+Tests versioned model persistence and batch anomaly scoring:
+1. A retrain in one worker is hot-swapped into another worker through CURRENT
+2. Artifacts are loaded memory-mapped and old versions are pruned
+3. Batch scoring gives the same overall assessment as single-session detection
+4. POST /anomaly-detection/score-sessions-batch scores a batch of sessions
+"""
+
+import random
+import sys
+import tempfile
+
+import numpy as np
+import requests
+
+sys.path.append('/app/backend')
+from anomaly_detection_engine import AnomalyDetectionEngine
+from model_registry import ModelRegistry
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def build_session(session_id, rng, fast=False):
+    """Session in the detect-response-pattern-anomalies format"""
+    responses = [
+        {
+            "question_id": f"q{q}",
+            "is_correct": rng.random() < (0.95 if fast else 0.6),
+            "response_time": rng.uniform(2, 5) if fast else rng.uniform(20, 90),
+            "difficulty": rng.choice([1, 2, 3])
+        }
+        for q in range(20)
+    ]
+    return {"session_id": session_id, "responses": responses}
+
+def test_hot_swap_between_workers():
+    """Two engines sharing a registry root: the second picks up the first's retrain"""
+    print("🔁 Testing model hot-swap...")
+    try:
+        rng = random.Random(3)
+        root = tempfile.mkdtemp()
+        trainer = AnomalyDetectionEngine(ModelRegistry(root, refresh_seconds=0, keep_versions=2))
+        worker = AnomalyDetectionEngine(ModelRegistry(root, refresh_seconds=0))
+        history = [build_session(f"hist-{i}", rng) for i in range(60)]
+
+        versions = [trainer.train_baseline_models(history)["model_version"] for _ in range(3)]
+        active = worker.get_model_registry_status()
+        if active["active_version"] != versions[-1]:
+            print(f"❌ Worker serves {active['active_version']}, expected {versions[-1]}")
+            return False
+        saved = [entry["version"] for entry in active["versions"]]
+        if len(saved) != 2 or versions[0] in saved:
+            print(f"❌ Expected the two newest versions to be kept, found {saved}")
+            return False
+        pca = worker._current_models().artifacts["pca"]
+        if not isinstance(pca.components_, np.memmap):
+            print(f"❌ PCA components not memory-mapped: {type(pca.components_)}")
+            return False
+        print(f"   • worker swapped to {versions[-1]}, kept {len(saved)} versions, arrays memory-mapped")
+        print("✅ Retrained model hot-swapped")
+        return True
+    except Exception as e:
+        print(f"❌ Hot-swap error: {str(e)}")
+        return False
+
+def test_batch_matches_single_detection():
+    """score_sessions_batch vs detect_response_pattern_anomalies"""
+    print("\n🧮 Testing batch scoring equivalence...")
+    try:
+        rng = random.Random(5)
+        engine = AnomalyDetectionEngine(ModelRegistry(tempfile.mkdtemp()))
+        engine.train_baseline_models([build_session(f"hist-{i}", rng) for i in range(60)])
+        sessions = [build_session(f"live-{i}", rng, fast=i % 4 == 0) for i in range(50)]
+
+        batch = engine.score_sessions_batch(sessions)
+        mismatched = [
+            session["session_id"] for session in sessions
+            if engine.detect_response_pattern_anomalies(session)["overall_assessment"]
+            != batch["results"][session["session_id"]]["overall_assessment"]
+        ]
+        if not batch["success"] or mismatched:
+            print(f"❌ Batch results differ for {mismatched[:5]}")
+            return False
+        flagged = sum(result["overall_assessment"]["anomaly_detected"] for result in batch["results"].values())
+        print(f"   • {batch['sessions_scored']} sessions scored, {flagged} flagged")
+        print("✅ Batch and single-session assessments agree")
+        return True
+    except Exception as e:
+        print(f"❌ Batch equivalence error: {str(e)}")
+        return False
+
+def test_batch_scoring_endpoint():
+    """POST /anomaly-detection/score-sessions-batch"""
+    print("\n📊 Testing batch scoring endpoint...")
+    try:
+        rng = random.Random(9)
+        training = requests.post(
+            f"{BACKEND_URL}/anomaly-detection/train-baseline-models",
+            json={"historical_data": [build_session(f"hist-{i}", rng) for i in range(60)]},
+            timeout=120
+        )
+        if training.status_code != 200:
+            print(f"❌ Training failed: {training.status_code} {training.text}")
+            return False
+
+        response = requests.post(
+            f"{BACKEND_URL}/anomaly-detection/score-sessions-batch",
+            json={"sessions": [build_session(f"batch-{i}", rng, fast=i % 4 == 0) for i in range(100)]},
+            timeout=120
+        )
+        if response.status_code != 200:
+            print(f"❌ Batch scoring failed: {response.status_code} {response.text}")
+            return False
+        batch = response.json()["batch_results"]
+        if batch["sessions_scored"] != 100 or batch["model_version"] != training.json()["training_results"]["model_version"]:
+            print(f"❌ Unexpected batch result: {batch['sessions_scored']} scored with {batch['model_version']}")
+            return False
+        print(f"   • 100 sessions scored with model {batch['model_version']}")
+        print("✅ Batch scoring endpoint working")
+        return True
+    except Exception as e:
+        print(f"❌ Batch endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_hot_swap_between_workers(),
+        test_batch_matches_single_detection(),
+        test_batch_scoring_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
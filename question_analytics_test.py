@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+AI Question Analytics Test
+
+Tests the counter-backed /admin/aptitude-questions/ai-analytics:
+1. Incremental counters match the previous full-scan Python loop
+2. Updates apply as a removed/added delta
+3. The aggregation only scans the indexed AI subset
+4. The endpoint keeps its response shape and reports where numbers came from
+"""
+
+import random
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from question_analytics import build_ai_analytics_pipeline, counter_delta, format_ai_analytics, source_kind
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def random_question(rng):
+    metadata = {"source": rng.choice(["ai_gemini", "ai_gemini_enhanced", "admin_bulk", None])}
+    if rng.random() < 0.7:
+        metadata["quality_validation"] = {"quality_score": round(rng.random(), 2), "valid": rng.random() < 0.6}
+    if rng.random() < 0.5:
+        metadata["job_relevance_score"] = round(rng.random(), 2)
+    if rng.random() < 0.5:
+        metadata["industry"] = rng.choice(["technology", "finance"])
+    if rng.random() < 0.3:
+        metadata["contextual_enhancement"] = True
+    return {
+        "topic": rng.choice(["numerical_reasoning", "logical_reasoning"]),
+        "difficulty": rng.choice(["easy", "medium", "hard"]),
+        "metadata": metadata
+    }
+
+def full_scan_analytics(questions):
+    """The endpoint's previous implementation, for comparison"""
+    ai_questions = [q for q in questions if "ai_" in (q["metadata"].get("source") or "")]
+    analytics = {"total_ai_questions": len(ai_questions), "by_source": {}, "by_topic": {},
+                 "by_difficulty": {}, "by_industry": {},
+                 "quality_metrics": {"high_quality_count": 0, "contextual_questions": 0},
+                 "validation_status": {"validated": 0, "needs_validation": 0, "failed_validation": 0}}
+    quality_scores, relevance_scores = [], []
+    for q in ai_questions:
+        metadata = q.get("metadata", {})
+        for name, value in (("by_source", metadata.get("source", "unknown")), ("by_topic", q.get("topic", "unknown")),
+                            ("by_difficulty", q.get("difficulty", "unknown")),
+                            ("by_industry", metadata.get("industry", "general"))):
+            analytics[name][value] = analytics[name].get(value, 0) + 1
+        quality_validation = metadata.get("quality_validation", {})
+        quality_scores.append(quality_validation.get("quality_score", 0.5))
+        relevance_scores.append(metadata.get("job_relevance_score", 0.5))
+        if quality_scores[-1] >= 0.8:
+            analytics["quality_metrics"]["high_quality_count"] += 1
+        if metadata.get("contextual_enhancement"):
+            analytics["quality_metrics"]["contextual_questions"] += 1
+        if quality_validation:
+            state = "validated" if quality_validation.get("valid", False) else "failed_validation"
+        else:
+            state = "needs_validation"
+        analytics["validation_status"][state] += 1
+    analytics["quality_metrics"]["average_quality_score"] = round(sum(quality_scores) / len(quality_scores), 3)
+    analytics["quality_metrics"]["average_job_relevance"] = round(sum(relevance_scores) / len(relevance_scores), 3)
+    return analytics
+
+def apply(counters, delta):
+    """What $inc does to the stored counters document"""
+    for key, value in delta.items():
+        node = counters
+        *parents, leaf = key.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = node.get(leaf, 0) + value
+    return counters
+
+def test_counters_match_full_scan():
+    """Counters built insert by insert reproduce the old analytics"""
+    print("🧮 Testing incremental counters...")
+    try:
+        rng = random.Random(47)
+        questions = [random_question(rng) for _ in range(500)]
+        counters = {}
+        for i in range(0, len(questions), 37):
+            apply(counters, counter_delta(added=questions[i:i + 37]))
+        analytics = format_ai_analytics(counters)["analytics"]
+        expected = full_scan_analytics(questions)
+        for key in ("average_quality_score", "average_job_relevance"):
+            if abs(analytics["quality_metrics"].pop(key) - expected["quality_metrics"].pop(key)) > 0.0015:
+                print(f"❌ {key} differs")
+                return False
+        if analytics != expected:
+            print(f"❌ Counters differ from the full scan:\n   {analytics}\n   {expected}")
+            return False
+        print(f"   • {expected['total_ai_questions']} AI questions out of {len(questions)}")
+        print("✅ Counters match the full-scan analytics")
+        return True
+    except Exception as e:
+        print(f"❌ Counter error: {str(e)}")
+        return False
+
+def test_update_delta():
+    """A refinement moves a question between groups without touching the rest"""
+    print("\n✏️ Testing update deltas...")
+    try:
+        before = {"topic": "numerical_reasoning", "difficulty": "easy",
+                  "metadata": {"source": "ai_gemini", "job_relevance_score": 0.4}}
+        after = {**before, "metadata": {**before["metadata"], "job_relevance_score": 0.9}}
+        delta = counter_delta(removed=[before], added=[after])
+        if set(delta) != {"job_relevance_sum"} or abs(delta["job_relevance_sum"] - 0.5) > 1e-9:
+            print(f"❌ Unexpected delta: {delta}")
+            return False
+        if counter_delta(added=[{"metadata": {"source": "admin_bulk"}}]):
+            print("❌ Non-AI question counted")
+            return False
+        if (source_kind("ai_gemini"), source_kind("admin_bulk"), source_kind(None)) != ("ai", "import", "template"):
+            print("❌ Source kinds not normalized")
+            return False
+        print("✅ Updates apply as removed/added deltas")
+        return True
+    except Exception as e:
+        print(f"❌ Delta error: {str(e)}")
+        return False
+
+def test_pipeline_shape():
+    """One indexed $match, then a single $facet"""
+    print("\n🧱 Testing aggregation shape...")
+    try:
+        stages = build_ai_analytics_pipeline()
+        if stages[0] != {"$match": {"metadata.source_kind": "ai"}} or list(stages[1]) != ["$facet"] or len(stages) != 2:
+            print(f"❌ Unexpected pipeline: {[next(iter(stage)) for stage in stages]}")
+            return False
+        if set(stages[1]["$facet"]) != {"by_source", "by_topic", "by_difficulty", "by_industry", "totals"}:
+            print(f"❌ Missing facets: {list(stages[1]['$facet'])}")
+            return False
+        print("✅ Single $facet over the AI subset")
+        return True
+    except Exception as e:
+        print(f"❌ Pipeline error: {str(e)}")
+        return False
+
+def test_analytics_endpoint():
+    """Counter reads and refreshed aggregation agree"""
+    print("\n📊 Testing AI analytics endpoint...")
+    try:
+        responses = [requests.get(f"{BACKEND_URL}/admin/aptitude-questions/ai-analytics",
+                                  params={"refresh": refresh}, timeout=60) for refresh in ("true", "false")]
+        if any(response.status_code != 200 for response in responses):
+            print(f"❌ Request failed: {[response.status_code for response in responses]}")
+            return False
+        refreshed, cached = (response.json() for response in responses)
+        if refreshed["computed_from"] != "aggregation" or cached["computed_from"] != "counters":
+            print(f"❌ Unexpected sources: {refreshed['computed_from']}, {cached['computed_from']}")
+            return False
+        if refreshed.get("summary") != cached.get("summary"):
+            print(f"❌ Counters drifted from the aggregation: {cached.get('summary')} vs {refreshed.get('summary')}")
+            return False
+        print(f"   • Summary: {cached.get('summary')}")
+        print("✅ Analytics served from counters")
+        return True
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_counters_match_full_scan(),
+        test_update_delta(),
+        test_pipeline_shape(),
+        test_analytics_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Question Bank Stats Test
+
+Tests the counter-backed /admin/aptitude-questions/stats:
+1. $inc deltas from inserts, updates and deletes match a recount
+2. Reconciliation groups by (topic, subtopic, difficulty, question_type) in one stage
+3. The endpoint serves counters that agree with a reconciliation
+"""
+
+import random
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from question_bank_stats import bank_delta, build_bank_stats_pipeline, counters_from_groups, summarize_bank_stats
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def apply(counters, delta):
+    """What $inc does to the stored counters document"""
+    for key, value in delta.items():
+        node = counters
+        *parents, leaf = key.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = node.get(leaf, 0) + value
+    return counters
+
+def random_question(rng):
+    return {
+        "topic": rng.choice(["numerical_reasoning", "logical_reasoning", "verbal_comprehension"]),
+        "subtopic": rng.choice(["arithmetic", "sequences", "percentages"]),
+        "difficulty": rng.choice(["easy", "medium", "hard"]),
+        "question_type": rng.choice(["multiple_choice", "numerical_input"])
+    }
+
+def test_deltas_match_recount():
+    """Random inserts, updates and deletes"""
+    print("🧮 Testing incremental bank counters...")
+    try:
+        rng = random.Random(48)
+        bank, counters = [], {}
+        for _ in range(2000):
+            action = rng.random()
+            if action < 0.6 or not bank:
+                doc = random_question(rng)
+                bank.append(doc)
+                apply(counters, bank_delta(added=[doc]))
+            elif action < 0.8:
+                i = rng.randrange(len(bank))
+                updated = {**bank[i], "difficulty": rng.choice(["easy", "medium", "hard"])}
+                apply(counters, bank_delta(removed=[bank[i]], added=[updated]))
+                bank[i] = updated
+            else:
+                doc = bank.pop(rng.randrange(len(bank)))
+                apply(counters, bank_delta(removed=[doc]))
+        groups = {}
+        for doc in bank:
+            key = tuple(doc[field] for field in ("topic", "subtopic", "difficulty", "question_type"))
+            groups[key] = groups.get(key, 0) + 1
+        expected = counters_from_groups(
+            {"_id": dict(zip(("topic", "subtopic", "difficulty", "question_type"), key)), "count": count}
+            for key, count in groups.items())
+        live_cells = {key: count for key, count in counters["cells"].items() if count}
+        if counters["total"] != len(bank) or live_cells != expected["cells"]:
+            print(f"❌ Counters drifted: total {counters['total']} vs {len(bank)}")
+            return False
+        summary = summarize_bank_stats(counters, ["spatial_reasoning"], ["easy", "medium", "hard"])
+        if summary["by_topic"]["spatial_reasoning"] != 0 or sum(summary["by_difficulty"].values()) != len(bank):
+            print(f"❌ Unexpected summary: {summary['by_topic']} {summary['by_difficulty']}")
+            return False
+        print(f"   • {len(bank)} questions in {len(summary['cells'])} cells")
+        print("✅ Incremental counters match a full recount")
+        return True
+    except Exception as e:
+        print(f"❌ Counter error: {str(e)}")
+        return False
+
+def test_reconcile_pipeline():
+    """One $group over the four cell fields"""
+    print("\n🧱 Testing reconciliation pipeline...")
+    try:
+        stages = build_bank_stats_pipeline()
+        if len(stages) != 1 or set(stages[0]["$group"]["_id"]) != {"topic", "subtopic", "difficulty", "question_type"}:
+            print(f"❌ Unexpected pipeline: {stages}")
+            return False
+        if bank_delta(added=[{"topic": "a.b", "subtopic": None}]) != {"total": 1, "cells.a_b|unknown|unknown|unknown": 1}:
+            print("❌ Cell keys not sanitized")
+            return False
+        print("✅ Single-stage reconciliation")
+        return True
+    except Exception as e:
+        print(f"❌ Pipeline error: {str(e)}")
+        return False
+
+def test_stats_endpoint():
+    """Counters agree with a fresh reconciliation"""
+    print("\n📊 Testing question bank stats endpoint...")
+    try:
+        response = requests.post(f"{BACKEND_URL}/admin/aptitude-questions/stats/reconcile", timeout=60)
+        if response.status_code != 200:
+            print(f"❌ Reconcile failed: {response.status_code}")
+            return False
+        reconciled_total = response.json()["total"]
+        response = requests.get(f"{BACKEND_URL}/admin/aptitude-questions/stats", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Stats failed: {response.status_code}")
+            return False
+        stats = response.json()
+        if stats["computed_from"] != "counters" or stats["total"] != reconciled_total:
+            print(f"❌ Unexpected stats: {stats['computed_from']} total {stats['total']} vs {reconciled_total}")
+            return False
+        if sum(stats["by_topic"].values()) != stats["total"]:
+            print("❌ Topic breakdown does not add up")
+            return False
+        print(f"   • {stats['total']} questions, {len(stats['cells'])} cells")
+        print("✅ Stats served from counters")
+        return True
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_deltas_match_recount(),
+        test_reconcile_pipeline(),
+        test_stats_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
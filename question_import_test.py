@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Streaming Question Import Test
+
+Tests the NDJSON/CSV question import pipeline:
+1. The content hash ignores case, spacing and option order
+2. CSV/NDJSON rows are parsed across arbitrary chunk boundaries
+3. Invalid, duplicate and inserted rows are reported per row, in order
+4. Rows read before a stream error are still written and reported
+5. The stream is consumed lazily (bounded rows in flight)
+6. POST /admin/aptitude-questions/import reports a summary
+"""
+
+import asyncio
+import json
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from pymongo.errors import BulkWriteError
+from question_import import (IMPORT_CHUNK_SIZE, ImportFormatError, InvalidQuestionRow, content_hash,
+                             import_questions, iter_import_rows, write_questions)
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+class HashIndexedCollection:
+    """In-memory collection with a unique content_hash index; keeps hashes only"""
+    def __init__(self, existing=()):
+        self.hashes = set(existing)
+        self.inserted = 0
+
+    async def bulk_write(self, operations, ordered=True):
+        errors = []
+        for index, operation in enumerate(operations):
+            doc = operation._doc
+            if doc["content_hash"] in self.hashes:
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key"})
+            else:
+                self.hashes.add(doc["content_hash"])
+                self.inserted += 1
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(operations) - len(errors)})
+
+def prepare(data):
+    if len(data.get("question_text", "")) < 5:
+        raise InvalidQuestionRow(["question_text_too_short"])
+    return {"id": data.get("id"), "question_text": data["question_text"], "options": data.get("options", [])}
+
+async def chunked(payload, size):
+    for i in range(0, len(payload), size):
+        yield payload[i:i + size]
+
+async def collect(rows, collection):
+    async def insert(docs):
+        return await write_questions(collection, docs)
+    return [report async for report in import_questions(rows, prepare, insert, chunk_size=3)]
+
+def test_content_hash():
+    """Normalization of text and options"""
+    print("🔑 Testing content hash...")
+    try:
+        a = {"question_text": "What is  12 + 7?", "options": ["19", "18", "20"]}
+        b = {"question_text": "what is 12 + 7?\n", "options": ["20", "19", "18"]}
+        c = {"question_text": "What is 12 + 8?", "options": ["19", "18", "20"]}
+        if content_hash(a) != content_hash(b) or content_hash(a) == content_hash(c):
+            print("❌ Hash not normalized")
+            return False
+        print("✅ Hash ignores case, spacing and option order")
+        return True
+    except Exception as e:
+        print(f"❌ Hash error: {str(e)}")
+        return False
+
+def test_stream_parsing():
+    """CSV with a multi-line quoted field split across 7-byte chunks"""
+    print("\n📄 Testing stream parsing...")
+    try:
+        csv_body = ('question_text,options,correct_answer\n'
+                    '"Which number, if any,\nis prime?",4|6|7,7\n'
+                    '\n'
+                    'Pick the odd one out,"[""a"",""b""]",a\n').encode()
+
+        async def parse(body, fmt):
+            return [item async for item in iter_import_rows(chunked(body, 7), fmt)]
+
+        records = asyncio.run(parse(csv_body, "csv"))
+        if [row for row, _ in records] != [1, 2] or "\n" not in records[0][1].record:
+            print(f"❌ Unexpected CSV records: {records}")
+            return False
+        ndjson_body = b'{"question_text": "First question"}\r\n\n{"question_text": "Third line"}'
+        lines = asyncio.run(parse(ndjson_body, "ndjson"))
+        if [row for row, _ in lines] != [1, 3]:
+            print(f"❌ Unexpected NDJSON rows: {lines}")
+            return False
+        print("✅ Rows parsed across chunk boundaries")
+        return True
+    except Exception as e:
+        print(f"❌ Parsing error: {str(e)}")
+        return False
+
+def test_per_row_report():
+    """Inserted / duplicate / invalid rows, in input order"""
+    print("\n🧾 Testing per-row report...")
+    try:
+        banked = content_hash({"question_text": "Already in the bank", "options": []})
+        collection = HashIndexedCollection([banked])
+        lines = [
+            {"id": "q1", "question_text": "A brand new question"},
+            {"id": "q2", "question_text": "no"},
+            {"id": "q3", "question_text": "already in the   BANK"},
+            "not json",
+            {"id": "q5", "question_text": "A BRAND new question"},
+            {"id": "q6", "question_text": "Another new question"},
+            [1, 2],
+        ]
+        body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines).encode()
+        reports = asyncio.run(collect(iter_import_rows(chunked(body, 16), "ndjson"), collection))
+        statuses = [(report["row"], report["status"]) for report in reports]
+        expected = [(1, "inserted"), (2, "invalid"), (3, "duplicate"), (4, "invalid"),
+                    (5, "duplicate"), (6, "inserted"), (7, "invalid")]
+        if statuses != expected:
+            print(f"❌ Unexpected report: {statuses}")
+            return False
+        if reports[1]["errors"] != ["question_text_too_short"] or collection.inserted != 2:
+            print(f"❌ Unexpected details: {reports[1]}, {collection.inserted} inserted")
+            return False
+        print("✅ Every row reported; duplicates and invalid rows don't abort the import")
+        return True
+    except Exception as e:
+        print(f"❌ Report error: {str(e)}")
+        return False
+
+def test_stream_error_reports_read_rows():
+    """Rows of an unfinished chunk are written and reported before a stream error surfaces"""
+    print("\n🧯 Testing rows read before a stream error...")
+    try:
+        collection = HashIndexedCollection()
+        body = "".join(json.dumps({"id": f"q{i}", "question_text": f"Question before the bad tail {i}"}) + "\n"
+                       for i in range(5)).encode() + b"\xff\xfe"
+        reports = []
+
+        async def run():
+            async def insert(docs):
+                return await write_questions(collection, docs)
+            async for report in import_questions(iter_import_rows(chunked(body, 32), "ndjson"), prepare, insert,
+                                                 chunk_size=2):
+                reports.append(report)
+
+        try:
+            asyncio.run(run())
+            print("❌ Stream error not raised")
+            return False
+        except ImportFormatError:
+            pass
+        if [(report["row"], report["status"]) for report in reports] != [(i, "inserted") for i in range(1, 6)] \
+                or collection.inserted != 5:
+            print(f"❌ Reported {reports}, {collection.inserted} inserted")
+            return False
+        print("✅ All 5 rows read before the error were written and reported")
+        return True
+    except Exception as e:
+        print(f"❌ Stream error handling: {str(e)}")
+        return False
+
+def test_lazy_consumption():
+    """The first reports arrive after a few chunks, not after the whole stream"""
+    print("\n🌊 Testing bounded rows in flight...")
+    try:
+        total_rows, consumed = 20 * IMPORT_CHUNK_SIZE, [0]
+
+        async def body():
+            for i in range(total_rows):
+                consumed[0] += 1
+                yield (json.dumps({"id": f"q{i}", "question_text": f"Streaming question number {i}"}) + "\n").encode()
+
+        async def run():
+            collection = HashIndexedCollection()
+
+            async def insert(docs):
+                return await write_questions(collection, docs)
+
+            in_flight, count = 0, 0
+            async for _ in import_questions(iter_import_rows(body(), "ndjson"), prepare, insert):
+                count += 1
+                in_flight = max(in_flight, consumed[0] - count)
+            return count, in_flight
+
+        count, in_flight = asyncio.run(run())
+        if count != total_rows or in_flight > 3 * IMPORT_CHUNK_SIZE:
+            print(f"❌ {count} rows reported, up to {in_flight} rows in flight")
+            return False
+        print(f"   • {count} rows, at most {in_flight} rows read ahead of the report")
+        print("✅ Stream consumed chunk by chunk")
+        return True
+    except Exception as e:
+        print(f"❌ Streaming error: {str(e)}")
+        return False
+
+def test_import_endpoint():
+    """NDJSON import with a summary line"""
+    print("\n📥 Testing import endpoint...")
+    try:
+        rows = [{"topic": "numerical_reasoning", "subtopic": "arithmetic", "difficulty": "easy",
+                 "question_text": "Import test: what is 1234 + 4321 in total?", "question_type": "multiple_choice",
+                 "options": ["5555", "5545", "5565", "5455"], "correct_answer": "5555", "explanation": "Addition"},
+                {"topic": "unknown_topic", "question_text": "Invalid row"}]
+        body = "\n".join(json.dumps(row) for row in rows + rows[:1])
+        response = requests.post(f"{BACKEND_URL}/admin/aptitude-questions/import", data=body,
+                                 headers={"Content-Type": "application/x-ndjson"}, timeout=60)
+        if response.status_code != 200:
+            print(f"❌ Import failed: {response.status_code}")
+            return False
+        lines = [json.loads(line) for line in response.text.splitlines() if line]
+        summary = lines[-1]["summary"]
+        statuses = [line["status"] for line in lines[:-1]]
+        if statuses[1:] != ["invalid", "duplicate"] or statuses[0] not in ("inserted", "duplicate") or not summary["success"]:
+            print(f"❌ Unexpected report: {statuses} {summary}")
+            return False
+        print(f"   • Summary: {summary}")
+        print("✅ Streaming import reports every row")
+        return True
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_content_hash(),
+        test_stream_parsing(),
+        test_per_row_report(),
+        test_stream_error_reports_read_rows(),
+        test_lazy_consumption(),
+        test_import_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
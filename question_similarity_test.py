@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Question Index Test
+
+Tests the MinHash/LSH near-duplicate index over aptitude questions:
+1. Realistic paraphrases score above the threshold; number variants of a template are kept apart
+2. Generated batches are screened against the bank and against themselves
+3. Clustering groups near-duplicates in one pass
+4. GET /admin/aptitude-questions/near-duplicates returns clusters
+"""
+
+import asyncio
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from question_similarity import (NEAR_DUPLICATE_THRESHOLD, NearDuplicateGuard, cluster_near_duplicates,
+                                 estimated_similarity, question_signature, stamp_minhash, variant_key)
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+TRAIN = {"id": "train", "question_text": "A train travels 120 km in 2 hours. What is its average speed in km per hour?",
+         "options": ["60", "50", "40", "70"]}
+REWORDED = {"id": "reworded", "question_text": "If a train travels 120 km in 2 hours, what is its average speed (km per hour)?",
+            "options": ["60 km/h", "50 km/h", "40 km/h", "70 km/h"]}
+VARIANT = {"id": "variant", "question_text": "A train travels 150 km in 3 hours. What is its average speed in km per hour?",
+           "options": ["50", "45", "40", "60"]}
+PARAPHRASES = [
+    "A train covers 120 km in 2 hours. Find its average speed in km per hour.",
+    "What is the average speed in km per hour of a train that travels 120 km in 2 hours?",
+    "A train travels a distance of 120 km in 2 hours. Calculate its average speed in km per hour.",
+    "In 2 hours a train covers a distance of 120 km. At what average speed, in km per hour, was it moving?",
+]
+SAME_NUMBERS = {"id": "same-numbers", "question_text": "A train travels 120 km in 2 hours. How long does it take to travel 300 km?",
+                "options": ["5 hours", "4 hours", "6 hours", "3 hours"]}
+UNRELATED = {"id": "unrelated", "question_text": "Which word is closest in meaning to 'meticulous'?",
+             "options": ["Careful", "Careless", "Quick", "Loud"]}
+
+class BandIndexedCollection:
+    """In-memory collection answering $in queries on minhash_bands"""
+    def __init__(self, docs=()):
+        self.docs = [dict(doc) for doc in docs]
+        for doc in self.docs:
+            stamp_minhash(doc)
+        self.queries = 0
+
+    def find(self, query, projection=None):
+        collection = self
+        if "minhash_bands" in query:
+            collection.queries += 1
+            bands = set(query["minhash_bands"]["$in"])
+            matches = [doc for doc in self.docs if bands & set(doc["minhash_bands"])]
+        else:
+            matches = [doc for doc in self.docs if all(doc.get(k) == v for k, v in query.items())]
+
+        class Cursor:
+            def __init__(self):
+                self.remaining = len(matches)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                if self.remaining <= 0:
+                    raise StopAsyncIteration
+                self.remaining -= 1
+                return matches[len(matches) - self.remaining - 1]
+        return Cursor()
+
+def test_similarity_scores():
+    """Paraphrases vs. a different instance of the same template and unrelated questions"""
+    print("📐 Testing similarity scores...")
+    try:
+        train = question_signature(TRAIN)
+        paraphrases = [REWORDED] + [dict(TRAIN, question_text=text) for text in PARAPHRASES]
+        scores = [estimated_similarity(train, question_signature(doc)) for doc in paraphrases]
+        unrelated = max(estimated_similarity(train, question_signature(doc)) for doc in (UNRELATED, SAME_NUMBERS))
+        print(f"   • paraphrases {', '.join(f'{score:.2f}' for score in scores)}; unrelated at most {unrelated:.2f}")
+        if min(scores) < NEAR_DUPLICATE_THRESHOLD or unrelated >= NEAR_DUPLICATE_THRESHOLD:
+            print(f"❌ Scores not separated by the threshold {NEAR_DUPLICATE_THRESHOLD}")
+            return False
+        if any(variant_key(doc) != variant_key(TRAIN) for doc in paraphrases) or variant_key(VARIANT) == variant_key(TRAIN):
+            print("❌ Number/option check does not separate template variants")
+            return False
+        print("✅ Paraphrases are near-duplicates; template variants are not")
+        return True
+    except Exception as e:
+        print(f"❌ Similarity error: {str(e)}")
+        return False
+
+def test_guard_screening():
+    """Banked and in-batch near-duplicates are rejected with one query per batch"""
+    print("\n🛡️ Testing generation screening...")
+    try:
+        collection = BandIndexedCollection([TRAIN])
+        guard = NearDuplicateGuard(collection)
+        batch = [dict(REWORDED), dict(VARIANT), dict(UNRELATED, id="u1"), dict(UNRELATED, id="u2"),
+                 dict(TRAIN, id="p0", question_text=PARAPHRASES[0]), dict(SAME_NUMBERS)]
+        accepted, rejected = asyncio.run(guard.screen(batch))
+        if [doc["id"] for doc in accepted] != ["variant", "u1", "same-numbers"] or collection.queries != 1:
+            print(f"❌ Accepted {[doc['id'] for doc in accepted]} with {collection.queries} queries")
+            return False
+        if [(r["id"], r["near_duplicate_of"]) for r in rejected] != [("reworded", "train"), ("u2", "u1"), ("p0", "train")]:
+            print(f"❌ Unexpected rejections: {rejected}")
+            return False
+        if asyncio.run(NearDuplicateGuard(collection, exclude_ids=["train"]).check(dict(TRAIN))) is not None:
+            print("❌ Question matched itself")
+            return False
+        # A question checked but then discarded (e.g. for quality) must not block later ones
+        guard = NearDuplicateGuard(BandIndexedCollection([]))
+        if asyncio.run(guard.check(dict(UNRELATED, id="u1"))) or asyncio.run(guard.check(dict(UNRELATED, id="u2"))):
+            print("❌ An unaccepted question was recorded")
+            return False
+        guard.accept(dict(UNRELATED, id="u2"))
+        if (asyncio.run(guard.check(dict(UNRELATED, id="u3"))) or {}).get("near_duplicate_of") != "u2":
+            print("❌ Accepted question not compared with later ones")
+            return False
+        print("✅ Near-duplicates rejected before insert")
+        return True
+    except Exception as e:
+        print(f"❌ Screening error: {str(e)}")
+        return False
+
+def test_clustering():
+    """Single-pass clustering"""
+    print("\n🧩 Testing near-duplicate clustering...")
+    try:
+        docs = [TRAIN, VARIANT, UNRELATED, REWORDED,
+                dict(UNRELATED, id="unrelated-copy", question_text="Which word is closest in meaning to meticulous?")]
+        result = asyncio.run(cluster_near_duplicates(BandIndexedCollection(docs)))
+        clusters = sorted(sorted(cluster) for cluster in result["clusters"])
+        if result["scanned"] != 5 or clusters != [["reworded", "train"], ["unrelated", "unrelated-copy"]]:
+            print(f"❌ Unexpected clusters: {clusters}")
+            return False
+        print(f"   • {len(clusters)} clusters over {result['scanned']} questions")
+        print("✅ Near-duplicates clustered in one pass")
+        return True
+    except Exception as e:
+        print(f"❌ Clustering error: {str(e)}")
+        return False
+
+def test_near_duplicates_endpoint():
+    """Admin clustering endpoint"""
+    print("\n📊 Testing near-duplicates endpoint...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/aptitude-questions/near-duplicates",
+                                params={"limit": 10}, timeout=120)
+        if response.status_code != 200:
+            print(f"❌ Request failed: {response.status_code}")
+            return False
+        data = response.json()
+        if any(cluster["size"] < 2 or len(cluster["questions"]) != cluster["size"] for cluster in data["clusters"]):
+            print("❌ Malformed clusters")
+            return False
+        response = requests.get(f"{BACKEND_URL}/admin/aptitude-questions/near-duplicates",
+                                params={"threshold": 1.5}, timeout=30)
+        if response.status_code != 400:
+            print(f"❌ Invalid threshold accepted: {response.status_code}")
+            return False
+        print(f"   • {data['cluster_count']} clusters, {data['clustered_questions']} of {data['scanned']} questions")
+        print("✅ Clusters served")
+        return True
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_similarity_scores(),
+        test_guard_screening(),
+        test_clustering(),
+        test_near_duplicates_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Reference Data Cache Test
+
+Tests the read-through cache for candidate tokens, jobs and aptitude configs:
+1. Repeated validate-token calls are served from the cache
+2. Unknown tokens are negatively cached and still rejected
+3. Cache statistics endpoint reports hit rates
+"""
+
+import requests
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def get_cache_stats():
+    response = requests.get(f"{BACKEND_URL}/admin/reference-cache/stats", timeout=30)
+    response.raise_for_status()
+    return {cache["name"]: cache for cache in response.json().get("caches", [])}
+
+def test_negative_caching():
+    """Unknown tokens stay invalid and repeat lookups hit the negative cache"""
+    print("🔍 Testing negative caching of unknown tokens...")
+    try:
+        before = get_cache_stats()["candidate_tokens"]
+        for _ in range(3):
+            response = requests.post(
+                f"{BACKEND_URL}/candidate/validate-token",
+                json={"token": "NOSUCHTOKEN00000"},
+                timeout=30
+            )
+            if response.status_code != 401:
+                print(f"❌ Unknown token not rejected: {response.status_code}")
+                return False
+        after = get_cache_stats()["candidate_tokens"]
+
+        negative_hits = after["negative_hits"] - before["negative_hits"]
+        print(f"   • Negative hits: {negative_hits}")
+        # Several workers may each load once, but at least one repeat must be cached
+        ok = negative_hits >= 1
+        print(f"{'✅' if ok else '❌'} Negative caching {'working' if ok else 'not observed'}")
+        return ok
+    except Exception as e:
+        print(f"❌ Negative caching test error: {str(e)}")
+        return False
+
+def test_cache_stats_shape():
+    """Stats endpoint lists every reference cache"""
+    print("\n📊 Testing cache stats endpoint...")
+    try:
+        caches = get_cache_stats()
+        expected = {"candidate_tokens", "jobs", "aptitude_configs", "aptitude_tokens"}
+        missing = expected - set(caches)
+        if missing:
+            print(f"❌ Missing caches: {missing}")
+            return False
+        for name, stats in caches.items():
+            print(f"   • {name}: {stats['entries']} entries, hit rate {stats['hit_rate']}")
+        print("✅ Cache stats available")
+        return True
+    except Exception as e:
+        print(f"❌ Cache stats error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_cache_stats_shape(), test_negative_caching()]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
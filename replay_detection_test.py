@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Replay Detection Test
+
+Tests the rolling-hash replay detection and sweep-line synchronized-activity
+detection used by SessionIntegrityMonitor:
+1. Replay runs cover exactly the windows the former pairwise comparison found
+2. Long request histories are checked in linear time
+3. Synchronized activities are found across a 30-second slot boundary
+4. Incremental detection through record_session_events()
+5. POST /session-fingerprinting/record-session-events
+"""
+
+import random
+import sys
+import time
+import uuid
+
+import requests
+
+sys.path.append('/app/backend')
+from replay_detection import find_duplicate_sequences, find_synchronized_groups
+from session_fingerprinting_engine import SessionIntegrityMonitor
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def pairwise_duplicates(signatures, sequence_length=3):
+    """The former quadratic comparison: (original_start, duplicate_start) pairs"""
+    pairs = []
+    for i in range(len(signatures) - sequence_length + 1):
+        for j in range(i + sequence_length, len(signatures) - sequence_length + 1):
+            if signatures[i:i + sequence_length] == signatures[j:j + sequence_length]:
+                pairs.append((i, j))
+    return pairs
+
+def build_requests(paths, start=0):
+    return [
+        {"method": "POST", "path": path, "body_hash": f"h-{path}", "timestamp": start + index}
+        for index, path in enumerate(paths)
+    ]
+
+def test_runs_match_pairwise_comparison():
+    """Every replayed window of the pairwise scan lies in exactly the reported runs"""
+    print("🔁 Testing replay runs against pairwise comparison...")
+    try:
+        rng = random.Random(5)
+        for _ in range(200):
+            signatures = [rng.choice("ABCDE") for _ in range(rng.randint(0, 60))]
+            if len(signatures) > 10:
+                start = rng.randrange(len(signatures) - 5)
+                signatures += signatures[start:start + rng.randint(3, 8)]
+            covered = set()
+            for run in find_duplicate_sequences(signatures):
+                length = run["sequence_length"]
+                duplicate = signatures[run["duplicate_start"]:run["duplicate_start"] + length]
+                original = signatures[run["original_start"]:run["original_start"] + length]
+                if duplicate != run["sequence"] or original != run["sequence"]:
+                    print(f"❌ Run does not repeat its original: {run}")
+                    return False
+                covered.update(range(run["duplicate_start"], run["duplicate_start"] + length - 2))
+            expected = {duplicate_start for _, duplicate_start in pairwise_duplicates(signatures)}
+            if covered != expected:
+                print(f"❌ Replayed windows differ: expected {sorted(expected)}, got {sorted(covered)}")
+                return False
+        print("✅ Replay runs match the pairwise comparison")
+        return True
+    except Exception as e:
+        print(f"❌ Replay comparison error: {str(e)}")
+        return False
+
+def test_long_history_performance():
+    """A session replaying 5,000 requests"""
+    print("\n⏱️ Testing long request history...")
+    try:
+        monitor = SessionIntegrityMonitor()
+        history = build_requests([f"/api/answer/{i}" for i in range(5000)])
+        history += build_requests([f"/api/answer/{i}" for i in range(5000)], start=5000)
+        started = time.perf_counter()
+        detection = monitor._detect_session_replay_attacks({"request_history": history})
+        elapsed = time.perf_counter() - started
+        runs = detection["duplicate_sequences"]
+        if not detection["replay_detected"] or len(runs) != 1 or runs[0]["sequence_length"] != 5000:
+            print(f"❌ Expected one replayed run of 5000 requests, got {[run['sequence_length'] for run in runs]}")
+            return False
+        print(f"   • 10,000 requests checked in {elapsed * 1000:.1f} ms")
+        print("✅ Replay of the whole history reported as one run")
+        return True
+    except Exception as e:
+        print(f"❌ Long history error: {str(e)}")
+        return False
+
+def test_synchronized_across_slot_boundary():
+    """Two devices 4 seconds apart on either side of :30"""
+    print("\n🕒 Testing synchronized activity detection...")
+    try:
+        activities = [
+            {"device_id": "laptop", "timestamp": "2024-01-15T10:00:28Z", "activity_type": "answer"},
+            {"device_id": "phone", "timestamp": "2024-01-15T10:00:32Z", "activity_type": "search"},
+            {"device_id": "laptop", "timestamp": "2024-01-15T10:05:00Z", "activity_type": "answer"},
+        ]
+        groups = find_synchronized_groups(activities)
+        if len(groups) != 1 or sorted(groups[0]["devices"]) != ["laptop", "phone"]:
+            print(f"❌ Expected one laptop/phone group, got {groups}")
+            return False
+        print(f"   • group at {groups[0]['timestamp']} spanning {groups[0]['time_span_seconds']:.0f}s")
+        print("✅ Synchronized activity found across the slot boundary")
+        return True
+    except Exception as e:
+        print(f"❌ Synchronized activity error: {str(e)}")
+        return False
+
+def test_incremental_detection():
+    """Events fed in small batches as they arrive"""
+    print("\n📥 Testing incremental detection...")
+    try:
+        monitor = SessionIntegrityMonitor()
+        paths = ["/login", "/start", "/q/1", "/q/2", "/q/3", "/submit"]
+        stream = build_requests(paths, start=1000) + build_requests(paths[2:5], start=1006)
+        replayed = []
+        for offset in range(0, len(stream), 2):
+            result = monitor.record_session_events("session-a", stream[offset:offset + 2])
+            replayed.extend(result["new_duplicate_sequences"])
+        if len(replayed) != 1 or replayed[0]["original_start"] != 2 or result["requests_seen"] != len(stream):
+            print(f"❌ Unexpected incremental result: {replayed}")
+            return False
+
+        other = monitor.record_session_events("session-b", [{"path": "/q/1", "timestamp": 1008}])
+        if other["synchronized_sessions"] != ["session-a"]:
+            print(f"❌ Cross-session join missed session-a: {other['synchronized_sessions']}")
+            return False
+        print("✅ Replay and cross-session activity detected incrementally")
+        return True
+    except Exception as e:
+        print(f"❌ Incremental detection error: {str(e)}")
+        return False
+
+def test_record_session_events_endpoint():
+    """POST /session-fingerprinting/record-session-events"""
+    print("\n📡 Testing record-session-events endpoint...")
+    try:
+        session_id = f"replay-{uuid.uuid4().hex[:8]}"
+        paths = ["/q/1", "/q/2", "/q/3"]
+        now = time.time()
+        response = None
+        for batch in (build_requests(paths, start=now), build_requests(paths, start=now + 3)):
+            response = requests.post(
+                f"{BACKEND_URL}/session-fingerprinting/record-session-events",
+                json={"session_id": session_id, "events": batch},
+                timeout=30
+            )
+            if response.status_code != 200:
+                print(f"❌ Request failed: {response.status_code} {response.text}")
+                return False
+        result = response.json()
+        if not result["replay_detected"] or len(result["new_duplicate_sequences"]) != 1:
+            print(f"❌ Replay not detected: {result}")
+            return False
+        print("✅ Record-session-events endpoint working")
+        return True
+    except Exception as e:
+        print(f"❌ Endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_runs_match_pairwise_comparison(),
+        test_long_history_performance(),
+        test_synchronized_across_slot_boundary(),
+        test_incremental_detection(),
+        test_record_session_events_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Report Rendering Service Test
+
+Tests PDF reports rendered out of process and stored in GridFS:
+1. A generated report downloads as a streamed PDF from any worker
+2. Downloads of the same report return the same content-addressed artifact (ETag)
+3. Renderer statistics are exposed for admins
+"""
+
+import requests
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def test_rejection_reasons_pdf_download():
+    """Generate a rejection reasons report and download it twice"""
+    print("📄 Testing rejection reasons PDF rendering and download...")
+    try:
+        with open("sample_resume.txt", "rb") as resume:
+            response = requests.post(
+                f"{BACKEND_URL}/placement-preparation/rejection-reasons",
+                data={
+                    "job_title": "Senior Backend Engineer",
+                    "job_description": "Python, FastAPI, MongoDB, 5+ years of backend experience"
+                },
+                files={"resume": ("sample_resume.txt", resume, "text/plain")},
+                timeout=180
+            )
+        print(f"Status Code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Generation failed: {response.text}")
+            return False
+
+        rejection_id = response.json().get("rejection_id")
+        url = f"{BACKEND_URL}/placement-preparation/rejection-reasons/{rejection_id}/download"
+        first = requests.get(url, timeout=60)
+        second = requests.get(url, timeout=60)
+
+        if first.status_code != 200 or not first.content.startswith(b"%PDF"):
+            print(f"❌ Download failed: {first.status_code}")
+            return False
+        if first.headers.get("ETag") != second.headers.get("ETag") or first.content != second.content:
+            print("❌ Repeat download returned a different artifact")
+            return False
+
+        print(f"✅ PDF streamed ({len(first.content)} bytes, ETag {first.headers.get('ETag')})")
+        return True
+    except Exception as e:
+        print(f"❌ Rejection reasons PDF error: {str(e)}")
+        return False
+
+def test_report_renderer_stats():
+    """Renderer statistics endpoint"""
+    print("\n📊 Testing report renderer stats...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/report-renderer/stats", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Stats request failed: {response.text}")
+            return False
+
+        stats = response.json().get("report_renderer", {})
+        for key in ["requests", "renders", "cache_hits", "max_workers"]:
+            if key not in stats:
+                print(f"❌ Missing stat: {key}")
+                return False
+        print(f"✅ Renderer stats: {stats}")
+        return True
+    except Exception as e:
+        print(f"❌ Renderer stats error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_rejection_reasons_pdf_download(), test_report_renderer_stats()]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
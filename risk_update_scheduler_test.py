@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Continuous Risk Scoring Scheduler Test
+
+Tests the event-driven risk scheduler and risk update fan-out:
+1. A burst of events for one session is coalesced into a single recomputation
+2. Recomputations never exceed the concurrency bound
+3. Subscribers only receive their sessions; slow subscribers drop the oldest messages
+4. The stats endpoint reports scheduler and broker statistics
+"""
+
+import asyncio
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from risk_update_scheduler import ContinuousRiskScheduler, RiskUpdateBroker
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def test_burst_coalescing():
+    """100 marks for one session -> one recomputation"""
+    print("🧺 Testing burst coalescing...")
+    try:
+        calls = []
+
+        async def recompute(session_id):
+            calls.append(session_id)
+
+        async def run():
+            scheduler = ContinuousRiskScheduler(recompute, coalesce_seconds=0.05, min_interval_seconds=1.0)
+            for _ in range(100):
+                scheduler.mark_dirty("session-a")
+            scheduler.mark_dirty("session-b")
+            await asyncio.sleep(0.3)
+            scheduler.stop()
+            return scheduler.get_stats()
+
+        stats = asyncio.run(run())
+        if sorted(calls) != ["session-a", "session-b"]:
+            print(f"❌ Expected one recomputation per session, got {calls}")
+            return False
+        print(f"   • {stats['marks']} marks, {stats['coalesced_marks']} coalesced, {stats['recomputations']} recomputations")
+        print("✅ Burst coalesced")
+        return True
+    except Exception as e:
+        print(f"❌ Coalescing error: {str(e)}")
+        return False
+
+def test_concurrency_bound():
+    """20 dirty sessions with max_concurrency=3"""
+    print("\n🚦 Testing concurrency bound...")
+    try:
+        active, peak = [0], [0]
+
+        async def recompute(session_id):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.05)
+            active[0] -= 1
+
+        async def run():
+            scheduler = ContinuousRiskScheduler(recompute, max_concurrency=3, coalesce_seconds=0.01, min_interval_seconds=0)
+            for i in range(20):
+                scheduler.mark_dirty(f"session-{i}")
+            await asyncio.sleep(0.8)
+            scheduler.stop()
+            return scheduler.get_stats()
+
+        stats = asyncio.run(run())
+        if peak[0] > 3 or stats["recomputations"] != 20:
+            print(f"❌ Peak concurrency {peak[0]}, recomputations {stats['recomputations']}")
+            return False
+        print(f"   • peak concurrency {peak[0]}, {stats['recomputations']} recomputations")
+        print("✅ Concurrency bounded")
+        return True
+    except Exception as e:
+        print(f"❌ Concurrency error: {str(e)}")
+        return False
+
+def test_broker_filtering():
+    """Session filters and drop-oldest on full queues"""
+    print("\n📡 Testing broker fan-out...")
+    try:
+        async def run():
+            broker = RiskUpdateBroker(queue_size=2)
+            everything = broker.subscribe()
+            only_a = broker.subscribe(["session-a"])
+            for score in (0.1, 0.2, 0.3):
+                broker.publish({"type": "risk_update", "session_id": "session-a", "composite_risk_score": score})
+            broker.publish({"type": "risk_update", "session_id": "session-b", "composite_risk_score": 0.9})
+            return everything, only_a
+
+        everything, only_a = asyncio.run(run())
+        received_a = [only_a.queue.get_nowait()["composite_risk_score"] for _ in range(only_a.queue.qsize())]
+        if received_a != [0.2, 0.3] or only_a.dropped != 1 or everything.queue.qsize() != 2:
+            print(f"❌ Unexpected fan-out: session-a subscriber got {received_a}, dropped {only_a.dropped}")
+            return False
+        print(f"   • filtered subscriber kept the newest {received_a}, dropped {only_a.dropped}")
+        print("✅ Fan-out filters and bounds subscriber queues")
+        return True
+    except Exception as e:
+        print(f"❌ Broker error: {str(e)}")
+        return False
+
+def test_stats_endpoint():
+    """GET /admin/risk-updates/stats"""
+    print("\n📊 Testing risk update stats endpoint...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/risk-updates/stats", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Stats request failed: {response.status_code} {response.text}")
+            return False
+        stats = response.json()["stats"]
+        if "broker" not in stats:
+            print(f"❌ Missing broker stats: {stats}")
+            return False
+        print(f"   • subscribers {stats['broker']['subscribers']}, published {stats['broker']['published']}")
+        print("✅ Stats endpoint available")
+        return True
+    except Exception as e:
+        print(f"❌ Stats endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_burst_coalescing(),
+        test_concurrency_bound(),
+        test_broker_filtering(),
+        test_stats_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
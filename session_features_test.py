@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Session Feature Bundle Test
+
+Tests the shared per-session feature bundle:
+1. The four statistical analyses return the same results for a dict and a bundle
+2. The feature cache reuses a bundle until the session gets a new answer
+3. GET /admin/risk-updates/stats reports the risk calculator's feature cache
+"""
+
+import random
+import sys
+
+import requests
+
+sys.path.append('/app/backend')
+from session_features import SessionFeatureBundle, SessionFeatureCache
+from statistical_anomaly_analyzer import StatisticalAnomalyAnalyzer
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def build_session(session_id, rng, questions=30):
+    responses = [
+        {
+            "question_id": f"q{q}",
+            "response": rng.choice("ABCD"),
+            "is_correct": rng.random() < 0.6,
+            "response_time": rng.uniform(5, 60),
+            "difficulty": rng.random(),
+            "timestamp": f"2026-01-01T10:{q:02d}:00"
+        }
+        for q in range(questions)
+    ]
+    return {"session_id": session_id, "timezone": "UTC", "responses": responses}
+
+def strip_timestamps(result):
+    """Analysis results without their generation timestamps"""
+    if isinstance(result, dict):
+        return {key: strip_timestamps(value) for key, value in result.items() if key != "analysis_timestamp"}
+    if isinstance(result, list):
+        return [strip_timestamps(value) for value in result]
+    return result
+
+def test_bundle_matches_dict_input():
+    """Analyzer entry points give identical results for dicts and bundles"""
+    print("🧩 Testing bundle equivalence...")
+    try:
+        rng = random.Random(4)
+        analyzer = StatisticalAnomalyAnalyzer()
+        mismatched = []
+        for i in range(10):
+            session = build_session(f"bundle-{i}", rng)
+            bundle = SessionFeatureBundle(session)
+            for method in ("detect_answer_pattern_irregularities", "analyze_difficulty_progression_anomalies",
+                           "identify_time_zone_manipulation", "detect_collaborative_cheating_patterns"):
+                if strip_timestamps(getattr(analyzer, method)(session)) != strip_timestamps(getattr(analyzer, method)(bundle)):
+                    mismatched.append((session["session_id"], method))
+        if mismatched:
+            print(f"❌ Results differ for {mismatched[:5]}")
+            return False
+        print("✅ Dict and bundle inputs agree for all four analyses")
+        return True
+    except Exception as e:
+        print(f"❌ Bundle equivalence error: {str(e)}")
+        return False
+
+def test_cache_versioning():
+    """A cached bundle is reused until a new answer changes the data version"""
+    print("\n🗃️ Testing feature cache versioning...")
+    try:
+        rng = random.Random(6)
+        cache = SessionFeatureCache(max_sessions=2)
+        session = build_session("cache-1", rng, questions=5)
+        first = cache.get(session)
+        if cache.get(dict(session)) is not first:
+            print("❌ Unchanged session was not served from the cache")
+            return False
+        session = {**session, "responses": session["responses"] + build_session("cache-1", rng, questions=1)["responses"]}
+        updated = cache.get(session)
+        if updated is first or len(updated.answer_choices) != 6:
+            print("❌ New answer did not rebuild the bundle")
+            return False
+        cache.get(build_session("cache-2", rng))
+        cache.get(build_session("cache-3", rng))
+        stats = cache.get_stats()
+        if stats["cached_sessions"] != 2 or stats["hits"] != 1:
+            print(f"❌ Unexpected cache stats: {stats}")
+            return False
+        print(f"   • {stats}")
+        print("✅ Feature cache invalidates on new answers and stays bounded")
+        return True
+    except Exception as e:
+        print(f"❌ Cache versioning error: {str(e)}")
+        return False
+
+def test_feature_cache_stats_endpoint():
+    """Continuous update stats include the feature cache"""
+    print("\n📊 Testing feature cache stats...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/risk-updates/stats", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Stats request failed: {response.status_code} {response.text}")
+            return False
+        stats = response.json()["stats"]
+        if not stats["calculator_loaded"]:
+            print("⚠️ Risk calculator not loaded yet, no feature cache to report")
+            return True
+        if "feature_cache" not in stats:
+            print(f"❌ feature_cache missing from {list(stats)}")
+            return False
+        print(f"   • {stats['feature_cache']}")
+        print("✅ Feature cache stats reported")
+        return True
+    except Exception as e:
+        print(f"❌ Stats endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_bundle_matches_dict_input(),
+        test_cache_versioning(),
+        test_feature_cache_stats_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Session Insights Rollup Test
+
+Tests that /api/analysis/session-insights/{session_id} is served from the
+incrementally maintained session rollup:
+1. Response keeps the legacy video/audio metric shape
+2. Rollup statistics (mean/variance) and per-minute timelines are present
+3. Unknown sessions return empty metrics instead of failing
+"""
+
+import requests
+import uuid
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def test_unknown_session_insights():
+    """A session without any analysis events returns empty metrics"""
+    print("📊 Testing insights for a session without events...")
+    session_id = f"rollup_test_{uuid.uuid4()}"
+    try:
+        response = requests.get(f"{BACKEND_URL}/analysis/session-insights/{session_id}", timeout=30)
+        print(f"Status Code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Request failed: {response.text}")
+            return False
+
+        data = response.json()
+        counts = data.get("analysis_count", {})
+        ok = (
+            data.get("video_metrics") == {}
+            and data.get("audio_metrics") == {}
+            and counts.get("video_frames") == 0
+            and counts.get("audio_clips") == 0
+            and "timelines" in data
+            and "rollup_statistics" in data
+        )
+        print(f"{'✅' if ok else '❌'} Empty insights: {counts}")
+        return ok
+    except Exception as e:
+        print(f"❌ Insights error: {str(e)}")
+        return False
+
+def test_insights_response_shape(session_id: str):
+    """Insights for an existing session expose rollup statistics and timelines"""
+    print(f"\n📈 Testing insights shape for session {session_id}...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/analysis/session-insights/{session_id}", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Request failed: {response.text}")
+            return False
+
+        data = response.json()
+        timelines = data.get("timelines", {})
+        for key in ["engagement", "attention", "confidence"]:
+            if key not in timelines:
+                print(f"❌ Missing timeline: {key}")
+                return False
+
+        stats = data.get("rollup_statistics", {})
+        for stream in ["video", "audio", "emotional_intelligence"]:
+            if stream not in stats:
+                print(f"❌ Missing rollup statistics for {stream}")
+                return False
+            for metric, values in stats[stream].get("metrics", {}).items():
+                if values.get("variance", 0) < 0:
+                    print(f"❌ Negative variance for {stream}.{metric}")
+                    return False
+
+        print(f"✅ Insights shape valid - counts: {data.get('analysis_count')}")
+        return True
+    except Exception as e:
+        print(f"❌ Insights error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_unknown_session_insights()]
+    try:
+        with open("test_session_id.txt") as f:
+            results.append(test_insights_response_shape(f.read().strip()))
+    except FileNotFoundError:
+        print("⚠️  test_session_id.txt not found - skipping existing session check")
+    print(f"\n{sum(results)}/{len(results)} tests passed")
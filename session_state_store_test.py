@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Session State Store Test
+
+Tests the bounded session state behind SessionIntegrityMonitor:
+1. Per-session history and anomaly windows are ring buffers; users keep 20 sessions
+2. Idle sessions are evicted and the store never exceeds its capacity
+3. Summary deltas aggregate every record, including those dropped from the ring
+4. Cross-session correlation sees the user's other active sessions
+5. GET /admin/session-state/stats
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+sys.path.append('/app/backend')
+from session_state_store import SessionStateStore, SummaryDelta
+from session_fingerprinting_engine import SessionIntegrityMonitor
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def test_ring_buffers():
+    """History/anomaly windows and per-user session lists stay bounded"""
+    print("🔁 Testing ring-buffered session windows...")
+    try:
+        store = SessionStateStore(history_window=5, anomaly_window=3)
+        for i in range(50):
+            store.append_history("s1", {"timestamp": datetime.utcnow(), "continuity_score": i / 50})
+            store.append_anomaly("s1", {"anomaly_score": i / 50})
+        for i in range(30):
+            store.add_user_session("user-1", f"s{i}")
+        history = store.get_history("s1")
+        if len(history) != 5 or history[-1]["continuity_score"] != 49 / 50 or len(store.get_anomalies("s1")) != 3:
+            print(f"❌ Unexpected windows: {len(history)} history, {len(store.get_anomalies('s1'))} anomalies")
+            return False
+        sessions = store.user_session_ids("user-1")
+        if len(sessions) != 20 or sessions[-1] != "s29":
+            print(f"❌ Expected the last 20 sessions of user-1, got {sessions}")
+            return False
+        print("✅ Windows keep only the newest records")
+        return True
+    except Exception as e:
+        print(f"❌ Ring buffer error: {str(e)}")
+        return False
+
+def test_idle_eviction():
+    """Idle sessions leave the store and their user mapping"""
+    print("\n🧹 Testing idle-session eviction...")
+    try:
+        store = SessionStateStore(capacity=100, idle_seconds=60)
+        store.touch_session("old", {"user_id": "user-2"}, {})
+        store._sessions["old"].last_seen = time.time() - 120
+        store.touch_session("new", {"user_id": "user-2"}, {})
+        if "old" in store or store.user_session_ids("user-2") != ["new"]:
+            print(f"❌ Idle session still tracked: {store.user_session_ids('user-2')}")
+            return False
+        for i in range(250):
+            store.touch_session(f"bulk-{i}", {"user_id": f"bulk-user-{i}"}, {})
+        stats = store.get_stats()
+        if len(store) != 100 or stats["idle_evictions"] != 1 or stats["tracked_users"] != 100:
+            print(f"❌ Unexpected store size after eviction: {stats}")
+            return False
+        print(f"   • {stats['idle_evictions']} idle / {stats['capacity_evictions']} capacity evictions")
+        print("✅ Idle and excess sessions evicted")
+        return True
+    except Exception as e:
+        print(f"❌ Eviction error: {str(e)}")
+        return False
+
+def test_summary_delta():
+    """Compaction aggregates count every record appended"""
+    print("\n🗜️ Testing summary compaction aggregates...")
+    try:
+        start = datetime(2026, 1, 1, 10, 0)
+        first, second = SummaryDelta(), SummaryDelta()
+        for i in range(100):
+            record = {
+                "timestamp": start + timedelta(seconds=i),
+                "continuity_score": i / 100,
+                "risk_level": "HIGH" if i % 4 == 0 else "LOW",
+                "collaboration_detected": i % 10 == 0
+            }
+            (first if i < 60 else second).add(record)
+        first.merge(second)
+        update = {}
+        first.apply_to("history", update)
+        expected = {
+            "history.records": 100,
+            "history.counts.risk_level.HIGH": 25,
+            "history.counts.risk_level.LOW": 75,
+            "history.flags.collaboration_detected": 10
+        }
+        for key, value in expected.items():
+            if update["$inc"].get(key) != value:
+                print(f"❌ {key}: expected {value}, got {update['$inc'].get(key)}")
+                return False
+        if update["$max"]["history.maxima.continuity_score"] != 0.99 or update["$min"]["first_event_at"] != start:
+            print(f"❌ Unexpected extremes: {update['$max']} {update['$min']}")
+            return False
+        print("✅ Summary covers all 100 records")
+        return True
+    except Exception as e:
+        print(f"❌ Summary error: {str(e)}")
+        return False
+
+def test_cross_session_correlation():
+    """Active sessions of the same user are correlated through the store"""
+    print("\n🔗 Testing cross-session correlation...")
+    try:
+        monitor = SessionIntegrityMonitor()
+        for i in range(4):
+            monitor.session_state.touch_session(
+                f"exam-{i}",
+                {"user_id": "candidate-9", "device_fingerprint": {"screen_resolution": f"{1000 + i}x800"}},
+                {}
+            )
+        analysis = monitor._analyze_cross_session_correlation({
+            "session_id": "exam-0",
+            "user_id": "candidate-9",
+            "device_fingerprint": {"screen_resolution": "1920x1080"}
+        })
+        if analysis["concurrent_sessions"] != 4 or analysis["device_consistency"]:
+            print(f"❌ Unexpected correlation: {analysis}")
+            return False
+        print(f"   • anomalies: {analysis['correlation_anomalies']}")
+        print("✅ Concurrent sessions and device changes detected")
+        return True
+    except Exception as e:
+        print(f"❌ Correlation error: {str(e)}")
+        return False
+
+def test_session_state_stats_endpoint():
+    """GET /admin/session-state/stats"""
+    print("\n📊 Testing session state stats endpoint...")
+    try:
+        response = requests.get(f"{BACKEND_URL}/admin/session-state/stats", timeout=30)
+        if response.status_code != 200:
+            print(f"❌ Stats request failed: {response.status_code} {response.text}")
+            return False
+        result = response.json()
+        if result["engine_loaded"] and "tracked_sessions" not in result["session_state"]:
+            print(f"❌ Unexpected stats: {result}")
+            return False
+        print(f"   • {result['session_state']}")
+        print("✅ Session state stats reported")
+        return True
+    except Exception as e:
+        print(f"❌ Stats endpoint error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [
+        test_ring_buffers(),
+        test_idle_eviction(),
+        test_summary_delta(),
+        test_cross_session_correlation(),
+        test_session_state_stats_endpoint(),
+    ]
+    print(f"\n{sum(results)}/{len(results)} tests passed")
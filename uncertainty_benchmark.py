@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Bootstrap Uncertainty Benchmark
+
+Compares the former per-level bootstrap loop (1000 np.random.choice calls for
+each of the 80/90/95/99% levels) with the vectorized uncertainty module on
+synthetic risk score histories:
+1. One session: loop vs one resample-index matrix for all levels (percentile and BCa)
+2. Many sessions: per-session calls vs batch_bootstrap_intervals
+3. Reproducibility and agreement of the percentile bounds with the loop
+
+Usage: python uncertainty_benchmark.py [--sessions 500] [--history 25] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+sys.path.append('/app/backend')
+from uncertainty import batch_bootstrap_intervals, bootstrap_intervals
+
+LEVELS = [0.80, 0.90, 0.95, 0.99]
+
+
+def loop_bootstrap(scores, confidence_levels, n_bootstrap=1000):
+    """The previous RealTimeRiskCalculator implementation, once per confidence level"""
+    intervals = {}
+    for confidence_level in confidence_levels:
+        bootstrap_means = []
+        for _ in range(n_bootstrap):
+            bootstrap_sample = np.random.choice(scores, size=len(scores), replace=True)
+            bootstrap_means.append(np.mean(bootstrap_sample))
+        alpha = 1 - confidence_level
+        intervals[f"{int(confidence_level * 100)}%"] = (np.percentile(bootstrap_means, alpha / 2 * 100),
+                                                        np.percentile(bootstrap_means, (1 - alpha / 2) * 100))
+    return intervals
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--history", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    histories = [rng.beta(2, 5, size=args.history) for _ in range(args.sessions)]
+    scores = histories[0]
+
+    print(f"🎯 One session ({args.history} scores, {len(LEVELS)} confidence levels, 1000 resamples):")
+    loop_seconds, loop_result = timed(lambda: loop_bootstrap(scores, LEVELS), args.repeat)
+    percentile_seconds, percentile_result = timed(
+        lambda: bootstrap_intervals(scores, LEVELS, method="percentile", allow_normal_approximation=False), args.repeat)
+    bca_seconds, bca_result = timed(lambda: bootstrap_intervals(scores, LEVELS, allow_normal_approximation=False), args.repeat)
+    print(f"   • loop       {loop_seconds * 1000:8.2f} ms")
+    print(f"   • percentile {percentile_seconds * 1000:8.2f} ms ({loop_seconds / percentile_seconds:.0f}x)")
+    print(f"   • BCa        {bca_seconds * 1000:8.2f} ms ({loop_seconds / bca_seconds:.0f}x)")
+
+    lower, upper = loop_result["95%"]
+    vectorized = percentile_result["95%"]
+    print(f"   • 95% interval: loop [{lower:.4f}, {upper:.4f}], percentile "
+          f"[{vectorized['lower_bound']:.4f}, {vectorized['upper_bound']:.4f}], BCa "
+          f"[{bca_result['95%']['lower_bound']:.4f}, {bca_result['95%']['upper_bound']:.4f}]")
+    repeated = bootstrap_intervals(scores, LEVELS, allow_normal_approximation=False)
+    print(f"   • seeded rerun identical: {repeated == bca_result}")
+
+    sample = min(args.sessions, 20)
+    per_session_seconds, _ = timed(
+        lambda: [bootstrap_intervals(h, LEVELS, allow_normal_approximation=False) for h in histories[:sample]], 1)
+    per_session_seconds *= args.sessions / sample
+    batch_seconds, _ = timed(
+        lambda: batch_bootstrap_intervals(histories, LEVELS, allow_normal_approximation=False), args.repeat)
+    loop_total = loop_seconds * args.sessions
+    print(f"\n📚 {args.sessions} sessions:")
+    print(f"   • loop (estimated)   {loop_total:8.2f} s")
+    print(f"   • per-session calls  {per_session_seconds:8.2f} s")
+    print(f"   • batch              {batch_seconds:8.2f} s ({loop_total / batch_seconds:.0f}x vs loop)")
+
+
+if __name__ == "__main__":
+    main()
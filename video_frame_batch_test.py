@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Batched Video Frame Ingestion Test
+
+Tests the /api/analysis/video-frames/batch endpoint:
+1. Batch of frames is accepted and summarized
+2. Static frames are skipped by adaptive sampling
+3. Oversized and empty batches are rejected
+"""
+
+import requests
+import base64
+import io
+import uuid
+from datetime import datetime, timedelta
+from PIL import Image, ImageDraw
+
+# Backend URL
+BACKEND_URL = "https://netdata-collector.preview.emergentagent.com/api"
+
+def make_frame(offset: int) -> str:
+    """Create a base64 JPEG frame with a moving bright square"""
+    image = Image.new("RGB", (320, 240), (40, 40, 40))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([100 + offset, 60, 200 + offset, 180], fill=(200, 170, 150))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=80)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+def test_video_frame_batch():
+    """Send a batch of frames and check the ingestion summary"""
+    print("🎥 Testing batched video frame ingestion...")
+    session_id = f"batch_test_{uuid.uuid4()}"
+    start = datetime.utcnow()
+
+    # 10 identical frames followed by 10 frames with motion
+    frames = []
+    for i in range(20):
+        offset = 0 if i < 10 else (i - 10) * 8
+        frames.append({
+            "frame_data": make_frame(offset),
+            "timestamp": (start + timedelta(milliseconds=200 * i)).isoformat()
+        })
+
+    try:
+        response = requests.post(
+            f"{BACKEND_URL}/analysis/video-frames/batch",
+            json={"session_id": session_id, "frames": frames},
+            timeout=60
+        )
+        print(f"Status Code: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Batch request failed: {response.text}")
+            return False
+
+        data = response.json()
+        if data.get("message") == "Emotion detector not available":
+            print("⚠️  Emotion detector disabled on this deployment - endpoint reachable")
+            return True
+
+        print(f"   • Frames received: {data.get('frames_received')}")
+        print(f"   • Frames analyzed: {data.get('frames_analyzed')}")
+        print(f"   • Frames skipped: {data.get('frames_skipped')}")
+        print(f"   • Face detections run: {data.get('face_detections_run')}")
+
+        if data.get("frames_received") != 20:
+            print("❌ Unexpected frames_received")
+            return False
+        if data.get("frames_skipped", 0) == 0:
+            print("❌ Expected static frames to be skipped")
+            return False
+        print("✅ Batched ingestion working")
+        return True
+    except Exception as e:
+        print(f"❌ Batch request error: {str(e)}")
+        return False
+
+def test_invalid_batches():
+    """Empty and oversized batches must be rejected"""
+    print("\n🚫 Testing invalid batches...")
+    try:
+        empty = requests.post(f"{BACKEND_URL}/analysis/video-frames/batch", json={"frames": []}, timeout=30)
+        oversized = requests.post(
+            f"{BACKEND_URL}/analysis/video-frames/batch",
+            json={"frames": ["x"] * 61},
+            timeout=30
+        )
+        ok = empty.status_code == 400 and oversized.status_code == 400
+        print(f"{'✅' if ok else '❌'} Empty: {empty.status_code}, oversized: {oversized.status_code}")
+        return ok
+    except Exception as e:
+        print(f"❌ Invalid batch test error: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    results = [test_video_frame_batch(), test_invalid_batches()]
+    print(f"\n{sum(results)}/{len(results)} tests passed")